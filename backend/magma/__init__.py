@@ -11,8 +11,9 @@ relationship storage and retrieval:
   - causal:   Cause-effect reasoning chains
 
 Submodules:
-  - taxonomy: Canonical relationship type constants per graph layer
-  - store:    Persist extracted relationships to entity_relationships table
+  - taxonomy:   Canonical relationship type constants per graph layer
+  - store:      Persist extracted relationships to entity_relationships table
+  - resolution: Batched entity resolution (one lookup, one bulk write)
 """
 
 from backend.magma.taxonomy import (
@@ -0,0 +1,376 @@
+"""
+MAGMA Resolution - Batched Entity Resolution
+=============================================
+
+Resolves a whole batch of extracted entities against the ``entities``
+table with a constant number of round-trips, regardless of how many
+entities a message names:
+
+  1. One candidate lookup (``match_entity_candidates`` RPC, backed by the
+     ``idx_entities_name_trigram`` GIN index) for every name in the batch
+  2. In-process fuzzy matching: normalized names first, then pg_trgm-style
+     trigram similarity
+  3. One bulk ``upsert`` that applies every merge and every create
+
+New entities get client-generated UUIDs so the upsert response never has
+to be matched back to its input rows.
+
+The main entry point is :func:`resolve_entities_batch`, called from
+``backend/worker/slow_path.py`` and ``lib/agent/memory.py``.  It returns
+one ``{"action": ..., "entity_id": ...}`` dict per input entity, in input
+order -- the same shape :func:`backend.magma.store.build_entity_name_to_id`
+consumes.
+"""
+
+import asyncio
+import logging
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+
+# Minimum trigram similarity for a fuzzy (non-exact) match.  Mirrors the
+# pg_trgm default ``similarity_threshold`` of 0.3 used by the candidate
+# lookup, but is stricter so "Jon Smith" merges into "John Smith" while
+# "Jo" does not merge into "John Smith".
+DEFAULT_SIMILARITY_THRESHOLD: float = 0.6
+
+# Candidate lookup is looser than the final match so near-misses still
+# reach the in-process scorer.
+CANDIDATE_SIMILARITY_THRESHOLD: float = 0.3
+
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+# ---------------------------------------------------------------------------
+# Name normalization and similarity
+# ---------------------------------------------------------------------------
+
+def normalize_entity_name(name: str) -> str:
+    """
+    Normalize an entity name for comparison.
+
+    Lowercases, strips accents and punctuation, and collapses whitespace,
+    so ``"Dr. José  Álvarez"`` and ``"dr jose alvarez"`` compare equal.
+
+    Parameters
+    ----------
+    name : str
+        Raw entity name.
+
+    Returns
+    -------
+    str
+        Normalized name (may be empty).
+    """
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    ascii_only = "".join(c for c in decomposed if not unicodedata.combining(c))
+    stripped = _NON_WORD_RE.sub(" ", ascii_only.lower()).replace("_", " ")
+    return _WHITESPACE_RE.sub(" ", stripped).strip()
+
+
+def _trigrams(normalized: str) -> FrozenSet[str]:
+    """Return the pg_trgm-style trigram set of a normalized name."""
+    grams: set = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return frozenset(grams)
+
+
+def trigram_similarity(a: str, b: str) -> float:
+    """
+    Trigram similarity between two names, matching pg_trgm ``similarity()``.
+
+    Parameters
+    ----------
+    a, b : str
+        Names to compare (normalized internally).
+
+    Returns
+    -------
+    float
+        Shared trigrams divided by total distinct trigrams, in [0.0, 1.0].
+    """
+    grams_a = _trigrams(normalize_entity_name(a))
+    grams_b = _trigrams(normalize_entity_name(b))
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def find_best_match(
+    name: str,
+    candidates: List[Dict[str, Any]],
+    entity_type: Optional[str] = None,
+    domain: Optional[str] = None,
+    similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    strict: bool = False,
+) -> Tuple[Optional[Dict[str, Any]], float]:
+    """
+    Pick the best existing entity for ``name`` from a candidate list.
+
+    An exact normalized-name match always scores 1.0.  Otherwise the
+    highest trigram similarity at or above ``similarity_threshold`` wins,
+    provided both names contain the same numbers.
+    Ties are broken in favour of candidates whose ``type`` and ``domain``
+    agree with the incoming entity.
+
+    Parameters
+    ----------
+    name : str
+        Incoming entity name.
+    candidates : list[dict]
+        Entity rows (must contain ``name``; ``type``/``domain`` optional).
+    entity_type, domain : str, optional
+        Incoming entity type and domain.
+    similarity_threshold : float
+        Minimum fuzzy score to accept.
+    strict : bool
+        When True, candidates must also match ``entity_type`` and
+        ``domain`` exactly (the ingestion pipeline's historical rule).
+
+    Returns
+    -------
+    tuple[dict | None, float]
+        ``(best_candidate, score)``; ``(None, 0.0)`` when nothing qualifies.
+    """
+    normalized = normalize_entity_name(name)
+    if not normalized:
+        return None, 0.0
+
+    best: Optional[Dict[str, Any]] = None
+    best_key: Tuple[float, int] = (0.0, -1)
+
+    for candidate in candidates:
+        cand_type = candidate.get("type")
+        cand_domain = candidate.get("domain")
+        if strict and (
+            (entity_type and cand_type != entity_type)
+            or (domain and cand_domain != domain)
+        ):
+            continue
+
+        cand_name = normalize_entity_name(candidate.get("name", ""))
+        if cand_name == normalized:
+            score = 1.0
+        elif _DIGITS_RE.findall(cand_name) != _DIGITS_RE.findall(normalized):
+            # "Q1 Launch" and "Q2 Launch" are different things no matter
+            # how many trigrams they share.
+            continue
+        else:
+            score = trigram_similarity(normalized, cand_name)
+            if score < similarity_threshold:
+                continue
+
+        agreement = int(bool(entity_type) and cand_type == entity_type) + int(
+            bool(domain) and cand_domain == domain
+        )
+        key = (score, agreement)
+        if key > best_key:
+            best, best_key = candidate, key
+
+    return best, best_key[0] if best is not None else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Database access
+# ---------------------------------------------------------------------------
+
+async def fetch_entity_candidates(
+    client: Any,
+    names: List[str],
+    min_similarity: float = CANDIDATE_SIMILARITY_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch existing active entities similar to any of ``names`` in one query.
+
+    Parameters
+    ----------
+    client : supabase.Client
+        Supabase client.
+    names : list[str]
+        Raw entity names from the batch.
+    min_similarity : float
+        pg_trgm similarity floor applied server-side.
+
+    Returns
+    -------
+    list[dict]
+        Candidate entity rows (``id``, ``name``, ``type``, ``domain``,
+        ``attributes``, ``status``).  The RPC caps rows per name, exact
+        name matches first, so a large batch cannot crowd out an exact match.
+    """
+    unique_names = sorted({n.strip() for n in names if n and n.strip()})
+    if not unique_names:
+        return []
+
+    response = await asyncio.to_thread(
+        lambda: client.rpc(
+            "match_entity_candidates",
+            {"p_names": unique_names, "p_min_similarity": min_similarity},
+        ).execute()
+    )
+    return response.data if isinstance(response.data, list) else []
+
+
+# ---------------------------------------------------------------------------
+# Batch resolution
+# ---------------------------------------------------------------------------
+
+async def resolve_entities_batch(
+    entities: List[Dict[str, Any]],
+    user_id: str = "",
+    client: Optional[Any] = None,
+    similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    strict: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Resolve a batch of entities with one lookup and one bulk write.
+
+    Entities that match an existing record (or an earlier entity in the
+    same batch) are merged: attributes are combined with new values
+    winning, and ``mention_count`` is incremented once per mention.
+    Everything else is created.
+
+    Parameters
+    ----------
+    entities : list[dict]
+        Entity dicts with ``name`` and optional ``type``, ``domain``,
+        ``attributes``.
+    user_id : str
+        User ID recorded in mention metadata.
+    client : supabase.Client, optional
+        Supabase client; defaults to the shared WAL service client.
+    similarity_threshold : float
+        Minimum trigram similarity for a fuzzy merge.
+    strict : bool
+        Require exact ``type`` and ``domain`` agreement for merges.
+
+    Returns
+    -------
+    list[dict]
+        One ``{"action": "created" | "updated" | "skipped",
+        "entity_id": ...}`` dict per input entity, in input order.
+
+    Raises
+    ------
+    Exception
+        Propagates lookup or write failures so callers can fall back to
+        per-entity resolution.
+    """
+    results: List[Dict[str, Any]] = [
+        {"action": "skipped", "entity_id": None} for _ in entities
+    ]
+    named = [
+        (i, e) for i, e in enumerate(entities)
+        if (e.get("name") or "").strip()
+    ]
+    for i, e in enumerate(entities):
+        if not (e.get("name") or "").strip():
+            logger.warning("Entity resolution skipped: empty name (index %d)", i)
+
+    if not named:
+        return results
+
+    if client is None:
+        from backend.services.wal import get_supabase_client
+
+        client = get_supabase_client()
+
+    candidates = await fetch_entity_candidates(
+        client, [e["name"] for _, e in named],
+    )
+
+    now_iso = datetime.now(timezone.utc).isoformat()
+    # entity_id -> pending row; insertion order is preserved for the upsert
+    pending: Dict[str, Dict[str, Any]] = {}
+    created_ids: set = set()
+
+    for index, entity_data in named:
+        name: str = entity_data["name"].strip()
+        entity_type: str = entity_data.get("type") or "unknown"
+        domain: str = entity_data.get("domain") or "personal"
+        attributes: Dict[str, Any] = entity_data.get("attributes") or {}
+
+        # Earlier rows in this batch take part in matching so that two
+        # mentions of the same new entity produce a single record.
+        pool = candidates + [
+            row for row in pending.values() if row["id"] in created_ids
+        ]
+        match, score = find_best_match(
+            name,
+            pool,
+            entity_type=entity_type,
+            domain=domain,
+            similarity_threshold=similarity_threshold,
+            strict=strict,
+        )
+
+        if match is not None:
+            entity_id = str(match["id"])
+            row = pending.get(entity_id)
+            if row is None:
+                row = {
+                    "id": entity_id,
+                    "name": match.get("name", name),
+                    "type": match.get("type") or entity_type,
+                    "domain": match.get("domain") or domain,
+                    "status": match.get("status") or "active",
+                    "attributes": dict(match.get("attributes") or {}),
+                }
+                pending[entity_id] = row
+
+            merged = {**row["attributes"], **attributes}
+            merged["mention_count"] = row["attributes"].get("mention_count", 0) + 1
+            if user_id:
+                merged["last_mentioned_by"] = user_id
+            merged["last_mentioned_at"] = now_iso
+            row["attributes"] = merged
+            row["updated_at"] = now_iso
+
+            action = "created" if entity_id in created_ids else "updated"
+            logger.debug(
+                "Entity matched: %r -> %r (id=%s score=%.2f)",
+                name, row["name"], entity_id, score,
+            )
+        else:
+            entity_id = str(uuid4())
+            new_attrs = {**attributes, "mention_count": 1}
+            if user_id:
+                new_attrs["first_mentioned_by"] = user_id
+            new_attrs["first_mentioned_at"] = now_iso
+            pending[entity_id] = {
+                "id": entity_id,
+                "name": name,
+                "type": entity_type,
+                "domain": domain,
+                "status": "active",
+                "attributes": new_attrs,
+                "updated_at": now_iso,
+            }
+            created_ids.add(entity_id)
+            action = "created"
+
+        results[index] = {"action": action, "entity_id": entity_id}
+
+    rows = list(pending.values())
+    await asyncio.to_thread(
+        lambda: client.table("entities").upsert(rows, on_conflict="id").execute()
+    )
+
+    logger.info(
+        "Batch entity resolution: %d entities -> %d created, %d updated "
+        "(1 lookup, 1 write)",
+        len(named),
+        len(created_ids),
+        len(rows) - len(created_ids),
+    )
+    return results
@@ -15,6 +15,10 @@ Key behaviours:
   - Validates predicates against the MAGMA taxonomy
   - Corrects ``graph_layer`` via :func:`infer_layer` if mismatched
   - Logs all skips and errors (never swallows silently)
+
+Inserted edges update ``entity_centrality`` (per-entity degree used by
+salience scoring) through statement-level triggers on
+``entity_relationships``; see ``backend/services/entity_centrality.py``.
 """
 
 import logging
@@ -223,7 +227,8 @@ def build_entity_name_to_id(
     Build a mapping of entity names to their resolved UUIDs.
 
     Pairs each entity from the input list with the resolution result
-    from ``_async_resolve_entity()`` to create the lookup table
+    from ``resolve_entities_batch()`` (or the per-entity
+    ``_async_resolve_entity()`` fallback) to create the lookup table
     needed by :func:`store_relationships`.
 
     Parameters
@@ -12,17 +12,28 @@ Key Features:
 3. Performance metrics: Execution time tracking
 4. Security monitoring: Blocked repo access attempts logged
 5. Multi-tenant support: User ID association for filtering
+6. Buffered writes: entries go to an in-memory queue and a background
+   thread flushes them as multi-row INSERTs, off the request path.  When
+   the database is unreachable, rows are appended to a local spill file
+   and replayed once inserts succeed again.  Rows the database rejects
+   outright (constraint or size violations) are isolated by bisecting the
+   batch and moved to a dead-letter file instead of being retried.
 
 Owner: @backend-architect-sabine
 PRD Reference: Project Dream Team - Agent Observability
 """
 
+import atexit
+import json
 import logging
 import os
 import re
+import tempfile
+import threading
 import time
+from collections import deque
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 from uuid import UUID, uuid4
 
 from supabase import Client, create_client
@@ -38,6 +49,23 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
 TOOL_AUDIT_TABLE = "tool_audit_log"
 
+# Buffered writer: entries are queued and flushed in multi-row INSERTs when
+# AUDIT_LOG_BATCH_SIZE rows are waiting or every AUDIT_LOG_FLUSH_INTERVAL_SECONDS.
+AUDIT_LOG_BUFFERED = os.getenv("AUDIT_LOG_BUFFERED", "true").lower() == "true"
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "5000"))
+AUDIT_LOG_BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "100"))
+AUDIT_LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL_SECONDS", "2"))
+AUDIT_LOG_SPILL_PATH = os.getenv(
+    "AUDIT_LOG_SPILL_PATH",
+    os.path.join(tempfile.gettempdir(), "sabine_tool_audit_spill.jsonl"),
+)
+
+# Error codes caused by the rows themselves, so retrying them cannot help:
+# SQLSTATE data exceptions (22) and integrity violations (23), and PostgREST
+# malformed-request errors (PGRST1xx).  Schema-wide errors (e.g. a column
+# missing before a migration) stay transient and keep the rows spilled.
+_PERMANENT_ERROR_PREFIXES = ("22", "23", "PGRST1")
+
 # Maximum size for stored input/output (to prevent bloat)
 MAX_INPUT_SIZE = 2000
 MAX_OUTPUT_SIZE = 2000
@@ -194,6 +222,380 @@ def classify_error(error_message: str) -> Optional[str]:
         return "unknown"
 
 
+# =============================================================================
+# Buffered Audit Sink
+# =============================================================================
+
+def _is_permanent_error(error: Exception) -> bool:
+    """
+    True if retrying the same rows cannot succeed.
+
+    PostgREST errors carry the SQLSTATE (or a ``PGRST`` code) in ``code``;
+    anything without one (connection errors, timeouts, 5xx) is transient.
+    """
+    code = str(getattr(error, "code", "") or "")
+    if code.startswith(_PERMANENT_ERROR_PREFIXES):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 413
+
+
+class AuditLogSink:
+    """
+    Process-wide buffered writer for ``tool_audit_log`` rows.
+
+    ``enqueue()`` only appends to a bounded in-memory queue, so callers never
+    wait on the database.  A daemon thread flushes the queue as multi-row
+    INSERTs once ``batch_size`` rows are waiting or ``flush_interval``
+    seconds have passed.  Rows that cannot be inserted (or that arrive while
+    the queue is full) are appended to a JSONL spill file, which is replayed
+    after the next successful insert.
+
+    Inserts are upserts that ignore duplicate ids, so a batch re-sent after
+    an ambiguous timeout does not fail.  A batch the database rejects is
+    bisected until the offending rows are isolated; those go to
+    ``{spill_path}.rejected`` and the rest are written.
+
+    Usage:
+        sink = get_audit_sink()
+        sink.enqueue([audit_entry])
+        ...
+        sink.close()  # on shutdown: drain the queue
+    """
+
+    def __init__(
+        self,
+        client_factory: Optional[Callable[[], Optional[Client]]] = None,
+        max_queue: int = AUDIT_LOG_QUEUE_SIZE,
+        batch_size: int = AUDIT_LOG_BATCH_SIZE,
+        flush_interval: float = AUDIT_LOG_FLUSH_INTERVAL_SECONDS,
+        spill_path: str = AUDIT_LOG_SPILL_PATH,
+    ):
+        """
+        Initialize the sink (the flush thread starts on first enqueue).
+
+        Args:
+            client_factory: Returns the Supabase client (default: get_supabase_client)
+            max_queue: Rows held in memory before overflow goes to the spill file
+            batch_size: Rows per INSERT, and the queue depth that triggers a flush
+            flush_interval: Maximum seconds a row waits before being flushed
+            spill_path: JSONL file for rows that could not be inserted
+                (rejected rows go to ``{spill_path}.rejected``)
+        """
+        self._client_factory = client_factory or get_supabase_client
+        self.max_queue = max_queue
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.dead_letter_path = f"{spill_path}.rejected"
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = False
+
+        self._stats: Dict[str, int] = {
+            "enqueued": 0,
+            "flushed": 0,
+            "flush_batches": 0,
+            "flush_failures": 0,
+            "overflowed": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "dead_lettered": 0,
+            "high_watermark": 0,
+        }
+
+    # -------------------------------------------------------------------------
+    # Producer side
+    # -------------------------------------------------------------------------
+
+    def enqueue(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Queue rows for insertion without blocking on the database.
+
+        Rows beyond the queue's capacity are written to the spill file
+        instead (backpressure shows up as ``overflowed`` in ``stats()``).
+
+        Returns:
+            Number of rows accepted (queued or spilled)
+        """
+        if not rows:
+            return 0
+
+        with self._lock:
+            space = max(0, self.max_queue - len(self._queue))
+            accepted, overflow = rows[:space], rows[space:]
+            self._queue.extend(accepted)
+            self._stats["enqueued"] += len(accepted)
+            self._stats["high_watermark"] = max(self._stats["high_watermark"], len(self._queue))
+            if len(self._queue) >= self.batch_size:
+                self._wake.notify()
+
+        if overflow:
+            logger.warning(f"Audit log queue full ({self.max_queue}); spilling {len(overflow)} rows")
+            with self._lock:
+                self._stats["overflowed"] += len(overflow)
+            self._spill(overflow)
+
+        self._ensure_started()
+        return len(rows)
+
+    def _ensure_started(self) -> None:
+        # A forked child inherits the deque but not the thread
+        if self._stopping:
+            return
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run, name="audit-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    # -------------------------------------------------------------------------
+    # Flush side
+    # -------------------------------------------------------------------------
+
+    def _run(self) -> None:
+        # Rows left over from a previous process (crash, DB outage)
+        self.replay_spill()
+        while True:
+            with self._wake:
+                if not self._stopping and len(self._queue) < self.batch_size:
+                    self._wake.wait(self.flush_interval)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self) -> int:
+        """
+        Write every queued row now.
+
+        Returns:
+            Number of rows inserted into the database
+        """
+        inserted = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    if not self._queue:
+                        break
+                    count = min(self.batch_size, len(self._queue))
+                    batch = [self._queue.popleft() for _ in range(count)]
+                written, pending = self._write(batch)
+                inserted += written
+                if pending:
+                    self._spill(pending)
+
+            if inserted and os.path.exists(self.spill_path):
+                self._replay_locked()
+        return inserted
+
+    def _write(self, rows: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Insert rows, bisecting around rows the database rejects.
+
+        Returns:
+            (rows inserted, rows left unwritten by a transient failure)
+        """
+        error = self._insert(rows)
+        if error is None:
+            return len(rows), []
+        if not _is_permanent_error(error):
+            return 0, rows
+        if len(rows) == 1:
+            self._dead_letter(rows[0], error)
+            return 0, []
+
+        mid = len(rows) // 2
+        written, pending = self._write(rows[:mid])
+        if pending:
+            return written, pending + rows[mid:]
+        right_written, pending = self._write(rows[mid:])
+        return written + right_written, pending
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> Optional[Exception]:
+        """One multi-row upsert; returns the error, or None on success."""
+        client = self._client_factory()
+        if not client:
+            return ConnectionError("Supabase client not configured")
+        try:
+            client.table(TOOL_AUDIT_TABLE).upsert(
+                rows, on_conflict="id", ignore_duplicates=True,
+            ).execute()
+        except Exception as e:
+            with self._lock:
+                self._stats["flush_failures"] += 1
+            logger.warning(f"Audit log flush of {len(rows)} rows failed: {e}")
+            return e
+        with self._lock:
+            self._stats["flushed"] += len(rows)
+            self._stats["flush_batches"] += 1
+        logger.debug(f"Audit log flushed {len(rows)} rows")
+        return None
+
+    def _dead_letter(self, row: Dict[str, Any], error: Exception) -> None:
+        """Set aside a row the database will never accept."""
+        logger.error(f"Audit row {row.get('id')} rejected by the database; dead-lettering: {error}")
+        try:
+            with self._spill_lock, open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"row": row, "error": str(error)}, default=str) + "\n")
+        except OSError as e:
+            logger.error(f"Could not dead-letter audit row to {self.dead_letter_path}: {e}")
+        with self._lock:
+            self._stats["dead_lettered"] += 1
+
+    # -------------------------------------------------------------------------
+    # Spill file
+    # -------------------------------------------------------------------------
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, default=str) + "\n")
+        except OSError as e:
+            logger.error(f"Could not spill {len(rows)} audit rows to {self.spill_path}: {e}")
+            return
+        with self._lock:
+            self._stats["spilled"] += len(rows)
+
+    def replay_spill(self) -> int:
+        """
+        Insert rows from the spill file, keeping any that still fail.
+
+        Returns:
+            Number of rows replayed into the database
+        """
+        with self._flush_lock:
+            return self._replay_locked()
+
+    def _replay_locked(self) -> int:
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return 0
+            replay_path = f"{self.spill_path}.replaying"
+            try:
+                os.replace(self.spill_path, replay_path)
+            except OSError as e:
+                logger.warning(f"Could not claim audit spill file: {e}")
+                return 0
+
+        rows: List[Dict[str, Any]] = []
+        with open(replay_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt line in audit spill file")
+
+        replayed = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            written, pending = self._write(batch)
+            replayed += written
+            if pending:
+                # Still down: put the remainder back for the next attempt
+                self._spill(pending + rows[start + len(batch):])
+                break
+
+        os.remove(replay_path)
+        if replayed:
+            with self._lock:
+                self._stats["replayed"] += replayed
+            logger.info(f"Replayed {replayed} audit rows from spill file")
+        return replayed
+
+    # -------------------------------------------------------------------------
+    # Lifecycle / metrics
+    # -------------------------------------------------------------------------
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the flush thread and drain the queue (call on shutdown)."""
+        with self._wake:
+            self._stopping = True
+            self._wake.notify()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        # Anything the thread did not get to (or enqueued after it exited)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and backpressure counters."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["queue_depth"] = len(self._queue)
+        stats["queue_capacity"] = self.max_queue
+        stats["batch_size"] = self.batch_size
+        stats["flush_interval_seconds"] = self.flush_interval
+        stats["spill_pending"] = os.path.exists(self.spill_path)
+        stats["dead_letter_path"] = self.dead_letter_path
+        stats["running"] = self._thread is not None and self._thread.is_alive()
+        return stats
+
+
+_audit_sink: Optional[AuditLogSink] = None
+_audit_sink_lock = threading.Lock()
+
+
+def get_audit_sink() -> AuditLogSink:
+    """Get the process-wide audit sink (created on first use)."""
+    global _audit_sink
+    if _audit_sink is None:
+        with _audit_sink_lock:
+            if _audit_sink is None:
+                _audit_sink = AuditLogSink()
+                atexit.register(close_audit_sink)
+    return _audit_sink
+
+
+def set_audit_buffering(enabled: bool) -> None:
+    """
+    Turn the buffered writer on or off for this process.
+
+    The rq worker disables it: work-horse processes exit via ``os._exit``,
+    which skips the shutdown flush.
+    """
+    global AUDIT_LOG_BUFFERED
+    AUDIT_LOG_BUFFERED = enabled
+
+
+def close_audit_sink(timeout: float = 10.0) -> None:
+    """
+    Flush-on-shutdown hook: drain queued audit rows to the database.
+
+    Registered with ``atexit`` and called from the API shutdown handler.
+    Safe to call more than once.
+    """
+    if _audit_sink is None:
+        return
+    try:
+        _audit_sink.close(timeout)
+    except Exception as e:
+        logger.error(f"Error flushing audit log on shutdown: {e}")
+
+
+def get_audit_sink_stats() -> Dict[str, Any]:
+    """Buffered writer metrics (empty queue stats if never used)."""
+    stats = get_audit_sink().stats() if _audit_sink is not None else {"queue_depth": 0, "running": False}
+    stats["buffered"] = AUDIT_LOG_BUFFERED
+    return stats
+
+
 # =============================================================================
 # Main Audit Logging Functions
 # =============================================================================
@@ -211,6 +613,7 @@ async def log_tool_execution(
     session_id: Optional[str] = None,
     task_id: Optional[UUID] = None,
     agent_role: Optional[str] = None,
+    cache_hit: bool = False,
 ) -> Optional[UUID]:
     """
     Log a tool execution to the audit log.
@@ -231,9 +634,11 @@ async def log_tool_execution(
         session_id: Session/conversation context
         task_id: Task ID if this is part of orchestrated execution
         agent_role: Agent role that executed the tool
+        cache_hit: Whether the result was served from the tool result cache
 
     Returns:
-        UUID of the created audit log entry, or None if logging failed
+        UUID of the audit log entry (queued for the background writer when
+        AUDIT_LOG_BUFFERED is on), or None if logging failed
     """
     client = get_supabase_client()
     if not client:
@@ -241,48 +646,32 @@ async def log_tool_execution(
         return None
 
     try:
-        # Redact sensitive data from inputs
-        safe_input = redact_sensitive_data(input_params) if input_params else {}
-        safe_input = truncate_data(safe_input, MAX_INPUT_SIZE)
-
-        # Create output summary (redacted and truncated)
-        output_summary = {}
-        if output_data:
-            safe_output = redact_sensitive_data(output_data)
-            output_summary = truncate_data(safe_output, MAX_OUTPUT_SIZE)
-
-        # Extract repo info from input
-        target_repo, target_path = extract_repo_info(tool_name, input_params or {})
-
-        # Classify error type
-        error_type = classify_error(error_message) if error_message else None
-
-        # Build audit log entry
-        audit_entry = {
-            "id": str(uuid4()),
-            "user_id": user_id,
-            "session_id": session_id,
-            "task_id": str(task_id) if task_id else None,
-            "agent_role": agent_role,
-            "tool_name": tool_name,
-            "tool_action": tool_action,
-            "input_params": safe_input,
-            "output_summary": output_summary,
-            "status": status,
-            "error_type": error_type,
-            "error_message": error_message[:500] if error_message else None,
-            "target_repo": target_repo,
-            "target_path": str(target_path) if target_path else None,
-            "artifact_created": artifact_created,
-            "execution_time_ms": execution_time_ms,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
+        audit_entry = _build_audit_entry(
+            tool_name=tool_name,
+            tool_action=tool_action,
+            input_params=input_params,
+            output_data=output_data,
+            status=status,
+            error_message=error_message,
+            artifact_created=artifact_created,
+            execution_time_ms=execution_time_ms,
+            user_id=user_id,
+            session_id=session_id,
+            task_id=task_id,
+            agent_role=agent_role,
+            cache_hit=cache_hit,
+        )
+        audit_id = UUID(audit_entry["id"])
+
+        if AUDIT_LOG_BUFFERED:
+            get_audit_sink().enqueue([audit_entry])
+            logger.debug(f"Audit log queued: {audit_id} - {tool_name} ({status})")
+            return audit_id
 
         # Insert into database
         result = client.table(TOOL_AUDIT_TABLE).insert(audit_entry).execute()
 
         if result.data:
-            audit_id = UUID(audit_entry["id"])
             logger.debug(f"Audit log created: {audit_id} - {tool_name} ({status})")
             return audit_id
         else:
@@ -295,6 +684,62 @@ async def log_tool_execution(
         return None
 
 
+def _build_audit_entry(
+    tool_name: str,
+    tool_action: Optional[str] = None,
+    input_params: Optional[Dict] = None,
+    output_data: Optional[Dict] = None,
+    status: str = "success",
+    error_message: Optional[str] = None,
+    artifact_created: Optional[str] = None,
+    execution_time_ms: Optional[int] = None,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    task_id: Optional[UUID] = None,
+    agent_role: Optional[str] = None,
+    cache_hit: bool = False,
+) -> Dict[str, Any]:
+    """Build a redacted, truncated ``tool_audit_log`` row."""
+    # Redact sensitive data from inputs
+    safe_input = redact_sensitive_data(input_params) if input_params else {}
+    safe_input = truncate_data(safe_input, MAX_INPUT_SIZE)
+
+    # Create output summary (redacted and truncated)
+    output_summary = {}
+    if output_data:
+        safe_output = redact_sensitive_data(output_data)
+        output_summary = truncate_data(safe_output, MAX_OUTPUT_SIZE)
+
+    # Extract repo info from input
+    target_repo, target_path = extract_repo_info(tool_name, input_params or {})
+
+    # Classify error type
+    error_type = classify_error(error_message) if error_message else None
+
+    # Build audit log entry
+    audit_entry = {
+        "id": str(uuid4()),
+        "user_id": user_id,
+        "session_id": session_id,
+        "task_id": str(task_id) if task_id else None,
+        "agent_role": agent_role,
+        "tool_name": tool_name,
+        "tool_action": tool_action,
+        "input_params": safe_input,
+        "output_summary": output_summary,
+        "status": status,
+        "error_type": error_type,
+        "error_message": error_message[:500] if error_message else None,
+        "target_repo": target_repo,
+        "target_path": str(target_path) if target_path else None,
+        "artifact_created": artifact_created,
+        "execution_time_ms": execution_time_ms,
+        "cache_hit": cache_hit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    return audit_entry
+
+
 async def log_tool_executions_batch(
     executions: List[Dict[str, Any]],
     task_id: Optional[UUID] = None,
@@ -304,8 +749,9 @@ async def log_tool_executions_batch(
     """
     Log multiple tool executions in a batch.
 
-    This is more efficient than calling log_tool_execution multiple times
-    when processing results from an agent run.
+    All rows are queued on the buffered sink together (or written in one
+    multi-row INSERT when buffering is off), which is much cheaper than
+    calling log_tool_execution once per result.
 
     Args:
         executions: List of execution dicts with tool_name, status, etc.
@@ -320,36 +766,42 @@ async def log_tool_executions_batch(
     if not client:
         return 0
 
-    logged_count = 0
-
+    entries: List[Dict[str, Any]] = []
     for execution in executions:
         try:
             # Skip tool_call entries (we only want to log results)
             if execution.get("type") == "tool_call":
                 continue
 
-            tool_name = execution.get("tool_name", "unknown")
-            status = execution.get("status", "unknown")
-            error_message = execution.get("error")
-            artifact = execution.get("artifact_created")
-
-            audit_id = await log_tool_execution(
-                tool_name=tool_name,
-                status=status,
-                error_message=error_message,
-                artifact_created=artifact,
+            entries.append(_build_audit_entry(
+                tool_name=execution.get("tool_name", "unknown"),
+                status=execution.get("status", "unknown"),
+                error_message=execution.get("error"),
+                artifact_created=execution.get("artifact_created"),
                 task_id=task_id,
                 user_id=user_id,
                 agent_role=agent_role,
-            )
-
-            if audit_id:
-                logged_count += 1
+                cache_hit=bool(execution.get("cache_hit", False)),
+            ))
 
         except Exception as e:
             logger.error(f"Error logging execution in batch: {e}")
             continue
 
+    if not entries:
+        return 0
+
+    if AUDIT_LOG_BUFFERED:
+        logged_count = get_audit_sink().enqueue(entries)
+    else:
+        # One multi-row INSERT for the whole turn
+        try:
+            result = client.table(TOOL_AUDIT_TABLE).insert(entries).execute()
+            logged_count = len(result.data) if result.data else 0
+        except Exception as e:
+            logger.error(f"Error logging execution batch: {e}")
+            logged_count = 0
+
     logger.info(f"Batch audit logging: {logged_count}/{len(executions)} entries logged")
     return logged_count
 
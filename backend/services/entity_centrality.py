@@ -0,0 +1,227 @@
+"""
+Entity Centrality
+=================
+
+Reads and checks the ``entity_centrality`` table: per-entity out/in degree
+in ``entity_relationships``, the graph signal behind the salience
+formula's causal-centrality component.
+
+The table is maintained in the database (migration
+``20260224000000_entity_centrality.sql``):
+
+- Statement-level triggers on ``entity_relationships`` apply each write's
+  degree deltas, so every edge ``backend.magma.store.store_relationships``
+  inserts is counted incrementally.
+- ``refresh_entity_centrality()`` recomputes all degrees with one GROUP BY.
+
+The nightly salience job reads one summed degree per memory through
+``load_memory_degrees`` instead of issuing two COUNT queries per memory.
+
+Consistency check (exit status 1 on drift)::
+
+    python -m backend.services.entity_centrality check
+    python -m backend.services.entity_centrality check --sample 200 --repair
+    python -m backend.services.entity_centrality refresh
+
+PRD Reference: MEM-001 (Salience Scoring Formula)
+"""
+
+import argparse
+import json
+import logging
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Constants
+# =============================================================================
+
+# Memory ids per memory_entity_degrees call (stays under PostgREST max_rows)
+DEGREE_BATCH_SIZE: int = 500
+
+# Drifted entities reported by the consistency check
+DRIFT_REPORT_LIMIT: int = 100
+
+# Memories compared against the on-the-fly COUNT queries by default
+DEFAULT_CHECK_SAMPLE: int = 50
+
+
+# =============================================================================
+# Reads
+# =============================================================================
+
+def load_memory_degrees(client: Any, memory_ids: Sequence[str]) -> Dict[str, int]:
+    """
+    Summed entity degree for each memory, joined in SQL.
+
+    Calls ``memory_entity_degrees`` in batches of ``DEGREE_BATCH_SIZE``.
+
+    Parameters
+    ----------
+    client : supabase.Client
+        Supabase client instance.
+    memory_ids : sequence of str
+        Memories to look up.
+
+    Returns
+    -------
+    dict[str, int]
+        memory id -> degree.  Memories without entity links are absent
+        (their centrality does not depend on the degree).
+
+    Raises
+    ------
+    Exception
+        If an RPC call fails; callers decide how to fall back.
+    """
+    degrees: Dict[str, int] = {}
+    ids = [str(memory_id) for memory_id in memory_ids]
+    for start in range(0, len(ids), DEGREE_BATCH_SIZE):
+        batch = ids[start:start + DEGREE_BATCH_SIZE]
+        response = client.rpc("memory_entity_degrees", {"p_memory_ids": batch}).execute()
+        for row in response.data or []:
+            degrees[str(row["memory_id"])] = int(row.get("degree") or 0)
+    return degrees
+
+
+def refresh_entity_centrality(client: Any) -> Dict[str, int]:
+    """
+    Recompute every entity's degree with one GROUP BY.
+
+    Parameters
+    ----------
+    client : supabase.Client
+        Supabase client instance.
+
+    Returns
+    -------
+    dict
+        ``{"entities": N, "removed": M}``: entities with edges, stale rows
+        deleted.
+    """
+    response = client.rpc("refresh_entity_centrality", {}).execute()
+    row: Dict[str, Any] = (response.data or [{}])[0]
+    result = {"entities": row.get("entities") or 0, "removed": row.get("removed") or 0}
+    logger.info("entity_centrality refreshed: %s", result)
+    return result
+
+
+# =============================================================================
+# Consistency Check
+# =============================================================================
+
+def check_consistency(
+    client: Any,
+    sample_size: int = DEFAULT_CHECK_SAMPLE,
+    drift_limit: int = DRIFT_REPORT_LIMIT,
+) -> Dict[str, Any]:
+    """
+    Compare ``entity_centrality`` with the on-the-fly computation.
+
+    Two checks:
+
+    1. Entity level, exhaustive: ``entity_centrality_drift`` compares every
+       stored degree with a GROUP BY over ``entity_relationships``.
+    2. Memory level, sampled: for up to ``sample_size`` memories with entity
+       links, the centrality from the table must equal
+       ``compute_causal_centrality``'s COUNT-query path.
+
+    Parameters
+    ----------
+    client : supabase.Client
+        Supabase client instance.
+    sample_size : int
+        Memories to compare (0 skips the memory check).
+    drift_limit : int
+        Maximum drifted entities returned.
+
+    Returns
+    -------
+    dict
+        ``{"consistent": bool, "drifted_entities": [...],
+        "memories_checked": N, "memory_mismatches": [...]}``.
+    """
+    from backend.services.salience import centrality_from_degree, compute_causal_centrality
+
+    drift = client.rpc("entity_centrality_drift", {"p_limit": drift_limit}).execute()
+    drifted: List[Dict[str, Any]] = drift.data or []
+
+    mismatches: List[Dict[str, Any]] = []
+    memories: List[Dict[str, Any]] = []
+    if sample_size > 0:
+        response = (
+            client.table("memories")
+            .select("id, entity_links")
+            .neq("entity_links", "{}")
+            .order("updated_at", desc=True)
+            .limit(sample_size)
+            .execute()
+        )
+        memories = [m for m in response.data or [] if m.get("entity_links")]
+        degrees = load_memory_degrees(client, [m["id"] for m in memories])
+        for memory in memories:
+            stored = centrality_from_degree(degrees.get(str(memory["id"]), 0))
+            actual = compute_causal_centrality(entity_links=memory["entity_links"])
+            if stored != actual:
+                mismatches.append({
+                    "memory_id": memory["id"],
+                    "stored": stored,
+                    "actual": actual,
+                })
+
+    report = {
+        "consistent": not drifted and not mismatches,
+        "drifted_entities": drifted,
+        "memories_checked": len(memories),
+        "memory_mismatches": mismatches,
+    }
+    if report["consistent"]:
+        logger.info("entity_centrality consistent (%d memories sampled)", len(memories))
+    else:
+        logger.warning(
+            "entity_centrality drift: %d entities, %d of %d sampled memories",
+            len(drifted), len(mismatches), len(memories),
+        )
+    return report
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check or rebuild the entity_centrality table",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    check = commands.add_parser("check", help="Compare entity_centrality with entity_relationships")
+    check.add_argument("--sample", type=int, default=DEFAULT_CHECK_SAMPLE,
+                       help="Memories to compare against the COUNT-query path (0 to skip)")
+    check.add_argument("--limit", type=int, default=DRIFT_REPORT_LIMIT, help="Drifted entities to report")
+    check.add_argument("--repair", action="store_true", help="Refresh the table if drift is found")
+    commands.add_parser("refresh", help="Recompute entity_centrality with one GROUP BY")
+    args = parser.parse_args(argv)
+
+    from backend.services.wal import get_supabase_client
+
+    client = get_supabase_client()
+
+    if args.command == "refresh":
+        print(json.dumps(refresh_entity_centrality(client)))
+        return 0
+
+    report = check_consistency(client, sample_size=args.sample, drift_limit=args.limit)
+    print(json.dumps(report, indent=2, default=str))
+    if report["consistent"]:
+        return 0
+    if args.repair:
+        print(json.dumps({"refreshed": refresh_entity_centrality(client)}))
+    return 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -35,6 +35,11 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from backend.services.hedging import get_hedger
+from backend.services.metrics import track_llm_call
+from backend.services.rate_limiter import approx_tokens, llm_rate_limit
+from backend.services.tracing import inject, start_span, traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -291,13 +296,30 @@ async def extract_entities(message: str) -> List[ExtractedEntity]:
 
         client = AsyncAnthropic(api_key=api_key)
 
-        # Call Claude Haiku with a timeout enforced by asyncio
+        async def _call_haiku(max_wait: float) -> Any:
+            async with llm_rate_limit(
+                "anthropic",
+                _HAIKU_MODEL,
+                approx_tokens(_ENTITY_EXTRACTION_PROMPT, message) + 256,
+                max_wait=max_wait,
+            ) as slot:
+                with track_llm_call("anthropic", _HAIKU_MODEL):
+                    response = await client.messages.create(
+                        model=_HAIKU_MODEL,
+                        max_tokens=1024,
+                        system=_ENTITY_EXTRACTION_PROMPT,
+                        messages=[{"role": "user", "content": message}],
+                    )
+                await slot.record_async(response)
+            return response
+
+        # Call Claude Haiku with a timeout enforced by asyncio (queueing for
+        # rate-limit budget included).  A slow call is hedged with a
+        # duplicate, which is dropped rather than queued for budget.
         response = await asyncio.wait_for(
-            client.messages.create(
-                model=_HAIKU_MODEL,
-                max_tokens=1024,
-                system=_ENTITY_EXTRACTION_PROMPT,
-                messages=[{"role": "user", "content": message}],
+            get_hedger("fast_path.extract_entities").run(
+                lambda: _call_haiku(_HAIKU_TIMEOUT_SECONDS),
+                lambda: _call_haiku(0.0),
             ),
             timeout=_HAIKU_TIMEOUT_SECONDS,
         )
@@ -448,14 +470,15 @@ async def generate_embedding(text: str) -> List[float]:
 
         client = AsyncOpenAI(api_key=api_key)
 
-        response = await asyncio.wait_for(
-            client.embeddings.create(
-                model=_EMBEDDING_MODEL,
-                input=text,
-                dimensions=_EMBEDDING_DIMENSIONS,
-            ),
-            timeout=_EMBEDDING_TIMEOUT_SECONDS,
-        )
+        with track_llm_call("openai", _EMBEDDING_MODEL):
+            response = await asyncio.wait_for(
+                client.embeddings.create(
+                    model=_EMBEDDING_MODEL,
+                    input=text,
+                    dimensions=_EMBEDDING_DIMENSIONS,
+                ),
+                timeout=_EMBEDDING_TIMEOUT_SECONDS,
+            )
 
         embedding: List[float] = response.data[0].embedding
 
@@ -682,6 +705,7 @@ async def detect_conflicts(
 # Fast Path Pipeline
 # =============================================================================
 
+@traced("fast_path.process")
 async def process_fast_path(
     user_id: str,
     message: str,
@@ -746,6 +770,8 @@ async def process_fast_path(
             }
             if session_id:
                 payload["session_id"] = session_id
+            # Lets the Slow Path link its consolidation back to this request
+            inject(payload)
 
             wal_entry = await wal_service.create_entry(payload)
             wal_entry_id = str(wal_entry.id)
@@ -778,9 +804,10 @@ async def process_fast_path(
         entity_task = extract_entities(message)
         embedding_task = generate_embedding(message)
 
-        results = await asyncio.gather(
-            entity_task, embedding_task, return_exceptions=True,
-        )
+        with start_span("fast_path.extraction_and_embedding"):
+            results = await asyncio.gather(
+                entity_task, embedding_task, return_exceptions=True,
+            )
 
         # Unpack results
         if isinstance(results[0], BaseException):
@@ -879,6 +906,7 @@ async def process_fast_path(
     # -------------------------------------------------------------------------
     timings.total_ms = (time.monotonic() - total_start) * 1000.0
     timings.log_summary(user_id=user_id, session_id=session_id)
+    timings.record_metrics()
 
     result = FastPathResult(
         wal_entry_id=wal_entry_id,
@@ -17,10 +17,12 @@ Owner: @backend-architect-sabine
 import logging
 import time
 from contextlib import contextmanager
-from typing import Generator, Optional
+from typing import Any, ContextManager, Generator, Optional
 
 from pydantic import BaseModel, Field
 
+from backend.services.tracing import start_span
+
 logger = logging.getLogger(__name__)
 
 
@@ -111,6 +113,14 @@ class FastPathTimings(BaseModel):
             )
 
 
+    def record_metrics(self) -> None:
+        """Observe every step (and the total) in the Fast Path stage histogram."""
+        from backend.services.metrics import FAST_PATH_STAGE_SECONDS
+
+        for field, value in self.model_dump().items():
+            FAST_PATH_STAGE_SECONDS.observe(value / 1000.0, stage=field[:-len("_ms")])
+
+
 # =============================================================================
 # Timing Context Manager
 # =============================================================================
@@ -119,7 +129,8 @@ class TimingBlock:
     """
     Reusable timing context manager for instrumenting code blocks.
 
-    Records elapsed wall-clock time in milliseconds.
+    Records elapsed wall-clock time in milliseconds, and traces the block
+    as a ``fast_path.<label>`` span.
 
     Usage::
 
@@ -139,9 +150,12 @@ class TimingBlock:
         self.label: str = label
         self.elapsed_ms: float = 0.0
         self._start: float = 0.0
+        self._span: Optional[ContextManager[Any]] = None
 
     def __enter__(self) -> "TimingBlock":
-        """Record start time."""
+        """Open the span and record start time."""
+        self._span = start_span(f"fast_path.{self.label}")
+        self._span.__enter__()
         self._start = time.monotonic()
         return self
 
@@ -156,6 +170,9 @@ class TimingBlock:
         logger.debug(
             "TimingBlock [%s]: %.1fms", self.label, self.elapsed_ms,
         )
+        if self._span is not None:
+            span, self._span = self._span, None
+            span.__exit__(exc_type, exc_val, exc_tb)
 
 
 @contextmanager
@@ -10,13 +10,16 @@ Gap types detected:
 - missing_tool: Tool not found errors (future)
 - edit_heavy: User edits output heavily (future telemetry)
 
+Failures are grouped per (user, tool) by the aggregate_tool_failures SQL
+function and written back with one upsert_skill_gaps call; see
+supabase/migrations/20260220000000_gap_detection_aggregate.sql.
+
 PRD Requirements: SKILL-001, SKILL-002, SKILL-003
 """
 
 import logging
 import os
 from collections import Counter
-from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from supabase import Client, create_client
@@ -29,6 +32,9 @@ MIN_FAILURE_COUNT = 3
 # Lookback window in hours (7 days)
 LOOKBACK_HOURS = 168
 
+# Sample error messages kept per (user, tool) gap
+SAMPLE_MESSAGE_LIMIT = 5
+
 
 def _get_supabase_client() -> Optional[Client]:
     """Get Supabase client for gap detection queries."""
@@ -47,6 +53,9 @@ async def get_failure_summary(
     """
     Fetch recent tool failures from the audit log.
 
+    Returns raw rows for inspection; detect_gaps does not use this (it
+    aggregates in SQL, see aggregate_failures).
+
     Parameters
     ----------
     hours : int
@@ -121,6 +130,71 @@ def group_failures_by_tool(failures: List[Dict[str, Any]]) -> Dict[str, Dict[str
     return groups
 
 
+async def aggregate_failures(
+    client: Client,
+    hours: int = LOOKBACK_HOURS,
+    user_id: Optional[str] = None,
+    min_failures: int = MIN_FAILURE_COUNT,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate tool failures per (user, tool) in the database.
+
+    Runs the ``aggregate_tool_failures`` SQL function, which filters
+    tool_audit_log by window and user at the source and groups there, so
+    the result is complete however many failures the window holds.
+
+    Parameters
+    ----------
+    client : Client
+        Supabase client.
+    hours : int
+        Lookback window in hours.
+    user_id : str, optional
+        If provided, only aggregate this user's failures.
+    min_failures : int
+        Minimum failure count for a (user, tool) pair to be returned.
+
+    Returns
+    -------
+    list[dict]
+        One row per pair: user_id, tool_name, failure_count, error_types
+        (error type -> count), first_seen, last_seen, sample_messages.
+    """
+    try:
+        result = client.rpc(
+            "aggregate_tool_failures",
+            {
+                "p_hours": hours,
+                "p_user_id": user_id,
+                "p_min_failures": min_failures,
+                "p_sample_limit": SAMPLE_MESSAGE_LIMIT,
+            },
+        ).execute()
+    except Exception as e:
+        logger.error("Failed to aggregate tool failures: %s", e)
+        return []
+
+    rows = result.data or []
+    logger.info(
+        "Aggregated %d (user, tool) pairs with >= %d failures (last %dh)",
+        len(rows), min_failures, hours,
+    )
+    return rows
+
+
+def _describe_gap(row: Dict[str, Any], hours: int) -> str:
+    """Human-readable pattern description for an aggregated failure row."""
+    error_types = row.get("error_types") or {}
+    top_errors = sorted(error_types.items(), key=lambda kv: (-kv[1], kv[0]))[:3]
+    error_summary = ", ".join(f"{etype}({count})" for etype, count in top_errors)
+    samples = row.get("sample_messages") or []
+    return (
+        f"Tool '{row['tool_name']}' failed {row['failure_count']} times in {hours}h. "
+        f"Error types: {error_summary}. "
+        f"Sample: {samples[0][:100] if samples else 'N/A'}"
+    )
+
+
 async def detect_gaps(
     user_id: Optional[str] = None,
     min_failures: int = MIN_FAILURE_COUNT,
@@ -129,8 +203,9 @@ async def detect_gaps(
     """
     Analyze audit logs and detect skill gaps.
 
-    For each tool with >= min_failures failures in the window,
-    creates or updates a skill_gaps record.
+    For each (user, tool) pair with >= min_failures failures in the window,
+    creates or updates that user's open skill_gaps record.  Aggregation
+    and the upsert each run as a single database statement.
 
     Parameters
     ----------
@@ -150,144 +225,59 @@ async def detect_gaps(
     if not client:
         return []
 
-    # Fetch failures
-    failures = await get_failure_summary(hours=hours)
-
-    # Optionally filter by user
-    if user_id:
-        failures = [f for f in failures if f.get("user_id") == user_id]
-
-    if not failures:
-        logger.info("No failures found in the last %d hours", hours)
-        return []
-
-    # Group by tool
-    groups = group_failures_by_tool(failures)
-
-    # Filter to tools with enough failures
-    significant = {
-        name: data for name, data in groups.items()
-        if data["count"] >= min_failures
-    }
-
-    if not significant:
-        logger.info(
-            "No tools with >= %d failures (found %d tools with failures)",
-            min_failures, len(groups),
-        )
+    rows = await aggregate_failures(
+        client, hours=hours, user_id=user_id, min_failures=min_failures,
+    )
+    if not rows:
+        logger.info("No tools with >= %d failures in the last %d hours", min_failures, hours)
         return []
 
     logger.info(
-        "Found %d tools with >= %d failures: %s",
-        len(significant), min_failures,
-        list(significant.keys()),
+        "Found %d (user, tool) pairs with >= %d failures: %s",
+        len(rows), min_failures,
+        sorted({row["tool_name"] for row in rows}),
     )
 
-    # Upsert gaps
-    detected_gaps: List[Dict[str, Any]] = []
-
-    for tool_name, data in significant.items():
-        # Build pattern description from error types
-        error_summary = ", ".join(
-            f"{etype}({count})"
-            for etype, count in data["error_types"].most_common(3)
-        )
-        pattern_desc = (
-            f"Tool '{tool_name}' failed {data['count']} times in {hours}h. "
-            f"Error types: {error_summary}. "
-            f"Sample: {data['error_messages'][0][:100] if data['error_messages'] else 'N/A'}"
-        )
-
-        # For each affected user, create/update a gap
-        affected_users = list(data["user_ids"]) if data["user_ids"] else [user_id] if user_id else []
-
-        for uid in affected_users:
-            if not uid:
-                continue
-
-            gap = await _upsert_gap(
-                client=client,
-                user_id=uid,
-                tool_name=tool_name,
-                gap_type="repeated_failure",
-                pattern_description=pattern_desc,
-                occurrence_count=data["count"],
-                first_seen=data["first_seen"],
-                last_seen=data["last_seen"],
-            )
-            if gap:
-                detected_gaps.append(gap)
+    gaps = [
+        {
+            "user_id": row["user_id"],
+            "gap_type": "repeated_failure",
+            "tool_name": row["tool_name"],
+            "pattern_description": _describe_gap(row, hours),
+            "occurrence_count": row["failure_count"],
+            "first_seen_at": row.get("first_seen"),
+            "last_seen_at": row.get("last_seen"),
+        }
+        for row in rows
+    ]
+    detected_gaps = await _upsert_gaps(client, gaps)
 
     logger.info("Detected/updated %d skill gaps", len(detected_gaps))
     return detected_gaps
 
 
-async def _upsert_gap(
+async def _upsert_gaps(
     client: Client,
-    user_id: str,
-    tool_name: str,
-    gap_type: str,
-    pattern_description: str,
-    occurrence_count: int,
-    first_seen: Optional[str],
-    last_seen: Optional[str],
-) -> Optional[Dict[str, Any]]:
+    gaps: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
     """
-    Insert or update a skill gap record.
+    Insert or refresh skill gap records in one statement.
 
-    If an open gap exists for the same user + tool, update it.
-    Otherwise, create a new gap.
+    Runs the ``upsert_skill_gaps`` SQL function: an INSERT ... ON CONFLICT
+    on (user_id, tool_name) among open/researching gaps, which updates
+    occurrence_count, pattern_description and last_seen_at of an existing
+    open gap instead of creating a duplicate.
 
-    Returns the gap record or None on failure.
+    Returns the written gap records, or [] on failure.
     """
+    if not gaps:
+        return []
     try:
-        # Check for existing open gap
-        existing = client.table("skill_gaps")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .eq("tool_name", tool_name)\
-            .in_("status", ["open", "researching"])\
-            .limit(1)\
-            .execute()
-
-        now_iso = datetime.now(timezone.utc).isoformat()
-
-        if existing.data:
-            # Update existing gap
-            gap_id = existing.data[0]["id"]
-            updated = client.table("skill_gaps")\
-                .update({
-                    "occurrence_count": occurrence_count,
-                    "pattern_description": pattern_description,
-                    "last_seen_at": last_seen or now_iso,
-                })\
-                .eq("id", gap_id)\
-                .execute()
-
-            logger.debug("Updated gap %s for tool %s", gap_id, tool_name)
-            return updated.data[0] if updated.data else existing.data[0]
-        else:
-            # Insert new gap
-            new_gap = {
-                "user_id": user_id,
-                "gap_type": gap_type,
-                "tool_name": tool_name,
-                "pattern_description": pattern_description,
-                "occurrence_count": occurrence_count,
-                "first_seen_at": first_seen or now_iso,
-                "last_seen_at": last_seen or now_iso,
-                "status": "open",
-            }
-            result = client.table("skill_gaps").insert(new_gap).execute()
-
-            if result.data:
-                logger.info("Created new gap for tool %s (user=%s)", tool_name, user_id)
-                return result.data[0]
-            return None
-
+        result = client.rpc("upsert_skill_gaps", {"p_gaps": gaps}).execute()
+        return result.data or []
     except Exception as e:
-        logger.error("Failed to upsert gap for tool %s: %s", tool_name, e)
-        return None
+        logger.error("Failed to upsert %d skill gaps: %s", len(gaps), e)
+        return []
 
 
 async def dismiss_gap(gap_id: str) -> Dict[str, Any]:
@@ -0,0 +1,271 @@
+"""
+Hedged Requests for Cheap LLM Calls
+===================================
+
+Small, idempotent LLM calls (Fast Path entity extraction, context
+extraction) usually answer quickly, but provider tail latency dominates
+their p99.  A hedged call sends the request once and, if it has not
+answered by the call site's observed p90 latency, sends a duplicate (to
+the same model or a fallback).  The first successful response wins and
+the other call is cancelled.
+
+Delay:
+    Each call site (``Hedger``) keeps the latencies of its last
+    ``HEDGE_WINDOW`` calls and hedges after their ``HEDGE_QUANTILE``
+    quantile.  Until ``HEDGE_MIN_SAMPLES`` calls have been seen it does not
+    hedge at all.  A call won by the hedge is recorded with the time the
+    caller waited, a lower bound of the primary's latency.
+
+Budget:
+    Every call earns ``HEDGE_BUDGET_RATIO`` of a hedge credit (up to
+    ``HEDGE_BUDGET_BURST`` credits) and each hedge spends one, so hedges
+    stay within about 5% extra calls even when a provider slows down
+    across the board.  A call that would hedge without credit just keeps
+    waiting for the primary.
+
+Failures:
+    Hedging is for latency, not retries: a primary that fails before the
+    hedge delay raises immediately.  Once both are in flight a failure of
+    one waits for the other; if both fail the primary's error is raised.
+
+Metrics:
+    ``sabine_llm_hedge_events_total{site, event}`` with events ``call``,
+    ``hedge``, ``hedge_won`` and ``budget_exhausted``.
+
+Usage::
+
+    from backend.services.hedging import get_hedger
+
+    response = await get_hedger("fast_path.extract_entities").run(
+        lambda: client.messages.create(...),
+    )
+
+Disable with ``LLM_HEDGE_ENABLED=false``.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+# Latency quantile after which the duplicate is sent
+HEDGE_QUANTILE: float = float(os.getenv("LLM_HEDGE_QUANTILE", "0.9"))
+# Hedge credits earned per call, and the most that can be saved up
+HEDGE_BUDGET_RATIO: float = float(os.getenv("LLM_HEDGE_BUDGET_RATIO", "0.05"))
+HEDGE_BUDGET_BURST: float = float(os.getenv("LLM_HEDGE_BUDGET_BURST", "10"))
+# Calls observed before a site starts hedging, and how many are kept
+HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_WINDOW: int = 200
+# Never hedge sooner than this, however fast the site usually is
+HEDGE_MIN_DELAY_SECONDS: float = 0.02
+
+
+# =============================================================================
+# Hedger
+# =============================================================================
+
+class Hedger:
+    """
+    Hedging state of one call site: recent latencies and hedge credit.
+
+    Parameters
+    ----------
+    site : str
+        Call-site name, used as the metrics label.
+    quantile : float
+        Latency quantile after which a hedge is sent.
+    budget_ratio : float
+        Hedge credit earned per call.
+    budget_burst : float
+        Maximum hedge credit saved up.
+    min_samples : int
+        Calls observed before hedging starts.
+    window : int
+        Number of recent latencies kept.
+    clock : callable, optional
+        Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        site: str,
+        quantile: float = HEDGE_QUANTILE,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+        budget_burst: float = HEDGE_BUDGET_BURST,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        window: int = HEDGE_WINDOW,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.site = site
+        self.quantile = quantile
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self.min_samples = min_samples
+        self._clock = clock
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._credit = 0.0
+        self._counts: Dict[str, int] = {"call": 0, "hedge": 0, "hedge_won": 0, "budget_exhausted": 0}
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # State
+    # -------------------------------------------------------------------------
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while too few calls were seen."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(self.quantile * len(ordered)) - 1))
+        return max(HEDGE_MIN_DELAY_SECONDS, ordered[index])
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _earn(self) -> None:
+        with self._lock:
+            self._credit = min(self.budget_burst, self._credit + self.budget_ratio)
+
+    def _spend(self) -> bool:
+        with self._lock:
+            if self._credit < 1.0 - 1e-9:   # twenty 0.05s sum to just under 1
+                return False
+            self._credit -= 1.0
+            return True
+
+    def _count(self, event: str) -> None:
+        with self._lock:
+            self._counts[event] += 1
+        try:
+            from backend.services.metrics import LLM_HEDGE_EVENTS_TOTAL
+            LLM_HEDGE_EVENTS_TOTAL.inc(site=self.site, event=event)
+        except Exception:  # pragma: no cover - metrics must never break a call
+            pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        with self._lock:
+            counts = dict(self._counts)
+            credit = self._credit
+            samples = len(self._latencies)
+        return {
+            "hedge_delay_seconds": round(delay, 4) if delay is not None else None,
+            "samples": samples,
+            "credit": round(credit, 2),
+            **counts,
+        }
+
+    # -------------------------------------------------------------------------
+    # Calls
+    # -------------------------------------------------------------------------
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        hedge_call: Optional[Callable[[], Awaitable[T]]] = None,
+    ) -> T:
+        """
+        Run ``call``, hedging it with ``hedge_call`` (default: ``call``
+        again) if it is slow.
+
+        Both callables must be safe to run twice and to cancel.
+
+        Parameters
+        ----------
+        call : callable
+            Returns a new awaitable of the primary request on each call.
+        hedge_call : callable, optional
+            Returns the duplicate request, e.g. against a fallback model.
+
+        Returns
+        -------
+        T
+            The first successful response.
+        """
+        self._count("call")
+        self._earn()
+        delay = self.hedge_delay() if HEDGE_ENABLED else None
+        start = self._clock()
+
+        if delay is None:
+            result = await call()
+            self.record(self._clock() - start)
+            return result
+
+        primary = asyncio.ensure_future(call())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                result = primary.result()
+                self.record(self._clock() - start)
+                return result
+            if not self._spend():
+                self._count("budget_exhausted")
+                result = await primary
+                self.record(self._clock() - start)
+                return result
+
+            self._count("hedge")
+            hedge = asyncio.ensure_future((hedge_call or call)())
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary when both finish together
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedge_won")
+                        self.record(self._clock() - start)
+                        return task.result()
+            # Both failed
+            raise primary.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+_hedgers: Dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(site: str) -> Hedger:
+    """The ``Hedger`` of a call site, created on first use."""
+    with _hedgers_lock:
+        hedger = _hedgers.get(site)
+        if hedger is None:
+            hedger = _hedgers[site] = Hedger(site)
+        return hedger
+
+
+def hedge_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Per-site hedging state, for ``/providers/health``."""
+    with _hedgers_lock:
+        hedgers = list(_hedgers.values())
+    return {hedger.site: hedger.snapshot() for hedger in hedgers}
+
+
+def reset_hedgers() -> None:
+    """Forget every site's latencies and credit (for tests)."""
+    with _hedgers_lock:
+        _hedgers.clear()
@@ -0,0 +1,407 @@
+"""
+Redis lease-based leader election for singleton background services.
+
+The API process runs several services that must exist exactly once per
+deployment: ``SabineScheduler`` (briefings), ``ReminderScheduler``,
+``EmailPoller`` and Slack Socket Mode.  Running ``uvicorn --workers N`` or
+several replicas would otherwise duplicate briefings, reminders and email
+replies.
+
+Every API process creates one :class:`LeaderElector`.  Electors compete
+for a Redis key (``sabine:leader:{name}``) with ``SET NX PX``; the holder
+renews the lease every ``ttl / 3`` seconds with a compare-and-expire Lua
+script, so only the owner can extend or release it.  When the leader dies
+or loses Redis, its lease lapses after ``ttl`` seconds and another
+instance acquires it and starts the singleton services.
+
+A leader that cannot renew demotes itself *before* the lease can lapse,
+so two instances never believe they are leader at the same time.
+
+Stateless request handling is unaffected and scales across workers and
+containers.
+
+Configuration:
+    - ``LEADER_ELECTION_ENABLED`` (default ``true``): set ``false`` for a
+      single instance without Redis; the process is then always leader.
+    - ``LEADER_LEASE_TTL_SECONDS`` (default ``30``): lease length.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+LEADER_ELECTION_ENABLED: bool = (
+    os.getenv("LEADER_ELECTION_ENABLED", "true").lower() != "false"
+)
+LEADER_LEASE_TTL_SECONDS: float = float(os.getenv("LEADER_LEASE_TTL_SECONDS", "30"))
+
+_LEADER_KEY_PREFIX: str = "sabine:leader"
+
+# Extend the lease only if we still own it (KEYS[1]=key, ARGV[1]=owner,
+# ARGV[2]=ttl ms).  Returns 1 on success, 0 if someone else holds it.
+_RENEW_SCRIPT: str = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Delete the lease only if we still own it.
+_RELEASE_SCRIPT: str = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+LeadershipCallback = Callable[[], Awaitable[None]]
+
+
+# =============================================================================
+# Models
+# =============================================================================
+
+class LeadershipStatus(BaseModel):
+    """Snapshot of an elector's state for health endpoints."""
+
+    name: str = Field(..., description="Election name (one lease per name)")
+    instance_id: str = Field(..., description="This process's identity")
+    is_leader: bool = Field(..., description="True if this process holds the lease")
+    enabled: bool = Field(..., description="False when election is disabled")
+    leader_id: Optional[str] = Field(
+        default=None, description="Current lease holder, if known"
+    )
+    lease_ttl_seconds: float = Field(..., description="Configured lease length")
+    leader_since: Optional[float] = Field(
+        default=None, description="Unix time this process became leader"
+    )
+    last_error: Optional[str] = Field(
+        default=None, description="Most recent Redis error, if any"
+    )
+
+
+# =============================================================================
+# Elector
+# =============================================================================
+
+def _default_instance_id() -> str:
+    """Hostname + PID + random suffix; unique per process and restart."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderElector:
+    """
+    Run ``on_elected`` / ``on_demoted`` as this process gains or loses a
+    Redis lease.
+
+    Usage::
+
+        elector = LeaderElector(
+            name="api-singletons",
+            on_elected=start_singleton_services,
+            on_demoted=stop_singleton_services,
+        )
+        await elector.start()
+        ...
+        await elector.stop()   # releases the lease and runs on_demoted
+    """
+
+    def __init__(
+        self,
+        name: str,
+        on_elected: Optional[LeadershipCallback] = None,
+        on_demoted: Optional[LeadershipCallback] = None,
+        ttl_seconds: float = LEADER_LEASE_TTL_SECONDS,
+        enabled: bool = LEADER_ELECTION_ENABLED,
+        redis_client: Optional[Any] = None,
+        instance_id: Optional[str] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        name : str
+            Election name; processes with the same name compete.
+        on_elected, on_demoted : async callables, optional
+            Invoked on leadership transitions.
+        ttl_seconds : float
+            Lease length.  Renewal happens every ``ttl_seconds / 3``.
+        enabled : bool
+            When False the elector is always leader and never touches Redis.
+        redis_client : optional
+            Injected Redis client for testing.  If ``None``, the shared
+            singleton from ``backend.services.redis_client`` is used.
+        instance_id : str, optional
+            Override the generated process identity.
+        """
+        self.name: str = name
+        self.instance_id: str = instance_id or _default_instance_id()
+        self.ttl_seconds: float = ttl_seconds
+        self.enabled: bool = enabled
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._redis_client: Optional[Any] = redis_client
+
+        self._is_leader: bool = False
+        self._leader_since: Optional[float] = None
+        self._last_renewed: float = 0.0
+        self._last_error: Optional[str] = None
+        # Lease holder seen by the last tick; status() serves this so health
+        # checks never wait on Redis
+        self._leader_id: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: bool = False
+
+    # ------------------------------------------------------------------
+    # Properties
+    # ------------------------------------------------------------------
+
+    @property
+    def key(self) -> str:
+        """Redis key holding the lease."""
+        return f"{_LEADER_KEY_PREFIX}:{self.name}"
+
+    @property
+    def is_leader(self) -> bool:
+        """True while this process holds the lease."""
+        return self._is_leader
+
+    @property
+    def renew_interval(self) -> float:
+        """Seconds between renewal attempts."""
+        return max(self.ttl_seconds / 3.0, 0.05)
+
+    def _get_redis(self) -> Any:
+        """Return the Redis client, lazily importing the singleton."""
+        if self._redis_client is not None:
+            return self._redis_client
+        from backend.services.redis_client import get_redis_client
+        return get_redis_client()
+
+    # ------------------------------------------------------------------
+    # Lease primitives (synchronous; run via asyncio.to_thread)
+    # ------------------------------------------------------------------
+
+    def _try_acquire(self) -> bool:
+        ttl_ms = int(self.ttl_seconds * 1000)
+        return bool(
+            self._get_redis().set(self.key, self.instance_id, nx=True, px=ttl_ms)
+        )
+
+    def _try_renew(self) -> bool:
+        ttl_ms = int(self.ttl_seconds * 1000)
+        result = self._get_redis().eval(
+            _RENEW_SCRIPT, 1, self.key, self.instance_id, ttl_ms,
+        )
+        return bool(result)
+
+    def _release(self) -> None:
+        self._get_redis().eval(_RELEASE_SCRIPT, 1, self.key, self.instance_id)
+
+    def current_leader(self) -> Optional[str]:
+        """
+        Return the current lease holder's instance ID (``None`` if unknown).
+
+        Synchronous Redis GET; from async code use :meth:`status` (cached)
+        or ``asyncio.to_thread``.
+        """
+        if not self.enabled:
+            return self.instance_id
+        try:
+            return self._get_redis().get(self.key)
+        except Exception:
+            return None
+
+    # ------------------------------------------------------------------
+    # Transitions
+    # ------------------------------------------------------------------
+
+    async def _become_leader(self) -> None:
+        self._is_leader = True
+        self._leader_id = self.instance_id
+        self._leader_since = time.time()
+        self._last_renewed = time.monotonic()
+        logger.info(
+            "Leader election '%s': %s is now LEADER", self.name, self.instance_id,
+        )
+        if self._on_elected is not None:
+            try:
+                await self._on_elected()
+            except Exception as exc:
+                logger.error(
+                    "Leader election '%s': on_elected failed: %s",
+                    self.name, exc, exc_info=True,
+                )
+
+    async def _lose_leadership(self, reason: str) -> None:
+        if not self._is_leader:
+            return
+        self._is_leader = False
+        self._leader_since = None
+        logger.warning(
+            "Leader election '%s': %s demoted (%s)",
+            self.name, self.instance_id, reason,
+        )
+        if self._on_demoted is not None:
+            try:
+                await self._on_demoted()
+            except Exception as exc:
+                logger.error(
+                    "Leader election '%s': on_demoted failed: %s",
+                    self.name, exc, exc_info=True,
+                )
+
+    async def tick(self) -> None:
+        """
+        Run one acquire-or-renew step.
+
+        Exposed for tests and for callers that drive the elector from an
+        existing loop instead of :meth:`start`.
+        """
+        try:
+            if self._is_leader:
+                renewed = await asyncio.to_thread(self._try_renew)
+                if renewed:
+                    self._last_renewed = time.monotonic()
+                    self._last_error = None
+                else:
+                    await self._lose_leadership("lease taken by another instance")
+            else:
+                acquired = await asyncio.to_thread(self._try_acquire)
+                self._last_error = None
+                if acquired:
+                    await self._become_leader()
+                else:
+                    self._leader_id = await asyncio.to_thread(self.current_leader)
+        except Exception as exc:
+            self._last_error = str(exc)
+            logger.warning(
+                "Leader election '%s': Redis error: %s", self.name, exc,
+            )
+            # Step down before our lease can lapse so that a new leader
+            # elected after expiry never overlaps with us.
+            if self._is_leader and (
+                time.monotonic() - self._last_renewed
+                >= self.ttl_seconds - self.renew_interval
+            ):
+                await self._lose_leadership("could not renew lease")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            await self.tick()
+            await asyncio.sleep(self.renew_interval)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """
+        Start competing for the lease.
+
+        Performs the first acquisition attempt inline so that a lone
+        instance starts its singleton services during startup, then keeps
+        renewing / retrying in a background task.
+        """
+        self._stopping = False
+        if not self.enabled:
+            logger.info(
+                "Leader election '%s' disabled; %s runs singleton services",
+                self.name, self.instance_id,
+            )
+            await self._become_leader()
+            return
+
+        await self.tick()
+        if not self._is_leader:
+            logger.info(
+                "Leader election '%s': %s is FOLLOWER (leader=%s)",
+                self.name, self.instance_id, self._leader_id,
+            )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the loop, release the lease if held, and run ``on_demoted``."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        was_leader = self._is_leader
+        await self._lose_leadership("shutdown")
+        if was_leader and self.enabled:
+            try:
+                await asyncio.to_thread(self._release)
+                logger.info("Leader election '%s': lease released", self.name)
+            except Exception as exc:
+                logger.warning(
+                    "Leader election '%s': failed to release lease: %s",
+                    self.name, exc,
+                )
+
+    def status(self) -> LeadershipStatus:
+        """
+        Return a :class:`LeadershipStatus` snapshot.
+
+        Never touches Redis: ``leader_id`` is the holder seen by the last
+        renew-loop tick, so this is safe to call from async handlers.
+        """
+        return LeadershipStatus(
+            name=self.name,
+            instance_id=self.instance_id,
+            is_leader=self._is_leader,
+            enabled=self.enabled,
+            leader_id=self.instance_id if self._is_leader else self._leader_id,
+            lease_ttl_seconds=self.ttl_seconds,
+            leader_since=self._leader_since,
+            last_error=self._last_error,
+        )
+
+
+# =============================================================================
+# Process-wide elector for API singleton services
+# =============================================================================
+
+_api_elector: Optional[LeaderElector] = None
+
+
+def get_api_elector() -> Optional[LeaderElector]:
+    """Return the API process's elector (``None`` before startup)."""
+    return _api_elector
+
+
+def set_api_elector(elector: Optional[LeaderElector]) -> None:
+    """Register the API process's elector (called from server startup)."""
+    global _api_elector
+    _api_elector = elector
+
+
+def get_leadership_status() -> Dict[str, Any]:
+    """
+    Leadership info for health endpoints.
+
+    Returns
+    -------
+    dict
+        :class:`LeadershipStatus` fields, or ``{"is_leader": None}`` when no
+        elector is registered (e.g. during startup).
+    """
+    if _api_elector is None:
+        return {"is_leader": None, "instance_id": None}
+    return _api_elector.status().model_dump()
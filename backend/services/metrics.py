@@ -0,0 +1,788 @@
+"""
+In-Process Metrics Registry for Sabine 2.0
+==========================================
+
+Counters, gauges and bucketed histograms kept in process memory and
+rendered in the Prometheus text format by ``GET /metrics/prometheus``.
+
+Multiprocess aggregation:
+    The API and the rq worker are separate processes, and rq runs every job
+    in a forked work horse that exits with ``os._exit()``.  Each process
+    therefore pushes its *deltas* since the last flush into one Redis hash
+    (``HINCRBYFLOAT`` for counters and histograms, ``HSET`` for gauges), and
+    a scrape renders that hash.  The work horse flushes at the end of every
+    job; the API flushes on a background interval and on each scrape.  A
+    forked child starts with everything it inherited marked as flushed, so
+    nothing is counted twice.  Without Redis the scrape renders the local
+    registry only.
+
+Background gauges:
+    Gauges derived from database or queue queries (WAL depth, rq queue,
+    Dream Team task health) are refreshed by ``MetricsRefresher`` every
+    ``METRICS_REFRESH_INTERVAL_SECONDS`` instead of on every scrape.
+
+Usage::
+
+    from backend.services.metrics import RQ_JOB_SECONDS, track_llm_call
+
+    RQ_JOB_SECONDS.observe(1.8, job="process_wal_entry", status="success")
+
+    with track_llm_call("anthropic", "claude-3-5-haiku-20241022"):
+        response = await client.messages.create(...)
+
+Owner: @backend-architect-sabine
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+METRICS_REDIS_KEY: str = "sabine:metrics"
+METRICS_REDIS_ENABLED: bool = os.getenv("METRICS_REDIS_ENABLED", "true").lower() == "true"
+METRICS_REFRESH_INTERVAL_SECONDS: float = float(
+    os.getenv("METRICS_REFRESH_INTERVAL_SECONDS", "30")
+)
+
+# Latency buckets in seconds (5ms .. 60s)
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+# Background job buckets in seconds (100ms .. 30min)
+JOB_DURATION_BUCKETS: Tuple[float, ...] = (
+    0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0,
+)
+
+LabelValues = Tuple[str, ...]
+# (suffix, label values, le) - le is set for histogram buckets only
+SampleKey = Tuple[str, LabelValues, Optional[str]]
+Samples = Dict[str, Dict[SampleKey, float]]
+
+
+# =============================================================================
+# Metric Types
+# =============================================================================
+
+class _Metric(ABC):
+    """Common name/help/label handling for all metric types."""
+
+    kind: str = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name: str = name
+        self.help: str = help_text
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) != len(self.labelnames) or set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def collect(self) -> Dict[SampleKey, float]:
+        """Current samples, keyed by (suffix, label values, le)."""
+
+    def _reset_lock(self) -> None:
+        self._lock = threading.Lock()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> Dict[SampleKey, float]:
+        with self._lock:
+            return {("", key, None): value for key, value in self._values.items()}
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (last write wins across processes)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> Dict[SampleKey, float]:
+        with self._lock:
+            return {("", key, None): value for key, value in self._values.items()}
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with ``_bucket``, ``_sum`` and ``_count`` series."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(b for b in buckets if not math.isinf(b)))
+        # Per label set: non-cumulative count per bucket (+ overflow), sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Generator[None, None, None]:
+        """Observe the wall-clock seconds spent in the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def collect(self) -> Dict[SampleKey, float]:
+        samples: Dict[SampleKey, float] = {}
+        with self._lock:
+            for key, counts in self._counts.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    samples[("_bucket", key, _format_value(bound))] = float(cumulative)
+                cumulative += counts[-1]
+                samples[("_bucket", key, "+Inf")] = float(cumulative)
+                samples[("_sum", key, None)] = self._sums[key]
+                samples[("_count", key, None)] = float(cumulative)
+        return samples
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+class MetricsRegistry:
+    """
+    Named collection of metrics with Prometheus rendering and Redis flushing.
+
+    Parameters
+    ----------
+    redis_key : str
+        Hash that holds the cross-process aggregate.
+    """
+
+    def __init__(self, redis_key: str = METRICS_REDIS_KEY) -> None:
+        self.redis_key: str = redis_key
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flushed: Samples = {}
+        self._redis_factory: Optional[Callable[[], Any]] = None
+
+    # ---- Registration -------------------------------------------------------
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    # ---- Collection and rendering ------------------------------------------
+
+    def collect(self) -> Samples:
+        """Current samples of every metric, keyed by metric name."""
+        return {name: metric.collect() for name, metric in list(self._metrics.items())}
+
+    def render(self, samples: Optional[Samples] = None) -> str:
+        """
+        Prometheus text exposition (format 0.0.4).
+
+        Parameters
+        ----------
+        samples : dict, optional
+            Samples to render (e.g. the Redis aggregate); defaults to the
+            local registry.
+        """
+        samples = self.collect() if samples is None else samples
+        lines: List[str] = []
+        for name, metric in list(self._metrics.items()):
+            lines.append(f"# HELP {name} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            series = samples.get(name, {})
+            if not series and not metric.labelnames and metric.kind != "histogram":
+                series = {("", (), None): 0.0}
+            for (suffix, values, le), value in sorted(series.items(), key=_sample_order):
+                labels = _format_labels(metric.labelnames, values, le)
+                lines.append(f"{name}{suffix}{labels} {_format_value(value)}")
+            lines.append("")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    # ---- Multiprocess aggregation ------------------------------------------
+
+    def enable_redis(self, client_factory: Optional[Callable[[], Any]] = None) -> None:
+        """Aggregate through Redis from now on (``get_redis_client`` by default)."""
+        if client_factory is None:
+            from backend.services.redis_client import get_redis_client
+            client_factory = get_redis_client
+        self._redis_factory = client_factory
+
+    @property
+    def redis_enabled(self) -> bool:
+        return self._redis_factory is not None
+
+    def flush(self) -> bool:
+        """
+        Push changes since the last flush to the Redis aggregate.
+
+        Counters and histograms are sent as increments, gauges as their
+        current value.  On failure nothing is marked flushed, so the next
+        flush retries the same deltas.
+
+        Returns
+        -------
+        bool
+            True if Redis is enabled and the flush succeeded.
+        """
+        if self._redis_factory is None:
+            return False
+        with self._flush_lock:
+            current = self.collect()
+            writes = 0
+            try:
+                pipe = self._redis_factory().pipeline(transaction=False)
+                for name, series in current.items():
+                    metric = self._metrics[name]
+                    flushed = self._flushed.get(name, {})
+                    for key, value in series.items():
+                        previous = flushed.get(key)
+                        if metric.kind == "gauge":
+                            if previous != value:
+                                pipe.hset(self.redis_key, _field(name, key), repr(value))
+                                writes += 1
+                        elif value != (previous or 0.0):
+                            pipe.hincrbyfloat(self.redis_key, _field(name, key), value - (previous or 0.0))
+                            writes += 1
+                if writes:
+                    pipe.execute()
+            except Exception as exc:
+                logger.warning("Metrics flush to Redis failed: %s", exc)
+                return False
+            self._flushed = current
+            return True
+
+    def read_aggregate(self) -> Samples:
+        """Samples of all processes from the Redis hash (known metrics only)."""
+        if self._redis_factory is None:
+            raise RuntimeError("Redis aggregation is not enabled")
+        raw: Dict[str, str] = self._redis_factory().hgetall(self.redis_key)
+        samples: Samples = {}
+        for field, value in raw.items():
+            if isinstance(field, bytes):
+                field = field.decode()
+            try:
+                name, suffix, values, le = json.loads(field)
+            except (ValueError, TypeError):
+                continue
+            if name in self._metrics:
+                samples.setdefault(name, {})[(suffix, tuple(values), le)] = float(value)
+        return samples
+
+    def render_aggregate(self) -> str:
+        """Render all processes' metrics, or the local ones without Redis."""
+        if self._redis_factory is not None and self.flush():
+            try:
+                return self.render(self.read_aggregate())
+            except Exception as exc:
+                logger.warning("Reading metrics aggregate failed; rendering local: %s", exc)
+        return self.render()
+
+    def _after_fork_in_child(self) -> None:
+        # The parent owns (and flushes) everything inherited at fork time
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._reset_lock()
+        self._flushed = self.collect()
+
+
+def _field(name: str, key: SampleKey) -> str:
+    suffix, values, le = key
+    return json.dumps([name, suffix, list(values), le], separators=(",", ":"))
+
+
+_SUFFIX_ORDER = {"": 0, "_bucket": 1, "_sum": 2, "_count": 3}
+
+
+def _sample_order(item: Tuple[SampleKey, float]) -> Tuple[Any, ...]:
+    (suffix, values, le), _ = item
+    bound = math.inf if le == "+Inf" else float(le) if le is not None else 0.0
+    return (values, _SUFFIX_ORDER.get(suffix, 4), bound)
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, le: Optional[str]) -> str:
+    pairs = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# =============================================================================
+# Default Registry and Instruments
+# =============================================================================
+
+REGISTRY = MetricsRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=REGISTRY._after_fork_in_child)
+
+FAST_PATH_STAGE_SECONDS = REGISTRY.histogram(
+    "sabine_fast_path_stage_seconds",
+    "Fast Path pipeline step latency",
+    ["stage"],
+)
+RETRIEVAL_STAGE_SECONDS = REGISTRY.histogram(
+    "sabine_retrieval_stage_seconds",
+    "Context retrieval step latency",
+    ["stage"],
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "sabine_llm_request_seconds",
+    "LLM and embedding API call latency",
+    ["provider", "model"],
+)
+LLM_REQUESTS_TOTAL = REGISTRY.counter(
+    "sabine_llm_requests_total",
+    "LLM and embedding API calls by outcome",
+    ["provider", "model", "status"],
+)
+TOOL_EXECUTION_SECONDS = REGISTRY.histogram(
+    "sabine_tool_execution_seconds",
+    "Agent tool execution latency",
+    ["tool"],
+)
+TOOL_EXECUTIONS_TOTAL = REGISTRY.counter(
+    "sabine_tool_executions_total",
+    "Agent tool executions by outcome",
+    ["tool", "status"],
+)
+LLM_RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "sabine_llm_rate_limit_wait_seconds",
+    "Time LLM calls queued for provider rate-limit budget",
+    ["provider", "priority"],
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+LLM_RATE_LIMIT_EVENTS_TOTAL = REGISTRY.counter(
+    "sabine_llm_rate_limit_events_total",
+    "LLM rate limiter events (queued, provider_429, wait_exceeded)",
+    ["provider", "event"],
+)
+LLM_HEDGE_EVENTS_TOTAL = REGISTRY.counter(
+    "sabine_llm_hedge_events_total",
+    "Hedged LLM call events (call, hedge, hedge_won, budget_exhausted)",
+    ["site", "event"],
+)
+USER_CONFIG_CACHE_LOOKUPS_TOTAL = REGISTRY.counter(
+    "sabine_user_config_cache_lookups_total",
+    "user_config cache lookups by result (hit, negative_hit, miss)",
+    ["result"],
+)
+USER_CONFIG_CACHE_ENTRIES = REGISTRY.gauge(
+    "sabine_user_config_cache_entries",
+    "Entries in the user_config cache (last process to change it)",
+)
+TOOL_CACHE_LOOKUPS_TOTAL = REGISTRY.counter(
+    "sabine_tool_cache_lookups_total",
+    "Tool result cache lookups by result (hit, redis_hit, miss)",
+    ["result"],
+)
+TOOL_CACHE_ENTRIES = REGISTRY.gauge(
+    "sabine_tool_cache_entries",
+    "Entries in the local tool result cache (last process to change it)",
+)
+LLM_CIRCUIT_STATE = REGISTRY.gauge(
+    "sabine_llm_circuit_state",
+    "LLM provider circuit breaker state (1 for the current state; last process to change it)",
+    ["provider", "state"],
+)
+AGENT_SETUP_SECONDS = REGISTRY.histogram(
+    "sabine_agent_setup_seconds",
+    "Agent routing, client and graph setup time per turn",
+    ["cache"],
+)
+RQ_JOB_SECONDS = REGISTRY.histogram(
+    "sabine_rq_job_seconds",
+    "rq worker job duration",
+    ["job", "status"],
+    buckets=JOB_DURATION_BUCKETS,
+)
+
+# Refreshed in the background by MetricsRefresher
+WAL_ENTRIES = REGISTRY.gauge(
+    "sabine_wal_entries",
+    "WAL entries by status",
+    ["status"],
+)
+RQ_QUEUE_JOBS = REGISTRY.gauge(
+    "sabine_rq_queue_jobs",
+    "Jobs in the Slow Path rq queue by state",
+    ["state"],
+)
+RQ_WORKERS = REGISTRY.gauge(
+    "sabine_rq_workers",
+    "Active rq workers",
+)
+METRICS_REFRESH_TIMESTAMP = REGISTRY.gauge(
+    "sabine_metrics_refresh_timestamp_seconds",
+    "Unix time of the last background gauge refresh",
+)
+DREAM_TEAM_QUEUE_DEPTH = REGISTRY.gauge(
+    "dream_team_queue_depth", "Number of tasks in queue by status", ["status"],
+)
+DREAM_TEAM_BLOCKED = REGISTRY.gauge(
+    "dream_team_blocked_tasks", "Tasks blocked by failed dependencies",
+)
+DREAM_TEAM_STUCK = REGISTRY.gauge(
+    "dream_team_stuck_tasks", "Tasks stuck past timeout",
+)
+DREAM_TEAM_STALE = REGISTRY.gauge(
+    "dream_team_stale_tasks", "Tasks queued too long", ["threshold"],
+)
+DREAM_TEAM_PENDING_RETRIES = REGISTRY.gauge(
+    "dream_team_pending_retries", "Failed tasks pending retry",
+)
+DREAM_TEAM_SUCCESS_RATE = REGISTRY.gauge(
+    "dream_team_success_rate_1h", "Task success rate in last hour",
+)
+DREAM_TEAM_COMPLETED = REGISTRY.gauge(
+    "dream_team_completed_1h", "Tasks completed in last hour",
+)
+DREAM_TEAM_FAILED = REGISTRY.gauge(
+    "dream_team_failed_1h", "Tasks failed in last hour",
+)
+DREAM_TEAM_DURATION = REGISTRY.gauge(
+    "dream_team_task_duration_ms", "Task duration in milliseconds", ["quantile"],
+)
+
+
+@contextmanager
+def track_llm_call(provider: str, model: str) -> Generator[None, None, None]:
+    """
+    Time one LLM/embedding API call and count it as success, error or
+    cancelled.
+
+    Parameters
+    ----------
+    provider : str
+        Provider name (``"anthropic"``, ``"openai"``, ...).
+    model : str
+        Model identifier.
+    """
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "success"
+    except asyncio.CancelledError:
+        # e.g. the losing half of a hedged call
+        status = "cancelled"
+        raise
+    finally:
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider=provider, model=model)
+        LLM_REQUESTS_TOTAL.inc(provider=provider, model=model, status=status)
+
+
+def flush_metrics() -> bool:
+    """Flush the default registry to Redis (no-op unless enabled)."""
+    return REGISTRY.flush()
+
+
+def enable_redis_aggregation() -> bool:
+    """
+    Aggregate the default registry through Redis.
+
+    Called at API and worker startup; disabled with
+    ``METRICS_REDIS_ENABLED=false``.
+
+    Returns
+    -------
+    bool
+        True if aggregation was enabled.
+    """
+    if not METRICS_REDIS_ENABLED:
+        return False
+    REGISTRY.enable_redis()
+    return True
+
+
+def render_metrics() -> str:
+    """Prometheus text for every process (or this one without Redis)."""
+    return REGISTRY.render_aggregate()
+
+
+# =============================================================================
+# Background Gauge Refresh
+# =============================================================================
+
+GaugeCollector = Callable[[], Union[None, Awaitable[None]]]
+
+
+async def _collect_wal_depth() -> None:
+    from backend.services.wal import WALService
+
+    for status, count in (await WALService().get_stats()).items():
+        WAL_ENTRIES.set(count, status=status)
+
+
+def _collect_rq_queue() -> None:
+    from backend.services.queue import get_queue_stats
+
+    stats = get_queue_stats()
+    if stats.get("error"):
+        return
+    for state in ("pending", "started", "failed", "completed"):
+        RQ_QUEUE_JOBS.set(stats.get(state, 0), state=state)
+    RQ_WORKERS.set(stats.get("workers", 0))
+
+
+async def _collect_task_queue() -> None:
+    from backend.services.task_queue import get_task_queue_service
+
+    service = get_task_queue_service()
+    health = await service.get_task_queue_health()
+    DREAM_TEAM_QUEUE_DEPTH.set(health.get("total_queued", 0), status="queued")
+    DREAM_TEAM_QUEUE_DEPTH.set(health.get("total_in_progress", 0), status="in_progress")
+    DREAM_TEAM_BLOCKED.set(health.get("blocked_by_failed_deps", 0))
+    DREAM_TEAM_STUCK.set(health.get("stuck_tasks", 0))
+    DREAM_TEAM_STALE.set(health.get("stale_queued_1h", 0), threshold="1h")
+    DREAM_TEAM_STALE.set(health.get("stale_queued_24h", 0), threshold="24h")
+    DREAM_TEAM_PENDING_RETRIES.set(health.get("pending_retries", 0))
+
+    latest = await service.get_latest_metrics()
+    if latest:
+        DREAM_TEAM_SUCCESS_RATE.set(latest.get("success_rate_1h", 0) or 0)
+        DREAM_TEAM_COMPLETED.set(latest.get("total_completed_1h", 0) or 0)
+        DREAM_TEAM_FAILED.set(latest.get("total_failed_1h", 0) or 0)
+        DREAM_TEAM_DURATION.set(latest.get("avg_duration_ms", 0) or 0, quantile="avg")
+        DREAM_TEAM_DURATION.set(latest.get("p95_duration_ms", 0) or 0, quantile="p95")
+
+
+DEFAULT_COLLECTORS: Tuple[GaugeCollector, ...] = (
+    _collect_wal_depth,
+    _collect_rq_queue,
+    _collect_task_queue,
+)
+
+
+class MetricsRefresher:
+    """
+    Daemon thread that refreshes expensive gauges and flushes the registry.
+
+    Each collector may be sync or async; a failing collector is logged and
+    keeps its previous values.
+
+    Parameters
+    ----------
+    collectors : sequence of callables
+        Gauge collectors run on every tick.
+    interval_seconds : float
+        Seconds between ticks.
+    registry : MetricsRegistry
+        Registry flushed after each tick.
+    """
+
+    def __init__(
+        self,
+        collectors: Sequence[GaugeCollector] = DEFAULT_COLLECTORS,
+        interval_seconds: float = METRICS_REFRESH_INTERVAL_SECONDS,
+        registry: MetricsRegistry = REGISTRY,
+    ) -> None:
+        self.collectors: Tuple[GaugeCollector, ...] = tuple(collectors)
+        self.interval_seconds: float = interval_seconds
+        self.registry: MetricsRegistry = registry
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh_once(self) -> int:
+        """
+        Run every collector once, then flush.
+
+        Returns
+        -------
+        int
+            Number of collectors that succeeded.
+        """
+        succeeded = 0
+        for collector in self.collectors:
+            try:
+                result = collector()
+                if asyncio.iscoroutine(result):
+                    asyncio.run(result)
+                succeeded += 1
+            except Exception as exc:
+                logger.warning(
+                    "Metrics collector %s failed: %s",
+                    getattr(collector, "__name__", collector), exc,
+                )
+        METRICS_REFRESH_TIMESTAMP.set(time.time())
+        self.registry.flush()
+        return succeeded
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh_once()
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-refresher", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Metrics refresher started (interval=%.0fs, collectors=%d)",
+            self.interval_seconds, len(self.collectors),
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+_refresher: Optional[MetricsRefresher] = None
+_refresher_lock = threading.Lock()
+
+
+def get_metrics_refresher() -> MetricsRefresher:
+    """The process-wide refresher (created on first use, not started)."""
+    global _refresher
+    if _refresher is None:
+        with _refresher_lock:
+            if _refresher is None:
+                _refresher = MetricsRefresher()
+    return _refresher
+
+
+def start_metrics_refresher() -> MetricsRefresher:
+    """Start the process-wide refresher if it is not already running."""
+    refresher = get_metrics_refresher()
+    refresher.start()
+    return refresher
+
+
+def stop_metrics_refresher() -> None:
+    if _refresher is not None:
+        _refresher.stop()
@@ -11,16 +11,34 @@ to prevent sensitive data leakage. It handles:
 4. Error Message Cleaning: Strips stack traces and internal details
 5. Field Filtering: Removes internal-only fields from responses
 6. Size Limiting: Prevents oversized responses
+7. Streaming: Chunk-safe redaction of token streams (StreamingRedactor)
+
+Credential/PII patterns are compiled once into a RedactionEngine, which
+checks each pattern's literal anchors first and only runs the patterns
+that can match a given string.
 
 Owner: @backend-architect-sabine
 PRD Reference: Project Dream Team - Security & Output Sanitization
 """
 
 import html
+import json
 import logging
 import os
 import re
-from typing import Any, Dict, List, Optional, Set, Union
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -134,6 +152,257 @@ PATH_PATTERNS = [
     (r'File "([^"]+)", line \d+', 'File "***PATH***", line ***'),
 ]
 
+# =============================================================================
+# Compiled Redaction Engine
+# =============================================================================
+
+# Literal anchors (regex fragments, matched case-insensitively) that every
+# match of a pattern must contain.  One combined scan for these decides
+# which patterns can fire on a string; only those are run.  Patterns
+# without an entry here are always run.
+PATTERN_TRIGGERS: Dict[str, Tuple[str, ...]] = {
+    r'sk-ant-[a-zA-Z0-9_\-]+': ("sk-ant-",),
+    r'sk-[a-zA-Z0-9_\-]{20,}': ("sk-",),
+    r'ghp_[a-zA-Z0-9]{20,}': ("ghp_",),
+    r'gho_[a-zA-Z0-9]{20,}': ("gho_",),
+    r'github_pat_[a-zA-Z0-9_]{20,}': ("github_pat_",),
+    r'xoxb-[a-zA-Z0-9\-]+': ("xoxb-",),
+    r'xoxp-[a-zA-Z0-9\-]+': ("xoxp-",),
+    r'eyJ[a-zA-Z0-9_\-]{50,}\.eyJ[a-zA-Z0-9_\-]+\.[a-zA-Z0-9_\-]+': ("eyj",),
+    r'eyJ[a-zA-Z0-9_\-]{50,}': ("eyj",),
+    r'AKIA[0-9A-Z]{16}': ("akia",),
+    r'aws_secret_access_key\s*=\s*[^\s]+': ("aws_secret_access_key",),
+    r'(postgres|mysql|mongodb|redis)://[^\s"\']+': ("postgres://", "mysql://", "mongodb://", "redis://"),
+    r'(DATABASE_URL|REDIS_URL|MONGODB_URI)\s*=\s*[^\s]+': ("database_url", "redis_url", "mongodb_uri"),
+    r'"client_secret"\s*:\s*"[^"]+"': ('"client_secret"',),
+    r'"refresh_token"\s*:\s*"[^"]+"': ('"refresh_token"',),
+    r'(api[_-]?key|apikey)["\']?\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{10,})': ("apikey", "api_key", "api-key"),
+    r'(bearer\s+)([a-zA-Z0-9_\-\.]{20,})': ("bearer",),
+    r'((?:^|[^a-zA-Z])(?:token|secret|password|credential))["\']?\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{8,})':
+        ("token", "secret", "password", "credential"),
+    r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}': ("@",),
+    r'\b(\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b': (r"\d{3}",),
+    r'\b\d{3}[-.\s]?\d{2}[-.\s]?\d{4}\b': (r"\d{3}",),
+    r'\b(?:\d{4}[-.\s]?){3}\d{4}\b': (r"\d{4}",),
+}
+
+# Characters held back by StreamingRedactor; longer than the longest
+# prefix any pattern needs before it can match.
+STREAM_WINDOW = 256
+
+
+class _Rule:
+    """One precompiled (pattern, replacement) pair."""
+
+    __slots__ = ("index", "regex", "replacement", "triggers", "always")
+
+    def __init__(self, index: int, pattern: str, replacement: str):
+        self.index = index
+        self.regex = re.compile(pattern, re.IGNORECASE)
+        self.replacement = replacement
+        triggers = PATTERN_TRIGGERS.get(pattern)
+        self.triggers: Tuple[str, ...] = triggers or ()
+        self.always = triggers is None
+
+
+class RedactionEngine:
+    """
+    Precompiled redaction over an ordered list of (pattern, replacement).
+
+    Produces exactly what applying the patterns one ``re.sub`` at a time
+    does, but first checks each pattern's literal anchors (substring search
+    on the lowercased text), so only patterns that can match are run.  A
+    typical tool output costs a few C-level substring scans instead of one
+    regex pass per pattern.
+    """
+
+    def __init__(self, patterns: List[Tuple[str, str]]):
+        self.rules = [_Rule(i, p, r) for i, (p, r) in enumerate(patterns)]
+        self._always = frozenset(r.index for r in self.rules if r.always)
+
+        # Distinct anchors -> indexes of the rules each one enables.  Plain
+        # literals are checked with substring search on the lowercased
+        # text; regex anchors (\d{3}) with one compiled search each.
+        self._literal_anchors: Dict[str, Set[int]] = {}
+        self._regex_anchors: Dict[str, Set[int]] = {}
+        for rule in self.rules:
+            for trigger in rule.triggers:
+                table = self._regex_anchors if trigger.startswith("\\") else self._literal_anchors
+                table.setdefault(trigger.lower(), set()).add(rule.index)
+        self._compiled_anchors = {a: re.compile(a) for a in self._regex_anchors}
+
+        # A replacement can introduce an anchor for a later rule
+        # ("api_key=***REDACTED***" contains "api"); remember which.
+        self._enables: Dict[int, FrozenSet[int]] = {
+            rule.index: self._scan(rule.replacement) - self._always
+            for rule in self.rules
+        }
+
+    def _scan(self, text: str) -> FrozenSet[int]:
+        """Indexes of rules whose anchors occur in ``text`` (plus always-on rules)."""
+        active = set(self._always)
+        lowered = text.lower()
+        for anchor, indexes in self._literal_anchors.items():
+            if not indexes <= active and anchor in lowered:
+                active |= indexes
+        for anchor, indexes in self._regex_anchors.items():
+            if not indexes <= active and self._compiled_anchors[anchor].search(text):
+                active |= indexes
+        return frozenset(active)
+
+    def redact(self, text: str) -> str:
+        """Apply every pattern, in order, to ``text``."""
+        if not text:
+            return text
+        active = set(self._scan(text))
+        if not active:
+            return text
+        for rule in self.rules:
+            if rule.index in active:
+                text, count = rule.regex.subn(rule.replacement, text)
+                if count:
+                    active |= self._enables[rule.index]
+        return text
+
+    def straddling_start(self, text: str, cut: int) -> int:
+        """
+        Move ``cut`` back to the start of any match that crosses it.
+
+        Matches are searched at every start position (overlapping), since an
+        earlier rule's replacement can expose a later rule's match that a
+        plain left-to-right scan of the raw text would skip over.
+        """
+        active = self._scan(text)
+        moved = True
+        while moved and cut > 0:
+            moved = False
+            for rule in self.rules:
+                if rule.index not in active:
+                    continue
+                pos = 0
+                while True:
+                    match = rule.regex.search(text, pos)
+                    if match is None or match.start() >= cut:
+                        break
+                    if match.end() > cut:
+                        cut = match.start()
+                        moved = True
+                        break
+                    pos = match.start() + 1
+        return cut
+
+
+def _joins_digits(text: str, boundary: int) -> bool:
+    """Whether whitespace at ``boundary`` may sit inside a card/phone number."""
+    before = text[boundary - 1] if boundary > 0 else ""
+    after = text[boundary + 1] if boundary + 1 < len(text) else ""
+    return after.isdigit() and (before.isdigit() or before == ")")
+
+
+class StreamingRedactor:
+    """
+    Chunk-safe redaction for token streams (e.g. SSE).
+
+    Holds back at least the last ``window`` characters so a secret split across
+    chunks is seen whole, and only releases text up to a whitespace
+    boundary that no match crosses.  Concatenating the outputs of
+    ``feed()`` and ``flush()`` gives the same text as redacting the whole
+    stream at once (whenever the stream has whitespace within each window).
+
+    Usage:
+        redactor = StreamingRedactor()
+        for chunk in chunks:
+            yield redactor.feed(chunk)
+        yield redactor.flush()
+    """
+
+    def __init__(self, include_pii: bool = False, window: int = STREAM_WINDOW):
+        self._engine = get_redaction_engine(include_pii)
+        self.window = window
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; return the text that is now safe to emit."""
+        if chunk:
+            self._buffer += chunk
+        # Release in batches of ~window characters rather than per token
+        if len(self._buffer) <= 2 * self.window:
+            return ""
+
+        buffer = self._buffer
+        whole: Optional[str] = None
+        cut = len(buffer) - self.window
+        while cut > 0:
+            cut = self._engine.straddling_start(buffer, cut)
+            # Cut just after whitespace so word-boundary anchors see the same context
+            boundary = max(buffer.rfind(ws, 0, cut) for ws in (" ", "\n", "\t", "\r"))
+            if boundary < 0:
+                # No whitespace yet: wait, unless the buffer is getting large
+                if len(buffer) < 4 * self.window or cut <= 0:
+                    return ""
+                return self._emit(cut)
+            if boundary + 1 != cut:
+                cut = boundary + 1
+                continue
+            if _joins_digits(buffer, boundary):
+                cut = boundary
+                continue
+            # Accept the cut only if redacting both halves separately gives
+            # the same text as redacting the buffer whole; replacements can
+            # create match context (e.g. "***secret: x") the raw text lacks.
+            if whole is None:
+                whole = self._engine.redact(buffer)
+            head = self._engine.redact(buffer[:cut])
+            if head + self._engine.redact(buffer[cut:]) == whole:
+                self._buffer = buffer[cut:]
+                return head
+            cut = boundary
+        return ""
+
+    def _emit(self, cut: int) -> str:
+        ready, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return self._engine.redact(ready)
+
+    def flush(self) -> str:
+        """Return the redacted remainder at end of stream."""
+        ready, self._buffer = self._buffer, ""
+        return self._engine.redact(ready)
+
+
+async def redact_stream(
+    chunks: AsyncIterable[str],
+    include_pii: bool = False,
+) -> AsyncIterator[str]:
+    """Redact an async stream of text chunks, yielding sanitized chunks."""
+    redactor = StreamingRedactor(include_pii=include_pii)
+    async for chunk in chunks:
+        out = redactor.feed(chunk)
+        if out:
+            yield out
+    tail = redactor.flush()
+    if tail:
+        yield tail
+
+
+_engines: Dict[bool, RedactionEngine] = {}
+
+
+def get_redaction_engine(include_pii: bool = False) -> RedactionEngine:
+    """Engine for SENSITIVE_PATTERNS (plus PII_PATTERNS when requested)."""
+    engine = _engines.get(include_pii)
+    if engine is None:
+        patterns = SENSITIVE_PATTERNS + (PII_PATTERNS if include_pii else [])
+        engine = _engines[include_pii] = RedactionEngine(patterns)
+    return engine
+
+
+@lru_cache(maxsize=4096)
+def _is_sensitive_key(key: str) -> bool:
+    """Whether a field name marks its value as sensitive (cached per key)."""
+    key_lower = key.lower()
+    return any(sensitive in key_lower for sensitive in SENSITIVE_FIELDS)
+
+
 # =============================================================================
 # Core Sanitization Functions
 # =============================================================================
@@ -152,18 +421,7 @@ def redact_sensitive_strings(text: str, include_pii: bool = False) -> str:
     if not text or not isinstance(text, str):
         return text
 
-    result = text
-
-    # Apply sensitive patterns
-    for pattern, replacement in SENSITIVE_PATTERNS:
-        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
-
-    # Apply PII patterns if requested
-    if include_pii:
-        for pattern, replacement in PII_PATTERNS:
-            result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
-
-    return result
+    return get_redaction_engine(include_pii).redact(text)
 
 
 def sanitize_path(text: str) -> str:
@@ -261,10 +519,8 @@ def redact_sensitive_fields(data: Any, redact_pii: bool = False) -> Any:
     if isinstance(data, dict):
         result = {}
         for key, value in data.items():
-            key_lower = key.lower()
-
             # Check if key indicates sensitive data
-            if any(sensitive in key_lower for sensitive in SENSITIVE_FIELDS):
+            if isinstance(key, str) and _is_sensitive_key(key):
                 result[key] = "***REDACTED***"
             elif isinstance(value, str):
                 result[key] = redact_sensitive_strings(value, include_pii=redact_pii)
@@ -311,18 +567,25 @@ def truncate_response(data: Any, max_size: int = MAX_RESPONSE_SIZE) -> Any:
     Returns:
         Truncated data if necessary
     """
-    import json
-
     if data is None:
         return data
 
-    try:
-        data_str = json.dumps(data) if not isinstance(data, str) else data
-    except (TypeError, ValueError):
-        data_str = str(data)
+    # Dicts: serialize each value once and derive the total from the parts,
+    # instead of dumping the whole dict and then every value again.
+    value_sizes = _dict_value_sizes(data) if isinstance(data, dict) else None
+    if value_sizes is not None:
+        total_size = _dict_json_size(data, value_sizes)
+        if total_size <= max_size:
+            return data
+        data_str = None
+    else:
+        try:
+            data_str = json.dumps(data) if not isinstance(data, str) else data
+        except (TypeError, ValueError):
+            data_str = str(data)
 
-    if len(data_str) <= max_size:
-        return data
+        if len(data_str) <= max_size:
+            return data
 
     # For strings, truncate directly
     if isinstance(data, str):
@@ -334,8 +597,11 @@ def truncate_response(data: Any, max_size: int = MAX_RESPONSE_SIZE) -> Any:
         current_size = 0
 
         for key, value in data.items():
-            value_str = json.dumps(value) if not isinstance(value, str) else value
-            value_size = len(value_str)
+            if value_sizes is not None:
+                value_size = value_sizes[key][1]
+            else:
+                value_str = json.dumps(value) if not isinstance(value, str) else value
+                value_size = len(value_str)
 
             if current_size + value_size > max_size - 100:
                 truncated[key] = f"[TRUNCATED - {value_size} chars]" if value_size > 100 else value
@@ -352,6 +618,35 @@ def truncate_response(data: Any, max_size: int = MAX_RESPONSE_SIZE) -> Any:
     return {"_truncated": True, "_original_size": len(data_str)}
 
 
+def _dict_value_sizes(data: Dict[Any, Any]) -> Optional[Dict[str, Tuple[int, int]]]:
+    """
+    Per-key (serialized size, truncation size) for a str-keyed dict.
+
+    The truncation size mirrors truncate_response's accounting (raw length
+    for strings).  Returns None when the dict can't be measured this way.
+    """
+    sizes: Dict[str, Tuple[int, int]] = {}
+    try:
+        for key, value in data.items():
+            if not isinstance(key, str):
+                return None
+            dumped = len(json.dumps(value))
+            sizes[key] = (dumped, len(value) if isinstance(value, str) else dumped)
+    except (TypeError, ValueError):
+        return None
+    return sizes
+
+
+def _dict_json_size(data: Dict[str, Any], sizes: Dict[str, Tuple[int, int]]) -> int:
+    """len(json.dumps(data)) computed from per-value sizes (default separators)."""
+    if not data:
+        return 2
+    total = 2 + 2 * (len(data) - 1)  # braces, ", " between items
+    for key in data:
+        total += len(json.dumps(key)) + 2 + sizes[key][0]  # key, ": ", value
+    return total
+
+
 # =============================================================================
 # High-Level Sanitization Functions
 # =============================================================================
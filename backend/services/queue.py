@@ -19,6 +19,8 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from backend.services.tracing import SPAN_KIND_PRODUCER, inject, start_span
+
 logger = logging.getLogger(__name__)
 
 
@@ -286,12 +288,21 @@ def _enqueue_job(
 
         at_front: bool = (priority == JobPriority.HIGH.value)
 
-        job = queue.enqueue(
-            func_path,
-            at_front=at_front,
-            **kwargs,
-            **enqueue_kwargs,
-        )
+        job_name = func_path.rsplit(".", 1)[-1]
+        with start_span(
+            f"rq.enqueue {job_name}",
+            kind=SPAN_KIND_PRODUCER,
+            attributes={"messaging.destination.name": QUEUE_NAME},
+        ) as span:
+            # The worker resumes this trace from job.meta (memory_guard)
+            job = queue.enqueue(
+                func_path,
+                at_front=at_front,
+                meta=inject(),
+                **kwargs,
+                **enqueue_kwargs,
+            )
+            span.set_attribute("messaging.message.id", job.id)
 
         return EnqueueResult(job_id=job.id, success=True)
 
@@ -0,0 +1,861 @@
+"""
+Provider Rate Limiter for LLM Calls
+===================================
+
+Every LLM call (agent turns, Fast Path entity extraction, Slow Path
+relationship extraction, skill generation, history summaries) draws from a
+shared budget per provider and model, so background workers cannot spend
+the quota interactive ``/invoke`` traffic needs and trip provider 429s.
+
+Budgets:
+    Two token buckets per ``provider:model`` key: requests per minute and
+    tokens per minute, refilled continuously.  Limits come from
+    ``DEFAULT_RATE_LIMITS`` (per provider) overridden by the
+    ``LLM_RATE_LIMITS`` JSON env var, e.g.
+    ``{"anthropic": {"rpm": 1000, "tpm": 400000},
+    "anthropic:claude-3-5-haiku-20241022": {"rpm": 2000, "tpm": 800000}}``.
+    A limit of 0 means unlimited.  Token usage is usually only known after
+    the call, so callers reserve an estimate and settle the difference
+    afterwards; a bucket may go into debt, which delays the next calls.
+
+Coordination:
+    The buckets live in Redis and are updated by one Lua script, so the API
+    and every rq work horse share them.  Without Redis (or when it errors)
+    each process falls back to an in-memory bucket with the same rules.
+
+Priorities:
+    ``Priority.INTERACTIVE`` (API default) and ``Priority.BACKGROUND``
+    (rq worker default, see ``set_default_priority``).  Background calls
+    leave ``RATE_LIMIT_INTERACTIVE_RESERVE`` of each bucket untouched and
+    stand aside entirely while an interactive call is waiting.  Override
+    for a block of code with ``with llm_priority(Priority.BACKGROUND):``.
+
+Provider 429s:
+    A rate-limit error blocks the key for its ``retry-after`` (or
+    ``retry-after-ms``) duration, or ``RATE_LIMIT_DEFAULT_BACKOFF_SECONDS``
+    without one, for every process and priority.
+
+Usage::
+
+    from backend.services.rate_limiter import approx_tokens, llm_rate_limit
+
+    async with llm_rate_limit("anthropic", MODEL, approx_tokens(prompt) + 1024) as slot:
+        response = await client.messages.create(...)
+        await slot.record_async(response)
+
+LangChain chat models get a ``ProviderRateLimiter`` (their ``rate_limiter``
+field) from ``lib/agent/model_router.get_pooled_llm``.
+"""
+
+import asyncio
+import contextvars
+import email.utils
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Generator, List, Optional, Tuple
+
+from langchain_core.rate_limiters import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_REDIS_ENABLED: bool = os.getenv("RATE_LIMIT_REDIS_ENABLED", "true").lower() == "true"
+RATE_LIMIT_REDIS_PREFIX: str = "sabine:ratelimit"
+RATE_LIMIT_INTERACTIVE_RESERVE: float = float(os.getenv("RATE_LIMIT_INTERACTIVE_RESERVE", "0.2"))
+RATE_LIMIT_DEFAULT_BACKOFF_SECONDS: float = float(os.getenv("RATE_LIMIT_DEFAULT_BACKOFF_SECONDS", "5"))
+# How long a call may queue before ThrottleWaitExceeded, per priority
+RATE_LIMIT_MAX_WAIT_INTERACTIVE: float = float(os.getenv("RATE_LIMIT_MAX_WAIT_INTERACTIVE", "20"))
+RATE_LIMIT_MAX_WAIT_BACKGROUND: float = float(os.getenv("RATE_LIMIT_MAX_WAIT_BACKGROUND", "300"))
+# Re-check interval while waiting (budgets are shared, so waits are re-evaluated)
+RATE_LIMIT_POLL_SECONDS: float = 1.0
+# Seconds an interactive waiter registration lives without being refreshed
+_WAITER_TTL_SECONDS: float = 5.0
+# Seconds to stay on in-process buckets after a Redis error
+_REDIS_RETRY_SECONDS: float = 30.0
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Per-minute budget of one provider/model key (0 = unlimited)."""
+    rpm: int = 0
+    tpm: int = 0
+
+
+DEFAULT_RATE_LIMITS: Dict[str, RateLimit] = {
+    "anthropic": RateLimit(rpm=1000, tpm=400_000),
+    "groq": RateLimit(rpm=1000, tpm=300_000),
+    "together": RateLimit(rpm=600, tpm=180_000),
+    "openai": RateLimit(rpm=3000, tpm=1_000_000),
+    "ollama": RateLimit(),
+}
+
+
+def load_rate_limits() -> Dict[str, RateLimit]:
+    """``DEFAULT_RATE_LIMITS`` with overrides from ``LLM_RATE_LIMITS``."""
+    limits = dict(DEFAULT_RATE_LIMITS)
+    raw = os.getenv("LLM_RATE_LIMITS", "")
+    if raw:
+        try:
+            for key, value in json.loads(raw).items():
+                limits[key] = RateLimit(rpm=int(value.get("rpm", 0)), tpm=int(value.get("tpm", 0)))
+        except (ValueError, AttributeError, TypeError) as e:
+            logger.error("Invalid LLM_RATE_LIMITS (%s); using defaults", e)
+    return limits
+
+
+# =============================================================================
+# Priorities
+# =============================================================================
+
+class Priority(str, Enum):
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+_default_priority: Priority = Priority(os.getenv("LLM_DEFAULT_PRIORITY", Priority.INTERACTIVE.value))
+_priority: contextvars.ContextVar[Optional[Priority]] = contextvars.ContextVar(
+    "sabine_llm_priority", default=None,
+)
+# Accumulator for seconds spent queueing, installed by whoever times a call
+# (see ``track_queue_wait``).  A mutable holder because LangChain acquires
+# in a child task whose context changes the caller would not see.
+_queue_wait: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "sabine_llm_queue_wait", default=None,
+)
+
+
+def set_default_priority(priority: Priority) -> None:
+    """Set the process-wide default priority (the rq worker uses BACKGROUND)."""
+    global _default_priority
+    _default_priority = priority
+
+
+def current_priority() -> Priority:
+    """Priority of LLM calls made from the current context."""
+    return _priority.get() or _default_priority
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Generator[None, None, None]:
+    """Run LLM calls in the block at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+async def run_with_priority(priority: Priority, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Call ``fn`` (sync or async) with LLM calls at ``priority``.
+
+    For ``BackgroundTasks.add_task(run_with_priority, Priority.BACKGROUND, fn)``.
+    """
+    with llm_priority(priority):
+        result = fn(*args, **kwargs)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+
+def track_queue_wait() -> List[float]:
+    """
+    Start accumulating queueing time for calls made from the current context.
+
+    Returns a one-element list; ``[0]`` holds the seconds queued so far, so
+    latency measured around a call can exclude it.
+    """
+    holder = [0.0]
+    _queue_wait.set(holder)
+    return holder
+
+
+# =============================================================================
+# Errors
+# =============================================================================
+
+class ThrottleWaitExceeded(Exception):
+    """
+    Raised when a call would queue longer than its priority allows.
+
+    Deliberately not a ``TimeoutError``: it says this deployment's budget is
+    spent, not that the provider is unhealthy, so circuit breakers ignore it.
+    """
+
+    def __init__(self, key: str, priority: Priority, waited: float, needed: float):
+        self.key = key
+        self.priority = priority
+        self.waited = waited
+        self.needed = needed
+        super().__init__(
+            f"LLM budget for {key} exhausted: {priority.value} call queued "
+            f"{waited:.1f}s and needs {needed:.1f}s more"
+        )
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether ``error`` is a provider 429."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    return "ratelimit" in type(error).__name__.lower()
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """``retry-after-ms`` / ``retry-after`` (seconds or HTTP date) of a provider error."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return max(0.0, float(value) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def approx_tokens(*texts: Optional[str]) -> int:
+    """Rough token count (4 characters per token) for reserving budget."""
+    return sum(len(text) for text in texts if text) // 4
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+# KEYS: requests bucket, tokens bucket, block key, interactive waiters
+# ARGV: rpm, tpm, requests, tokens, interactive (1/0), reserve, waiter id, waiter ttl
+# Returns the seconds to wait as a string: "0" = acquired, "-1" = yield to interactive
+_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rpm, tpm = tonumber(ARGV[1]), tonumber(ARGV[2])
+local requests, tokens = tonumber(ARGV[3]), tonumber(ARGV[4])
+local interactive = ARGV[5] == '1'
+local reserve = 0
+if not interactive then reserve = tonumber(ARGV[6]) end
+
+local blocked_until = tonumber(redis.call('GET', KEYS[3]) or '0')
+if blocked_until > now then return tostring(blocked_until - now) end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[4], '-inf', now)
+if not interactive and redis.call('ZCARD', KEYS[4]) > 0 then return '-1' end
+
+local function level(key, limit)
+  local state = redis.call('HMGET', key, 'level', 'ts')
+  local lv, ts = tonumber(state[1]), tonumber(state[2])
+  if lv == nil then return limit end
+  return math.min(limit, lv + math.max(0, now - ts) * limit / 60)
+end
+
+local wait = 0
+local req_level, tok_level = 0, 0
+if rpm > 0 then
+  req_level = level(KEYS[1], rpm)
+  local short = requests + rpm * reserve - req_level
+  if short > 0 then wait = math.max(wait, short * 60 / rpm) end
+end
+if tpm > 0 then
+  tok_level = level(KEYS[2], tpm)
+  local short = tokens + tpm * reserve - tok_level
+  if short > 0 then wait = math.max(wait, short * 60 / tpm) end
+end
+
+if wait > 0 then
+  if interactive then
+    redis.call('ZADD', KEYS[4], now + tonumber(ARGV[8]), ARGV[7])
+    redis.call('EXPIRE', KEYS[4], 120)
+  end
+  return tostring(wait)
+end
+
+if rpm > 0 then
+  redis.call('HSET', KEYS[1], 'level', req_level - requests, 'ts', now)
+  redis.call('EXPIRE', KEYS[1], 120)
+end
+if tpm > 0 then
+  redis.call('HSET', KEYS[2], 'level', tok_level - tokens, 'ts', now)
+  redis.call('EXPIRE', KEYS[2], 120)
+end
+if interactive then redis.call('ZREM', KEYS[4], ARGV[7]) end
+return '0'
+"""
+
+# KEYS: tokens bucket.  ARGV: tpm, tokens to charge (negative refunds)
+_CHARGE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tpm, tokens = tonumber(ARGV[1]), tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'level', 'ts')
+local lv, ts = tonumber(state[1]), tonumber(state[2])
+if lv == nil then lv = tpm else lv = math.min(tpm, lv + math.max(0, now - ts) * tpm / 60) end
+redis.call('HSET', KEYS[1], 'level', math.min(tpm, lv - tokens), 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+return 1
+"""
+
+# KEYS: block key.  ARGV: seconds
+_BLOCK_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local untilt = now + tonumber(ARGV[1])
+if untilt > tonumber(redis.call('GET', KEYS[1]) or '0') then
+  redis.call('SET', KEYS[1], tostring(untilt), 'EX', math.ceil(tonumber(ARGV[1])) + 1)
+end
+return 1
+"""
+
+
+class LocalBucketBackend:
+    """In-process buckets with the same rules as the Redis script."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._levels: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self._waiters: Dict[str, Dict[str, float]] = {}
+
+    def _level(self, key: str, kind: str, limit: int, now: float) -> float:
+        state = self._levels.get((key, kind))
+        if state is None:
+            return float(limit)
+        level, ts = state
+        return min(float(limit), level + max(0.0, now - ts) * limit / 60)
+
+    def try_acquire(
+        self, key: str, limit: RateLimit, requests: int, tokens: int,
+        interactive: bool, reserve: float, waiter_id: str,
+    ) -> float:
+        with self._lock:
+            now = self._clock()
+            blocked_until = self._blocked_until.get(key, 0.0)
+            if blocked_until > now:
+                return blocked_until - now
+
+            waiters = self._waiters.setdefault(key, {})
+            for stale in [w for w, expires in waiters.items() if expires <= now]:
+                del waiters[stale]
+            if not interactive and waiters:
+                return -1.0
+
+            reserve = 0.0 if interactive else reserve
+            wait = 0.0
+            req_level = tok_level = 0.0
+            if limit.rpm > 0:
+                req_level = self._level(key, "req", limit.rpm, now)
+                short = requests + limit.rpm * reserve - req_level
+                if short > 0:
+                    wait = max(wait, short * 60 / limit.rpm)
+            if limit.tpm > 0:
+                tok_level = self._level(key, "tok", limit.tpm, now)
+                short = tokens + limit.tpm * reserve - tok_level
+                if short > 0:
+                    wait = max(wait, short * 60 / limit.tpm)
+
+            if wait > 0:
+                if interactive:
+                    waiters[waiter_id] = now + _WAITER_TTL_SECONDS
+                return wait
+
+            if limit.rpm > 0:
+                self._levels[(key, "req")] = (req_level - requests, now)
+            if limit.tpm > 0:
+                self._levels[(key, "tok")] = (tok_level - tokens, now)
+            waiters.pop(waiter_id, None)
+            return 0.0
+
+    def charge(self, key: str, limit: RateLimit, tokens: int) -> None:
+        with self._lock:
+            now = self._clock()
+            level = self._level(key, "tok", limit.tpm, now)
+            self._levels[(key, "tok")] = (min(float(limit.tpm), level - tokens), now)
+
+    def block(self, key: str, seconds: float) -> None:
+        with self._lock:
+            until = self._clock() + seconds
+            self._blocked_until[key] = max(until, self._blocked_until.get(key, 0.0))
+
+
+class RedisBucketBackend:
+    """Buckets shared by every process through Redis Lua scripts."""
+
+    def __init__(self, client: Any, prefix: str = RATE_LIMIT_REDIS_PREFIX):
+        self._client = client
+        self._prefix = prefix
+        self._acquire = client.register_script(_ACQUIRE_LUA)
+        self._charge = client.register_script(_CHARGE_LUA)
+        self._block = client.register_script(_BLOCK_LUA)
+
+    def _keys(self, key: str) -> Tuple[str, str, str, str]:
+        base = f"{self._prefix}:{key}"
+        return f"{base}:req", f"{base}:tok", f"{base}:blocked", f"{base}:waiters"
+
+    def try_acquire(
+        self, key: str, limit: RateLimit, requests: int, tokens: int,
+        interactive: bool, reserve: float, waiter_id: str,
+    ) -> float:
+        result = self._acquire(
+            keys=list(self._keys(key)),
+            args=[limit.rpm, limit.tpm, requests, tokens, int(interactive), reserve, waiter_id, _WAITER_TTL_SECONDS],
+        )
+        return float(result.decode() if isinstance(result, bytes) else result)
+
+    def charge(self, key: str, limit: RateLimit, tokens: int) -> None:
+        self._charge(keys=[self._keys(key)[1]], args=[limit.tpm, tokens])
+
+    def block(self, key: str, seconds: float) -> None:
+        self._block(keys=[self._keys(key)[2]], args=[seconds])
+
+
+# =============================================================================
+# Limiter
+# =============================================================================
+
+class LLMRateLimiter:
+    """
+    Shared RPM/TPM budgets per provider and model, with priorities.
+
+    Parameters
+    ----------
+    limits : dict, optional
+        ``provider`` or ``provider:model`` -> ``RateLimit`` (default: env).
+    backend : optional
+        Bucket backend; default Redis when available, else in-process.
+    clock : callable
+        Monotonic time source for wait accounting.
+    sleep, async_sleep : callable, optional
+        Sleep functions (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, RateLimit]] = None,
+        backend: Any = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.limits = limits if limits is not None else load_rate_limits()
+        self._backend = backend
+        self._local = LocalBucketBackend(clock=clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._redis_retry_at = 0.0
+        self._lock = threading.Lock()
+        self._settler: Optional[ThreadPoolExecutor] = None
+        self.waiting: Dict[Tuple[str, str], int] = {}
+
+    # ---- Configuration -----------------------------------------------------
+
+    def limit_for(self, provider: str, model: str) -> RateLimit:
+        return self.limits.get(f"{provider}:{model}") or self.limits.get(provider) or RateLimit()
+
+    def _get_backend(self) -> Any:
+        if self._backend is None:
+            backend: Any = self._local
+            if RATE_LIMIT_REDIS_ENABLED:
+                try:
+                    from backend.services.redis_client import get_redis_client
+                    backend = RedisBucketBackend(get_redis_client())
+                except Exception as e:
+                    logger.warning("Rate limiter using in-process buckets (Redis unavailable: %s)", e)
+            self._backend = backend
+        return self._backend
+
+    def _call(self, method: str, *args: Any) -> Any:
+        backend = self._get_backend()
+        if backend is not self._local and self._clock() >= self._redis_retry_at:
+            try:
+                return getattr(backend, method)(*args)
+            except Exception as e:
+                # Stay on in-process buckets for a while instead of paying a
+                # failed Redis round trip on every call
+                self._redis_retry_at = self._clock() + _REDIS_RETRY_SECONDS
+                logger.warning(
+                    "Rate limiter Redis error (%s); using in-process buckets for %.0fs",
+                    e, _REDIS_RETRY_SECONDS,
+                )
+        return getattr(self._local, method)(*args)
+
+    async def _call_async(self, method: str, *args: Any) -> Any:
+        """``_call`` off the event loop when it may hit Redis."""
+        if self._get_backend() is self._local:
+            return self._call(method, *args)
+        return await asyncio.to_thread(self._call, method, *args)
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> None:
+        """Run ``func`` without waiting for it when it may hit Redis."""
+        if self._get_backend() is self._local:
+            func(*args)
+            return
+        with self._lock:
+            if self._settler is None:
+                self._settler = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-ratelimit-settle")
+        self._settler.submit(func, *args)
+
+    # ---- Acquire -----------------------------------------------------------
+
+    def _attempt(self, key: str, limit: RateLimit, tokens: int, priority: Priority, waiter_id: str) -> float:
+        return self._call(
+            "try_acquire", key, limit, 1, tokens,
+            priority == Priority.INTERACTIVE, RATE_LIMIT_INTERACTIVE_RESERVE, waiter_id,
+        )
+
+    async def _attempt_async(
+        self, key: str, limit: RateLimit, tokens: int, priority: Priority, waiter_id: str,
+    ) -> float:
+        """``_attempt`` off the event loop when it may hit Redis."""
+        if self._get_backend() is self._local:
+            return self._attempt(key, limit, tokens, priority, waiter_id)
+        return await asyncio.to_thread(self._attempt, key, limit, tokens, priority, waiter_id)
+
+    def _prepare(
+        self, provider: str, model: str, tokens: int, priority: Optional[Priority],
+        max_wait: Optional[float] = None,
+    ) -> Tuple[str, RateLimit, int, Priority, float]:
+        limit = self.limit_for(provider, model)
+        priority = priority or current_priority()
+        if max_wait is None:
+            max_wait = (
+                RATE_LIMIT_MAX_WAIT_INTERACTIVE if priority == Priority.INTERACTIVE
+                else RATE_LIMIT_MAX_WAIT_BACKGROUND
+            )
+        # A reservation larger than the bucket could never be granted
+        tokens = min(max(0, int(tokens)), limit.tpm) if limit.tpm else 0
+        return f"{provider}:{model}", limit, tokens, priority, max_wait
+
+    def _next_sleep(self, key: str, priority: Priority, wait: float, started: float, max_wait: float) -> float:
+        waited = self._clock() - started
+        if wait < 0:
+            wait = 0.1  # background yielding to an interactive waiter
+        if waited + wait > max_wait:
+            from backend.services.metrics import LLM_RATE_LIMIT_EVENTS_TOTAL
+            LLM_RATE_LIMIT_EVENTS_TOTAL.inc(provider=key.split(":", 1)[0], event="wait_exceeded")
+            raise ThrottleWaitExceeded(key, priority, waited, wait)
+        # Re-check at least every poll interval, with jitter against lockstep wakeups
+        return min(wait, RATE_LIMIT_POLL_SECONDS) * random.uniform(0.8, 1.2)
+
+    def _finish(self, key: str, priority: Priority, started: float, queued: bool) -> float:
+        from backend.services.metrics import LLM_RATE_LIMIT_EVENTS_TOTAL, LLM_RATE_LIMIT_WAIT_SECONDS
+
+        waited = self._clock() - started if queued else 0.0
+        provider = key.split(":", 1)[0]
+        LLM_RATE_LIMIT_WAIT_SECONDS.observe(waited, provider=provider, priority=priority.value)
+        if queued:
+            LLM_RATE_LIMIT_EVENTS_TOTAL.inc(provider=provider, event="queued")
+            logger.debug("%s %s call queued %.2fs for budget", key, priority.value, waited)
+        holder = _queue_wait.get()
+        if holder is not None:
+            holder[0] += waited
+        return waited
+
+    def _track_waiting(self, key: str, priority: Priority, delta: int) -> None:
+        with self._lock:
+            slot = (key, priority.value)
+            self.waiting[slot] = self.waiting.get(slot, 0) + delta
+
+    async def acquire(
+        self, provider: str, model: str, tokens: int = 0, priority: Optional[Priority] = None,
+        max_wait: Optional[float] = None,
+    ) -> float:
+        """
+        Wait for budget for one call reserving ``tokens``.
+
+        ``max_wait`` overrides the priority's maximum queueing time, for
+        callers with their own deadline.
+
+        Returns
+        -------
+        float
+            Seconds spent queueing.
+
+        Raises
+        ------
+        ThrottleWaitExceeded
+            If the wait would exceed the priority's maximum.
+        """
+        if not RATE_LIMIT_ENABLED:
+            return 0.0
+        key, limit, tokens, priority, max_wait = self._prepare(provider, model, tokens, priority, max_wait)
+        if not limit.rpm and not limit.tpm:
+            return 0.0
+        waiter_id = uuid.uuid4().hex
+        started = self._clock()
+        wait = await self._attempt_async(key, limit, tokens, priority, waiter_id)
+        if wait == 0:
+            return self._finish(key, priority, started, queued=False)
+        self._track_waiting(key, priority, 1)
+        try:
+            while wait != 0:
+                await self._async_sleep(self._next_sleep(key, priority, wait, started, max_wait))
+                wait = await self._attempt_async(key, limit, tokens, priority, waiter_id)
+        finally:
+            self._track_waiting(key, priority, -1)
+        return self._finish(key, priority, started, queued=True)
+
+    def acquire_sync(
+        self, provider: str, model: str, tokens: int = 0, priority: Optional[Priority] = None,
+        max_wait: Optional[float] = None,
+    ) -> float:
+        """Blocking ``acquire`` for synchronous callers (rq jobs, sync SDK clients)."""
+        if not RATE_LIMIT_ENABLED:
+            return 0.0
+        key, limit, tokens, priority, max_wait = self._prepare(provider, model, tokens, priority, max_wait)
+        if not limit.rpm and not limit.tpm:
+            return 0.0
+        waiter_id = uuid.uuid4().hex
+        started = self._clock()
+        wait = self._attempt(key, limit, tokens, priority, waiter_id)
+        if wait == 0:
+            return self._finish(key, priority, started, queued=False)
+        self._track_waiting(key, priority, 1)
+        try:
+            while wait != 0:
+                self._sleep(self._next_sleep(key, priority, wait, started, max_wait))
+                wait = self._attempt(key, limit, tokens, priority, waiter_id)
+        finally:
+            self._track_waiting(key, priority, -1)
+        return self._finish(key, priority, started, queued=True)
+
+    # ---- Settlement --------------------------------------------------------
+
+    def record_usage(self, provider: str, model: str, tokens: int) -> None:
+        """Charge (or refund, if negative) tokens beyond what was reserved."""
+        if not RATE_LIMIT_ENABLED or not tokens:
+            return
+        limit = self.limit_for(provider, model)
+        if limit.tpm:
+            self._call("charge", f"{provider}:{model}", limit, int(tokens))
+
+    async def record_usage_async(self, provider: str, model: str, tokens: int) -> None:
+        """``record_usage`` for async callers; the Redis script runs off the loop."""
+        if not RATE_LIMIT_ENABLED or not tokens:
+            return
+        limit = self.limit_for(provider, model)
+        if limit.tpm:
+            await self._call_async("charge", f"{provider}:{model}", limit, int(tokens))
+
+    def record_usage_nowait(self, provider: str, model: str, tokens: int) -> None:
+        """``record_usage`` without waiting for Redis (callback handlers)."""
+        if RATE_LIMIT_ENABLED and tokens:
+            self._submit(self.record_usage, provider, model, tokens)
+
+    def block(self, provider: str, model: str, seconds: float) -> None:
+        """Stop all calls to ``provider:model`` for ``seconds`` (every process)."""
+        if not RATE_LIMIT_ENABLED or seconds <= 0:
+            return
+        self._call("block", f"{provider}:{model}", seconds)
+
+    async def block_async(self, provider: str, model: str, seconds: float) -> None:
+        """``block`` for async callers; the Redis script runs off the loop."""
+        if not RATE_LIMIT_ENABLED or seconds <= 0:
+            return
+        await self._call_async("block", f"{provider}:{model}", seconds)
+
+    def handle_error(self, provider: str, model: str, error: BaseException) -> Optional[float]:
+        """
+        Honour a provider 429: block the key for its retry-after.
+
+        Returns
+        -------
+        float or None
+            Seconds blocked, or None if ``error`` is not a rate-limit error.
+        """
+        seconds = self._backoff_for(provider, model, error)
+        if seconds is not None:
+            self.block(provider, model, seconds)
+        return seconds
+
+    async def handle_error_async(self, provider: str, model: str, error: BaseException) -> Optional[float]:
+        """``handle_error`` for async callers; the Redis script runs off the loop."""
+        seconds = self._backoff_for(provider, model, error)
+        if seconds is not None:
+            await self.block_async(provider, model, seconds)
+        return seconds
+
+    def handle_error_nowait(self, provider: str, model: str, error: BaseException) -> Optional[float]:
+        """``handle_error`` without waiting for Redis (callback handlers)."""
+        seconds = self._backoff_for(provider, model, error)
+        if seconds is not None and RATE_LIMIT_ENABLED and seconds > 0:
+            self._submit(self.block, provider, model, seconds)
+        return seconds
+
+    def _backoff_for(self, provider: str, model: str, error: BaseException) -> Optional[float]:
+        """Seconds to block ``provider:model`` for ``error``; None if it is not a 429."""
+        if not is_rate_limit_error(error):
+            return None
+        from backend.services.metrics import LLM_RATE_LIMIT_EVENTS_TOTAL
+
+        seconds = retry_after_seconds(error)
+        if seconds is None:
+            seconds = RATE_LIMIT_DEFAULT_BACKOFF_SECONDS
+        LLM_RATE_LIMIT_EVENTS_TOTAL.inc(provider=provider, event="provider_429")
+        logger.warning("%s:%s returned 429; pausing calls for %.1fs", provider, model, seconds)
+        return seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waiting = {f"{key}/{priority}": count for (key, priority), count in self.waiting.items() if count}
+        return {
+            "enabled": RATE_LIMIT_ENABLED,
+            "backend": type(self._backend).__name__ if self._backend else None,
+            "default_priority": _default_priority.value,
+            "limits": {key: {"rpm": limit.rpm, "tpm": limit.tpm} for key, limit in sorted(self.limits.items())},
+            "waiting": waiting,
+        }
+
+
+# =============================================================================
+# Call Sites
+# =============================================================================
+
+class RateLimitSlot:
+    """
+    Budget for one direct SDK call; use as a (sync or async) context manager.
+
+    Settles the reservation with ``record(response)`` and honours 429s
+    raised inside the block.
+    """
+
+    def __init__(
+        self, limiter: LLMRateLimiter, provider: str, model: str,
+        estimated_tokens: int, priority: Optional[Priority], max_wait: Optional[float] = None,
+    ):
+        self._limiter = limiter
+        self.provider = provider
+        self.model = model
+        self.estimated_tokens = estimated_tokens
+        self.priority = priority
+        self.max_wait = max_wait
+        self.waited = 0.0
+
+    def __enter__(self) -> "RateLimitSlot":
+        self.waited = self._limiter.acquire_sync(
+            self.provider, self.model, self.estimated_tokens, self.priority, self.max_wait,
+        )
+        return self
+
+    async def __aenter__(self) -> "RateLimitSlot":
+        self.waited = await self._limiter.acquire(
+            self.provider, self.model, self.estimated_tokens, self.priority, self.max_wait,
+        )
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        if exc is not None:
+            self._limiter.handle_error(self.provider, self.model, exc)
+        return False
+
+    async def __aexit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        if exc is not None:
+            await self._limiter.handle_error_async(self.provider, self.model, exc)
+        return False
+
+    def record(self, response: Any) -> None:
+        """Settle the reservation with the response's reported usage."""
+        used = self._used_tokens(response)
+        if used is not None:
+            self._limiter.record_usage(self.provider, self.model, used - self.estimated_tokens)
+
+    async def record_async(self, response: Any) -> None:
+        """``record`` inside ``async with``; the Redis script runs off the loop."""
+        used = self._used_tokens(response)
+        if used is not None:
+            await self._limiter.record_usage_async(self.provider, self.model, used - self.estimated_tokens)
+
+    @staticmethod
+    def _used_tokens(response: Any) -> Optional[int]:
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return None
+        return (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+
+
+def llm_rate_limit(
+    provider: str,
+    model: str,
+    estimated_tokens: int = 0,
+    priority: Optional[Priority] = None,
+    max_wait: Optional[float] = None,
+) -> RateLimitSlot:
+    """Rate-limit slot for one direct SDK call (see module docstring)."""
+    return RateLimitSlot(get_rate_limiter(), provider, model, estimated_tokens, priority, max_wait)
+
+
+class ProviderRateLimiter(BaseRateLimiter):
+    """
+    LangChain ``rate_limiter`` for one provider/model.
+
+    Chat models call it before every request.  The token cost is unknown at
+    that point, so the call reserves only a request and the response's
+    usage is charged afterwards (``CircuitBreakerCallbackHandler``).
+    """
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self._try()
+        get_rate_limiter().acquire_sync(self.provider, self.model)
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self._try()
+        await get_rate_limiter().acquire(self.provider, self.model)
+        return True
+
+    def _try(self) -> bool:
+        limiter = get_rate_limiter()
+        key, limit, tokens, priority, _ = limiter._prepare(self.provider, self.model, 0, None)
+        if not RATE_LIMIT_ENABLED or (not limit.rpm and not limit.tpm):
+            return True
+        return limiter._attempt(key, limit, tokens, priority, uuid.uuid4().hex) == 0
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_limiter: Optional[LLMRateLimiter] = None
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """Get or create the process-wide LLM rate limiter."""
+    global _limiter
+    if _limiter is None:
+        _limiter = LLMRateLimiter()
+    return _limiter
+
+
+def reset_rate_limiter() -> None:
+    """Reset the singleton (useful in tests)."""
+    global _limiter
+    _limiter = None
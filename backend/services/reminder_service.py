@@ -825,6 +825,73 @@ class ReminderService:
                 )
             )
 
+    async def mark_reminder_failed(
+        self,
+        reminder_id: UUID,
+        error: Optional[str] = None,
+    ) -> OperationResult:
+        """
+        Deactivate a reminder whose delivery failed permanently.
+
+        Sets is_active = False and records the failure under
+        ``metadata.delivery_failure``, so pollers stop re-indexing it and
+        the failure stays distinguishable from a user cancellation.
+
+        Args:
+            reminder_id: The reminder UUID
+            error: Last delivery error (optional)
+
+        Returns:
+            OperationResult with success status
+        """
+        if not self.client:
+            return OperationResult.fail(
+                MissingCredentialsError(
+                    service="Supabase",
+                    required_keys=["SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY"]
+                )
+            )
+
+        now = datetime.now(timezone.utc)
+
+        try:
+            existing = self.client.table(REMINDERS_TABLE).select("metadata").eq(
+                "id", str(reminder_id)
+            ).execute()
+            if not existing.data:
+                return OperationResult.fail(
+                    ReminderNotFoundError(reminder_id=str(reminder_id))
+                )
+
+            metadata = existing.data[0].get("metadata") or {}
+            metadata["delivery_failure"] = {
+                "failed_at": now.isoformat(),
+                "error": error,
+            }
+            self.client.table(REMINDERS_TABLE).update({
+                "is_active": False,
+                "metadata": metadata,
+            }).eq("id", str(reminder_id)).execute()
+
+            logger.warning(f"Deactivated reminder {reminder_id} after failed delivery")
+            return OperationResult.ok({
+                "reminder_id": str(reminder_id),
+                "status": "failed",
+                "failed_at": now.isoformat(),
+            })
+
+        except Exception as e:
+            logger.error(f"Error marking reminder {reminder_id} failed: {e}")
+            return OperationResult.fail(
+                DatabaseError(
+                    message=f"Failed to mark reminder failed: {str(e)}",
+                    operation="update",
+                    table=REMINDERS_TABLE,
+                    context={"reminder_id": str(reminder_id)},
+                    original_error=e,
+                )
+            )
+
 
     # =========================================================================
     # Deduplication Helpers (DEBT-002)
@@ -12,7 +12,9 @@ Components:
     - **Frequency**: Normalised ``access_count`` using log-scale
       ``log(1 + access_count) / log(1 + max_count)``
     - **Emotional weight**: Stub returning 0.5 (Phase 2: sentiment analysis)
-    - **Causal centrality**: Stub returning 0.3 (Phase 2: graph degree count)
+    - **Causal centrality**: Graph degree of the memory's linked entities,
+      ``degree / max(10, degree)``; degrees come from the ``entity_centrality``
+      table (``backend/services/entity_centrality.py``) in batch jobs
 
 Default weights: w_r=0.4, w_f=0.2, w_e=0.2, w_c=0.2
 
@@ -292,18 +294,41 @@ def compute_emotional_weight(
         return 0.3
 
 
+def centrality_from_degree(degree: int) -> float:
+    """
+    Normalise a memory's graph degree to a causal centrality score.
+
+    Parameters
+    ----------
+    degree : int
+        Edges where any linked entity is the source, plus edges where any
+        linked entity is the target.
+
+    Returns
+    -------
+    float
+        0.1 for no edges, otherwise ``degree / max(10, degree)`` (capped so
+        very connected entities don't dominate).
+    """
+    if degree <= 0:
+        return 0.1
+    score = degree / max(10, degree)
+    return round(min(max(score, 0.0), 1.0), 6)
+
+
 def compute_causal_centrality(
     memory_metadata: Optional[dict] = None,
     entity_links: Optional[list] = None,
+    degree: Optional[int] = None,
 ) -> float:
     """
     Compute causal centrality for a memory via graph degree centrality.
 
-    Queries the ``entity_relationships`` table in Supabase to count how
-    many relationship edges involve the entities linked to this memory.
-    The total degree (edges where any linked entity appears as source or
-    target) is normalised with a cap of 10 to prevent very connected
-    entities from dominating the score.
+    When ``degree`` is given (read from ``entity_centrality`` by the batch
+    job) it is used as is.  Otherwise the ``entity_relationships`` table is
+    queried on the fly: two COUNT queries for the edges where any linked
+    entity appears as source or target.  The total degree is normalised by
+    ``centrality_from_degree``.
 
     Parameters
     ----------
@@ -311,6 +336,8 @@ def compute_causal_centrality(
         Memory metadata dict (unused — kept for signature compatibility).
     entity_links : list or None
         List of entity UUIDs linked to this memory.
+    degree : int or None
+        Precomputed degree of the linked entities.
 
     Returns
     -------
@@ -323,6 +350,9 @@ def compute_causal_centrality(
     if not entity_links:
         return 0.1
 
+    if degree is not None:
+        return centrality_from_degree(degree)
+
     # Convert all UUIDs to strings for the Supabase filter
     entity_id_strs: list[str] = [str(eid) for eid in entity_links]
 
@@ -351,14 +381,7 @@ def compute_causal_centrality(
         source_count: int = source_resp.count if source_resp.count is not None else 0
         target_count: int = target_resp.count if target_resp.count is not None else 0
 
-        degree: int = source_count + target_count
-
-        if degree == 0:
-            return 0.1
-
-        # Normalise: cap at 10 so very-connected entities don't dominate
-        score = degree / max(10, degree)
-        return round(min(max(score, 0.0), 1.0), 6)
+        return centrality_from_degree(source_count + target_count)
 
     except Exception:
         logger.warning(
@@ -379,6 +402,7 @@ def calculate_salience(
     weights: Optional[SalienceWeights] = None,
     max_access_count: int = DEFAULT_MAX_ACCESS_COUNT,
     now: Optional[datetime] = None,
+    causal_degree: Optional[int] = None,
 ) -> SalienceResult:
     """
     Calculate the composite salience score for a single memory.
@@ -396,6 +420,9 @@ def calculate_salience(
         Maximum access count across all memories for frequency normalisation.
     now : datetime or None
         Reference time for recency calculation.
+    causal_degree : int or None
+        Precomputed graph degree of the memory's entities (from
+        ``entity_centrality``); queried on the fly when None.
 
     Returns
     -------
@@ -421,6 +448,7 @@ def calculate_salience(
     causal = compute_causal_centrality(
         memory_metadata=memory.metadata if hasattr(memory, "metadata") else None,
         entity_links=memory.entity_links if hasattr(memory, "entity_links") else None,
+        degree=causal_degree,
     )
 
     components = SalienceComponents(
@@ -11,11 +11,15 @@ PRD Requirements: TRAIN-001, TRAIN-004
 Note: This uses keyword/pattern matching, NOT LLM calls.
 TRAIN-004 explicitly says "no direct model fine-tuning" —
 we optimize retrieval and prompts, not weights.
+
+All phrase lists are compiled into one SignalMatcher, so each message
+is scanned once for every signal.
 """
 
 import logging
 import re
-from typing import Any, Dict, Optional, Set
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -58,12 +62,153 @@ FRUSTRATION_PATTERNS: list[str] = [
 ]
 
 
+# ---- Compiled pattern matcher ----
+
+# Phrases this short only match as whole words ("ty" is not in "pretty",
+# "ugh" is not in "though").  Longer phrases must start at a word boundary
+# but may run on ("thank" matches "thankful").
+WHOLE_WORD_MAX_LEN = 3
+
+
+class SignalHit(NamedTuple):
+    """One phrase occurrence in a lowercased message."""
+
+    kind: str       # "gratitude", "negation" or "frustration"
+    phrase: str
+    start: int
+    end: int
+
+
+class SignalMatcher:
+    """
+    All signal phrases compiled into one automaton.
+
+    A single regex scan finds, at every word start, the longest phrase
+    that begins there; the shorter phrases that also begin there are
+    exactly the phrases that are prefixes of it, which are precomputed.
+    So one pass yields every hit with its position, and negations can be
+    scoped to the gratitude hits they actually cover.
+    """
+
+    def __init__(self, phrases: Dict[str, Iterable[str]]):
+        self._kind: Dict[str, str] = {}
+        for kind, items in phrases.items():
+            for phrase in items:
+                self._kind.setdefault(phrase, kind)
+
+        ordered = sorted(self._kind, key=lambda p: (-len(p), p))
+        self._regex = re.compile(r"(?<!\w)(?=(" + _trie_pattern(ordered) + "))")
+
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            p: tuple(q for q in ordered if q != p and p.startswith(q))
+            for p in ordered
+        }
+
+    def hits(self, message: str) -> List[SignalHit]:
+        """Every phrase occurrence in ``message`` (case-insensitive)."""
+        text = _normalize(message)
+        found: List[SignalHit] = []
+        for match in self._regex.finditer(text):
+            start = match.start()
+            longest = match.group(1)
+            for phrase in (longest,) + self._prefixes[longest]:
+                end = start + len(phrase)
+                if phrase is not longest and len(phrase) <= WHOLE_WORD_MAX_LEN \
+                        and end < len(text) and _is_word_char(text[end]):
+                    continue
+                found.append(SignalHit(self._kind[phrase], phrase, start, end))
+        return found
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Regex for a prefix trie of ``phrases`` that matches the longest one.
+
+    Shared prefixes are factored out ("thank" / "thanks" / "thanks but"
+    become ``thank(?:s(?:...)?)?``), so a position that starts no phrase
+    fails on its first character.  Continuations are tried before a
+    phrase ends, which makes the match the longest phrase available.
+    """
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def _node(node: Dict[str, Any], depth: int) -> str:
+        branches = [re.escape(char) + _node(child, depth + 1)
+                    for char, child in sorted(node.items()) if char]
+        if "" not in node:
+            return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        end = r"(?!\w)" if depth <= WHOLE_WORD_MAX_LEN else ""
+        if not branches:
+            return end
+        return "(?:" + "|".join(branches + [end]) + ")"
+
+    return _node(trie, 0)
+
+
+def _normalize(message: str) -> str:
+    return message.lower().strip().replace("\u2019", "'")
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+_matcher: Optional[SignalMatcher] = None
+
+
+def get_signal_matcher() -> SignalMatcher:
+    """The matcher for the module's phrase lists (built on first use)."""
+    global _matcher
+    if _matcher is None:
+        _matcher = SignalMatcher({
+            "negation": GRATITUDE_NEGATIONS,
+            "gratitude": GRATITUDE_PATTERNS,
+            "frustration": FRUSTRATION_PATTERNS,
+        })
+    return _matcher
+
+
+def _has_gratitude(hits: List[SignalHit]) -> bool:
+    """A gratitude hit that no negation hit ("no thanks", "thanks but") covers."""
+    negations = [(h.start, h.end) for h in hits if h.kind == "negation"]
+    return any(
+        h.kind == "gratitude"
+        and not any(start <= h.start and h.end <= end for start, end in negations)
+        for h in hits
+    )
+
+
+def _has_frustration(hits: List[SignalHit]) -> bool:
+    return any(h.kind == "frustration" for h in hits)
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1024)
+def _content_tokens(text: str) -> FrozenSet[str]:
+    """
+    Lowercased word set minus stopwords.
+
+    Cached by message text: each turn's message is the next turn's
+    "previous message", so a conversation tokenizes every message once.
+    """
+    return frozenset(_WORD_RE.findall(text.lower())) - STOPWORDS
+
+
+# ---- Classifiers ----
+
 def classify_gratitude(message: str) -> bool:
     """
     Classify whether a message expresses gratitude.
 
     Returns True if the message is a "thank you" or equivalent.
-    Handles negation prefixes like "no thanks" or "thanks but".
+    Gratitude inside a negation like "no thanks" or "thanks but" does
+    not count; gratitude elsewhere in the message still does.
 
     Parameters
     ----------
@@ -75,19 +220,7 @@ def classify_gratitude(message: str) -> bool:
     bool
         True if gratitude detected, False otherwise.
     """
-    lower = message.lower().strip()
-
-    # Check for negation prefixes first
-    for neg in GRATITUDE_NEGATIONS:
-        if lower.startswith(neg):
-            return False
-
-    # Check for gratitude patterns
-    for pattern in GRATITUDE_PATTERNS:
-        if pattern in lower:
-            return True
-
-    return False
+    return _has_gratitude(get_signal_matcher().hits(message))
 
 
 def classify_repetition(current_message: str, previous_message: str) -> bool:
@@ -109,25 +242,15 @@ def classify_repetition(current_message: str, previous_message: str) -> bool:
     bool
         True if messages appear to be repetitions.
     """
-    def _tokenize(text: str) -> Set[str]:
-        """Tokenize and remove stopwords."""
-        words = set(re.findall(r'\w+', text.lower()))
-        return words - STOPWORDS
+    current_words = _content_tokens(current_message)
+    previous_words = _content_tokens(previous_message)
 
-    current_words = _tokenize(current_message)
-    previous_words = _tokenize(previous_message)
-
-    if not current_words and not previous_words:
-        return False
     if not current_words or not previous_words:
         return False
 
     intersection = current_words & previous_words
     union = current_words | previous_words
 
-    if not union:
-        return False
-
     similarity = len(intersection) / len(union)
     return similarity > 0.5
 
@@ -149,13 +272,7 @@ def classify_frustration(message: str) -> bool:
     bool
         True if frustration detected, False otherwise.
     """
-    lower = message.lower().strip()
-
-    for pattern in FRUSTRATION_PATTERNS:
-        if pattern in lower:
-            return True
-
-    return False
+    return _has_frustration(get_signal_matcher().hits(message))
 
 
 def classify_signals(
@@ -184,9 +301,10 @@ def classify_signals(
         - frustration: bool
         - skill_version_id: str or None
     """
+    hits = get_signal_matcher().hits(current_message)
     result: Dict[str, Any] = {
-        "gratitude": classify_gratitude(current_message),
-        "frustration": classify_frustration(current_message),
+        "gratitude": _has_gratitude(hits),
+        "frustration": _has_frustration(hits),
         "skill_version_id": agent_used_skill,
     }
 
@@ -107,13 +107,19 @@ async def _call_haiku(prompt: str) -> Optional[str]:
             logger.error("ANTHROPIC_API_KEY not set — cannot generate skills")
             return None
 
+        from backend.services.rate_limiter import approx_tokens, llm_rate_limit
+
         client = anthropic.Anthropic(api_key=api_key)
 
-        response = client.messages.create(
-            model="claude-3-5-haiku-latest",
-            max_tokens=4096,
-            messages=[{"role": "user", "content": prompt}],
-        )
+        with llm_rate_limit(
+            "anthropic", "claude-3-5-haiku-latest", approx_tokens(prompt) + 2048,
+        ) as slot:
+            response = client.messages.create(
+                model="claude-3-5-haiku-latest",
+                max_tokens=4096,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            slot.record(response)
 
         if response.content and len(response.content) > 0:
             return response.content[0].text
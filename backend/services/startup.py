@@ -0,0 +1,320 @@
+"""
+Startup Profiling and Readiness Gates
+=====================================
+
+The API accepts traffic as soon as its routes are mounted.  Only cheap,
+fail-fast steps (dotenv, preflight env checks) run inline in the startup
+event; heavy subsystems initialise in the background behind readiness
+gates.
+
+Gates:
+    ``start_gate(name, init)`` runs ``init`` as a background task and
+    records its duration and outcome.  ``GET /ready`` answers 200 once every
+    *required* gate is ready and 503 before; ``GET /health`` only says the
+    process is alive.  Optional gates (Redis reachability, leader election
+    and the leader-only services) are reported but never hold traffic back.
+
+Profile:
+    Inline startup steps are timed with ``startup_phase(name)``.  With
+    ``STARTUP_PROFILE=true`` the server also installs an import timer (a
+    ``sys.meta_path`` hook) before its heavy imports, and logs the slowest
+    top-level packages with the phase and gate timings once every gate has
+    finished.  ``GET /startup/profile`` returns the same report.
+
+Measure a cold import without starting the server::
+
+    python -m backend.services.startup
+"""
+
+import asyncio
+import importlib.machinery
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+STARTUP_PROFILE_ENABLED: bool = os.getenv("STARTUP_PROFILE", "false").lower() == "true"
+# Packages listed in the import report
+PROFILE_TOP_PACKAGES: int = 15
+
+# Reference point for every offset below: when this module was imported,
+# which the server does before anything heavy
+_process_start: float = time.monotonic()
+
+
+# =============================================================================
+# Import Timing
+# =============================================================================
+
+_FILE_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+    importlib.machinery.ExtensionFileLoader,
+)
+
+
+class ImportTimer:
+    """
+    ``sys.meta_path`` hook timing how long each module takes to execute.
+
+    Finding is delegated to the other finders; file-backed loaders get their
+    ``exec_module`` wrapped.  Times are self times (a module's own code,
+    excluding the modules it imports), so they add up to the total.
+    """
+
+    def __init__(self) -> None:
+        self.self_seconds: Dict[str, float] = {}
+        self._local = threading.local()
+
+    def find_spec(self, fullname: str, path: Any = None, target: Any = None) -> Any:
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                find = getattr(finder, "find_spec", None)
+                if finder is self or find is None:
+                    continue
+                spec = find(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        # Builtin and frozen loaders are shared classes; leave them alone
+        if isinstance(spec.loader, _FILE_LOADERS):
+            spec.loader.exec_module = self._timed(fullname, spec.loader.exec_module)
+        return spec
+
+    def _timed(self, name: str, exec_module: Callable[[Any], None]) -> Callable[[Any], None]:
+        def exec_timed(module: Any) -> None:
+            stack: List[float] = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.self_seconds[name] = elapsed - children
+        return exec_timed
+
+    def by_package(self) -> List[Dict[str, Any]]:
+        """Self time summed per top-level package, slowest first."""
+        packages: Dict[str, List[float]] = {}
+        for name, seconds in list(self.self_seconds.items()):
+            packages.setdefault(name.split(".")[0], []).append(seconds)
+        ranked = sorted(packages.items(), key=lambda item: sum(item[1]), reverse=True)
+        return [
+            {"package": package, "seconds": round(sum(times), 3), "modules": len(times)}
+            for package, times in ranked
+        ]
+
+
+_import_timer: Optional[ImportTimer] = None
+
+
+def install_import_timer(force: bool = False) -> Optional[ImportTimer]:
+    """
+    Start timing imports if ``STARTUP_PROFILE`` is on (or ``force``).
+
+    Must run before the imports to be measured; the server calls it first.
+    """
+    global _import_timer
+    if _import_timer is None and (STARTUP_PROFILE_ENABLED or force):
+        _import_timer = ImportTimer()
+        sys.meta_path.insert(0, _import_timer)
+    return _import_timer
+
+
+def uninstall_import_timer() -> None:
+    """Stop timing imports (the collected times are kept)."""
+    if _import_timer is not None and _import_timer in sys.meta_path:
+        sys.meta_path.remove(_import_timer)
+
+
+# =============================================================================
+# Phases and Gates
+# =============================================================================
+
+@dataclass
+class Gate:
+    """One subsystem initialised in the background at startup."""
+    name: str
+    required: bool
+    status: str = "pending"            # pending | running | ready | failed
+    started_at: Optional[float] = None  # seconds since process start
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "required": self.required,
+            "status": self.status,
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "error": self.error,
+        }
+
+
+_phases: List[Dict[str, Any]] = []
+_gates: Dict[str, Gate] = {}
+_gate_tasks: Set["asyncio.Task[None]"] = set()
+_ready_at: Optional[float] = None
+
+
+def _since_start() -> float:
+    return round(time.monotonic() - _process_start, 3)
+
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    """Time an inline startup step (works around ``await`` too)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append({"name": name, "seconds": round(time.perf_counter() - start, 3)})
+
+
+def start_gate(name: str, init: Callable[[], Awaitable[Any]], required: bool = True) -> "asyncio.Task[None]":
+    """
+    Run ``init`` in the background as the readiness gate ``name``.
+
+    A failing ``init`` is logged and marks the gate failed; a failed
+    required gate keeps ``/ready`` at 503.
+
+    Parameters
+    ----------
+    name : str
+        Gate name reported by ``/ready``.
+    init : callable
+        Coroutine function initialising the subsystem.
+    required : bool
+        Whether ``/ready`` waits for this gate.
+
+    Returns
+    -------
+    asyncio.Task
+        The background task.
+    """
+    gate = _gates[name] = Gate(name=name, required=required)
+
+    async def run() -> None:
+        global _ready_at
+        gate.status = "running"
+        gate.started_at = _since_start()
+        start = time.perf_counter()
+        try:
+            await init()
+            gate.status = "ready"
+        except Exception as e:
+            gate.status = "failed"
+            gate.error = str(e)
+            logger.error(f"Startup gate '{name}' failed: {e}", exc_info=True)
+        finally:
+            gate.seconds = round(time.perf_counter() - start, 3)
+        logger.info(f"✓ Startup gate '{name}' {gate.status} in {gate.seconds:.2f}s")
+        if _ready_at is None and is_ready():
+            _ready_at = _since_start()
+            logger.info(f"API ready {_ready_at:.2f}s after process start")
+        if all(g.status in ("ready", "failed") for g in _gates.values()):
+            _log_profile()
+
+    task = asyncio.create_task(run(), name=f"startup:{name}")
+    _gate_tasks.add(task)
+    task.add_done_callback(_gate_tasks.discard)
+    return task
+
+
+async def stop_gates() -> None:
+    """Cancel gates still initialising (on shutdown)."""
+    tasks = list(_gate_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def is_ready() -> bool:
+    """Whether every required gate is ready."""
+    return all(gate.status == "ready" for gate in _gates.values() if gate.required)
+
+
+def readiness() -> Dict[str, Any]:
+    """Gate states, for ``GET /ready``."""
+    return {
+        "ready": is_ready(),
+        "ready_after_seconds": _ready_at,
+        "gates": {name: gate.to_dict() for name, gate in _gates.items()},
+    }
+
+
+def startup_profile() -> Dict[str, Any]:
+    """Phase, gate and (in profile mode) import timings, for ``GET /startup/profile``."""
+    profile: Dict[str, Any] = {
+        "profile_enabled": _import_timer is not None,
+        "uptime_seconds": _since_start(),
+        "ready_after_seconds": _ready_at,
+        "phases": list(_phases),
+        "gates": {name: gate.to_dict() for name, gate in _gates.items()},
+    }
+    if _import_timer is not None:
+        packages = _import_timer.by_package()
+        profile["imports"] = {
+            "total_seconds": round(sum(p["seconds"] for p in packages), 3),
+            "modules": sum(p["modules"] for p in packages),
+            "packages": packages[:PROFILE_TOP_PACKAGES],
+        }
+    return profile
+
+
+def _log_profile() -> None:
+    if _import_timer is None:
+        return
+    profile = startup_profile()
+    imports = profile["imports"]
+    logger.info("=" * 60)
+    logger.info(f"STARTUP PROFILE (ready after {profile['ready_after_seconds']}s)")
+    logger.info(f"Imports: {imports['total_seconds']:.2f}s across {imports['modules']} modules")
+    for package in imports["packages"]:
+        logger.info(f"  - {package['package']}: {package['seconds']:.3f}s ({package['modules']} modules)")
+    for phase in profile["phases"]:
+        logger.info(f"Phase {phase['name']}: {phase['seconds']:.3f}s")
+    for name, gate in profile["gates"].items():
+        logger.info(f"Gate {name}: {gate['status']} in {gate['seconds']}s (started at {gate['started_at']}s)")
+    logger.info("=" * 60)
+
+
+def reset_startup_state() -> None:
+    """Forget phases and gates (for tests)."""
+    global _ready_at
+    _phases.clear()
+    _gates.clear()
+    _ready_at = None
+
+
+if __name__ == "__main__":
+    # Cold import of the API, the cost paid before it can accept traffic
+    timer = install_import_timer(force=True)
+    start = time.perf_counter()
+    import lib.agent.server  # noqa: F401,E402
+    elapsed = time.perf_counter() - start
+    uninstall_import_timer()
+    print(f"import lib.agent.server: {elapsed:.2f}s")
+    for package in timer.by_package()[:PROFILE_TOP_PACKAGES]:
+        print(f"  {package['package']:<28} {package['seconds']:>7.3f}s  {package['modules']:>4} modules")
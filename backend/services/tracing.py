@@ -0,0 +1,705 @@
+"""
+Request Tracing for Sabine 2.0
+==============================
+
+A small span-based tracer that follows one request from the FastAPI
+endpoint through the Fast Path, memory retrieval, the agent loop and its
+tool calls, and across the rq queue into the Slow Path worker.
+
+The data model is OpenTelemetry's: W3C Trace Context IDs, span kinds,
+status, attributes and links.  Finished spans are written as OTLP/JSON
+lines, so the files can be loaded by an OpenTelemetry Collector
+(``otlpjsonfile`` receiver) or any OTLP-aware viewer later, but nothing
+here needs a collector or the OpenTelemetry SDK.
+
+Propagation
+-----------
+- In process: the current span lives in a ``ContextVar``.  It follows
+  ``await``, ``asyncio.gather`` / ``create_task`` (LangGraph runs tool
+  calls as tasks), ``asyncio.to_thread`` and ``asyncio.run``, which all
+  copy the caller's context.  Plain ``loop.run_in_executor`` does not;
+  wrap the callable with :func:`bind_context` there.
+- HTTP: :class:`TraceMiddleware` continues an incoming ``traceparent``
+  header and returns ``traceparent`` / ``X-Trace-Id`` on the response.
+- rq: the producer stores :func:`inject` output in ``job.meta``;
+  ``memory_profiled_job`` resumes it in the work horse.  The Fast Path
+  also stamps ``traceparent`` into the WAL payload, and the Slow Path
+  links its consolidation span to it, so entries consolidated by a batch
+  or retry job still point back at the originating ``/invoke``.
+
+Configuration (environment):
+    TRACING_EXPORTER      ``none`` (default), ``stdout`` or ``file``
+    TRACING_FILE_PATH     Output path for ``file`` (default: traces.jsonl)
+    TRACING_SERVICE_NAME  ``service.name`` resource attribute
+                          (default: sabine-api)
+
+Spans are created and propagated even when the exporter is ``none``, so
+trace IDs still appear in response headers and job metadata.
+
+Owner: @backend-architect-sabine
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Generator,
+    List,
+    Mapping,
+    Optional,
+    TextIO,
+    Tuple,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+SPAN_KIND_INTERNAL = "INTERNAL"
+SPAN_KIND_SERVER = "SERVER"
+SPAN_KIND_CLIENT = "CLIENT"
+SPAN_KIND_PRODUCER = "PRODUCER"
+SPAN_KIND_CONSUMER = "CONSUMER"
+
+# OTLP enum values
+_OTLP_SPAN_KIND: Dict[str, int] = {
+    SPAN_KIND_INTERNAL: 1,
+    SPAN_KIND_SERVER: 2,
+    SPAN_KIND_CLIENT: 3,
+    SPAN_KIND_PRODUCER: 4,
+    SPAN_KIND_CONSUMER: 5,
+}
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_TRACEPARENT_RE = re.compile(
+    r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$"
+)
+
+
+# =============================================================================
+# Span Context
+# =============================================================================
+
+@dataclass(frozen=True)
+class SpanContext:
+    """Identity of a span as carried across process boundaries."""
+
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+    def to_traceparent(self) -> str:
+        """Encode as a W3C ``traceparent`` header value."""
+        flags = "01" if self.sampled else "00"
+        return f"00-{self.trace_id}-{self.span_id}-{flags}"
+
+    @classmethod
+    def from_traceparent(cls, value: Optional[str]) -> Optional["SpanContext"]:
+        """
+        Parse a W3C ``traceparent`` value.
+
+        Returns ``None`` for missing or malformed values, including the
+        all-zero trace and span IDs the spec reserves as invalid.
+        """
+        if not value or not isinstance(value, str):
+            return None
+        match = _TRACEPARENT_RE.match(value.strip().lower())
+        if match is None:
+            return None
+        version, trace_id, span_id, flags = match.groups()
+        if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(trace_id=trace_id, span_id=span_id, sampled=bool(int(flags, 16) & 1))
+
+
+def _new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def _new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+# =============================================================================
+# Span
+# =============================================================================
+
+class Span:
+    """
+    A timed operation within a trace.
+
+    Created by :meth:`Tracer.start_span` (current for the ``with`` block)
+    or :meth:`Tracer.start_detached_span` (caller ends it).  Ending a span
+    hands it to the tracer's exporter; ending twice is a no-op.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_span_id: Optional[str] = None,
+        kind: str = SPAN_KIND_INTERNAL,
+        attributes: Optional[Mapping[str, Any]] = None,
+        links: Optional[List[Tuple[SpanContext, Dict[str, Any]]]] = None,
+        tracer: Optional["Tracer"] = None,
+    ) -> None:
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.links: List[Tuple[SpanContext, Dict[str, Any]]] = list(links or [])
+        self.status_code: int = STATUS_UNSET
+        self.status_message: str = ""
+        self.start_ns: int = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._tracer = tracer
+
+    @property
+    def is_recording(self) -> bool:
+        return self.end_ns is None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Mapping[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_link(self, context: SpanContext, attributes: Optional[Mapping[str, Any]] = None) -> None:
+        """Point at a span in another trace (e.g. the request that wrote a WAL entry)."""
+        self.links.append((context, dict(attributes or {})))
+
+    def set_status(self, code: int, message: str = "") -> None:
+        self.status_code = code
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        """Mark the span failed and attach the exception type and message."""
+        self.set_status(STATUS_ERROR, f"{type(exc).__name__}: {exc}")
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self._tracer is not None:
+            self._tracer._on_end(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """This span as an OTLP/JSON ``Span`` object."""
+        span: Dict[str, Any] = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": _OTLP_SPAN_KIND.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns if self.end_ns is not None else self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.links:
+            span["links"] = [
+                {
+                    "traceId": ctx.trace_id,
+                    "spanId": ctx.span_id,
+                    "attributes": _otlp_attributes(attrs),
+                }
+                for ctx, attrs in self.links
+            ]
+        return span
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, trace={self.context.trace_id}, span={self.context.span_id})"
+
+
+class _NonRecordingSpan(Span):
+    """Returned by :func:`current_span` outside any span; discards everything."""
+
+    def __init__(self) -> None:
+        super().__init__("", SpanContext("0" * 32, "0" * 16, sampled=False))
+        self.end_ns = self.start_ns
+
+    @property
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        return None
+
+    def add_link(self, context: SpanContext, attributes: Optional[Mapping[str, Any]] = None) -> None:
+        return None
+
+    def set_status(self, code: int, message: str = "") -> None:
+        return None
+
+    def record_exception(self, exc: BaseException) -> None:
+        return None
+
+
+INVALID_SPAN: Span = _NonRecordingSpan()
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "sabine_current_span", default=None,
+)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+# =============================================================================
+# Exporters
+# =============================================================================
+
+class SpanExporter:
+    """Receives finished spans.  The base class drops them."""
+
+    def export(self, spans: List[Span]) -> None:
+        return None
+
+    def shutdown(self) -> None:
+        return None
+
+
+class _OTLPJsonLinesExporter(SpanExporter, ABC):
+    """Writes one OTLP/JSON ``ExportTraceServiceRequest`` per line."""
+
+    def __init__(self, service_name: str) -> None:
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def _encode(self, spans: List[Span]) -> str:
+        return json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({
+                    "service.name": self.service_name,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": "sabine.tracing"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }],
+        }, separators=(",", ":"), default=str)
+
+    @abstractmethod
+    def _write(self, line: str) -> None:
+        """Write one encoded line (called under the exporter lock)."""
+
+    def export(self, spans: List[Span]) -> None:
+        if not spans:
+            return
+        line = self._encode(spans)
+        with self._lock:
+            self._write(line)
+
+
+class ConsoleSpanExporter(_OTLPJsonLinesExporter):
+    """OTLP/JSON lines on stdout (or another text stream)."""
+
+    def __init__(self, service_name: str = "sabine-api", stream: Optional[TextIO] = None) -> None:
+        super().__init__(service_name)
+        self.stream = stream or sys.stdout
+
+    def _write(self, line: str) -> None:
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+class FileSpanExporter(_OTLPJsonLinesExporter):
+    """
+    OTLP/JSON lines appended to a file.
+
+    Each export is written and flushed immediately: rq work horses leave
+    through ``os._exit``, so anything still buffered would be lost.
+    """
+
+    def __init__(self, path: str, service_name: str = "sabine-api") -> None:
+        super().__init__(service_name)
+        self.path = path
+        self._file: Optional[TextIO] = None
+        self._pid: Optional[int] = None
+
+    def _write(self, line: str) -> None:
+        # Reopen after fork so parent and child never share a buffer.
+        if self._file is None or self._pid != os.getpid():
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._pid = os.getpid()
+        self._file.write(line + "\n")
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._file.close()
+            self._file = None
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps finished spans in a list; for tests."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def by_name(self, name: str) -> List[Span]:
+        return [span for span in self.spans if span.name == name]
+
+
+# =============================================================================
+# Tracer
+# =============================================================================
+
+class Tracer:
+    """
+    Creates spans and forwards finished ones to an exporter.
+
+    Parameters
+    ----------
+    exporter : SpanExporter, optional
+        Where finished spans go.  ``None`` drops them (IDs still propagate).
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None) -> None:
+        self.exporter = exporter
+
+    def _new_span(
+        self,
+        name: str,
+        kind: str,
+        attributes: Optional[Mapping[str, Any]],
+        parent: Optional[SpanContext],
+        links: Optional[List[Tuple[SpanContext, Dict[str, Any]]]],
+    ) -> Span:
+        if parent is None:
+            current = _current_span.get()
+            if current is not None:
+                parent = current.context
+        context = SpanContext(
+            trace_id=parent.trace_id if parent else _new_trace_id(),
+            span_id=_new_span_id(),
+            sampled=parent.sampled if parent else True,
+        )
+        return Span(
+            name,
+            context,
+            parent_span_id=parent.span_id if parent else None,
+            kind=kind,
+            attributes=attributes,
+            links=links,
+            tracer=self,
+        )
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Mapping[str, Any]] = None,
+        kind: str = SPAN_KIND_INTERNAL,
+        parent: Optional[SpanContext] = None,
+        links: Optional[List[Tuple[SpanContext, Dict[str, Any]]]] = None,
+    ) -> Generator[Span, None, None]:
+        """
+        Run the ``with`` block inside a new span.
+
+        The span is the child of ``parent`` if given (a remote context),
+        otherwise of the current span, otherwise it starts a new trace.
+        Exceptions are recorded on the span and re-raised.
+        """
+        span = self._new_span(name, kind, attributes, parent, links)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def start_detached_span(
+        self,
+        name: str,
+        attributes: Optional[Mapping[str, Any]] = None,
+        kind: str = SPAN_KIND_INTERNAL,
+        parent: Optional[SpanContext] = None,
+    ) -> Span:
+        """
+        Start a span without making it current; the caller must ``end()`` it.
+
+        For work whose start and end arrive as separate callbacks (LangChain
+        run events), where a ``with`` block is not possible.
+        """
+        return self._new_span(name, kind, attributes, parent, None)
+
+    def _on_end(self, span: Span) -> None:
+        exporter = self.exporter
+        if exporter is None or not span.context.sampled:
+            return
+        try:
+            exporter.export([span])
+        except Exception as exc:
+            logger.debug("Span export failed (non-fatal): %s", exc)
+
+
+# =============================================================================
+# Module-level API
+# =============================================================================
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def _exporter_from_env() -> Optional[SpanExporter]:
+    kind = os.getenv("TRACING_EXPORTER", "none").strip().lower()
+    service_name = os.getenv("TRACING_SERVICE_NAME", "sabine-api")
+    if kind == "stdout":
+        return ConsoleSpanExporter(service_name=service_name)
+    if kind == "file":
+        path = os.getenv("TRACING_FILE_PATH", "traces.jsonl")
+        return FileSpanExporter(path, service_name=service_name)
+    if kind not in ("", "none"):
+        logger.warning("Unknown TRACING_EXPORTER=%r; tracing export disabled", kind)
+    return None
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer, configured from the environment on first use."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(_exporter_from_env())
+    return _tracer
+
+
+def configure_tracing(exporter: Optional[SpanExporter] = None) -> Tracer:
+    """
+    Replace the process-wide tracer.
+
+    Parameters
+    ----------
+    exporter : SpanExporter, optional
+        Exporter to use; ``None`` re-reads the environment.
+
+    Returns
+    -------
+    Tracer
+    """
+    global _tracer
+    with _tracer_lock:
+        old = _tracer
+        _tracer = Tracer(exporter if exporter is not None else _exporter_from_env())
+    if old is not None and old.exporter is not None and old.exporter is not _tracer.exporter:
+        old.exporter.shutdown()
+    return _tracer
+
+
+def shutdown_tracing() -> None:
+    """Close the exporter (flushes and closes trace files)."""
+    tracer = _tracer
+    if tracer is not None and tracer.exporter is not None:
+        tracer.exporter.shutdown()
+
+
+def start_span(
+    name: str,
+    attributes: Optional[Mapping[str, Any]] = None,
+    kind: str = SPAN_KIND_INTERNAL,
+    parent: Optional[SpanContext] = None,
+    links: Optional[List[Tuple[SpanContext, Dict[str, Any]]]] = None,
+) -> ContextManager[Span]:
+    """:meth:`Tracer.start_span` on the process-wide tracer."""
+    return get_tracer().start_span(name, attributes=attributes, kind=kind, parent=parent, links=links)
+
+
+def current_span() -> Span:
+    """The active span, or :data:`INVALID_SPAN` (which ignores writes)."""
+    return _current_span.get() or INVALID_SPAN
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.context.trace_id if span is not None else None
+
+
+def inject(carrier: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Write the current span's ``traceparent`` into ``carrier``.
+
+    Returns the carrier (a new dict if none was given); unchanged when
+    there is no active span.
+    """
+    carrier = {} if carrier is None else carrier
+    span = _current_span.get()
+    if span is not None:
+        carrier[TRACEPARENT_HEADER] = span.context.to_traceparent()
+    return carrier
+
+
+def extract(carrier: Optional[Mapping[str, Any]]) -> Optional[SpanContext]:
+    """Read a remote parent from a carrier written by :func:`inject`."""
+    if not carrier:
+        return None
+    return SpanContext.from_traceparent(carrier.get(TRACEPARENT_HEADER))
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def traced(
+    name: Optional[str] = None,
+    kind: str = SPAN_KIND_INTERNAL,
+) -> Callable[[F], F]:
+    """
+    Decorator running each call of a sync or async function in a span.
+
+    Parameters
+    ----------
+    name : str, optional
+        Span name; defaults to ``module.qualname``.
+    kind : str
+        Span kind.
+    """
+    def decorator(func: F) -> F:
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with get_tracer().start_span(span_name, kind=kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with get_tracer().start_span(span_name, kind=kind):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def bind_context(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Bind ``func`` to the caller's context (and so its current span).
+
+    Only needed for thread hand-offs that do not copy context, such as
+    ``loop.run_in_executor``; ``asyncio.to_thread`` already does.
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return ctx.run(func, *args, **kwargs)
+    return wrapper
+
+
+# =============================================================================
+# ASGI Middleware
+# =============================================================================
+
+class TraceMiddleware:
+    """
+    Pure ASGI middleware opening a SERVER span per HTTP request.
+
+    Continues the caller's trace when a valid ``traceparent`` header is
+    present and returns the request span's ``traceparent`` and
+    ``X-Trace-Id`` headers, so a client can look up its request.
+    Streaming responses stay inside the span until the body is sent.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for key, value in scope.get("headers") or ():
+            if key.lower() == b"traceparent":
+                parent = SpanContext.from_traceparent(value.decode("latin-1"))
+                break
+
+        method = scope.get("method", "GET")
+        path = scope.get("path", "")
+        with get_tracer().start_span(
+            f"{method} {path}",
+            kind=SPAN_KIND_SERVER,
+            parent=parent,
+            attributes={"http.request.method": method, "url.path": path},
+        ) as span:
+            async def send_with_trace(message: Dict[str, Any]) -> None:
+                if message.get("type") == "http.response.start":
+                    status = int(message.get("status", 0))
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_status(STATUS_ERROR, f"HTTP {status}")
+                    headers = list(message.get("headers") or [])
+                    headers.append((b"traceparent", span.context.to_traceparent().encode("latin-1")))
+                    headers.append((b"x-trace-id", span.context.trace_id.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                # Starlette records the matched route in the scope; name
+                # the span by template so spans group across IDs.
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
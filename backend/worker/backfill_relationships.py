@@ -2,15 +2,42 @@
 Backfill Entity Relationships from Existing Memories
 =====================================================
 
-Batch job to extract entity relationships from memories that already
-have ``entity_links`` populated.  For each memory with 2+ linked entities,
-this job:
+Streaming job to extract entity relationships from memories that already
+have ``entity_links`` populated.  The job walks the ``memories`` table with
+keyset cursors and, for each page:
 
-1. Looks up entity names from UUIDs in the ``entities`` table
+1. Looks up entity names for every linked UUID in the page (chunked queries)
 2. Calls ``extract_relationships()`` (Haiku-based extraction) from slow_path
-3. Builds a name-to-UUID mapping for the looked-up entities
-4. Stores relationships via ``store_relationships()`` in the MAGMA layer
-5. Checkpoints progress for crash recovery
+   for each memory with 2+ linked entities
+3. Stores relationships via ``store_relationships()`` in the MAGMA layer
+4. Advances a persisted high-water mark
+
+High-water marks
+----------------
+Each run makes two keyset passes per shard, each with its own mark:
+
+- ``created_at``: memories inserted since the previous run.
+- ``entity_links_updated_at``: memories re-linked since the previous run.
+  The column is stamped by a trigger only when ``entity_links`` changes
+  (migration ``20260225000000_memory_entity_links_marker.sql``).
+
+``updated_at`` is deliberately not used: every write bumps it, including
+the nightly salience rewrite of every row, which would re-send the whole
+corpus through Haiku on each run.  Re-linked memories that are also newer
+than the run's starting ``created_at`` mark are left to the first pass.
+
+The last processed ``(column, id)`` of each pass is stored in Redis (no
+TTL).  A crash mid-run (including rq's job timeout) loses at most one
+checkpoint interval of work; the retry or the next scheduled run picks up
+from there.  Pass ``full_rescan=True`` to ignore the stored marks.
+
+Key schema: ``sabine:backfill:relationships:hwm:{column}:{shard_index}of{shard_count}``
+
+Sharding
+--------
+``shard_count`` workers can split the UUID space into equal contiguous
+``id`` ranges; each worker passes its own ``shard_index`` and keeps its
+own high-water mark.
 
 The job is idempotent thanks to the UNIQUE constraint on
 ``entity_relationships(source_entity_id, target_entity_id, relationship_type)``.
@@ -19,9 +46,11 @@ ADR Reference: ADR-001 (entity_relationships schema)
 """
 
 import asyncio
+import json
 import logging
 import time
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
 logger = logging.getLogger(__name__)
@@ -29,11 +58,29 @@ logger = logging.getLogger(__name__)
 # Cost estimate per Haiku call for tracking
 _ESTIMATED_COST_PER_CALL: float = 0.00003
 
+# Redis key prefix for persisted high-water marks
+_HWM_PREFIX: str = "sabine:backfill:relationships:hwm"
+
+# Exclusive upper bound of the UUID space (2**128)
+_UUID_SPACE: int = 1 << 128
+
+# Keyset passes, in run order: new memories, then re-linked memories
+_CREATED_COLUMN: str = "created_at"
+_RELINK_COLUMN: str = "entity_links_updated_at"
+_CURSOR_COLUMNS: Tuple[str, ...] = (_CREATED_COLUMN, _RELINK_COLUMN)
+
+# Entity ids per ``.in_`` lookup (keeps the PostgREST URL bounded)
+_ENTITY_LOOKUP_CHUNK: int = 200
+
 
 def backfill_entity_relationships(
     batch_size: int = 500,
     checkpoint_interval: int = 100,
     dry_run: bool = False,
+    max_memories: Optional[int] = None,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    full_rescan: bool = False,
 ) -> Dict[str, Any]:
     """
     Backfill entity_relationships from existing memories.
@@ -44,274 +91,580 @@ def backfill_entity_relationships(
     Parameters
     ----------
     batch_size : int
-        Maximum number of memories to process in this run.
+        Page size for the keyset scan.
     checkpoint_interval : int
-        Save a checkpoint every N entries for crash recovery.
+        Persist the high-water mark every N memories for crash recovery.
     dry_run : bool
-        If True, log what would be done without storing relationships.
+        If True, log what would be done without storing relationships
+        or advancing the high-water mark.
+    max_memories : int, optional
+        Stop after scanning this many memories (``None`` = whole shard).
+    shard_index : int
+        Zero-based index of this worker's shard.
+    shard_count : int
+        Total number of shards the ``id`` space is split into.
+    full_rescan : bool
+        Ignore the stored high-water marks and start from the beginning.
 
     Returns
     -------
     dict
         Summary with keys: total_memories, processed, relationships_stored,
-        errors, estimated_cost, elapsed_ms.
+        errors, estimated_cost, estimated_remaining_cost, high_water_mark
+        (one cursor per keyset column), shard, elapsed_ms.
     """
     return asyncio.run(
         _async_backfill(
             batch_size=batch_size,
             checkpoint_interval=checkpoint_interval,
             dry_run=dry_run,
+            max_memories=max_memories,
+            shard_index=shard_index,
+            shard_count=shard_count,
+            full_rescan=full_rescan,
         )
     )
 
 
+# ---------------------------------------------------------------------------
+# Sharding and high-water mark helpers
+# ---------------------------------------------------------------------------
+
+def shard_id_range(
+    shard_index: int,
+    shard_count: int,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return the ``[lower, upper)`` UUID bounds for a shard.
+
+    Postgres compares UUIDs bytewise, which matches the ordering of
+    their canonical hex strings, so contiguous integer ranges over the
+    128-bit space map to contiguous ``id`` ranges.
+
+    Parameters
+    ----------
+    shard_index : int
+        Zero-based shard index.
+    shard_count : int
+        Total number of shards (>= 1).
+
+    Returns
+    -------
+    tuple[str | None, str | None]
+        ``(lower_inclusive, upper_exclusive)``; ``None`` means unbounded.
+
+    Raises
+    ------
+    ValueError
+        If the shard parameters are out of range.
+    """
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(
+            f"Invalid shard {shard_index} of {shard_count}"
+        )
+    step = _UUID_SPACE // shard_count
+    lower = None if shard_index == 0 else str(UUID(int=shard_index * step))
+    upper = (
+        None if shard_index == shard_count - 1
+        else str(UUID(int=(shard_index + 1) * step))
+    )
+    return lower, upper
+
+
+def _hwm_key(shard_index: int, shard_count: int, column: str = _CREATED_COLUMN) -> str:
+    """Redis key for a shard's high-water mark on ``column``."""
+    return f"{_HWM_PREFIX}:{column}:{shard_index}of{shard_count}"
+
+
+def load_high_water_mark(
+    shard_index: int = 0,
+    shard_count: int = 1,
+    redis_client: Optional[Any] = None,
+    column: str = _CREATED_COLUMN,
+) -> Optional[Dict[str, Any]]:
+    """
+    Load the persisted ``(column, id)`` cursor for a shard.
+
+    Returns
+    -------
+    dict or None
+        ``{column: ..., "id": ..., "saved_at": ...}`` or ``None`` when no
+        mark exists or Redis is unreachable.
+    """
+    try:
+        if redis_client is None:
+            from backend.services.redis_client import get_redis_client
+            redis_client = get_redis_client()
+        raw = redis_client.get(_hwm_key(shard_index, shard_count, column))
+        return json.loads(raw) if raw else None
+    except Exception as exc:
+        logger.warning(
+            "Failed to load backfill %s high-water mark for shard %d/%d: %s",
+            column, shard_index, shard_count, exc,
+        )
+        return None
+
+
+def save_high_water_mark(
+    value: str,
+    memory_id: str,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    redis_client: Optional[Any] = None,
+    column: str = _CREATED_COLUMN,
+) -> None:
+    """
+    Persist the ``(column, id)`` cursor for a shard (no TTL).
+
+    Failures are logged, not raised: losing a mark only means the next
+    run repeats some idempotent work.
+    """
+    payload = {
+        column: value,
+        "id": memory_id,
+        "saved_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        if redis_client is None:
+            from backend.services.redis_client import get_redis_client
+            redis_client = get_redis_client()
+        redis_client.set(_hwm_key(shard_index, shard_count, column), json.dumps(payload))
+    except Exception as exc:
+        logger.warning(
+            "Failed to save backfill %s high-water mark for shard %d/%d: %s",
+            column, shard_index, shard_count, exc,
+        )
+
+
+def _base_query(
+    client: Any,
+    columns: str,
+    id_range: Tuple[Optional[str], Optional[str]],
+    count: Optional[str] = None,
+    column: str = _CREATED_COLUMN,
+) -> Any:
+    """Memories with entity links, not archived, inside the shard range."""
+    query = (
+        client.table("memories")
+        .select(columns, count=count)
+        .neq("entity_links", "{}")
+        .eq("is_archived", False)
+    )
+    if column != _CREATED_COLUMN:
+        query = query.not_.is_(column, "null")
+    lower, upper = id_range
+    if lower is not None:
+        query = query.gte("id", lower)
+    if upper is not None:
+        query = query.lt("id", upper)
+    return query
+
+
+def _apply_cursor(
+    query: Any,
+    cursor: Optional[Dict[str, Any]],
+    column: str = _CREATED_COLUMN,
+) -> Any:
+    """Restrict a query to rows strictly after ``(column, id)``."""
+    if not cursor:
+        return query
+    ts = cursor[column]
+    return query.or_(
+        f"{column}.gt.{ts},and({column}.eq.{ts},id.gt.{cursor['id']})"
+    )
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    """Parse a PostgREST timestamp (``None`` passes through)."""
+    return datetime.fromisoformat(value) if value else None
+
+
+def _created_after(memory: Dict[str, Any], mark: Optional[datetime]) -> bool:
+    """
+    True if the ``created_at`` pass owns this memory.
+
+    With no mark (first run or full rescan) the ``created_at`` pass walks
+    every memory, so it owns them all.
+    """
+    if mark is None:
+        return True
+    created = _parse_ts(memory.get(_CREATED_COLUMN))
+    return created is not None and created > mark
+
+
+def _fetch_page(
+    client: Any,
+    id_range: Tuple[Optional[str], Optional[str]],
+    cursor: Optional[Dict[str, Any]],
+    page_size: int,
+    column: str = _CREATED_COLUMN,
+) -> List[Dict[str, Any]]:
+    """Fetch the next keyset page ordered by ``(column, id)``."""
+    query = _base_query(
+        client,
+        f"id, content, entity_links, metadata, {_CREATED_COLUMN}, {_RELINK_COLUMN}",
+        id_range,
+        column=column,
+    )
+    response = (
+        _apply_cursor(query, cursor, column)
+        .order(column)
+        .order("id")
+        .limit(page_size)
+        .execute()
+    )
+    return response.data or []
+
+
+def _count_remaining(
+    client: Any,
+    id_range: Tuple[Optional[str], Optional[str]],
+    cursor: Optional[Dict[str, Any]],
+    column: str = _CREATED_COLUMN,
+) -> Optional[int]:
+    """Exact count of memories left in one keyset pass (``None`` on failure)."""
+    try:
+        query = _base_query(client, "id", id_range, count="exact", column=column)
+        response = _apply_cursor(query, cursor, column).limit(1).execute()
+        return response.count
+    except Exception as exc:
+        logger.warning("Backfill remaining-count query failed: %s", exc)
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Main loop
+# ---------------------------------------------------------------------------
+
 async def _async_backfill(
     batch_size: int = 500,
     checkpoint_interval: int = 100,
     dry_run: bool = False,
+    max_memories: Optional[int] = None,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    full_rescan: bool = False,
 ) -> Dict[str, Any]:
     """
     Async implementation of entity relationship backfill.
 
-    Process:
-        1. Query memories that have entity_links (non-empty array)
-        2. For each memory, get its linked entities
-        3. If memory has 2+ entities, extract relationships via Haiku
-        4. Resolve entity names to UUIDs
+    Process, once per keyset column (``created_at``, then
+    ``entity_links_updated_at``):
+        1. Load the shard's high-water mark (unless ``full_rescan``)
+        2. Fetch the next keyset page of memories with entity_links
+        3. Look up all linked entities for the page in one query
+        4. For each memory with 2+ entities, extract relationships via Haiku
         5. Store relationships via store_relationships()
-        6. Checkpoint every N entries for crash recovery
+        6. Persist the high-water mark every N memories and at page end
+        7. Repeat until the shard is exhausted or ``max_memories`` is hit
 
     Parameters
     ----------
     batch_size : int
-        Maximum memories to process.
+        Keyset page size.
     checkpoint_interval : int
-        Checkpoint frequency.
+        High-water-mark persistence frequency (memories).
     dry_run : bool
-        If True, skip actual storage.
+        If True, skip storage and leave the high-water mark untouched.
+    max_memories : int, optional
+        Cap on memories scanned in this run.
+    shard_index, shard_count : int
+        Shard selection (see :func:`shard_id_range`).
+    full_rescan : bool
+        Ignore the stored high-water marks.
 
     Returns
     -------
     dict
         ``{"total_memories": N, "processed": M, "relationships_stored": R,
-          "errors": [...], "estimated_cost": float, "elapsed_ms": float}``
+          "errors": [...], "estimated_cost": float,
+          "estimated_remaining_cost": float,
+          "high_water_mark": {column: {...}},
+          "shard": "i/n", "elapsed_ms": float}``
     """
     # Lazy imports to avoid circular dependencies
-    from backend.worker.checkpoint import CheckpointManager
     from backend.worker.slow_path import extract_relationships
     from backend.magma.store import store_relationships
     from backend.services.wal import get_supabase_client
 
     start: float = time.monotonic()
-    batch_id: str = f"backfill-rel-{int(time.time())}"
-    checkpoint_mgr = CheckpointManager(batch_id=batch_id)
+    id_range = shard_id_range(shard_index, shard_count)
+    shard_label = f"{shard_index}/{shard_count}"
+    page_size: int = max(1, batch_size)
 
-    # --- 1. Query memories with entity_links ---
     client = get_supabase_client()
 
+    cursors: Dict[str, Optional[Dict[str, Any]]] = {
+        column: (
+            None if full_rescan
+            else load_high_water_mark(shard_index, shard_count, column=column)
+        )
+        for column in _CURSOR_COLUMNS
+    }
+    # Re-linked memories created after this mark are covered by the
+    # created_at pass (this run or a later one)
+    created_start: Optional[datetime] = _parse_ts(
+        (cursors[_CREATED_COLUMN] or {}).get(_CREATED_COLUMN)
+    )
+
     logger.info(
-        "Backfill START  batch_size=%d  checkpoint_interval=%d  dry_run=%s",
-        batch_size,
+        "Backfill START  shard=%s  page_size=%d  max_memories=%s  "
+        "checkpoint_interval=%d  dry_run=%s  resume_from=%s",
+        shard_label,
+        page_size,
+        max_memories,
         checkpoint_interval,
         dry_run,
+        cursors,
     )
 
-    try:
-        response = (
-            client.table("memories")
-            .select("id, content, entity_links, metadata")
-            .neq("entity_links", "{}")
-            .eq("is_archived", False)
-            .order("created_at")
-            .limit(batch_size)
-            .execute()
+    remaining_at_start: Optional[int] = 0
+    for column in _CURSOR_COLUMNS:
+        count = _count_remaining(client, id_range, cursors[column], column)
+        remaining_at_start = (
+            None if count is None or remaining_at_start is None
+            else remaining_at_start + count
         )
-    except Exception as exc:
-        logger.error("Failed to query memories for backfill: %s", exc, exc_info=True)
-        return {
-            "total_memories": 0,
-            "processed": 0,
-            "relationships_stored": 0,
-            "errors": [str(exc)],
-            "estimated_cost": 0.0,
-            "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
-        }
-
-    memories: List[Dict[str, Any]] = response.data or []
-    total: int = len(memories)
-
-    logger.info("Found %d memories with entity_links", total)
-
-    if total == 0:
-        elapsed_ms = (time.monotonic() - start) * 1000
-        return {
-            "total_memories": 0,
-            "processed": 0,
-            "relationships_stored": 0,
-            "errors": [],
-            "estimated_cost": 0.0,
-            "elapsed_ms": round(elapsed_ms, 1),
-        }
-
-    # --- 2. Resume from checkpoint if available ---
-    resume_index: int = 0
+    if remaining_at_start is not None:
+        logger.info(
+            "Backfill shard %s: %d memories to scan (upper-bound cost $%.5f)",
+            shard_label,
+            remaining_at_start,
+            remaining_at_start * _ESTIMATED_COST_PER_CALL,
+        )
+
+    scanned: int = 0
     processed: int = 0
     relationships_stored: int = 0
     haiku_calls: int = 0
     errors: List[str] = []
+    since_checkpoint: int = 0
+
+    def _checkpoint(column: str) -> None:
+        cursor = cursors[column]
+        if not dry_run and cursor:
+            save_high_water_mark(
+                cursor[column], cursor["id"], shard_index, shard_count,
+                column=column,
+            )
 
-    existing_checkpoint = checkpoint_mgr.load()
-    if existing_checkpoint is not None:
-        resume_index = existing_checkpoint.get("last_processed_index", -1) + 1
-        processed = existing_checkpoint.get("processed", 0)
-        relationships_stored = existing_checkpoint.get("relationships_stored", 0)
-        haiku_calls = existing_checkpoint.get("haiku_calls", 0)
-        logger.info(
-            "Resuming backfill from index %d (processed=%d, stored=%d)",
-            resume_index,
-            processed,
-            relationships_stored,
-        )
-
-    # --- 3. Process each memory ---
-    for i in range(resume_index, total):
-        memory = memories[i]
-        memory_id: str = memory.get("id", "")
-        content: str = memory.get("content", "")
-        entity_link_ids: List[str] = memory.get("entity_links", [])
-
-        if len(entity_link_ids) < 2:
-            processed += 1
-            continue
+    for column in _CURSOR_COLUMNS:
+        failed = False
+        while max_memories is None or scanned < max_memories:
+            limit = page_size
+            if max_memories is not None:
+                limit = min(limit, max_memories - scanned)
 
-        # --- 3a. Look up entity details from UUIDs ---
-        try:
-            entity_details = await _lookup_entities(client, entity_link_ids)
-        except Exception as exc:
-            error_msg = f"Entity lookup failed for memory {memory_id}: {exc}"
-            logger.warning(error_msg)
-            errors.append(error_msg)
-            processed += 1
-            continue
-
-        if len(entity_details) < 2:
-            processed += 1
-            continue
-
-        # Build the entity list for extract_relationships
-        entities_list: List[Dict[str, Any]] = [
-            {"name": e["name"], "type": e.get("type", "unknown")}
-            for e in entity_details
-        ]
-
-        # Build name -> UUID mapping
-        name_to_id: Dict[str, UUID] = {}
-        for e in entity_details:
             try:
-                name_to_id[e["name"].strip()] = UUID(e["id"])
-            except (ValueError, KeyError, TypeError):
-                pass
-
-        # --- 3b. Extract relationships via Haiku ---
-        try:
-            relationships = extract_relationships(
-                message=content,
-                entities=entities_list,
-                source_wal_id=memory_id,
-            )
-            haiku_calls += 1
-        except Exception as exc:
-            error_msg = f"Relationship extraction failed for memory {memory_id}: {exc}"
-            logger.warning(error_msg)
-            errors.append(error_msg)
-            processed += 1
-            continue
-
-        if not relationships:
-            processed += 1
-            continue
-
-        # --- 3c. Store relationships ---
-        if dry_run:
-            logger.info(
-                "DRY RUN: would store %d relationships for memory %s",
-                len(relationships),
-                memory_id,
-            )
-            relationships_stored += len(relationships)
-        else:
-            try:
-                stored = await store_relationships(
-                    relationships=relationships,
-                    entity_name_to_id=name_to_id,
-                    source_wal_id=memory_id,
+                memories = _fetch_page(client, id_range, cursors[column], limit, column)
+            except Exception as exc:
+                logger.error(
+                    "Failed to query memories for backfill (shard %s, %s): %s",
+                    shard_label, column, exc, exc_info=True,
                 )
-                relationships_stored += stored.get("stored", 0)
+                errors.append(str(exc))
+                failed = True
+                break
+
+            if not memories:
+                break
+
+            if column == _RELINK_COLUMN:
+                pending = [m for m in memories if not _created_after(m, created_start)]
+            else:
+                pending = memories
+
+            # --- Look up every linked entity in the page with one query ---
+            page_entity_ids: List[str] = sorted({
+                eid for m in pending for eid in (m.get("entity_links") or [])
+            })
+            try:
+                entity_by_id: Dict[str, Dict[str, Any]] = {
+                    str(e["id"]): e
+                    for e in await _lookup_entities(client, page_entity_ids)
+                }
             except Exception as exc:
-                error_msg = f"store_relationships failed for memory {memory_id}: {exc}"
+                error_msg = f"Entity lookup failed for page after {cursors[column]}: {exc}"
                 logger.warning(error_msg)
                 errors.append(error_msg)
-
-        processed += 1
-
-        # --- 3d. Log progress ---
-        if (i + 1) % 100 == 0 or i == total - 1:
+                failed = True
+                break
+
+            for memory in memories:
+                memory_id: str = memory.get("id", "")
+                scanned += 1
+                cursors[column] = {column: memory.get(column), "id": memory_id}
+
+                if column == _RELINK_COLUMN and _created_after(memory, created_start):
+                    continue
+
+                stored, called, error_msg = await _process_memory(
+                    memory,
+                    entity_by_id,
+                    extract_relationships,
+                    store_relationships,
+                    dry_run,
+                )
+                processed += 1
+                relationships_stored += stored
+                haiku_calls += called
+                if error_msg:
+                    errors.append(error_msg)
+
+                since_checkpoint += 1
+                if since_checkpoint >= checkpoint_interval:
+                    _checkpoint(column)
+                    since_checkpoint = 0
+
+            _checkpoint(column)
+            since_checkpoint = 0
+
+            remaining = (
+                None if remaining_at_start is None
+                else max(0, remaining_at_start - scanned)
+            )
             logger.info(
-                "Backfill progress: %d/%d memories  relationships=%d  "
-                "haiku_calls=%d  errors=%d",
-                i + 1,
-                total,
+                "Backfill progress shard=%s pass=%s: scanned=%d  remaining=%s  "
+                "relationships=%d  haiku_calls=%d  errors=%d  cost=$%.5f",
+                shard_label,
+                column,
+                scanned,
+                remaining if remaining is not None else "?",
                 relationships_stored,
                 haiku_calls,
                 len(errors),
+                haiku_calls * _ESTIMATED_COST_PER_CALL,
             )
 
-        # --- 3e. Checkpoint periodically ---
-        if (i + 1) % checkpoint_interval == 0 or i == total - 1:
-            checkpoint_mgr.save(
-                last_processed_index=i,
-                metadata={
-                    "processed": processed,
-                    "relationships_stored": relationships_stored,
-                    "haiku_calls": haiku_calls,
-                    "errors_count": len(errors),
-                    "remaining": total - (i + 1),
-                },
-            )
+            if len(memories) < limit:
+                break
 
-    # --- 4. Cleanup ---
-    checkpoint_mgr.clear()
+        if failed:
+            break
 
     elapsed_ms = (time.monotonic() - start) * 1000
     estimated_cost = haiku_calls * _ESTIMATED_COST_PER_CALL
 
+    # Project remaining cost from the observed Haiku-call rate
+    remaining_after: Optional[int] = (
+        None if remaining_at_start is None
+        else max(0, remaining_at_start - scanned)
+    )
+    call_rate = (haiku_calls / scanned) if scanned else 1.0
+    estimated_remaining_cost = (
+        round((remaining_after or 0) * call_rate * _ESTIMATED_COST_PER_CALL, 5)
+    )
+
     result: Dict[str, Any] = {
-        "total_memories": total,
+        "total_memories": scanned,
         "processed": processed,
         "relationships_stored": relationships_stored,
         "haiku_calls": haiku_calls,
         "errors": errors[:50],  # Cap error list to avoid oversized responses
         "error_count": len(errors),
         "estimated_cost": round(estimated_cost, 5),
+        "estimated_remaining_cost": estimated_remaining_cost,
+        "remaining_memories": remaining_after,
+        "high_water_mark": cursors,
+        "shard": shard_label,
         "dry_run": dry_run,
         "elapsed_ms": round(elapsed_ms, 1),
     }
 
     logger.info(
-        "Backfill DONE: total=%d  processed=%d  relationships=%d  "
-        "haiku_calls=%d  errors=%d  cost=$%.5f  elapsed=%.0fms",
-        total,
-        processed,
+        "Backfill DONE: shard=%s  scanned=%d  relationships=%d  "
+        "haiku_calls=%d  errors=%d  cost=$%.5f  remaining=%s  elapsed=%.0fms",
+        shard_label,
+        scanned,
         relationships_stored,
         haiku_calls,
         len(errors),
         estimated_cost,
+        remaining_after if remaining_after is not None else "?",
         elapsed_ms,
     )
 
     return result
 
 
+async def _process_memory(
+    memory: Dict[str, Any],
+    entity_by_id: Dict[str, Dict[str, Any]],
+    extract_relationships: Any,
+    store_relationships: Any,
+    dry_run: bool,
+) -> Tuple[int, int, Optional[str]]:
+    """
+    Extract and store relationships for one memory.
+
+    Returns
+    -------
+    tuple[int, int, str | None]
+        ``(relationships_stored, haiku_calls, error_message)``
+    """
+    memory_id: str = memory.get("id", "")
+    content: str = memory.get("content", "")
+    entity_link_ids: List[str] = memory.get("entity_links") or []
+
+    if len(entity_link_ids) < 2:
+        return 0, 0, None
+
+    entity_details = [
+        entity_by_id[str(eid)] for eid in entity_link_ids
+        if str(eid) in entity_by_id
+    ]
+    if len(entity_details) < 2:
+        return 0, 0, None
+
+    # Build the entity list for extract_relationships
+    entities_list: List[Dict[str, Any]] = [
+        {"name": e["name"], "type": e.get("type", "unknown")}
+        for e in entity_details
+    ]
+
+    # Build name -> UUID mapping
+    name_to_id: Dict[str, UUID] = {}
+    for e in entity_details:
+        try:
+            name_to_id[e["name"].strip()] = UUID(str(e["id"]))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+    try:
+        relationships = extract_relationships(
+            message=content,
+            entities=entities_list,
+            source_wal_id=memory_id,
+        )
+    except Exception as exc:
+        error_msg = f"Relationship extraction failed for memory {memory_id}: {exc}"
+        logger.warning(error_msg)
+        return 0, 0, error_msg
+
+    if not relationships:
+        return 0, 1, None
+
+    if dry_run:
+        logger.info(
+            "DRY RUN: would store %d relationships for memory %s",
+            len(relationships),
+            memory_id,
+        )
+        return len(relationships), 1, None
+
+    try:
+        stored = await store_relationships(
+            relationships=relationships,
+            entity_name_to_id=name_to_id,
+            source_wal_id=memory_id,
+        )
+        return stored.get("stored", 0), 1, None
+    except Exception as exc:
+        error_msg = f"store_relationships failed for memory {memory_id}: {exc}"
+        logger.warning(error_msg)
+        return 0, 1, error_msg
+
+
 async def _lookup_entities(
     client: Any,
     entity_ids: List[str],
@@ -319,6 +672,9 @@ async def _lookup_entities(
     """
     Look up entity details (name, type, id) from a list of entity UUIDs.
 
+    Queries in chunks of ``_ENTITY_LOOKUP_CHUNK`` ids so a page with many
+    links cannot exceed the PostgREST URL limit.
+
     Parameters
     ----------
     client : supabase.Client
@@ -343,19 +699,23 @@ async def _lookup_entities(
     if not valid_ids:
         return []
 
-    try:
-        response = (
-            client.table("entities")
-            .select("id, name, type, domain")
-            .in_("id", valid_ids)
-            .execute()
-        )
-        return response.data or []
-    except Exception as exc:
-        logger.error(
-            "Entity lookup failed for %d IDs: %s",
-            len(valid_ids),
-            exc,
-            exc_info=True,
-        )
-        raise
+    entities: List[Dict[str, Any]] = []
+    for start in range(0, len(valid_ids), _ENTITY_LOOKUP_CHUNK):
+        chunk = valid_ids[start:start + _ENTITY_LOOKUP_CHUNK]
+        try:
+            response = (
+                client.table("entities")
+                .select("id, name, type, domain")
+                .in_("id", chunk)
+                .execute()
+            )
+        except Exception as exc:
+            logger.error(
+                "Entity lookup failed for %d IDs: %s",
+                len(chunk),
+                exc,
+                exc_info=True,
+            )
+            raise
+        entities.extend(response.data or [])
+    return entities
@@ -28,7 +28,7 @@ import asyncio
 import logging
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from backend.worker.memory_guard import memory_profiled_job
 
@@ -262,23 +262,28 @@ def run_salience_recalculation() -> Dict[str, Any]:
 # ---------------------------------------------------------------------------
 
 @memory_profiled_job()
-def run_archive_job(threshold: float = 0.2) -> Dict[str, Any]:
+def run_archive_job(threshold: float = 0.2, user_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Archive memories whose salience has dropped below threshold.
 
     Designed to run as a nightly scheduled job after salience
     recalculation.  Delegates to
-    ``salience_job.archive_low_salience_memories()``.
+    ``salience_job.archive_low_salience_memories()``, which moves them
+    into ``archived_memories``.
 
     Parameters
     ----------
     threshold : float
         Salience score threshold.  Default: 0.2.
+    user_id : str, optional
+        Archive only this user's memories, with their archive config
+        (manual trigger).  Default: all users, global config.
 
     Returns
     -------
     dict
-        Summary with keys: archived_count, threshold, duration_ms.
+        Summary with keys: archived_count, scanned, by_type, threshold,
+        duration_ms.
     """
     logger.info("run_archive_job START  threshold=%.2f", threshold)
     start = time.monotonic()
@@ -287,7 +292,7 @@ def run_archive_job(threshold: float = 0.2) -> Dict[str, Any]:
         # Lazy import to avoid circular dependencies
         from backend.worker.salience_job import archive_low_salience_memories
 
-        result = archive_low_salience_memories(threshold=threshold)
+        result = archive_low_salience_memories(threshold=threshold, user_id=user_id)
         elapsed_ms = (time.monotonic() - start) * 1000.0
 
         _record_health()
@@ -324,13 +329,18 @@ def run_archive_job(threshold: float = 0.2) -> Dict[str, Any]:
 def run_backfill_job(
     batch_size: int = 500,
     dry_run: bool = False,
+    max_memories: Optional[int] = None,
+    shard_index: int = 0,
+    shard_count: int = 1,
+    full_rescan: bool = False,
 ) -> Dict[str, Any]:
     """
     Backfill entity relationships from existing memories.
 
-    Scans memories that have ``entity_links`` with 2+ entities, extracts
-    relationships via Claude Haiku, and stores them in the
-    ``entity_relationships`` table.
+    Walks memories that have ``entity_links`` with a keyset cursor,
+    resuming after the shard's stored high-water mark, extracts
+    relationships via Claude Haiku for memories with 2+ entities, and
+    stores them in the ``entity_relationships`` table.
 
     This job is idempotent: the UNIQUE constraint on the
     ``entity_relationships`` table handles deduplication on re-runs.
@@ -338,9 +348,17 @@ def run_backfill_job(
     Parameters
     ----------
     batch_size : int
-        Maximum number of memories to process in this run (default: 500).
+        Keyset page size (default: 500).
     dry_run : bool
         If True, log what would be done without actually storing (default: False).
+    max_memories : int, optional
+        Cap on memories scanned in this run (default: whole shard).
+    shard_index : int
+        Zero-based shard handled by this job (default: 0).
+    shard_count : int
+        Total number of id-range shards (default: 1).
+    full_rescan : bool
+        Ignore the stored high-water mark (default: False).
 
     Returns
     -------
@@ -349,9 +367,14 @@ def run_backfill_job(
         errors, estimated_cost, elapsed_ms.
     """
     logger.info(
-        "run_backfill_job START  batch_size=%d  dry_run=%s",
+        "run_backfill_job START  shard=%d/%d  batch_size=%d  "
+        "max_memories=%s  dry_run=%s  full_rescan=%s",
+        shard_index,
+        shard_count,
         batch_size,
+        max_memories,
         dry_run,
+        full_rescan,
     )
     start = time.monotonic()
 
@@ -364,6 +387,10 @@ def run_backfill_job(
         result = backfill_entity_relationships(
             batch_size=batch_size,
             dry_run=dry_run,
+            max_memories=max_memories,
+            shard_index=shard_index,
+            shard_count=shard_count,
+            full_rescan=full_rescan,
         )
         elapsed_ms = (time.monotonic() - start) * 1000.0
 
@@ -347,6 +347,21 @@ def run_worker() -> None:
     signal.signal(signal.SIGTERM, _shutdown_handler)
     signal.signal(signal.SIGINT, _shutdown_handler)
 
+    # Job metrics reach the API's /metrics/prometheus through Redis; each
+    # work horse flushes its deltas when its job finishes.
+    from backend.services.metrics import enable_redis_aggregation
+    enable_redis_aggregation()
+
+    # Worker LLM calls (Slow Path, backfill, salience) yield rate-limit
+    # budget to interactive /invoke traffic; work horses inherit this on fork.
+    from backend.services.rate_limiter import Priority, set_default_priority
+    set_default_priority(Priority.BACKGROUND)
+
+    # rq work horses exit via os._exit(), which skips the audit sink's
+    # shutdown flush, so jobs write audit rows synchronously.
+    from backend.services.audit_logging import set_audit_buffering
+    set_audit_buffering(False)
+
     # 6. Start the rq worker loop (blocking) --------------------------------
     worker = Worker(
         queues=[queue],
@@ -19,11 +19,14 @@ ADR Reference: ADR-002 / SLOW-005
 import functools
 import logging
 import time
-from typing import Any, Callable, Optional, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, TypeVar, cast
 
 import psutil
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    from backend.services.tracing import SpanContext
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -168,6 +171,43 @@ def _record_peak_memory(job_type: str, peak_mb: float) -> None:
         logger.debug("memory_guard: Redis peak recording failed (non-fatal): %s", exc)
 
 
+def _record_job_metrics(job_type: str, duration_s: float, status: str) -> None:
+    """
+    Observe the job duration and flush metrics to Redis.
+
+    The rq work horse exits right after the job, so this flush is the
+    only chance to publish what the job recorded.  Best-effort.
+    """
+    try:
+        from backend.services.metrics import RQ_JOB_SECONDS, flush_metrics
+
+        RQ_JOB_SECONDS.observe(duration_s, job=job_type, status=status)
+        flush_metrics()
+    except Exception as exc:
+        logger.debug("memory_guard: metrics recording failed (non-fatal): %s", exc)
+
+
+def _current_job_trace() -> Tuple[Optional[str], Optional["SpanContext"]]:
+    """
+    The running rq job's ID and the trace context stored in its meta.
+
+    ``(None, None)`` outside an rq work horse (e.g. when a job function is
+    called directly), so the job span then starts its own trace.
+    """
+    try:
+        from rq import get_current_job  # type: ignore[import-untyped]
+
+        from backend.services.tracing import extract
+
+        job = get_current_job()
+        if job is None:
+            return None, None
+        return job.id, extract(job.meta)
+    except Exception as exc:
+        logger.debug("memory_guard: trace context unavailable (non-fatal): %s", exc)
+        return None, None
+
+
 # ---------------------------------------------------------------------------
 # Decorator
 # ---------------------------------------------------------------------------
@@ -191,6 +231,10 @@ def memory_profiled_job(
            CRITICAL and raises ``MemoryLimitExceeded`` so rq marks the
            job as failed.
         5. Records peak RSS in Redis for historical analysis.
+        6. Observes the job duration in ``sabine_rq_job_seconds`` and
+           flushes the process's metrics to Redis.
+        7. Runs the job in a CONSUMER span continuing the trace the
+           producer stored in ``job.meta``.
 
     Parameters
     ----------
@@ -209,6 +253,19 @@ def memory_profiled_job(
 
         @functools.wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
+            # Resume the producer's trace from job.meta (see queue._enqueue_job)
+            from backend.services.tracing import SPAN_KIND_CONSUMER, start_span
+
+            job_id, parent = _current_job_trace()
+            with start_span(
+                f"rq.job {job_type}",
+                kind=SPAN_KIND_CONSUMER,
+                parent=parent,
+                attributes={"messaging.message.id": job_id},
+            ):
+                return run_job(*args, **kwargs)
+
+        def run_job(*args: Any, **kwargs: Any) -> Any:
             # --- Before ---
             before = get_memory_snapshot()
             logger.info(
@@ -228,6 +285,7 @@ def memory_profiled_job(
                     job_type, after.rss_mb, after.rss_mb - before.rss_mb,
                 )
                 _record_peak_memory(job_type, after.rss_mb)
+                _record_job_metrics(job_type, time.monotonic() - start_time, "error")
                 raise
 
             # --- After ---
@@ -268,6 +326,7 @@ def memory_profiled_job(
                     job_type, after.rss_mb, max_memory_mb,
                 )
                 _record_peak_memory(job_type, after.rss_mb)
+                _record_job_metrics(job_type, elapsed_ms / 1000.0, "error")
                 raise MemoryLimitExceeded(
                     current_mb=after.rss_mb,
                     limit_mb=float(max_memory_mb),
@@ -276,6 +335,9 @@ def memory_profiled_job(
             # --- Record peak in Redis ---
             _record_peak_memory(job_type, after.rss_mb)
 
+            failed = isinstance(result, dict) and result.get("status") == "failed"
+            _record_job_metrics(job_type, elapsed_ms / 1000.0, "failed" if failed else "success")
+
             return result
 
         return cast(F, wrapper)
@@ -10,12 +10,18 @@ Background jobs for the Sabine 2.0 memory lifecycle:
    large datasets.
 
 2. **archive_low_salience_memories()** (MEM-002)
-   Archives memories whose salience has fallen below a configurable
+   Moves memories whose salience has fallen below a configurable
    threshold, provided they also meet minimum age and access-count
-   criteria per ADR-004.
+   criteria per ADR-004, into ``archived_memories``.  Criteria are set
+   per memory type; a dry run reports what would move.
 
-Both functions are synchronous wrappers suitable for rq workers.
-They are registered as job handlers in ``backend/worker/jobs.py``.
+3. **restore_archived_memories()** (MEM-003)
+   Moves archived memories matching a predicate back into ``memories``.
+
+All are synchronous wrappers suitable for rq workers; the first two are
+registered as job handlers in ``backend/worker/jobs.py``.  Archival and
+restore are set-based RPCs (migration
+``20260223000000_set_based_memory_archival.sql``).
 
 PRD Reference: MEM-001, MEM-002
 ADR Reference: ADR-004 (cold storage archival trigger criteria)
@@ -23,7 +29,6 @@ ADR Reference: ADR-004 (cold storage archival trigger criteria)
 
 import logging
 import time
-from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
@@ -47,6 +52,13 @@ MAX_ARCHIVE_ACCESS_COUNT: int = 2
 # Checkpoint interval for batch recalculation
 CHECKPOINT_INTERVAL: int = 200
 
+# Rows scanned per archive_memory_chunk call (and restored per
+# restore_archived_memories call); each chunk is its own transaction
+ARCHIVE_CHUNK_SIZE: int = 500
+
+# Salience given to restored memories (the column default)
+RESTORE_SALIENCE: float = 0.5
+
 
 # =============================================================================
 # Nightly Batch Recalculation (MEM-001)
@@ -59,10 +71,12 @@ def recalculate_all_salience_scores() -> Dict[str, Any]:
     This is the synchronous entry point called by rq.  It:
         1. Queries all active (non-archived) memories from Supabase
         2. Determines the global max access_count for normalisation
-        3. Calculates salience for each memory using the formula
-        4. Batch-updates salience_score in Supabase
-        5. Uses CheckpointManager for crash recovery
-        6. Logs summary stats
+        3. Reads each memory's entity degree from ``entity_centrality``
+           (joined in SQL, batched) for the causal-centrality component
+        4. Calculates salience for each memory using the formula
+        5. Batch-updates salience_score in Supabase
+        6. Uses CheckpointManager for crash recovery
+        7. Logs summary stats
 
     Returns
     -------
@@ -128,6 +142,23 @@ def recalculate_all_salience_scores() -> Dict[str, Any]:
     )
     max_access_count = max(max_access_count, 1)  # floor at 1
 
+    # ------------------------------------------------------------------
+    # 3b. Entity degrees for causal centrality (one join per batch
+    #     instead of two COUNT queries per memory)
+    # ------------------------------------------------------------------
+    causal_degrees: Optional[Dict[str, int]] = None
+    try:
+        from backend.services.entity_centrality import load_memory_degrees
+
+        causal_degrees = load_memory_degrees(
+            client, [m["id"] for m in memories_data if m.get("entity_links")],
+        )
+    except Exception as exc:
+        logger.warning(
+            "Failed to load entity degrees from entity_centrality; "
+            "computing causal centrality per memory: %s", exc,
+        )
+
     # ------------------------------------------------------------------
     # 4. Check for existing checkpoint (crash recovery)
     # ------------------------------------------------------------------
@@ -174,6 +205,10 @@ def recalculate_all_salience_scores() -> Dict[str, Any]:
                 memory=memory_obj,
                 weights=weights,
                 max_access_count=max_access_count,
+                causal_degree=(
+                    causal_degrees.get(str(mem_data["id"]), 0)
+                    if causal_degrees is not None else None
+                ),
             )
 
             pending_updates.append({
@@ -244,25 +279,33 @@ def recalculate_all_salience_scores() -> Dict[str, Any]:
 
 def archive_low_salience_memories(
     threshold: float = DEFAULT_ARCHIVE_THRESHOLD,
+    dry_run: bool = False,
+    user_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
-    Archive memories with low salience scores.
+    Move low-salience memories into cold storage (``archived_memories``).
 
     Loads archive configuration from Redis (falling back to module-level
-    defaults) so that per-user overrides set via the Settings API are
-    respected at runtime.
+    defaults) so that overrides set via the Settings API are respected at
+    runtime.  A run scoped to ``user_id`` uses that user's config; an
+    all-users run uses the global config.
 
-    Criteria for archival (all must be met, per ADR-004):
+    Criteria for archival (all must be met, per ADR-004), evaluated with
+    the retention policy of the memory's type (see
+    ``build_retention_policies``):
         1. ``salience_score < threshold`` (default 0.2)
-        2. ``is_archived = false`` (not already archived)
-        3. ``access_count <= max_access_count`` (rarely accessed)
-        4. Memory is older than ``min_age_days`` days
+        2. ``access_count <= max_access_count`` (rarely accessed)
+        3. Memory is older than ``min_age_days`` days
 
-    Sets ``is_archived = true`` on matching memories.
+    Memories flagged ``is_archived`` by the previous job are moved too.
 
-    .. todo::
-        Phase 2: Move archived memories to ``archived_memories`` table
-        with Haiku-generated summaries and S3/R2 backup.
+    The work is done by the ``archive_memory_chunk`` RPC, one keyset chunk
+    of ``ARCHIVE_CHUNK_SIZE`` scanned rows per call: qualifying rows are
+    copied (embedding included) and deleted from ``memories`` in a single
+    statement.  Only memories below the highest policy threshold are
+    scanned, so a run scales with the low-salience rows rather than the
+    whole corpus.  Each chunk commits on its own; a failed run is simply
+    re-run.
 
     Parameters
     ----------
@@ -270,25 +313,37 @@ def archive_low_salience_memories(
         Salience score threshold for archival.  Default: 0.2.
         This parameter is used as an override; if not explicitly
         provided, the Redis-stored config value is preferred.
+    dry_run : bool
+        Report what would be archived without moving anything.
+    user_id : str, optional
+        Restrict archival to one user's memories and apply that user's
+        archive config.
 
     Returns
     -------
     dict
-        Summary with keys: archived_count, threshold, duration_ms.
+        Summary with keys: status ("completed" or "dry_run"),
+        candidate_count, archived_count, scanned, chunks, by_type
+        (``{type: {"count", "avg_salience"}}``), policies, threshold,
+        duration_ms.
     """
     start = time.monotonic()
 
     # ------------------------------------------------------------------
     # 0. Load archive config from Redis (or fall back to defaults)
     # ------------------------------------------------------------------
-    archive_config = _load_archive_config_from_redis()
+    archive_config = _load_archive_config_from_redis(user_id)
     effective_threshold: float = threshold if threshold != DEFAULT_ARCHIVE_THRESHOLD else archive_config["threshold"]
-    effective_min_age: int = archive_config["min_age_days"]
-    effective_max_access: int = archive_config["max_access_count"]
+    policies = build_retention_policies(
+        threshold=effective_threshold,
+        min_age_days=archive_config["min_age_days"],
+        max_access_count=archive_config["max_access_count"],
+        by_type=archive_config["by_type"],
+    )
 
     logger.info(
-        "archive_low_salience START  threshold=%.2f  max_access=%d  min_age_days=%d",
-        effective_threshold, effective_max_access, effective_min_age,
+        "archive_low_salience START  dry_run=%s  policies=%s",
+        dry_run, policies,
     )
 
     try:
@@ -297,82 +352,250 @@ def archive_low_salience_memories(
         logger.error("Failed to get Supabase client: %s", exc, exc_info=True)
         return _error_result(start, str(exc))
 
-    # Calculate the age cutoff date
-    age_cutoff = datetime.now(timezone.utc) - timedelta(days=effective_min_age)
-    age_cutoff_str = age_cutoff.isoformat()
-
     # ------------------------------------------------------------------
-    # Query archival candidates
+    # Move (or count) candidates chunk by chunk
     # ------------------------------------------------------------------
-    try:
-        response = (
-            client.table("memories")
-            .select("id, salience_score, access_count, created_at")
-            .eq("is_archived", False)
-            .lt("salience_score", effective_threshold)
-            .lte("access_count", effective_max_access)
-            .lt("created_at", age_cutoff_str)
-            .execute()
+    # Keyset cursor on idx_memories_archive_scan: (salience_score, id)
+    cursor: Optional[str] = None
+    cursor_salience: Optional[float] = None
+    scanned = 0
+    candidates = 0
+    chunks = 0
+    by_type: Dict[str, Dict[str, Any]] = {}
+
+    while True:
+        try:
+            response = client.rpc(
+                "archive_memory_chunk",
+                {
+                    "p_policies": policies,
+                    "p_after_salience": cursor_salience,
+                    "p_after": cursor,
+                    "p_limit": ARCHIVE_CHUNK_SIZE,
+                    "p_dry_run": dry_run,
+                    "p_user_id": user_id,
+                },
+            ).execute()
+        except Exception as exc:
+            logger.error(
+                "Archive chunk after (%s, %s) failed (%d archived so far): %s",
+                cursor_salience, cursor, 0 if dry_run else candidates, exc, exc_info=True,
+            )
+            result = _error_result(start, str(exc))
+            result["archived_count"] = 0 if dry_run else candidates
+            return result
+
+        row: Dict[str, Any] = (response.data or [{}])[0]
+        chunks += 1
+        scanned += row.get("scanned") or 0
+        candidates += row.get("archived") or 0
+        _merge_type_report(by_type, row.get("by_type") or {})
+        logger.debug(
+            "Archive chunk %d: scanned=%s  archived=%s  (total so far: %d)",
+            chunks, row.get("scanned"), row.get("archived"), candidates,
         )
-        candidates: List[Dict[str, Any]] = response.data or []
-    except Exception as exc:
-        logger.error("Failed to query archival candidates: %s", exc, exc_info=True)
-        return _error_result(start, str(exc))
 
-    candidate_count = len(candidates)
-    if candidate_count == 0:
-        elapsed_ms = (time.monotonic() - start) * 1000.0
-        logger.info("archive_low_salience DONE: no candidates found")
-        return {
-            "status": "completed",
-            "archived_count": 0,
-            "threshold": threshold,
-            "duration_ms": round(elapsed_ms, 1),
-        }
+        cursor = row.get("next_after")
+        cursor_salience = row.get("next_after_salience")
+        if not cursor:
+            break
 
-    logger.info("Found %d archival candidates", candidate_count)
+    elapsed_ms = (time.monotonic() - start) * 1000.0
 
-    # ------------------------------------------------------------------
-    # Archive in batches
-    # ------------------------------------------------------------------
-    archived_count = 0
-    candidate_ids = [c["id"] for c in candidates]
+    logger.info(
+        "archive_low_salience DONE: %s=%d  scanned=%d  chunks=%d  elapsed=%.0fms",
+        "would_archive" if dry_run else "archived",
+        candidates, scanned, chunks, elapsed_ms,
+    )
+
+    return {
+        "status": "dry_run" if dry_run else "completed",
+        "candidate_count": candidates,
+        "archived_count": 0 if dry_run else candidates,
+        "scanned": scanned,
+        "chunks": chunks,
+        "by_type": by_type,
+        "policies": policies,
+        "threshold": effective_threshold,
+        "duration_ms": round(elapsed_ms, 1),
+    }
+
+
+def restore_archived_memories(
+    user_id: Optional[str] = None,
+    memory_ids: Optional[List[str]] = None,
+    memory_type: Optional[str] = None,
+    archived_after: Optional[str] = None,
+    archived_before: Optional[str] = None,
+    salience: float = RESTORE_SALIENCE,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Move archived memories matching a predicate back into ``memories``.
 
-    for batch_start in range(0, len(candidate_ids), BATCH_UPDATE_SIZE):
-        batch_ids = candidate_ids[batch_start:batch_start + BATCH_UPDATE_SIZE]
+    Restored memories keep their original id, content, embedding and
+    access counters; their salience is reset to ``salience`` and
+    ``last_accessed_at`` to now, so the next nightly run does not archive
+    them straight back.  Runs the ``restore_archived_memories`` RPC in
+    chunks of ``ARCHIVE_CHUNK_SIZE``.
+
+    Parameters
+    ----------
+    user_id : str, optional
+        Only this user's memories.
+    memory_ids : list[str], optional
+        Original memory ids.
+    memory_type : str, optional
+        Retention type the memories were archived under (e.g. ``"sms"``).
+    archived_after : str, optional
+        ISO timestamp; archived at or after.
+    archived_before : str, optional
+        ISO timestamp; archived before.
+    salience : float
+        Salience score given to restored memories.  Default: 0.5.
+    dry_run : bool
+        Report what would be restored without moving anything.
+
+    Returns
+    -------
+    dict
+        Summary with keys: status ("completed" or "dry_run"),
+        restored_count, by_type (``{type: count}``), duration_ms.
+
+    Raises
+    ------
+    ValueError
+        If no predicate is given (restoring the whole archive must be
+        asked for one user or time range at a time).
+    """
+    if not any([user_id, memory_ids, memory_type, archived_after, archived_before]):
+        raise ValueError("restore_archived_memories needs at least one predicate")
+
+    start = time.monotonic()
+    logger.info(
+        "restore_archived START  user=%s  ids=%d  type=%s  after=%s  before=%s  dry_run=%s",
+        user_id, len(memory_ids or []), memory_type, archived_after, archived_before, dry_run,
+    )
+
+    try:
+        client = _get_supabase_client()
+    except Exception as exc:
+        logger.error("Failed to get Supabase client: %s", exc, exc_info=True)
+        return _error_result(start, str(exc))
+
+    restored = 0
+    by_type: Dict[str, int] = {}
+    while True:
         try:
-            client.table("memories").update(
-                {"is_archived": True}
-            ).in_("id", batch_ids).execute()
-            archived_count += len(batch_ids)
-            logger.debug(
-                "Archived batch: %d memories (total so far: %d)",
-                len(batch_ids), archived_count,
-            )
+            response = client.rpc(
+                "restore_archived_memories",
+                {
+                    "p_user_id": user_id,
+                    "p_memory_ids": memory_ids,
+                    "p_memory_type": memory_type,
+                    "p_archived_after": archived_after,
+                    "p_archived_before": archived_before,
+                    "p_salience": salience,
+                    "p_limit": ARCHIVE_CHUNK_SIZE,
+                    "p_dry_run": dry_run,
+                },
+            ).execute()
         except Exception as exc:
             logger.error(
-                "Failed to archive batch starting at %d: %s",
-                batch_start, exc, exc_info=True,
+                "Restore chunk failed (%d restored so far): %s",
+                restored, exc, exc_info=True,
             )
+            result = _error_result(start, str(exc))
+            result["restored_count"] = restored
+            return result
 
-    elapsed_ms = (time.monotonic() - start) * 1000.0
+        row: Dict[str, Any] = (response.data or [{}])[0]
+        count = row.get("restored") or 0
+        restored += count
+        for memory_type_key, n in (row.get("by_type") or {}).items():
+            by_type[memory_type_key] = by_type.get(memory_type_key, 0) + n
 
-    # TODO(phase2): Move archived memories to archived_memories table
-    # with Haiku-generated summaries and S3/R2 backup.
+        # A dry run counts every match in one call
+        if dry_run or count < ARCHIVE_CHUNK_SIZE:
+            break
 
+    elapsed_ms = (time.monotonic() - start) * 1000.0
     logger.info(
-        "archive_low_salience DONE: archived=%d  threshold=%.2f  elapsed=%.0fms",
-        archived_count, effective_threshold, elapsed_ms,
+        "restore_archived DONE: %s=%d  elapsed=%.0fms",
+        "would_restore" if dry_run else "restored", restored, elapsed_ms,
     )
 
     return {
-        "status": "completed",
-        "archived_count": archived_count,
-        "threshold": effective_threshold,
+        "status": "dry_run" if dry_run else "completed",
+        "restored_count": restored,
+        "by_type": by_type,
         "duration_ms": round(elapsed_ms, 1),
     }
 
 
+def build_retention_policies(
+    threshold: float = DEFAULT_ARCHIVE_THRESHOLD,
+    min_age_days: int = MIN_ARCHIVE_AGE_DAYS,
+    max_access_count: int = MAX_ARCHIVE_ACCESS_COUNT,
+    by_type: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the per-memory-type retention policies for ``archive_memory_chunk``.
+
+    A memory's type is its ``metadata.source`` (``"sms"``, ``"file"``,
+    ``"fast_path"``, ...), else its ``source`` column.  The ``"default"``
+    policy applies to types without an entry; each ``by_type`` entry
+    overrides any of the default's keys for that type.  A threshold of 0
+    keeps a type forever.
+
+    Parameters
+    ----------
+    threshold : float
+        Default salience threshold.
+    min_age_days : int
+        Default minimum age in days.
+    max_access_count : int
+        Default maximum access count.
+    by_type : dict, optional
+        ``{memory_type: {"threshold"?, "min_age_days"?, "max_access_count"?}}``.
+
+    Returns
+    -------
+    dict
+        ``{"default": {...}, memory_type: {...}, ...}`` with all three keys
+        set in every policy.
+    """
+    default = {
+        "threshold": float(threshold),
+        "min_age_days": int(min_age_days),
+        "max_access_count": int(max_access_count),
+    }
+    policies: Dict[str, Dict[str, Any]] = {"default": default}
+    for memory_type, override in (by_type or {}).items():
+        policy = dict(default)
+        policy.update({k: v for k, v in override.items() if k in default and v is not None})
+        policies[memory_type] = policy
+    return policies
+
+
+def _merge_type_report(
+    total: Dict[str, Dict[str, Any]],
+    chunk: Dict[str, Dict[str, Any]],
+) -> None:
+    """Add one chunk's per-type report into the running total (count-weighted mean)."""
+    for memory_type, stats in chunk.items():
+        count = stats.get("count") or 0
+        if not count:
+            continue
+        entry = total.setdefault(memory_type, {"count": 0, "avg_salience": 0.0})
+        merged = entry["count"] + count
+        entry["avg_salience"] = round(
+            (entry["avg_salience"] * entry["count"] + float(stats.get("avg_salience") or 0.0) * count) / merged,
+            4,
+        )
+        entry["count"] = merged
+
+
 # =============================================================================
 # Internal Helpers
 # =============================================================================
@@ -481,24 +704,35 @@ def _load_weights_from_redis() -> "SalienceWeights":
     return SalienceWeights()
 
 
-def _load_archive_config_from_redis() -> Dict[str, Any]:
+def _load_archive_config_from_redis(user_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Load archive configuration from Redis, falling back to defaults.
 
-    Checks the global key ``sabine:archive_config:global`` for settings
-    persisted via the Archive Configuration API.
+    Checks ``sabine:archive_config:{user_id}`` (written by
+    ``PUT /api/archive/config``) when a user is given, then the global key
+    ``sabine:archive_config:global``.
+
+    Parameters
+    ----------
+    user_id : str, optional
+        User whose config to prefer.
 
     Returns
     -------
     dict
-        Archive config with keys: threshold, min_age_days, max_access_count.
+        Archive config with keys: threshold, min_age_days, max_access_count,
+        by_type (per-memory-type overrides, see ``build_retention_policies``).
     """
     try:
         import json
         from backend.services.redis_client import get_redis_client
 
         redis_client = get_redis_client()
-        raw = redis_client.get("sabine:archive_config:global")
+        raw = None
+        if user_id:
+            raw = redis_client.get(f"sabine:archive_config:{user_id}")
+        if not raw:
+            raw = redis_client.get("sabine:archive_config:global")
         if raw:
             data = json.loads(raw)
             logger.debug("Loaded archive config from Redis: %s", data)
@@ -506,6 +740,7 @@ def _load_archive_config_from_redis() -> Dict[str, Any]:
                 "threshold": data.get("threshold", DEFAULT_ARCHIVE_THRESHOLD),
                 "min_age_days": data.get("min_age_days", MIN_ARCHIVE_AGE_DAYS),
                 "max_access_count": data.get("max_access_count", MAX_ARCHIVE_ACCESS_COUNT),
+                "by_type": data.get("by_type") or {},
             }
     except Exception as exc:
         logger.debug(
@@ -517,6 +752,7 @@ def _load_archive_config_from_redis() -> Dict[str, Any]:
         "threshold": DEFAULT_ARCHIVE_THRESHOLD,
         "min_age_days": MIN_ARCHIVE_AGE_DAYS,
         "max_access_count": MAX_ARCHIVE_ACCESS_COUNT,
+        "by_type": {},
     }
 
 
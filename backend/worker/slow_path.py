@@ -29,6 +29,9 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID, uuid4
 
 from backend.magma.taxonomy import is_valid_predicate, infer_layer, GraphLayer
+from backend.services.metrics import track_llm_call
+from backend.services.rate_limiter import approx_tokens, llm_rate_limit
+from backend.services.tracing import current_span, extract, start_span
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +64,26 @@ async def _async_consolidate_entry(wal_entry_id: str) -> "ConsolidationResult":
     """
     Async implementation of single-entry consolidation.
 
+    Runs :func:`_consolidate_entry` in a ``slow_path.consolidate_entry``
+    span, a child of the rq job span when called from a job.
+
+    Parameters
+    ----------
+    wal_entry_id : str
+        UUID (as string) of the WAL entry.
+
+    Returns
+    -------
+    ConsolidationResult
+    """
+    with start_span("slow_path.consolidate_entry", attributes={"wal.entry_id": wal_entry_id}):
+        return await _consolidate_entry(wal_entry_id)
+
+
+async def _consolidate_entry(wal_entry_id: str) -> "ConsolidationResult":
+    """
+    Consolidate one WAL entry.
+
     Steps:
         1. Read WAL entry from Supabase
         2. Parse raw_payload for message content
@@ -124,6 +147,11 @@ async def _async_consolidate_entry(wal_entry_id: str) -> "ConsolidationResult":
         message: str = raw_payload.get("message", "")
         user_id: str = raw_payload.get("user_id", "")
 
+        # Link back to the request that wrote the entry (Fast Path stamps it)
+        origin = extract(raw_payload)
+        if origin is not None:
+            current_span().add_link(origin, {"sabine.link": "wal_origin"})
+
         if not message:
             logger.warning(
                 "WAL entry %s has no message in raw_payload; marking completed",
@@ -150,25 +178,15 @@ async def _async_consolidate_entry(wal_entry_id: str) -> "ConsolidationResult":
         )
 
         # 5. Resolve entities --------------------------------------------------
-        entities_resolved: int = 0
-        resolve_results: List[Dict[str, Any]] = []
-        for entity_data in entities_in_payload:
-            try:
-                resolve_result = await _async_resolve_entity(
-                    entity_data=entity_data,
-                    user_id=user_id,
-                )
-                resolve_results.append(resolve_result)
-                if resolve_result.get("action") in ("created", "updated"):
-                    entities_resolved += 1
-            except Exception as entity_exc:
-                logger.warning(
-                    "Entity resolution failed for %s in WAL %s: %s",
-                    entity_data.get("name", "unknown"),
-                    wal_entry_id,
-                    entity_exc,
-                )
-                resolve_results.append({"action": "failed", "entity_id": None})
+        resolve_results: List[Dict[str, Any]] = await resolve_entities(
+            entities=entities_in_payload,
+            user_id=user_id,
+            wal_entry_id=wal_entry_id,
+        )
+        entities_resolved: int = sum(
+            1 for r in resolve_results
+            if r.get("action") in ("created", "updated")
+        )
 
         # 6. Persist extracted relationships -----------------------------------
         relationships_stored: int = 0
@@ -525,13 +543,18 @@ def extract_relationships(
             timeout=10.0,
         )
 
-        response = client.messages.create(
-            model="claude-3-5-haiku-20241022",
-            max_tokens=1024,
-            messages=[
-                {"role": "user", "content": prompt},
-            ],
-        )
+        with llm_rate_limit(
+            "anthropic", "claude-3-5-haiku-20241022", approx_tokens(prompt) + 512,
+        ) as slot:
+            with track_llm_call("anthropic", "claude-3-5-haiku-20241022"):
+                response = client.messages.create(
+                    model="claude-3-5-haiku-20241022",
+                    max_tokens=1024,
+                    messages=[
+                        {"role": "user", "content": prompt},
+                    ],
+                )
+            slot.record(response)
 
         # Extract the text content from the response
         raw_text: str = ""
@@ -712,6 +735,67 @@ def resolve_entity(entity_data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
     return asyncio.run(_async_resolve_entity(entity_data, user_id))
 
 
+async def resolve_entities(
+    entities: List[Dict[str, Any]],
+    user_id: str,
+    wal_entry_id: str = "",
+) -> List[Dict[str, Any]]:
+    """
+    Resolve all entities of a WAL entry with one lookup and one write.
+
+    Delegates to :func:`backend.magma.resolution.resolve_entities_batch`.
+    If the batch path fails (e.g. the ``match_entity_candidates`` RPC is
+    not deployed yet), falls back to :func:`_async_resolve_entity` per
+    entity so consolidation still makes progress.
+
+    Parameters
+    ----------
+    entities : list[dict]
+        Entity dicts from ``raw_payload["entities"]``.
+    user_id : str
+        User ID for mention metadata.
+    wal_entry_id : str
+        WAL entry ID for log context.
+
+    Returns
+    -------
+    list[dict]
+        One ``{"action": ..., "entity_id": ...}`` dict per entity, in
+        input order (``action`` is ``"failed"`` for per-entity errors).
+    """
+    if not entities:
+        return []
+
+    try:
+        from backend.magma.resolution import resolve_entities_batch
+
+        return await resolve_entities_batch(entities=entities, user_id=user_id)
+    except Exception as batch_exc:
+        logger.warning(
+            "Batch entity resolution failed for WAL %s; falling back to "
+            "per-entity resolution: %s",
+            wal_entry_id,
+            batch_exc,
+        )
+
+    resolve_results: List[Dict[str, Any]] = []
+    for entity_data in entities:
+        try:
+            resolve_results.append(await _async_resolve_entity(
+                entity_data=entity_data,
+                user_id=user_id,
+            ))
+        except Exception as entity_exc:
+            logger.warning(
+                "Entity resolution failed for %s in WAL %s: %s",
+                entity_data.get("name", "unknown"),
+                wal_entry_id,
+                entity_exc,
+            )
+            resolve_results.append({"action": "failed", "entity_id": None})
+    return resolve_results
+
+
 async def _async_resolve_entity(
     entity_data: Dict[str, Any],
     user_id: str,
@@ -0,0 +1,407 @@
+"""
+Adaptive Model Routing
+======================
+
+Static routing (``ModelRouter``) maps a role to a tier and takes that tier's
+default model.  The adaptive policy refines that choice with what the
+process has observed about each model recently:
+
+- **Statistics**: every LLM call reports its latency, outcome and token
+  usage (``CircuitBreakerCallbackHandler``).  They are kept per model with
+  exponential time decay (half-life ``ADAPTIVE_ROUTING_HALF_LIFE_SECONDS``),
+  as a log-bucket latency histogram for the p95, a success rate, and mean
+  input/output tokens per call.
+- **SLOs**: each role has a ``RoutingSLO`` (p95 latency, minimum success
+  rate) from ``TierRoutingConfig.role_slo_map``.
+- **Policy**: among models in the statically chosen tier and the tiers above
+  it that meet the tool/vision requirements and whose provider is available,
+  pick the cheapest (expected cost per call at the observed token mix) that
+  currently meets the SLO.  A model with fewer than
+  ``ADAPTIVE_ROUTING_MIN_SAMPLES`` effective samples counts as meeting it.
+  If no model meets the SLO the static decision stands.
+
+Because samples decay, a model that was routed away from stops receiving
+traffic, its sample weight falls below the minimum after a few half-lives,
+and it is tried again.  That is how a recovered cheap model wins its
+traffic back without a separate probing mechanism.
+
+An explicit ``model_preference`` in a role manifest bypasses the policy.
+``lib/agent/routing_simulation.py`` replays recorded latency traces through
+this policy and the static one for comparison.
+"""
+
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .llm_config import (
+    MODEL_REGISTRY,
+    ModelConfig,
+    ModelProvider,
+    ModelTier,
+    RoutingSLO,
+    TierRoutingConfig,
+    get_routing_config,
+)
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+ADAPTIVE_ROUTING_ENABLED = os.getenv("ADAPTIVE_ROUTING_ENABLED", "true").lower() == "true"
+ADAPTIVE_ROUTING_HALF_LIFE_SECONDS = float(os.getenv("ADAPTIVE_ROUTING_HALF_LIFE_SECONDS", "300"))
+ADAPTIVE_ROUTING_MIN_SAMPLES = float(os.getenv("ADAPTIVE_ROUTING_MIN_SAMPLES", "5"))
+
+# Token mix used to compare model prices before any usage was observed
+DEFAULT_INPUT_TOKENS = 3000
+DEFAULT_OUTPUT_TOKENS = 500
+
+# Latency histogram bucket upper bounds: 50ms growing by 25% per bucket (~30 min)
+LATENCY_BUCKETS: List[float] = [0.05 * 1.25 ** i for i in range(48)]
+
+TIER_RANK = {ModelTier.LOCAL: 0, ModelTier.API: 1, ModelTier.PREMIUM: 2}
+
+
+# =============================================================================
+# Decayed Statistics
+# =============================================================================
+
+@dataclass
+class ModelHealth:
+    """Decayed view of one model's recent calls."""
+    samples: float
+    p95_seconds: float
+    success_rate: float
+    avg_input_tokens: Optional[float]
+    avg_output_tokens: Optional[float]
+
+    def meets(self, slo: RoutingSLO) -> bool:
+        return self.p95_seconds <= slo.p95_seconds and self.success_rate >= slo.min_success_rate
+
+
+class ModelStats:
+    """
+    Exponentially decayed call statistics for one model.
+
+    Every weight is multiplied by ``0.5 ** (elapsed / half_life)``, so a
+    call ``half_life`` seconds old counts half as much as a new one.
+
+    Args:
+        half_life_seconds: Decay half-life.
+        clock: Monotonic time source (injectable for tests and simulation).
+    """
+
+    def __init__(
+        self,
+        half_life_seconds: float = ADAPTIVE_ROUTING_HALF_LIFE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.half_life_seconds = half_life_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = [0.0] * (len(LATENCY_BUCKETS) + 1)
+        self._total = 0.0
+        self._ok = 0.0
+        self._token_weight = 0.0
+        self._input_tokens = 0.0
+        self._output_tokens = 0.0
+        self._updated_at: Optional[float] = None
+
+    def _factor(self, now: float) -> float:
+        if self._updated_at is None or now <= self._updated_at:
+            return 1.0
+        return 0.5 ** ((now - self._updated_at) / self.half_life_seconds)
+
+    def record(
+        self,
+        latency_seconds: float,
+        ok: bool = True,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            now = self._clock()
+            factor = self._factor(now)
+            if factor != 1.0:
+                self._buckets = [weight * factor for weight in self._buckets]
+                self._total *= factor
+                self._ok *= factor
+                self._token_weight *= factor
+                self._input_tokens *= factor
+                self._output_tokens *= factor
+            self._updated_at = max(now, self._updated_at or now)
+
+            self._buckets[bisect.bisect_left(LATENCY_BUCKETS, latency_seconds)] += 1.0
+            self._total += 1.0
+            if ok:
+                self._ok += 1.0
+            if input_tokens is not None and output_tokens is not None:
+                self._token_weight += 1.0
+                self._input_tokens += input_tokens
+                self._output_tokens += output_tokens
+
+    def health(self) -> Optional[ModelHealth]:
+        """Current statistics, or None before the first call."""
+        with self._lock:
+            if not self._total:
+                return None
+            # Uniform decay leaves ratios unchanged; only the sample weight shrinks
+            samples = self._total * self._factor(self._clock())
+            target = 0.95 * self._total
+            cumulative = 0.0
+            p95 = math.inf
+            for index, weight in enumerate(self._buckets):
+                cumulative += weight
+                if cumulative >= target:
+                    p95 = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else math.inf
+                    break
+            tokens = self._token_weight
+            return ModelHealth(
+                samples=samples,
+                p95_seconds=p95,
+                success_rate=self._ok / self._total,
+                avg_input_tokens=self._input_tokens / tokens if tokens else None,
+                avg_output_tokens=self._output_tokens / tokens if tokens else None,
+            )
+
+
+class ModelStatsRegistry:
+    """Lazily creates one ``ModelStats`` per model id."""
+
+    def __init__(
+        self,
+        half_life_seconds: float = ADAPTIVE_ROUTING_HALF_LIFE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.half_life_seconds = half_life_seconds
+        self._clock = clock
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_id: str) -> ModelStats:
+        stats = self._stats.get(model_id)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.get(model_id)
+                if stats is None:
+                    stats = ModelStats(self.half_life_seconds, clock=self._clock)
+                    self._stats[model_id] = stats
+        return stats
+
+    def record(
+        self,
+        model_id: str,
+        latency_seconds: float,
+        ok: bool = True,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+    ) -> None:
+        self.get(model_id).record(latency_seconds, ok, input_tokens, output_tokens)
+
+    def health(self, model_id: str) -> Optional[ModelHealth]:
+        stats = self._stats.get(model_id)
+        return stats.health() if stats else None
+
+    def expected_tokens(self) -> Tuple[float, float]:
+        """Mean input/output tokens per call across all models (defaults before any usage)."""
+        weight = input_tokens = output_tokens = 0.0
+        for stats in list(self._stats.values()):
+            health = stats.health()
+            if health is None or health.avg_input_tokens is None:
+                continue
+            weight += health.samples
+            input_tokens += health.samples * health.avg_input_tokens
+            output_tokens += health.samples * (health.avg_output_tokens or 0.0)
+        if not weight:
+            return float(DEFAULT_INPUT_TOKENS), float(DEFAULT_OUTPUT_TOKENS)
+        return input_tokens / weight, output_tokens / weight
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for model_id, stats in sorted(self._stats.items()):
+            health = stats.health()
+            if health is None:
+                continue
+            result[model_id] = {
+                "samples": round(health.samples, 2),
+                "p95_seconds": round(health.p95_seconds, 3) if math.isfinite(health.p95_seconds) else None,
+                "success_rate": round(health.success_rate, 4),
+                "avg_input_tokens": round(health.avg_input_tokens) if health.avg_input_tokens else None,
+                "avg_output_tokens": round(health.avg_output_tokens) if health.avg_output_tokens else None,
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+# =============================================================================
+# Policy
+# =============================================================================
+
+def expected_cost(config: ModelConfig, input_tokens: float, output_tokens: float) -> float:
+    """Expected USD cost of one call to ``config``."""
+    return (
+        input_tokens * config.cost_per_1m_input
+        + output_tokens * config.cost_per_1m_output
+    ) / 1_000_000
+
+
+class AdaptiveRoutingPolicy:
+    """
+    Cheapest model in the allowed tiers that currently meets the role's SLO.
+
+    Args:
+        stats: Per-model call statistics (default: the process-wide registry).
+        config: Routing configuration with the per-role SLOs.
+        min_samples: Effective samples below which a model is assumed healthy.
+    """
+
+    def __init__(
+        self,
+        stats: Optional[ModelStatsRegistry] = None,
+        config: Optional[TierRoutingConfig] = None,
+        min_samples: float = ADAPTIVE_ROUTING_MIN_SAMPLES,
+    ):
+        self._stats = stats
+        self.config = config or get_routing_config()
+        self.min_samples = min_samples
+
+    @property
+    def stats(self) -> ModelStatsRegistry:
+        return self._stats or get_model_stats()
+
+    def meets_slo(self, config: ModelConfig, slo: RoutingSLO) -> Tuple[bool, Optional[ModelHealth]]:
+        """Whether a model meets ``slo``; unknown models are given the benefit of the doubt."""
+        health = self.stats.health(config.model_id)
+        if health is None or health.samples < self.min_samples:
+            return True, health
+        return health.meets(slo), health
+
+    def candidates(
+        self,
+        static_key: str,
+        tier: ModelTier,
+        requires_tools: bool,
+        requires_vision: bool,
+        is_available: Callable[[ModelProvider], bool],
+        models: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, ModelConfig]]:
+        """Eligible models ordered by expected cost (the static model wins ties)."""
+        allowed = set(models) if models is not None else None
+        input_tokens, output_tokens = self.stats.expected_tokens()
+        eligible = []
+        for key, config in MODEL_REGISTRY.items():
+            if TIER_RANK[config.tier] < TIER_RANK[tier]:
+                continue
+            if allowed is not None and key not in allowed:
+                continue
+            if requires_tools and not config.supports_tools:
+                continue
+            if requires_vision and not config.supports_vision:
+                continue
+            if not is_available(config.provider):
+                continue
+            eligible.append((key, config))
+        return sorted(eligible, key=lambda item: (
+            expected_cost(item[1], input_tokens, output_tokens),
+            TIER_RANK[item[1].tier],
+            item[0] != static_key,
+        ))
+
+    def select(
+        self,
+        decision: Any,
+        role: Optional[str] = None,
+        requires_tools: bool = True,
+        requires_vision: bool = False,
+        is_available: Callable[[ModelProvider], bool] = lambda _: True,
+        models: Optional[Iterable[str]] = None,
+    ) -> Any:
+        """
+        Refine a static ``RoutingDecision``.
+
+        Args:
+            decision: Decision of the static policy; its tier is the lowest allowed
+            role: Role ID, selects the SLO
+            requires_tools: Whether the task needs tool calling
+            requires_vision: Whether the task needs vision
+            is_available: Provider availability check (configured, breaker closed)
+            models: Restrict candidates to these model keys (simulation)
+
+        Returns:
+            A new RoutingDecision for the selected model, or ``decision``
+            unchanged when it is already the pick or no model meets the SLO
+        """
+        from .model_router import RoutingDecision
+
+        slo = self.config.slo_for(role)
+        static_key = _model_key(decision.model_config)
+        for key, config in self.candidates(
+            static_key, decision.tier, requires_tools, requires_vision, is_available, models,
+        ):
+            meets, health = self.meets_slo(config, slo)
+            if not meets:
+                continue
+            if config.model_id == decision.model_config.model_id:
+                return decision
+            observed = (
+                f"p95 {health.p95_seconds:.1f}s, {health.success_rate:.0%} ok"
+                if health and health.samples >= self.min_samples else "no recent data"
+            )
+            logger.info(
+                f"Adaptive routing: {key} instead of {static_key} for role {role} ({observed})"
+            )
+            return RoutingDecision(
+                model_config=config,
+                tier=config.tier,
+                reason=(
+                    f"{decision.reason}; adaptive: {key} is the cheapest model meeting "
+                    f"p95<={slo.p95_seconds:g}s ({observed})"
+                ),
+                fallback_chain=decision.fallback_chain,
+            )
+
+        logger.warning(f"Adaptive routing: no model meets the SLO for role {role}, keeping {static_key}")
+        return RoutingDecision(
+            model_config=decision.model_config,
+            tier=decision.tier,
+            reason=f"{decision.reason}; adaptive: no model meets p95<={slo.p95_seconds:g}s, static choice kept",
+            fallback_chain=decision.fallback_chain,
+        )
+
+
+def _model_key(config: ModelConfig) -> str:
+    for key, registered in MODEL_REGISTRY.items():
+        if registered.model_id == config.model_id:
+            return key
+    return config.model_id
+
+
+# =============================================================================
+# Singletons
+# =============================================================================
+
+_stats = ModelStatsRegistry()
+_policy: Optional[AdaptiveRoutingPolicy] = None
+
+
+def get_model_stats() -> ModelStatsRegistry:
+    """Get the process-wide per-model call statistics."""
+    return _stats
+
+
+def get_adaptive_policy() -> AdaptiveRoutingPolicy:
+    """Get or create the adaptive routing policy (reads the process-wide stats)."""
+    global _policy
+    if _policy is None:
+        _policy = AdaptiveRoutingPolicy()
+    return _policy
@@ -0,0 +1,173 @@
+"""
+Compiled Agent Cache
+====================
+
+Compiling a LangGraph ReAct agent (binding tool schemas to the model,
+building the graph) is the same work every turn for a given model chain,
+role, tool set and static prompt.  ``create_react_agent_with_tools()``
+keeps compiled agents here, keyed by exactly those inputs, and supplies
+the per-turn parts at invoke time:
+
+- the dynamic context (date/time, upcoming events) is read by the agent's
+  prompt callable from ``config["configurable"][DYNAMIC_PROMPT_KEY]``;
+- callbacks are attached with ``agent.with_config(...)``.
+
+The tool fingerprint covers each tool's name, description and argument
+schema plus the user id, because tools wrapped by the VoI gate are bound
+to the user they were created for.  Entries expire after
+``AGENT_CACHE_TTL_SECONDS`` so MCP tool changes are eventually picked up.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+AGENT_CACHE_ENABLED = os.getenv("AGENT_CACHE_ENABLED", "true").lower() == "true"
+AGENT_CACHE_MAX_ENTRIES = int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "128"))
+AGENT_CACHE_TTL_SECONDS = float(os.getenv("AGENT_CACHE_TTL_SECONDS", "1800"))
+
+DYNAMIC_PROMPT_KEY = "sabine_dynamic_prompt"
+
+
+# =============================================================================
+# Keys and Prompt
+# =============================================================================
+
+def _sha(payload: str) -> str:
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def tool_fingerprint(tools: Sequence[Any], user_id: Optional[str] = None) -> str:
+    """Fingerprint of a tool set (order-insensitive) and the user it is bound to."""
+    entries = []
+    for tool in tools:
+        schema: Any = None
+        args_schema = getattr(tool, "args_schema", None)
+        if isinstance(args_schema, dict):
+            schema = args_schema
+        elif hasattr(args_schema, "model_fields"):
+            # Field names, types and descriptions; generating the full JSON
+            # schema would cost more than the compile this cache saves
+            schema = {
+                name: [repr(field.annotation), field.description, repr(field.default)]
+                for name, field in args_schema.model_fields.items()
+            }
+        entries.append([tool.name, getattr(tool, "description", ""), schema])
+    entries.sort(key=lambda entry: entry[0])
+    return _sha(json.dumps({"tools": entries, "user": user_id}, sort_keys=True, default=str))
+
+
+def agent_cache_key(
+    models: Sequence[str],
+    role: Optional[str],
+    tools: Sequence[Any],
+    static_prompt: str,
+    user_id: Optional[str] = None,
+) -> Tuple[str, ...]:
+    """Key of a compiled agent: model chain, role, tool set, static prompt."""
+    return (
+        ",".join(models),
+        role or "",
+        tool_fingerprint(tools, user_id),
+        _sha(static_prompt),
+    )
+
+
+def make_prompt(static_prompt: str) -> Callable[[Dict[str, Any], RunnableConfig], List[BaseMessage]]:
+    """
+    Prompt callable for ``create_react_agent``: the static prompt plus the
+    turn's dynamic context from the run config, followed by the messages.
+    """
+    def prompt(state: Dict[str, Any], config: RunnableConfig) -> List[BaseMessage]:
+        dynamic = (config.get("configurable") or {}).get(DYNAMIC_PROMPT_KEY, "")
+        return [SystemMessage(content=static_prompt + dynamic), *state["messages"]]
+
+    return prompt
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+class CompiledAgentCache:
+    """Bounded LRU of compiled agents with a TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = AGENT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = AGENT_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, ...], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.setup_seconds = {"hit": 0.0, "miss": 0.0}
+
+    def get(self, key: Tuple[str, ...]) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[1] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple[str, ...], agent: Any) -> None:
+        with self._lock:
+            self._entries[key] = (agent, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_setup(self, hit: bool, seconds: float) -> None:
+        with self._lock:
+            self.setup_seconds["hit" if hit else "miss"] += seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and mean agent-setup time per outcome."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "avg_setup_ms_hit": round(self.setup_seconds["hit"] * 1000 / self.hits, 3) if self.hits else None,
+                "avg_setup_ms_miss": round(self.setup_seconds["miss"] * 1000 / self.misses, 3) if self.misses else None,
+            }
+
+
+_cache = CompiledAgentCache()
+
+
+def get_agent_cache() -> CompiledAgentCache:
+    """Get the process-wide compiled agent cache."""
+    return _cache
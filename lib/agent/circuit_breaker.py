@@ -0,0 +1,322 @@
+"""
+Provider Circuit Breakers
+=========================
+
+One breaker per LLM provider (anthropic, groq, ollama, ...) tracks recent
+call outcomes in a rolling time window and stops sending traffic to a
+provider that is failing or too slow:
+
+- **closed**: calls flow.  The breaker trips when, over at least
+  ``min_calls`` calls in the last ``window_seconds``, the error rate reaches
+  ``error_rate_threshold`` or the share of calls slower than
+  ``slow_call_seconds`` reaches ``slow_call_rate_threshold``.
+- **open**: the provider is skipped for ``open_seconds``.  ``ModelRouter``
+  routes around it and the failover model chain does not try it.
+- **half-open**: after the cool-down, up to ``half_open_probes`` live calls
+  are let through.  A successful probe closes the breaker; a failed one
+  re-opens it.
+
+Only provider failures count as errors: timeouts, connection errors, rate
+limits and 5xx/529 overloads.  A 400 for a bad request means the provider
+is up.
+
+Breakers are per process.  Each API worker learns about an outage from its
+own traffic, which takes ``min_calls`` failed calls.  State changes are
+published to the ``sabine_llm_circuit_state`` gauge.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from backend.services.metrics import LLM_CIRCUIT_STATE
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+
+
+@dataclass
+class BreakerConfig:
+    """Thresholds for one provider's breaker."""
+    window_seconds: float = float(os.getenv("CIRCUIT_BREAKER_WINDOW_SECONDS", "60"))
+    min_calls: int = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+    error_rate_threshold: float = float(os.getenv("CIRCUIT_BREAKER_ERROR_RATE", "0.5"))
+    slow_call_seconds: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "30"))
+    slow_call_rate_threshold: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8"))
+    open_seconds: float = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+    half_open_probes: int = int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_PROBES", "1"))
+    # A probe whose outcome never arrives frees its slot after this long
+    probe_timeout_seconds: float = 120.0
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when every candidate provider is behind an open breaker."""
+
+    def __init__(self, providers: Any):
+        self.providers = list(providers)
+        super().__init__(f"Circuit open for providers: {self.providers}")
+
+
+# =============================================================================
+# Error Classification
+# =============================================================================
+
+_FAILURE_STATUS_CODES = {408, 429, 500, 502, 503, 504, 529}
+_FAILURE_MARKERS = (
+    "overloaded", "timeout", "timed out", "connection", "rate limit",
+    "rate_limit", "service unavailable", "bad gateway", "529",
+)
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """
+    Whether ``error`` says the provider is unhealthy (as opposed to the
+    request being wrong).
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, CircuitOpenError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in _FAILURE_STATUS_CODES or status >= 500
+    name = type(error).__name__.lower()
+    if "timeout" in name or "connection" in name or "overloaded" in name or "ratelimit" in name:
+        return True
+    text = str(error).lower()
+    return any(marker in text for marker in _FAILURE_MARKERS)
+
+
+# =============================================================================
+# Breaker
+# =============================================================================
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for one provider.
+
+    Args:
+        name: Provider name, used in logs and snapshots.
+        config: Thresholds (defaults from environment).
+        clock: Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: Optional[BreakerConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.config = config or BreakerConfig()
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (timestamp, failed, slow)
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()
+        self._set_state(BreakerState.CLOSED)
+        self._opened_at = 0.0
+        self._probes: Deque[float] = deque()
+        self.times_opened = 0
+        self.rejected = 0
+
+    # ---- State -------------------------------------------------------------
+
+    def _set_state(self, state: BreakerState) -> None:
+        self._state = state
+        for candidate in BreakerState:
+            LLM_CIRCUIT_STATE.set(int(candidate == state), provider=self.name, state=candidate.value)
+
+    def _current_state(self, now: float) -> BreakerState:
+        if self._state == BreakerState.OPEN and now - self._opened_at >= self.config.open_seconds:
+            self._set_state(BreakerState.HALF_OPEN)
+            self._probes.clear()
+            logger.info("Circuit for %s half-open; probing", self.name)
+        return self._state
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def is_available(self) -> bool:
+        """Whether the router should consider this provider (does not use a probe)."""
+        return self.state != BreakerState.OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Admit a call.  In half-open state this takes one of the probe slots.
+        """
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            if state == BreakerState.CLOSED:
+                return True
+            if state == BreakerState.HALF_OPEN:
+                while self._probes and now - self._probes[0] > self.config.probe_timeout_seconds:
+                    self._probes.popleft()
+                if len(self._probes) < self.config.half_open_probes:
+                    self._probes.append(now)
+                    return True
+            self.rejected += 1
+            return False
+
+    # ---- Outcomes ----------------------------------------------------------
+
+    def record_success(self, latency_seconds: float = 0.0) -> None:
+        self._record(failed=False, latency_seconds=latency_seconds)
+
+    def record_failure(self, latency_seconds: float = 0.0) -> None:
+        self._record(failed=True, latency_seconds=latency_seconds)
+
+    def _record(self, failed: bool, latency_seconds: float) -> None:
+        slow = latency_seconds >= self.config.slow_call_seconds
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+
+            if state == BreakerState.HALF_OPEN:
+                if self._probes:
+                    self._probes.popleft()
+                if failed or slow:
+                    self._open(now, "probe failed" if failed else "probe slow")
+                else:
+                    self._set_state(BreakerState.CLOSED)
+                    self._calls.clear()
+                    logger.info("Circuit for %s closed after successful probe", self.name)
+                return
+
+            if state == BreakerState.OPEN:
+                # Late result of a call admitted before the breaker tripped
+                return
+
+            self._calls.append((now, failed, slow))
+            self._trim(now)
+            total = len(self._calls)
+            if total < self.config.min_calls:
+                return
+            failures = sum(1 for _, f, _ in self._calls if f)
+            slow_calls = sum(1 for _, _, s in self._calls if s)
+            if failures / total >= self.config.error_rate_threshold:
+                self._open(now, f"error rate {failures}/{total}")
+            elif slow_calls / total >= self.config.slow_call_rate_threshold:
+                self._open(now, f"slow calls {slow_calls}/{total}")
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.config.window_seconds
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def _open(self, now: float, reason: str) -> None:
+        self._set_state(BreakerState.OPEN)
+        self._opened_at = now
+        self._calls.clear()
+        self._probes.clear()
+        self.times_opened += 1
+        logger.warning(
+            "Circuit for %s opened (%s); skipping it for %.0fs",
+            self.name, reason, self.config.open_seconds,
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._set_state(BreakerState.CLOSED)
+            self._calls.clear()
+            self._probes.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            self._trim(now)
+            total = len(self._calls)
+            failures = sum(1 for _, f, _ in self._calls if f)
+            slow_calls = sum(1 for _, _, s in self._calls if s)
+            return {
+                "state": state.value,
+                "window_calls": total,
+                "error_rate": round(failures / total, 4) if total else 0.0,
+                "slow_call_rate": round(slow_calls / total, 4) if total else 0.0,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "retry_in_seconds": (
+                    round(max(0.0, self.config.open_seconds - (now - self._opened_at)), 1)
+                    if state == BreakerState.OPEN else 0.0
+                ),
+            }
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+class CircuitBreakerRegistry:
+    """Lazily creates one breaker per provider name."""
+
+    def __init__(
+        self,
+        config: Optional[BreakerConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._config = config
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(provider)
+                if breaker is None:
+                    breaker = CircuitBreaker(provider, config=self._config, clock=self._clock)
+                    self._breakers[provider] = breaker
+        return breaker
+
+    def is_available(self, provider: str) -> bool:
+        if not CIRCUIT_BREAKER_ENABLED:
+            return True
+        return self.get(provider).is_available()
+
+    def allow_request(self, provider: str) -> bool:
+        if not CIRCUIT_BREAKER_ENABLED:
+            return True
+        return self.get(provider).allow_request()
+
+    def record(self, provider: str, latency_seconds: float, error: Optional[BaseException] = None) -> None:
+        """Record a call outcome; errors that are not provider failures count as successes."""
+        breaker = self.get(provider)
+        if error is not None and is_provider_failure(error):
+            breaker.record_failure(latency_seconds)
+        else:
+            breaker.record_success(latency_seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.snapshot() for name, breaker in sorted(self._breakers.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+_registry = CircuitBreakerRegistry()
+
+
+def get_breaker_registry() -> CircuitBreakerRegistry:
+    """Get the process-wide provider breaker registry."""
+    return _registry
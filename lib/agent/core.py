@@ -18,23 +18,23 @@ import hashlib
 import logging
 import os
 import time
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, TypedDict, Tuple
 
 import pytz
 
-from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_core.tools import StructuredTool
-from langgraph.prebuilt import create_react_agent
-from supabase import create_client, Client
+
+from backend.services.rate_limiter import ProviderRateLimiter, approx_tokens, llm_rate_limit
+from backend.services.tracing import current_span
 
 from .registry import get_all_tools
 from .models import RoleManifest
-from .model_router import get_model_router, RoutingDecision
+from .model_router import build_failover_llm, get_model_router, RoutingDecision
 from .llm_config import ModelProvider, MODEL_REGISTRY
-from .providers import get_provider
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +42,10 @@ logger = logging.getLogger(__name__)
 # Shared Helper Functions (Phase 2)
 # =============================================================================
 
-def extract_tool_execution_details(agent_messages: List[BaseMessage]) -> Dict[str, Any]:
+def extract_tool_execution_details(
+    agent_messages: List[BaseMessage],
+    cache_hits: Optional[Counter] = None,
+) -> Dict[str, Any]:
     """
     Extract tool execution details from agent messages.
     
@@ -54,6 +57,9 @@ def extract_tool_execution_details(agent_messages: List[BaseMessage]) -> Dict[st
     
     Args:
         agent_messages: List of messages returned from agent.ainvoke()
+        cache_hits: Results served from the tool cache during the run
+            (from ``tool_cache.track_cache_hits()``); matching tool results
+            are flagged ``cache_hit``.
         
     Returns:
         Dictionary with:
@@ -143,6 +149,11 @@ def extract_tool_execution_details(agent_messages: List[BaseMessage]) -> Dict[st
                         tool_status = "success"
                         tool_successes += 1
             
+            cache_hit = False
+            if cache_hits and cache_hits[(tool_name, tool_content)] > 0:
+                cache_hits[(tool_name, tool_content)] -= 1
+                cache_hit = True
+
             tool_executions.append({
                 "type": "tool_result",
                 "tool_name": tool_name,
@@ -150,6 +161,7 @@ def extract_tool_execution_details(agent_messages: List[BaseMessage]) -> Dict[st
                 "status": tool_status,
                 "error": tool_error,
                 "artifact_created": artifact_created,
+                "cache_hit": cache_hit,
                 "content_preview": str(tool_content)[:500] if tool_content else None
             })
             status_indicator = "OK" if tool_status == "success" else "FAIL"
@@ -508,6 +520,12 @@ class CacheMetrics:
         else:
             self.cache_misses += 1
 
+        current_span().set_attributes({
+            "gen_ai.usage.input_tokens": input_tokens,
+            "llm.cache_read_tokens": cache_read,
+            "llm.cache_creation_tokens": cache_creation,
+        })
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "total_calls": self.total_calls,
@@ -544,13 +562,25 @@ def reset_cache_metrics():
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
-supabase: Optional[Client] = None
-if SUPABASE_URL and SUPABASE_SERVICE_KEY:
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-        logger.info("✓ Supabase client initialized")
-    except Exception as e:
-        logger.error(f"Failed to initialize Supabase client: {e}")
+supabase: Optional[Any] = None
+
+
+def get_supabase() -> Optional[Any]:
+    """
+    The shared Supabase client, created on first use (None when not configured).
+
+    Created lazily so importing this module does not pull in the supabase
+    SDK before the API starts serving.
+    """
+    global supabase
+    if supabase is None and SUPABASE_URL and SUPABASE_SERVICE_KEY:
+        try:
+            from supabase import create_client
+            supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+            logger.info("✓ Supabase client initialized")
+        except Exception as e:
+            logger.error(f"Failed to initialize Supabase client: {e}")
+    return supabase
 
 # =============================================================================
 # Agent State
@@ -595,6 +625,7 @@ async def load_deep_context(user_id: str) -> Dict[str, Any]:
         "recent_memories": []
     }
 
+    supabase = get_supabase()
     if not supabase:
         logger.warning("Supabase not initialized - returning empty context")
         return context
@@ -1390,15 +1421,14 @@ async def create_agent(
             "fallback_chain": routing_decision.fallback_chain,
         }
 
-        # Create LLM using provider adapter
-        provider = get_provider(selected_provider)
-        max_tokens = model_config.max_tokens
-
-        llm = provider.create_llm(
-            config=model_config,
+        # Create LLM with failover along the fallback chain; providers with
+        # an open circuit breaker are skipped
+        llm = build_failover_llm(
+            routing_decision,
+            requires_tools=requires_tools,
             temperature=0.7,
-            max_tokens=max_tokens,
         )
+        deep_context["_routing"]["failover_providers"] = llm.providers
 
         # Prompt caching only works with Anthropic
         caching_enabled = enable_caching and selected_provider == ModelProvider.ANTHROPIC
@@ -1419,11 +1449,14 @@ async def create_agent(
             "fallback_chain": ["claude-sonnet"],
         }
 
+        from langchain_anthropic import ChatAnthropic
+
         llm = ChatAnthropic(
             model=model_name,
             anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
             temperature=0.7,
-            max_tokens=4096
+            max_tokens=4096,
+            rate_limiter=ProviderRateLimiter("anthropic", model_name),
         )
 
         caching_enabled = enable_caching
@@ -1436,6 +1469,8 @@ async def create_agent(
     # Combine static + dynamic for the full system message
     full_system_prompt = static_prompt + dynamic_prompt
 
+    from langgraph.prebuilt import create_react_agent
+
     agent = create_react_agent(
         llm,
         tools,
@@ -1472,25 +1507,41 @@ async def create_react_agent_with_tools(
     role: Optional[str] = None,
     use_hybrid_routing: bool = True,
     task_payload: Optional[Dict[str, Any]] = None,
+    dynamic_prompt: str = "",
 ) -> tuple[Any, Dict[str, Any]]:
     """
     Create a LangGraph ReAct agent with tools and system prompt.
     
     This is a shared helper for both sabine_agent and task_agent modules.
     It handles model routing, LLM client creation, and agent instantiation.
+
+    Compiled agents are cached (``lib/agent/agent_cache.py``) by model
+    chain, role, tool set and ``system_prompt``; LLM clients are pooled per
+    (provider, model).  ``dynamic_prompt`` is appended to the system prompt
+    at invoke time, so per-turn context does not defeat the cache.
     
     Args:
         tools: List of StructuredTool objects to give to the agent
-        system_prompt: Full system prompt (static + dynamic context)
+        system_prompt: Static system prompt (identical across turns)
         user_id: User ID for tracking
         session_id: Session ID for tracking
         role: Optional role ID for model routing decisions
         use_hybrid_routing: Whether to use intelligent model routing
         task_payload: Optional task payload for complexity analysis
+        dynamic_prompt: Per-turn context appended to the system prompt
         
     Returns:
         Tuple of (agent, metadata_dict) where metadata contains routing info
     """
+    from .agent_cache import (
+        AGENT_CACHE_ENABLED,
+        DYNAMIC_PROMPT_KEY,
+        agent_cache_key,
+        get_agent_cache,
+        make_prompt,
+    )
+
+    setup_start = time.perf_counter()
     logger.info(f"Creating ReAct agent with {len(tools)} tools (role: {role or 'None'})")
     
     # Determine tool requirements
@@ -1547,15 +1598,15 @@ async def create_react_agent_with_tools(
             "fallback_chain": routing_decision.fallback_chain,
         }
         
-        # Create LLM using provider adapter
-        provider = get_provider(selected_provider)
-        max_tokens = model_config.max_tokens
-        
-        llm = provider.create_llm(
-            config=model_config,
+        # Pooled LLM clients with failover along the fallback chain;
+        # providers with an open circuit breaker are skipped
+        llm = build_failover_llm(
+            routing_decision,
+            requires_tools=requires_tools,
             temperature=0.7,
-            max_tokens=max_tokens,
         )
+        metadata["_routing"]["failover_providers"] = llm.providers
+        model_ids = llm.models
         
         # Prompt caching only works with Anthropic
         caching_enabled = selected_provider == ModelProvider.ANTHROPIC
@@ -1574,21 +1625,62 @@ async def create_react_agent_with_tools(
             "fallback_chain": ["claude-sonnet"],
         }
         
-        llm = ChatAnthropic(
-            model=model_name,
-            anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
-            temperature=0.7,
-            max_tokens=4096
-        )
+        llm = None
+        model_ids = [model_name]
         
         caching_enabled = True
     
-    # Create ReAct agent with system prompt
-    agent = create_react_agent(
-        llm,
-        tools,
-        prompt=SystemMessage(content=system_prompt)
+    # Reuse the compiled agent when model chain, role, tools and static
+    # prompt are unchanged
+    cache = get_agent_cache()
+    cache_key = agent_cache_key(model_ids, role, tools, system_prompt, user_id)
+    agent = cache.get(cache_key) if AGENT_CACHE_ENABLED else None
+    cache_hit = agent is not None
+
+    if agent is None:
+        from langgraph.prebuilt import create_react_agent
+
+        if llm is None:
+            from langchain_anthropic import ChatAnthropic
+            llm = ChatAnthropic(
+                model=model_name,
+                anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
+                temperature=0.7,
+                max_tokens=4096,
+                rate_limiter=ProviderRateLimiter("anthropic", model_name),
+            )
+
+        # Create ReAct agent; the prompt callable appends the turn's dynamic
+        # context from the run config
+        agent = create_react_agent(
+            llm,
+            tools,
+            prompt=make_prompt(system_prompt),
+        )
+        if AGENT_CACHE_ENABLED:
+            cache.put(cache_key, agent)
+
+    # Latency/outcome metrics and trace spans for every LLM call and tool
+    # execution, plus this turn's dynamic context
+    from .metrics_callbacks import MetricsCallbackHandler, TracingCallbackHandler
+    routing = metadata["_routing"]
+    agent = agent.with_config(
+        callbacks=[
+            MetricsCallbackHandler(provider=routing["provider"], model=routing["model"]),
+            TracingCallbackHandler(provider=routing["provider"], model=routing["model"]),
+        ],
+        configurable={DYNAMIC_PROMPT_KEY: dynamic_prompt},
     )
+
+    setup_seconds = time.perf_counter() - setup_start
+    cache.record_setup(cache_hit, setup_seconds)
+    from backend.services.metrics import AGENT_SETUP_SECONDS
+    AGENT_SETUP_SECONDS.observe(setup_seconds, cache="hit" if cache_hit else "miss")
+    current_span().set_attributes({"agent.cache_hit": cache_hit, "agent.setup_ms": round(setup_seconds * 1000, 3)})
+    metadata["_agent_cache"] = {
+        "hit": cache_hit,
+        "setup_ms": round(setup_seconds * 1000, 3),
+    }
     
     # Store caching info in metadata
     metadata["_cache_info"] = {
@@ -1606,8 +1698,8 @@ async def create_react_agent_with_tools(
     provider_info = metadata.get("_routing", {}).get("provider", "anthropic")
     tier_info = metadata.get("_routing", {}).get("tier", "premium")
     logger.info(
-        f"ReAct agent created (provider: {provider_info}, tier: {tier_info}, "
-        f"caching: {caching_enabled})"
+        f"ReAct agent {'reused' if cache_hit else 'created'} (provider: {provider_info}, "
+        f"tier: {tier_info}, caching: {caching_enabled}, setup: {setup_seconds * 1000:.1f}ms)"
     )
     
     return agent, metadata
@@ -1686,24 +1778,30 @@ async def run_agent_with_caching(
 
         # Make API call with prompt caching
         # Static context gets cached, dynamic context is fresh
-        response = client.messages.create(
-            model=model_name,
-            max_tokens=4096,
-            system=[
-                {
-                    "type": "text",
-                    "text": static_prompt,
-                    "cache_control": {"type": "ephemeral"}  # Cache for 5 minutes
-                },
-                {
-                    "type": "text",
-                    "text": dynamic_prompt
-                    # No cache_control = fresh each time
-                }
-            ],
-            messages=messages,
-            tools=anthropic_tools if anthropic_tools else None
-        )
+        estimated_tokens = approx_tokens(
+            static_prompt, dynamic_prompt, user_message,
+            *(str(m["content"]) for m in messages[:-1]),
+        ) + 1024
+        async with llm_rate_limit("anthropic", model_name, estimated_tokens) as slot:
+            response = client.messages.create(
+                model=model_name,
+                max_tokens=4096,
+                system=[
+                    {
+                        "type": "text",
+                        "text": static_prompt,
+                        "cache_control": {"type": "ephemeral"}  # Cache for 5 minutes
+                    },
+                    {
+                        "type": "text",
+                        "text": dynamic_prompt
+                        # No cache_control = fresh each time
+                    }
+                ],
+                messages=messages,
+                tools=anthropic_tools if anthropic_tools else None
+            )
+            await slot.record_async(response)
 
         duration_ms = (time.time() - start_time) * 1000
 
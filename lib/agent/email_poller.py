@@ -223,7 +223,7 @@ class EmailPoller:
             self._token_alert_sent = False
 
             if action == "replied":
-                self._emails_found += 1
+                self._emails_found += result.get("replied_count", 1)
                 recipient = result.get("recipient", "unknown")
                 subject = result.get("subject", "")
                 logger.info(
@@ -12,6 +12,9 @@ Features:
 - Uses headless Gmail MCP (credentials passed as tool parameters)
 - Dual-token architecture: USER_REFRESH_TOKEN for reading, AGENT_REFRESH_TOKEN for sending
 - Supabase-backed tracking for persistence across Railway deploys
+- Incremental sync via the Gmail History API with Redis dedup state
+  (see gmail_sync.py); all eligible emails in a batch are answered,
+  GMAIL_SYNC_CONCURRENCY at a time
 """
 
 import asyncio
@@ -23,10 +26,17 @@ import sys
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, List, Optional, Set
 
 from supabase import create_client, Client
 
+from lib.agent.gmail_sync import (
+    GMAIL_SYNC_CONCURRENCY,
+    EmailDedupStore,
+    get_dedup_store,
+    sync_new_emails,
+)
+
 # Cross-platform file locking
 if sys.platform == 'win32':
     import msvcrt
@@ -272,6 +282,28 @@ def _get_cached_replied_threads() -> Set[str]:
         logger.debug(f"Refreshed replied threads cache: {len(_cached_replied_threads)} entries")
     return _cached_replied_threads
 
+def _processed_subset(message_ids: List[str]) -> Set[str]:
+    """Return which of ``message_ids`` were already processed."""
+    dedup = get_dedup_store()
+    if dedup is not None:
+        try:
+            return dedup.processed(message_ids)
+        except Exception as e:
+            logger.warning(f"Redis processed-ID lookup failed, using cache: {e}")
+    cached = _get_cached_processed_ids()
+    return {mid for mid in message_ids if mid in cached}
+
+def _replied_subset(thread_ids: List[str]) -> Set[str]:
+    """Return which of ``thread_ids`` Sabine already replied to."""
+    dedup = get_dedup_store()
+    if dedup is not None:
+        try:
+            return dedup.replied_threads(thread_ids)
+        except Exception as e:
+            logger.warning(f"Redis replied-thread lookup failed, using cache: {e}")
+    cached = _get_cached_replied_threads()
+    return {tid for tid in thread_ids if tid in cached}
+
 def _add_to_cache(message_id: Optional[str] = None, thread_id: Optional[str] = None):
     """Add ID to in-memory cache immediately (before DB write completes)."""
     global _cached_processed_ids, _cached_replied_threads
@@ -330,6 +362,15 @@ def save_replied_thread(thread_id: str):
     _add_to_cache(thread_id=thread_id)
     logger.debug(f"Added thread {thread_id} to in-memory cache")
 
+    redis_saved = False
+    dedup = get_dedup_store()
+    if dedup is not None:
+        try:
+            dedup.mark_thread_replied(thread_id)
+            redis_saved = True
+        except Exception as e:
+            logger.warning(f"Could not save thread to Redis: {e}")
+
     # Save to Supabase - use INSERT with conflict handling instead of upsert
     supabase = get_supabase()
     if supabase:
@@ -355,7 +396,9 @@ def save_replied_thread(thread_id: str):
             # Log but don't fail - local file is backup
             logger.warning(f"Could not save thread to Supabase: {e}")
 
-    # Also save to local file as backup (always, even if Supabase succeeds)
+    # Local file backup is only needed when Redis is unavailable
+    if redis_saved:
+        return
     try:
         local_file = Path(__file__).parent / ".replied_threads.json"
         threads = set()
@@ -416,6 +459,59 @@ def save_processed_id(message_id: str):
     _add_to_cache(message_id=message_id)
     logger.debug(f"Added message {message_id} to in-memory cache")
 
+    redis_saved = False
+    dedup = get_dedup_store()
+    if dedup is not None:
+        try:
+            dedup.mark_processed(message_id)
+            redis_saved = True
+        except Exception as e:
+            logger.warning(f"Could not save message to Redis: {e}")
+
+    _save_processed_id_to_supabase(message_id)
+
+    # Local file backup is only needed when Redis is unavailable
+    if redis_saved:
+        return
+    try:
+        local_file = Path(__file__).parent / ".processed_emails.json"
+        ids = set()
+        if local_file.exists():
+            data = json.loads(local_file.read_text())
+            ids = set(data.get("ids", []))
+        ids.add(message_id)
+        id_list = list(ids)[-1000:]
+        local_file.write_text(json.dumps({"ids": id_list}))
+    except Exception as e:
+        logger.warning(f"Could not save local processed ID: {e}")
+
+
+def claim_processed_id(message_id: str) -> bool:
+    """
+    Atomically mark a message as processed.
+
+    Returns False when another worker or process already claimed it.
+    Without Redis this falls back to save_processed_id() and always
+    returns True (the file lock serializes handlers in that case).
+    """
+    dedup = get_dedup_store()
+    if dedup is None:
+        save_processed_id(message_id)
+        return True
+    try:
+        claimed = dedup.claim_message(message_id)
+    except Exception as e:
+        logger.warning(f"Redis claim failed for {message_id}, using Supabase: {e}")
+        save_processed_id(message_id)
+        return True
+    _add_to_cache(message_id=message_id)
+    if claimed:
+        _save_processed_id_to_supabase(message_id)
+    return claimed
+
+
+def _save_processed_id_to_supabase(message_id: str) -> None:
+    """Record a processed message ID in Supabase (durable audit trail)."""
     # Save to Supabase - use INSERT with conflict handling
     supabase = get_supabase()
     if supabase:
@@ -438,22 +534,9 @@ def save_processed_id(message_id: str):
             else:
                 logger.debug(f"Message {message_id} already exists in Supabase")
         except Exception as e:
-            # Log but don't fail - local file is backup
+            # Log but don't fail - Redis/local file is backup
             logger.warning(f"Could not save message to Supabase: {e}")
 
-    # Also save to local file as backup (always, even if Supabase succeeds)
-    try:
-        local_file = Path(__file__).parent / ".processed_emails.json"
-        ids = set()
-        if local_file.exists():
-            data = json.loads(local_file.read_text())
-            ids = set(data.get("ids", []))
-        ids.add(message_id)
-        id_list = list(ids)[-1000:]
-        local_file.write_text(json.dumps({"ids": id_list}))
-    except Exception as e:
-        logger.warning(f"Could not save local processed ID: {e}")
-
 
 # Track processed message IDs to avoid duplicate replies (local file backup)
 PROCESSED_FILE = Path(__file__).parent / ".processed_emails.json"
@@ -1024,14 +1107,523 @@ Sabine Assistant
 """
 
 
+# =============================================================================
+# Email selection and processing
+# =============================================================================
+
+class _SerializedMCP:
+    """Serialize tool calls on one MCP stdio session shared by concurrent workers."""
+
+    def __init__(self, mcp: Any):
+        self._mcp = mcp
+        self._lock = asyncio.Lock()
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        async with self._lock:
+            return await self._mcp.call_tool(name, arguments)
+
+
+async def _list_recent_unread(mcp: Any, agent_access_token: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    List recent unread emails in the agent's inbox via MCP.
+
+    Used when there is no history cursor yet (or it expired).
+
+    Returns:
+        List of email dicts, or None if the listing failed
+    """
+    logger.info("Getting recent emails from agent's inbox (sabine@strugcity.com)...")
+    search_result = await mcp.call_tool("gmail_get_recent_emails", {
+        "google_access_token": agent_access_token,
+        "max_results": 10,
+        "unread_only": True
+    })
+
+    if not search_result:
+        logger.error("get_recent_emails returned empty result")
+        return None
+
+    logger.info(f"get_recent_emails result: {search_result[:500]}...")
+
+    # Parse result - response format is {"emails": [...]}
+    try:
+        result_data = json.loads(search_result)
+        # Handle {"emails": [...]} format
+        if isinstance(result_data, dict) and "emails" in result_data:
+            return result_data["emails"] or []
+        if isinstance(result_data, list):
+            return result_data
+        return []
+    except json.JSONDecodeError:
+        if "No messages" in search_result or "0 messages" in search_result.lower():
+            logger.info("No recent inbox emails found")
+        return []
+
+
+def _select_eligible_emails(
+    emails: List[Dict[str, Any]],
+    config: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """
+    Filter candidate emails down to those Sabine should answer.
+
+    Applies duplicate, loop-prevention, blocklist and authorization checks.
+    Skipped messages are marked processed so they are not re-examined.
+    At most one message per thread is selected.
+
+    Args:
+        emails: Email dicts (``id``, ``threadId``, ``from``, ``subject``, ...)
+        config: Configuration from get_config()
+
+    Returns:
+        One dict per eligible email with message_id, thread_id, sender,
+        sender_name, subject, body_preview and email_domain
+    """
+    candidate_ids = [c.get("id") or c.get("message_id") for c in emails]
+    candidate_threads = [
+        c.get("threadId") or c.get("thread_id") or cid
+        for c, cid in zip(emails, candidate_ids)
+    ]
+    processed_ids = _processed_subset(candidate_ids)
+    replied_threads = _replied_subset(candidate_threads)
+
+    selected: List[Dict[str, Any]] = []
+    selected_threads: Set[str] = set()
+
+    for candidate, candidate_id, candidate_thread_id in zip(emails, candidate_ids, candidate_threads):
+        candidate_sender = candidate.get("from", "").lower()
+        candidate_subject = candidate.get("subject", "").lower()
+
+        # Extract email from "Name <email>" format
+        if candidate_sender and '<' in candidate_sender:
+            match = re.search(r'<([^>]+)>', candidate_sender)
+            if match:
+                candidate_sender_email = match.group(1).lower()
+            else:
+                candidate_sender_email = candidate_sender
+        else:
+            candidate_sender_email = candidate_sender
+
+        logger.info(f"Checking email {candidate_id} (thread: {candidate_thread_id}) from {candidate_sender_email}")
+
+        # Skip if currently being processed by another concurrent request
+        if candidate_id in _processing_messages:
+            logger.info(f"  -> Currently being processed by another request, skipping")
+            continue
+
+        # Skip already processed message
+        if candidate_id in processed_ids:
+            logger.info(f"  -> Already processed (message ID), skipping")
+            continue
+
+        # Skip threads we've already replied to (prevents replying to same conversation twice)
+        if candidate_thread_id in replied_threads:
+            logger.info(f"  -> Already replied to this thread, skipping")
+            save_processed_id(candidate_id)  # Mark as processed so we don't check again
+            continue
+
+        # Skip self-emails (loop prevention)
+        if candidate_sender_email == config["assistant_email"] or candidate_sender_email == config["agent_email"]:
+            logger.info(f"  -> Self-email from Sabine, skipping")
+            save_processed_id(candidate_id)
+            continue
+
+        # Skip emails that look like they're part of a reply chain FROM Sabine
+        # (e.g., if someone forwarded Sabine's reply back)
+        if "sabine" in candidate_sender_email:
+            logger.info(f"  -> Email from Sabine-related address, skipping")
+            save_processed_id(candidate_id)
+            continue
+
+        # Skip noreply addresses
+        if any(ind in candidate_sender_email for ind in ['noreply', 'no-reply', 'donotreply', 'mailer-daemon', 'postmaster']):
+            logger.info(f"  -> No-reply address, skipping")
+            save_processed_id(candidate_id)
+            continue
+
+        # Skip subjects with auto-reply indicators BEFORE processing
+        if any(indicator in candidate_subject for indicator in AUTO_REPLY_INDICATORS):
+            logger.info(f"  -> Subject contains auto-reply indicator, skipping")
+            save_processed_id(candidate_id)
+            continue
+
+        # Classify email domain (work vs personal)
+        # Note: Headers may not be available in the list view, but we can still classify based on sender/subject
+        email_domain = classify_email_domain(
+            sender_email=candidate_sender_email,
+            subject=candidate_subject,
+            headers=None  # Headers not available in list view; will be fetched later if needed
+        )
+        logger.info(f"  -> Email domain classified as: {email_domain}")
+
+        # Work-aware sender filtering: relaxed blocking for work emails
+        if email_domain == "work":
+            # Work emails: only block obvious automated patterns, not corporate system senders
+            work_blocked_patterns = ["noreply", "no-reply", "donotreply", "mailer-daemon", "postmaster"]
+            is_blocked = any(pattern in candidate_sender_email for pattern in work_blocked_patterns)
+            if is_blocked:
+                logger.info(f"  -> Work email blocked by strict pattern, skipping")
+                save_processed_id(candidate_id)
+                continue
+        else:
+            # Personal: use full BLOCKED_SENDER_PATTERNS list
+            if any(pattern in candidate_sender_email for pattern in BLOCKED_SENDER_PATTERNS):
+                logger.info(f"  -> Blocked sender pattern detected, skipping")
+                save_processed_id(candidate_id)
+                continue
+
+            # Also check the full sender field (includes name)
+            if any(pattern in candidate_sender for pattern in BLOCKED_SENDER_PATTERNS):
+                logger.info(f"  -> Blocked sender name pattern detected, skipping")
+                save_processed_id(candidate_id)
+                continue
+
+        # Skip blocked subject patterns (grade notifications, automated messages)
+        if any(pattern in candidate_subject for pattern in BLOCKED_SUBJECT_PATTERNS):
+            logger.info(f"  -> Blocked subject pattern detected: {candidate_subject[:50]}, skipping")
+            save_processed_id(candidate_id)
+            continue
+
+        # Check authorization
+        if candidate_sender_email not in config["authorized_emails"]:
+            logger.info(f"  -> Not authorized ({config['authorized_emails']}), skipping")
+            continue
+
+        # One reply per thread per batch; the newest message wins
+        if candidate_thread_id in selected_threads:
+            logger.info(f"  -> Thread already selected in this batch, skipping")
+            save_processed_id(candidate_id)
+            continue
+
+        logger.info(f"  -> AUTHORIZED! Processing this email")
+        sender_name = None
+        if '<' in candidate.get("from", ""):
+            sender_name = candidate.get("from", "").split('<')[0].strip()
+        selected_threads.add(candidate_thread_id)
+        selected.append({
+            "message_id": candidate_id,
+            "thread_id": candidate_thread_id,
+            "sender": candidate_sender_email,
+            "sender_name": sender_name,
+            "subject": candidate.get("subject", ""),
+            "body_preview": candidate.get("body") or candidate.get("snippet", ""),
+            "email_domain": email_domain,
+        })
+
+    return selected
+
+
+async def _process_email(
+    mcp: Any,
+    agent_access_token: str,
+    config: Dict[str, Any],
+    email: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Generate and send Sabine's reply to one eligible email.
+
+    Args:
+        mcp: MCP session (shared; calls are serialized by the caller)
+        agent_access_token: Access token for the agent mailbox
+        config: Configuration from get_config()
+        email: Entry from _select_eligible_emails()
+
+    Returns:
+        Dict with status and details
+    """
+    message_id = email["message_id"]
+    thread_id = email["thread_id"]
+    sender = email["sender"]
+    sender_name = email["sender_name"]
+    subject = email["subject"]
+    body_preview = email["body_preview"]
+    email_domain = email["email_domain"]
+
+    logger.info(f"Selected email classified as: {email_domain} (from {sender})")
+
+    # Add to in-flight processing set to prevent concurrent duplicate handling
+    _processing_messages.add(message_id)
+    logger.info(f"Message {message_id} added to in-flight processing set")
+
+    try:
+        # Claim the message; another process may have taken it first
+        if not claim_processed_id(message_id):
+            logger.info(f"Message {message_id} already claimed elsewhere, skipping")
+            return {"success": True, "action": "skipped_concurrent", "message_id": message_id}
+        logger.info(f"Message {message_id} marked as processing")
+
+        # Get full message content if needed (from agent's inbox)
+        if not body_preview:
+            logger.info(f"Getting full content for message {message_id}...")
+            message_content = await mcp.call_tool("gmail_get_email_body_chunk", {
+                "google_access_token": agent_access_token,
+                "message_id": message_id
+            })
+
+            if message_content:
+                try:
+                    content_data = json.loads(message_content)
+                    if not body_preview:
+                        body_preview = content_data.get("body", "")
+                except json.JSONDecodeError:
+                    body_preview = extract_body(message_content)
+
+        logger.info(f"Processing email from: {sender_name} <{sender}>")
+
+        original_subject = subject or ""
+        subject_lower = original_subject.lower()
+
+        # Loop prevention: skip auto-replies
+        for indicator in AUTO_REPLY_INDICATORS:
+            if indicator in subject_lower:
+                logger.info(f"Subject contains auto-reply indicator '{indicator}', skipping to prevent loop")
+                return {"success": True, "action": "auto_reply_skipped", "subject": original_subject}
+
+        # Loop prevention: skip noreply addresses
+        if any(ind in sender for ind in ['noreply', 'no-reply', 'donotreply', 'mailer-daemon']):
+            logger.info(f"Sender {sender} appears to be a no-reply address, skipping")
+            return {"success": True, "action": "noreply_sender_skipped", "sender": sender}
+
+        email_body = body_preview or ""
+        logger.info(f"Email body ({len(email_body)} chars): {email_body[:200]}...")
+
+        # Fetch attachment metadata and content for this message.
+        # Uses a single shared AsyncClient (avoids unclosed-connection leaks)
+        # and _walk_parts from the gmail_get_message skill so nested multipart
+        # structures (e.g. multipart/mixed > multipart/alternative > attachment)
+        # are found correctly.
+        attachment_context = ""
+        try:
+            import base64 as _base64
+            import httpx as _httpx
+            import io as _io
+            from lib.skills.gmail_get_message.handler import (
+                _walk_parts as _gmail_walk_parts,
+                _extract_text_from_bytes as _gmail_extract_text,
+            )
+            _MAX_ATT_BYTES = 5_000_000  # 5 MB
+            _MAX_CONTENT_CHARS = 5000
+            _EXTRACTABLE_MIMES = {"text/plain", "text/csv", "text/html", "application/pdf"}
+
+            async with _httpx.AsyncClient() as _client:
+                _attach_resp = await _client.get(
+                    f"https://gmail.googleapis.com/gmail/v1/users/me/messages/{message_id}?format=full",
+                    headers={"Authorization": f"Bearer {agent_access_token}"},
+                    timeout=10.0,
+                )
+                if _attach_resp.status_code == 200:
+                    _payload = _attach_resp.json().get("payload", {})
+                    # _walk_parts recurses into nested multipart structures
+                    _, _att_meta = _gmail_walk_parts(_payload)
+                    _attachments = []
+                    for _meta in _att_meta:
+                        _att_id = _meta.get("attachmentId", "")
+                        _filename = _meta.get("filename", "")
+                        _mime = _meta.get("mime_type", "")
+                        _size = _meta.get("size", 0)
+                        _att_info = {"filename": _filename, "mime_type": _mime, "size": _size}
+                        if _att_id and _mime in _EXTRACTABLE_MIMES and _size < _MAX_ATT_BYTES:
+                            try:
+                                _att_resp = await _client.get(
+                                    f"https://gmail.googleapis.com/gmail/v1/users/me/messages/{message_id}/attachments/{_att_id}",
+                                    headers={"Authorization": f"Bearer {agent_access_token}"},
+                                    timeout=30.0,
+                                )
+                                if _att_resp.status_code == 200:
+                                    _raw = _base64.urlsafe_b64decode(_att_resp.json().get("data", ""))
+                                    _extracted = _gmail_extract_text(_raw, _mime, _filename)
+                                    if "content" in _extracted:
+                                        _att_info["content"] = _extracted["content"][:_MAX_CONTENT_CHARS]
+                            except Exception as _e:
+                                logger.warning(f"Could not fetch attachment '{_filename}': {_e}")
+                        _attachments.append(_att_info)
+                    if _attachments:
+                        attachment_context = "\n\n**EMAIL ATTACHMENTS:**\n"
+                        for _att in _attachments:
+                            attachment_context += f"\n### Attachment: {_att['filename']} ({_att['mime_type']}, {_att['size']} bytes)\n"
+                            if "content" in _att:
+                                attachment_context += f"Content:\n{_att['content']}\n"
+                            else:
+                                attachment_context += "(Binary attachment — content not extracted)\n"
+        except Exception as _e:
+            logger.warning(f"Could not fetch attachments for message {message_id}: {_e}")
+
+        email_body = email_body + attachment_context
+
+        if not original_subject:
+            original_subject = "your email"
+        reply_subject = f"Re: {original_subject}" if not original_subject.lower().startswith("re:") else original_subject
+
+        # SABINE 2.0: Fast Path pipeline — WAL write, entity extraction,
+        # embedding, conflict detection, and Slow Path enqueue.
+        # Replaces the legacy ingest_user_message() call.
+        # Skip for very short emails (likely automated).
+        if len(email_body.strip()) >= 20:
+            try:
+                # Lazy import to avoid circular dependencies
+                from backend.services.fast_path import process_fast_path
+
+                # Format email content for Fast Path processing
+                ingestion_content = (
+                    f"Email from {sender}"
+                    + (f" ({sender_name})" if sender_name else "")
+                    + f"\nSubject: {original_subject}\n"
+                    f"---\n"
+                    f"{email_body[:2000]}"  # Truncate very long emails
+                )
+
+                logger.info(f"Running Fast Path for email (domain={email_domain})...")
+                fp_result = await process_fast_path(
+                    user_id=config["user_id"],
+                    message=ingestion_content,
+                    session_id=f"email-{email_domain}-{message_id}",
+                )
+
+                logger.info(
+                    f"Fast Path complete: wal_id={fp_result.wal_entry_id}, "
+                    f"entities={len(fp_result.extracted_entities)}, "
+                    f"conflicts={len(fp_result.conflicts)}, "
+                    f"memories={len(fp_result.retrieved_memories)}, "
+                    f"queue_job={fp_result.queue_job_id}, "
+                    f"total={fp_result.timings.get('total_ms', 0):.1f}ms"
+                )
+            except Exception as e:
+                # Fast Path failure should NOT block email response
+                logger.warning(f"Email Fast Path failed (non-fatal): {e}", exc_info=True)
+        else:
+            logger.info(f"Skipping Fast Path for very short email ({len(email_body.strip())} chars)")
+
+        # Generate AI response
+        logger.info(f"Generating AI response for email from {sender}...")
+        ai_response = await generate_ai_response(
+            sender_email=sender,
+            sender_name=sender_name,
+            subject=original_subject,
+            body=email_body,
+            user_id=config["user_id"],
+            email_domain=email_domain  # Pass domain classification
+        )
+
+        logger.info(f"AI response: {ai_response[:200]}...")
+
+        # Convert plain text to simple HTML for email rendering
+        html_response = ai_response.replace('\n', '<br>\n')
+        html_body = f"""<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6;">
+{html_response}
+</body>
+</html>"""
+
+        # Get original email's Message-ID header for threading
+        logger.info(f"Getting original email headers for threading...")
+        original_headers = await get_message_headers(mcp, agent_access_token, message_id)
+        in_reply_to = original_headers.get("message_id_header")
+        references = original_headers.get("references")
+
+        # Send threaded reply using Gmail API directly
+        # This ensures the reply appears in the same email thread
+        logger.info(f"Sending threaded AI-generated reply to {sender} (thread: {thread_id})...")
+        send_result = await send_threaded_reply(
+            access_token=agent_access_token,
+            config=config,
+            to=sender,
+            subject=reply_subject,
+            body=ai_response,
+            html_body=html_body,
+            thread_id=thread_id,
+            in_reply_to=in_reply_to,
+            references=references
+        )
+
+        logger.info(f"Send result: {send_result}")
+
+        if send_result.get("success"):
+            logger.info(f"Threaded AI response sent to {sender} in thread {thread_id}")
+
+            # Mark the original email as read (like a real email client)
+            await mark_as_read(agent_access_token, message_id)
+
+            # Mark thread as replied to prevent double-replies
+            if thread_id:
+                save_replied_thread(thread_id)
+                logger.info(f"Thread {thread_id} marked as replied")
+            return {
+                "success": True,
+                "action": "replied",
+                "recipient": sender,
+                "message_id": message_id,
+                "thread_id": thread_id,
+                "subject": reply_subject,
+                "response_type": "ai_generated",
+                "threaded": True
+            }
+        else:
+            error_msg = send_result.get("error", "Unknown error")
+            logger.warning(f"Failed to send threaded reply to {sender}: {error_msg}")
+            return {"success": False, "error": f"Failed to send threaded reply: {error_msg}"}
+
+    finally:
+        # Always remove from in-flight processing set when done
+        if message_id and message_id in _processing_messages:
+            _processing_messages.discard(message_id)
+            logger.debug(f"Message {message_id} removed from in-flight processing set")
+
+
+def _advance_history(
+    dedup: Optional[EmailDedupStore],
+    mailbox: str,
+    history_id: Optional[str],
+) -> None:
+    """Move the mailbox's history cursor forward once a batch is handled."""
+    if dedup is None or not history_id:
+        return
+    try:
+        dedup.advance_history_id(mailbox, history_id)
+    except Exception as e:
+        logger.warning(f"Could not advance Gmail history cursor: {e}")
+
+
+def _summarize_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine per-email results into one notification result.
+
+    A single result is returned unchanged. For several, the first reply's
+    recipient/subject/ids are surfaced alongside ``replied_count`` and the
+    full ``results`` list.
+    """
+    if len(results) == 1:
+        return results[0]
+
+    replied = [r for r in results if r.get("action") == "replied"]
+    summary: Dict[str, Any] = {
+        "success": all(r.get("success") for r in results),
+        "action": "replied" if replied else (results[0].get("action") or "failed"),
+        "replied_count": len(replied),
+        "processed_count": len(results),
+        "results": results,
+    }
+    if replied:
+        for key in ("recipient", "message_id", "thread_id", "subject"):
+            summary[key] = replied[0].get(key)
+    errors = [r["error"] for r in results if r.get("error")]
+    if errors:
+        summary["error"] = "; ".join(errors)
+    return summary
+
+
 async def handle_new_email_notification(history_id: str) -> Dict[str, Any]:
     """
     Handle a new email notification by:
     1. Acquiring a lock to prevent race conditions
-    2. Finding the most recent inbox email from an authorized sender (using USER token)
-    3. Generating an AI response using the LangGraph agent
-    4. Sending the response via MCP (using AGENT token)
-    5. Tracking processed emails to avoid duplicates
+    2. Listing inbox emails added since the last historyId (falling back to
+       recent unread emails when there is no usable cursor)
+    3. Generating an AI response for each authorized email using the
+       LangGraph agent (GMAIL_SYNC_CONCURRENCY at a time)
+    4. Sending the responses via MCP (using AGENT token)
+    5. Tracking processed emails to avoid duplicates and advancing the cursor
+
+    Args:
+        history_id: historyId from the push notification (or a poll marker)
 
     Returns:
         Dict with status and details
@@ -1062,11 +1654,10 @@ async def handle_new_email_notification(history_id: str) -> Dict[str, Any]:
             logger.error("Missing AGENT_REFRESH_TOKEN")
             return {"success": False, "error": "Missing agent refresh token"}
 
-        # Use cached IDs for fast duplicate detection (includes both DB and local file)
-        processed_ids = _get_cached_processed_ids()
-        replied_threads = _get_cached_replied_threads()
-
-        logger.info(f"Loaded {len(processed_ids)} processed IDs and {len(replied_threads)} replied threads")
+        # Dedup state and history cursor live in Redis when it is reachable;
+        # otherwise fall back to the Supabase/local-file tracking.
+        dedup = get_dedup_store()
+        mailbox = config["agent_email"]
 
         # Use MCPClient context manager to keep session open for all tool calls
         async with MCPClient(
@@ -1084,395 +1675,63 @@ async def handle_new_email_notification(history_id: str) -> Dict[str, Any]:
             if not agent_access_token:
                 return {"success": False, "error": "Failed to get agent access token"}
 
-            # Search for recent inbox emails in AGENT's inbox (sabine@strugcity.com)
-            # This is where user emails TO Sabine arrive
-            logger.info("Getting recent emails from agent's inbox (sabine@strugcity.com)...")
-            search_result = await mcp.call_tool("gmail_get_recent_emails", {
-                "google_access_token": agent_access_token,
-                "max_results": 10,
-                "unread_only": True
-            })
+            # Incremental sync: only messages added since the last historyId.
+            # User emails TO Sabine arrive in the AGENT's inbox.
+            emails: Optional[List[Dict[str, Any]]] = None
+            next_history_id: Optional[str] = None
+            if dedup is not None:
+                try:
+                    emails, next_history_id = await sync_new_emails(
+                        access_token=agent_access_token,
+                        mailbox=mailbox,
+                        store=dedup,
+                        push_history_id=history_id if str(history_id).isdigit() else None,
+                    )
+                except Exception as e:
+                    logger.warning(f"Incremental Gmail sync failed, listing recent unread: {e}")
 
-            if not search_result:
-                logger.error("get_recent_emails returned empty result")
-                return {"success": False, "error": "Failed to search emails"}
+            if emails is None:
+                emails = await _list_recent_unread(mcp, agent_access_token)
+                if emails is None:
+                    return {"success": False, "error": "Failed to search emails"}
 
-            logger.info(f"get_recent_emails result: {search_result[:500]}...")
+            eligible = _select_eligible_emails(emails, config) if emails else []
 
-            # Parse result - response format is {"emails": [...]}
-            try:
-                result_data = json.loads(search_result)
-                # Handle {"emails": [...]} format
-                if isinstance(result_data, dict) and "emails" in result_data:
-                    emails = result_data["emails"]
-                elif isinstance(result_data, list):
-                    emails = result_data
-                else:
-                    emails = []
-
-                if not emails or len(emails) == 0:
+            if not eligible:
+                _advance_history(dedup, mailbox, next_history_id)
+                if not emails:
                     logger.info("No recent unread emails found")
                     return {"success": True, "action": "no_emails"}
-            except json.JSONDecodeError:
-                if "No messages" in search_result or "0 messages" in search_result.lower():
-                    logger.info("No recent inbox emails found")
-                    return {"success": True, "action": "no_emails"}
-                emails = []
-
-            # Find first email from an authorized sender that we haven't replied to
-            email_data = None
-            message_id = None
-            thread_id = None
-            sender = None
-            sender_name = None
-            subject = None
-            body_preview = None
-            email_domain = "personal"  # Default domain classification
-
-            for candidate in emails:
-                candidate_id = candidate.get("id") or candidate.get("message_id")
-                candidate_thread_id = candidate.get("threadId") or candidate.get("thread_id") or candidate_id
-                candidate_sender = candidate.get("from", "").lower()
-                candidate_subject = candidate.get("subject", "").lower()
-
-                # Extract email from "Name <email>" format
-                if candidate_sender and '<' in candidate_sender:
-                    match = re.search(r'<([^>]+)>', candidate_sender)
-                    if match:
-                        candidate_sender_email = match.group(1).lower()
-                    else:
-                        candidate_sender_email = candidate_sender
-                else:
-                    candidate_sender_email = candidate_sender
-
-                logger.info(f"Checking email {candidate_id} (thread: {candidate_thread_id}) from {candidate_sender_email}")
-
-                # Skip if currently being processed by another concurrent request
-                if candidate_id in _processing_messages:
-                    logger.info(f"  -> Currently being processed by another request, skipping")
-                    continue
-
-                # Skip already processed message (check in-memory cache first, then DB/file)
-                if candidate_id in processed_ids:
-                    logger.info(f"  -> Already processed (message ID), skipping")
-                    continue
-
-                # Skip threads we've already replied to (prevents replying to same conversation twice)
-                if candidate_thread_id in replied_threads:
-                    logger.info(f"  -> Already replied to this thread, skipping")
-                    save_processed_id(candidate_id)  # Mark as processed so we don't check again
-                    continue
-
-                # Skip self-emails (loop prevention)
-                if candidate_sender_email == config["assistant_email"] or candidate_sender_email == config["agent_email"]:
-                    logger.info(f"  -> Self-email from Sabine, skipping")
-                    save_processed_id(candidate_id)
-                    continue
-
-                # Skip emails that look like they're part of a reply chain FROM Sabine
-                # (e.g., if someone forwarded Sabine's reply back)
-                if "sabine" in candidate_sender_email:
-                    logger.info(f"  -> Email from Sabine-related address, skipping")
-                    save_processed_id(candidate_id)
-                    continue
-
-                # Skip noreply addresses
-                if any(ind in candidate_sender_email for ind in ['noreply', 'no-reply', 'donotreply', 'mailer-daemon', 'postmaster']):
-                    logger.info(f"  -> No-reply address, skipping")
-                    save_processed_id(candidate_id)
-                    continue
-
-                # Skip subjects with auto-reply indicators BEFORE processing
-                if any(indicator in candidate_subject for indicator in AUTO_REPLY_INDICATORS):
-                    logger.info(f"  -> Subject contains auto-reply indicator, skipping")
-                    save_processed_id(candidate_id)
-                    continue
-
-                # Classify email domain (work vs personal)
-                # Note: Headers may not be available in the list view, but we can still classify based on sender/subject
-                email_domain = classify_email_domain(
-                    sender_email=candidate_sender_email,
-                    subject=candidate_subject,
-                    headers=None  # Headers not available in list view; will be fetched later if needed
-                )
-                logger.info(f"  -> Email domain classified as: {email_domain}")
-
-                # Work-aware sender filtering: relaxed blocking for work emails
-                if email_domain == "work":
-                    # Work emails: only block obvious automated patterns, not corporate system senders
-                    work_blocked_patterns = ["noreply", "no-reply", "donotreply", "mailer-daemon", "postmaster"]
-                    is_blocked = any(pattern in candidate_sender_email for pattern in work_blocked_patterns)
-                    if is_blocked:
-                        logger.info(f"  -> Work email blocked by strict pattern, skipping")
-                        save_processed_id(candidate_id)
-                        continue
-                else:
-                    # Personal: use full BLOCKED_SENDER_PATTERNS list
-                    if any(pattern in candidate_sender_email for pattern in BLOCKED_SENDER_PATTERNS):
-                        logger.info(f"  -> Blocked sender pattern detected, skipping")
-                        save_processed_id(candidate_id)
-                        continue
-
-                    # Also check the full sender field (includes name)
-                    if any(pattern in candidate_sender for pattern in BLOCKED_SENDER_PATTERNS):
-                        logger.info(f"  -> Blocked sender name pattern detected, skipping")
-                        save_processed_id(candidate_id)
-                        continue
-
-                # Skip blocked subject patterns (grade notifications, automated messages)
-                if any(pattern in candidate_subject for pattern in BLOCKED_SUBJECT_PATTERNS):
-                    logger.info(f"  -> Blocked subject pattern detected: {candidate_subject[:50]}, skipping")
-                    save_processed_id(candidate_id)
-                    continue
-
-                # Check authorization
-                if candidate_sender_email not in config["authorized_emails"]:
-                    logger.info(f"  -> Not authorized ({config['authorized_emails']}), skipping")
-                    continue
-
-                # Found a valid email!
-                logger.info(f"  -> AUTHORIZED! Processing this email")
-                email_data = candidate
-                message_id = candidate_id
-                thread_id = candidate_thread_id
-                sender = candidate_sender_email
-                if '<' in candidate.get("from", ""):
-                    sender_name = candidate.get("from", "").split('<')[0].strip()
-                subject = candidate.get("subject", "")
-                body_preview = candidate.get("body") or candidate.get("snippet", "")
-                break
-
-            if not email_data:
                 logger.info("No unread emails from authorized senders found")
                 return {"success": True, "action": "no_authorized_emails"}
 
-            # Log the final classification for the selected email
-            logger.info(f"Selected email classified as: {email_domain} (from {sender})")
+            # Reply to every eligible email, GMAIL_SYNC_CONCURRENCY at a time
+            logger.info(f"Processing {len(eligible)} eligible emails")
+            shared_mcp = _SerializedMCP(mcp)
+            semaphore = asyncio.Semaphore(GMAIL_SYNC_CONCURRENCY)
 
-            # Add to in-flight processing set to prevent concurrent duplicate handling
-            _processing_messages.add(message_id)
-            logger.info(f"Message {message_id} added to in-flight processing set")
+            async def _bounded(email: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    return await _process_email(shared_mcp, agent_access_token, config, email)
 
-            try:
-                # Mark as processing in persistent storage
-                save_processed_id(message_id)
-                logger.info(f"Message {message_id} marked as processing")
-
-                # Get full message content if needed (from agent's inbox)
-                if not body_preview:
-                    logger.info(f"Getting full content for message {message_id}...")
-                    message_content = await mcp.call_tool("gmail_get_email_body_chunk", {
-                        "google_access_token": agent_access_token,
-                        "message_id": message_id
-                    })
-
-                    if message_content:
-                        try:
-                            content_data = json.loads(message_content)
-                            if not body_preview:
-                                body_preview = content_data.get("body", "")
-                        except json.JSONDecodeError:
-                            body_preview = extract_body(message_content)
-
-                logger.info(f"Processing email from: {sender_name} <{sender}>")
-
-                original_subject = subject or ""
-                subject_lower = original_subject.lower()
-
-                # Loop prevention: skip auto-replies
-                for indicator in AUTO_REPLY_INDICATORS:
-                    if indicator in subject_lower:
-                        logger.info(f"Subject contains auto-reply indicator '{indicator}', skipping to prevent loop")
-                        return {"success": True, "action": "auto_reply_skipped", "subject": original_subject}
-
-                # Loop prevention: skip noreply addresses
-                if any(ind in sender for ind in ['noreply', 'no-reply', 'donotreply', 'mailer-daemon']):
-                    logger.info(f"Sender {sender} appears to be a no-reply address, skipping")
-                    return {"success": True, "action": "noreply_sender_skipped", "sender": sender}
-
-                email_body = body_preview or ""
-                logger.info(f"Email body ({len(email_body)} chars): {email_body[:200]}...")
-
-                # Fetch attachment metadata and content for this message.
-                # Uses a single shared AsyncClient (avoids unclosed-connection leaks)
-                # and _walk_parts from the gmail_get_message skill so nested multipart
-                # structures (e.g. multipart/mixed > multipart/alternative > attachment)
-                # are found correctly.
-                attachment_context = ""
-                try:
-                    import base64 as _base64
-                    import httpx as _httpx
-                    import io as _io
-                    from lib.skills.gmail_get_message.handler import (
-                        _walk_parts as _gmail_walk_parts,
-                        _extract_text_from_bytes as _gmail_extract_text,
+            outcomes = await asyncio.gather(
+                *[_bounded(email) for email in eligible],
+                return_exceptions=True,
+            )
+            results: List[Dict[str, Any]] = []
+            for email, outcome in zip(eligible, outcomes):
+                if isinstance(outcome, TokenExpiredError):
+                    raise outcome
+                if isinstance(outcome, Exception):
+                    logger.error(
+                        f"Error processing email {email['message_id']}: {outcome}",
+                        exc_info=outcome,
                     )
-                    _MAX_ATT_BYTES = 5_000_000  # 5 MB
-                    _MAX_CONTENT_CHARS = 5000
-                    _EXTRACTABLE_MIMES = {"text/plain", "text/csv", "text/html", "application/pdf"}
-
-                    async with _httpx.AsyncClient() as _client:
-                        _attach_resp = await _client.get(
-                            f"https://gmail.googleapis.com/gmail/v1/users/me/messages/{message_id}?format=full",
-                            headers={"Authorization": f"Bearer {agent_access_token}"},
-                            timeout=10.0,
-                        )
-                        if _attach_resp.status_code == 200:
-                            _payload = _attach_resp.json().get("payload", {})
-                            # _walk_parts recurses into nested multipart structures
-                            _, _att_meta = _gmail_walk_parts(_payload)
-                            _attachments = []
-                            for _meta in _att_meta:
-                                _att_id = _meta.get("attachmentId", "")
-                                _filename = _meta.get("filename", "")
-                                _mime = _meta.get("mime_type", "")
-                                _size = _meta.get("size", 0)
-                                _att_info = {"filename": _filename, "mime_type": _mime, "size": _size}
-                                if _att_id and _mime in _EXTRACTABLE_MIMES and _size < _MAX_ATT_BYTES:
-                                    try:
-                                        _att_resp = await _client.get(
-                                            f"https://gmail.googleapis.com/gmail/v1/users/me/messages/{message_id}/attachments/{_att_id}",
-                                            headers={"Authorization": f"Bearer {agent_access_token}"},
-                                            timeout=30.0,
-                                        )
-                                        if _att_resp.status_code == 200:
-                                            _raw = _base64.urlsafe_b64decode(_att_resp.json().get("data", ""))
-                                            _extracted = _gmail_extract_text(_raw, _mime, _filename)
-                                            if "content" in _extracted:
-                                                _att_info["content"] = _extracted["content"][:_MAX_CONTENT_CHARS]
-                                    except Exception as _e:
-                                        logger.warning(f"Could not fetch attachment '{_filename}': {_e}")
-                                _attachments.append(_att_info)
-                            if _attachments:
-                                attachment_context = "\n\n**EMAIL ATTACHMENTS:**\n"
-                                for _att in _attachments:
-                                    attachment_context += f"\n### Attachment: {_att['filename']} ({_att['mime_type']}, {_att['size']} bytes)\n"
-                                    if "content" in _att:
-                                        attachment_context += f"Content:\n{_att['content']}\n"
-                                    else:
-                                        attachment_context += "(Binary attachment — content not extracted)\n"
-                except Exception as _e:
-                    logger.warning(f"Could not fetch attachments for message {message_id}: {_e}")
-
-                email_body = email_body + attachment_context
-
-                if not original_subject:
-                    original_subject = "your email"
-                reply_subject = f"Re: {original_subject}" if not original_subject.lower().startswith("re:") else original_subject
-
-                # SABINE 2.0: Fast Path pipeline — WAL write, entity extraction,
-                # embedding, conflict detection, and Slow Path enqueue.
-                # Replaces the legacy ingest_user_message() call.
-                # Skip for very short emails (likely automated).
-                if len(email_body.strip()) >= 20:
-                    try:
-                        # Lazy import to avoid circular dependencies
-                        from backend.services.fast_path import process_fast_path
-
-                        # Format email content for Fast Path processing
-                        ingestion_content = (
-                            f"Email from {sender}"
-                            + (f" ({sender_name})" if sender_name else "")
-                            + f"\nSubject: {original_subject}\n"
-                            f"---\n"
-                            f"{email_body[:2000]}"  # Truncate very long emails
-                        )
-
-                        logger.info(f"Running Fast Path for email (domain={email_domain})...")
-                        fp_result = await process_fast_path(
-                            user_id=config["user_id"],
-                            message=ingestion_content,
-                            session_id=f"email-{email_domain}-{message_id}",
-                        )
-
-                        logger.info(
-                            f"Fast Path complete: wal_id={fp_result.wal_entry_id}, "
-                            f"entities={len(fp_result.extracted_entities)}, "
-                            f"conflicts={len(fp_result.conflicts)}, "
-                            f"memories={len(fp_result.retrieved_memories)}, "
-                            f"queue_job={fp_result.queue_job_id}, "
-                            f"total={fp_result.timings.get('total_ms', 0):.1f}ms"
-                        )
-                    except Exception as e:
-                        # Fast Path failure should NOT block email response
-                        logger.warning(f"Email Fast Path failed (non-fatal): {e}", exc_info=True)
-                else:
-                    logger.info(f"Skipping Fast Path for very short email ({len(email_body.strip())} chars)")
-
-                # Generate AI response
-                logger.info(f"Generating AI response for email from {sender}...")
-                ai_response = await generate_ai_response(
-                    sender_email=sender,
-                    sender_name=sender_name,
-                    subject=original_subject,
-                    body=email_body,
-                    user_id=config["user_id"],
-                    email_domain=email_domain  # Pass domain classification
-                )
-
-                logger.info(f"AI response: {ai_response[:200]}...")
-
-                # Convert plain text to simple HTML for email rendering
-                html_response = ai_response.replace('\n', '<br>\n')
-                html_body = f"""<html>
-<body style="font-family: Arial, sans-serif; line-height: 1.6;">
-{html_response}
-</body>
-</html>"""
-
-                # Get original email's Message-ID header for threading
-                logger.info(f"Getting original email headers for threading...")
-                original_headers = await get_message_headers(mcp, agent_access_token, message_id)
-                in_reply_to = original_headers.get("message_id_header")
-                references = original_headers.get("references")
-
-                # Send threaded reply using Gmail API directly
-                # This ensures the reply appears in the same email thread
-                logger.info(f"Sending threaded AI-generated reply to {sender} (thread: {thread_id})...")
-                send_result = await send_threaded_reply(
-                    access_token=agent_access_token,
-                    config=config,
-                    to=sender,
-                    subject=reply_subject,
-                    body=ai_response,
-                    html_body=html_body,
-                    thread_id=thread_id,
-                    in_reply_to=in_reply_to,
-                    references=references
-                )
+                    outcome = {"success": False, "error": str(outcome), "message_id": email["message_id"]}
+                results.append(outcome)
 
-                logger.info(f"Send result: {send_result}")
-
-                if send_result.get("success"):
-                    logger.info(f"Threaded AI response sent to {sender} in thread {thread_id}")
-
-                    # Mark the original email as read (like a real email client)
-                    await mark_as_read(agent_access_token, message_id)
-
-                    # Mark thread as replied to prevent double-replies
-                    if thread_id:
-                        save_replied_thread(thread_id)
-                        logger.info(f"Thread {thread_id} marked as replied")
-                    return {
-                        "success": True,
-                        "action": "replied",
-                        "recipient": sender,
-                        "message_id": message_id,
-                        "thread_id": thread_id,
-                        "subject": reply_subject,
-                        "response_type": "ai_generated",
-                        "threaded": True
-                    }
-                else:
-                    error_msg = send_result.get("error", "Unknown error")
-                    logger.warning(f"Failed to send threaded reply to {sender}: {error_msg}")
-                    return {"success": False, "error": f"Failed to send threaded reply: {error_msg}"}
-
-            finally:
-                # Always remove from in-flight processing set when done
-                if message_id and message_id in _processing_messages:
-                    _processing_messages.discard(message_id)
-                    logger.debug(f"Message {message_id} removed from in-flight processing set")
+            _advance_history(dedup, mailbox, next_history_id)
+            return _summarize_results(results)
 
     except TokenExpiredError as token_err:
         logger.critical(
@@ -0,0 +1,374 @@
+"""
+Gmail Incremental Sync - History API deltas and Redis dedup state
+=================================================================
+
+Supports ``gmail_handler.handle_new_email_notification()`` so that each
+push notification or poll only looks at mail that arrived since the last
+sync:
+
+- The last-seen ``historyId`` per mailbox is kept in Redis
+  (``sabine:gmail:history_id:{mailbox}``).  A sync calls
+  ``users.history.list`` with ``startHistoryId`` and
+  ``historyTypes=messageAdded`` and returns only the new INBOX messages.
+  When there is no stored ID yet, or Google reports it expired (HTTP 404),
+  the caller falls back to its "recent unread" listing and the cursor is
+  reset to the mailbox's current ``historyId``.
+- Processed message IDs and replied thread IDs live in Redis sorted sets
+  (``sabine:gmail:processed`` / ``sabine:gmail:replied_threads``).  The
+  score is the time each ID was added, and entries older than
+  ``EMAIL_DEDUP_TTL_DAYS`` are pruned, so each set acts as a set with
+  per-member TTL.  ``ZADD NX`` makes claiming a message atomic across
+  processes.  Membership checks are per ID, which replaces the 60-second
+  reload of seven days of IDs from Supabase and the local JSON rewrites.
+
+Configuration:
+- EMAIL_DEDUP_TTL_DAYS: How long processed IDs are remembered (default: 7)
+- GMAIL_SYNC_CONCURRENCY: Parallel Gmail API / reply workers (default: 4)
+
+Owner: @backend-architect-sabine
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+EMAIL_DEDUP_TTL_DAYS = int(os.getenv("EMAIL_DEDUP_TTL_DAYS", "7"))
+GMAIL_SYNC_CONCURRENCY = int(os.getenv("GMAIL_SYNC_CONCURRENCY", "4"))
+
+GMAIL_API_BASE = "https://gmail.googleapis.com/gmail/v1/users/me"
+
+PROCESSED_KEY = "sabine:gmail:processed"
+REPLIED_THREADS_KEY = "sabine:gmail:replied_threads"
+HISTORY_KEY_PREFIX = "sabine:gmail:history_id"
+
+# Maximum history pages followed in one sync (500 records per page)
+MAX_HISTORY_PAGES = 10
+
+# Store ARGV[1] only if it is newer than the current cursor
+_ADVANCE_HISTORY_SCRIPT = """
+local current = redis.call('get', KEYS[1])
+if (not current) or tonumber(ARGV[1]) > tonumber(current) then
+    redis.call('set', KEYS[1], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+# =============================================================================
+# Dedup Store
+# =============================================================================
+
+class EmailDedupStore:
+    """
+    Expiring Redis sets of processed message IDs and replied thread IDs.
+
+    Usage:
+        store = EmailDedupStore()
+        if store.claim_message(message_id):
+            ...  # first process to see this message
+        store.mark_thread_replied(thread_id)
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        ttl_days: int = EMAIL_DEDUP_TTL_DAYS,
+        clock: Any = time.time,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            redis_client: Redis client (defaults to the shared singleton)
+            ttl_days: How long IDs are remembered
+            clock: Returns the current epoch time in seconds (for tests)
+        """
+        self._redis_client = redis_client
+        self.ttl_seconds = ttl_days * 86400
+        self._clock = clock
+
+    def _redis(self) -> Any:
+        if self._redis_client is None:
+            from backend.services.redis_client import get_redis_client
+            self._redis_client = get_redis_client()
+        return self._redis_client
+
+    def _add(self, key: str, member: str, nx: bool) -> bool:
+        now = self._clock()
+        pipe = self._redis().pipeline()
+        pipe.zremrangebyscore(key, "-inf", now - self.ttl_seconds)
+        pipe.zadd(key, {member: now}, nx=nx)
+        pipe.expire(key, self.ttl_seconds)
+        _, added, _ = pipe.execute()
+        return bool(added)
+
+    def _members(self, key: str, members: Iterable[str]) -> Set[str]:
+        members = [m for m in members if m]
+        if not members:
+            return set()
+        cutoff = self._clock() - self.ttl_seconds
+        scores = self._redis().zmscore(key, members)
+        return {m for m, s in zip(members, scores) if s is not None and s > cutoff}
+
+    def claim_message(self, message_id: str) -> bool:
+        """Atomically mark a message processed; False if it already was."""
+        return self._add(PROCESSED_KEY, message_id, nx=True)
+
+    def mark_processed(self, message_id: str) -> None:
+        """Mark a message processed (idempotent)."""
+        self._add(PROCESSED_KEY, message_id, nx=True)
+
+    def processed(self, message_ids: Iterable[str]) -> Set[str]:
+        """Return the subset of ``message_ids`` already processed."""
+        return self._members(PROCESSED_KEY, message_ids)
+
+    def mark_thread_replied(self, thread_id: str) -> None:
+        """Remember that Sabine replied in this thread."""
+        self._add(REPLIED_THREADS_KEY, thread_id, nx=False)
+
+    def replied_threads(self, thread_ids: Iterable[str]) -> Set[str]:
+        """Return the subset of ``thread_ids`` already replied to."""
+        return self._members(REPLIED_THREADS_KEY, thread_ids)
+
+    # -------------------------------------------------------------------------
+    # History cursor
+    # -------------------------------------------------------------------------
+
+    def get_history_id(self, mailbox: str) -> Optional[str]:
+        """Last-seen historyId for a mailbox."""
+        return self._redis().get(f"{HISTORY_KEY_PREFIX}:{mailbox}")
+
+    def advance_history_id(self, mailbox: str, history_id: str) -> bool:
+        """Move the mailbox cursor forward (never backward)."""
+        if not history_id or not str(history_id).isdigit():
+            return False
+        return bool(self._redis().eval(
+            _ADVANCE_HISTORY_SCRIPT, 1, f"{HISTORY_KEY_PREFIX}:{mailbox}", str(history_id),
+        ))
+
+    def reset_history_id(self, mailbox: str, history_id: str) -> None:
+        """Overwrite the mailbox cursor (after an expired-history fallback)."""
+        self._redis().set(f"{HISTORY_KEY_PREFIX}:{mailbox}", str(history_id))
+
+
+_dedup_store: Optional[EmailDedupStore] = None
+
+
+def get_dedup_store() -> Optional[EmailDedupStore]:
+    """
+    Get the shared dedup store, or None if Redis is unreachable.
+
+    Callers fall back to the Supabase/local-file tracking when this
+    returns None.
+    """
+    global _dedup_store
+    try:
+        if _dedup_store is None:
+            store = EmailDedupStore()
+            store._redis().ping()
+            _dedup_store = store
+        return _dedup_store
+    except Exception as e:
+        logger.warning(f"Email dedup store unavailable (using Supabase fallback): {e}")
+        return None
+
+
+# =============================================================================
+# Gmail History API
+# =============================================================================
+
+class HistoryExpiredError(Exception):
+    """startHistoryId is too old for users.history.list (HTTP 404)."""
+
+
+def _header(headers: List[Dict[str, str]], name: str) -> str:
+    for h in headers or []:
+        if h.get("name", "").lower() == name.lower():
+            return h.get("value", "")
+    return ""
+
+
+async def get_mailbox_history_id(client: Any, access_token: str) -> Optional[str]:
+    """Return the mailbox's current historyId from ``users.getProfile``."""
+    response = await client.get(
+        f"{GMAIL_API_BASE}/profile",
+        headers={"Authorization": f"Bearer {access_token}"},
+        timeout=10.0,
+    )
+    if response.status_code != 200:
+        logger.warning(f"Gmail profile lookup failed: {response.status_code}")
+        return None
+    return str(response.json().get("historyId") or "") or None
+
+
+async def list_history_message_ids(
+    client: Any,
+    access_token: str,
+    start_history_id: str,
+) -> Tuple[List[str], Optional[str]]:
+    """
+    List INBOX messages added since ``start_history_id``.
+
+    Args:
+        client: httpx.AsyncClient
+        access_token: Gmail access token for the mailbox
+        start_history_id: Last-seen historyId
+
+    Returns:
+        (message_ids in arrival order without duplicates, latest historyId)
+
+    Raises:
+        HistoryExpiredError: Google no longer has history that far back
+    """
+    message_ids: List[str] = []
+    seen: Set[str] = set()
+    latest: Optional[str] = None
+    page_token: Optional[str] = None
+
+    for _ in range(MAX_HISTORY_PAGES):
+        params: Dict[str, Any] = {
+            "startHistoryId": start_history_id,
+            "historyTypes": "messageAdded",
+            "labelId": "INBOX",
+            "maxResults": 500,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+
+        response = await client.get(
+            f"{GMAIL_API_BASE}/history",
+            headers={"Authorization": f"Bearer {access_token}"},
+            params=params,
+            timeout=15.0,
+        )
+        if response.status_code == 404:
+            raise HistoryExpiredError(start_history_id)
+        response.raise_for_status()
+
+        data = response.json()
+        latest = str(data.get("historyId") or latest or "") or None
+        for record in data.get("history", []):
+            for added in record.get("messagesAdded", []):
+                msg_id = (added.get("message") or {}).get("id")
+                if msg_id and msg_id not in seen:
+                    seen.add(msg_id)
+                    message_ids.append(msg_id)
+
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            break
+
+    return message_ids, latest
+
+
+async def fetch_message_summaries(
+    client: Any,
+    access_token: str,
+    message_ids: List[str],
+    concurrency: int = GMAIL_SYNC_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch From/Subject/snippet for each message, in parallel.
+
+    Returns dicts in the same shape ``gmail_get_recent_emails`` produces
+    (``id``, ``threadId``, ``from``, ``subject``, ``snippet``), newest
+    first, limited to unread INBOX messages.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(message_id: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                response = await client.get(
+                    f"{GMAIL_API_BASE}/messages/{message_id}",
+                    headers={"Authorization": f"Bearer {access_token}"},
+                    params={"format": "metadata", "metadataHeaders": ["From", "Subject"]},
+                    timeout=10.0,
+                )
+            except Exception as e:
+                logger.warning(f"Could not fetch message {message_id}: {e}")
+                return None
+        if response.status_code != 200:
+            # 404: deleted between the history event and now
+            return None
+        data = response.json()
+        labels = set(data.get("labelIds", []))
+        if "INBOX" not in labels or "UNREAD" not in labels:
+            return None
+        headers = (data.get("payload") or {}).get("headers", [])
+        return {
+            "id": data.get("id", message_id),
+            "threadId": data.get("threadId") or message_id,
+            "from": _header(headers, "From"),
+            "subject": _header(headers, "Subject"),
+            "snippet": data.get("snippet", ""),
+            "internalDate": data.get("internalDate"),
+        }
+
+    summaries = await asyncio.gather(*[_one(mid) for mid in message_ids])
+    emails = [s for s in summaries if s]
+    emails.sort(key=lambda e: int(e.get("internalDate") or 0), reverse=True)
+    return emails
+
+
+async def sync_new_emails(
+    access_token: str,
+    mailbox: str,
+    store: EmailDedupStore,
+    push_history_id: Optional[str] = None,
+    client: Optional[Any] = None,
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """
+    Return the mailbox's new unread INBOX messages since the last sync.
+
+    Args:
+        access_token: Gmail access token for the mailbox
+        mailbox: Mailbox address (cursor key)
+        store: Dedup store holding the cursor
+        push_history_id: historyId from a push notification, if any
+        client: httpx.AsyncClient (one is created if omitted)
+
+    Returns:
+        (emails, next_history_id).  The caller passes ``next_history_id``
+        to ``store.advance_history_id()`` once the emails are handled, so
+        a crash mid-batch replays the delta (dedup makes that safe).
+        ``emails`` is None when the caller must fall back to a full
+        "recent unread" listing (no cursor yet, or history expired); the
+        cursor is then reset to the mailbox's current historyId so the
+        next sync is incremental.
+    """
+    import httpx
+
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient()
+    try:
+        start = store.get_history_id(mailbox)
+        if start:
+            try:
+                message_ids, latest = await list_history_message_ids(client, access_token, start)
+                emails = await fetch_message_summaries(client, access_token, message_ids)
+                logger.info(
+                    f"Gmail history sync for {mailbox}: {len(message_ids)} added since "
+                    f"{start}, {len(emails)} unread in INBOX"
+                )
+                return emails, latest or push_history_id
+            except HistoryExpiredError:
+                logger.warning(f"Gmail historyId {start} expired for {mailbox}; full resync")
+
+        current = await get_mailbox_history_id(client, access_token)
+        if current:
+            store.reset_history_id(mailbox, current)
+        return None, None
+    finally:
+        if owns_client:
+            await client.aclose()
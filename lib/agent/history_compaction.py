@@ -0,0 +1,505 @@
+"""
+Conversation History Compaction
+===============================
+
+Keeps the prompt for long threads bounded.  Instead of replaying the whole
+``conversation_history`` on every turn, the agent sees:
+
+1. A rolling summary of the older turns, cached per session and extended
+   incrementally: only turns that aged out since the last fold are sent to
+   a cheap model together with the previous summary.
+2. The last ``HISTORY_KEEP_TURNS`` turns verbatim.
+
+A *turn* is a user message plus everything that follows it up to the next
+user message (assistant replies, assistant tool calls and their tool
+results), so compaction never separates a tool call from its result.
+
+The whole thing is held under ``HISTORY_TOKEN_BUDGET`` tokens, estimated
+locally with ``tiktoken`` when it is installed and a chars/4 heuristic
+otherwise.  When the budget is exceeded, more turns are folded into the
+summary (the current turn is always kept verbatim).
+
+Folding is batched (``HISTORY_FOLD_BATCH``): the verbatim window is allowed
+to grow a few turns past ``HISTORY_KEEP_TURNS`` before the summarizer is
+called, so a long thread pays for one summary call every few turns instead
+of every turn.
+
+Usage::
+
+    compacted = await compact_history(session_id, conversation_history)
+    if compacted.summary:
+        messages.append(HumanMessage(content=compacted.summary_message()))
+    for msg in compacted.messages:
+        ...
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+HISTORY_COMPACTION_ENABLED = os.getenv("HISTORY_COMPACTION_ENABLED", "true").lower() == "true"
+HISTORY_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "6"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "3000"))
+HISTORY_FOLD_BATCH = int(os.getenv("HISTORY_FOLD_BATCH", "4"))
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "500"))
+HISTORY_SUMMARY_MODEL = os.getenv("HISTORY_SUMMARY_MODEL", "claude-3-5-haiku-20241022")
+HISTORY_SUMMARY_TIMEOUT_SECONDS = float(os.getenv("HISTORY_SUMMARY_TIMEOUT_SECONDS", "8"))
+HISTORY_SUMMARY_CACHE_SIZE = int(os.getenv("HISTORY_SUMMARY_CACHE_SIZE", "1000"))
+HISTORY_SUMMARY_TTL_SECONDS = float(os.getenv("HISTORY_SUMMARY_TTL_SECONDS", "86400"))
+
+# Per-message framing overhead (role markers etc.) in chat formats
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+Message = Dict[str, Any]
+Turn = List[Message]
+Summarizer = Callable[[Optional[str], Sequence[Turn], int], Awaitable[str]]
+
+
+# =============================================================================
+# Token Estimation
+# =============================================================================
+
+_encoder: Any = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder() -> Any:
+    """cl100k encoder if tiktoken is installed, else None (loaded once)."""
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        with _encoder_lock:
+            if not _encoder_loaded:
+                try:
+                    import tiktoken
+                    _encoder = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    logger.info("tiktoken unavailable, using chars/4 token estimate: %s", e)
+                    _encoder = None
+                _encoder_loaded = True
+    return _encoder
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local estimate of the number of tokens in ``text``.
+
+    Not exact for Claude models, but close enough to enforce a budget
+    without a network round trip.
+    """
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _content_text(message: Message) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, default=str)
+
+
+def estimate_message_tokens(message: Message) -> int:
+    tokens = estimate_tokens(_content_text(message)) + _MESSAGE_OVERHEAD_TOKENS
+    if message.get("tool_calls"):
+        tokens += estimate_tokens(json.dumps(message["tool_calls"], default=str))
+    return tokens
+
+
+def estimate_turn_tokens(turn: Turn) -> int:
+    return sum(estimate_message_tokens(m) for m in turn)
+
+
+# =============================================================================
+# Turn Grouping
+# =============================================================================
+
+def split_turns(history: Sequence[Message]) -> List[Turn]:
+    """
+    Group a flat message list into turns.
+
+    Each turn starts at a user message and owns every following assistant
+    and tool message, which keeps tool calls and tool results together.
+    Leading non-user messages form a turn of their own.
+    """
+    turns: List[Turn] = []
+    for message in history:
+        if message.get("role") == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _turns_digest(turns: Sequence[Turn]) -> str:
+    """Fingerprint of a run of turns, used to detect edited history."""
+    digest = hashlib.sha256()
+    for turn in turns:
+        for message in turn:
+            digest.update(str(message.get("role")).encode("utf-8"))
+            digest.update(b"\x00")
+            digest.update(_content_text(message).encode("utf-8"))
+            digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+def format_turns(turns: Sequence[Turn]) -> str:
+    """Render turns as a plain transcript for the summarizer."""
+    lines: List[str] = []
+    for turn in turns:
+        for message in turn:
+            role = message.get("role", "unknown")
+            if role == "tool":
+                name = message.get("name") or "tool"
+                lines.append(f"Tool result ({name}): {_content_text(message)}")
+                continue
+            text = _content_text(message)
+            for call in message.get("tool_calls") or []:
+                name = call.get("name") or call.get("function", {}).get("name", "tool")
+                text += f" [called {name}]"
+            lines.append(f"{role.capitalize()}: {text.strip()}")
+    return "\n".join(lines)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` so its estimate fits in ``max_tokens``."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    encoder = _get_encoder()
+    if encoder is not None:
+        return encoder.decode(encoder.encode(text, disallowed_special=())[: max(0, max_tokens - 2)]).rstrip() + " …"
+    return text[: max(0, max_tokens - 2) * 4].rstrip() + " …"
+
+
+# =============================================================================
+# Summarizers
+# =============================================================================
+
+_SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and their personal assistant.
+
+Update the summary with the new conversation turns. Keep facts, decisions,
+commitments, names, dates, open questions and the outcome of tool calls.
+Drop greetings and small talk. Write terse bullet points, no preamble.
+Stay under {max_tokens} tokens."""
+
+
+def extractive_summary(
+    previous: Optional[str],
+    turns: Sequence[Turn],
+    max_tokens: int,
+) -> str:
+    """
+    Model-free fallback: the previous summary plus a clipped line per turn.
+
+    Older material is dropped first when the result exceeds ``max_tokens``.
+    """
+    lines = [previous] if previous else []
+    for turn in turns:
+        user = next((m for m in turn if m.get("role") == "user"), None)
+        reply = next(
+            (m for m in reversed(turn) if m.get("role") == "assistant" and _content_text(m)),
+            None,
+        )
+        parts = []
+        if user is not None:
+            parts.append("User: " + truncate_to_tokens(_content_text(user), 40))
+        if reply is not None:
+            parts.append("Assistant: " + truncate_to_tokens(_content_text(reply), 40))
+        if parts:
+            lines.append("- " + " / ".join(parts))
+
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+
+async def summarize_with_model(
+    previous: Optional[str],
+    turns: Sequence[Turn],
+    max_tokens: int,
+) -> str:
+    """
+    Fold ``turns`` into ``previous`` with the cheap summary model.
+
+    Falls back to :func:`extractive_summary` when no API key is configured
+    or the call fails or times out.
+    """
+    try:
+        from anthropic import AsyncAnthropic
+
+        from backend.services.metrics import track_llm_call
+        from backend.services.rate_limiter import approx_tokens, llm_rate_limit
+
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            logger.debug("ANTHROPIC_API_KEY not set; using extractive history summary")
+            return extractive_summary(previous, turns, max_tokens)
+
+        client = AsyncAnthropic(api_key=api_key)
+        content = (
+            f"Current summary:\n{previous or '(empty)'}\n\n"
+            f"New turns:\n{format_turns(turns)}"
+        )
+        async with llm_rate_limit(
+            "anthropic",
+            HISTORY_SUMMARY_MODEL,
+            approx_tokens(_SUMMARY_PROMPT, content) + max_tokens,
+            max_wait=HISTORY_SUMMARY_TIMEOUT_SECONDS,
+        ) as slot:
+            with track_llm_call("anthropic", HISTORY_SUMMARY_MODEL):
+                response = await asyncio.wait_for(
+                    client.messages.create(
+                        model=HISTORY_SUMMARY_MODEL,
+                        max_tokens=max_tokens,
+                        system=_SUMMARY_PROMPT.format(max_tokens=max_tokens),
+                        messages=[{"role": "user", "content": content}],
+                    ),
+                    timeout=HISTORY_SUMMARY_TIMEOUT_SECONDS,
+                )
+            await slot.record_async(response)
+        summary = response.content[0].text.strip()
+        if summary:
+            return truncate_to_tokens(summary, max_tokens)
+        return extractive_summary(previous, turns, max_tokens)
+
+    except Exception as e:
+        logger.warning("History summarization failed, using extractive summary: %s", e)
+        return extractive_summary(previous, turns, max_tokens)
+
+
+# =============================================================================
+# Session Summary Cache
+# =============================================================================
+
+@dataclass
+class SessionSummary:
+    """Rolling summary of the first ``folded_turns`` turns of a session."""
+    summary: str
+    folded_turns: int
+    digest: str
+    updated_at: float = 0.0
+
+
+class SessionSummaryCache:
+    """Bounded LRU of per-session summaries with a TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = HISTORY_SUMMARY_CACHE_SIZE,
+        ttl_seconds: float = HISTORY_SUMMARY_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, SessionSummary]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[SessionSummary]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if self._clock() - entry.updated_at > self.ttl_seconds:
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return entry
+
+    def put(self, session_id: str, entry: SessionSummary) -> None:
+        entry.updated_at = self._clock()
+        with self._lock:
+            self._entries[session_id] = entry
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# =============================================================================
+# Compactor
+# =============================================================================
+
+@dataclass
+class CompactedHistory:
+    """What the agent should see in place of the full history."""
+    summary: Optional[str]
+    messages: List[Message]
+    folded_turns: int
+    total_turns: int
+    estimated_tokens: int
+    original_tokens: int
+    summarized: bool = False
+
+    def summary_message(self) -> str:
+        """The summary framed as context for the model."""
+        return f"Summary of our earlier conversation:\n{self.summary}"
+
+
+class HistoryCompactor:
+    """
+    Folds old turns into a cached rolling summary and keeps the recent ones
+    verbatim, within a token budget.
+
+    Args:
+        keep_turns: Turns always kept verbatim (when the budget allows).
+        token_budget: Upper bound for summary + verbatim turns.
+        fold_batch: Minimum number of newly aged-out turns before the
+            summarizer is called again.
+        summary_max_tokens: Size cap of the rolling summary.
+        summarizer: ``async (previous, turns, max_tokens) -> summary``.
+        cache: Per-session summary store.
+    """
+
+    def __init__(
+        self,
+        keep_turns: int = HISTORY_KEEP_TURNS,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        fold_batch: int = HISTORY_FOLD_BATCH,
+        summary_max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS,
+        summarizer: Optional[Summarizer] = None,
+        cache: Optional[SessionSummaryCache] = None,
+    ):
+        self.keep_turns = max(1, keep_turns)
+        self.token_budget = token_budget
+        self.fold_batch = max(1, fold_batch)
+        self.summary_max_tokens = summary_max_tokens
+        self.summarizer = summarizer or summarize_with_model
+        self.cache = cache if cache is not None else SessionSummaryCache()
+        self.summary_calls = 0
+
+    def _cached(self, session_id: Optional[str], turns: Sequence[Turn]) -> Optional[SessionSummary]:
+        """The cached summary, if it still describes a prefix of ``turns``."""
+        if not session_id:
+            return None
+        entry = self.cache.get(session_id)
+        if entry is None:
+            return None
+        if entry.folded_turns > len(turns) or entry.digest != _turns_digest(turns[: entry.folded_turns]):
+            # History was edited or belongs to a different thread
+            self.cache.invalidate(session_id)
+            return None
+        return entry
+
+    async def compact(
+        self,
+        session_id: Optional[str],
+        history: Optional[Sequence[Message]],
+    ) -> CompactedHistory:
+        """
+        Compact ``history`` for one agent run.
+
+        Args:
+            session_id: Conversation id the summary is cached under.
+            history: Prior messages (``role``/``content`` dicts), oldest first.
+
+        Returns:
+            CompactedHistory with the summary (or None) and the verbatim messages.
+        """
+        turns = split_turns(history or [])
+        turn_tokens = [estimate_turn_tokens(t) for t in turns]
+        original_tokens = sum(turn_tokens)
+
+        cached = self._cached(session_id, turns)
+        folded = cached.folded_turns if cached else 0
+        summary = cached.summary if cached else None
+
+        def size(fold_at: int, summary_tokens: int) -> int:
+            return summary_tokens + sum(turn_tokens[fold_at:])
+
+        # Where the fold point would be without batching
+        target = max(folded, len(turns) - self.keep_turns)
+        current_summary_tokens = estimate_tokens(summary) if summary else 0
+        if target - folded < self.fold_batch and size(folded, current_summary_tokens) <= self.token_budget:
+            # Not worth a summary call yet; keep the extra turns verbatim
+            target = folded
+        else:
+            # Fold further while summary (at its cap) + verbatim turns overflow
+            while target < len(turns) - 1 and size(target, self.summary_max_tokens) > self.token_budget:
+                target += 1
+
+        summarized = False
+        if target > folded:
+            summary = await self.summarizer(summary, turns[folded:target], self.summary_max_tokens)
+            summary = truncate_to_tokens(summary, self.summary_max_tokens)
+            self.summary_calls += 1
+            summarized = True
+            folded = target
+            if session_id:
+                self.cache.put(session_id, SessionSummary(
+                    summary=summary,
+                    folded_turns=folded,
+                    digest=_turns_digest(turns[:folded]),
+                ))
+
+        kept = turns[folded:]
+        summary_tokens = estimate_tokens(summary) if summary else 0
+        return CompactedHistory(
+            summary=summary,
+            messages=[m for turn in kept for m in turn],
+            folded_turns=folded,
+            total_turns=len(turns),
+            estimated_tokens=size(folded, summary_tokens),
+            original_tokens=original_tokens,
+            summarized=summarized,
+        )
+
+
+_compactor: Optional[HistoryCompactor] = None
+
+
+def get_history_compactor() -> HistoryCompactor:
+    """Get the process-wide history compactor."""
+    global _compactor
+    if _compactor is None:
+        _compactor = HistoryCompactor()
+    return _compactor
+
+
+async def compact_history(
+    session_id: Optional[str],
+    history: Optional[Sequence[Message]],
+) -> CompactedHistory:
+    """
+    Compact ``history`` with the process-wide compactor.
+
+    With ``HISTORY_COMPACTION_ENABLED=false`` the history is passed through.
+    """
+    if not HISTORY_COMPACTION_ENABLED:
+        messages = list(history or [])
+        tokens = sum(estimate_message_tokens(m) for m in messages)
+        return CompactedHistory(
+            summary=None,
+            messages=messages,
+            folded_turns=0,
+            total_turns=len(split_turns(messages)),
+            estimated_tokens=tokens,
+            original_tokens=tokens,
+        )
+    return await get_history_compactor().compact(session_id, history)
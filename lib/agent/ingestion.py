@@ -0,0 +1,665 @@
+"""
+Chunked File Ingestion
+======================
+
+Turns an uploaded file into many retrievable memories instead of one blob.
+
+Pipeline (one background job per upload):
+
+1. ``spool_upload`` streams the upload to a temp file in fixed-size blocks,
+   enforcing the size limit as it goes, so the request never holds the
+   whole file in memory.
+2. The file is uploaded to the ``knowledge_base`` storage bucket straight
+   from disk.
+3. ``parsing.iter_file_sections`` parses it incrementally (a PDF page, a
+   block of spreadsheet rows, a block of text at a time).  Images are
+   described once with ``parsing.parse_image``.
+4. ``chunk_sections`` packs paragraphs, lines and sentences into chunks of
+   about ``INGEST_CHUNK_CHARS`` characters, each repeating the last
+   ``INGEST_CHUNK_OVERLAP_CHARS`` of its predecessor.
+5. Chunks are embedded ``INGEST_EMBED_BATCH_SIZE`` at a time in one
+   embeddings call per batch and bulk-inserted into ``memories`` with
+   ``document_id`` pointing at the file's ``knowledge_files`` row (the
+   parent document record).
+6. Entities and the domain are extracted once, from the opening of the
+   document; each chunk links the entities it mentions.
+
+Progress lives on the ``IngestionJob`` in this process and is mirrored to
+the ``knowledge_files`` row after every batch, so
+``GET /memory/upload/{job_id}/progress`` can answer from any API replica.
+A failed job deletes the chunks it already stored.
+
+The job runs in the API process (FastAPI background task, background LLM
+priority) because the spooled file is on that process's disk.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+MAX_UPLOAD_BYTES = 52428800  # 50MB
+UPLOAD_READ_BLOCK_BYTES = 1024 * 1024
+INGEST_CHUNK_CHARS = int(os.getenv("INGEST_CHUNK_CHARS", "1500"))
+INGEST_CHUNK_OVERLAP_CHARS = int(os.getenv("INGEST_CHUNK_OVERLAP_CHARS", "200"))
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64"))
+# Characters from the start of the document used for entity/domain extraction
+INGEST_CONTEXT_CHARS = int(os.getenv("INGEST_CONTEXT_CHARS", "6000"))
+EMBEDDING_MODEL = "text-embedding-3-small"
+STORAGE_BUCKET = "knowledge_base"
+# Finished jobs kept in memory for progress queries
+MAX_FINISHED_JOBS = 200
+
+
+class UploadTooLargeError(ValueError):
+    """The upload exceeded ``MAX_UPLOAD_BYTES`` while being spooled."""
+
+
+# =============================================================================
+# Spooling
+# =============================================================================
+
+async def spool_upload(upload: Any, filename: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[str, int]:
+    """
+    Stream an upload to a temp file.
+
+    Args:
+        upload: Object with an async ``read(size)`` (e.g. FastAPI ``UploadFile``)
+        filename: Original filename (its extension is kept)
+        max_bytes: Size limit
+
+    Returns:
+        Tuple of (temp file path, size in bytes)
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than ``max_bytes``
+    """
+    suffix = os.path.splitext(filename)[1][:16]
+    handle = tempfile.NamedTemporaryFile(prefix="sabine_upload_", suffix=suffix, delete=False)
+    size = 0
+    try:
+        with handle:
+            while True:
+                block = await upload.read(UPLOAD_READ_BLOCK_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"File too large: more than {max_bytes:,} bytes. Maximum: {max_bytes:,} bytes"
+                    )
+                await asyncio.to_thread(handle.write, block)
+    except BaseException:
+        _remove(handle.name)
+        raise
+    return handle.name, size
+
+
+def _remove(path: Optional[str]) -> None:
+    if path:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+# =============================================================================
+# Chunking
+# =============================================================================
+
+@dataclass
+class TextChunk:
+    """A chunk of a document, with the labels of the sections it spans."""
+    index: int
+    text: str
+    sections: List[str]
+
+    def label(self) -> str:
+        if not self.sections:
+            return ""
+        if len(self.sections) == 1:
+            return self.sections[0]
+        return f"{self.sections[0]} to {self.sections[-1]}"
+
+
+# Coarsest to finest: paragraphs, lines, sentences, words
+_SPLITTERS = (
+    (re.compile(r"\n\s*\n"), "\n\n"),
+    (re.compile(r"\n"), "\n"),
+    (re.compile(r"(?<=[.!?])\s+"), " "),
+    (re.compile(r"\s+"), " "),
+)
+_SENTENCE_LEVEL = 2
+
+
+def _split_units(text: str, max_chars: int, level: int = 0, joiner: str = "\n\n") -> Iterator[Tuple[str, str]]:
+    """
+    Split ``text`` into (unit, joiner) pairs: paragraphs, or lines, sentences
+    or words where a paragraph is longer than ``max_chars``.  ``joiner`` is
+    what separated the unit from the one before it.
+    """
+    text = text.strip()
+    if not text:
+        return
+    if len(text) <= max_chars and level > 0:
+        yield text, joiner
+        return
+    if level >= len(_SPLITTERS):
+        for start in range(0, len(text), max_chars):
+            yield text[start:start + max_chars], joiner if start == 0 else ""
+        return
+    pattern, separator = _SPLITTERS[level]
+    for i, piece in enumerate(p for p in pattern.split(text) if p.strip()):
+        yield from _split_units(piece, max_chars, level + 1, joiner if i == 0 else separator)
+
+
+@dataclass
+class _Unit:
+    text: str
+    joiner: str
+    label: str
+
+
+class Chunker:
+    """
+    Packs parsed sections into overlapping chunks at natural boundaries,
+    one section at a time.
+
+    Paragraphs (or rows) are packed whole; only paragraphs longer than a
+    chunk are split into lines, sentences or words.  Chunks may span
+    sections (a paragraph continuing onto the next page).  Each chunk
+    after the first starts with up to ``overlap_chars`` of trailing
+    sentences from the previous chunk.
+
+    Args:
+        max_chars: Target maximum chunk size
+        overlap_chars: Maximum overlap carried into the next chunk
+    """
+
+    def __init__(self, max_chars: int = INGEST_CHUNK_CHARS, overlap_chars: int = INGEST_CHUNK_OVERLAP_CHARS):
+        self.max_chars = max_chars
+        self.overlap_chars = overlap_chars
+        self._units: List[_Unit] = []
+        self._size = 0
+        self._fresh = False                        # whether units hold anything not yet emitted
+        self._index = 0
+
+    def feed(self, label: str, text: str) -> List[TextChunk]:
+        """Add a section; returns the chunks it completed."""
+        chunks = []
+        for unit_text, joiner in _split_units(text, self.max_chars):
+            if self._fresh and self._size + len(joiner) + len(unit_text) > self.max_chars:
+                chunks.append(self._emit())
+                self._keep_overlap(len(unit_text))
+            if not self._units:
+                joiner = ""
+            self._units.append(_Unit(unit_text, joiner, label))
+            self._size += len(joiner) + len(unit_text)
+            self._fresh = True
+        return chunks
+
+    def flush(self) -> List[TextChunk]:
+        """The final, partial chunk (if any)."""
+        return [self._emit()] if self._fresh else []
+
+    def _emit(self) -> TextChunk:
+        labels: List[str] = []
+        for unit in self._units:
+            if not labels or labels[-1] != unit.label:
+                labels.append(unit.label)
+        text = "".join(unit.joiner + unit.text for unit in self._units)
+        chunk = TextChunk(index=self._index, text=text, sections=labels)
+        self._index += 1
+        self._fresh = False
+        return chunk
+
+    def _keep_overlap(self, next_unit_chars: int) -> None:
+        budget = min(self.overlap_chars, self.max_chars - next_unit_chars - 2)
+        kept: List[_Unit] = []
+        size = 0
+        for unit in reversed(self._units):
+            if size + len(unit.text) + 2 <= budget:
+                kept.insert(0, unit)
+                size += len(unit.text) + 2
+                continue
+            # Take the trailing sentences of a unit too long to keep whole
+            sentences = [s for s in _SPLITTERS[_SENTENCE_LEVEL][0].split(unit.text) if s.strip()]
+            tail: List[str] = []
+            for sentence in reversed(sentences[1:]):
+                if size + len(sentence) + 1 > budget:
+                    break
+                tail.insert(0, sentence)
+                size += len(sentence) + 1
+            if tail:
+                kept.insert(0, _Unit(" ".join(tail), unit.joiner, unit.label))
+            break
+        if kept:
+            kept[0] = _Unit(kept[0].text, "", kept[0].label)
+        self._units = kept
+        self._size = sum(len(unit.joiner) + len(unit.text) for unit in kept)
+
+
+def chunk_sections(
+    sections: Iterable[Any],
+    max_chars: int = INGEST_CHUNK_CHARS,
+    overlap_chars: int = INGEST_CHUNK_OVERLAP_CHARS,
+) -> Iterator[TextChunk]:
+    """
+    Chunk a sequence of sections (see ``Chunker``).
+
+    Args:
+        sections: Objects with ``label`` and ``text`` (``parsing.ParsedSection``)
+        max_chars: Target maximum chunk size
+        overlap_chars: Maximum overlap carried into the next chunk
+
+    Yields:
+        TextChunk in document order
+    """
+    chunker = Chunker(max_chars, overlap_chars)
+    for section in sections:
+        yield from chunker.feed(section.label, section.text)
+    yield from chunker.flush()
+
+
+# =============================================================================
+# Jobs
+# =============================================================================
+
+@dataclass
+class IngestionJob:
+    """
+    One upload being ingested, and its progress.
+
+    Status goes ``queued`` -> ``processing`` -> ``completed`` | ``failed``.
+    """
+    job_id: str
+    user_id: str
+    filename: str
+    mime_type: str
+    file_size: int
+    source: str
+    temp_path: Optional[str]
+    role: str = "assistant"
+    storage_path: Optional[str] = None
+    document_id: Optional[str] = None       # knowledge_files row, when Supabase is configured
+    status: str = "queued"
+    stage: str = "queued"
+    parsed_fraction: float = 0.0
+    sections_parsed: int = 0
+    chunks_embedded: int = 0
+    chunks_stored: int = 0
+    entities_linked: int = 0
+    error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    finished_at: Optional[str] = None
+
+    @property
+    def percent(self) -> int:
+        if self.status == "completed":
+            return 100
+        # Parsing leads storage by at most one batch
+        return min(99, int(self.parsed_fraction * 100))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "document_id": self.document_id,
+            "file_name": self.filename,
+            "mime_type": self.mime_type,
+            "file_size": self.file_size,
+            "storage_path": self.storage_path,
+            "status": self.status,
+            "stage": self.stage,
+            "percent": self.percent,
+            "sections_parsed": self.sections_parsed,
+            "chunks_embedded": self.chunks_embedded,
+            "chunks_stored": self.chunks_stored,
+            "entities_linked": self.entities_linked,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_jobs: Dict[str, IngestionJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def _register(job: IngestionJob) -> None:
+    with _jobs_lock:
+        _jobs[job.job_id] = job
+        finished = sorted((j for j in _jobs.values() if j.finished_at), key=lambda j: j.finished_at)
+        # Forget the oldest finished jobs beyond MAX_FINISHED_JOBS
+        for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[old.job_id]
+
+
+def get_ingestion_job(job_id: str) -> Optional[IngestionJob]:
+    """The job with ``job_id`` if it ran (or is running) in this process."""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def _supabase() -> Optional[Any]:
+    if not (os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_SERVICE_ROLE_KEY")):
+        return None
+    from .memory import get_supabase_client
+    return get_supabase_client()
+
+
+def create_ingestion_job(
+    temp_path: str,
+    file_size: int,
+    user_id: str,
+    filename: str,
+    mime_type: str,
+    source: str = "file_upload",
+    role: str = "assistant",
+) -> IngestionJob:
+    """
+    Register an ingestion job for a spooled upload.
+
+    Creates the parent ``knowledge_files`` row (status ``pending``) when
+    Supabase is configured; its id is the job id.  Blocking: async callers
+    run it via ``asyncio.to_thread``.
+
+    Args:
+        temp_path: Spooled upload from ``spool_upload``
+        file_size: Size of the upload in bytes
+        user_id: Owner of the resulting memories
+        filename: Original filename
+        mime_type: MIME type of the upload
+        source: Source identifier recorded on each memory
+        role: Role recorded on each memory
+
+    Returns:
+        The queued IngestionJob (run it with ``run_ingestion_job``)
+    """
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    safe_filename = "".join(c for c in filename if c.isalnum() or c in "._-")
+    storage_path = f"{user_id}/{timestamp}_{str(uuid.uuid4())[:8]}_{safe_filename}"
+
+    job = IngestionJob(
+        job_id=str(uuid.uuid4()),
+        user_id=user_id,
+        filename=filename,
+        mime_type=mime_type,
+        file_size=file_size,
+        source=source,
+        temp_path=temp_path,
+        role=role,
+        storage_path=storage_path,
+    )
+    try:
+        supabase = _supabase()
+        if supabase is not None:
+            response = supabase.table("knowledge_files").insert({
+                "file_name": filename,
+                "file_path": storage_path,
+                "file_size": file_size,
+                "mime_type": mime_type,
+                "user_id": user_id,
+                "status": "pending",
+                "metadata": {"source": source},
+            }).execute()
+            if response.data:
+                job.document_id = job.job_id = str(response.data[0]["id"])
+    except Exception as e:
+        logger.warning(f"Failed to create knowledge_files record (continuing without it): {e}")
+    _register(job)
+    return job
+
+
+def _update_document(job: IngestionJob, **fields: Any) -> None:
+    """Mirror progress onto the parent ``knowledge_files`` row (blocking)."""
+    if not job.document_id:
+        return
+    try:
+        supabase = _supabase()
+        if supabase is not None:
+            supabase.table("knowledge_files").update({
+                "chunks_ingested": job.chunks_stored,
+                "progress": job.percent / 100,
+                **fields,
+            }).eq("id", job.document_id).execute()
+    except Exception as e:
+        logger.warning(f"Failed to update knowledge_files progress: {e}")
+
+
+# =============================================================================
+# Pipeline
+# =============================================================================
+
+async def _iter_sections(job: IngestionJob) -> Any:
+    """Parse the spooled file section by section without blocking the event loop."""
+    from .parsing import ParsedSection, get_file_type, iter_file_sections, parse_image
+
+    if get_file_type(job.mime_type) == "image":
+        with open(job.temp_path, "rb") as handle:
+            content = await asyncio.to_thread(handle.read)
+        text, _ = await parse_image(content, job.filename, job.mime_type)
+        yield ParsedSection("Image", text, 1.0)
+        return
+
+    sections = iter_file_sections(job.temp_path, job.mime_type, job.filename)
+    while True:
+        section = await asyncio.to_thread(next, sections, None)
+        if section is None:
+            return
+        yield section
+
+
+async def _embed(texts: List[str]) -> List[List[float]]:
+    from backend.services.rate_limiter import approx_tokens, llm_rate_limit
+
+    from .memory import get_embeddings
+
+    async with llm_rate_limit("openai", EMBEDDING_MODEL, approx_tokens(*texts)):
+        vectors = await get_embeddings().aembed_documents(texts)
+    if len(vectors) != len(texts):
+        raise ValueError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+    return vectors
+
+
+async def _extract_document_context(job: IngestionJob, text: str) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+    """Domain and (entity name, entity id) pairs from the opening of the document."""
+    from .memory import extract_context, resolve_extracted_entities
+
+    try:
+        extracted = await extract_context(text[:INGEST_CONTEXT_CHARS])
+        supabase = _supabase()
+        if supabase is None or not extracted.extracted_entities:
+            return extracted.domain.value, []
+        entity_ids, _, _ = await resolve_extracted_entities(
+            extracted.extracted_entities, user_id=job.user_id, supabase=supabase,
+        )
+        # Ids line up with the extracted entities unless some failed to resolve
+        if len(entity_ids) != len(extracted.extracted_entities):
+            return extracted.domain.value, []
+        names = [entity.name for entity in extracted.extracted_entities]
+        return extracted.domain.value, list(zip(names, (str(eid) for eid in entity_ids)))
+    except Exception as e:
+        logger.warning(f"Document context extraction failed for {job.filename}: {e}")
+        return None, []
+
+
+def _chunk_content(job: IngestionJob, chunk: TextChunk) -> str:
+    label = chunk.label()
+    header = f"[File: {job.filename}" + (f" | {label}" if label else "") + "]"
+    return f"{header}\n{chunk.text}"
+
+
+async def _store_batch(
+    job: IngestionJob,
+    chunks: List[TextChunk],
+    domain: Optional[str],
+    entities: List[Tuple[str, str]],
+) -> None:
+    contents = [_chunk_content(job, chunk) for chunk in chunks]
+    vectors = await _embed(contents)
+    job.chunks_embedded += len(chunks)
+
+    supabase = _supabase()
+    if supabase is None:
+        raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+
+    timestamp = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for chunk, content, vector in zip(chunks, contents, vectors):
+        lowered = chunk.text.lower()
+        links = [eid for name, eid in entities if name.lower() in lowered]
+        job.entities_linked += len(links)
+        metadata = {
+            "user_id": job.user_id,
+            "source": job.source,
+            "timestamp": timestamp,
+            "role": job.role,
+            "file_name": job.filename,
+            "chunk_index": chunk.index,
+            "sections": chunk.sections,
+        }
+        if domain:
+            metadata["domain"] = domain
+        row = {
+            "content": content,
+            # pgvector-compatible string, as in memory.store_memory
+            "embedding": f"[{','.join(str(x) for x in vector)}]",
+            "entity_links": links,
+            "metadata": metadata,
+            "importance_score": 0.5,
+        }
+        if job.document_id:
+            row["document_id"] = job.document_id
+        else:
+            metadata["upload_job_id"] = job.job_id
+        rows.append(row)
+
+    await asyncio.to_thread(lambda: supabase.table("memories").insert(rows).execute())
+    job.chunks_stored += len(rows)
+
+
+def _upload_to_storage(job: IngestionJob) -> None:
+    supabase = _supabase()
+    if supabase is None or not job.temp_path:
+        job.storage_path = None
+        return
+    try:
+        with open(job.temp_path, "rb") as handle:
+            supabase.storage.from_(STORAGE_BUCKET).upload(
+                path=job.storage_path,
+                file=handle,
+                file_options={"content-type": job.mime_type},
+            )
+        logger.info(f"✓ Saved to storage: {job.storage_path}")
+    except Exception as e:
+        logger.warning(f"Storage upload failed (continuing with ingestion): {e}")
+        job.storage_path = None
+
+
+def _delete_stored_chunks(job: IngestionJob) -> None:
+    if not job.chunks_stored:
+        return
+    try:
+        supabase = _supabase()
+        if supabase is None:
+            return
+        query = supabase.table("memories").delete()
+        if job.document_id:
+            query = query.eq("document_id", job.document_id)
+        else:
+            query = query.eq("metadata->>upload_job_id", job.job_id)
+        query.execute()
+    except Exception as e:
+        logger.error(f"Failed to remove partial chunks of {job.filename}: {e}", exc_info=True)
+
+
+async def run_ingestion_job(job: IngestionJob) -> IngestionJob:
+    """
+    Parse, chunk, embed and store a spooled upload, updating ``job`` as it
+    goes.  Always removes the temp file.
+
+    Args:
+        job: Job from ``create_ingestion_job``
+
+    Returns:
+        The finished job (status ``completed`` or ``failed``)
+    """
+    start = time.perf_counter()
+    job.status = job.stage = "processing"
+    logger.info(f"🧠 Ingesting {job.filename} ({job.file_size:,} bytes) as job {job.job_id}")
+    try:
+        job.stage = "uploading"
+        await asyncio.to_thread(_upload_to_storage, job)
+        await asyncio.to_thread(
+            _update_document, job, status="processing", file_path=job.storage_path or "",
+        )
+
+        job.stage = "parsing"
+        domain: Optional[str] = None
+        entities: List[Tuple[str, str]] = []
+        context_done = False
+        batch: List[TextChunk] = []
+
+        chunker = Chunker()
+        async for section in _iter_sections(job):
+            job.sections_parsed += 1
+            job.parsed_fraction = section.progress
+            batch.extend(chunker.feed(section.label, section.text))
+            while len(batch) >= INGEST_EMBED_BATCH_SIZE:
+                if not context_done:
+                    domain, entities = await _extract_document_context(job, "\n\n".join(c.text for c in batch))
+                    context_done = True
+                job.stage = "embedding"
+                await _store_batch(job, batch[:INGEST_EMBED_BATCH_SIZE], domain, entities)
+                batch = batch[INGEST_EMBED_BATCH_SIZE:]
+                await asyncio.to_thread(_update_document, job)
+                job.stage = "parsing"
+        batch.extend(chunker.flush())
+
+        if not context_done and batch:
+            domain, entities = await _extract_document_context(job, "\n\n".join(c.text for c in batch))
+        job.stage = "embedding"
+        for offset in range(0, len(batch), INGEST_EMBED_BATCH_SIZE):
+            await _store_batch(job, batch[offset:offset + INGEST_EMBED_BATCH_SIZE], domain, entities)
+
+        if not job.chunks_stored:
+            raise ValueError("No text could be extracted from the file")
+
+        job.status = job.stage = "completed"
+        job.parsed_fraction = 1.0
+        await asyncio.to_thread(
+            _update_document, job, status="completed",
+            extracted_at=datetime.now(timezone.utc).isoformat(),
+            metadata={"source": job.source, "chunks": job.chunks_stored,
+                      "sections": job.sections_parsed, "domain": domain},
+        )
+        logger.info(
+            f"✓ Ingested {job.filename}: {job.sections_parsed} sections, {job.chunks_stored} chunks "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+    except Exception as e:
+        logger.error(f"File ingestion failed for {job.filename}: {e}", exc_info=True)
+        await asyncio.to_thread(_delete_stored_chunks, job)
+        job.status = "failed"
+        job.error = str(e)
+        job.chunks_stored = 0
+        await asyncio.to_thread(_update_document, job, status="failed", error_message=str(e))
+    finally:
+        job.finished_at = datetime.now(timezone.utc).isoformat()
+        _remove(job.temp_path)
+        job.temp_path = None
+    return job
+
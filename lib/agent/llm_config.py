@@ -146,6 +146,13 @@ MODEL_REGISTRY: Dict[str, ModelConfig] = {
 # Tier Routing Configuration
 # =============================================================================
 
+@dataclass
+class RoutingSLO:
+    """Latency/reliability target the adaptive router holds a role to."""
+    p95_seconds: float = float(os.getenv("ADAPTIVE_ROUTING_SLO_P95_SECONDS", "30"))
+    min_success_rate: float = float(os.getenv("ADAPTIVE_ROUTING_SLO_SUCCESS_RATE", "0.95"))
+
+
 @dataclass
 class TierRoutingConfig:
     """Configuration for tier-based model routing."""
@@ -176,6 +183,17 @@ class TierRoutingConfig:
         "refactor", "migrate", "integrate", "complex"
     ])
 
+    # Role -> SLO for adaptive routing ("consumer" is used when there is no role)
+    # Interactive chat is held to a tighter p95 than background engineering work
+    default_slo: RoutingSLO = field(default_factory=RoutingSLO)
+    role_slo_map: Dict[str, RoutingSLO] = field(default_factory=lambda: {
+        "consumer": RoutingSLO(p95_seconds=15.0, min_success_rate=0.97),
+    })
+
+    def slo_for(self, role: Optional[str]) -> RoutingSLO:
+        """SLO for a role, falling back to ``default_slo``."""
+        return self.role_slo_map.get(role or "consumer", self.default_slo)
+
 
 # =============================================================================
 # Helper Functions
@@ -14,10 +14,10 @@ MCP Spec: 2024-11-05+
 import asyncio
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from mcp.client.stdio import StdioServerParameters, stdio_client
-from mcp import ClientSession
+if TYPE_CHECKING:
+    from mcp import ClientSession
 
 logger = logging.getLogger(__name__)
 
@@ -56,13 +56,17 @@ class MCPClient:
         self.command = command
         self.args = args or ["--transport", "stdio"]
         self.timeout = timeout if timeout is not None else self.DEFAULT_TIMEOUT
-        self._session: Optional[ClientSession] = None
+        self._session: Optional["ClientSession"] = None
         self._transport_cm = None
         self._session_cm = None
         self._tools: Dict[str, Any] = {}
 
     async def __aenter__(self) -> "MCPClient":
         """Enter the async context and establish MCP connection with timeout protection."""
+        # The mcp SDK is imported on first connection, not at startup
+        from mcp import ClientSession
+        from mcp.client.stdio import StdioServerParameters, stdio_client
+
         logger.info(f"Connecting to MCP server: {self.command} {' '.join(self.args)} (timeout: {self.timeout}s)")
 
         stdio_params = StdioServerParameters(
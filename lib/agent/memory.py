@@ -23,14 +23,12 @@ import asyncio
 import logging
 import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from langchain_anthropic import ChatAnthropic
 from langchain_core.exceptions import OutputParserException
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import OpenAIEmbeddings
 from pydantic import BaseModel, Field
 from supabase import Client, create_client
 
@@ -42,6 +40,11 @@ from lib.db.models import (
     MemoryCreate,
 )
 
+if TYPE_CHECKING:
+    # Provider SDKs are imported when a client is first created
+    from langchain_anthropic import ChatAnthropic
+    from langchain_openai import OpenAIEmbeddings
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -55,8 +58,8 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
 # Initialize clients
 _supabase_client: Optional[Client] = None
-_llm: Optional[ChatAnthropic] = None
-_embeddings: Optional[OpenAIEmbeddings] = None
+_llm: Optional["ChatAnthropic"] = None
+_embeddings: Optional["OpenAIEmbeddings"] = None
 
 
 def get_supabase_client() -> Client:
@@ -71,27 +74,37 @@ def get_supabase_client() -> Client:
     return _supabase_client
 
 
-def get_llm() -> ChatAnthropic:
+def get_llm() -> "ChatAnthropic":
     """Get or create LLM client singleton (Claude 3.5 Sonnet for extraction)."""
     global _llm
     if _llm is None:
         if not ANTHROPIC_API_KEY:
             raise ValueError("ANTHROPIC_API_KEY must be set")
+        from langchain_anthropic import ChatAnthropic
+
+        from backend.services.rate_limiter import ProviderRateLimiter
+
+        from .metrics_callbacks import CircuitBreakerCallbackHandler
+
         _llm = ChatAnthropic(
             model="claude-3-haiku-20240307",  # Use same model as core agent
             temperature=0.0,  # Deterministic extraction
             anthropic_api_key=ANTHROPIC_API_KEY,
+            rate_limiter=ProviderRateLimiter("anthropic", "claude-3-haiku-20240307"),
+            callbacks=[CircuitBreakerCallbackHandler("anthropic", model="claude-3-haiku-20240307")],
         )
         logger.info("✓ Claude 3 Haiku initialized for entity extraction")
     return _llm
 
 
-def get_embeddings() -> OpenAIEmbeddings:
+def get_embeddings() -> "OpenAIEmbeddings":
     """Get or create embeddings client singleton (text-embedding-3-small)."""
     global _embeddings
     if _embeddings is None:
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY must be set")
+        from langchain_openai import OpenAIEmbeddings
+
         _embeddings = OpenAIEmbeddings(
             model="text-embedding-3-small",  # 1536 dimensions
             openai_api_key=OPENAI_API_KEY,
@@ -209,9 +222,13 @@ Output:
         format_instructions=parser.get_format_instructions()
     )
 
-    # Run extraction
+    # Run extraction (idempotent, so a slow call is hedged with a duplicate)
     try:
-        response = await llm.ainvoke(formatted_prompt)
+        from backend.services.hedging import get_hedger
+
+        response = await get_hedger("memory.extract_context").run(
+            lambda: llm.ainvoke(formatted_prompt),
+        )
         result = parser.parse(response.content)
         logger.info(
             f"✓ Extracted {len(result.extracted_entities)} entities from text")
@@ -396,6 +413,78 @@ async def create_entity(
         raise
 
 
+async def resolve_extracted_entities(
+    extracted_entities: List[ExtractedEntity],
+    user_id: str,
+    supabase: Client
+) -> Tuple[List[UUID], int, int]:
+    """
+    Resolve all extracted entities with one lookup and one bulk write.
+
+    Uses backend.magma.resolution.resolve_entities_batch in strict mode
+    (type and domain must match, as in find_similar_entity). If the batch
+    path fails, falls back to find_similar_entity / merge_entity_attributes /
+    create_entity per entity.
+
+    Args:
+        extracted_entities: Entities from extract_context()
+        user_id: User ID recorded in mention metadata
+        supabase: Supabase client
+
+    Returns:
+        Tuple of (entity_ids, entities_created, entities_updated)
+    """
+    if not extracted_entities:
+        return [], 0, 0
+
+    try:
+        from backend.magma.resolution import resolve_entities_batch
+
+        results = await resolve_entities_batch(
+            entities=[e.model_dump(mode="json") for e in extracted_entities],
+            user_id=user_id,
+            client=supabase,
+            strict=True,
+        )
+        entity_ids = [UUID(r["entity_id"]) for r in results if r.get("entity_id")]
+        created = sum(1 for r in results if r.get("action") == "created")
+        updated = sum(1 for r in results if r.get("action") == "updated")
+        return entity_ids, created, updated
+    except Exception as e:
+        logger.warning(
+            f"Batch entity resolution failed, falling back to per-entity: {e}")
+
+    entity_ids: List[UUID] = []
+    entities_created = 0
+    entities_updated = 0
+
+    for extracted_entity in extracted_entities:
+        # Check if entity already exists (fuzzy match)
+        existing = await find_similar_entity(
+            name=extracted_entity.name,
+            entity_type=extracted_entity.type,
+            domain=extracted_entity.domain,
+            supabase=supabase
+        )
+
+        if existing:
+            # UPDATE: Merge attributes
+            updated = await merge_entity_attributes(
+                existing=existing,
+                new_attributes=extracted_entity.attributes,
+                supabase=supabase
+            )
+            entity_ids.append(updated.id)
+            entities_updated += 1
+        else:
+            # CREATE: New entity
+            created = await create_entity(extracted_entity, supabase)
+            entity_ids.append(created.id)
+            entities_created += 1
+
+    return entity_ids, entities_created, entities_updated
+
+
 # =============================================================================
 # Memory Storage
 # =============================================================================
@@ -551,33 +640,11 @@ async def ingest_user_message(
         logger.info(
             f"Step 3: Processing {len(extracted.extracted_entities)} entities...")
 
-        entity_ids: List[UUID] = []
-        entities_created = 0
-        entities_updated = 0
-
-        for extracted_entity in extracted.extracted_entities:
-            # Check if entity already exists (fuzzy match)
-            existing = await find_similar_entity(
-                name=extracted_entity.name,
-                entity_type=extracted_entity.type,
-                domain=extracted_entity.domain,
-                supabase=supabase
-            )
-
-            if existing:
-                # UPDATE: Merge attributes
-                updated = await merge_entity_attributes(
-                    existing=existing,
-                    new_attributes=extracted_entity.attributes,
-                    supabase=supabase
-                )
-                entity_ids.append(updated.id)
-                entities_updated += 1
-            else:
-                # CREATE: New entity
-                created = await create_entity(extracted_entity, supabase)
-                entity_ids.append(created.id)
-                entities_created += 1
+        entity_ids, entities_created, entities_updated = await resolve_extracted_entities(
+            extracted.extracted_entities,
+            user_id=str(user_id),
+            supabase=supabase,
+        )
 
         # STEP 4: Store memory with entity links
         logger.info("Step 4: Storing memory...")
@@ -0,0 +1,283 @@
+"""
+Agent Metrics Callbacks
+=======================
+
+LangChain callback handlers that feed agent LLM calls and tool executions
+into the in-process metrics registry (``backend/services/metrics.py``)
+and the request tracer (``backend/services/tracing.py``).
+
+Attached to every ReAct agent by ``create_react_agent_with_tools()``, so
+both Sabine and the Dream Team task agents are covered without wrapping
+individual tools or LLM clients.
+
+``CircuitBreakerCallbackHandler`` is attached to each candidate model of a
+failover chain instead (``model_router.build_failover_llm``), so outcomes
+are recorded against the provider that actually served the call.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from backend.services.metrics import (
+    LLM_REQUEST_SECONDS,
+    LLM_REQUESTS_TOTAL,
+    TOOL_EXECUTION_SECONDS,
+    TOOL_EXECUTIONS_TOTAL,
+)
+from backend.services.tracing import SPAN_KIND_CLIENT, Span, current_span, get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Times LLM calls (per provider and model) and tool executions.
+
+    Start times are keyed by LangChain ``run_id``, so concurrent tool calls
+    in one agent step are timed independently.
+
+    Args:
+        provider: Provider label for LLM metrics (e.g. "anthropic").
+        model: Model label for LLM metrics (e.g. "claude-sonnet-4-20250514").
+    """
+
+    # Record inline instead of in an executor thread: the work is a dict
+    # lookup and a histogram update.
+    run_inline = True
+
+    def __init__(self, provider: str, model: str) -> None:
+        self.provider = provider
+        self.model = model
+        self._llm_starts: Dict[UUID, float] = {}
+        self._tool_starts: Dict[UUID, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    # ---- LLM ---------------------------------------------------------------
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._llm_starts[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._llm_starts[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_llm(run_id, "success")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_llm(run_id, "cancelled" if isinstance(error, asyncio.CancelledError) else "error")
+
+    def _finish_llm(self, run_id: UUID, status: str) -> None:
+        with self._lock:
+            start = self._llm_starts.pop(run_id, None)
+        if start is None:
+            return
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider=self.provider, model=self.model)
+        LLM_REQUESTS_TOTAL.inc(provider=self.provider, model=self.model, status=status)
+
+    # ---- Tools -------------------------------------------------------------
+
+    def on_tool_start(self, serialized: Optional[Dict[str, Any]], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        with self._lock:
+            self._tool_starts[run_id] = (time.perf_counter(), name)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_tool(run_id, "success")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_tool(run_id, "error")
+
+    def _finish_tool(self, run_id: UUID, status: str) -> None:
+        with self._lock:
+            started = self._tool_starts.pop(run_id, None)
+        if started is None:
+            return
+        start, name = started
+        TOOL_EXECUTION_SECONDS.observe(time.perf_counter() - start, tool=name)
+        TOOL_EXECUTIONS_TOTAL.inc(tool=name, status=status)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Records each LLM call and tool execution as a span.
+
+    Spans are keyed by LangChain ``run_id`` and parented on the span of
+    the ``parent_run_id`` if this handler opened one, otherwise on the span
+    current when the run started (the agent invocation).  They are not
+    made current themselves: start and end arrive as separate callbacks,
+    possibly from different tasks.
+
+    Args:
+        provider: Provider recorded as ``gen_ai.system`` on LLM spans.
+        model: Model recorded as ``gen_ai.request.model`` on LLM spans.
+    """
+
+    run_inline = True
+
+    def __init__(self, provider: str, model: str) -> None:
+        self.provider = provider
+        self.model = model
+        self._spans: Dict[UUID, Span] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, **span_kwargs: Any) -> None:
+        with self._lock:
+            parent = self._spans.get(parent_run_id) if parent_run_id else None
+        parent_span = parent or current_span()
+        span = get_tracer().start_detached_span(
+            name,
+            parent=parent_span.context if parent_span.is_recording else None,
+            **span_kwargs,
+        )
+        with self._lock:
+            self._spans[run_id] = span
+
+    def _finish(self, run_id: UUID, error: Optional[BaseException] = None, **attributes: Any) -> None:
+        with self._lock:
+            span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        span.set_attributes(attributes)
+        if error is not None:
+            span.record_exception(error)
+        span.end()
+
+    # ---- LLM ---------------------------------------------------------------
+
+    def _start_llm(self, run_id: UUID, parent_run_id: Optional[UUID]) -> None:
+        self._start(
+            run_id, parent_run_id, f"llm {self.model}",
+            kind=SPAN_KIND_CLIENT,
+            attributes={"gen_ai.system": self.provider, "gen_ai.request.model": self.model},
+        )
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: Any, *,
+        run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any,
+    ) -> None:
+        self._start_llm(run_id, parent_run_id)
+
+    def on_llm_start(
+        self, serialized: Dict[str, Any], prompts: Any, *,
+        run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any,
+    ) -> None:
+        self._start_llm(run_id, parent_run_id)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, **_token_usage(response))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=error)
+
+    # ---- Tools -------------------------------------------------------------
+
+    def on_tool_start(
+        self, serialized: Optional[Dict[str, Any]], input_str: str, *,
+        run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any,
+    ) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        self._start(run_id, parent_run_id, f"tool {name}", attributes={"tool.name": name})
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=error)
+
+
+class CircuitBreakerCallbackHandler(BaseCallbackHandler):
+    """
+    Reports the outcome and latency of each call of one model to its
+    provider's circuit breaker (``lib/agent/circuit_breaker.py``) and, when
+    ``model`` is given, outcome, latency and token usage to the model's
+    adaptive routing statistics (``lib/agent/adaptive_routing.py``) and
+    token usage and 429s to the rate limiter
+    (``backend/services/rate_limiter.py``).  Latency excludes time spent
+    queueing for rate-limit budget.
+
+    Args:
+        provider: Provider whose breaker receives the outcomes.
+        model: Model id whose routing statistics receive the outcomes.
+    """
+
+    run_inline = True
+
+    def __init__(self, provider: str, model: Optional[str] = None) -> None:
+        self.provider = provider
+        self.model = model
+        self._starts: Dict[UUID, Tuple[float, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def _start(self, run_id: UUID) -> None:
+        from backend.services.rate_limiter import track_queue_wait
+
+        queued = track_queue_wait()
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), queued)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, response=response)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error)
+
+    def _finish(self, run_id: UUID, error: Optional[BaseException] = None, response: Any = None) -> None:
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+        # A cancelled call (e.g. the losing half of a hedge) says nothing either way
+        if started is None or isinstance(error, asyncio.CancelledError):
+            return
+        from backend.services.rate_limiter import get_rate_limiter
+
+        from .circuit_breaker import get_breaker_registry, is_provider_failure
+        start, queued = started
+        # Time spent queueing for rate-limit budget says nothing about the provider
+        latency = max(0.0, time.perf_counter() - start - queued[0])
+        get_breaker_registry().record(self.provider, latency, error=error)
+        if self.model:
+            from .adaptive_routing import get_model_stats
+            usage = _token_usage(response) if response is not None else {}
+            input_tokens = usage.get("gen_ai.usage.input_tokens")
+            output_tokens = usage.get("gen_ai.usage.output_tokens")
+            get_model_stats().record(
+                self.model,
+                latency,
+                ok=error is None or not is_provider_failure(error),
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+            )
+            # Chat models reserve only a request; charge the tokens now.
+            # This handler runs inline on the event loop, so the Redis
+            # settlement is handed to the limiter's settlement thread.
+            limiter = get_rate_limiter()
+            if error is not None:
+                limiter.handle_error_nowait(self.provider, self.model, error)
+            elif input_tokens or output_tokens:
+                limiter.record_usage_nowait(self.provider, self.model, (input_tokens or 0) + (output_tokens or 0))
+
+
+def _token_usage(response: Any) -> Dict[str, Any]:
+    """Input/output token counts from an ``LLMResult``, when the provider reports them."""
+    try:
+        message = response.generations[0][0].message
+        usage = getattr(message, "usage_metadata", None) or {}
+    except (AttributeError, IndexError, TypeError):
+        return {}
+    return {
+        "gen_ai.usage.input_tokens": usage.get("input_tokens"),
+        "gen_ai.usage.output_tokens": usage.get("output_tokens"),
+    }
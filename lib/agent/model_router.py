@@ -6,16 +6,27 @@ Routes requests to appropriate model tier based on:
 2. Role-based tier assignment
 3. Task complexity analysis (keyword escalation)
 4. Tool/vision requirements
-5. Provider availability
-
-Includes automatic fallback cascade when models fail.
+5. Provider availability (API key configured and circuit breaker not open)
+6. Observed latency and success rate against the role's SLO
+   (``adaptive_routing.py``): the cheapest model of the chosen tier or
+   above that currently meets the SLO
+
+Includes automatic fallback cascade when models fail: ``build_failover_llm``
+turns a routing decision into a chat model that fails over along the
+fallback chain and skips providers whose breaker is open.
 """
 
 import logging
 import os
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.fallbacks import RunnableWithFallbacks
 
+from .circuit_breaker import CircuitOpenError, get_breaker_registry
 from .llm_config import (
     MODEL_REGISTRY,
     ModelConfig,
@@ -48,8 +59,9 @@ class ModelRouter:
     2. Check role's tier assignment (from config)
     3. Analyze task for complexity escalation keywords
     4. Verify tool/vision requirements are met
-    5. Check provider availability
+    5. Check provider availability (configured, breaker not open)
     6. Build fallback chain for resilience
+    7. Adaptive refinement: cheapest model meeting the role's SLO
     """
 
     def __init__(self, config: Optional[TierRoutingConfig] = None):
@@ -128,13 +140,41 @@ class ModelRouter:
 
         reason = f"Role-based routing: {role or 'consumer'} -> {tier.value}"
 
-        return RoutingDecision(
+        if not self._is_provider_available(model_config.provider):
+            # Selected provider is unhealthy; degrade along the fallback chain
+            alternate = self._first_available(
+                self._build_fallback_chain(tier), requires_tools, requires_vision
+            )
+            if alternate:
+                logger.warning(
+                    f"Provider {model_config.provider.value} circuit open, "
+                    f"routing to {alternate.display_name}"
+                )
+                reason += (
+                    f" (failover: {model_config.provider.value} unavailable, "
+                    f"using {alternate.display_name})"
+                )
+                model_config = alternate
+
+        decision = RoutingDecision(
             model_config=model_config,
             tier=tier,
             reason=reason,
             fallback_chain=self._build_fallback_chain(tier),
         )
 
+        # Step 5: Adaptive refinement from observed latency/success
+        from . import adaptive_routing
+        if adaptive_routing.ADAPTIVE_ROUTING_ENABLED:
+            decision = adaptive_routing.get_adaptive_policy().select(
+                decision,
+                role=role,
+                requires_tools=requires_tools,
+                requires_vision=requires_vision,
+                is_available=self._is_provider_available,
+            )
+        return decision
+
     def _determine_tier_for_role(self, role: Optional[str]) -> ModelTier:
         """Determine the default tier for a role."""
         if not role:
@@ -219,8 +259,31 @@ class ModelRouter:
             return False
         return True
 
+    def _first_available(
+        self,
+        chain: List[str],
+        requires_tools: bool,
+        requires_vision: bool,
+    ) -> Optional[ModelConfig]:
+        """First model in ``chain`` that meets requirements and is available."""
+        for key in chain:
+            config = get_model_config(key)
+            if config and self._meets_requirements(config, requires_tools, requires_vision):
+                if self._is_provider_available(config.provider):
+                    return config
+        return None
+
     def _is_provider_available(self, provider: ModelProvider) -> bool:
-        """Check if a provider is available (API key configured, etc.)."""
+        """Check if a provider is configured and its circuit breaker is not open."""
+        if not self._is_provider_configured(provider):
+            return False
+        if not get_breaker_registry().is_available(provider.value):
+            logger.debug(f"Provider {provider.value} circuit open")
+            return False
+        return True
+
+    def _is_provider_configured(self, provider: ModelProvider) -> bool:
+        """Check if a provider is configured (API key set, etc.); cached."""
         if provider in self._provider_available_cache:
             return self._provider_available_cache[provider]
 
@@ -246,7 +309,13 @@ class ModelRouter:
         return available
 
     def _build_fallback_chain(self, starting_tier: ModelTier) -> List[str]:
-        """Build ordered fallback chain from current tier upward."""
+        """
+        Build ordered fallback chain from current tier upward.
+
+        Premium falls back to the API tier as a degraded last resort, so an
+        Anthropic outage does not fail every consumer request.  Models whose
+        provider breaker is open are moved to the end.
+        """
         chain = []
 
         if starting_tier == ModelTier.LOCAL:
@@ -258,8 +327,15 @@ class ModelRouter:
             chain.append(self.config.default_premium)
         else:
             chain.append(self.config.default_premium)
+            chain.append(self.config.default_api)
+
+        registry = get_breaker_registry()
 
-        return chain
+        def is_healthy(key: str) -> bool:
+            config = get_model_config(key)
+            return config is None or registry.is_available(config.provider.value)
+
+        return sorted(chain, key=lambda key: not is_healthy(key))
 
     def clear_availability_cache(self):
         """Clear the provider availability cache (useful for testing)."""
@@ -287,6 +363,176 @@ def reset_model_router():
     _router = None
 
 
+# =============================================================================
+# LLM Client Pool
+# =============================================================================
+
+# One client per (provider, model, temperature, max_tokens), so each turn
+# reuses the client's HTTP connection pool instead of opening a new one.
+_llm_pool: Dict[Tuple[str, str, float, int], Any] = {}
+_llm_pool_lock = threading.Lock()
+
+
+def get_pooled_llm(
+    config: ModelConfig,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+) -> Any:
+    """
+    Get the shared chat model client for a model config.
+
+    Created on first use through the provider adapter, with a
+    ``CircuitBreakerCallbackHandler`` attached that reports each call to the
+    provider's breaker and to the model's adaptive routing statistics, and
+    a ``ProviderRateLimiter`` that queues calls for the shared provider budget.
+
+    Args:
+        config: Model to create a client for
+        temperature: Sampling temperature
+        max_tokens: Output token limit (default: the model's)
+
+    Returns:
+        LangChain chat model; safe to share between concurrent turns
+
+    Raises:
+        ValueError: If the provider adapter cannot create the client
+    """
+    max_tokens = max_tokens or config.max_tokens
+    key = (config.provider.value, config.model_id, temperature, max_tokens)
+    llm = _llm_pool.get(key)
+    if llm is not None:
+        return llm
+
+    from backend.services.rate_limiter import ProviderRateLimiter
+
+    from .metrics_callbacks import CircuitBreakerCallbackHandler
+    from .providers import get_provider
+
+    with _llm_pool_lock:
+        llm = _llm_pool.get(key)
+        if llm is None:
+            llm = get_provider(config.provider).create_llm(
+                config=config,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            llm.callbacks = [
+                *(llm.callbacks or []),
+                CircuitBreakerCallbackHandler(config.provider.value, model=config.model_id),
+            ]
+            llm.rate_limiter = ProviderRateLimiter(config.provider.value, config.model_id)
+            _llm_pool[key] = llm
+            logger.info(f"Created pooled LLM client for {config.display_name}")
+    return llm
+
+
+def clear_llm_pool() -> None:
+    """Drop pooled LLM clients (useful for testing and key rotation)."""
+    with _llm_pool_lock:
+        _llm_pool.clear()
+
+
+# =============================================================================
+# Failover Chat Model
+# =============================================================================
+
+class FailoverChatModel(RunnableWithFallbacks):
+    """
+    Chat model that fails over along a routing decision's fallback chain.
+
+    Each candidate is only tried if its provider's circuit breaker admits
+    the call, so a provider that is known to be down costs nothing instead
+    of a timeout per request.  ``bind_tools`` and other methods that return
+    a runnable are applied to every candidate (inherited from
+    ``RunnableWithFallbacks``), which is what ``create_react_agent`` needs.
+    """
+
+    providers: List[str]
+    """Provider name of ``runnable`` followed by each fallback."""
+
+    models: List[str] = []
+    """Model id of ``runnable`` followed by each fallback."""
+
+    @property
+    def runnables(self) -> Iterator[Runnable]:
+        registry = get_breaker_registry()
+        admitted = False
+        for runnable, provider in zip([self.runnable, *self.fallbacks], self.providers):
+            if registry.allow_request(provider):
+                admitted = True
+                yield runnable
+            else:
+                logger.info(f"Skipping {provider}: circuit open")
+        if not admitted:
+            raise CircuitOpenError(self.providers)
+
+
+def build_failover_llm(
+    routing_decision: RoutingDecision,
+    requires_tools: bool = True,
+    requires_vision: bool = False,
+    temperature: float = 0.7,
+    max_fallbacks: int = 2,
+) -> FailoverChatModel:
+    """
+    Create the chat model for a routing decision, with failover.
+
+    The selected model comes first, then up to ``max_fallbacks`` distinct
+    models from the fallback chain that meet the requirements and whose
+    provider is configured.  Clients come from the per-process pool and
+    report call outcomes to their provider's circuit breaker.
+
+    Args:
+        routing_decision: Output of ``ModelRouter.route()``
+        requires_tools: Skip fallbacks without tool calling
+        requires_vision: Skip fallbacks without vision
+        temperature: Sampling temperature for every model
+        max_fallbacks: Maximum number of fallback models
+
+    Returns:
+        FailoverChatModel wrapping the selected model and its fallbacks
+
+    Raises:
+        ValueError: If no model in the chain can be created
+    """
+    router = get_model_router()
+    candidates = [routing_decision.model_config]
+    for key in routing_decision.fallback_chain:
+        config = get_model_config(key)
+        if config is None or any(c.model_id == config.model_id for c in candidates):
+            continue
+        if not router._meets_requirements(config, requires_tools, requires_vision):
+            continue
+        if not router._is_provider_configured(config.provider):
+            continue
+        candidates.append(config)
+        if len(candidates) > max_fallbacks:
+            break
+
+    llms = []
+    providers = []
+    models = []
+    for config in candidates:
+        try:
+            llm = get_pooled_llm(config, temperature=temperature)
+        except Exception as e:
+            logger.warning(f"Cannot create {config.display_name} for failover: {e}")
+            continue
+        llms.append(llm)
+        providers.append(config.provider.value)
+        models.append(config.model_id)
+
+    if not llms:
+        raise ValueError(
+            f"No model could be created for {routing_decision.model_config.display_name} "
+            f"or its fallbacks {routing_decision.fallback_chain}"
+        )
+
+    return FailoverChatModel(
+        runnable=llms[0], fallbacks=llms[1:], providers=providers, models=models,
+    )
+
+
 # =============================================================================
 # Fallback Execution Helper
 # =============================================================================
@@ -322,18 +568,38 @@ async def execute_with_fallback(
     attempts = []
     fallback_chain = routing_decision.fallback_chain[:max_attempts]
 
+    from .adaptive_routing import get_model_stats
+    from .circuit_breaker import is_provider_failure
+
+    registry = get_breaker_registry()
+    stats = get_model_stats()
+
     for i, model_key in enumerate(fallback_chain):
         model_config = get_model_config(model_key)
         if not model_config:
             logger.warning(f"Fallback model {model_key} not found, skipping")
             continue
 
+        provider = model_config.provider.value
+        if not registry.allow_request(provider):
+            logger.info(f"Skipping {model_config.display_name}: {provider} circuit open")
+            attempts.append({
+                "model": model_key,
+                "error": f"Circuit open for {provider}",
+                "error_type": CircuitOpenError.__name__,
+            })
+            continue
+
+        start = time.monotonic()
         try:
             logger.info(
                 f"Attempt {i + 1}/{len(fallback_chain)}: "
                 f"Trying {model_config.display_name}"
             )
             result = await execute_fn(model_config)
+            elapsed = time.monotonic() - start
+            registry.record(provider, elapsed)
+            stats.record(model_config.model_id, elapsed)
 
             if i > 0:
                 logger.info(
@@ -344,6 +610,9 @@ async def execute_with_fallback(
             return result
 
         except Exception as e:
+            elapsed = time.monotonic() - start
+            registry.record(provider, elapsed, error=e)
+            stats.record(model_config.model_id, elapsed, ok=not is_provider_failure(e))
             logger.warning(
                 f"Model {model_config.display_name} failed: {type(e).__name__}: {e}"
             )
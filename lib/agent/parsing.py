@@ -7,11 +7,15 @@ Converts binary files (PDF, CSV, Excel, Images) into text for ingestion.
 
 Supported Formats:
 - PDF: Extracts text using pypdf
-- CSV: Converts rows into readable summaries using pandas
-- Excel: Converts sheets/rows into readable summaries using pandas
+- CSV: Profiles columns block by block with pandas (bounded for large files)
+- Excel: Streams sheets with openpyxl's read-only reader and profiles them
 - Images: Uses Claude 3.5 Sonnet vision to describe image content
 - Plain Text: Direct passthrough
 
+``parse_file`` returns one (truncated) text for a whole file held in memory;
+``iter_file_sections`` parses a file on disk page by page or block by block
+for chunked ingestion (``lib/agent/ingestion.py``).
+
 Owner: @backend-architect-sabine
 """
 
@@ -19,9 +23,9 @@ import base64
 import io
 import logging
 import os
-from typing import Optional, Tuple
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage
 
 logger = logging.getLogger(__name__)
@@ -139,6 +143,330 @@ async def parse_pdf(file_content: bytes, filename: str = "document.pdf") -> Tupl
         raise ValueError(f"PDF parsing failed: {str(e)}")
 
 
+# =============================================================================
+# Spreadsheet Profiling
+# =============================================================================
+
+# Rows read per pandas block (bounds memory whatever the file size)
+PROFILE_BLOCK_ROWS = 20_000
+
+# Most frequent values shown per text column, and distinct values tracked
+PROFILE_TOP_K = 5
+PROFILE_TRACKED_VALUES = 1_000
+
+# Uniform row sample kept for quantiles and the representative sample
+PROFILE_RESERVOIR_ROWS = 5_000
+
+# Representative sample shown in a summary
+PROFILE_SAMPLE_ROWS = 20
+PROFILE_SAMPLE_CHARS = 4_000
+
+# Longest cell value shown before it is cut
+PROFILE_VALUE_CHARS = 80
+
+PROFILE_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def _column_names(header: Iterable[Any]) -> List[str]:
+    """Header cells as unique column names ("Column N" for blank cells)."""
+    columns: List[str] = []
+    for i, cell in enumerate(header):
+        name = str(cell) if cell is not None else f"Column {i + 1}"
+        if name in columns:
+            name = f"{name}.{i + 1}"
+        columns.append(name)
+    return columns
+
+
+def _format_value(value: Any) -> str:
+    """A cell value as short text for a summary."""
+    import datetime
+
+    if isinstance(value, float):
+        text = f"{value:.6g}"
+    elif isinstance(value, datetime.datetime):
+        text = value.date().isoformat() if value.time() == datetime.time() else value.isoformat(sep=" ")
+    else:
+        text = str(value)
+    if len(text) > PROFILE_VALUE_CHARS:
+        text = text[:PROFILE_VALUE_CHARS - 3] + "..."
+    return text
+
+
+def _iter_csv_frames(source: Any) -> Iterator[Any]:
+    """Read a CSV path or binary stream as DataFrames of PROFILE_BLOCK_ROWS rows."""
+    import pandas as pd
+
+    with pd.read_csv(source, chunksize=PROFILE_BLOCK_ROWS) as reader:
+        yield from reader
+
+
+def _iter_sheet_blocks(sheet: Any, block_rows: int) -> Iterator[Tuple[List[str], List[Tuple[Any, ...]]]]:
+    """
+    Stream a read-only openpyxl worksheet as (columns, rows) blocks.
+
+    The first row is the header; blank rows are skipped and rows are padded
+    or cut to the header width.  A sheet with only a header yields one
+    empty block so its columns are still known.
+    """
+    rows = sheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = _column_names(header)
+    width = len(columns)
+    block: List[Tuple[Any, ...]] = []
+    emitted = False
+    for row in rows:
+        if all(cell is None for cell in row):
+            continue
+        block.append(tuple(row[:width]) + (None,) * (width - len(row)))
+        if len(block) == block_rows:
+            yield columns, block
+            block, emitted = [], True
+    if block or not emitted:
+        yield columns, block
+
+
+def _rows_frame(columns: List[str], rows: List[Tuple[Any, ...]]) -> Any:
+    import pandas as pd
+
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+class TableProfiler:
+    """
+    Column profiles and a representative sample of a table, built one
+    DataFrame block at a time with vectorized pandas operations, so memory
+    stays bounded by the block size whatever the number of rows.
+
+    Row and null counts, min/max/mean and date ranges are exact.  Top values
+    are exact unless a column has more than PROFILE_TRACKED_VALUES distinct
+    values.  Quantiles and the sample come from a uniform sample of
+    PROFILE_RESERVOIR_ROWS rows, so they are exact for smaller tables.
+
+    Args:
+        seed: Seed of the row sample, so summaries are reproducible
+    """
+
+    def __init__(self, seed: int = 0) -> None:
+        import numpy as np
+
+        self.rows = 0
+        self.columns: List[str] = []
+        self._dtypes: Dict[str, List[str]] = {}
+        self._nulls: Dict[str, int] = {}
+        self._min: Dict[str, Any] = {}
+        self._max: Dict[str, Any] = {}
+        self._sum: Dict[str, float] = {}
+        self._count: Dict[str, int] = {}
+        self._values: Dict[str, Any] = {}
+        self._values_capped: set = set()
+        self._date_formats: Dict[str, str] = {}
+        self._reservoir: Any = None
+        self._reservoir_keys: Any = None
+        self._rng = np.random.default_rng(seed)
+
+    # -------------------------------------------------------------------------
+    # Accumulation
+    # -------------------------------------------------------------------------
+
+    def add(self, frame: Any) -> None:
+        """Fold one block of rows into the profile."""
+        import pandas as pd
+
+        if not self.columns:
+            self.columns = [str(col) for col in frame.columns]
+            self._nulls = dict.fromkeys(self.columns, 0)
+            self._dtypes = {col: [] for col in self.columns}
+        frame = frame.set_axis(self.columns, axis=1)
+        if frame.empty:
+            return
+        if self.rows == 0:
+            self._detect_dates(frame)
+        if self._date_formats:
+            frame = frame.assign(**{
+                col: pd.to_datetime(frame[col], format=fmt, errors="coerce")
+                for col, fmt in self._date_formats.items()
+            })
+
+        for col, dtype in frame.dtypes.items():
+            if str(dtype) not in self._dtypes[col]:
+                self._dtypes[col].append(str(dtype))
+        for col, nulls in frame.isna().sum().items():
+            self._nulls[col] += int(nulls)
+
+        numeric = frame.select_dtypes(include="number", exclude="bool")
+        dates = frame.select_dtypes(include=["datetime", "datetimetz"])
+        for part in (numeric, dates):
+            if len(part.columns):
+                self._merge_extremes(part.min(), part.max())
+        if len(numeric.columns):
+            for col, total in numeric.sum().items():
+                self._sum[col] = self._sum.get(col, 0.0) + float(total)
+            for col, count in numeric.count().items():
+                self._count[col] = self._count.get(col, 0) + int(count)
+
+        measured = set(numeric.columns) | set(dates.columns)
+        for col in self.columns:
+            if col not in measured:
+                self._merge_values(col, frame[col].value_counts())
+
+        self._sample(frame)
+        self.rows += len(frame)
+
+    def _detect_dates(self, frame: Any) -> None:
+        """Treat text columns whose values share one date format as dates."""
+        import pandas as pd
+        from pandas.api.types import is_numeric_dtype
+        from pandas.tseries.api import guess_datetime_format
+
+        for col in self.columns:
+            if is_numeric_dtype(frame[col]) or frame[col].dtype == bool:
+                continue
+            values = frame[col].dropna().head(100)
+            if values.empty or not all(isinstance(value, str) for value in values):
+                continue
+            fmt = guess_datetime_format(values.iloc[0])
+            if fmt is None:
+                continue
+            parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+            if parsed.notna().mean() >= 0.9:
+                self._date_formats[col] = fmt
+
+    def _merge_extremes(self, mins: Any, maxs: Any) -> None:
+        import pandas as pd
+
+        for col, value in mins.items():
+            if not pd.isna(value):
+                self._min[col] = value if col not in self._min else min(self._min[col], value)
+        for col, value in maxs.items():
+            if not pd.isna(value):
+                self._max[col] = value if col not in self._max else max(self._max[col], value)
+
+    def _merge_values(self, col: str, counts: Any) -> None:
+        import pandas as pd
+
+        if col in self._values:
+            # groupby rather than Series.add: the index may mix types
+            counts = pd.concat([self._values[col], counts]).groupby(level=0, sort=False).sum()
+        if len(counts) > PROFILE_TRACKED_VALUES:
+            counts = counts.nlargest(PROFILE_TRACKED_VALUES)
+            self._values_capped.add(col)
+        self._values[col] = counts
+
+    def _sample(self, frame: Any) -> None:
+        """Keep the PROFILE_RESERVOIR_ROWS rows with the smallest random keys."""
+        import pandas as pd
+
+        block = frame.set_axis(pd.RangeIndex(self.rows + 1, self.rows + len(frame) + 1))
+        keys = pd.Series(self._rng.random(len(block)), index=block.index)
+        if self._reservoir is not None:
+            if len(self._reservoir_keys) >= PROFILE_RESERVOIR_ROWS:
+                keep = keys < self._reservoir_keys.max()
+                block, keys = block[keep], keys[keep]
+            if block.empty:
+                return
+            block = pd.concat([self._reservoir, block])
+            keys = pd.concat([self._reservoir_keys, keys])
+        keys = keys.nsmallest(PROFILE_RESERVOIR_ROWS)
+        self._reservoir_keys = keys
+        self._reservoir = block.loc[keys.index]
+
+    # -------------------------------------------------------------------------
+    # Rendering
+    # -------------------------------------------------------------------------
+
+    @property
+    def sampled(self) -> bool:
+        """Whether quantiles and the sample come from a subset of the rows."""
+        return self.rows > PROFILE_RESERVOIR_ROWS
+
+    def summary_lines(self) -> List[str]:
+        """Column profiles followed by the representative sample, as text lines."""
+        lines = [
+            f"Columns: {', '.join(self.columns)}",
+            f"Total Rows: {self.rows}",
+            "",
+            "Column Details:",
+        ]
+        quantiles = self._quantiles()
+        for col in self.columns:
+            lines.append(f"  - {col}: {self._describe(col, quantiles)}")
+        lines.append("")
+        lines.extend(self._sample_lines())
+        return lines
+
+    def _quantiles(self) -> Dict[str, List[Any]]:
+        if self._reservoir is None:
+            return {}
+        numeric = self._reservoir.select_dtypes(include="number", exclude="bool")
+        if not len(numeric.columns):
+            return {}
+        table = numeric.quantile(list(PROFILE_QUANTILES))
+        return {col: table[col].tolist() for col in table.columns}
+
+    def _describe(self, col: str, quantiles: Dict[str, List[Any]]) -> str:
+        non_null = self.rows - self._nulls.get(col, 0)
+        null_rate = self._nulls.get(col, 0) / self.rows if self.rows else 0.0
+        parts = [
+            "/".join(self._dtypes.get(col) or ["empty"]),
+            f"{non_null} non-null ({null_rate:.1%} null)",
+        ]
+        if col in self._min and col in self._sum:
+            mean = self._sum[col] / self._count[col] if self._count.get(col) else None
+            parts.append(f"min {_format_value(self._min[col])}, max {_format_value(self._max[col])}")
+            if mean is not None:
+                parts.append(f"mean {_format_value(mean)}")
+            if col in quantiles:
+                labels = ("p5", "p25", "median", "p75", "p95")
+                values = ", ".join(f"{label} {_format_value(value)}" for label, value in zip(labels, quantiles[col]))
+                parts.append(values + (" (sampled)" if self.sampled else ""))
+        elif col in self._min:
+            parts.append(f"range {_format_value(self._min[col])} to {_format_value(self._max[col])}")
+        counts = self._values.get(col)
+        if counts is not None and len(counts):
+            distinct = f"{PROFILE_TRACKED_VALUES}+" if col in self._values_capped else str(len(counts))
+            top = counts.nlargest(PROFILE_TOP_K)
+            if top.iloc[0] > 1:
+                values = ", ".join(f"{_format_value(value)} ({count})" for value, count in top.items())
+                parts.append(f"{distinct} distinct, top: {values}")
+            else:
+                # Identifier-like column: counts of 1 say nothing
+                parts.append(f"{distinct} distinct, e.g. {', '.join(_format_value(value) for value in top.index)}")
+        return ", ".join(parts)
+
+    def _sample_lines(self) -> List[str]:
+        import pandas as pd
+
+        if self._reservoir is None:
+            return ["Sample Data: (no rows)"]
+        chosen = self._reservoir_keys.nsmallest(PROFILE_SAMPLE_ROWS).index.sort_values()
+        sample = self._reservoir.loc[chosen]
+        if len(sample) == self.rows:
+            lines = [f"Sample Data (all {self.rows} rows):"]
+        else:
+            lines = [f"Sample Data ({len(sample)} random rows of {self.rows}):"]
+
+        used = 0
+        shown = 0
+        for row_number, row in zip(sample.index, sample.itertuples(index=False, name=None)):
+            cells = " | ".join(
+                f"{col}: {_format_value(value)}"
+                for col, value in zip(self.columns, row)
+                if not pd.isna(value)
+            )
+            line = f"  Row {row_number}: {cells}"
+            if shown and used + len(line) > PROFILE_SAMPLE_CHARS:
+                break
+            lines.append(line)
+            used += len(line)
+            shown += 1
+        if shown < self.rows:
+            lines.append(f"  ... and {self.rows - shown} more rows")
+        return lines
+
+
 # =============================================================================
 # CSV/Excel Parser
 # =============================================================================
@@ -147,6 +475,9 @@ async def parse_csv(file_content: bytes, filename: str = "data.csv") -> Tuple[st
     """
     Convert CSV data into a readable text summary.
 
+    The CSV is read in blocks and profiled with ``TableProfiler``, so the
+    summary stays bounded in time and memory for very large files.
+
     Args:
         file_content: Raw CSV bytes
         filename: Original filename for logging
@@ -155,44 +486,14 @@ async def parse_csv(file_content: bytes, filename: str = "data.csv") -> Tuple[st
         Tuple of (extracted_text, metadata_dict)
     """
     try:
-        import pandas as pd
-
         logger.info(f"📊 Parsing CSV: {filename}")
 
-        # Read CSV from bytes
-        csv_stream = io.BytesIO(file_content)
-        df = pd.read_csv(csv_stream)
-
-        # Generate summary
-        text_parts = []
-
-        # Header info
-        text_parts.append(f"CSV Data Summary: {filename}")
-        text_parts.append(f"Columns: {', '.join(df.columns.tolist())}")
-        text_parts.append(f"Total Rows: {len(df)}")
-        text_parts.append("")
-
-        # Column statistics
-        text_parts.append("Column Details:")
-        for col in df.columns:
-            dtype = str(df[col].dtype)
-            non_null = df[col].count()
-            unique = df[col].nunique()
-            text_parts.append(f"  - {col}: {dtype}, {non_null} non-null, {unique} unique values")
-
-        text_parts.append("")
-
-        # Sample rows (first 20)
-        text_parts.append("Sample Data (first 20 rows):")
-        sample_df = df.head(20)
-        for idx, row in sample_df.iterrows():
-            row_text = " | ".join([f"{col}: {val}" for col, val in row.items()])
-            text_parts.append(f"  Row {idx + 1}: {row_text}")
-
-        # If more rows, add note
-        if len(df) > 20:
-            text_parts.append(f"  ... and {len(df) - 20} more rows")
+        profiler = TableProfiler()
+        for frame in _iter_csv_frames(io.BytesIO(file_content)):
+            profiler.add(frame)
 
+        text_parts = [f"CSV Data Summary: {filename}"]
+        text_parts.extend(profiler.summary_lines())
         extracted_text = "\n".join(text_parts)
 
         # Truncate if too long
@@ -202,14 +503,15 @@ async def parse_csv(file_content: bytes, filename: str = "data.csv") -> Tuple[st
 
         metadata = {
             "parser": "pandas",
-            "total_rows": len(df),
-            "total_columns": len(df.columns),
-            "columns": df.columns.tolist(),
+            "total_rows": profiler.rows,
+            "total_columns": len(profiler.columns),
+            "columns": profiler.columns,
+            "sampled": profiler.sampled,
             "filename": filename
         }
 
         logger.info(
-            f"✓ Parsed CSV with {len(df)} rows, {len(df.columns)} columns")
+            f"✓ Parsed CSV with {profiler.rows} rows, {len(profiler.columns)} columns")
         return extracted_text, metadata
 
     except Exception as e:
@@ -221,6 +523,9 @@ async def parse_excel(file_content: bytes, filename: str = "data.xlsx") -> Tuple
     """
     Convert Excel data into a readable text summary.
 
+    Sheets are streamed with openpyxl's read-only reader and profiled
+    block by block with ``TableProfiler``.
+
     Args:
         file_content: Raw Excel bytes
         filename: Original filename for logging
@@ -229,44 +534,27 @@ async def parse_excel(file_content: bytes, filename: str = "data.xlsx") -> Tuple
         Tuple of (extracted_text, metadata_dict)
     """
     try:
-        import pandas as pd
+        from openpyxl import load_workbook
 
         logger.info(f"📊 Parsing Excel: {filename}")
 
-        # Read Excel from bytes
-        excel_stream = io.BytesIO(file_content)
-        excel_file = pd.ExcelFile(excel_stream, engine='openpyxl')
-
-        text_parts = []
-        text_parts.append(f"Excel Workbook Summary: {filename}")
-        text_parts.append(f"Sheets: {', '.join(excel_file.sheet_names)}")
-        text_parts.append("")
-
-        total_rows = 0
-        all_columns = []
-
-        # Process each sheet
-        for sheet_name in excel_file.sheet_names:
-            df = pd.read_excel(excel_file, sheet_name=sheet_name)
-            total_rows += len(df)
-            all_columns.extend(df.columns.tolist())
-
-            text_parts.append(f"=== Sheet: {sheet_name} ===")
-            text_parts.append(f"Columns: {', '.join(df.columns.tolist())}")
-            text_parts.append(f"Rows: {len(df)}")
-            text_parts.append("")
-
-            # Sample rows (first 10 per sheet)
-            text_parts.append("Sample Data:")
-            sample_df = df.head(10)
-            for idx, row in sample_df.iterrows():
-                row_text = " | ".join([f"{col}: {val}" for col, val in row.items()])
-                text_parts.append(f"  Row {idx + 1}: {row_text}")
-
-            if len(df) > 10:
-                text_parts.append(f"  ... and {len(df) - 10} more rows")
-
-            text_parts.append("")
+        workbook = load_workbook(io.BytesIO(file_content), read_only=True, data_only=True)
+        try:
+            sheet_names = workbook.sheetnames
+            text_parts = [f"Excel Workbook Summary: {filename}", f"Sheets: {', '.join(sheet_names)}", ""]
+            total_rows = 0
+
+            for sheet_name in sheet_names:
+                profiler = TableProfiler()
+                for columns, rows in _iter_sheet_blocks(workbook[sheet_name], PROFILE_BLOCK_ROWS):
+                    profiler.add(_rows_frame(columns, rows))
+                total_rows += profiler.rows
+
+                text_parts.append(f"=== Sheet: {sheet_name} ===")
+                text_parts.extend(profiler.summary_lines())
+                text_parts.append("")
+        finally:
+            workbook.close()
 
         extracted_text = "\n".join(text_parts)
 
@@ -277,14 +565,14 @@ async def parse_excel(file_content: bytes, filename: str = "data.xlsx") -> Tuple
 
         metadata = {
             "parser": "pandas+openpyxl",
-            "total_sheets": len(excel_file.sheet_names),
-            "sheet_names": excel_file.sheet_names,
+            "total_sheets": len(sheet_names),
+            "sheet_names": sheet_names,
             "total_rows": total_rows,
             "filename": filename
         }
 
         logger.info(
-            f"✓ Parsed Excel with {len(excel_file.sheet_names)} sheets, {total_rows} total rows")
+            f"✓ Parsed Excel with {len(sheet_names)} sheets, {total_rows} total rows")
         return extracted_text, metadata
 
     except Exception as e:
@@ -327,10 +615,18 @@ async def parse_image(file_content: bytes, filename: str = "image.jpg", mime_typ
         media_type = media_type_map.get(mime_type.lower(), "image/jpeg")
 
         # Create Claude client
+        from langchain_anthropic import ChatAnthropic
+
+        from backend.services.rate_limiter import ProviderRateLimiter
+
+        from .metrics_callbacks import CircuitBreakerCallbackHandler
+
         llm = ChatAnthropic(
             model=VISION_MODEL,
             temperature=0.0,
             anthropic_api_key=ANTHROPIC_API_KEY,
+            rate_limiter=ProviderRateLimiter("anthropic", VISION_MODEL),
+            callbacks=[CircuitBreakerCallbackHandler("anthropic", model=VISION_MODEL)],
         )
 
         # Create vision message
@@ -542,3 +838,187 @@ async def parse_file(
         raise ValueError(f"No parser available for file type: {file_type}")
 
     return await parser_func(file_content, filename)
+
+
+# =============================================================================
+# Incremental Parsing (chunked ingestion)
+# =============================================================================
+
+# Spreadsheet/CSV rows per parsed section
+ROWS_PER_SECTION = 200
+
+# Plain-text bytes read per parsed section
+TEXT_BYTES_PER_SECTION = 64 * 1024
+
+
+@dataclass
+class ParsedSection:
+    """
+    One incrementally parsed piece of a file (a PDF page, a block of rows).
+
+    Attributes:
+        label: Where the text came from, e.g. "Page 3" or "Sheet Budget, rows 1-200"
+        text: Extracted text
+        progress: Fraction of the file parsed once this section is done (0-1)
+    """
+    label: str
+    text: str
+    progress: float
+
+
+def _format_rows(columns: List[str], rows: Iterable[Iterable[Any]], first_row: int) -> str:
+    """Render rows as "Row N: col: value | col: value" lines."""
+    lines = []
+    for offset, row in enumerate(rows):
+        cells = " | ".join(f"{col}: {val}" for col, val in zip(columns, row))
+        lines.append(f"Row {first_row + offset}: {cells}")
+    return "\n".join(lines)
+
+
+def _iter_pdf_sections(path: str) -> Iterator[ParsedSection]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    total_pages = len(reader.pages)
+    for i, page in enumerate(reader.pages):
+        yield ParsedSection(f"Page {i + 1}", page.extract_text() or "", (i + 1) / max(total_pages, 1))
+
+
+def _iter_csv_sections(path: str) -> Iterator[ParsedSection]:
+    size = max(os.path.getsize(path), 1)
+    profiler = TableProfiler()
+    with open(path, "rb") as handle:
+        first_row = 1
+        done = 0.0
+        for block in _iter_csv_frames(handle):
+            profiler.add(block)
+            read = min(handle.tell() / size, 1.0)
+            columns = [str(col) for col in block.columns]
+            for start in range(0, len(block), ROWS_PER_SECTION):
+                frame = block.iloc[start:start + ROWS_PER_SECTION]
+                last_row = first_row + len(frame) - 1
+                yield ParsedSection(
+                    f"Rows {first_row}-{last_row}",
+                    _format_rows(columns, frame.itertuples(index=False, name=None), first_row),
+                    done + (read - done) * (start + len(frame)) / len(block),
+                )
+                first_row = last_row + 1
+            done = read
+    if profiler.rows:
+        yield ParsedSection("Summary", "\n".join(profiler.summary_lines()), 1.0)
+
+
+def _iter_excel_sections(path: str) -> Iterator[ParsedSection]:
+    from openpyxl import load_workbook
+
+    # read_only streams rows instead of loading every sheet into memory
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet_names = workbook.sheetnames
+        for sheet_index, sheet_name in enumerate(sheet_names):
+            sheet = workbook[sheet_name]
+            total_rows = max((sheet.max_row or 1) - 1, 1)
+            profiler = TableProfiler()
+            first_row = 1
+            for columns, block in _iter_sheet_blocks(sheet, PROFILE_BLOCK_ROWS):
+                profiler.add(_rows_frame(columns, block))
+                for start in range(0, len(block), ROWS_PER_SECTION):
+                    rows = block[start:start + ROWS_PER_SECTION]
+                    last_row = first_row + len(rows) - 1
+                    yield ParsedSection(
+                        f"Sheet {sheet_name}, rows {first_row}-{last_row}",
+                        _format_rows(columns, rows, first_row),
+                        (sheet_index + min(last_row / total_rows, 1.0)) / len(sheet_names),
+                    )
+                    first_row = last_row + 1
+            if profiler.rows:
+                yield ParsedSection(
+                    f"Sheet {sheet_name}, summary",
+                    "\n".join(profiler.summary_lines()),
+                    (sheet_index + 1) / len(sheet_names),
+                )
+    finally:
+        workbook.close()
+
+
+def _iter_text_sections(path: str) -> Iterator[ParsedSection]:
+    import codecs
+
+    size = max(os.path.getsize(path), 1)
+    with open(path, "rb") as handle:
+        raw = handle.read(4096)
+        handle.seek(0)
+        try:
+            raw.decode("utf-8")
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        except UnicodeDecodeError as e:
+            # A multi-byte character cut at the probe boundary is still UTF-8
+            encoding = "utf-8" if e.start >= len(raw) - 3 else "latin-1"
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        part = 1
+        while True:
+            block = handle.read(TEXT_BYTES_PER_SECTION)
+            text = decoder.decode(block, final=not block)
+            if text:
+                yield ParsedSection(f"Part {part}", text, min(handle.tell() / size, 1.0))
+                part += 1
+            if not block:
+                return
+
+
+def _iter_json_sections(path: str) -> Iterator[ParsedSection]:
+    import json
+
+    with open(path, "rb") as handle:
+        data = json.loads(handle.read().decode("utf-8", errors="replace"))
+    # One section per top-level item or key keeps related values together
+    if isinstance(data, list):
+        items = [(f"Item {i + 1}", item) for i, item in enumerate(data)]
+    elif isinstance(data, dict):
+        items = [(f"Key {key}", {key: value}) for key, value in data.items()]
+    else:
+        items = [("Value", data)]
+    for i, (label, item) in enumerate(items):
+        yield ParsedSection(label, json.dumps(item, indent=2, ensure_ascii=False), (i + 1) / len(items))
+
+
+def iter_file_sections(path: str, mime_type: str, filename: str = "unknown") -> Iterator[ParsedSection]:
+    """
+    Parse a file on disk incrementally, one page, row block or text block
+    at a time, so large files never have to be held in memory whole.
+    Tables end with a ``TableProfiler`` summary section per CSV or sheet.
+
+    Unlike ``parse_file`` nothing is truncated.  Images are not supported
+    (describe them with ``parse_image``).
+
+    Args:
+        path: Path of the file on disk
+        mime_type: MIME type of the file
+        filename: Original filename for logging
+
+    Yields:
+        ParsedSection for each piece of the file, in order
+
+    Raises:
+        ValueError: If the MIME type is not supported or parsing fails
+    """
+    file_type = get_file_type(mime_type)
+    iterators = {
+        "pdf": _iter_pdf_sections,
+        "csv": _iter_csv_sections,
+        "excel": _iter_excel_sections,
+        "text": _iter_text_sections,
+        "json": _iter_json_sections,
+    }
+    iterator = iterators.get(file_type or "")
+    if iterator is None:
+        raise ValueError(f"Incremental parsing not available for MIME type: {mime_type}")
+
+    logger.info(f"🔄 Parsing {file_type} incrementally: {filename}")
+    try:
+        yield from iterator(path)
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to parse {filename}: {e}", exc_info=True)
+        raise ValueError(f"{file_type.upper()} parsing failed: {str(e)}")
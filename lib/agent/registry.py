@@ -16,13 +16,23 @@ import importlib.util
 import json
 import logging
 import os
+import time
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 
 from .mcp_client import get_mcp_tools
+from .tool_cache import (
+    TOOL_CACHE_ENABLED,
+    ToolCacheSpec,
+    derive_key_args,
+    effective_tags,
+    get_tool_result_cache,
+    make_cache_key,
+    record_cache_hit,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +62,10 @@ if mcp_server_specs:
 
 logger.info(f"Configured MCP servers: {[s['command'] for s in MCP_SERVERS]}")
 
+# Local skills and MCP tools are loaded once per process; a load in which
+# an MCP server returned no tools is retried after this many seconds
+TOOL_REGISTRY_RETRY_SECONDS = float(os.getenv("TOOL_REGISTRY_RETRY_SECONDS", "60"))
+
 
 # =============================================================================
 # Local Skill Models
@@ -63,6 +77,9 @@ class SkillManifest(BaseModel):
     description: str
     version: str = "1.0.0"
     parameters: Dict[str, Any] = Field(default_factory=dict)
+    # Result caching for read-only skills / tags a write skill makes stale
+    cache: Optional[ToolCacheSpec] = None
+    invalidates: List[str] = Field(default_factory=list)
 
 
 class LoadedSkill(BaseModel):
@@ -274,16 +291,26 @@ def convert_local_skill_to_tool(skill: LoadedSkill) -> StructuredTool:
     """
     Convert a local Python skill to a LangChain StructuredTool.
 
+    Skills whose manifest has a ``cache`` block serve repeated reads from
+    the tool result cache; skills with ``invalidates`` evict the tags they
+    make stale (see ``lib/agent/tool_cache.py``).
+
     Args:
         skill: The loaded skill
 
     Returns:
         A LangChain StructuredTool
     """
+    cache_spec = skill.manifest.cache if TOOL_CACHE_ENABLED else None
+    invalidates = skill.manifest.invalidates if TOOL_CACHE_ENABLED else []
+    param_defaults = {
+        name: schema["default"]
+        for name, schema in skill.manifest.parameters.get("properties", {}).items()
+        if isinstance(schema, dict) and "default" in schema
+    }
 
-    # Wrap the handler to handle both sync and async
-    async def async_wrapper(**kwargs) -> str:
-        """Async wrapper for skill handler."""
+    async def run_skill(kwargs: Dict[str, Any]) -> Tuple[str, bool]:
+        """Run the handler; returns the tool output and whether it succeeded."""
         try:
             logger.info(f"Executing skill {skill.name} with args: {kwargs}")
             result = skill.handler(kwargs)
@@ -298,20 +325,51 @@ def convert_local_skill_to_tool(skill: LoadedSkill) -> StructuredTool:
             if isinstance(result, dict):
                 # For sandbox/code execution results, include the output
                 if "output" in result and result.get("status") == "success":
-                    return f"SUCCESS: {result.get('message', 'Code executed')}\n\nOutput:\n{result['output']}"
+                    return f"SUCCESS: {result.get('message', 'Code executed')}\n\nOutput:\n{result['output']}", True
                 # For error results, include full details
                 if result.get("status") == "error":
                     error_msg = result.get("error", result.get("message", "Unknown error"))
                     logger.warning(f"Skill {skill.name} returned error: {error_msg}")
-                    return f"ERROR: {error_msg}"
+                    return f"ERROR: {error_msg}", False
                 # For other results with status/message, show full JSON to preserve data
-                return json.dumps(result, indent=2)
+                ok = "error" not in result and result.get("success", True) is not False
+                return json.dumps(result, indent=2), ok
 
-            return str(result)
+            return str(result), True
 
         except Exception as e:
             logger.error(f"Error executing skill {skill.name}: {e}", exc_info=True)
-            return f"Error: {str(e)}"
+            return f"Error: {str(e)}", False
+
+    # Wrap the handler to handle both sync and async
+    async def async_wrapper(**kwargs) -> str:
+        """Async wrapper for skill handler."""
+        cacheable = cache_spec is not None and cache_spec.applies_to(kwargs)
+        if not cacheable and not invalidates:
+            return (await run_skill(kwargs))[0]
+
+        cache = get_tool_result_cache()
+        if cacheable:
+            generations = await _call_cache(cache.generations, effective_tags(skill.name, cache_spec))
+            cache_key = make_cache_key(
+                skill.name,
+                skill.manifest.version,
+                derive_key_args(cache_spec, kwargs, param_defaults),
+                generations,
+            )
+            cached = await _call_cache(cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"Skill {skill.name} served from tool cache")
+                record_cache_hit(skill.name, cached)
+                return cached
+
+        output, ok = await run_skill(kwargs)
+        if ok:
+            if cacheable:
+                await _call_cache(cache.put, cache_key, output, cache_spec.ttl_seconds)
+            else:
+                await _call_cache(cache.invalidate, invalidates)
+        return output
 
     # Create args_schema from manifest for proper LangChain integration
     args_schema = create_args_schema_from_manifest(skill)
@@ -325,24 +383,19 @@ def convert_local_skill_to_tool(skill: LoadedSkill) -> StructuredTool:
     )
 
 
+async def _call_cache(method: Callable[..., Any], *args: Any) -> Any:
+    """Call a tool cache method, off the event loop when it may hit Redis."""
+    if get_tool_result_cache().redis_enabled:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+
 # =============================================================================
 # MCP Tool Loading
 # =============================================================================
 
-async def load_mcp_tools() -> List[StructuredTool]:
-    """
-    Load tools from all configured MCP servers.
-
-    Returns:
-        List of LangChain StructuredTool objects from MCP servers
-    """
-    all_mcp_tools: List[StructuredTool] = []
-
-    if not MCP_SERVERS:
-        logger.info("No MCP servers configured")
-        return all_mcp_tools
-
-    # Load tools from each MCP server concurrently
+async def _load_mcp_tools_by_server() -> List[Tuple[str, List[StructuredTool]]]:
+    """Load every configured MCP server concurrently: (command, tools) pairs."""
     tasks = [
         get_mcp_tools(
             command=server["command"],
@@ -352,14 +405,35 @@ async def load_mcp_tools() -> List[StructuredTool]:
     ]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
+    loaded: List[Tuple[str, List[StructuredTool]]] = []
     for i, result in enumerate(results):
         server_name = MCP_SERVERS[i]["command"]
         if isinstance(result, Exception):
             logger.error(f"Failed to load tools from {server_name}: {result}")
+            loaded.append((server_name, []))
         elif isinstance(result, list):
-            all_mcp_tools.extend(result)
+            loaded.append((server_name, result))
             logger.info(f"✓ Loaded {len(result)} tools from {server_name}")
 
+    return loaded
+
+
+async def load_mcp_tools() -> List[StructuredTool]:
+    """
+    Load tools from all configured MCP servers.
+
+    Returns:
+        List of LangChain StructuredTool objects from MCP servers
+    """
+    all_mcp_tools: List[StructuredTool] = []
+
+    if not MCP_SERVERS:
+        logger.info("No MCP servers configured")
+        return all_mcp_tools
+
+    for _, tools in await _load_mcp_tools_by_server():
+        all_mcp_tools.extend(tools)
+
     return all_mcp_tools
 
 
@@ -410,6 +484,81 @@ async def get_mcp_diagnostics() -> Dict[str, Any]:
     return diagnostics
 
 
+# =============================================================================
+# Base Tool Cache
+# =============================================================================
+# Loading execs every skill's handler.py and starts every MCP server, so
+# local and MCP tools are loaded once per process (at startup, behind the
+# "tools" readiness gate) instead of on every agent turn.
+
+_base_tools: Optional[Tuple[List[StructuredTool], List[StructuredTool]]] = None
+_base_tools_expire_at: Optional[float] = None
+_base_tools_loading: Optional["asyncio.Task[Tuple[List[StructuredTool], List[StructuredTool]]]"] = None
+
+
+async def _load_base_tools() -> Tuple[List[StructuredTool], List[StructuredTool]]:
+    global _base_tools, _base_tools_expire_at
+
+    logger.info("Loading local skills...")
+    # exec'ing skill handlers is blocking file and module work
+    local_skills = await asyncio.to_thread(load_local_skills)
+    local_tools = [convert_local_skill_to_tool(skill) for skill in local_skills]
+    logger.info(f"Loaded {len(local_skills)} local skills")
+
+    logger.info("Loading MCP tools...")
+    if MCP_SERVERS:
+        by_server = await _load_mcp_tools_by_server()
+    else:
+        logger.info("No MCP servers configured")
+        by_server = []
+    mcp_tools = [tool for _, tools in by_server for tool in tools]
+    logger.info(f"Loaded {len(mcp_tools)} MCP tools")
+
+    empty = [name for name, tools in by_server if not tools]
+    if empty:
+        logger.warning(f"MCP servers {empty} returned no tools; retrying in {TOOL_REGISTRY_RETRY_SECONDS:.0f}s")
+    _base_tools = (local_tools, mcp_tools)
+    _base_tools_expire_at = time.monotonic() + TOOL_REGISTRY_RETRY_SECONDS if empty else None
+    return _base_tools
+
+
+async def get_base_tools() -> Tuple[List[StructuredTool], List[StructuredTool]]:
+    """
+    Local skill tools and MCP tools, loaded on first use and then cached.
+
+    Concurrent first calls on one event loop share a single load.
+
+    Returns
+    -------
+    tuple[list[StructuredTool], list[StructuredTool]]
+        (local skill tools, MCP tools).
+    """
+    global _base_tools_loading
+    if _base_tools is not None and (_base_tools_expire_at is None or time.monotonic() < _base_tools_expire_at):
+        return _base_tools
+
+    loop = asyncio.get_running_loop()
+    task = _base_tools_loading
+    if task is None or task.done() or task.get_loop() is not loop:
+        task = _base_tools_loading = loop.create_task(_load_base_tools())
+    return await asyncio.shield(task)
+
+
+def loaded_tool_count() -> int:
+    """Number of cached local and MCP tools (0 until the first load)."""
+    if _base_tools is None:
+        return 0
+    return sum(len(tools) for tools in _base_tools)
+
+
+def reset_base_tools() -> None:
+    """Drop the cached local and MCP tools so the next call reloads them."""
+    global _base_tools, _base_tools_expire_at, _base_tools_loading
+    _base_tools = None
+    _base_tools_expire_at = None
+    _base_tools_loading = None
+
+
 # =============================================================================
 # Unified Tool Registry
 # =============================================================================
@@ -435,19 +584,10 @@ async def get_all_tools(user_id: Optional[str] = None) -> List[StructuredTool]:
     """
     all_tools: List[StructuredTool] = []
 
-    # Load local skills
-    logger.info("Loading local skills...")
-    local_skills = load_local_skills()
-    for skill in local_skills:
-        tool = convert_local_skill_to_tool(skill)
-        all_tools.append(tool)
-    logger.info(f"Loaded {len(local_skills)} local skills")
-
-    # Load MCP tools
-    logger.info("Loading MCP tools...")
-    mcp_tools = await load_mcp_tools()
+    # Local skills and MCP tools (loaded once per process)
+    local_tools, mcp_tools = await get_base_tools()
+    all_tools.extend(local_tools)
     all_tools.extend(mcp_tools)
-    logger.info(f"Loaded {len(mcp_tools)} MCP tools")
 
     # Load DB skills (user-specific promoted skills)
     db_skill_count = 0
@@ -463,7 +603,7 @@ async def get_all_tools(user_id: Optional[str] = None) -> List[StructuredTool]:
     # Log summary
     logger.info("=" * 60)
     logger.info(f"TOTAL TOOLS LOADED: {len(all_tools)}")
-    logger.info(f"  - Local Skills: {len(local_skills)}")
+    logger.info(f"  - Local Skills: {len(local_tools)}")
     logger.info(f"  - MCP Tools: {len(mcp_tools)}")
     if user_id:
         logger.info(f"  - DB Skills: {db_skill_count}")
@@ -50,6 +50,7 @@ import asyncio
 import json
 import logging
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 from uuid import UUID
@@ -80,6 +81,73 @@ AGENT_REFRESH_TOKEN = os.getenv("AGENT_REFRESH_TOKEN", "")
 # User's timezone
 USER_TIMEZONE = pytz.timezone(os.getenv("SCHEDULER_TIMEZONE", "America/Chicago"))
 
+# Delivery throughput
+# Reminders fired concurrently per batch
+REMINDER_DELIVERY_CONCURRENCY = int(os.getenv("REMINDER_DELIVERY_CONCURRENCY", "10"))
+# Per-channel send rates (messages/second). Twilio long codes accept about
+# 1 SMS/second; Gmail send quotas tolerate short bursts.
+REMINDER_SMS_RATE_PER_SEC = float(os.getenv("REMINDER_SMS_RATE_PER_SEC", "1"))
+REMINDER_EMAIL_RATE_PER_SEC = float(os.getenv("REMINDER_EMAIL_RATE_PER_SEC", "5"))
+
+
+# =============================================================================
+# Channel Rate Limiting
+# =============================================================================
+
+class ChannelRateLimiter:
+    """
+    Async token bucket limiting sends on one notification channel.
+
+    Usage:
+        limiter = ChannelRateLimiter(rate_per_sec=1.0, burst=1)
+        await limiter.acquire()   # waits until a send is allowed
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate_per_sec: Sustained sends per second (<= 0 disables limiting)
+            burst: Sends allowed back-to-back from a full bucket
+        """
+        self.rate_per_sec = rate_per_sec
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for and consume one token."""
+        if self.rate_per_sec <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate_per_sec,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_sec)
+
+
+_CHANNEL_LIMITERS: Dict[str, ChannelRateLimiter] = {
+    "sms": ChannelRateLimiter(REMINDER_SMS_RATE_PER_SEC, burst=1),
+    "email": ChannelRateLimiter(REMINDER_EMAIL_RATE_PER_SEC, burst=5),
+}
+
+
+async def _rate_limited(channel: str, send: Any) -> Dict[str, Any]:
+    """Await a channel send coroutine once the channel's limiter allows it."""
+    limiter = _CHANNEL_LIMITERS.get(channel)
+    if limiter is not None:
+        await limiter.acquire()
+    return await send
+
 
 # =============================================================================
 # Notification Formatters
@@ -483,11 +551,11 @@ async def send_reminder_notification(
 
     if channels.get("sms"):
         results["channels_attempted"].append("sms")
-        tasks.append(("sms", send_sms_notification(reminder)))
+        tasks.append(("sms", _rate_limited("sms", send_sms_notification(reminder))))
 
     if channels.get("email"):
         results["channels_attempted"].append("email")
-        tasks.append(("email", send_email_notification(reminder)))
+        tasks.append(("email", _rate_limited("email", send_email_notification(reminder))))
 
     # Execute all channel notifications concurrently
     if tasks:
@@ -632,6 +700,28 @@ async def fire_reminder(reminder_id: UUID) -> Dict[str, Any]:
 # Batch Processing for Due Reminders
 # =============================================================================
 
+async def fire_reminders(reminder_ids: List[UUID]) -> List[Dict[str, Any]]:
+    """
+    Fire several reminders concurrently.
+
+    At most REMINDER_DELIVERY_CONCURRENCY reminders are in flight at once;
+    per-channel rate limits still apply inside each delivery.
+
+    Args:
+        reminder_ids: Reminders to fire
+
+    Returns:
+        One fire_reminder() result per ID, in input order
+    """
+    semaphore = asyncio.Semaphore(REMINDER_DELIVERY_CONCURRENCY)
+
+    async def _fire(reminder_id: UUID) -> Dict[str, Any]:
+        async with semaphore:
+            return await fire_reminder(reminder_id)
+
+    return list(await asyncio.gather(*[_fire(rid) for rid in reminder_ids]))
+
+
 async def process_due_reminders() -> Dict[str, Any]:
     """
     Process all reminders that are due for firing.
@@ -671,10 +761,11 @@ async def process_due_reminders() -> Dict[str, Any]:
             logger.info("No due reminders found")
             return result
 
-        # Process each reminder
-        for reminder in reminders:
+        # Deliver concurrently, then tally in order
+        fire_results = await fire_reminders([UUID(r["id"]) for r in reminders])
+
+        for reminder, fire_result in zip(reminders, fire_results):
             reminder_id = UUID(reminder["id"])
-            fire_result = await fire_reminder(reminder_id)
             result["reminders_processed"] += 1
 
             if fire_result.get("status") == "success":
@@ -0,0 +1,543 @@
+"""
+Reminder Queue - Redis Sorted-Set Reminder Index
+================================================
+
+A time-ordered index of upcoming reminder fire times, shared by every API
+process through Redis.  Replaces one APScheduler job per reminder:
+
+- ``sabine:reminders:schedule`` (ZSET): member = reminder ID,
+  score = next fire time in epoch milliseconds.
+- ``sabine:reminders:spec`` (HASH): reminder ID -> JSON with
+  ``scheduled_time``, ``repeat_pattern``, ``title`` and ``attempts``,
+  enough to compute the next occurrence without touching Postgres.
+- ``sabine:reminders:indexed`` (STRING): set once the index has been
+  bootstrapped from the ``reminders`` table.  Because the index lives in
+  Redis, restarts no longer reload every active reminder.
+
+Claiming is atomic: a Lua script pops up to N due members and pushes their
+score forward by a claim lease, so concurrent dispatchers never deliver the
+same occurrence twice, and a dispatcher that dies mid-delivery releases its
+claims when the lease lapses.  After delivery the claimer finalizes each
+reminder with a compare-and-set on the lease score: recurring reminders
+move to their next occurrence, one-time reminders leave the index.  A
+reminder re-scheduled during delivery keeps its new time.
+
+A delivery that keeps failing is retried ``REMINDER_MAX_ATTEMPTS`` times.
+A recurring reminder then skips to its next occurrence.  A one-time
+reminder leaves the index only once ``give_up`` has persisted the failure
+(``ReminderScheduler`` deactivates the row), so the poller's re-indexing
+of still-active due rows cannot restart its attempts.
+
+Wakeups are O(due): the dispatcher reads only the head of the ZSET to
+decide how long to sleep and only the due members when it wakes.
+
+Owner: @backend-architect-sabine
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from lib.agent.reminder_scheduler import USER_TIMEZONE, create_trigger_for_reminder
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+REMINDER_QUEUE_ENABLED = os.getenv("REMINDER_QUEUE_ENABLED", "true").lower() != "false"
+
+# How long a claimed reminder stays invisible to other dispatchers
+REMINDER_CLAIM_LEASE_SECONDS = int(os.getenv("REMINDER_CLAIM_LEASE_SECONDS", "300"))
+
+# Maximum reminders claimed per wakeup
+REMINDER_CLAIM_BATCH_SIZE = int(os.getenv("REMINDER_CLAIM_BATCH_SIZE", "100"))
+
+# Delivery attempts before a failing occurrence is given up
+REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", "3"))
+
+SCHEDULE_KEY = "sabine:reminders:schedule"
+SPEC_KEY = "sabine:reminders:spec"
+INDEXED_KEY = "sabine:reminders:indexed"
+
+# Bootstrap page size when indexing the reminders table
+BOOTSTRAP_PAGE_SIZE = 500
+
+# KEYS[1]=schedule  ARGV[1]=now_ms  ARGV[2]=limit  ARGV[3]=lease_until_ms
+_CLAIM_SCRIPT = """
+local due = redis.call('zrangebyscore', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, id in ipairs(due) do
+    redis.call('zadd', KEYS[1], ARGV[3], id)
+end
+return due
+"""
+
+# KEYS[1]=schedule KEYS[2]=spec
+# ARGV[1]=id ARGV[2]=claimed score ARGV[3]=next score ('' = remove)
+# ARGV[4]=new spec JSON ('' = unchanged)
+_FINALIZE_SCRIPT = """
+local score = redis.call('zscore', KEYS[1], ARGV[1])
+if not score or tonumber(score) ~= tonumber(ARGV[2]) then
+    return 0
+end
+if ARGV[3] == '' then
+    redis.call('zrem', KEYS[1], ARGV[1])
+    redis.call('hdel', KEYS[2], ARGV[1])
+else
+    redis.call('zadd', KEYS[1], ARGV[3], ARGV[1])
+    if ARGV[4] ~= '' then
+        redis.call('hset', KEYS[2], ARGV[1], ARGV[4])
+    end
+end
+return 1
+"""
+
+FireManyCallable = Callable[[List[UUID]], Awaitable[List[Dict[str, Any]]]]
+
+# (reminder_id, error) -> True once the terminal failure is persisted
+GiveUpCallable = Callable[[UUID, Optional[str]], Awaitable[bool]]
+
+
+# =============================================================================
+# Time Helpers
+# =============================================================================
+
+def _parse_time(value: Any) -> datetime:
+    """Parse an ISO timestamp (``Z`` suffix allowed) or pass a datetime through."""
+    if isinstance(value, datetime):
+        return value
+    text = str(value)
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    return datetime.fromisoformat(text)
+
+
+def _to_ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def _from_ms(ms: float) -> datetime:
+    return datetime.fromtimestamp(ms / 1000.0, tz=timezone.utc)
+
+
+def next_fire_time(
+    scheduled_time: datetime,
+    repeat_pattern: Optional[str],
+    after: datetime,
+) -> Optional[datetime]:
+    """
+    Compute a reminder's next occurrence strictly after ``after``.
+
+    Args:
+        scheduled_time: The reminder's original scheduled time
+        repeat_pattern: Recurrence pattern or None for one-time
+        after: Occurrences at or before this instant are ignored
+
+    Returns:
+        Next fire time, or None when a one-time reminder has nothing left
+    """
+    if repeat_pattern is None:
+        if scheduled_time.tzinfo is None:
+            scheduled_time = USER_TIMEZONE.localize(scheduled_time)
+        return scheduled_time if scheduled_time > after else None
+
+    trigger = create_trigger_for_reminder(scheduled_time, repeat_pattern)
+    # Cron fire times have one-second resolution; step past the occurrence
+    # that just fired.
+    return trigger.get_next_fire_time(None, after + timedelta(seconds=1))
+
+
+# =============================================================================
+# Reminder Queue
+# =============================================================================
+
+class ReminderQueue:
+    """
+    Redis ZSET index of upcoming reminder fire times.
+
+    Usage:
+        queue = ReminderQueue()
+        await queue.schedule(reminder_id, scheduled_time, "weekly")
+        results = await queue.dispatch_due(fire_reminders)
+        delay = await queue.seconds_until_next()
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        clock: Callable[[], float] = time.time,
+        lease_seconds: int = REMINDER_CLAIM_LEASE_SECONDS,
+        batch_size: int = REMINDER_CLAIM_BATCH_SIZE,
+        max_attempts: int = REMINDER_MAX_ATTEMPTS,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            redis_client: Redis client (defaults to the shared singleton)
+            clock: Returns the current epoch time in seconds (for tests)
+            lease_seconds: Claim lease length
+            batch_size: Maximum reminders claimed per wakeup
+            max_attempts: Delivery attempts before an occurrence is given up
+        """
+        self._redis_client = redis_client
+        self._clock = clock
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+    def _redis(self) -> Any:
+        if self._redis_client is None:
+            from backend.services.redis_client import get_redis_client
+            self._redis_client = get_redis_client()
+        return self._redis_client
+
+    def _now(self) -> datetime:
+        return datetime.fromtimestamp(self._clock(), tz=timezone.utc)
+
+    async def is_available(self) -> bool:
+        """Return True if Redis answers a PING."""
+        try:
+            return bool(await asyncio.to_thread(self._redis().ping))
+        except Exception as e:
+            logger.warning(f"Reminder queue unavailable: {e}")
+            return False
+
+    # -------------------------------------------------------------------------
+    # Scheduling
+    # -------------------------------------------------------------------------
+
+    async def schedule(
+        self,
+        reminder_id: UUID,
+        scheduled_time: datetime,
+        repeat_pattern: Optional[str] = None,
+        title: Optional[str] = None,
+        only_if_absent: bool = False,
+    ) -> Optional[datetime]:
+        """
+        Index a reminder at its next occurrence.
+
+        Args:
+            reminder_id: The reminder UUID
+            scheduled_time: When the reminder is scheduled
+            repeat_pattern: Recurrence pattern (optional)
+            title: Reminder title for listings (optional)
+            only_if_absent: Leave an already-indexed reminder untouched
+
+        Returns:
+            The indexed fire time, or None if nothing was indexed
+        """
+        now = self._now()
+        if scheduled_time.tzinfo is None:
+            scheduled_time = USER_TIMEZONE.localize(scheduled_time)
+        if repeat_pattern is None:
+            # Overdue one-time reminders fire immediately
+            fire_at = scheduled_time
+        else:
+            fire_at = next_fire_time(scheduled_time, repeat_pattern, now - timedelta(seconds=1))
+        if fire_at is None:
+            return None
+
+        spec = json.dumps({
+            "scheduled_time": scheduled_time.isoformat(),
+            "repeat_pattern": repeat_pattern,
+            "title": title,
+            "attempts": 0,
+        })
+        member = str(reminder_id)
+        score = _to_ms(fire_at)
+
+        def _write() -> bool:
+            pipe = self._redis().pipeline()
+            if only_if_absent:
+                pipe.zadd(SCHEDULE_KEY, {member: score}, nx=True)
+                pipe.hsetnx(SPEC_KEY, member, spec)
+            else:
+                pipe.zadd(SCHEDULE_KEY, {member: score})
+                pipe.hset(SPEC_KEY, member, spec)
+            added, _ = pipe.execute()
+            return bool(added) or not only_if_absent
+
+        written = await asyncio.to_thread(_write)
+        if written:
+            logger.info(
+                f"Indexed reminder {member} "
+                f"(pattern={repeat_pattern or 'one-time'}, next_run={fire_at.isoformat()})"
+            )
+            return fire_at
+        return None
+
+    async def unschedule(self, reminder_id: UUID) -> None:
+        """Remove a reminder from the index."""
+        member = str(reminder_id)
+
+        def _remove() -> None:
+            pipe = self._redis().pipeline()
+            pipe.zrem(SCHEDULE_KEY, member)
+            pipe.hdel(SPEC_KEY, member)
+            pipe.execute()
+
+        await asyncio.to_thread(_remove)
+        logger.info(f"Removed reminder {member} from index")
+
+    # -------------------------------------------------------------------------
+    # Claim / finalize
+    # -------------------------------------------------------------------------
+
+    async def claim_due(self) -> Tuple[List[str], int]:
+        """
+        Atomically claim due reminders.
+
+        Returns:
+            (reminder_ids, claimed_score_ms)
+        """
+        now_ms = int(self._clock() * 1000)
+        lease_until = now_ms + self.lease_seconds * 1000
+        ids = await asyncio.to_thread(
+            self._redis().eval,
+            _CLAIM_SCRIPT, 1, SCHEDULE_KEY, now_ms, self.batch_size, lease_until,
+        )
+        return list(ids or []), lease_until
+
+    async def _load_specs(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not ids:
+            return {}
+        raw = await asyncio.to_thread(self._redis().hmget, SPEC_KEY, ids)
+        specs: Dict[str, Dict[str, Any]] = {}
+        for member, value in zip(ids, raw):
+            if value:
+                try:
+                    specs[member] = json.loads(value)
+                except (TypeError, ValueError):
+                    logger.warning(f"Corrupt reminder spec for {member}; dropping")
+        return specs
+
+    async def _finalize(
+        self,
+        member: str,
+        claimed_ms: int,
+        next_at: Optional[datetime],
+        spec: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        next_score = "" if next_at is None else str(_to_ms(next_at))
+        spec_json = "" if spec is None else json.dumps(spec)
+        applied = await asyncio.to_thread(
+            self._redis().eval,
+            _FINALIZE_SCRIPT, 2, SCHEDULE_KEY, SPEC_KEY,
+            member, claimed_ms, next_score, spec_json,
+        )
+        return bool(applied)
+
+    async def dispatch_due(
+        self,
+        fire_many: FireManyCallable,
+        give_up: Optional[GiveUpCallable] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Claim due reminders, deliver them, and reschedule or retire each.
+
+        Args:
+            fire_many: Delivers a list of reminder IDs concurrently and
+                returns one ``fire_reminder`` result per ID, in order
+            give_up: Persists the terminal failure of a one-time reminder
+                that ran out of attempts; while it returns False the
+                reminder stays indexed and is retried after the claim
+                lease.  Without it the reminder is just dropped.
+
+        Returns:
+            The delivery results
+        """
+        ids, claimed_ms = await self.claim_due()
+        if not ids:
+            return []
+
+        logger.info(f"Claimed {len(ids)} due reminders")
+        specs = await self._load_specs(ids)
+        results = await fire_many([UUID(member) for member in ids])
+        now = self._now()
+
+        for member, result in zip(ids, results):
+            spec = specs.get(member)
+            status = result.get("status")
+            action = result.get("action")
+
+            if spec is None or status == "skipped" or action == "completed":
+                # Inactive, cancelled, or one-time and done
+                await self._finalize(member, claimed_ms, None)
+                continue
+
+            if status in ("success", "partial"):
+                next_at = None
+                if spec.get("repeat_pattern"):
+                    next_at = next_fire_time(
+                        _parse_time(spec["scheduled_time"]),
+                        spec["repeat_pattern"],
+                        now,
+                    )
+                await self._finalize(member, claimed_ms, next_at, {**spec, "attempts": 0})
+                continue
+
+            attempts = int(spec.get("attempts", 0)) + 1
+            if attempts < self.max_attempts:
+                # Leave the claim lease in place as the retry delay
+                await self._finalize(
+                    member, claimed_ms, _from_ms(claimed_ms), {**spec, "attempts": attempts},
+                )
+                continue
+
+            error = result.get("error")
+            if spec.get("repeat_pattern"):
+                next_at = next_fire_time(
+                    _parse_time(spec["scheduled_time"]), spec["repeat_pattern"], now,
+                )
+                logger.error(
+                    f"Reminder {member} failed {attempts} times; skipping to next "
+                    f"occurrence: {error}"
+                )
+                await self._finalize(member, claimed_ms, next_at, {**spec, "attempts": 0})
+                continue
+
+            logger.error(f"Reminder {member} failed {attempts} times; giving up: {error}")
+            persisted = True
+            if give_up is not None:
+                try:
+                    persisted = await give_up(UUID(member), error)
+                except Exception as e:
+                    logger.error(f"Failed to record give-up for reminder {member}: {e}")
+                    persisted = False
+            if persisted:
+                await self._finalize(member, claimed_ms, None)
+            else:
+                await self._finalize(
+                    member, claimed_ms, _from_ms(claimed_ms), {**spec, "attempts": attempts},
+                )
+
+        return results
+
+    # -------------------------------------------------------------------------
+    # Inspection
+    # -------------------------------------------------------------------------
+
+    async def seconds_until_next(self) -> Optional[float]:
+        """Seconds until the earliest indexed fire time (None if empty)."""
+        head = await asyncio.to_thread(
+            self._redis().zrange, SCHEDULE_KEY, 0, 0, withscores=True,
+        )
+        if not head:
+            return None
+        _, score = head[0]
+        return max(0.0, score / 1000.0 - self._clock())
+
+    def upcoming(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        List the next indexed reminders, earliest first.
+
+        Returns:
+            Dicts shaped like ``ReminderScheduler.get_reminder_jobs`` entries
+        """
+        redis = self._redis()
+        head = redis.zrange(SCHEDULE_KEY, 0, limit - 1, withscores=True)
+        if not head:
+            return []
+        raw_specs = redis.hmget(SPEC_KEY, [member for member, _ in head])
+        jobs = []
+        for (member, score), raw in zip(head, raw_specs):
+            spec = json.loads(raw) if raw else {}
+            title = spec.get("title")
+            jobs.append({
+                "job_id": f"reminder_{member}",
+                "reminder_id": member,
+                "name": f"Reminder: {title}" if title else f"Reminder {member}",
+                "next_run": _from_ms(score).isoformat(),
+                "trigger": spec.get("repeat_pattern") or "one-time",
+            })
+        return jobs
+
+    # -------------------------------------------------------------------------
+    # Bootstrap
+    # -------------------------------------------------------------------------
+
+    async def bootstrap(self, client: Any) -> Dict[str, Any]:
+        """
+        Index active reminders from Postgres, once per Redis dataset.
+
+        Skipped when the index marker exists, so a restart costs one GET.
+        The table is walked in id-ordered pages of ``BOOTSTRAP_PAGE_SIZE``.
+
+        Args:
+            client: Supabase client
+
+        Returns:
+            Dict with ``indexed``, ``skipped`` and ``bootstrapped`` counts
+        """
+        result = {"bootstrapped": False, "indexed": 0, "skipped": 0}
+
+        claimed = await asyncio.to_thread(
+            self._redis().set, INDEXED_KEY, self._now().isoformat(), nx=True,
+        )
+        if not claimed:
+            logger.info("Reminder index already bootstrapped; skipping table scan")
+            return result
+
+        try:
+            last_id: Optional[str] = None
+            while True:
+                def _page(after: Optional[str] = last_id) -> List[Dict[str, Any]]:
+                    query = client.table("reminders").select(
+                        "id,title,scheduled_time,repeat_pattern"
+                    ).eq("is_active", True).eq("is_completed", False)
+                    if after is not None:
+                        query = query.gt("id", after)
+                    return query.order("id").limit(BOOTSTRAP_PAGE_SIZE).execute().data or []
+
+                rows = await asyncio.to_thread(_page)
+                for row in rows:
+                    try:
+                        indexed = await self.schedule(
+                            UUID(row["id"]),
+                            _parse_time(row["scheduled_time"]),
+                            row.get("repeat_pattern"),
+                            row.get("title"),
+                            only_if_absent=True,
+                        )
+                    except (KeyError, TypeError, ValueError) as e:
+                        logger.error(f"Cannot index reminder {row.get('id')}: {e}")
+                        indexed = None
+                    result["indexed" if indexed else "skipped"] += 1
+
+                if len(rows) < BOOTSTRAP_PAGE_SIZE:
+                    break
+                last_id = rows[-1]["id"]
+        except Exception:
+            # Let the next start retry the bootstrap
+            await asyncio.to_thread(self._redis().delete, INDEXED_KEY)
+            raise
+
+        result["bootstrapped"] = True
+        logger.info(
+            f"Reminder index bootstrapped: {result['indexed']} indexed, "
+            f"{result['skipped']} skipped"
+        )
+        return result
+
+
+# =============================================================================
+# Module-level singleton
+# =============================================================================
+
+_reminder_queue: Optional[ReminderQueue] = None
+
+
+def get_reminder_queue() -> ReminderQueue:
+    """Get or create the global reminder queue."""
+    global _reminder_queue
+    if _reminder_queue is None:
+        _reminder_queue = ReminderQueue()
+    return _reminder_queue
@@ -9,6 +9,9 @@ Features:
 - Remove jobs when reminders are cancelled
 - Restore jobs from database on server restart
 - Support for one-time (DateTrigger) and recurring (CronTrigger) reminders
+- Redis sorted-set index (``reminder_queue.py``) when Redis is available:
+  reminders are claimed atomically across processes, delivered
+  concurrently, and restarts skip the full table reload
 
 BDD Specification:
     Feature: Scheduler Integration
@@ -67,6 +70,10 @@ REMINDER_JOB_PREFIX = "reminder_"
 # Polling interval for due reminders (fallback mechanism)
 DUE_REMINDER_POLL_MINUTES = int(os.getenv("DUE_REMINDER_POLL_MINUTES", "5"))
 
+# Longest the queue dispatcher sleeps; bounds the delay for reminders
+# indexed by another process ahead of the current head
+REMINDER_QUEUE_MAX_SLEEP_SECONDS = float(os.getenv("REMINDER_QUEUE_MAX_SLEEP_SECONDS", "30"))
+
 
 # =============================================================================
 # Trigger Creation
@@ -180,13 +187,20 @@ class ReminderScheduler:
         await scheduler.restore_reminder_jobs()
     """
 
-    def __init__(self, scheduler: Optional[AsyncIOScheduler] = None):
+    def __init__(
+        self,
+        scheduler: Optional[AsyncIOScheduler] = None,
+        queue: Optional[Any] = None,
+    ):
         """
         Initialize the reminder scheduler.
 
         Args:
             scheduler: Optional existing scheduler to use.
                        If None, creates a new one.
+            queue: Optional ``ReminderQueue``. When set (and Redis is
+                   reachable at start), reminders live in the Redis index
+                   instead of one APScheduler job each.
         """
         if scheduler is None:
             self.scheduler = AsyncIOScheduler(timezone=SCHEDULER_TIMEZONE)
@@ -195,6 +209,9 @@ class ReminderScheduler:
             self.scheduler = scheduler
             self._owns_scheduler = False
 
+        self._queue = queue
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
         self._started = False
         logger.info(f"ReminderScheduler initialized (timezone: {SCHEDULER_TIMEZONE})")
 
@@ -218,20 +235,97 @@ class ReminderScheduler:
 
         self._started = True
 
-        # Restore jobs from database
-        await self.restore_reminder_jobs()
+        if self._queue is not None and await self._queue.is_available():
+            await self._start_queue_dispatcher()
+        else:
+            if self._queue is not None:
+                logger.warning("Redis unavailable - falling back to in-memory reminder jobs")
+                self._queue = None
+            # Restore jobs from database
+            await self.restore_reminder_jobs()
 
         logger.info("ReminderScheduler started")
 
+    async def _start_queue_dispatcher(self):
+        """Bootstrap the Redis index (first run only) and start dispatching."""
+        from backend.services.reminder_service import get_reminder_service
+
+        service = get_reminder_service()
+        if service.client:
+            try:
+                await self._queue.bootstrap(service.client)
+            except Exception as e:
+                logger.error(f"Failed to bootstrap reminder index: {e}", exc_info=True)
+        else:
+            logger.warning("Supabase not configured, cannot bootstrap reminder index")
+
+        self._wakeup = asyncio.Event()
+        self._dispatch_task = asyncio.create_task(self._dispatch_loop())
+        logger.info("Reminder queue dispatcher started")
+
+    async def _dispatch_loop(self):
+        """
+        Deliver due reminders from the Redis index.
+
+        Sleeps until the earliest indexed fire time (capped at
+        REMINDER_QUEUE_MAX_SLEEP_SECONDS), or until a local
+        add_reminder_job() wakes it early.
+        """
+        from lib.agent.reminder_notifications import fire_reminders
+
+        while self._started:
+            self._wakeup.clear()
+            try:
+                await self._queue.dispatch_due(fire_reminders, self._record_give_up)
+                delay = await self._queue.seconds_until_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Reminder dispatch failed: {e}", exc_info=True)
+                delay = None
+
+            timeout = REMINDER_QUEUE_MAX_SLEEP_SECONDS
+            if delay is not None:
+                timeout = min(delay, timeout)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _record_give_up(self, reminder_id: UUID, error: Optional[str]) -> bool:
+        """
+        Deactivate a one-time reminder that exhausted its delivery attempts.
+
+        Without this the row stays active and due, and the poller would
+        re-index it with a fresh attempt count on every pass.
+
+        Returns:
+            True once the failure is persisted
+        """
+        from backend.services.reminder_service import get_reminder_service
+
+        result = await get_reminder_service().mark_reminder_failed(reminder_id, error)
+        if not result.success:
+            logger.error(f"Could not deactivate failed reminder {reminder_id}: {result.error}")
+        return result.success
+
     async def shutdown(self):
         """Stop the scheduler."""
         if not self._started:
             return
 
+        self._started = False
+        if self._dispatch_task is not None:
+            self._dispatch_task.cancel()
+            try:
+                await self._dispatch_task
+            except asyncio.CancelledError:
+                pass
+            self._dispatch_task = None
+
         if self._owns_scheduler:
             self.scheduler.shutdown(wait=True)
 
-        self._started = False
         logger.info("ReminderScheduler stopped")
 
     async def _poll_due_reminders(self):
@@ -239,8 +333,14 @@ class ReminderScheduler:
         Polling job that catches any due reminders.
 
         This is a fallback mechanism in case a scheduled job was missed
-        or the reminder was created while the server was down.
+        or the reminder was created while the server was down.  With the
+        Redis index, due reminders missing from the index are indexed and
+        left to the dispatcher instead of being fired here.
         """
+        if self._queue is not None:
+            await self._index_missing_due_reminders()
+            return
+
         try:
             from lib.agent.reminder_notifications import process_due_reminders
             result = await process_due_reminders()
@@ -249,6 +349,34 @@ class ReminderScheduler:
         except Exception as e:
             logger.error(f"Error polling due reminders: {e}")
 
+    async def _index_missing_due_reminders(self):
+        """Index due reminders that never reached the Redis index."""
+        from backend.services.reminder_service import get_reminder_service
+
+        try:
+            list_result = await get_reminder_service().list_due_reminders(limit=100)
+            if not list_result.success:
+                return
+            indexed = 0
+            for reminder in list_result.data.get("reminders", []):
+                scheduled_time = datetime.fromisoformat(
+                    reminder["scheduled_time"].replace("Z", "+00:00")
+                )
+                if await self._queue.schedule(
+                    UUID(reminder["id"]),
+                    scheduled_time,
+                    reminder.get("repeat_pattern"),
+                    reminder.get("title"),
+                    only_if_absent=True,
+                ):
+                    indexed += 1
+            if indexed:
+                logger.info(f"Polling indexed {indexed} missed reminders")
+                if self._wakeup is not None:
+                    self._wakeup.set()
+        except Exception as e:
+            logger.error(f"Error polling due reminders: {e}")
+
     async def add_reminder_job(
         self,
         reminder_id: UUID,
@@ -271,6 +399,15 @@ class ReminderScheduler:
         job_id = get_job_id(reminder_id)
         job_name = f"Reminder: {title}" if title else f"Reminder {reminder_id}"
 
+        if self._queue is not None:
+            try:
+                await self._queue.schedule(reminder_id, scheduled_time, repeat_pattern, title)
+                if self._wakeup is not None:
+                    self._wakeup.set()
+                return True
+            except Exception as e:
+                logger.warning(f"Reminder index unavailable, using in-memory job: {e}")
+
         try:
             # Remove existing job if any (for updates)
             await self.remove_reminder_job(reminder_id)
@@ -313,6 +450,13 @@ class ReminderScheduler:
         """
         job_id = get_job_id(reminder_id)
 
+        if self._queue is not None:
+            try:
+                await self._queue.unschedule(reminder_id)
+            except Exception as e:
+                logger.error(f"Failed to remove reminder {reminder_id} from index: {e}")
+                return False
+
         try:
             self.scheduler.remove_job(job_id)
             logger.info(f"Removed reminder job: {job_id}")
@@ -448,6 +592,12 @@ class ReminderScheduler:
         Returns:
             List of job info dictionaries
         """
+        if self._queue is not None:
+            try:
+                return self._queue.upcoming()
+            except Exception as e:
+                logger.warning(f"Could not list indexed reminders: {e}")
+
         jobs = []
         for job in self.scheduler.get_jobs():
             if job.id.startswith(REMINDER_JOB_PREFIX):
@@ -477,7 +627,9 @@ def get_reminder_scheduler() -> ReminderScheduler:
     """Get or create the global reminder scheduler instance."""
     global _reminder_scheduler
     if _reminder_scheduler is None:
-        _reminder_scheduler = ReminderScheduler()
+        from lib.agent.reminder_queue import REMINDER_QUEUE_ENABLED, get_reminder_queue
+        queue = get_reminder_queue() if REMINDER_QUEUE_ENABLED else None
+        _reminder_scheduler = ReminderScheduler(queue=queue)
     return _reminder_scheduler
 
 
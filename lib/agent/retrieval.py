@@ -25,13 +25,15 @@ import asyncio
 import logging
 import os
 import re
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
 
-from langchain_openai import OpenAIEmbeddings
 from supabase import Client
 
+from backend.services.metrics import RETRIEVAL_STAGE_SECONDS, track_llm_call
+from backend.services.tracing import start_span, traced
 from lib.db.models import Entity, Memory
 
 logger = logging.getLogger(__name__)
@@ -446,6 +448,14 @@ def blend_context(
 # Main Retrieval Function
 # =============================================================================
 
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    """Time a retrieval stage into the stage histogram and trace it as a span."""
+    with RETRIEVAL_STAGE_SECONDS.time(stage=name), start_span(f"retrieval.{name}"):
+        yield
+
+
+@traced("retrieval.retrieve_context")
 async def retrieve_context(
     user_id: UUID,
     query: str,
@@ -517,7 +527,9 @@ async def retrieve_context(
         # STEP 1: Generate query embedding
         logger.info("Step 1: Generating query embedding...")
         embeddings_client = get_embeddings()
-        query_embedding = await embeddings_client.aembed_query(query)
+        with _stage("embedding"), \
+                track_llm_call("openai", "text-embedding-3-small"):
+            query_embedding = await embeddings_client.aembed_query(query)
 
         if len(query_embedding) != 1536:
             raise ValueError(
@@ -525,23 +537,25 @@ async def retrieve_context(
 
         # STEP 2: Vector search for similar memories
         logger.info("Step 2: Searching similar memories...")
-        memories = await search_similar_memories(
-            query_embedding=query_embedding,
-            user_id=user_id,
-            threshold=memory_threshold,
-            limit=memory_limit,
-            role_filter=role_filter,
-            domain_filter=domain_filter
-        )
+        with _stage("memory_search"):
+            memories = await search_similar_memories(
+                query_embedding=query_embedding,
+                user_id=user_id,
+                threshold=memory_threshold,
+                limit=memory_limit,
+                role_filter=role_filter,
+                domain_filter=domain_filter
+            )
 
         # STEP 3: Extract keywords and search entities
         logger.info("Step 3: Extracting keywords and searching entities...")
-        keywords = extract_keywords(query)
-        entities = await search_entities_by_keywords(
-            keywords=keywords,
-            limit=entity_limit,
-            domain_filter=domain_filter
-        )
+        with _stage("entity_search"):
+            keywords = extract_keywords(query)
+            entities = await search_entities_by_keywords(
+                keywords=keywords,
+                limit=entity_limit,
+                domain_filter=domain_filter
+            )
 
         # STEP 4: (Optional) Fetch graph relationships for found entities
         graph_relationships: Optional[List[Dict[str, Any]]] = None
@@ -549,7 +563,8 @@ async def retrieve_context(
         if include_graph and entities:
             logger.info("Step 4: Fetching graph relationships for %d entities...", len(entities))
             try:
-                graph_relationships = await _fetch_entity_relationships(entities)
+                with _stage("graph"):
+                    graph_relationships = await _fetch_entity_relationships(entities)
                 logger.info(
                     "Found %d graph relationships",
                     len(graph_relationships) if graph_relationships else 0,
@@ -562,17 +577,19 @@ async def retrieve_context(
 
         # STEP 5: Blend into formatted context
         logger.info("Step 5: Blending context...")
-        context = blend_context(
-            memories=memories,
-            entities=entities,
-            query=query,
-            domain_filter=domain_filter,
-            relationships=graph_relationships,
-        )
+        with _stage("blend"):
+            context = blend_context(
+                memories=memories,
+                entities=entities,
+                query=query,
+                domain_filter=domain_filter,
+                relationships=graph_relationships,
+            )
 
         # Calculate timing
         end_time = datetime.utcnow()
         elapsed_ms = int((end_time - start_time).total_seconds() * 1000)
+        RETRIEVAL_STAGE_SECONDS.observe((end_time - start_time).total_seconds(), stage="total")
 
         rels_count = len(graph_relationships) if graph_relationships else 0
         logger.info(
@@ -8,18 +8,23 @@ triggering manual archival operations.
 Endpoints:
 - GET   /api/archive/config  -- Get current archive config for user (or defaults)
 - PUT   /api/archive/config  -- Update archive config for user
-- POST  /api/archive/trigger -- Manually trigger archival (or dry-run)
+- POST  /api/archive/trigger -- Manually trigger archival (or dry-run report)
+- POST  /api/archive/restore -- Restore archived memories matching a predicate
 - GET   /api/archive/stats   -- Archive statistics for user
 
-Config is stored in Redis: ``sabine:archive_config:{user_id}``
+Config is stored in Redis: ``sabine:archive_config:{user_id}``.  A run
+triggered for a user (``/trigger``) applies that user's config to that
+user's memories; the nightly all-users run reads
+``sabine:archive_config:global``.
 
 PRD Reference: MEM-004 (Archive Configuration API)
 """
 
+import asyncio
 import json
 import logging
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
@@ -49,6 +54,22 @@ router = APIRouter(prefix="/api/archive", tags=["archive-config"])
 # Request/Response Models
 # =============================================================================
 
+class RetentionOverride(BaseModel):
+    """Archive criteria for one memory type (unset fields use the defaults)."""
+    threshold: Optional[float] = Field(
+        default=None, ge=0.0, le=1.0,
+        description="Salience score threshold for archival (0 keeps the type forever)",
+    )
+    min_age_days: Optional[int] = Field(
+        default=None, gt=0,
+        description="Minimum age in days before a memory can be archived",
+    )
+    max_access_count: Optional[int] = Field(
+        default=None, ge=0,
+        description="Maximum access count for archival eligibility",
+    )
+
+
 class ArchiveConfigResponse(BaseModel):
     """Response body for archive configuration queries."""
     threshold: float = Field(
@@ -60,6 +81,10 @@ class ArchiveConfigResponse(BaseModel):
     max_access_count: int = Field(
         ..., description="Maximum access count for archival eligibility",
     )
+    by_type: Dict[str, RetentionOverride] = Field(
+        default_factory=dict,
+        description="Per-memory-type overrides, keyed by memory source (e.g. 'sms', 'file')",
+    )
     is_default: bool = Field(
         ..., description="True if these are default settings (no custom override stored)",
     )
@@ -79,6 +104,10 @@ class ArchiveConfigRequest(BaseModel):
         ..., ge=0,
         description="Maximum access count for archival eligibility (>= 0)",
     )
+    by_type: Dict[str, RetentionOverride] = Field(
+        default_factory=dict,
+        description="Per-memory-type overrides, keyed by memory source (e.g. 'sms', 'file')",
+    )
 
 
 class ArchiveTriggerRequest(BaseModel):
@@ -104,6 +133,43 @@ class ArchiveTriggerResponse(BaseModel):
     estimated_count: int = Field(
         ..., description="Number of memories that would be (or were) archived",
     )
+    by_type: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Per-memory-type dry-run report: {type: {count, avg_salience}}",
+    )
+
+
+class ArchiveRestoreRequest(BaseModel):
+    """Predicate selecting archived memories to restore (combined with AND)."""
+    memory_ids: Optional[List[str]] = Field(
+        default=None, description="Original memory ids",
+    )
+    memory_type: Optional[str] = Field(
+        default=None, description="Memory type the memories were archived under",
+    )
+    archived_after: Optional[datetime] = Field(
+        default=None, description="Archived at or after this time",
+    )
+    archived_before: Optional[datetime] = Field(
+        default=None, description="Archived before this time",
+    )
+    dry_run: bool = Field(
+        default=False,
+        description="If true, return what would be restored without restoring",
+    )
+
+
+class ArchiveRestoreResponse(BaseModel):
+    """Response body from a restore operation."""
+    status: str = Field(
+        ..., description="'completed' or 'dry_run'",
+    )
+    restored_count: int = Field(
+        ..., description="Number of memories restored (or that would be)",
+    )
+    by_type: Dict[str, int] = Field(
+        default_factory=dict, description="Restored count per memory type",
+    )
 
 
 class ArchiveStatsResponse(BaseModel):
@@ -160,6 +226,7 @@ async def get_archive_config(
                 threshold=data.get("threshold", _DEFAULT_CONFIG["threshold"]),
                 min_age_days=data.get("min_age_days", _DEFAULT_CONFIG["min_age_days"]),
                 max_access_count=data.get("max_access_count", _DEFAULT_CONFIG["max_access_count"]),
+                by_type=data.get("by_type") or {},
                 is_default=False,
             )
 
@@ -212,6 +279,10 @@ async def update_archive_config(
         "threshold": request.threshold,
         "min_age_days": request.min_age_days,
         "max_access_count": request.max_access_count,
+        "by_type": {
+            memory_type: override.model_dump(exclude_none=True)
+            for memory_type, override in request.by_type.items()
+        },
     }
 
     try:
@@ -244,11 +315,13 @@ async def trigger_archive(
     _: bool = Depends(verify_api_key),
 ) -> ArchiveTriggerResponse:
     """
-    Manually trigger memory archival.
+    Manually trigger archival of a user's memories.
 
+    The run uses the user's stored archive config (see ``PUT /config``).
     If ``dry_run`` is true, returns the count of memories that would be
-    archived without actually archiving them.  Otherwise, enqueues the
-    ``run_archive_job`` for background execution via rq.
+    archived (with a per-type breakdown) without archiving them.
+    Otherwise, enqueues the ``run_archive_job`` for background execution
+    via rq.
 
     Parameters
     ----------
@@ -273,7 +346,8 @@ async def trigger_archive(
     )
 
     # Estimate the number of candidate memories
-    estimated_count = _count_archive_candidates(request.threshold)
+    report = await _dry_run_report(request.threshold, user_id)
+    estimated_count: int = report.get("candidate_count", 0)
 
     if request.dry_run:
         logger.info("Dry-run archive: %d candidates", estimated_count)
@@ -281,11 +355,12 @@ async def trigger_archive(
             status="dry_run",
             job_id=None,
             estimated_count=estimated_count,
+            by_type=report.get("by_type", {}),
         )
 
     # Enqueue the actual archive job via rq
     try:
-        job_id = _enqueue_archive_job(threshold=request.threshold)
+        job_id = _enqueue_archive_job(threshold=request.threshold, user_id=user_id)
 
         if job_id is not None:
             logger.info(
@@ -296,6 +371,7 @@ async def trigger_archive(
                 status="queued",
                 job_id=job_id,
                 estimated_count=estimated_count,
+                by_type=report.get("by_type", {}),
             )
 
         # If enqueue returned None (queue unavailable), log and raise
@@ -315,22 +391,82 @@ async def trigger_archive(
         )
 
 
+@router.post("/restore", response_model=ArchiveRestoreResponse)
+async def restore_archive(
+    request: ArchiveRestoreRequest,
+    user_id: str = Query(..., description="User UUID"),
+    _: bool = Depends(verify_api_key),
+) -> ArchiveRestoreResponse:
+    """
+    Restore a user's archived memories matching a predicate.
+
+    Memories move back from ``archived_memories`` into ``memories`` with
+    their original ids and embeddings (see
+    ``salience_job.restore_archived_memories``).
+
+    Parameters
+    ----------
+    request : ArchiveRestoreRequest
+        Predicate (ids, memory type, archived-at range) and dry_run flag.
+    user_id : str
+        User UUID; only this user's memories are restored.
+
+    Returns
+    -------
+    ArchiveRestoreResponse
+        Status, restored count and per-type breakdown.
+
+    Raises
+    ------
+    HTTPException (500)
+        If the restore fails.
+    """
+    from backend.worker.salience_job import restore_archived_memories
+
+    logger.info(
+        "Archive restore for user %s  type=%s  ids=%d  dry_run=%s",
+        user_id, request.memory_type, len(request.memory_ids or []), request.dry_run,
+    )
+
+    result = await asyncio.to_thread(
+        restore_archived_memories,
+        user_id=user_id,
+        memory_ids=request.memory_ids,
+        memory_type=request.memory_type,
+        archived_after=request.archived_after.isoformat() if request.archived_after else None,
+        archived_before=request.archived_before.isoformat() if request.archived_before else None,
+        dry_run=request.dry_run,
+    )
+
+    if result.get("status") == "failed":
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to restore archived memories: {result.get('error')}",
+        )
+
+    return ArchiveRestoreResponse(
+        status=result["status"],
+        restored_count=result["restored_count"],
+        by_type=result.get("by_type", {}),
+    )
+
+
 @router.get("/stats", response_model=ArchiveStatsResponse)
 async def get_archive_stats(
     user_id: str = Query(..., description="User UUID"),
     _: bool = Depends(verify_api_key),
 ) -> ArchiveStatsResponse:
     """
-    Get archive statistics.
+    Get archive statistics for a user.
 
-    Queries Supabase for total archived memories, the timestamp of the
-    most recently archived memory, and the average salience score of
-    all archived memories.
+    Queries Supabase for the user's total archived memories, the timestamp
+    of their most recent archival, and the average salience score of their
+    archived memories at the time they were archived.
 
     Parameters
     ----------
     user_id : str
-        User UUID (reserved for future per-user filtering).
+        User UUID.
 
     Returns
     -------
@@ -347,17 +483,11 @@ async def get_archive_stats(
     try:
         client = _get_supabase()
 
-        # Query archived memories for aggregate stats
-        response = (
-            client.table("memories")
-            .select("id, salience_score, updated_at")
-            .eq("is_archived", True)
-            .execute()
-        )
-        archived_rows = response.data or []
-
-        total_archived: int = len(archived_rows)
+        # Aggregated in SQL; archived rows live in archived_memories
+        response = client.rpc("archived_memory_stats", {"p_user_id": user_id}).execute()
+        row: Dict[str, Any] = (response.data or [{}])[0]
 
+        total_archived: int = row.get("total_archived") or 0
         if total_archived == 0:
             return ArchiveStatsResponse(
                 total_archived=0,
@@ -365,30 +495,11 @@ async def get_archive_stats(
                 avg_salience_of_archived=None,
             )
 
-        # Calculate average salience of archived memories
-        salience_values = [
-            row.get("salience_score", 0.0)
-            for row in archived_rows
-            if row.get("salience_score") is not None
-        ]
-        avg_salience: Optional[float] = (
-            round(sum(salience_values) / len(salience_values), 4)
-            if salience_values
-            else None
-        )
-
-        # Find the most recent updated_at (proxy for archive timestamp)
-        timestamps = [
-            row.get("updated_at", "")
-            for row in archived_rows
-            if row.get("updated_at")
-        ]
-        last_archive_run: Optional[str] = max(timestamps) if timestamps else None
-
+        avg_salience = row.get("avg_salience")
         return ArchiveStatsResponse(
             total_archived=total_archived,
-            last_archive_run=last_archive_run,
-            avg_salience_of_archived=avg_salience,
+            last_archive_run=row.get("last_archived_at"),
+            avg_salience_of_archived=round(avg_salience, 4) if avg_salience is not None else None,
         )
 
     except Exception as exc:
@@ -415,52 +526,44 @@ def _get_supabase() -> Any:
     return get_supabase_client()
 
 
-def _count_archive_candidates(threshold: float) -> int:
+async def _dry_run_report(threshold: float, user_id: Optional[str] = None) -> Dict[str, Any]:
     """
-    Count how many memories would be archived at the given threshold.
+    Dry-run the archive job to see what it would move.
 
-    Uses the same criteria as ``archive_low_salience_memories()`` in
-    ``backend/worker/salience_job.py``.
+    Runs ``archive_low_salience_memories(dry_run=True)`` in a worker thread,
+    so the estimate uses the same per-type retention policies as the job.
 
     Parameters
     ----------
     threshold : float
         Salience score threshold for archival.
+    user_id : str, optional
+        Restrict the report to one user's memories (and config).
 
     Returns
     -------
-    int
-        Number of archival candidates.
+    dict
+        The dry-run report (``candidate_count``, ``by_type``, ...), or an
+        empty report if the dry run failed.
     """
-    from datetime import timedelta
-
-    from backend.worker.salience_job import (
-        MAX_ARCHIVE_ACCESS_COUNT,
-        MIN_ARCHIVE_AGE_DAYS,
-    )
+    from backend.worker.salience_job import archive_low_salience_memories
 
     try:
-        client = _get_supabase()
-        age_cutoff = datetime.now(timezone.utc) - timedelta(days=MIN_ARCHIVE_AGE_DAYS)
-        age_cutoff_str = age_cutoff.isoformat()
-
-        response = (
-            client.table("memories")
-            .select("id", count="exact")
-            .eq("is_archived", False)
-            .lt("salience_score", threshold)
-            .lte("access_count", MAX_ARCHIVE_ACCESS_COUNT)
-            .lt("created_at", age_cutoff_str)
-            .execute()
+        report = await asyncio.to_thread(
+            archive_low_salience_memories,
+            threshold=threshold, dry_run=True, user_id=user_id,
         )
-        return response.count if response.count is not None else len(response.data or [])
-
     except Exception as exc:
-        logger.error("Failed to count archive candidates: %s", exc, exc_info=True)
-        return 0
+        logger.error("Failed to dry-run archive job: %s", exc, exc_info=True)
+        return {"candidate_count": 0, "by_type": {}}
+
+    if report.get("status") == "failed":
+        logger.error("Archive dry run failed: %s", report.get("error"))
+        return {"candidate_count": 0, "by_type": {}}
+    return report
 
 
-def _enqueue_archive_job(threshold: float) -> Optional[str]:
+def _enqueue_archive_job(threshold: float, user_id: Optional[str] = None) -> Optional[str]:
     """
     Enqueue an archive job via the rq queue.
 
@@ -470,6 +573,8 @@ def _enqueue_archive_job(threshold: float) -> Optional[str]:
     ----------
     threshold : float
         Salience score threshold to pass to the archive job.
+    user_id : str, optional
+        User whose memories (and config) the job archives.
 
     Returns
     -------
@@ -495,6 +600,7 @@ def _enqueue_archive_job(threshold: float) -> Optional[str]:
         job = queue.enqueue(
             "backend.worker.jobs.run_archive_job",
             threshold=threshold,
+            user_id=user_id,
             retry=Retry(max=MAX_RETRIES, interval=RETRY_INTERVALS),
             job_timeout=JOB_TIMEOUT,
             result_ttl=RESULT_TTL,
@@ -41,12 +41,27 @@ class BackfillRequest(BaseModel):
         default=500,
         ge=1,
         le=5000,
-        description="Maximum memories to process in this backfill run",
+        description="Keyset page size for the memories scan",
     )
     dry_run: bool = Field(
         default=False,
         description="If true, log actions without storing relationships",
     )
+    max_memories: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Cap on memories scanned per shard (None = whole shard)",
+    )
+    shard_count: int = Field(
+        default=1,
+        ge=1,
+        le=32,
+        description="Split the memories id space across this many jobs",
+    )
+    full_rescan: bool = Field(
+        default=False,
+        description="Ignore stored high-water marks and rescan from the start",
+    )
 
 
 class BackfillResponse(BaseModel):
@@ -54,11 +69,15 @@ class BackfillResponse(BaseModel):
 
     job_id: Optional[str] = Field(
         default=None,
-        description="rq job ID (None if enqueue failed)",
+        description="rq job ID of the first shard (None if enqueue failed)",
+    )
+    job_ids: List[str] = Field(
+        default_factory=list,
+        description="rq job IDs, one per shard",
     )
     status: str = Field(
         ...,
-        description="Result status: enqueued or failed",
+        description="Result status: enqueued, partial, or failed",
     )
     error: Optional[str] = Field(
         default=None,
@@ -219,9 +238,10 @@ async def trigger_backfill(
     """
     Trigger relationship backfill job.
 
-    Enqueues a background job that scans existing memories with 2+
-    entity_links, extracts relationships via Claude Haiku, and stores
-    them in the entity_relationships table.
+    Enqueues one background job per shard.  Each job walks its slice of
+    the memories table with a keyset cursor, resuming after its stored
+    high-water mark, extracts relationships via Claude Haiku for memories
+    with 2+ entity_links, and stores them in the entity_relationships table.
 
     The job is idempotent (UNIQUE constraint handles dedup on re-runs).
     """
@@ -229,25 +249,40 @@ async def trigger_backfill(
         # Lazy import to avoid circular deps
         from backend.services.queue import _enqueue_job
 
-        result = _enqueue_job(
-            func_path="backend.worker.jobs.run_backfill_job",
-            kwargs={
-                "batch_size": request.batch_size,
-                "dry_run": request.dry_run,
-            },
-            priority="low",
-        )
+        job_ids: List[str] = []
+        for shard_index in range(request.shard_count):
+            result = _enqueue_job(
+                func_path="backend.worker.jobs.run_backfill_job",
+                kwargs={
+                    "batch_size": request.batch_size,
+                    "dry_run": request.dry_run,
+                    "max_memories": request.max_memories,
+                    "shard_index": shard_index,
+                    "shard_count": request.shard_count,
+                    "full_rescan": request.full_rescan,
+                },
+                priority="low",
+            )
+            if result.success and result.job_id:
+                job_ids.append(result.job_id)
 
-        if result.success:
+        if job_ids:
             logger.info(
-                "Backfill job enqueued as %s (batch_size=%d, dry_run=%s)",
-                result.job_id,
+                "Backfill enqueued %d/%d shard jobs (batch_size=%d, dry_run=%s): %s",
+                len(job_ids),
+                request.shard_count,
                 request.batch_size,
                 request.dry_run,
+                job_ids,
             )
+            complete = len(job_ids) == request.shard_count
             return BackfillResponse(
-                job_id=result.job_id,
-                status="enqueued",
+                job_id=job_ids[0],
+                job_ids=job_ids,
+                status="enqueued" if complete else "partial",
+                error=None if complete else (
+                    f"Only {len(job_ids)} of {request.shard_count} shards enqueued"
+                ),
             )
 
         return BackfillResponse(
@@ -5,14 +5,15 @@ Endpoints:
 - POST /memory/ingest - Manually trigger memory ingestion
 - POST /memory/query - Debug endpoint for context retrieval
 - POST /memory/upload - Upload files for knowledge ingestion
+- GET  /memory/upload/{job_id}/progress - File ingestion job progress
 - GET  /memory/upload/supported-types - Get supported file types
 - GET  /memory/archived - List archived memories (paginated)
 - POST /memory/{memory_id}/promote - Re-promote an archived memory
 """
 
+import asyncio
 import logging
 import os
-from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID as UUIDType
 
@@ -23,7 +24,7 @@ from pydantic import BaseModel, Field
 from lib.agent.shared import verify_api_key, MemoryIngestRequest, MemoryQueryRequest
 from lib.agent.memory import ingest_user_message
 from lib.agent.retrieval import retrieve_context
-from lib.agent.parsing import parse_file, is_supported_mime_type, SUPPORTED_MIME_TYPES
+from lib.agent.parsing import is_supported_mime_type, SUPPORTED_MIME_TYPES
 from supabase import create_client
 
 logger = logging.getLogger(__name__)
@@ -169,14 +170,17 @@ async def memory_upload_endpoint(
     """
     Upload a file for knowledge ingestion.
 
-    This endpoint accepts files (PDF, CSV, Excel, Images), parses them to
-    extract text content, saves to Supabase Storage, and ingests the
-    extracted text into the Context Engine as a background task.
+    The upload is streamed to a temp file and ingested by a background job
+    (``lib/agent/ingestion.py``): the file is saved to Supabase Storage,
+    parsed page by page (or sheet/row block by block), split into
+    overlapping chunks, embedded in batches and stored as one memory per
+    chunk under a ``knowledge_files`` parent record.  Poll
+    ``GET /memory/upload/{job_id}/progress`` for progress.
 
     Supported file types:
-    - PDF: Text extraction with pypdf
-    - CSV: Row summaries with pandas
-    - Excel (.xlsx, .xls): Sheet/row summaries with pandas
+    - PDF: Text extraction with pypdf, page by page
+    - CSV: Row blocks with pandas
+    - Excel (.xlsx, .xls): Sheet/row blocks with openpyxl
     - Images (JPEG, PNG, GIF, WebP): Claude vision description
     - Text/JSON: Direct content extraction
 
@@ -189,14 +193,25 @@ async def memory_upload_endpoint(
         {
             "success": bool,
             "message": str,
+            "job_id": str,
+            "progress_url": str,
             "file_name": str,
             "file_size": int,
             "mime_type": str,
-            "storage_path": str (Supabase Storage path),
-            "extracted_text_preview": str (first 500 chars),
-            "ingestion_status": "queued" | "started"
+            "storage_path": str (planned Supabase Storage path),
+            "ingestion_status": "queued"
         }
     """
+    from backend.services.rate_limiter import Priority, run_with_priority
+
+    from lib.agent.ingestion import (
+        MAX_UPLOAD_BYTES,
+        UploadTooLargeError,
+        create_ingestion_job,
+        run_ingestion_job,
+        spool_upload,
+    )
+
     logger.info(f"📤 File upload received: {file.filename}")
     logger.info(f"  MIME type: {file.content_type}")
     logger.info(f"  User ID: {user_id}")
@@ -211,133 +226,38 @@ async def memory_upload_endpoint(
                        f"Supported types: {list(SUPPORTED_MIME_TYPES.keys())}"
             )
 
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
         filename = file.filename or "unknown_file"
 
-        logger.info(f"  File size: {file_size:,} bytes")
+        # Stream to disk; the size limit (50MB) is enforced while streaming
+        try:
+            temp_path, file_size = await spool_upload(file, filename, MAX_UPLOAD_BYTES)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
 
-        # Validate file size (50MB max)
-        max_size = 52428800  # 50MB
-        if file_size > max_size:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large: {file_size:,} bytes. Maximum: {max_size:,} bytes"
-            )
+        logger.info(f"  File size: {file_size:,} bytes")
 
-        # Parse file to extract text
-        logger.info(f"🔄 Parsing file...")
-        extracted_text, parse_metadata = await parse_file(
-            file_content=file_content,
+        job = await asyncio.to_thread(
+            create_ingestion_job,
+            temp_path=temp_path,
+            file_size=file_size,
+            user_id=user_id,
+            filename=filename,
             mime_type=mime_type,
-            filename=filename
+            source=source,
+            role="assistant"  # File uploads default to assistant role
         )
-
-        logger.info(f"✓ Extracted {len(extracted_text):,} characters")
-
-        # Save to Supabase Storage
-        storage_path = None
-        try:
-            supabase_url = os.getenv("SUPABASE_URL")
-            supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-            if supabase_url and supabase_key:
-                supabase = create_client(supabase_url, supabase_key)
-
-                # Generate unique storage path
-                import uuid
-                timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-                unique_id = str(uuid.uuid4())[:8]
-                safe_filename = "".join(c for c in filename if c.isalnum() or c in "._-")
-                storage_path = f"{user_id}/{timestamp}_{unique_id}_{safe_filename}"
-
-                # Upload to storage bucket
-                storage_response = supabase.storage.from_("knowledge_base").upload(
-                    path=storage_path,
-                    file=file_content,
-                    file_options={"content-type": mime_type}
-                )
-
-                logger.info(f"✓ Saved to storage: {storage_path}")
-
-                # Track in knowledge_files table
-                supabase.table("knowledge_files").insert({
-                    "file_name": filename,
-                    "file_path": storage_path,
-                    "file_size": file_size,
-                    "mime_type": mime_type,
-                    "status": "processing",
-                    "extracted_text": extracted_text,
-                    "extracted_at": datetime.utcnow().isoformat(),
-                    "metadata": parse_metadata
-                }).execute()
-
-                logger.info(f"✓ Tracked in knowledge_files table")
-
-        except Exception as storage_error:
-            logger.warning(f"Storage upload failed (continuing with ingestion): {storage_error}")
-            storage_path = None
-
-        # Queue memory ingestion as background task
-        async def ingest_file_content():
-            """Background task to ingest extracted file content."""
-            try:
-                result = await ingest_user_message(
-                    user_id=UUIDType(user_id),
-                    content=f"[File: {filename}]\n\n{extracted_text}",
-                    source=source,
-                    role="assistant"  # File uploads default to assistant role
-                )
-                logger.info(f"✓ File content ingested: {result.get('memory_id')}")
-
-                # Update knowledge_files status if we have storage_path
-                if storage_path:
-                    try:
-                        supabase_url = os.getenv("SUPABASE_URL")
-                        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-                        if supabase_url and supabase_key:
-                            supabase = create_client(supabase_url, supabase_key)
-                            supabase.table("knowledge_files").update({
-                                "status": "completed",
-                                "memory_id": str(result.get("memory_id")) if result.get("memory_id") else None
-                            }).eq("file_path", storage_path).execute()
-                    except Exception as update_error:
-                        logger.warning(f"Failed to update knowledge_files status: {update_error}")
-
-            except Exception as ingest_error:
-                logger.error(f"File ingestion failed: {ingest_error}")
-                # Update status to failed
-                if storage_path:
-                    try:
-                        supabase_url = os.getenv("SUPABASE_URL")
-                        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-                        if supabase_url and supabase_key:
-                            supabase = create_client(supabase_url, supabase_key)
-                            supabase.table("knowledge_files").update({
-                                "status": "failed",
-                                "error_message": str(ingest_error)
-                            }).eq("file_path", storage_path).execute()
-                    except Exception as db_status_err:
-                        logger.error(
-                            "Failed to update knowledge_files status to 'failed': %s",
-                            db_status_err,
-                            exc_info=True,
-                        )
-
-        background_tasks.add_task(ingest_file_content)
-        logger.info("✓ Queued file content for background ingestion")
+        background_tasks.add_task(run_with_priority, Priority.BACKGROUND, run_ingestion_job, job)
+        logger.info(f"✓ Queued file for background ingestion as job {job.job_id}")
 
         return {
             "success": True,
             "message": "File uploaded and queued for ingestion",
+            "job_id": job.job_id,
+            "progress_url": f"/memory/upload/{job.job_id}/progress",
             "file_name": filename,
             "file_size": file_size,
             "mime_type": mime_type,
-            "storage_path": storage_path,
-            "extracted_text_preview": extracted_text[:500] + "..." if len(extracted_text) > 500 else extracted_text,
-            "extracted_text_length": len(extracted_text),
-            "parse_metadata": parse_metadata,
+            "storage_path": job.storage_path,
             "ingestion_status": "queued"
         }
 
@@ -351,6 +271,76 @@ async def memory_upload_endpoint(
         )
 
 
+@router.get("/upload/{job_id}/progress")
+async def memory_upload_progress(
+    job_id: str,
+    _: bool = Depends(verify_api_key),
+) -> Dict[str, Any]:
+    """
+    Progress of a file ingestion job started by ``POST /memory/upload``.
+
+    Answers from the job when it runs in this process, otherwise from its
+    ``knowledge_files`` record.
+
+    Returns:
+        {
+            "success": true,
+            "job_id": str,
+            "status": "queued" | "processing" | "completed" | "failed",
+            "stage": str,
+            "percent": int,
+            "chunks_stored": int,
+            ...
+        }
+    """
+    from lib.agent.ingestion import get_ingestion_job
+
+    job = get_ingestion_job(job_id)
+    if job is not None:
+        return {"success": True, **job.to_dict()}
+
+    try:
+        UUIDType(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Ingestion job {job_id} not found")
+
+    try:
+        supabase = create_client(os.getenv("SUPABASE_URL", ""), os.getenv("SUPABASE_SERVICE_ROLE_KEY", ""))
+        response = (
+            supabase.table("knowledge_files")
+            .select("id, file_name, file_path, file_size, mime_type, status, error_message, "
+                    "chunks_ingested, progress, created_at, updated_at")
+            .eq("id", job_id)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        logger.error(f"Failed to read ingestion progress for {job_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=404, detail=f"Ingestion job {job_id} not found")
+
+    if not response.data:
+        raise HTTPException(status_code=404, detail=f"Ingestion job {job_id} not found")
+
+    row = response.data[0]
+    status = {"pending": "queued"}.get(row["status"], row["status"])
+    return {
+        "success": True,
+        "job_id": job_id,
+        "document_id": job_id,
+        "file_name": row.get("file_name"),
+        "mime_type": row.get("mime_type"),
+        "file_size": row.get("file_size"),
+        "storage_path": row.get("file_path") or None,
+        "status": status,
+        "stage": status,
+        "percent": 100 if status == "completed" else int((row.get("progress") or 0) * 100),
+        "chunks_stored": row.get("chunks_ingested") or 0,
+        "error": row.get("error_message"),
+        "created_at": row.get("created_at"),
+        "finished_at": row.get("updated_at") if status in ("completed", "failed") else None,
+    }
+
+
 @router.get("/upload/supported-types")
 async def get_supported_upload_types():
     """
@@ -401,8 +391,8 @@ async def list_archived_memories(
     """
     List archived memories for a user (paginated).
 
-    Queries memories where ``is_archived = true`` for the given user,
-    ordered by ``created_at DESC``.
+    Queries ``archived_memories`` (cold storage, filled by the archive job)
+    for the given user, most recently archived first.
 
     Parameters
     ----------
@@ -433,27 +423,36 @@ async def list_archived_memories(
 
         client = create_client(supabase_url, supabase_key)
 
-        # Query archived memories from the memories table
-        # (is_archived = true for the given user)
+        # Page and total count in one query
         response = (
-            client.table("memories")
-            .select("id, content, salience_score, access_count, is_archived, created_at, updated_at, metadata")
-            .eq("is_archived", True)
-            .order("created_at", desc=True)
+            client.table("archived_memories")
+            .select(
+                "id, original_memory_id, original_content, salience_at_archival, access_count, "
+                "memory_type, memory_created_at, archived_at, metadata",
+                count="exact",
+            )
+            .eq("user_id", user_id)
+            .order("archived_at", desc=True)
             .range(offset, offset + limit - 1)
             .execute()
         )
 
-        archived_memories: List[Dict[str, Any]] = response.data or []
-
-        # Get total count for pagination
-        count_response = (
-            client.table("memories")
-            .select("id", count="exact")
-            .eq("is_archived", True)
-            .execute()
-        )
-        total_count = count_response.count if hasattr(count_response, "count") and count_response.count is not None else len(archived_memories)
+        archived_memories: List[Dict[str, Any]] = [
+            {
+                "id": row["id"],
+                "original_memory_id": row["original_memory_id"],
+                "content": row.get("original_content", ""),
+                "salience_score": row.get("salience_at_archival", 0.0),
+                "access_count": row.get("access_count") or 0,
+                "is_archived": True,
+                "memory_type": row.get("memory_type"),
+                "created_at": row.get("memory_created_at"),
+                "archived_at": row.get("archived_at"),
+                "metadata": row.get("metadata") or {},
+            }
+            for row in response.data or []
+        ]
+        total_count = response.count if getattr(response, "count", None) is not None else len(archived_memories)
 
         logger.info("Found %d archived memories (total: %d)", len(archived_memories), total_count)
 
@@ -487,13 +486,14 @@ async def promote_archived_memory(
     """
     Re-promote an archived memory back to active status.
 
-    Sets ``is_archived = false`` and boosts ``salience_score`` to 0.6
-    so the memory is immediately relevant in retrieval.
+    Moves the memory from ``archived_memories`` back into ``memories``
+    (original id and embedding) and boosts ``salience_score`` to 0.6 so the
+    memory is immediately relevant in retrieval.
 
     Parameters
     ----------
     memory_id : str
-        UUID of the memory to promote.
+        Original UUID of the memory to promote.
 
     Returns
     -------
@@ -503,47 +503,29 @@ async def promote_archived_memory(
     logger.info("Promoting archived memory: %s", memory_id)
 
     try:
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-        if not supabase_url or not supabase_key:
-            raise HTTPException(
-                status_code=500,
-                detail="Supabase configuration missing",
-            )
-
-        client = create_client(supabase_url, supabase_key)
+        # Lazy import to avoid circular dependency
+        from backend.worker.salience_job import restore_archived_memories
 
-        # Verify the memory exists and is archived
-        check_response = (
-            client.table("memories")
-            .select("id, is_archived, salience_score")
-            .eq("id", memory_id)
-            .limit(1)
-            .execute()
+        result = await asyncio.to_thread(
+            restore_archived_memories,
+            memory_ids=[memory_id],
+            salience=PROMOTE_SALIENCE_BOOST,
         )
 
-        if not check_response.data or len(check_response.data) == 0:
+        if result.get("status") == "failed":
             raise HTTPException(
-                status_code=404,
-                detail=f"Memory not found: {memory_id}",
+                status_code=500,
+                detail=f"Failed to promote memory: {result.get('error')}",
             )
 
-        memory_data = check_response.data[0]
-        if not memory_data.get("is_archived", False):
+        if result.get("restored_count", 0) == 0:
             raise HTTPException(
-                status_code=400,
-                detail=f"Memory {memory_id} is not archived",
+                status_code=404,
+                detail=f"Archived memory not found: {memory_id}",
             )
 
-        # Promote: un-archive and boost salience
-        client.table("memories").update({
-            "is_archived": False,
-            "salience_score": PROMOTE_SALIENCE_BOOST,
-        }).eq("id", memory_id).execute()
-
         logger.info(
-            "Memory %s promoted: is_archived=false, salience_score=%.2f",
+            "Memory %s promoted: restored from archive, salience_score=%.2f",
             memory_id, PROMOTE_SALIENCE_BOOST,
         )
 
@@ -3,19 +3,23 @@ Observability Router - Health, metrics, and monitoring endpoints.
 
 Endpoints:
 - GET / - Root endpoint
-- GET /health - System health check
+- GET /health - Liveness (cheap; never loads tools)
+- GET /ready - Readiness gates (503 while warming up)
+- GET /startup/profile - Startup phase, gate and import timings
+- GET /leader/status - Leader election status
 - GET /tools - List available tools
 - GET /tools/diagnostics - MCP diagnostics
 - And many more observability endpoints
 """
 
+import asyncio
 import logging
 import os
 from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 
 # Import core functions and services
@@ -79,11 +83,20 @@ async def cache_metrics():
     """
     Get prompt caching metrics.
 
-    Returns statistics on cache hit rate, token savings, and latency.
+    Returns statistics on cache hit rate, token savings, and latency,
+    plus the user_config read cache, tool result cache and compiled agent
+    cache counters.
     """
+    from lib.agent.agent_cache import get_agent_cache
+    from lib.agent.tool_cache import get_tool_result_cache
+    from lib.db.user_config import get_user_config_cache_stats
+
     return {
         "success": True,
-        "metrics": get_cache_metrics()
+        "metrics": get_cache_metrics(),
+        "user_config_cache": get_user_config_cache_stats(),
+        "tool_result_cache": get_tool_result_cache().stats(),
+        "compiled_agent_cache": get_agent_cache().stats(),
     }
 
 
@@ -203,25 +216,33 @@ async def wal_failed(limit: int = 10, _: bool = Depends(verify_api_key)):
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
-    Health check endpoint.
+    Liveness check.
 
-    Returns system status, tool count, and database connectivity.
+    Answers as soon as the process serves requests and never loads tools
+    or calls dependencies; ``tools_loaded`` is 0 until the startup warm-up
+    has loaded them.  Use ``/ready`` to decide whether to route traffic.
     """
     try:
-        # Check if tools can be loaded
-        tools = await get_all_tools()
-        tools_count = len(tools)
+        from backend.services.startup import is_ready
+        from lib.agent.registry import loaded_tool_count
 
         # Check database connection
         supabase_url = os.getenv("SUPABASE_URL", "")
         supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
         database_connected = bool(supabase_url and supabase_key)
 
+        # Which instance runs the singleton background services
+        from backend.services.leader_election import get_leadership_status
+        leadership = get_leadership_status()
+
         return HealthResponse(
             status="healthy",
             version="1.0.0",
-            tools_loaded=tools_count,
-            database_connected=database_connected
+            tools_loaded=loaded_tool_count(),
+            database_connected=database_connected,
+            is_leader=leadership.get("is_leader"),
+            instance_id=leadership.get("instance_id"),
+            ready=is_ready(),
         )
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -229,6 +250,68 @@ async def health_check():
             status_code=503, detail=f"Service unhealthy: {str(e)}")
 
 
+@router.get("/ready")
+async def readiness_check():
+    """
+    Readiness check.
+
+    200 once every required startup gate (the tool registry) is ready, 503
+    while warming up or if a required gate failed.  The body lists every
+    gate with its status and duration.
+    """
+    from backend.services.startup import readiness
+    state = readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+
+@router.get("/startup/profile")
+async def startup_profile():
+    """
+    Startup cost report: inline phases, background gates and, when the
+    server runs with ``STARTUP_PROFILE=true``, the slowest imports.
+    """
+    from backend.services.startup import startup_profile as get_startup_profile
+    return {"success": True, **get_startup_profile()}
+
+
+@router.get("/leader/status")
+async def leader_status():
+    """
+    Leader election status.
+
+    Only the leader instance runs the schedulers, email poller and Slack
+    Socket Mode; followers serve requests only.
+    """
+    from backend.services.leader_election import get_leadership_status
+    return {"success": True, **get_leadership_status()}
+
+
+@router.get("/providers/health")
+async def providers_health():
+    """
+    LLM provider circuit breaker states, per-model routing statistics and
+    rate limiter budgets.
+
+    An ``open`` provider is skipped by the model router and by agent
+    failover until its cool-down ends and a half-open probe succeeds.
+    ``models`` holds the decayed p95 latency and success rate the adaptive
+    router compares against each role's SLO.  ``rate_limits`` shows the
+    per-minute budgets and how many calls in this process are queued.
+    ``hedging`` shows each hedged call site's delay, credit and wins.
+    """
+    from backend.services.hedging import hedge_snapshot
+    from backend.services.rate_limiter import get_rate_limiter
+    from lib.agent.adaptive_routing import get_model_stats
+    from lib.agent.circuit_breaker import get_breaker_registry
+    return {
+        "success": True,
+        "providers": get_breaker_registry().snapshot(),
+        "models": get_model_stats().snapshot(),
+        "rate_limits": get_rate_limiter().snapshot(),
+        "hedging": hedge_snapshot(),
+    }
+
+
 @router.get("/tools")
 async def list_tools():
     """
@@ -488,61 +571,20 @@ async def get_prometheus_metrics():
 
     This endpoint can be scraped by Prometheus for monitoring.
     No authentication required for scraping compatibility.
+
+    Served from the in-process metrics registry (aggregated across API and
+    worker processes through Redis).  Database-derived gauges are refreshed
+    by a background thread, so a scrape issues no database queries.
     """
     try:
-        service = get_task_queue_service()
-        health = await service.get_task_queue_health()
-        latest = await service.get_latest_metrics()
-
-        # Build Prometheus text format
-        lines = [
-            "# HELP dream_team_queue_depth Number of tasks in queue by status",
-            "# TYPE dream_team_queue_depth gauge",
-            f'dream_team_queue_depth{{status="queued"}} {health.get("total_queued", 0)}',
-            f'dream_team_queue_depth{{status="in_progress"}} {health.get("total_in_progress", 0)}',
-            "",
-            "# HELP dream_team_blocked_tasks Tasks blocked by failed dependencies",
-            "# TYPE dream_team_blocked_tasks gauge",
-            f"dream_team_blocked_tasks {health.get('blocked_by_failed_deps', 0)}",
-            "",
-            "# HELP dream_team_stuck_tasks Tasks stuck past timeout",
-            "# TYPE dream_team_stuck_tasks gauge",
-            f"dream_team_stuck_tasks {health.get('stuck_tasks', 0)}",
-            "",
-            "# HELP dream_team_stale_tasks Tasks queued too long",
-            "# TYPE dream_team_stale_tasks gauge",
-            f'dream_team_stale_tasks{{threshold="1h"}} {health.get("stale_queued_1h", 0)}',
-            f'dream_team_stale_tasks{{threshold="24h"}} {health.get("stale_queued_24h", 0)}',
-            "",
-            "# HELP dream_team_pending_retries Failed tasks pending retry",
-            "# TYPE dream_team_pending_retries gauge",
-            f"dream_team_pending_retries {health.get('pending_retries', 0)}",
-        ]
-
-        # Add metrics from latest snapshot if available
-        if latest:
-            lines.extend([
-                "",
-                "# HELP dream_team_success_rate_1h Task success rate in last hour",
-                "# TYPE dream_team_success_rate_1h gauge",
-                f"dream_team_success_rate_1h {latest.get('success_rate_1h', 0) or 0}",
-                "",
-                "# HELP dream_team_completed_1h Tasks completed in last hour",
-                "# TYPE dream_team_completed_1h counter",
-                f"dream_team_completed_1h {latest.get('total_completed_1h', 0)}",
-                "",
-                "# HELP dream_team_failed_1h Tasks failed in last hour",
-                "# TYPE dream_team_failed_1h counter",
-                f"dream_team_failed_1h {latest.get('total_failed_1h', 0)}",
-                "",
-                "# HELP dream_team_task_duration_ms Task duration in milliseconds",
-                "# TYPE dream_team_task_duration_ms gauge",
-                f'dream_team_task_duration_ms{{quantile="avg"}} {latest.get("avg_duration_ms", 0) or 0}',
-                f'dream_team_task_duration_ms{{quantile="p95"}} {latest.get("p95_duration_ms", 0) or 0}',
-            ])
+        from backend.services.metrics import render_metrics, start_metrics_refresher
+
+        # No-op once running; covers processes that skipped startup wiring
+        start_metrics_refresher()
+        content = await asyncio.to_thread(render_metrics)
 
         return PlainTextResponse(
-            content="\n".join(lines) + "\n",
+            content=content,
             media_type="text/plain; version=0.0.4; charset=utf-8"
         )
 
@@ -675,6 +717,22 @@ async def get_tool_audit_stats(
         raise HTTPException(status_code=500, detail=f"Failed to fetch stats: {str(e)}")
 
 
+@router.get("/audit/writer")
+async def get_audit_writer_stats(_: bool = Depends(verify_api_key)):
+    """
+    Get buffered audit writer metrics.
+
+    Reports queue depth and capacity, rows flushed, flush failures and
+    backpressure (rows overflowed or spilled to the local file).
+    """
+    from backend.services.audit_logging import get_audit_sink_stats
+
+    return {
+        "success": True,
+        "writer": get_audit_sink_stats(),
+    }
+
+
 # =============================================================================
 # Test Endpoint
 # =============================================================================
@@ -0,0 +1,329 @@
+"""
+Routing Simulation
+==================
+
+Replays recorded LLM latency traces through the adaptive routing policy
+(``adaptive_routing.py``) and the static policy, to tune SLOs, half-life and
+minimum samples offline and to see what adaptive routing would have done
+during a past incident.
+
+A trace is JSONL, one recorded call per line::
+
+    {"t": 12.5, "model": "groq-llama-70b", "latency_s": 1.8, "ok": true,
+     "input_tokens": 2100, "output_tokens": 350}
+
+``t`` is seconds from any origin, ``model`` a ``MODEL_REGISTRY`` key (or
+model id).  ``ok``, ``input_tokens`` and ``output_tokens`` are optional.
+
+Every recorded call is one request arrival.  A request routed to a model is
+answered with that model's recorded call nearest in time (the latest one at
+or before the arrival, else the first after it), and its outcome only
+becomes visible to the policy once the call has completed.
+
+Usage:
+    python -m lib.agent.routing_simulation traces.jsonl --role backend-architect-sabine
+    python -m lib.agent.routing_simulation traces.jsonl --slo-p95 8 --half-life 120 --json
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import math
+import sys
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .adaptive_routing import (
+    ADAPTIVE_ROUTING_HALF_LIFE_SECONDS,
+    ADAPTIVE_ROUTING_MIN_SAMPLES,
+    DEFAULT_INPUT_TOKENS,
+    DEFAULT_OUTPUT_TOKENS,
+    AdaptiveRoutingPolicy,
+    ModelStatsRegistry,
+    expected_cost,
+)
+from .llm_config import MODEL_REGISTRY, ModelTier, RoutingSLO, TierRoutingConfig, get_model_config
+
+
+# =============================================================================
+# Traces
+# =============================================================================
+
+@dataclass
+class TraceRecord:
+    """One recorded LLM call."""
+    t: float
+    model: str
+    latency_s: float
+    ok: bool = True
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
+def _resolve_model_key(model: str) -> str:
+    if model in MODEL_REGISTRY:
+        return model
+    for key, config in MODEL_REGISTRY.items():
+        if config.model_id == model:
+            return key
+    raise ValueError(f"Unknown model in trace: {model}")
+
+
+def load_trace(path: str) -> List[TraceRecord]:
+    """
+    Load a JSONL trace, sorted by time.
+
+    Raises:
+        ValueError: On a malformed line or a model not in the registry
+    """
+    records = []
+    with open(path, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw = json.loads(line)
+                records.append(TraceRecord(
+                    t=float(raw["t"]),
+                    model=_resolve_model_key(raw["model"]),
+                    latency_s=float(raw["latency_s"]),
+                    ok=bool(raw.get("ok", True)),
+                    input_tokens=raw.get("input_tokens"),
+                    output_tokens=raw.get("output_tokens"),
+                ))
+            except (KeyError, TypeError, ValueError, json.JSONDecodeError) as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from e
+    records.sort(key=lambda record: record.t)
+    return records
+
+
+class TraceReplay:
+    """Per-model, time-indexed view of a trace."""
+
+    def __init__(self, records: Sequence[TraceRecord]):
+        self._by_model: Dict[str, List[TraceRecord]] = defaultdict(list)
+        for record in sorted(records, key=lambda r: r.t):
+            self._by_model[_resolve_model_key(record.model)].append(record)
+        self._times = {model: [r.t for r in rows] for model, rows in self._by_model.items()}
+
+    @property
+    def models(self) -> List[str]:
+        return sorted(self._by_model)
+
+    def outcome(self, model: str, t: float) -> TraceRecord:
+        """The recorded call of ``model`` nearest to ``t`` (latest at or before, else first after)."""
+        rows = self._by_model[model]
+        index = bisect.bisect_right(self._times[model], t) - 1
+        return rows[max(index, 0)]
+
+
+# =============================================================================
+# Simulation
+# =============================================================================
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of replaying a trace through one policy."""
+    policy: str
+    requests: int
+    p95_latency_s: float
+    mean_latency_s: float
+    failures: int
+    slo_violations: int
+    cost_usd: float
+    model_mix: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def slo_violation_rate(self) -> float:
+        return self.slo_violations / self.requests if self.requests else 0.0
+
+
+def _p95(values: List[float]) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def static_model_for(role: Optional[str], config: Optional[TierRoutingConfig] = None) -> str:
+    """Model key the static policy picks for a role with every provider up."""
+    from .model_router import ModelRouter
+
+    router = ModelRouter(config)
+    tier = router._determine_tier_for_role(role)
+    return {
+        ModelTier.LOCAL: router.config.default_local,
+        ModelTier.API: router.config.default_api,
+        ModelTier.PREMIUM: router.config.default_premium,
+    }[tier]
+
+
+def simulate(
+    records: Sequence[TraceRecord],
+    policy: str = "adaptive",
+    role: Optional[str] = None,
+    slo: Optional[RoutingSLO] = None,
+    half_life_seconds: float = ADAPTIVE_ROUTING_HALF_LIFE_SECONDS,
+    min_samples: float = ADAPTIVE_ROUTING_MIN_SAMPLES,
+    static_model: Optional[str] = None,
+) -> SimulationResult:
+    """
+    Replay a trace through one routing policy.
+
+    Args:
+        records: Recorded calls; each is one request arrival
+        policy: ``"adaptive"`` or ``"static"``
+        role: Role whose tier and SLO apply
+        slo: Override the role's SLO
+        half_life_seconds: Decay half-life of the adaptive statistics
+        min_samples: Effective samples before a model's statistics are trusted
+        static_model: Override the static policy's model key
+
+    Returns:
+        SimulationResult with latency, SLO violations, cost and model mix
+
+    Raises:
+        ValueError: If ``policy`` is unknown or the static model is not in the trace
+    """
+    from .model_router import RoutingDecision
+
+    if policy not in ("adaptive", "static"):
+        raise ValueError(f"Unknown policy: {policy}")
+
+    config = TierRoutingConfig()
+    if slo is not None:
+        config.role_slo_map[role or "consumer"] = slo
+    slo = config.slo_for(role)
+
+    replay = TraceReplay(records)
+    static_key = static_model or static_model_for(role, config)
+    if static_key not in replay.models:
+        raise ValueError(f"Static model {static_key} has no calls in the trace")
+    static_config = get_model_config(static_key)
+    static_decision = RoutingDecision(
+        model_config=static_config,
+        tier=static_config.tier,
+        reason="static",
+        fallback_chain=[static_key],
+    )
+
+    clock = _Clock()
+    stats = ModelStatsRegistry(half_life_seconds=half_life_seconds, clock=clock)
+    adaptive = AdaptiveRoutingPolicy(stats=stats, config=config, min_samples=min_samples)
+
+    # (completion time, sequence, model id, outcome)
+    pending: List[Tuple[float, int, str, TraceRecord]] = []
+    latencies: List[float] = []
+    failures = violations = 0
+    cost = 0.0
+    mix: Counter = Counter()
+
+    for sequence, arrival in enumerate(sorted(records, key=lambda r: r.t)):
+        while pending and pending[0][0] <= arrival.t:
+            done_at, _, model_id, outcome = heapq.heappop(pending)
+            clock.now = done_at
+            stats.record(model_id, outcome.latency_s, outcome.ok, outcome.input_tokens, outcome.output_tokens)
+        clock.now = arrival.t
+
+        if policy == "adaptive":
+            decision = adaptive.select(static_decision, role=role, models=replay.models)
+        else:
+            decision = static_decision
+        key = _resolve_model_key(decision.model_config.model_id)
+        outcome = replay.outcome(key, arrival.t)
+        heapq.heappush(pending, (arrival.t + outcome.latency_s, sequence, decision.model_config.model_id, outcome))
+
+        mix[key] += 1
+        latencies.append(outcome.latency_s)
+        failures += not outcome.ok
+        violations += (not outcome.ok) or outcome.latency_s > slo.p95_seconds
+        cost += expected_cost(
+            decision.model_config,
+            outcome.input_tokens if outcome.input_tokens is not None else DEFAULT_INPUT_TOKENS,
+            outcome.output_tokens if outcome.output_tokens is not None else DEFAULT_OUTPUT_TOKENS,
+        )
+
+    return SimulationResult(
+        policy=policy,
+        requests=len(latencies),
+        p95_latency_s=round(_p95(latencies), 3),
+        mean_latency_s=round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        failures=failures,
+        slo_violations=violations,
+        cost_usd=round(cost, 6),
+        model_mix=dict(mix),
+    )
+
+
+def compare(records: Sequence[TraceRecord], **kwargs) -> Dict[str, SimulationResult]:
+    """Replay a trace through both the static and the adaptive policy."""
+    return {policy: simulate(records, policy=policy, **kwargs) for policy in ("static", "adaptive")}
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded LLM latency traces through the static and adaptive routing policies",
+    )
+    parser.add_argument("trace", help="JSONL trace of recorded calls")
+    parser.add_argument("--role", default=None, help="Role ID (default: consumer)")
+    parser.add_argument("--slo-p95", type=float, default=None, help="Override the role's p95 target (seconds)")
+    parser.add_argument("--slo-success", type=float, default=None, help="Override the role's minimum success rate")
+    parser.add_argument("--half-life", type=float, default=ADAPTIVE_ROUTING_HALF_LIFE_SECONDS)
+    parser.add_argument("--min-samples", type=float, default=ADAPTIVE_ROUTING_MIN_SAMPLES)
+    parser.add_argument("--static-model", default=None, help="Model key of the static policy")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    slo = None
+    if args.slo_p95 is not None or args.slo_success is not None:
+        base = TierRoutingConfig().slo_for(args.role)
+        slo = RoutingSLO(
+            p95_seconds=args.slo_p95 if args.slo_p95 is not None else base.p95_seconds,
+            min_success_rate=args.slo_success if args.slo_success is not None else base.min_success_rate,
+        )
+
+    try:
+        results = compare(
+            load_trace(args.trace),
+            role=args.role,
+            slo=slo,
+            half_life_seconds=args.half_life,
+            min_samples=args.min_samples,
+            static_model=args.static_model,
+        )
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps({name: asdict(result) for name, result in results.items()}, indent=2))
+        return 0
+
+    print(f"{'policy':<10} {'requests':>8} {'p95 s':>8} {'mean s':>8} {'fail':>6} {'SLO miss':>9} {'cost $':>10}  models")
+    for result in results.values():
+        mix = ", ".join(f"{model}={count}" for model, count in sorted(result.model_mix.items()))
+        print(
+            f"{result.policy:<10} {result.requests:>8} {result.p95_latency_s:>8.2f} "
+            f"{result.mean_latency_s:>8.2f} {result.failures:>6} "
+            f"{result.slo_violation_rate:>8.1%} {result.cost_usd:>10.4f}  {mix}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
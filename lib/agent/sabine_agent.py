@@ -15,9 +15,12 @@ from uuid import UUID
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
+from backend.services.tracing import start_span, traced
+
 logger = logging.getLogger(__name__)
 
 
+@traced("agent.run_sabine")
 async def run_sabine_agent(
     user_id: str,
     session_id: str,
@@ -76,6 +79,7 @@ async def run_sabine_agent(
             classify_agent_error,
         )
         from .retrieval import retrieve_context
+        from .tool_cache import track_cache_hits
         
         logger.info(f"Running Sabine agent for user {user_id}, session {session_id}")
         
@@ -93,13 +97,13 @@ async def run_sabine_agent(
         tools = wrap_tools_with_voi_gate(tools, user_id=user_id)
         
         # === STEP 2: Load deep context ===
-        deep_context = await load_deep_context(user_id)
+        with start_span("agent.load_deep_context"):
+            deep_context = await load_deep_context(user_id)
         logger.info(f"Loaded deep context for user {user_id}")
         
         # === STEP 3: Build system prompt ===
         static_prompt = build_static_context(deep_context, role=None)
         dynamic_prompt = build_dynamic_context(deep_context)
-        full_system_prompt = static_prompt + dynamic_prompt
         
         # === STEP 3b: Determine domain context ===
         domain_filter = None
@@ -154,20 +158,34 @@ async def run_sabine_agent(
         # === STEP 5: Create the agent ===
         agent, metadata = await create_react_agent_with_tools(
             tools=tools,
-            system_prompt=full_system_prompt,
+            system_prompt=static_prompt,
             user_id=user_id,
             session_id=session_id,
             role=None,  # Sabine has no role
             use_hybrid_routing=True,
             task_payload=None,
+            dynamic_prompt=dynamic_prompt,
         )
         
         # === STEP 6: Build message history ===
         messages: List[BaseMessage] = []
         
-        # Add conversation history if provided
+        # Add conversation history if provided: older turns are folded into a
+        # cached rolling summary so the prompt stays within the token budget
         if conversation_history:
-            for msg in conversation_history:
+            from lib.agent.history_compaction import compact_history
+
+            with start_span("agent.compact_history") as span:
+                compacted = await compact_history(session_id, conversation_history)
+                span.set_attributes({
+                    "history.total_turns": compacted.total_turns,
+                    "history.folded_turns": compacted.folded_turns,
+                    "history.original_tokens": compacted.original_tokens,
+                    "history.estimated_tokens": compacted.estimated_tokens,
+                })
+            if compacted.summary:
+                messages.append(HumanMessage(content=compacted.summary_message()))
+            for msg in compacted.messages:
                 if msg["role"] == "user":
                     messages.append(HumanMessage(content=msg["content"]))
                 elif msg["role"] == "assistant":
@@ -178,7 +196,9 @@ async def run_sabine_agent(
         
         # === STEP 7: Run the agent ===
         logger.info(f"Running Sabine agent with {len(messages)} messages")
-        result = await agent.ainvoke({"messages": messages})
+        with start_span("agent.invoke", attributes={"agent.message_count": len(messages)}), \
+                track_cache_hits() as cache_hits:
+            result = await agent.ainvoke({"messages": messages})
         
         duration_ms = (time.time() - start_time) * 1000
         
@@ -187,7 +207,7 @@ async def run_sabine_agent(
         logger.info(f"Agent returned {len(agent_messages)} messages")
         
         # Use shared helper to extract tool execution details
-        tool_details = extract_tool_execution_details(agent_messages)
+        tool_details = extract_tool_execution_details(agent_messages, cache_hits=cache_hits)
         tool_executions = tool_details["tool_executions"]
         tool_calls_detected = tool_details["tool_calls_detected"]
         tool_successes = tool_details["tool_successes"]
@@ -33,7 +33,6 @@ from uuid import UUID
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 from supabase import Client
 
@@ -300,11 +299,19 @@ async def synthesize_briefing(context: str, user_name: str = "Ryan") -> str:
         # Use Claude to synthesize into a more concise version
         logger.info(f"Synthesizing long briefing ({len(context)} chars) with Claude...")
 
+        from langchain_anthropic import ChatAnthropic
+
+        from backend.services.rate_limiter import Priority, ProviderRateLimiter, llm_priority
+
+        from .metrics_callbacks import CircuitBreakerCallbackHandler
+
         llm = ChatAnthropic(
             model=SYNTHESIS_MODEL,
             temperature=0.7,
             anthropic_api_key=ANTHROPIC_API_KEY,
-            max_tokens=600
+            max_tokens=600,
+            rate_limiter=ProviderRateLimiter("anthropic", SYNTHESIS_MODEL),
+            callbacks=[CircuitBreakerCallbackHandler("anthropic", model=SYNTHESIS_MODEL)],
         )
 
         system_prompt = f"""You are Sabine, an Executive Assistant AI. Condense this morning briefing for {user_name}.
@@ -338,7 +345,9 @@ CROSS-CONTEXT ALERTS (if any)
             HumanMessage(content=human_prompt)
         ]
 
-        response = await llm.ainvoke(messages)
+        # Scheduled job: yields rate-limit budget to interactive turns
+        with llm_priority(Priority.BACKGROUND):
+            response = await llm.ainvoke(messages)
         briefing = response.content.strip()
 
         logger.info(f"Synthesized briefing ({len(briefing)} chars)")
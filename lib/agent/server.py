@@ -13,8 +13,15 @@ Or with uvicorn:
 
 Note: Railway sets PORT env var automatically. The server respects both
 PORT and API_PORT environment variables for flexibility.
+
+Set STARTUP_PROFILE=true to log import and initialisation costs at startup
+(see backend/services/startup.py).
 """
 
+# Before any heavy import: times imports when STARTUP_PROFILE=true
+from backend.services.startup import install_import_timer
+install_import_timer()
+
 from lib.agent.core import run_agent, run_agent_with_caching, create_agent, get_cache_metrics, reset_cache_metrics
 from lib.agent.registry import get_all_tools, get_mcp_diagnostics, MCP_SERVERS
 from lib.agent.gmail_handler import handle_new_email_notification
@@ -46,6 +53,8 @@ from backend.services.output_sanitization import (
     sanitize_error_message,
     sanitize_for_logging,
 )
+from backend.services.tracing import TraceMiddleware, shutdown_tracing
+from backend.services.startup import start_gate, startup_phase, stop_gates
 import asyncio
 import hmac
 import logging
@@ -123,6 +132,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# One trace per request (continues an incoming traceparent header).
+# Added last so it is outermost and its span covers the whole request.
+app.add_middleware(TraceMiddleware)
+
 
 # =============================================================================
 # Helper Functions
@@ -176,95 +189,73 @@ app.include_router(skills_router)
 # Startup/Shutdown Events
 # =============================================================================
 
-@app.on_event("startup")
-async def startup_event():
-    """Run on application startup."""
-    logger.info("=" * 60)
-    logger.info("Personal Super Agent API Starting...")
-    logger.info("=" * 60)
+async def _start_proactive_scheduler():
+    scheduler = get_scheduler()
+    await scheduler.start()
+    logger.info("✓ Proactive scheduler started")
+    for job in scheduler.get_jobs():
+        logger.info(f"  - {job['name']}: next run at {job['next_run']}")
 
-    # Load environment variables from project root
-    from dotenv import load_dotenv
-    env_path = project_root / ".env"
-    load_dotenv(dotenv_path=env_path, override=True)
-
-    # Preflight checks — validates all required env vars and exits on
-    # critical failures (e.g. missing ANTHROPIC_API_KEY / SUPABASE creds).
-    from lib.agent.preflight import run_preflight_checks, check_redis_reachable
-    run_preflight_checks(fail_on_critical=True)
-    check_redis_reachable()
 
-    # Preload tools
-    try:
-        tools = await get_all_tools()
-        logger.info(f"✓ Loaded {len(tools)} tools")
-        for tool in tools:
-            logger.info(f"  - {tool.name}")
-    except Exception as e:
-        logger.error(f"Failed to load tools: {e}")
+async def _start_reminder_scheduler():
+    from lib.agent.reminder_scheduler import initialize_reminder_scheduler
+    reminder_scheduler = await initialize_reminder_scheduler()
+    logger.info("✓ Reminder scheduler started")
+    reminder_jobs = reminder_scheduler.get_reminder_jobs()
+    if reminder_jobs:
+        logger.info(f"  - Restored {len(reminder_jobs)} reminder jobs from database")
 
-    # Start the proactive scheduler
-    try:
-        scheduler = get_scheduler()
-        await scheduler.start()
-        logger.info("✓ Proactive scheduler started")
-        for job in scheduler.get_jobs():
-            logger.info(f"  - {job['name']}: next run at {job['next_run']}")
-    except Exception as e:
-        logger.error(f"Failed to start scheduler: {e}")
 
-    # Start the reminder scheduler (for scheduled SMS/email reminders)
-    try:
-        from lib.agent.reminder_scheduler import initialize_reminder_scheduler
-        reminder_scheduler = await initialize_reminder_scheduler()
-        logger.info("✓ Reminder scheduler started")
-        reminder_jobs = reminder_scheduler.get_reminder_jobs()
-        if reminder_jobs:
-            logger.info(f"  - Restored {len(reminder_jobs)} reminder jobs from database")
-    except Exception as e:
-        logger.error(f"Failed to start reminder scheduler: {e}")
+async def _start_email_poller():
+    from lib.agent.email_poller import initialize_email_poller
+    email_poller = await initialize_email_poller()
+    logger.info("✓ Email poller started")
+    status = email_poller.get_status()
+    logger.info(f"  - Polling every {status['interval_minutes']} minutes")
 
-    # Start the email poller (fallback for Gmail push notification delays)
-    try:
-        from lib.agent.email_poller import initialize_email_poller
-        email_poller = await initialize_email_poller()
-        logger.info("✓ Email poller started")
-        status = email_poller.get_status()
-        logger.info(f"  - Polling every {status['interval_minutes']} minutes")
-    except Exception as e:
-        logger.error(f"Failed to start email poller: {e}")
 
-    # Start Slack Socket Mode (The Gantry)
-    try:
-        from lib.agent.slack_manager import start_socket_mode
+async def _start_slack_socket_mode():
+    from lib.agent.slack_manager import start_socket_mode
 
-        slack_bot_token = os.getenv("SLACK_BOT_TOKEN")
-        slack_app_token = os.getenv("SLACK_APP_TOKEN")
+    slack_bot_token = os.getenv("SLACK_BOT_TOKEN")
+    slack_app_token = os.getenv("SLACK_APP_TOKEN")
 
-        if slack_bot_token and slack_app_token:
-            success = await start_socket_mode()
-            if success:
-                logger.info("✓ The Gantry (Slack Socket Mode) connected")
-            else:
-                logger.warning("Failed to start Slack Socket Mode")
+    if slack_bot_token and slack_app_token:
+        success = await start_socket_mode()
+        if success:
+            logger.info("✓ The Gantry (Slack Socket Mode) connected")
         else:
-            logger.info("Slack tokens not configured - Gantry disabled")
-    except Exception as e:
-        logger.error(f"Failed to start Slack Socket Mode: {e}")
+            logger.warning("Failed to start Slack Socket Mode")
+    else:
+        logger.info("Slack tokens not configured - Gantry disabled")
 
-    # Get the port for logging
-    api_port = os.getenv("PORT") or os.getenv("API_PORT", "8001")
-    logger.info("=" * 60)
-    logger.info("API Ready!")
-    logger.info(f"Listening on http://0.0.0.0:{api_port}")
-    logger.info("=" * 60)
 
+async def _start_singleton_services():
+    """
+    Start services that must run on exactly one instance (leader only).
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Run on application shutdown."""
-    logger.info("Personal Super Agent API shutting down...")
+    They are independent, so they start concurrently; one failing to start
+    is logged and does not stop the others.
+    """
+    services = {
+        "proactive scheduler": _start_proactive_scheduler,
+        "reminder scheduler": _start_reminder_scheduler,
+        "email poller": _start_email_poller,
+        "Slack Socket Mode": _start_slack_socket_mode,
+    }
+
+    async def start(name, starter):
+        try:
+            with startup_phase(f"singleton:{name}"):
+                await starter()
+        except Exception as e:
+            logger.error(f"Failed to start {name}: {e}")
 
+    await asyncio.gather(*(start(name, starter) for name, starter in services.items()))
+
+
+async def _stop_singleton_services():
+    """Stop the leader-only services (on demotion or shutdown)."""
     # Stop Slack Socket Mode
     try:
         from lib.agent.slack_manager import stop_socket_mode
@@ -303,6 +294,107 @@ async def shutdown_event():
         logger.error(f"Error stopping email poller: {e}")
 
 
+@app.on_event("startup")
+async def startup_event():
+    """
+    Run on application startup.
+
+    Only the fail-fast steps run here, so the API accepts traffic at once.
+    Tools, Redis and leader election (with the leader-only services) warm
+    up in the background behind readiness gates: ``GET /ready`` turns 200
+    once the tool registry is loaded, while ``GET /health`` reports
+    liveness only.
+    """
+    logger.info("=" * 60)
+    logger.info("Personal Super Agent API Starting...")
+    logger.info("=" * 60)
+
+    # Load environment variables from project root
+    with startup_phase("dotenv"):
+        from dotenv import load_dotenv
+        env_path = project_root / ".env"
+        load_dotenv(dotenv_path=env_path, override=True)
+
+    # Preflight checks — validates all required env vars and exits on
+    # critical failures (e.g. missing ANTHROPIC_API_KEY / SUPABASE creds).
+    with startup_phase("preflight"):
+        from lib.agent.preflight import run_preflight_checks, check_redis_reachable
+        run_preflight_checks(fail_on_critical=True)
+
+    # Metrics: aggregate with the worker through Redis and refresh the
+    # DB-derived gauges in the background (never per scrape)
+    with startup_phase("metrics"):
+        from backend.services.metrics import enable_redis_aggregation, start_metrics_refresher
+        enable_redis_aggregation()
+        start_metrics_refresher()
+
+    # Tools: exec local skill handlers and start MCP servers once, off the
+    # request path; agent turns wait on the same load if they arrive first
+    async def load_tools():
+        tools = await get_all_tools()
+        logger.info(f"✓ Loaded {len(tools)} tools")
+
+    start_gate("tools", load_tools)
+
+    # Best-effort: Redis being down never blocks startup
+    async def check_redis():
+        await asyncio.to_thread(check_redis_reachable)
+
+    start_gate("redis", check_redis, required=False)
+
+    # Singleton background services (schedulers, email poller, Slack) run
+    # on exactly one instance: whichever holds the leader lease.
+    async def elect_leader():
+        from backend.services.leader_election import LeaderElector, set_api_elector
+        elector = LeaderElector(
+            name="api-singletons",
+            on_elected=_start_singleton_services,
+            on_demoted=_stop_singleton_services,
+        )
+        set_api_elector(elector)
+        await elector.start()
+        if not elector.is_leader:
+            logger.info("Follower instance - singleton services run on the leader")
+
+    start_gate("leader_election", elect_leader, required=False)
+
+    # Get the port for logging
+    api_port = os.getenv("PORT") or os.getenv("API_PORT", "8001")
+    logger.info("=" * 60)
+    logger.info("API accepting traffic (warming up - see /ready)")
+    logger.info(f"Listening on http://0.0.0.0:{api_port}")
+    logger.info("=" * 60)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Run on application shutdown."""
+    logger.info("Personal Super Agent API shutting down...")
+
+    # Subsystems still warming up are abandoned
+    await stop_gates()
+
+    # Stopping the elector runs _stop_singleton_services (if this instance
+    # is leader) and releases the lease so a peer can take over at once.
+    from backend.services.leader_election import get_api_elector
+    elector = get_api_elector()
+    if elector is not None:
+        try:
+            await elector.stop()
+        except Exception as e:
+            logger.error(f"Error stopping leader elector: {e}")
+
+    from backend.services.metrics import flush_metrics, stop_metrics_refresher
+    stop_metrics_refresher()
+    await asyncio.to_thread(flush_metrics)
+
+    # Drain buffered tool audit rows before the process exits
+    from backend.services.audit_logging import close_audit_sink
+    await asyncio.to_thread(close_audit_sink)
+
+    shutdown_tracing()
+
+
 # =============================================================================
 # Main Entry Point
 # =============================================================================
@@ -118,6 +118,9 @@ class HealthResponse(BaseModel):
     version: str
     tools_loaded: int
     database_connected: bool
+    is_leader: Optional[bool] = None
+    instance_id: Optional[str] = None
+    ready: Optional[bool] = None
 
 
 class MemoryIngestRequest(BaseModel):
@@ -107,6 +107,7 @@ async def run_task_agent(
             extract_tool_execution_details,
             classify_agent_error,
         )
+        from .tool_cache import track_cache_hits
         
         logger.info(f"Running task agent for user {user_id}, session {session_id}, role: {role}")
         
@@ -186,7 +187,8 @@ The user has assigned you the following task. Execute it using the tools availab
         
         # === STEP 7: Run the agent ===
         logger.info(f"Running task agent with {len(messages)} messages")
-        result = await agent.ainvoke({"messages": messages})
+        with track_cache_hits() as cache_hits:
+            result = await agent.ainvoke({"messages": messages})
         
         duration_ms = (time.time() - start_time) * 1000
         
@@ -195,7 +197,7 @@ The user has assigned you the following task. Execute it using the tools availab
         logger.info(f"Agent returned {len(agent_messages)} messages")
         
         # Use shared helper to extract tool execution details
-        tool_details = extract_tool_execution_details(agent_messages)
+        tool_details = extract_tool_execution_details(agent_messages, cache_hits=cache_hits)
         tool_executions = tool_details["tool_executions"]
         tool_calls_detected = tool_details["tool_calls_detected"]
         tool_successes = tool_details["tool_successes"]
@@ -0,0 +1,317 @@
+"""
+Tool Result Cache
+=================
+
+Caches the results of idempotent, read-only skills so the agent does not
+re-hit external APIs (Google Calendar, Gmail, GitHub, weather) when it
+repeats a call inside one ReAct loop or a few turns later.
+
+Skills opt in through their ``manifest.json``::
+
+    "cache": {
+        "ttl_seconds": 120,
+        "key_args": ["time_range", "start_date", "end_date"],
+        "tags": ["calendar"],
+        "only_when": {"action": ["list", "get"]}
+    }
+
+- ``key_args``: arguments that identify a result (default: all of them).
+  Missing arguments take the manifest default, so ``{"max_results": 25}``
+  and an omitted ``max_results`` share an entry.
+- ``tags``: invalidation groups (default: the tool name).
+- ``only_when``: cache only calls whose arguments match, for skills that
+  mix reads and writes behind an ``action`` argument.
+
+Write skills declare what they make stale::
+
+    "invalidates": ["calendar"]
+
+A successful call that is not a cacheable read bumps the generation of
+each listed tag.  Generations are part of every cache key, so stale
+entries simply stop being found and age out of the LRU.
+
+Storage is a per-process LRU.  With ``TOOL_CACHE_REDIS_ENABLED=true``
+results and tag generations are also kept in Redis, so API workers share
+hits and see each other's invalidations.
+
+Hits are collected per agent run (:func:`track_cache_hits`) so the audit
+log can record which tool results were served from cache.
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from backend.services.metrics import TOOL_CACHE_ENTRIES, TOOL_CACHE_LOOKUPS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "1024"))
+TOOL_CACHE_REDIS_ENABLED = os.getenv("TOOL_CACHE_REDIS_ENABLED", "false").lower() == "true"
+
+REDIS_VALUE_PREFIX = "sabine:tool_cache:value:"
+REDIS_GENERATION_PREFIX = "sabine:tool_cache:gen:"
+
+
+# =============================================================================
+# Manifest Spec
+# =============================================================================
+
+class ToolCacheSpec(BaseModel):
+    """The ``cache`` block of a skill manifest."""
+    ttl_seconds: float = Field(gt=0)
+    key_args: Optional[List[str]] = None
+    tags: List[str] = Field(default_factory=list)
+    only_when: Dict[str, List[Any]] = Field(default_factory=dict)
+
+    def applies_to(self, args: Mapping[str, Any]) -> bool:
+        """Whether a call with ``args`` is a cacheable read."""
+        return all(args.get(name) in allowed for name, allowed in self.only_when.items())
+
+
+def effective_tags(tool_name: str, spec: ToolCacheSpec) -> List[str]:
+    return spec.tags or [tool_name]
+
+
+def derive_key_args(
+    spec: ToolCacheSpec,
+    args: Mapping[str, Any],
+    defaults: Mapping[str, Any],
+) -> Dict[str, Any]:
+    """
+    The arguments that identify a cached result.
+
+    Args:
+        spec: The skill's cache spec.
+        args: Arguments of this call.
+        defaults: Manifest parameter defaults, filled in for omitted args.
+
+    Returns:
+        ``{name: value}`` for ``spec.key_args`` (or every argument).
+    """
+    merged = {**defaults, **{k: v for k, v in args.items() if v is not None}}
+    if spec.key_args is None:
+        return merged
+    return {name: merged.get(name) for name in spec.key_args}
+
+
+def make_cache_key(
+    tool_name: str,
+    version: str,
+    key_args: Mapping[str, Any],
+    generations: Sequence[int],
+) -> str:
+    """Stable key for a tool call; changes when any tag generation changes."""
+    payload = json.dumps(
+        {"args": key_args, "gen": list(generations), "version": version},
+        sort_keys=True,
+        default=str,
+    )
+    return f"{tool_name}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}"
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+class ToolResultCache:
+    """
+    Bounded LRU of tool results with per-entry expiry, optionally backed
+    by Redis.
+
+    Tag generations live in Redis when it is enabled (so an invalidation
+    in one process reaches all of them) and in a local dict otherwise.
+    Redis failures degrade to the local cache; they never fail a tool call.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = TOOL_CACHE_MAX_ENTRIES,
+        redis_enabled: bool = TOOL_CACHE_REDIS_ENABLED,
+        redis_factory: Optional[Any] = None,
+        clock: Any = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.redis_enabled = redis_enabled
+        self._redis_factory = redis_factory
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def _redis(self) -> Optional[Any]:
+        if not self.redis_enabled:
+            return None
+        try:
+            if self._redis_factory is not None:
+                return self._redis_factory()
+            from backend.services.redis_client import get_redis_client
+            return get_redis_client()
+        except Exception as e:
+            logger.debug("Tool cache Redis unavailable: %s", e)
+            return None
+
+    def generations(self, tags: Sequence[str]) -> List[int]:
+        """Current generation of each tag."""
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = client.mget([REDIS_GENERATION_PREFIX + tag for tag in tags])
+                return [int(value) if value else 0 for value in raw]
+            except Exception as e:
+                logger.debug("Tool cache generation read failed: %s", e)
+        with self._lock:
+            return [self._generations.get(tag, 0) for tag in tags]
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached result, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                TOOL_CACHE_LOOKUPS_TOTAL.inc(result="hit")
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+                TOOL_CACHE_ENTRIES.set(len(self._entries))
+
+        client = self._redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                pipe.get(REDIS_VALUE_PREFIX + key)
+                pipe.ttl(REDIS_VALUE_PREFIX + key)
+                raw, ttl = pipe.execute()
+                if raw is not None and ttl > 0:
+                    value = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+                    self._put_local(key, value, ttl)
+                    with self._lock:
+                        self.redis_hits += 1
+                    TOOL_CACHE_LOOKUPS_TOTAL.inc(result="redis_hit")
+                    return value
+            except Exception as e:
+                logger.debug("Tool cache Redis read failed: %s", e)
+
+        with self._lock:
+            self.misses += 1
+        TOOL_CACHE_LOOKUPS_TOTAL.inc(result="miss")
+        return None
+
+    def put(self, key: str, value: str, ttl_seconds: float) -> None:
+        self._put_local(key, value, ttl_seconds)
+        client = self._redis()
+        if client is not None:
+            try:
+                client.set(REDIS_VALUE_PREFIX + key, value, ex=max(1, int(ttl_seconds)))
+            except Exception as e:
+                logger.debug("Tool cache Redis write failed: %s", e)
+
+    def _put_local(self, key: str, value: str, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            TOOL_CACHE_ENTRIES.set(len(self._entries))
+
+    def invalidate(self, tags: Sequence[str]) -> None:
+        """Make every cached result under ``tags`` unreachable."""
+        with self._lock:
+            self.invalidations += 1
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+        client = self._redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                for tag in tags:
+                    pipe.incr(REDIS_GENERATION_PREFIX + tag)
+                pipe.execute()
+            except Exception as e:
+                # Peers fall back to TTL expiry
+                logger.warning("Could not publish tool cache invalidation for %s: %s", tags, e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+        TOOL_CACHE_ENTRIES.set(0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "redis_enabled": self.redis_enabled,
+            }
+
+
+_cache = ToolResultCache()
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    """Get the process-wide tool result cache."""
+    return _cache
+
+
+# =============================================================================
+# Cache-hit Tracking (for the audit log)
+# =============================================================================
+
+# (tool_name, result) pairs served from cache during the current agent run.
+# Tool calls run as tasks that copy the context, so they all append to the
+# Counter installed by the run.
+_cache_hits: contextvars.ContextVar[Optional[Counter]] = contextvars.ContextVar(
+    "tool_cache_hits", default=None,
+)
+
+
+@contextmanager
+def track_cache_hits() -> Iterator[Counter]:
+    """
+    Collect the cached tool results returned inside the ``with`` block.
+
+    Yields:
+        A Counter of ``(tool_name, result)``; pass it to
+        ``extract_tool_execution_details(..., cache_hits=...)``.
+    """
+    hits: Counter = Counter()
+    token = _cache_hits.set(hits)
+    try:
+        yield hits
+    finally:
+        _cache_hits.reset(token)
+
+
+def record_cache_hit(tool_name: str, result: str) -> None:
+    hits = _cache_hits.get()
+    if hits is not None:
+        hits[(tool_name, result)] += 1
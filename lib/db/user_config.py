@@ -8,19 +8,32 @@ values from the ``user_config`` table.
 Initial use case: phone number for SMS reminder delivery.
 Future: timezone overrides, notification preferences, etc.
 
+Reads go through a per-process TTL cache (missing keys are cached too,
+for a shorter time), because the VoI gate and belief revision read the
+same few keys on every tool call.  Writes update the local cache and
+publish an invalidation on a Redis pub/sub channel so other API workers
+and the rq worker drop their copy.
+
 Usage::
 
     phone = await get_user_config(user_id, "phone_number")
     await set_user_config(user_id, "phone_number", "+15551234567")
 """
 
+import json
 import logging
 import os
-from typing import Optional
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
 from pydantic import BaseModel, Field
 from supabase import Client, create_client
 
+from backend.services.metrics import USER_CONFIG_CACHE_ENTRIES, USER_CONFIG_CACHE_LOOKUPS_TOTAL
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -32,6 +45,12 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
 USER_CONFIG_TABLE = "user_config"
 
+# Cache lifetimes; the pub/sub channel keeps processes coherent within them
+USER_CONFIG_CACHE_TTL_SECONDS = float(os.getenv("USER_CONFIG_CACHE_TTL_SECONDS", "300"))
+USER_CONFIG_NEGATIVE_TTL_SECONDS = float(os.getenv("USER_CONFIG_NEGATIVE_TTL_SECONDS", "60"))
+USER_CONFIG_CACHE_MAX_ENTRIES = int(os.getenv("USER_CONFIG_CACHE_MAX_ENTRIES", "10000"))
+USER_CONFIG_INVALIDATION_CHANNEL = "sabine:user_config:invalidate"
+
 _supabase_client: Optional[Client] = None
 
 
@@ -49,6 +68,192 @@ def _get_supabase() -> Optional[Client]:
     return _supabase_client
 
 
+# =============================================================================
+# Read Cache
+# =============================================================================
+
+# Sentinel stored for keys that do not exist (negative cache)
+_MISSING = object()
+
+
+class UserConfigCache:
+    """
+    Bounded LRU of ``(user_id, key) -> value`` with per-entry expiry.
+
+    Missing keys are stored as a sentinel with the (shorter) negative TTL
+    so repeated lookups of an unset key do not reach the database either.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = USER_CONFIG_CACHE_TTL_SECONDS,
+        negative_ttl_seconds: float = USER_CONFIG_NEGATIVE_TTL_SECONDS,
+        max_entries: int = USER_CONFIG_CACHE_MAX_ENTRIES,
+        clock: Any = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, user_id: str, key: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up a cached value.
+
+        Returns:
+            ``(True, value)`` on a hit (``value`` is None for a cached
+            missing key), ``(False, None)`` on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is not None and entry[1] > self._clock():
+                self._entries.move_to_end((user_id, key))
+                if entry[0] is _MISSING:
+                    self.negative_hits += 1
+                    USER_CONFIG_CACHE_LOOKUPS_TOTAL.inc(result="negative_hit")
+                    return True, None
+                self.hits += 1
+                USER_CONFIG_CACHE_LOOKUPS_TOTAL.inc(result="hit")
+                return True, entry[0]
+            if entry is not None:
+                del self._entries[(user_id, key)]
+                USER_CONFIG_CACHE_ENTRIES.set(len(self._entries))
+            self.misses += 1
+            USER_CONFIG_CACHE_LOOKUPS_TOTAL.inc(result="miss")
+            return False, None
+
+    def put(self, user_id: str, key: str, value: Optional[str]) -> None:
+        """Cache a value; ``None`` records the key as missing."""
+        if value is None:
+            stored, ttl = _MISSING, self.negative_ttl_seconds
+        else:
+            stored, ttl = value, self.ttl_seconds
+        with self._lock:
+            self._entries[(user_id, key)] = (stored, self._clock() + ttl)
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            USER_CONFIG_CACHE_ENTRIES.set(len(self._entries))
+
+    def invalidate(self, user_id: Optional[str] = None, key: Optional[str] = None) -> None:
+        """Drop one key, all keys for a user, or (no arguments) everything."""
+        with self._lock:
+            self.invalidations += 1
+            if user_id is None:
+                self._entries.clear()
+            elif key is not None:
+                self._entries.pop((user_id, key), None)
+            else:
+                for cache_key in [k for k in self._entries if k[0] == user_id]:
+                    del self._entries[cache_key]
+            USER_CONFIG_CACHE_ENTRIES.set(len(self._entries))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "negative_ttl_seconds": self.negative_ttl_seconds,
+            }
+
+
+_cache = UserConfigCache()
+
+# Identifies this process's own invalidation messages
+_INSTANCE_ID = uuid.uuid4().hex
+_listener_thread: Optional[threading.Thread] = None
+_listener_lock = threading.Lock()
+
+
+def get_user_config_cache() -> UserConfigCache:
+    """Get the process-wide user_config cache."""
+    return _cache
+
+
+def get_user_config_cache_stats() -> Dict[str, Any]:
+    """Cache counters for the metrics endpoints."""
+    stats = _cache.stats()
+    stats["invalidation_listener"] = _listener_thread is not None and _listener_thread.is_alive()
+    return stats
+
+
+def _publish_invalidation(user_id: str, key: str) -> None:
+    """Tell other processes to drop their cached copy of a key."""
+    try:
+        from backend.services.redis_client import get_redis_client
+        get_redis_client().publish(
+            USER_CONFIG_INVALIDATION_CHANNEL,
+            json.dumps({"user_id": user_id, "key": key, "origin": _INSTANCE_ID}),
+        )
+    except Exception as e:
+        # Peers fall back to TTL expiry
+        logger.warning("Could not publish user_config invalidation: %s", e)
+
+
+def _handle_invalidation(message: Dict[str, Any]) -> None:
+    """Apply an invalidation message received from the channel."""
+    try:
+        payload = json.loads(message.get("data") or "{}")
+    except (TypeError, ValueError):
+        logger.debug("Ignoring malformed user_config invalidation: %r", message)
+        return
+    if payload.get("origin") == _INSTANCE_ID:
+        return
+    _cache.invalidate(payload.get("user_id"), payload.get("key"))
+
+
+def _listen_for_invalidations() -> None:
+    """Subscriber loop; reconnects with backoff and resets the cache after gaps."""
+    from backend.services.redis_client import get_redis_client
+
+    backoff = 1.0
+    while True:
+        try:
+            pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(USER_CONFIG_INVALIDATION_CHANNEL)
+            # Invalidations may have been missed while unsubscribed
+            _cache.invalidate()
+            backoff = 1.0
+            for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _handle_invalidation(message)
+        except Exception as e:
+            logger.warning("user_config invalidation listener error: %s (retry in %.0fs)", e, backoff)
+        time.sleep(backoff)
+        backoff = min(backoff * 2, 60.0)
+
+
+def _ensure_invalidation_listener() -> None:
+    """Start the pub/sub subscriber thread on first use."""
+    global _listener_thread
+    if _listener_thread is not None:
+        return
+    with _listener_lock:
+        if _listener_thread is None:
+            _listener_thread = threading.Thread(
+                target=_listen_for_invalidations,
+                name="user-config-invalidation",
+                daemon=True,
+            )
+            _listener_thread.start()
+
+
 # =============================================================================
 # Pydantic Models
 # =============================================================================
@@ -99,6 +304,10 @@ async def get_user_config(
     """
     Fetch a user configuration value from the ``user_config`` table.
 
+    Served from the process cache when possible; found values are cached
+    for ``USER_CONFIG_CACHE_TTL_SECONDS`` and missing keys for
+    ``USER_CONFIG_NEGATIVE_TTL_SECONDS``.  Read errors are not cached.
+
     Args:
         user_id: User UUID string.
         key: Configuration key to look up.
@@ -107,11 +316,17 @@ async def get_user_config(
     Returns:
         The config value, or *default* if not found or on error.
     """
+    hit, cached = _cache.get(user_id, key)
+    if hit:
+        return cached if cached is not None else default
+
     client = _get_supabase()
     if client is None:
         logger.debug("No Supabase client; returning default for %s", key)
         return default
 
+    _ensure_invalidation_listener()
+
     try:
         response = (
             client.table(USER_CONFIG_TABLE)
@@ -125,9 +340,11 @@ async def get_user_config(
         if response.data and len(response.data) > 0:
             value = response.data[0]["config_value"]
             logger.debug("user_config[%s][%s] = %s", user_id[:8], key, value[:20] if value else "")
+            _cache.put(user_id, key, value)
             return value
 
         logger.debug("user_config[%s][%s] not found, using default", user_id[:8], key)
+        _cache.put(user_id, key, None)
         return default
 
     except Exception as e:
@@ -143,6 +360,9 @@ async def set_user_config(
     """
     Set (upsert) a user configuration value.
 
+    On success the local cache is updated and other processes are told
+    to drop their copy.
+
     Args:
         user_id: User UUID string.
         key: Configuration key.
@@ -172,6 +392,8 @@ async def set_user_config(
 
         if response.data and len(response.data) > 0:
             logger.info("user_config[%s][%s] set successfully", user_id[:8], key)
+            _cache.put(user_id, key, value)
+            _publish_invalidation(user_id, key)
             return True
 
         logger.warning("user_config upsert returned no data for %s/%s", user_id[:8], key)
@@ -211,6 +433,8 @@ async def delete_user_config(
         )
 
         logger.info("user_config[%s][%s] deleted", user_id[:8], key)
+        _cache.put(user_id, key, None)
+        _publish_invalidation(user_id, key)
         return True
 
     except Exception as e:
@@ -26,8 +26,8 @@ interface UploadResult {
   file_size: number
   mime_type: string
   storage_path: string | null
-  extracted_text_preview: string
-  extracted_text_length: number
+  job_id: string
+  progress_url: string
   ingestion_status: string
 }
 
@@ -162,18 +162,8 @@ export function FileUploader({ userId = '00000000-0000-0000-0000-000000000001' }
                   <strong>{success.file_name}</strong> ({(success.file_size / 1024).toFixed(1)} KB)
                 </p>
                 <p className="text-xs text-green-600 mt-1">
-                  Extracted {success.extracted_text_length.toLocaleString()} characters - {success.ingestion_status}
+                  Ingestion {success.ingestion_status} - the file is parsed and added to memory in the background
                 </p>
-                {success.extracted_text_preview && (
-                  <details className="mt-2">
-                    <summary className="text-xs text-green-600 cursor-pointer hover:text-green-800">
-                      Preview extracted text
-                    </summary>
-                    <pre className="mt-2 p-2 bg-white rounded text-xs text-gray-700 whitespace-pre-wrap max-h-32 overflow-y-auto">
-                      {success.extracted_text_preview}
-                    </pre>
-                  </details>
-                )}
               </div>
             </div>
             <button
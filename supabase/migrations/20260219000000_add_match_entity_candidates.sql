@@ -0,0 +1,78 @@
+-- =============================================================================
+-- Batched entity candidate lookup for entity resolution
+-- =============================================================================
+-- Replaces the per-entity ``ILIKE '%name%'`` lookups in the Slow Path and the
+-- memory ingestion pipeline with a single query for a whole batch of names.
+-- Final matching (normalization + trigram scoring) happens in Python in
+-- backend/magma/resolution.py; this function only narrows the candidate set.
+--
+-- Depends on:
+--   - pg_trgm extension (20260216000001_create_push_back_log.sql)
+--   - idx_entities_name_trigram (20260216000002_add_entity_name_trigram_index.sql)
+--
+-- Owner: @backend-architect-sabine
+-- =============================================================================
+
+-- Parameters:
+--   p_names            TEXT[]  - Entity names from one message / WAL entry
+--   p_min_similarity   REAL    - pg_trgm similarity floor (default: 0.3)
+--   p_max_results      INT     - Safety cap on rows per input name (default: 20)
+--
+-- Returns active entities that either contain one of the names
+-- (case-insensitive substring, the historical rule) or are trigram-similar
+-- to one of them.  pg_trgm trigrams are case-insensitive, so ``%`` can use
+-- the GIN index directly; the explicit similarity() check applies the
+-- caller's floor when it is stricter than pg_trgm.similarity_threshold.
+--
+-- The cap is applied per name (LATERAL), best matches first: exact
+-- case-insensitive name matches, then by similarity.  A batch-wide cap in
+-- id order could drop a name's exact match and make resolve_entities_batch
+-- create a duplicate entity.
+
+CREATE OR REPLACE FUNCTION match_entity_candidates(
+    p_names TEXT[],
+    p_min_similarity REAL DEFAULT 0.3,
+    p_max_results INT DEFAULT 20
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    type TEXT,
+    domain TEXT,
+    attributes JSONB,
+    status TEXT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT DISTINCT ON (c.id)
+        c.id,
+        c.name,
+        c.type,
+        c.domain,
+        c.attributes,
+        c.status
+    FROM unnest(p_names) AS n(candidate_name)
+    CROSS JOIN LATERAL (
+        SELECT
+            e.id,
+            e.name,
+            e.type,
+            e.domain::TEXT AS domain,
+            e.attributes,
+            e.status
+        FROM entities e
+        WHERE e.status = 'active'
+          AND (e.name ILIKE '%' || replace(n.candidate_name, '%', '') || '%'
+               OR (e.name % n.candidate_name
+                   AND similarity(e.name, n.candidate_name) >= p_min_similarity))
+        ORDER BY lower(e.name) = lower(n.candidate_name) DESC,
+                 similarity(e.name, n.candidate_name) DESC,
+                 e.id
+        LIMIT p_max_results
+    ) c
+    ORDER BY c.id;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION match_entity_candidates(TEXT[], REAL, INT) IS
+    'Batched candidate lookup for entity resolution (one query per message instead of one per entity)';
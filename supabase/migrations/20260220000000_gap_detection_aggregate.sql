@@ -0,0 +1,179 @@
+-- =============================================================================
+-- SQL-side gap detection: failure aggregate + bulk gap upsert
+-- =============================================================================
+-- Replaces the gap detector's "fetch 500 raw failures, filter/group in
+-- Python, SELECT-then-UPDATE/INSERT per gap" loop with:
+--   1. aggregate_tool_failures(): one GROUP BY over tool_audit_log, filtered
+--      at the source, returning one row per (user_id, tool_name).
+--   2. upsert_skill_gaps(): one INSERT ... ON CONFLICT for all detected gaps,
+--      keyed on (user_id, tool_name) among open/researching gaps.
+--
+-- Called from backend/services/gap_detection.py.
+--
+-- Owner: @backend-architect-sabine
+-- =============================================================================
+
+-- -----------------------------------------------------------------------------
+-- One open gap per (user, tool)
+-- -----------------------------------------------------------------------------
+-- Earlier SELECT-then-INSERT runs could race and create duplicates; keep the
+-- most recent open gap for each pair before adding the unique index.
+WITH ranked AS (
+    SELECT
+        id,
+        row_number() OVER (
+            PARTITION BY user_id, tool_name
+            ORDER BY last_seen_at DESC, created_at DESC
+        ) AS rn
+    FROM skill_gaps
+    WHERE status IN ('open', 'researching')
+)
+UPDATE skill_gaps
+SET status = 'dismissed'
+FROM ranked
+WHERE skill_gaps.id = ranked.id
+  AND ranked.rn > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_skill_gaps_open_user_tool
+    ON skill_gaps(user_id, tool_name)
+    WHERE status IN ('open', 'researching');
+
+-- Failure scans read only recent error rows
+CREATE INDEX IF NOT EXISTS idx_tool_audit_failures
+    ON tool_audit_log(created_at DESC, user_id, tool_name)
+    WHERE status = 'error';
+
+-- -----------------------------------------------------------------------------
+-- aggregate_tool_failures
+-- -----------------------------------------------------------------------------
+-- Parameters:
+--   p_hours          INT   - Lookback window in hours (default: 168 = 7 days)
+--   p_user_id        UUID  - Restrict to one user (default: all users)
+--   p_min_failures   INT   - Minimum failures for a (user, tool) pair
+--   p_sample_limit   INT   - Sample error messages per pair (most recent first)
+--
+-- Returns one row per (user_id, tool_name) with at least p_min_failures
+-- errors in the window: the count, an error-type histogram
+-- ({"timeout": 2, ...}), first/last seen and sample messages (<= 200 chars).
+
+CREATE OR REPLACE FUNCTION aggregate_tool_failures(
+    p_hours INT DEFAULT 168,
+    p_user_id UUID DEFAULT NULL,
+    p_min_failures INT DEFAULT 3,
+    p_sample_limit INT DEFAULT 5
+)
+RETURNS TABLE (
+    user_id UUID,
+    tool_name TEXT,
+    failure_count BIGINT,
+    error_types JSONB,
+    first_seen TIMESTAMPTZ,
+    last_seen TIMESTAMPTZ,
+    sample_messages TEXT[]
+) AS $$
+    WITH failures AS (
+        SELECT
+            l.user_id,
+            l.tool_name,
+            COALESCE(NULLIF(l.error_type, ''), 'unknown') AS error_type,
+            NULLIF(l.error_message, '') AS error_message,
+            l.created_at
+        FROM tool_audit_log l
+        WHERE l.status = 'error'
+          AND l.user_id IS NOT NULL
+          AND l.created_at >= now() - make_interval(hours => p_hours)
+          AND (p_user_id IS NULL OR l.user_id = p_user_id)
+    ),
+    pairs AS (
+        SELECT
+            f.user_id,
+            f.tool_name,
+            count(*) AS failure_count,
+            min(f.created_at) AS first_seen,
+            max(f.created_at) AS last_seen,
+            (array_agg(left(f.error_message, 200) ORDER BY f.created_at DESC)
+                FILTER (WHERE f.error_message IS NOT NULL))[1:p_sample_limit] AS sample_messages
+        FROM failures f
+        GROUP BY f.user_id, f.tool_name
+        HAVING count(*) >= p_min_failures
+    ),
+    histogram AS (
+        SELECT t.user_id, t.tool_name, jsonb_object_agg(t.error_type, t.n) AS error_types
+        FROM (
+            SELECT f.user_id, f.tool_name, f.error_type, count(*) AS n
+            FROM failures f
+            GROUP BY f.user_id, f.tool_name, f.error_type
+        ) t
+        GROUP BY t.user_id, t.tool_name
+    )
+    SELECT
+        p.user_id,
+        p.tool_name,
+        p.failure_count,
+        h.error_types,
+        p.first_seen,
+        p.last_seen,
+        COALESCE(p.sample_messages, ARRAY[]::TEXT[])
+    FROM pairs p
+    JOIN histogram h
+      ON h.user_id = p.user_id
+     AND h.tool_name = p.tool_name
+    ORDER BY p.failure_count DESC, p.tool_name;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION aggregate_tool_failures(INT, UUID, INT, INT) IS
+    'Per-(user, tool) failure counts, error-type histogram and samples for gap detection';
+
+-- -----------------------------------------------------------------------------
+-- upsert_skill_gaps
+-- -----------------------------------------------------------------------------
+-- Parameters:
+--   p_gaps  JSONB  - Array of {user_id, gap_type, tool_name,
+--                    pattern_description, occurrence_count,
+--                    first_seen_at, last_seen_at}; at most one per
+--                    (user_id, tool_name)
+--
+-- Inserts new open gaps and refreshes count/description/last_seen_at on the
+-- existing open gap for the same (user_id, tool_name).  PostgREST's upsert
+-- cannot target a partial unique index, hence the function.
+
+CREATE OR REPLACE FUNCTION upsert_skill_gaps(p_gaps JSONB)
+RETURNS SETOF skill_gaps AS $$
+    INSERT INTO skill_gaps AS g (
+        user_id,
+        gap_type,
+        tool_name,
+        pattern_description,
+        occurrence_count,
+        first_seen_at,
+        last_seen_at,
+        status
+    )
+    SELECT
+        r.user_id,
+        r.gap_type,
+        r.tool_name,
+        r.pattern_description,
+        r.occurrence_count,
+        COALESCE(r.first_seen_at, now()),
+        COALESCE(r.last_seen_at, now()),
+        'open'
+    FROM jsonb_to_recordset(p_gaps) AS r(
+        user_id UUID,
+        gap_type TEXT,
+        tool_name TEXT,
+        pattern_description TEXT,
+        occurrence_count INT,
+        first_seen_at TIMESTAMPTZ,
+        last_seen_at TIMESTAMPTZ
+    )
+    ON CONFLICT (user_id, tool_name) WHERE status IN ('open', 'researching')
+    DO UPDATE SET
+        occurrence_count = EXCLUDED.occurrence_count,
+        pattern_description = EXCLUDED.pattern_description,
+        last_seen_at = EXCLUDED.last_seen_at
+    RETURNING g.*;
+$$ LANGUAGE sql VOLATILE;
+
+COMMENT ON FUNCTION upsert_skill_gaps(JSONB) IS
+    'Bulk insert-or-refresh of open skill gaps keyed on (user_id, tool_name)';
@@ -0,0 +1,15 @@
+-- =============================================================================
+-- tool_audit_log.cache_hit
+-- =============================================================================
+-- Marks tool results served from the tool result cache
+-- (lib/agent/tool_cache.py) instead of a fresh call to the external API.
+-- Lets usage and latency analysis separate real API calls from cache hits.
+--
+-- Owner: @backend-architect-sabine
+-- =============================================================================
+
+ALTER TABLE tool_audit_log
+    ADD COLUMN IF NOT EXISTS cache_hit BOOLEAN NOT NULL DEFAULT FALSE;
+
+COMMENT ON COLUMN tool_audit_log.cache_hit IS
+    'True when the result came from the tool result cache rather than the external API';
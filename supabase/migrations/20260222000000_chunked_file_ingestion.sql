@@ -0,0 +1,35 @@
+-- =============================================================================
+-- Chunked file ingestion
+-- =============================================================================
+-- Uploaded files are now stored as many chunk memories instead of one
+-- memory holding the whole extracted text (lib/agent/ingestion.py).
+--
+-- knowledge_files is the parent document record: it gains the owner and
+-- the job progress that GET /memory/upload/{job_id}/progress reads.
+-- memories.document_id points each chunk at its parent; deleting the
+-- document deletes its chunks.
+--
+-- Owner: @backend-architect-sabine
+-- =============================================================================
+
+ALTER TABLE knowledge_files
+    ADD COLUMN IF NOT EXISTS user_id UUID,
+    ADD COLUMN IF NOT EXISTS chunks_ingested INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS progress REAL NOT NULL DEFAULT 0
+        CHECK (progress >= 0 AND progress <= 1);
+
+COMMENT ON COLUMN knowledge_files.chunks_ingested IS
+    'Chunk memories stored so far by the ingestion job';
+COMMENT ON COLUMN knowledge_files.progress IS
+    'Fraction of the file parsed and ingested (0-1)';
+
+ALTER TABLE memories
+    ADD COLUMN IF NOT EXISTS document_id UUID
+        REFERENCES knowledge_files(id) ON DELETE CASCADE;
+
+CREATE INDEX IF NOT EXISTS idx_memories_document_id
+    ON memories(document_id)
+    WHERE document_id IS NOT NULL;
+
+COMMENT ON COLUMN memories.document_id IS
+    'knowledge_files record this memory is a chunk of (NULL for non-file memories)';
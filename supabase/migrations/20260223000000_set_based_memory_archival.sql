@@ -0,0 +1,397 @@
+-- =============================================================================
+-- Set-based memory archival
+-- =============================================================================
+-- Replaces the archival job's "load every candidate, UPDATE is_archived in
+-- batches of 100 ids" loop with a keyset-chunked move into cold storage:
+--   1. archive_memory_chunk(): one statement per chunk that copies qualifying
+--      memories (embedding included) into archived_memories and deletes them
+--      from memories.  Retention is a per-memory-type policy; dry runs report
+--      what would move without moving it.
+--   2. restore_archived_memories(): moves archived rows matching a predicate
+--      back into memories with their original ids.
+--   3. archived_memory_stats(): aggregate counts for GET /api/archive/stats.
+--
+-- A chunk scans only memories below the highest policy threshold (via
+-- idx_memories_archive_scan), so a run costs O(low-salience rows), not
+-- O(corpus).  Rows flagged is_archived by the old job are moved by the
+-- first run.
+--
+-- Called from backend/worker/salience_job.py.
+--
+-- Depends on:
+--   - 20260213000000_phase1_schema.sql           (salience columns on memories)
+--   - 20260213100000_create_archived_memories.sql (archived_memories)
+--   - 20260216020000_add_belief_revision_columns.sql (belief columns on memories)
+--
+-- Owner: @backend-architect-sabine
+-- PRD Reference: MEM-002, MEM-003
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. archived_memories keeps everything needed to restore a memory
+-- -----------------------------------------------------------------------------
+
+ALTER TABLE archived_memories
+    ADD COLUMN IF NOT EXISTS memory_type TEXT NOT NULL DEFAULT 'default',
+    ADD COLUMN IF NOT EXISTS embedding vector(1536),
+    ADD COLUMN IF NOT EXISTS entity_links UUID[] DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS source TEXT,
+    ADD COLUMN IF NOT EXISTS importance_score FLOAT DEFAULT 0.5,
+    ADD COLUMN IF NOT EXISTS access_count INTEGER DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS last_accessed_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS memory_created_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS document_id UUID,
+    ADD COLUMN IF NOT EXISTS confidence FLOAT DEFAULT 1.0,
+    ADD COLUMN IF NOT EXISTS belief_version INTEGER DEFAULT 1,
+    ADD COLUMN IF NOT EXISTS is_temporary_deviation BOOLEAN DEFAULT false,
+    ADD COLUMN IF NOT EXISTS deviation_expires_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN archived_memories.memory_type IS
+    'Retention policy key: metadata->>''source'' of the memory, else memories.source, else ''default''';
+COMMENT ON COLUMN archived_memories.embedding IS
+    'Original memory embedding, restored unchanged';
+COMMENT ON COLUMN archived_memories.memory_created_at IS
+    'created_at of the original memory';
+
+-- One archive row per memory, so a retried chunk cannot duplicate rows
+WITH ranked AS (
+    SELECT
+        id,
+        row_number() OVER (
+            PARTITION BY original_memory_id
+            ORDER BY archived_at DESC
+        ) AS rn
+    FROM archived_memories
+)
+DELETE FROM archived_memories
+USING ranked
+WHERE archived_memories.id = ranked.id
+  AND ranked.rn > 1;
+
+DROP INDEX IF EXISTS idx_archived_memories_original_memory_id;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_archived_memories_original_memory_id
+    ON archived_memories (original_memory_id);
+
+-- Restore predicates: user + type, user + archived_at (existing index)
+CREATE INDEX IF NOT EXISTS idx_archived_memories_user_type
+    ON archived_memories (user_id, memory_type);
+
+-- Archival scans walk low-salience rows in (salience_score, id) order
+CREATE INDEX IF NOT EXISTS idx_memories_archive_scan
+    ON memories (salience_score, id);
+
+
+-- -----------------------------------------------------------------------------
+-- 2. archive_memory_chunk
+-- -----------------------------------------------------------------------------
+-- Parameters:
+--   p_policies        JSONB    - {"<memory_type>": {"threshold": 0.2,
+--                                "min_age_days": 90, "max_access_count": 2}, ...};
+--                                the "default" entry applies to unlisted types
+--                                (types with no entry and no default are kept)
+--   p_after_salience  FLOAT    - Keyset cursor, salience part (NULL = start)
+--   p_after           UUID     - Keyset cursor, id part (NULL = start)
+--   p_limit           INT      - Rows scanned per chunk
+--   p_dry_run         BOOLEAN  - Report without moving
+--   p_user_id         UUID     - Restrict to one user (default: all users)
+--
+-- Scans up to p_limit memories with salience below the highest policy
+-- threshold, in (salience_score, id) order after (p_after_salience, p_after),
+-- so each chunk is a range scan on idx_memories_archive_scan.  A scanned
+-- memory qualifies when it was flagged is_archived, or when its type's policy
+-- matches (salience below threshold, access_count at most max_access_count,
+-- older than min_age_days).  Qualifying memories are copied to
+-- archived_memories and deleted from memories in the same statement; only
+-- rows whose archive copy was written are deleted (a memory archived again
+-- refreshes its existing archive row).
+--
+-- Returns one row: rows scanned, rows archived (or that would be), the
+-- cursor for the next chunk (both parts NULL when the scan is complete) and
+-- a per-type report ({"sms": {"count": 3, "avg_salience": 0.08}, ...}).
+
+CREATE OR REPLACE FUNCTION archive_memory_chunk(
+    p_policies JSONB,
+    p_after_salience FLOAT DEFAULT NULL,
+    p_after UUID DEFAULT NULL,
+    p_limit INT DEFAULT 500,
+    p_dry_run BOOLEAN DEFAULT false,
+    p_user_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    scanned INT,
+    archived INT,
+    next_after_salience FLOAT,
+    next_after UUID,
+    by_type JSONB
+) AS $$
+    WITH scan AS (
+        SELECT
+            m.*,
+            COALESCE(NULLIF(m.metadata->>'source', ''), NULLIF(m.source, ''), 'default') AS memory_type
+        FROM memories m
+        WHERE m.salience_score < (
+                SELECT max((p.value->>'threshold')::FLOAT)
+                FROM jsonb_each(p_policies) p
+            )
+          AND (
+                p_after IS NULL
+             OR (m.salience_score, m.id) > (p_after_salience, p_after)
+          )
+          AND (p_user_id IS NULL OR m.user_id = p_user_id)
+        ORDER BY m.salience_score, m.id
+        LIMIT p_limit
+    ),
+    candidates AS (
+        SELECT s.*
+        FROM scan s
+        CROSS JOIN LATERAL (
+            SELECT COALESCE(p_policies->s.memory_type, p_policies->'default') AS policy
+        ) r
+        WHERE s.is_archived
+           OR (
+                s.salience_score < (r.policy->>'threshold')::FLOAT
+            AND COALESCE(s.access_count, 0) <= (r.policy->>'max_access_count')::INT
+            AND s.created_at < now() - make_interval(days => (r.policy->>'min_age_days')::INT)
+           )
+    ),
+    moved AS (
+        INSERT INTO archived_memories (
+            original_memory_id,
+            user_id,
+            original_content,
+            metadata,
+            archived_reason,
+            salience_at_archival,
+            memory_type,
+            embedding,
+            entity_links,
+            source,
+            importance_score,
+            access_count,
+            last_accessed_at,
+            memory_created_at,
+            document_id,
+            confidence,
+            belief_version,
+            is_temporary_deviation,
+            deviation_expires_at
+        )
+        SELECT
+            c.id,
+            c.user_id,
+            c.content,
+            COALESCE(c.metadata, '{}'),
+            CASE WHEN c.is_archived THEN 'flagged' ELSE 'low_salience' END,
+            LEAST(GREATEST(COALESCE(c.salience_score, 0.0), 0.0), 1.0),
+            c.memory_type,
+            c.embedding,
+            COALESCE(c.entity_links, '{}'),
+            c.source,
+            c.importance_score,
+            c.access_count,
+            c.last_accessed_at,
+            c.created_at,
+            c.document_id,
+            c.confidence,
+            c.belief_version,
+            c.is_temporary_deviation,
+            c.deviation_expires_at
+        FROM candidates c
+        WHERE NOT p_dry_run
+        ON CONFLICT (original_memory_id) DO UPDATE SET
+            user_id = EXCLUDED.user_id,
+            original_content = EXCLUDED.original_content,
+            metadata = EXCLUDED.metadata,
+            archived_at = now(),
+            archived_reason = EXCLUDED.archived_reason,
+            salience_at_archival = EXCLUDED.salience_at_archival,
+            memory_type = EXCLUDED.memory_type,
+            embedding = EXCLUDED.embedding,
+            entity_links = EXCLUDED.entity_links,
+            source = EXCLUDED.source,
+            importance_score = EXCLUDED.importance_score,
+            access_count = EXCLUDED.access_count,
+            last_accessed_at = EXCLUDED.last_accessed_at,
+            memory_created_at = EXCLUDED.memory_created_at,
+            document_id = EXCLUDED.document_id,
+            confidence = EXCLUDED.confidence,
+            belief_version = EXCLUDED.belief_version,
+            is_temporary_deviation = EXCLUDED.is_temporary_deviation,
+            deviation_expires_at = EXCLUDED.deviation_expires_at
+        RETURNING original_memory_id
+    ),
+    removed AS (
+        -- Delete only what now has an archive copy
+        DELETE FROM memories m
+        USING moved v
+        WHERE m.id = v.original_memory_id
+        RETURNING m.id
+    ),
+    report AS (
+        SELECT
+            c.memory_type,
+            count(*) AS n,
+            round(avg(c.salience_score)::NUMERIC, 4) AS avg_salience
+        FROM candidates c
+        GROUP BY c.memory_type
+    )
+    SELECT
+        (SELECT count(*) FROM scan)::INT,
+        (SELECT count(*) FROM candidates)::INT,
+        CASE
+            WHEN (SELECT count(*) FROM scan) < p_limit THEN NULL
+            ELSE (SELECT s.salience_score FROM scan s ORDER BY s.salience_score DESC, s.id DESC LIMIT 1)
+        END,
+        CASE
+            WHEN (SELECT count(*) FROM scan) < p_limit THEN NULL
+            ELSE (SELECT s.id FROM scan s ORDER BY s.salience_score DESC, s.id DESC LIMIT 1)
+        END,
+        COALESCE(
+            (SELECT jsonb_object_agg(
+                        r.memory_type,
+                        jsonb_build_object('count', r.n, 'avg_salience', r.avg_salience))
+             FROM report r),
+            '{}'::JSONB
+        );
+$$ LANGUAGE sql VOLATILE;
+
+COMMENT ON FUNCTION archive_memory_chunk(JSONB, FLOAT, UUID, INT, BOOLEAN, UUID) IS
+    'Move one keyset chunk of low-salience memories into archived_memories (per-type retention, dry-run report)';
+
+
+-- -----------------------------------------------------------------------------
+-- 3. restore_archived_memories
+-- -----------------------------------------------------------------------------
+-- Parameters:
+--   p_user_id          UUID         - Restrict to one user
+--   p_memory_ids       UUID[]       - Original memory ids
+--   p_memory_type      TEXT         - Retention type the memory was archived under
+--   p_archived_after   TIMESTAMPTZ  - Archived at or after
+--   p_archived_before  TIMESTAMPTZ  - Archived before
+--   p_salience         FLOAT        - salience_score of restored memories
+--   p_limit            INT          - Rows restored per call
+--   p_dry_run          BOOLEAN      - Report without restoring (not limited)
+--
+-- NULL parameters do not filter.  Matching rows are re-inserted into
+-- memories with their original id, content, embedding, counters and
+-- belief-revision state (a
+-- memory still present as a flagged row is un-flagged instead) and removed
+-- from archived_memories.  last_accessed_at is set to now() and salience to
+-- p_salience so the next nightly run does not archive them straight back.
+-- Call repeatedly until restored < p_limit.
+
+CREATE OR REPLACE FUNCTION restore_archived_memories(
+    p_user_id UUID DEFAULT NULL,
+    p_memory_ids UUID[] DEFAULT NULL,
+    p_memory_type TEXT DEFAULT NULL,
+    p_archived_after TIMESTAMPTZ DEFAULT NULL,
+    p_archived_before TIMESTAMPTZ DEFAULT NULL,
+    p_salience FLOAT DEFAULT 0.5,
+    p_limit INT DEFAULT 500,
+    p_dry_run BOOLEAN DEFAULT false
+)
+RETURNS TABLE (
+    restored INT,
+    by_type JSONB
+) AS $$
+    WITH matched AS (
+        SELECT a.*
+        FROM archived_memories a
+        WHERE (p_user_id IS NULL OR a.user_id = p_user_id)
+          AND (p_memory_ids IS NULL OR a.original_memory_id = ANY(p_memory_ids))
+          AND (p_memory_type IS NULL OR a.memory_type = p_memory_type)
+          AND (p_archived_after IS NULL OR a.archived_at >= p_archived_after)
+          AND (p_archived_before IS NULL OR a.archived_at < p_archived_before)
+        ORDER BY a.archived_at, a.id
+        LIMIT CASE WHEN p_dry_run THEN NULL ELSE p_limit END
+    ),
+    reinserted AS (
+        INSERT INTO memories AS m (
+            id,
+            user_id,
+            content,
+            embedding,
+            metadata,
+            entity_links,
+            source,
+            importance_score,
+            salience_score,
+            access_count,
+            last_accessed_at,
+            is_archived,
+            document_id,
+            confidence,
+            belief_version,
+            is_temporary_deviation,
+            deviation_expires_at,
+            created_at
+        )
+        SELECT
+            a.original_memory_id,
+            a.user_id,
+            a.original_content,
+            a.embedding,
+            COALESCE(a.metadata, '{}'),
+            COALESCE(a.entity_links, '{}'),
+            a.source,
+            COALESCE(a.importance_score, 0.5),
+            p_salience,
+            COALESCE(a.access_count, 0),
+            now(),
+            false,
+            a.document_id,
+            COALESCE(a.confidence, 1.0),
+            COALESCE(a.belief_version, 1),
+            COALESCE(a.is_temporary_deviation, false),
+            a.deviation_expires_at,
+            COALESCE(a.memory_created_at, a.archived_at)
+        FROM matched a
+        WHERE NOT p_dry_run
+        ON CONFLICT (id) DO UPDATE SET
+            is_archived = false,
+            salience_score = EXCLUDED.salience_score,
+            last_accessed_at = EXCLUDED.last_accessed_at
+        RETURNING m.id
+    ),
+    removed AS (
+        DELETE FROM archived_memories a
+        USING matched x
+        WHERE a.id = x.id
+          AND NOT p_dry_run
+        RETURNING a.id
+    ),
+    report AS (
+        SELECT x.memory_type, count(*) AS n
+        FROM matched x
+        GROUP BY x.memory_type
+    )
+    SELECT
+        (SELECT count(*) FROM matched)::INT,
+        COALESCE((SELECT jsonb_object_agg(r.memory_type, r.n) FROM report r), '{}'::JSONB);
+$$ LANGUAGE sql VOLATILE;
+
+COMMENT ON FUNCTION restore_archived_memories(UUID, UUID[], TEXT, TIMESTAMPTZ, TIMESTAMPTZ, FLOAT, INT, BOOLEAN) IS
+    'Move archived memories matching a predicate back into memories (original ids and embeddings)';
+
+
+-- -----------------------------------------------------------------------------
+-- 4. archived_memory_stats
+-- -----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION archived_memory_stats(p_user_id UUID DEFAULT NULL)
+RETURNS TABLE (
+    total_archived BIGINT,
+    last_archived_at TIMESTAMPTZ,
+    avg_salience FLOAT
+) AS $$
+    SELECT
+        count(*),
+        max(a.archived_at),
+        avg(a.salience_at_archival)
+    FROM archived_memories a
+    WHERE p_user_id IS NULL OR a.user_id = p_user_id;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION archived_memory_stats(UUID) IS
+    'Archived memory count, latest archival time and mean salience at archival';
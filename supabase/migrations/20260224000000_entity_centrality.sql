@@ -0,0 +1,341 @@
+-- =============================================================================
+-- Materialized entity degree centrality
+-- =============================================================================
+-- The salience job scored causal centrality with two COUNT queries against
+-- entity_relationships per memory (2 round-trips x every memory, every
+-- night).  Degrees are now kept per entity in entity_centrality:
+--   1. Statement-level triggers on entity_relationships apply the degree
+--      deltas of each write (store_relationships' upserts, deletes, and the
+--      ON DELETE SET NULL updates when an entity is removed) in one
+--      GROUP BY per statement.
+--   2. refresh_entity_centrality() recomputes every degree with one GROUP BY
+--      (run below to backfill, and by the consistency check's --repair).
+--   3. memory_entity_degrees() joins memories' entity_links against the
+--      table, so the salience job reads one summed degree per memory.
+--   4. entity_centrality_drift() compares the table with an on-the-fly
+--      GROUP BY (python -m backend.services.entity_centrality check).
+--
+-- A memory's degree is the sum over its distinct linked entities of
+-- out_degree + in_degree, which equals the old "edges with a linked
+-- source" + "edges with a linked target" counts.
+--
+-- Called from backend/services/entity_centrality.py and
+-- backend/worker/salience_job.py.
+--
+-- Depends on:
+--   - 20260214100001_create_entity_relationships.sql (entity_relationships)
+--
+-- Owner: @backend-architect-sabine
+-- PRD Reference: MEM-001 (salience: causal centrality)
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. entity_centrality
+-- -----------------------------------------------------------------------------
+-- No FK to entities: a deleted entity's edges are nulled (SET NULL) after
+-- the entity row is gone, and the decrement must still apply.
+
+CREATE TABLE IF NOT EXISTS entity_centrality (
+    entity_id UUID PRIMARY KEY,
+    out_degree INTEGER NOT NULL DEFAULT 0,
+    in_degree INTEGER NOT NULL DEFAULT 0,
+    degree INTEGER GENERATED ALWAYS AS (out_degree + in_degree) STORED,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE entity_centrality IS
+    'Per-entity degree in entity_relationships, maintained by triggers (causal centrality for salience)';
+COMMENT ON COLUMN entity_centrality.out_degree IS 'Edges with this entity as source_entity_id';
+COMMENT ON COLUMN entity_centrality.in_degree IS 'Edges with this entity as target_entity_id';
+
+ALTER TABLE entity_centrality ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_policies
+        WHERE tablename = 'entity_centrality'
+          AND policyname = 'entity_centrality_service_role_all'
+    ) THEN
+        CREATE POLICY entity_centrality_service_role_all
+            ON entity_centrality
+            FOR ALL
+            TO service_role
+            USING (true)
+            WITH CHECK (true);
+    END IF;
+END;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 2. Incremental maintenance
+-- -----------------------------------------------------------------------------
+-- Each trigger folds its transition tables into signed per-entity deltas
+-- with one GROUP BY and hands them to apply_entity_centrality_delta().
+-- INSERT ... ON CONFLICT DO UPDATE puts only really inserted rows in the
+-- INSERT transition table, so a confidence bump on an existing edge is an
+-- UPDATE whose endpoints cancel out.
+
+-- p_deltas: [{"entity_id": ..., "out_delta": n, "in_delta": n}, ...]
+CREATE OR REPLACE FUNCTION apply_entity_centrality_delta(p_deltas JSONB)
+RETURNS VOID AS $$
+    INSERT INTO entity_centrality AS c (entity_id, out_degree, in_degree, updated_at)
+    SELECT d.entity_id, d.out_delta, d.in_delta, now()
+    FROM jsonb_to_recordset(p_deltas) AS d(entity_id UUID, out_delta INT, in_delta INT)
+    ON CONFLICT (entity_id) DO UPDATE SET
+        out_degree = GREATEST(c.out_degree + EXCLUDED.out_degree, 0),
+        in_degree = GREATEST(c.in_degree + EXCLUDED.in_degree, 0),
+        updated_at = now();
+
+    -- A removal for an entity without a row (only after drift) inserted a
+    -- negative degree; clamp it, then drop entities left without edges
+    UPDATE entity_centrality c
+    SET out_degree = GREATEST(c.out_degree, 0),
+        in_degree = GREATEST(c.in_degree, 0)
+    FROM jsonb_to_recordset(p_deltas) AS d(entity_id UUID)
+    WHERE c.entity_id = d.entity_id
+      AND (c.out_degree < 0 OR c.in_degree < 0);
+
+    DELETE FROM entity_centrality c
+    USING jsonb_to_recordset(p_deltas) AS d(entity_id UUID)
+    WHERE c.entity_id = d.entity_id
+      AND c.out_degree = 0
+      AND c.in_degree = 0;
+$$ LANGUAGE sql VOLATILE;
+
+CREATE OR REPLACE FUNCTION entity_centrality_add_edges()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_deltas JSONB;
+BEGIN
+    SELECT jsonb_agg(jsonb_build_object('entity_id', d.entity_id, 'out_delta', d.out_delta, 'in_delta', d.in_delta))
+    INTO v_deltas
+    FROM (
+        SELECT e.entity_id, sum(e.out_delta) AS out_delta, sum(e.in_delta) AS in_delta
+        FROM (
+            SELECT n.source_entity_id AS entity_id, 1 AS out_delta, 0 AS in_delta FROM new_edges n
+            UNION ALL
+            SELECT n.target_entity_id, 0, 1 FROM new_edges n
+        ) e
+        WHERE e.entity_id IS NOT NULL
+        GROUP BY e.entity_id
+    ) d;
+
+    IF v_deltas IS NOT NULL THEN
+        PERFORM apply_entity_centrality_delta(v_deltas);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION entity_centrality_remove_edges()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_deltas JSONB;
+BEGIN
+    SELECT jsonb_agg(jsonb_build_object('entity_id', d.entity_id, 'out_delta', d.out_delta, 'in_delta', d.in_delta))
+    INTO v_deltas
+    FROM (
+        SELECT e.entity_id, sum(e.out_delta) AS out_delta, sum(e.in_delta) AS in_delta
+        FROM (
+            SELECT o.source_entity_id AS entity_id, -1 AS out_delta, 0 AS in_delta FROM old_edges o
+            UNION ALL
+            SELECT o.target_entity_id, 0, -1 FROM old_edges o
+        ) e
+        WHERE e.entity_id IS NOT NULL
+        GROUP BY e.entity_id
+    ) d;
+
+    IF v_deltas IS NOT NULL THEN
+        PERFORM apply_entity_centrality_delta(v_deltas);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Endpoint changes (ON DELETE SET NULL when an entity is removed, manual
+-- re-pointing): old endpoints -1, new endpoints +1.  Rows whose endpoints
+-- did not change net to zero and are filtered out.
+CREATE OR REPLACE FUNCTION entity_centrality_move_edges()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_deltas JSONB;
+BEGIN
+    SELECT jsonb_agg(jsonb_build_object('entity_id', d.entity_id, 'out_delta', d.out_delta, 'in_delta', d.in_delta))
+    INTO v_deltas
+    FROM (
+        SELECT e.entity_id, sum(e.out_delta) AS out_delta, sum(e.in_delta) AS in_delta
+        FROM (
+            SELECT o.source_entity_id AS entity_id, -1 AS out_delta, 0 AS in_delta FROM old_edges o
+            UNION ALL
+            SELECT o.target_entity_id, 0, -1 FROM old_edges o
+            UNION ALL
+            SELECT n.source_entity_id, 1, 0 FROM new_edges n
+            UNION ALL
+            SELECT n.target_entity_id, 0, 1 FROM new_edges n
+        ) e
+        WHERE e.entity_id IS NOT NULL
+        GROUP BY e.entity_id
+        HAVING sum(e.out_delta) <> 0 OR sum(e.in_delta) <> 0
+    ) d;
+
+    IF v_deltas IS NOT NULL THEN
+        PERFORM apply_entity_centrality_delta(v_deltas);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_entity_centrality_insert ON entity_relationships;
+CREATE TRIGGER trg_entity_centrality_insert
+    AFTER INSERT ON entity_relationships
+    REFERENCING NEW TABLE AS new_edges
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION entity_centrality_add_edges();
+
+DROP TRIGGER IF EXISTS trg_entity_centrality_delete ON entity_relationships;
+CREATE TRIGGER trg_entity_centrality_delete
+    AFTER DELETE ON entity_relationships
+    REFERENCING OLD TABLE AS old_edges
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION entity_centrality_remove_edges();
+
+DROP TRIGGER IF EXISTS trg_entity_centrality_update ON entity_relationships;
+CREATE TRIGGER trg_entity_centrality_update
+    AFTER UPDATE ON entity_relationships
+    REFERENCING OLD TABLE AS old_edges NEW TABLE AS new_edges
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION entity_centrality_move_edges();
+
+
+-- -----------------------------------------------------------------------------
+-- 3. refresh_entity_centrality
+-- -----------------------------------------------------------------------------
+-- Recomputes every degree with one GROUP BY and replaces the table's
+-- contents.  Returns the number of entities with edges and the number of
+-- stale rows removed.
+
+CREATE OR REPLACE FUNCTION refresh_entity_centrality()
+RETURNS TABLE (
+    entities INT,
+    removed INT
+) AS $$
+    WITH computed AS (
+        SELECT d.entity_id, sum(d.out_delta)::INT AS out_degree, sum(d.in_delta)::INT AS in_degree
+        FROM (
+            SELECT r.source_entity_id AS entity_id, 1 AS out_delta, 0 AS in_delta
+            FROM entity_relationships r
+            WHERE r.source_entity_id IS NOT NULL
+            UNION ALL
+            SELECT r.target_entity_id, 0, 1
+            FROM entity_relationships r
+            WHERE r.target_entity_id IS NOT NULL
+        ) d
+        GROUP BY d.entity_id
+    ),
+    upserted AS (
+        INSERT INTO entity_centrality AS c (entity_id, out_degree, in_degree, updated_at)
+        SELECT entity_id, out_degree, in_degree, now()
+        FROM computed
+        ON CONFLICT (entity_id) DO UPDATE SET
+            out_degree = EXCLUDED.out_degree,
+            in_degree = EXCLUDED.in_degree,
+            updated_at = now()
+        WHERE c.out_degree <> EXCLUDED.out_degree
+           OR c.in_degree <> EXCLUDED.in_degree
+        RETURNING c.entity_id
+    ),
+    stale AS (
+        DELETE FROM entity_centrality c
+        WHERE NOT EXISTS (SELECT 1 FROM computed x WHERE x.entity_id = c.entity_id)
+        RETURNING c.entity_id
+    )
+    SELECT
+        (SELECT count(*) FROM computed)::INT,
+        (SELECT count(*) FROM stale)::INT;
+$$ LANGUAGE sql VOLATILE;
+
+COMMENT ON FUNCTION refresh_entity_centrality() IS
+    'Recompute entity_centrality from entity_relationships with one GROUP BY';
+
+-- Backfill
+SELECT * FROM refresh_entity_centrality();
+
+
+-- -----------------------------------------------------------------------------
+-- 4. memory_entity_degrees
+-- -----------------------------------------------------------------------------
+-- Parameters:
+--   p_memory_ids  UUID[]  - Memories to score
+--
+-- Returns one row per given memory with entity links: the summed degree of
+-- its distinct linked entities (0 when none has edges).
+
+CREATE OR REPLACE FUNCTION memory_entity_degrees(p_memory_ids UUID[])
+RETURNS TABLE (
+    memory_id UUID,
+    degree BIGINT
+) AS $$
+    SELECT l.memory_id, COALESCE(sum(c.degree), 0)::BIGINT
+    FROM (
+        SELECT DISTINCT m.id AS memory_id, e.entity_id
+        FROM memories m
+        CROSS JOIN LATERAL unnest(m.entity_links) AS e(entity_id)
+        WHERE m.id = ANY(p_memory_ids)
+    ) l
+    LEFT JOIN entity_centrality c ON c.entity_id = l.entity_id
+    GROUP BY l.memory_id;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION memory_entity_degrees(UUID[]) IS
+    'Summed entity_centrality degree of each memory''s distinct entity_links';
+
+
+-- -----------------------------------------------------------------------------
+-- 5. entity_centrality_drift
+-- -----------------------------------------------------------------------------
+-- Parameters:
+--   p_limit  INT  - Maximum drifted entities returned
+--
+-- Entities whose stored degrees differ from an on-the-fly GROUP BY over
+-- entity_relationships (missing rows count as 0).
+
+CREATE OR REPLACE FUNCTION entity_centrality_drift(p_limit INT DEFAULT 100)
+RETURNS TABLE (
+    entity_id UUID,
+    stored_out INT,
+    stored_in INT,
+    actual_out INT,
+    actual_in INT
+) AS $$
+    WITH computed AS (
+        SELECT d.entity_id, sum(d.out_delta)::INT AS out_degree, sum(d.in_delta)::INT AS in_degree
+        FROM (
+            SELECT r.source_entity_id AS entity_id, 1 AS out_delta, 0 AS in_delta
+            FROM entity_relationships r
+            WHERE r.source_entity_id IS NOT NULL
+            UNION ALL
+            SELECT r.target_entity_id, 0, 1
+            FROM entity_relationships r
+            WHERE r.target_entity_id IS NOT NULL
+        ) d
+        GROUP BY d.entity_id
+    )
+    SELECT
+        COALESCE(c.entity_id, x.entity_id),
+        COALESCE(c.out_degree, 0),
+        COALESCE(c.in_degree, 0),
+        COALESCE(x.out_degree, 0),
+        COALESCE(x.in_degree, 0)
+    FROM entity_centrality c
+    FULL OUTER JOIN computed x ON x.entity_id = c.entity_id
+    WHERE COALESCE(c.out_degree, 0) <> COALESCE(x.out_degree, 0)
+       OR COALESCE(c.in_degree, 0) <> COALESCE(x.in_degree, 0)
+    ORDER BY 1
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION entity_centrality_drift(INT) IS
+    'Entities whose entity_centrality degrees differ from entity_relationships';
@@ -0,0 +1,64 @@
+-- =============================================================================
+-- Relink marker for the incremental relationship backfill
+-- =============================================================================
+-- The relationship backfill (backend/worker/backfill_relationships.py) kept
+-- its high-water mark on memories.updated_at.  trg_memories_updated bumps
+-- that column on every write, and the nightly salience job rewrites
+-- salience_score on every row, so each "incremental" run re-sent the whole
+-- corpus through Haiku extraction.
+--
+-- The backfill now walks two keysets per shard:
+--   1. (created_at, id)               - memories inserted since the last run
+--   2. (entity_links_updated_at, id)  - memories whose entity_links changed
+--
+-- entity_links_updated_at is stamped by a trigger that fires only when
+-- entity_links actually changes on UPDATE; salience, access-count and
+-- archive writes leave it alone.  Inserts leave it NULL (keyset 1 covers
+-- them).
+--
+-- Depends on:
+--   - 20260129170000_init_context_engine.sql (memories)
+--
+-- Owner: @backend-architect-sabine
+-- =============================================================================
+
+
+ALTER TABLE memories
+    ADD COLUMN IF NOT EXISTS entity_links_updated_at TIMESTAMPTZ;
+
+COMMENT ON COLUMN memories.entity_links_updated_at IS
+    'When entity_links last changed on UPDATE (relationship backfill relink cursor); NULL if never relinked';
+
+CREATE INDEX IF NOT EXISTS idx_memories_created_at_id
+    ON memories (created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_memories_entity_links_updated_at_id
+    ON memories (entity_links_updated_at, id)
+    WHERE entity_links_updated_at IS NOT NULL;
+
+
+CREATE OR REPLACE FUNCTION stamp_memories_entity_links_updated()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.entity_links_updated_at = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'trg_memories_entity_links_updated'
+    ) THEN
+        CREATE TRIGGER trg_memories_entity_links_updated
+            BEFORE UPDATE OF entity_links ON memories
+            FOR EACH ROW
+            WHEN (OLD.entity_links IS DISTINCT FROM NEW.entity_links)
+            EXECUTE FUNCTION stamp_memories_entity_links_updated();
+    END IF;
+END;
+$$;
+
+COMMENT ON FUNCTION stamp_memories_entity_links_updated() IS
+    'Stamps memories.entity_links_updated_at when entity_links changes';
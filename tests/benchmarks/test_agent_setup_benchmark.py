@@ -0,0 +1,90 @@
+"""
+Agent Setup Benchmark
+=====================
+
+Measures the per-turn cost of ``create_react_agent_with_tools()``: routing,
+LLM client construction and ReAct graph compilation.  Compares cold setup
+(no compiled-agent cache, fresh LLM clients: the old behaviour) with warm
+setup (pooled clients, cached compiled agent, only the dynamic context and
+callbacks bound per turn).
+
+Uses the real Anthropic/Groq client classes and the real local skill tools;
+no request is sent, so it runs anywhere.
+
+Run with: pytest tests/benchmarks/test_agent_setup_benchmark.py -v -s -m benchmark
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from lib.agent import agent_cache, circuit_breaker, model_router
+from lib.agent.core import create_react_agent_with_tools
+from lib.agent.registry import convert_local_skill_to_tool, load_local_skills
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+TURNS = 30
+STATIC_PROMPT = "You are Sabine, a personal assistant.\n" * 200
+
+
+def _setup_ms(loop: asyncio.AbstractEventLoop, tools: List, cold: bool) -> List[float]:
+    timings = []
+    for turn in range(TURNS):
+        if cold:
+            model_router.clear_llm_pool()
+        start = time.perf_counter()
+        loop.run_until_complete(create_react_agent_with_tools(
+            tools=tools,
+            system_prompt=STATIC_PROMPT,
+            user_id="bench-user",
+            session_id="bench-session",
+            dynamic_prompt=f"\nCurrent time: turn {turn}",
+        ))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+@pytest.mark.benchmark
+def test_agent_setup_cold_vs_cached(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-bench")
+    monkeypatch.setenv("GROQ_API_KEY", "gsk-bench")
+    monkeypatch.setattr(model_router, "_llm_pool", {})
+    monkeypatch.setattr(agent_cache, "_cache", agent_cache.CompiledAgentCache())
+    monkeypatch.setattr(circuit_breaker, "_registry", circuit_breaker.CircuitBreakerRegistry())
+    model_router.reset_model_router()
+
+    tools = [convert_local_skill_to_tool(skill) for skill in load_local_skills()]
+    loop = asyncio.new_event_loop()
+    try:
+        monkeypatch.setattr(agent_cache, "AGENT_CACHE_ENABLED", False)
+        cold = _setup_ms(loop, tools, cold=True)
+        monkeypatch.setattr(agent_cache, "AGENT_CACHE_ENABLED", True)
+        warm = _setup_ms(loop, tools, cold=False)[1:]  # first turn compiles
+    finally:
+        loop.close()
+        model_router.reset_model_router()
+
+    cold_ms = statistics.median(cold)
+    warm_ms = statistics.median(warm)
+    print(
+        f"\n  agent setup with {len(tools)} tools: cold {cold_ms:.2f}ms, "
+        f"cached {warm_ms:.2f}ms per turn (saves {cold_ms - warm_ms:.2f}ms, "
+        f"{cold_ms / warm_ms:.1f}x)"
+    )
+    assert warm_ms < cold_ms
@@ -0,0 +1,109 @@
+"""
+History Compaction Benchmark
+============================
+
+Replays a 100-turn synthetic conversation through the history compactor and
+reports the prompt tokens spent on history at each turn, with and without
+compaction.  Uncompacted history grows linearly with the thread; compacted
+history plateaus under ``token_budget``.  Hermetic: the summarizer is the
+model-free extractive fallback, so no network is needed.
+
+Run with: pytest tests/benchmarks/test_history_compaction_benchmark.py -v -s -m benchmark
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from lib.agent.history_compaction import (
+    HistoryCompactor,
+    estimate_message_tokens,
+    extractive_summary,
+)
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+TURNS = 100
+KEEP_TURNS = 6
+TOKEN_BUDGET = 3000
+SUMMARY_MAX_TOKENS = 500
+FOLD_BATCH = 4
+
+
+def _synthetic_conversation(turns: int) -> List[Dict]:
+    """Chatty thread with a calendar tool call every fifth turn."""
+    rng = random.Random(7)
+    words = ["pickup", "school", "dentist", "tuesday", "project", "email", "review",
+             "dinner", "flight", "budget", "meeting", "kids", "weekend", "reminder"]
+    history: List[Dict] = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Turn {i}: " + " ".join(rng.choices(words, k=rng.randint(10, 40)))})
+        if i % 5 == 0:
+            history.append({"role": "assistant", "content": "", "tool_calls": [{"name": "get_calendar_events", "args": {"time_range": "week"}}]})
+            history.append({"role": "tool", "name": "get_calendar_events", "content": " ".join(rng.choices(words, k=120))})
+        history.append({"role": "assistant", "content": " ".join(rng.choices(words, k=rng.randint(40, 120)))})
+    return history
+
+
+async def _extractive(previous, turns, max_tokens) -> str:
+    return extractive_summary(previous, turns, max_tokens)
+
+
+def _user_indices(history: List[Dict]) -> List[int]:
+    return [i for i, m in enumerate(history) if m["role"] == "user"]
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+@pytest.mark.benchmark
+def test_tokens_per_turn_over_100_turns():
+    history = _synthetic_conversation(TURNS)
+    starts = _user_indices(history)
+    compactor = HistoryCompactor(
+        keep_turns=KEEP_TURNS,
+        token_budget=TOKEN_BUDGET,
+        fold_batch=FOLD_BATCH,
+        summary_max_tokens=SUMMARY_MAX_TOKENS,
+        summarizer=_extractive,
+    )
+
+    rows = []
+    elapsed = 0.0
+    for turn, start in enumerate(starts):
+        prior = history[:start]  # history sent with this turn's message
+        t0 = time.perf_counter()
+        result = asyncio.run(compactor.compact("bench", prior))
+        elapsed += time.perf_counter() - t0
+        full = sum(estimate_message_tokens(m) for m in prior)
+        assert result.original_tokens == full
+        rows.append((turn + 1, full, result.estimated_tokens, result.folded_turns))
+
+    print(f"\n  {'turn':>5} {'full':>8} {'compacted':>10} {'folded':>7}")
+    for turn, full, compacted, folded in rows:
+        if turn in (1, 5, 10) or turn % 20 == 0:
+            print(f"  {turn:>5} {full:>8} {compacted:>10} {folded:>7}")
+    total_full = sum(r[1] for r in rows)
+    total_compacted = sum(r[2] for r in rows)
+    print(
+        f"  total history tokens over {TURNS} turns: {total_full} -> {total_compacted} "
+        f"({total_full / total_compacted:.1f}x fewer); "
+        f"{compactor.summary_calls} summary calls, {elapsed * 1000 / TURNS:.2f}ms/turn"
+    )
+
+    assert max(r[2] for r in rows) <= TOKEN_BUDGET
+    assert rows[-1][1] > 5 * TOKEN_BUDGET
+    # One summary call per FOLD_BATCH aged-out turns, not one per turn
+    assert compactor.summary_calls <= TURNS // FOLD_BATCH + 1
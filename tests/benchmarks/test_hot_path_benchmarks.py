@@ -0,0 +1,508 @@
+"""
+Hermetic Hot-Path Benchmarks
+============================
+
+End-to-end latency benchmarks for the request hot paths, run against
+deterministic in-process fakes instead of live services:
+
+- process_fast_path      (WAL write, entity extraction, embedding,
+                          memory retrieval, conflict detection, enqueue)
+- retrieve_context       (embedding, vector search, entity search, graph)
+- run_sabine_agent       (tools, deep context, retrieval, one tool-calling
+                          ReAct turn against a fake chat model)
+- consolidate_wal_entry  (Slow Path: relationship extraction, entity
+                          resolution, relationship storage)
+
+Every fake sleeps for a fixed, per-service latency (Supabase, Anthropic,
+OpenAI, the chat model), so the timings measure our own orchestration -
+sequential vs. parallel calls, round-trip counts, CPU overhead - on top of a
+known network budget.  Nothing touches the network or a database.
+
+Each benchmark's median is compared with ``hot_path_baseline.json``; a
+median above ``baseline * (1 + REGRESSION_TOLERANCE) + REGRESSION_SLACK_MS``
+fails the test.  Re-record the baseline after an intentional change with:
+
+    SABINE_BENCH_UPDATE_BASELINE=1 pytest tests/benchmarks/test_hot_path_benchmarks.py -m benchmark
+
+Run with: pytest tests/benchmarks/test_hot_path_benchmarks.py -v -s -m benchmark
+Requires pytest-benchmark (skipped otherwise).
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+# Injected per-call latency of each fake service (milliseconds)
+SUPABASE_LATENCY_MS = 8.0
+ANTHROPIC_LATENCY_MS = 120.0
+EMBEDDING_LATENCY_MS = 40.0
+CHAT_MODEL_LATENCY_MS = 150.0
+TOOL_LATENCY_MS = 20.0
+QUEUE_LATENCY_MS = 2.0
+
+ROUNDS = 8
+WARMUP_ROUNDS = 1
+
+BASELINE_PATH = Path(__file__).parent / "hot_path_baseline.json"
+REGRESSION_TOLERANCE = 0.25   # relative headroom over the recorded median
+REGRESSION_SLACK_MS = 15.0    # absolute headroom for scheduler noise
+UPDATE_BASELINE = os.getenv("SABINE_BENCH_UPDATE_BASELINE", "") == "1"
+
+USER_ID = "00000000-0000-4000-8000-000000000001"
+ENTITY_IDS = [f"00000000-0000-4000-8000-0000000000{i:02d}" for i in range(10, 14)]
+MESSAGE = "Remind me that Jenny from PriceSpider wants the contract review before Friday"
+
+
+# =============================================================================
+# Fake Supabase
+# =============================================================================
+
+def _entity_row(i: int) -> Dict[str, Any]:
+    names = ["Jenny", "PriceSpider", "Contract Review", "Friday Sync"]
+    types = ["person", "org", "project", "event"]
+    return {
+        "id": ENTITY_IDS[i],
+        "name": names[i],
+        "type": types[i],
+        "domain": "work",
+        "attributes": {"mention_count": 3},
+        "status": "active",
+        "created_at": "2026-01-05T10:00:00+00:00",
+        "updated_at": "2026-01-05T10:00:00+00:00",
+    }
+
+
+def _relationship_row(i: int) -> Dict[str, Any]:
+    return {
+        "id": str(uuid4()),
+        "source_entity_id": ENTITY_IDS[i % 4],
+        "target_entity_id": ENTITY_IDS[(i + 1) % 4],
+        "relationship_type": "works_at" if i % 2 == 0 else "related_to",
+        "graph_layer": "entity",
+        "confidence": 0.9,
+        "source_name": _entity_row(i % 4)["name"],
+        "target_name": _entity_row((i + 1) % 4)["name"],
+        "depth": 1,
+    }
+
+
+def _memory_row(i: int) -> Dict[str, Any]:
+    return {
+        "id": str(uuid4()),
+        "content": f"Memory {i}: Jenny asked about the PriceSpider contract timeline",
+        "similarity": 0.9 - i * 0.02,
+        "salience_score": 0.8,
+        "metadata": {"domain": "work", "role": "assistant"},
+        "created_at": "2026-01-05T10:00:00+00:00",
+    }
+
+
+def _wal_row(payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
+        "id": str(uuid4()),
+        "created_at": "2026-01-05T10:00:00+00:00",
+        "raw_payload": payload or {},
+        "status": "pending",
+        "retry_count": 0,
+        "idempotency_key": uuid4().hex,
+    }
+
+
+# Canned rows per table (SELECT) and per RPC name
+TABLE_ROWS: Dict[str, Callable[[], List[Dict[str, Any]]]] = {
+    "entities": lambda: [_entity_row(i) for i in range(4)],
+    "entity_relationships": lambda: [_relationship_row(i) for i in range(5)],
+    "memories": lambda: [_memory_row(i) for i in range(10)],
+    "rules": lambda: [{"id": "r1", "name": "Quiet hours", "trigger_condition": {}, "action_logic": {}}],
+    "custody_schedule": lambda: [],
+    "user_config": lambda: [],
+}
+RPC_ROWS: Dict[str, Callable[[], List[Dict[str, Any]]]] = {
+    "match_memories": lambda: [_memory_row(i) for i in range(5)],
+    "traverse_graph": lambda: [_relationship_row(i) for i in range(3)],
+}
+
+
+class FakeQuery:
+    """Chainable PostgREST query; ``execute()`` pays one round trip."""
+
+    def __init__(self, client: "FakeSupabase", table: Optional[str] = None, rpc: Optional[str] = None):
+        self._client = client
+        self._table = table
+        self._rpc = rpc
+        self._written: Optional[Any] = None
+        self._op = "select"
+
+    def insert(self, data: Any, **_: Any) -> "FakeQuery":
+        self._op, self._written = "insert", data
+        return self
+
+    def upsert(self, data: Any, **_: Any) -> "FakeQuery":
+        self._op, self._written = "upsert", data
+        return self
+
+    def update(self, data: Any, **_: Any) -> "FakeQuery":
+        self._op, self._written = "update", data
+        return self
+
+    def delete(self, **_: Any) -> "FakeQuery":
+        self._op = "delete"
+        return self
+
+    def __getattr__(self, name: str) -> Callable[..., "FakeQuery"]:
+        # select/eq/in_/ilike/order/limit/... are all no-op filters
+        return lambda *args, **kwargs: self
+
+    def execute(self) -> SimpleNamespace:
+        self._client.round_trips += 1
+        time.sleep(SUPABASE_LATENCY_MS / 1000.0)
+        if self._rpc is not None:
+            rows = RPC_ROWS.get(self._rpc, lambda: [])()
+        elif self._op in ("insert", "upsert"):
+            written = self._written if isinstance(self._written, list) else [self._written]
+            if self._table == "wal_logs":
+                rows = [_wal_row(w.get("raw_payload")) for w in written]
+            else:
+                rows = [{"id": str(uuid4()), **w} for w in written]
+        elif self._op in ("update", "delete"):
+            rows = [{"id": str(uuid4())}]
+        elif self._table == "wal_logs":
+            rows = [self._client.wal_entry]
+        else:
+            rows = TABLE_ROWS.get(self._table, lambda: [])()
+        return SimpleNamespace(data=rows, count=len(rows))
+
+
+class FakeSupabase:
+    """Stand-in for the synchronous supabase-py client (blocking I/O)."""
+
+    def __init__(self) -> None:
+        self.round_trips = 0
+        self.wal_entry: Dict[str, Any] = _wal_row({
+            "user_id": USER_ID,
+            "message": MESSAGE,
+            "entities": [
+                {"name": "Jenny", "type": "person", "domain": "work"},
+                {"name": "PriceSpider", "type": "org", "domain": "work"},
+            ],
+            "conflicts": [],
+        })
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, table=name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> FakeQuery:
+        return FakeQuery(self, rpc=name)
+
+
+# =============================================================================
+# Fake model providers
+# =============================================================================
+
+_EXTRACTED_ENTITIES = json.dumps([
+    {"name": "Jenny", "type": "person", "confidence": 0.95},
+    {"name": "PriceSpider", "type": "org", "confidence": 0.9},
+    {"name": "Friday", "type": "date", "confidence": 0.8},
+])
+_EXTRACTED_RELATIONSHIPS = json.dumps([
+    {"subject": "Jenny", "predicate": "works_at", "object": "PriceSpider",
+     "confidence": 0.9, "graph_layer": "entity"},
+])
+
+
+def _anthropic_response(text: str) -> SimpleNamespace:
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+class FakeAsyncAnthropic:
+    """``anthropic.AsyncAnthropic`` returning a canned entity list."""
+
+    def __init__(self, **_: Any) -> None:
+        self.messages = SimpleNamespace(create=self._create)
+
+    async def _create(self, **_: Any) -> SimpleNamespace:
+        await asyncio.sleep(ANTHROPIC_LATENCY_MS / 1000.0)
+        return _anthropic_response(_EXTRACTED_ENTITIES)
+
+
+class FakeAnthropic:
+    """Synchronous ``anthropic.Anthropic`` returning canned relationships."""
+
+    def __init__(self, **_: Any) -> None:
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, **_: Any) -> SimpleNamespace:
+        time.sleep(ANTHROPIC_LATENCY_MS / 1000.0)
+        return _anthropic_response(_EXTRACTED_RELATIONSHIPS)
+
+
+class FakeAsyncOpenAI:
+    """``openai.AsyncOpenAI`` returning a fixed 1536-dim embedding."""
+
+    def __init__(self, **_: Any) -> None:
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    async def _create(self, **_: Any) -> SimpleNamespace:
+        await asyncio.sleep(EMBEDDING_LATENCY_MS / 1000.0)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[0.01] * 1536)])
+
+
+class FakeEmbeddings:
+    """LangChain embeddings client used by lib.agent.retrieval."""
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(EMBEDDING_LATENCY_MS / 1000.0)
+        return [0.01] * 1536
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Tool-calling chat model with a fixed script: call the first bound tool
+    on the user's turn, then answer once the tool result is in.
+    """
+
+    tool_name: str = "lookup_schedule"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-hot-path"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> ChatResult:
+        if isinstance(messages[-1], ToolMessage):
+            message = AIMessage(content="Done - Jenny's contract review is on your list for Friday.")
+        else:
+            message = AIMessage(content="", tool_calls=[{
+                "name": self.tool_name,
+                "args": {"query": "Friday"},
+                "id": f"call_{uuid4().hex[:8]}",
+            }])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(CHAT_MODEL_LATENCY_MS / 1000.0)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(CHAT_MODEL_LATENCY_MS / 1000.0)
+        return self._reply(messages)
+
+
+class FakeProvider:
+    def create_llm(self, **_: Any) -> FakeChatModel:
+        return FakeChatModel()
+
+
+async def _lookup_schedule(query: str) -> str:
+    """Look up calendar entries matching a query."""
+    await asyncio.sleep(TOOL_LATENCY_MS / 1000.0)
+    return json.dumps({"status": "success", "events": [{"title": "Contract review", "day": query}]})
+
+
+def _fake_tools() -> List[StructuredTool]:
+    return [StructuredTool.from_function(coroutine=_lookup_schedule, name="lookup_schedule",
+                                         description="Look up calendar entries matching a query.")]
+
+
+def _fake_enqueue(**_: Any) -> str:
+    time.sleep(QUEUE_LATENCY_MS / 1000.0)
+    return f"job-{uuid4().hex[:8]}"
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def fake_services(monkeypatch):
+    """Route every external dependency of the hot paths to the fakes."""
+    import anthropic
+    import openai
+
+    from backend.services import audit_logging, queue, wal
+    from lib.agent import agent_cache, core, memory, model_router, providers, registry, retrieval
+    from lib.db import user_config
+
+    client = FakeSupabase()
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-fake")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-fake")
+    monkeypatch.setattr(anthropic, "AsyncAnthropic", FakeAsyncAnthropic)
+    monkeypatch.setattr(anthropic, "Anthropic", FakeAnthropic)
+    monkeypatch.setattr(openai, "AsyncOpenAI", FakeAsyncOpenAI)
+
+    monkeypatch.setattr(wal, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(memory, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(retrieval, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(retrieval, "get_embeddings", lambda: FakeEmbeddings())
+    monkeypatch.setattr(core, "supabase", client)
+    monkeypatch.setattr(providers, "get_provider", lambda provider: FakeProvider())
+    monkeypatch.setattr(model_router, "_llm_pool", {})
+    monkeypatch.setattr(agent_cache, "_cache", agent_cache.CompiledAgentCache())
+    monkeypatch.setattr(user_config, "_get_supabase", lambda: client)
+    monkeypatch.setattr(user_config, "_ensure_invalidation_listener", lambda: None)
+    monkeypatch.setattr(audit_logging, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(audit_logging, "AUDIT_LOG_BUFFERED", False)
+    monkeypatch.setattr(queue, "enqueue_wal_processing", _fake_enqueue)
+
+    async def scoped_tools(role: str) -> List[StructuredTool]:
+        await asyncio.sleep(0)
+        return _fake_tools()
+
+    monkeypatch.setattr(registry, "get_scoped_tools", scoped_tools)
+
+    user_config.get_user_config_cache().invalidate()
+    return client
+
+
+@pytest.fixture
+def event_loop_runner():
+    """Run coroutines on one private loop (pytest-benchmark timers are sync)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+# =============================================================================
+# Baseline comparison
+# =============================================================================
+
+def _load_baseline() -> Dict[str, Any]:
+    if BASELINE_PATH.exists():
+        return json.loads(BASELINE_PATH.read_text())
+    return {}
+
+
+def _check_baseline(name: str, benchmark, stages: Optional[Dict[str, float]] = None) -> None:
+    """Fail if the median regressed past the recorded baseline (or record it)."""
+    if benchmark.stats is None:  # --benchmark-disable
+        return
+    median_ms = benchmark.stats.stats.median * 1000.0
+    benchmark.extra_info["median_ms"] = round(median_ms, 1)
+    if stages:
+        benchmark.extra_info["stages_ms"] = stages
+        print(f"\n  {name} stages (median ms): " + ", ".join(f"{k}={v}" for k, v in stages.items()))
+    print(f"\n  {name}: median {median_ms:.1f}ms")
+
+    baseline = _load_baseline()
+    if UPDATE_BASELINE:
+        baseline[name] = {"median_ms": round(median_ms, 1), **({"stages_ms": stages} if stages else {})}
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        return
+
+    if name not in baseline:
+        pytest.skip(f"No baseline recorded for {name}; set SABINE_BENCH_UPDATE_BASELINE=1")
+    limit_ms = baseline[name]["median_ms"] * (1 + REGRESSION_TOLERANCE) + REGRESSION_SLACK_MS
+    assert median_ms <= limit_ms, (
+        f"{name} regressed: median {median_ms:.1f}ms > limit {limit_ms:.1f}ms "
+        f"(baseline {baseline[name]['median_ms']}ms)"
+    )
+
+
+def _median_stages(timings: List[Dict[str, float]]) -> Dict[str, float]:
+    keys = [k for k in timings[0] if k.endswith("_ms")]
+    return {k: round(statistics.median(t[k] for t in timings), 1) for k in keys}
+
+
+# =============================================================================
+# Benchmarks
+# =============================================================================
+
+@pytest.mark.benchmark
+def test_process_fast_path(benchmark, fake_services, event_loop_runner):
+    from backend.services.fast_path import process_fast_path
+
+    timings: List[Dict[str, float]] = []
+    counter = itertools.count()
+
+    def run():
+        result = event_loop_runner(
+            process_fast_path(USER_ID, f"{MESSAGE} #{next(counter)}", session_id="bench")
+        )
+        timings.append(result.timings)
+        return result
+
+    result = benchmark.pedantic(run, rounds=ROUNDS, warmup_rounds=WARMUP_ROUNDS)
+
+    assert result.wal_entry_id
+    assert [e.name for e in result.extracted_entities] == ["Jenny", "PriceSpider", "Friday"]
+    assert result.retrieved_memories
+    _check_baseline("process_fast_path", benchmark, _median_stages(timings[-ROUNDS:]))
+
+
+@pytest.mark.benchmark
+def test_retrieve_context(benchmark, fake_services, event_loop_runner):
+    from lib.agent.retrieval import retrieve_context
+
+    def run():
+        return event_loop_runner(
+            retrieve_context(user_id=UUID(USER_ID), query=MESSAGE, include_graph=True)
+        )
+
+    context = benchmark.pedantic(run, rounds=ROUNDS, warmup_rounds=WARMUP_ROUNDS)
+
+    assert "[ERROR]" not in context
+    assert "Jenny" in context
+    _check_baseline("retrieve_context", benchmark)
+
+
+@pytest.mark.benchmark
+def test_run_sabine_agent(benchmark, fake_services, event_loop_runner):
+    from lib.agent.sabine_agent import run_sabine_agent
+
+    def run():
+        return event_loop_runner(run_sabine_agent(
+            user_id=USER_ID,
+            session_id="bench",
+            user_message=MESSAGE,
+            conversation_history=[
+                {"role": "user", "content": "Who is Jenny?"},
+                {"role": "assistant", "content": "Jenny is your contact at PriceSpider."},
+            ],
+        ))
+
+    result = benchmark.pedantic(run, rounds=ROUNDS, warmup_rounds=WARMUP_ROUNDS)
+
+    assert result["success"], result.get("error")
+    assert result["tool_execution"]["success_count"] == 1
+    _check_baseline("run_sabine_agent", benchmark)
+
+
+@pytest.mark.benchmark
+def test_consolidate_wal_entry(benchmark, fake_services):
+    from backend.worker.slow_path import consolidate_wal_entry
+
+    wal_id = fake_services.wal_entry["id"]
+    result = benchmark.pedantic(consolidate_wal_entry, args=(wal_id,), rounds=ROUNDS, warmup_rounds=WARMUP_ROUNDS)
+
+    assert result.status == "processed", result.error
+    assert result.entities_resolved == 2
+    assert result.relationships_extracted == 1
+    _check_baseline("consolidate_wal_entry", benchmark)
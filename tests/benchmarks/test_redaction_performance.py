@@ -0,0 +1,107 @@
+"""
+Redaction Engine Microbenchmark
+===============================
+
+Compares the compiled RedactionEngine against the original one-re.sub-per-
+pattern loop on large JSON tool outputs (issue/search listings).  Hermetic:
+no network or database, so it runs anywhere.
+
+Run with: pytest tests/benchmarks/test_redaction_performance.py -v -s -m benchmark
+"""
+
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pytest
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.output_sanitization import (
+    PII_PATTERNS,
+    SENSITIVE_PATTERNS,
+    StreamingRedactor,
+    redact_sensitive_strings,
+)
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+ROWS = 600          # ~100KB of JSON per tool output
+ITERATIONS = 10
+
+
+def _legacy(text: str, include_pii: bool) -> str:
+    for pattern, replacement in SENSITIVE_PATTERNS:
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    if include_pii:
+        for pattern, replacement in PII_PATTERNS:
+            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    return text
+
+
+def _tool_output(with_secret: bool) -> str:
+    rng = random.Random(1)
+    words = ["issue", "fix", "status", "ok", "file", "data", "user", "value", "items", "merge"]
+    rows: List[Dict] = [
+        {
+            "id": i,
+            "title": "Issue about " + rng.choice(words),
+            "body": " ".join(rng.choices(words, k=40)),
+            "url": f"https://github.com/org/repo/issues/{i}",
+        }
+        for i in range(ROWS)
+    ]
+    if with_secret:
+        rows[5]["body"] += " api_key=sk-proj-" + "z" * 30
+    return json.dumps(rows)
+
+
+def _time_ms(fn: Callable[[], object]) -> float:
+    fn()  # warm caches
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - start) * 1000 / ITERATIONS
+
+
+# =============================================================================
+# Benchmarks
+# =============================================================================
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("with_secret", [False, True])
+@pytest.mark.parametrize("include_pii", [False, True])
+def test_engine_vs_sequential(with_secret, include_pii):
+    text = _tool_output(with_secret)
+    assert redact_sensitive_strings(text, include_pii) == _legacy(text, include_pii)
+
+    legacy_ms = _time_ms(lambda: _legacy(text, include_pii))
+    engine_ms = _time_ms(lambda: redact_sensitive_strings(text, include_pii))
+    print(
+        f"\n  {len(text) // 1024}KB secret={with_secret} pii={include_pii}: "
+        f"sequential {legacy_ms:.1f}ms, engine {engine_ms:.1f}ms "
+        f"({legacy_ms / engine_ms:.1f}x)"
+    )
+    assert engine_ms < legacy_ms
+
+
+@pytest.mark.benchmark
+def test_streaming_throughput():
+    text = _tool_output(with_secret=True)
+    chunks = [text[i:i + 16] for i in range(0, len(text), 16)]
+
+    def run() -> str:
+        redactor = StreamingRedactor()
+        return "".join(redactor.feed(c) for c in chunks) + redactor.flush()
+
+    assert run() == _legacy(text, False)
+    stream_ms = _time_ms(run)
+    print(f"\n  streaming {len(chunks)} chunks: {stream_ms:.1f}ms")
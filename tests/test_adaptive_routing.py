@@ -0,0 +1,232 @@
+"""
+Tests for adaptive latency/cost-aware routing (lib/agent/adaptive_routing.py)
+and the trace replay harness (lib/agent/routing_simulation.py).
+"""
+
+import json
+from typing import Any, Iterator, List
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from lib.agent import adaptive_routing, circuit_breaker
+from lib.agent.adaptive_routing import AdaptiveRoutingPolicy, ModelStats, ModelStatsRegistry
+from lib.agent.llm_config import ModelTier, RoutingSLO, TierRoutingConfig
+from lib.agent.metrics_callbacks import CircuitBreakerCallbackHandler
+from lib.agent.model_router import ModelRouter, reset_model_router
+from lib.agent.routing_simulation import TraceRecord, compare, load_trace, main
+
+ROLE = "backend-architect-sabine"   # API tier: groq-llama-70b by default
+SLO = RoutingSLO(p95_seconds=10.0, min_success_rate=0.9)
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def stats(monkeypatch: pytest.MonkeyPatch, clock: FakeClock) -> ModelStatsRegistry:
+    fresh = ModelStatsRegistry(half_life_seconds=60, clock=clock)
+    monkeypatch.setattr(adaptive_routing, "_stats", fresh)
+    monkeypatch.setattr(adaptive_routing, "_policy", None)
+    monkeypatch.setattr(circuit_breaker, "_registry", circuit_breaker.CircuitBreakerRegistry())
+    return fresh
+
+
+@pytest.fixture
+def router(monkeypatch: pytest.MonkeyPatch, stats: ModelStatsRegistry) -> Iterator[ModelRouter]:
+    for key in ("ANTHROPIC_API_KEY", "GROQ_API_KEY", "TOGETHER_API_KEY"):
+        monkeypatch.setenv(key, "test")
+    config = TierRoutingConfig()
+    config.role_slo_map[ROLE] = SLO
+    monkeypatch.setattr(adaptive_routing, "_policy", AdaptiveRoutingPolicy(config=config))
+    reset_model_router()
+    yield ModelRouter(config)
+    reset_model_router()
+
+
+def _feed(stats: ModelStatsRegistry, model_id: str, latency: float, count: int = 10, ok: bool = True) -> None:
+    for _ in range(count):
+        stats.record(model_id, latency, ok=ok)
+
+
+# =============================================================================
+# Statistics
+# =============================================================================
+
+class TestModelStats:
+
+    def test_p95_and_success_rate(self, clock: FakeClock) -> None:
+        stats = ModelStats(half_life_seconds=60, clock=clock)
+        for _ in range(95):
+            stats.record(1.0)
+        for _ in range(5):
+            stats.record(20.0, ok=False)
+        health = stats.health()
+        assert 0.9 <= health.p95_seconds <= 1.25
+        assert health.success_rate == pytest.approx(0.95)
+
+    def test_old_calls_decay(self, clock: FakeClock) -> None:
+        stats = ModelStats(half_life_seconds=60, clock=clock)
+        for _ in range(20):
+            stats.record(30.0)
+        clock.now += 300                   # five half-lives
+        for _ in range(20):
+            stats.record(1.0)
+        health = stats.health()
+        assert health.p95_seconds < 2.0
+        assert health.samples == pytest.approx(20 + 20 / 32)
+
+        clock.now += 60
+        assert stats.health().samples == pytest.approx((20 + 20 / 32) / 2)
+
+    def test_expected_tokens(self, clock: FakeClock) -> None:
+        registry = ModelStatsRegistry(half_life_seconds=60, clock=clock)
+        assert registry.expected_tokens() == (3000.0, 500.0)
+        registry.record("a", 1.0, input_tokens=1000, output_tokens=100)
+        registry.record("b", 1.0, input_tokens=3000, output_tokens=300)
+        assert registry.expected_tokens() == pytest.approx((2000.0, 200.0))
+
+
+# =============================================================================
+# Policy
+# =============================================================================
+
+class TestAdaptiveRouting:
+
+    def test_no_data_matches_static_routing(self, router: ModelRouter) -> None:
+        decision = router.route(role=ROLE)
+        assert decision.model_config.model_id == "llama-3.3-70b-versatile"
+        assert "adaptive" not in decision.reason
+        assert router.route().model_config.model_id == "claude-sonnet-4-20250514"
+
+    def test_slow_cheap_model_routed_to_next_cheapest(self, router: ModelRouter, stats: ModelStatsRegistry) -> None:
+        _feed(stats, "llama-3.3-70b-versatile", 25.0)
+        decision = router.route(role=ROLE)
+        assert decision.model_config.model_id == "Qwen/Qwen2.5-72B-Instruct-Turbo"
+        assert "adaptive" in decision.reason
+
+    def test_escalates_tier_when_api_tier_misses_slo(self, router: ModelRouter, stats: ModelStatsRegistry) -> None:
+        _feed(stats, "llama-3.3-70b-versatile", 25.0)
+        _feed(stats, "Qwen/Qwen2.5-72B-Instruct-Turbo", 1.0, ok=False)
+        decision = router.route(role=ROLE)
+        assert decision.model_config.model_id == "claude-sonnet-4-20250514"
+        assert decision.tier == ModelTier.PREMIUM
+
+    def test_never_routes_below_static_tier(self, router: ModelRouter, stats: ModelStatsRegistry) -> None:
+        _feed(stats, "claude-sonnet-4-20250514", 60.0)
+        _feed(stats, "claude-opus-4-20250514", 60.0)
+        decision = router.route()
+        assert decision.model_config.model_id == "claude-sonnet-4-20250514"
+        assert "static choice kept" in decision.reason
+
+    def test_recovered_model_wins_back_traffic(
+        self, router: ModelRouter, stats: ModelStatsRegistry, clock: FakeClock,
+    ) -> None:
+        _feed(stats, "llama-3.3-70b-versatile", 25.0)
+        assert router.route(role=ROLE).model_config.provider.value == "together"
+        clock.now += 120                   # 10 samples decay to 2.5 < min_samples
+        assert router.route(role=ROLE).model_config.provider.value == "groq"
+
+    def test_unavailable_provider_skipped(self, router: ModelRouter, stats: ModelStatsRegistry, monkeypatch) -> None:
+        monkeypatch.delenv("TOGETHER_API_KEY")
+        router.clear_availability_cache()
+        _feed(stats, "llama-3.3-70b-versatile", 25.0)
+        assert router.route(role=ROLE).model_config.provider.value == "anthropic"
+
+    def test_explicit_preference_bypasses_policy(self, router: ModelRouter, stats: ModelStatsRegistry) -> None:
+        from lib.agent.models import RoleManifest
+
+        _feed(stats, "llama-3.3-70b-versatile", 25.0)
+        manifest = RoleManifest(
+            role_id=ROLE, title="Backend", instructions="", model_preference="groq-llama-70b",
+        )
+        decision = router.route(role=ROLE, role_manifest=manifest)
+        assert decision.model_config.model_id == "llama-3.3-70b-versatile"
+
+    def test_can_be_disabled(self, router: ModelRouter, stats: ModelStatsRegistry, monkeypatch) -> None:
+        monkeypatch.setattr(adaptive_routing, "ADAPTIVE_ROUTING_ENABLED", False)
+        _feed(stats, "llama-3.3-70b-versatile", 25.0)
+        assert router.route(role=ROLE).model_config.provider.value == "groq"
+
+
+def test_callback_feeds_model_stats(stats: ModelStatsRegistry) -> None:
+    handler = CircuitBreakerCallbackHandler("groq", model="llama-3.3-70b-versatile")
+    run_id = uuid4()
+    handler.on_chat_model_start({}, [], run_id=run_id)
+    message = AIMessage(content="ok", usage_metadata={"input_tokens": 1200, "output_tokens": 80, "total_tokens": 1280})
+    handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+
+    health = stats.health("llama-3.3-70b-versatile")
+    assert health.samples == 1
+    assert health.success_rate == 1.0
+    assert (health.avg_input_tokens, health.avg_output_tokens) == (1200, 80)
+
+
+# =============================================================================
+# Simulation
+# =============================================================================
+
+def _degradation_trace() -> List[TraceRecord]:
+    """Groq degrades to 25s between t=300 and t=700; Together and Sonnet stay steady."""
+    records = []
+    for tick in range(600):
+        t = tick * 2.0
+        groq_latency = 25.0 if 300 <= t < 700 else 2.0
+        records.append(TraceRecord(t, "groq-llama-70b", groq_latency, input_tokens=2000, output_tokens=300))
+        records.append(TraceRecord(t + 0.5, "together-qwen-72b", 4.0, input_tokens=2000, output_tokens=300))
+        records.append(TraceRecord(t + 1.0, "claude-sonnet", 6.0, input_tokens=2000, output_tokens=300))
+    return records
+
+
+class TestSimulation:
+
+    def test_adaptive_cuts_slo_violations_during_degradation(self) -> None:
+        results = compare(_degradation_trace(), role=ROLE, slo=SLO, half_life_seconds=60)
+        static, adaptive = results["static"], results["adaptive"]
+
+        assert static.model_mix == {"groq-llama-70b": static.requests}
+        assert adaptive.slo_violations < static.slo_violations / 5
+        assert adaptive.p95_latency_s <= SLO.p95_seconds
+        # Groq wins its traffic back after the incident; Claude is never needed
+        assert adaptive.model_mix["groq-llama-70b"] > adaptive.requests / 3
+        assert "claude-sonnet" not in adaptive.model_mix
+        assert adaptive.cost_usd < 2 * static.cost_usd
+
+    def test_load_trace_and_cli(self, tmp_path: Any, capsys: pytest.CaptureFixture) -> None:
+        path = tmp_path / "trace.jsonl"
+        lines = [
+            json.dumps({"t": r.t, "model": r.model, "latency_s": r.latency_s, "ok": r.ok})
+            for r in _degradation_trace()
+        ]
+        # Model ids are accepted as well as registry keys
+        lines.append(json.dumps({"t": 9999, "model": "llama-3.3-70b-versatile", "latency_s": 1.0}))
+        path.write_text("\n".join(lines) + "\n")
+
+        records = load_trace(str(path))
+        assert records[-1].model == "groq-llama-70b"
+
+        assert main([str(path), "--role", ROLE, "--slo-p95", "10", "--json"]) == 0
+        output = json.loads(capsys.readouterr().out)
+        assert output["adaptive"]["slo_violations"] < output["static"]["slo_violations"]
+
+    def test_bad_trace_reported(self, tmp_path: Any, capsys: pytest.CaptureFixture) -> None:
+        path = tmp_path / "trace.jsonl"
+        path.write_text('{"t": 1, "model": "no-such-model", "latency_s": 1}\n')
+        assert main([str(path)]) == 1
+        assert "no-such-model" in capsys.readouterr().err
@@ -0,0 +1,168 @@
+"""
+Tests for the compiled agent cache (lib/agent/agent_cache.py), pooled LLM
+clients (lib/agent/model_router.py) and their use in
+create_react_agent_with_tools().
+"""
+
+from typing import Any, Iterator, List
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
+from langchain_core.tools import StructuredTool
+
+from lib.agent import agent_cache, circuit_breaker, model_router, providers
+from lib.agent.agent_cache import CompiledAgentCache, agent_cache_key, tool_fingerprint
+from lib.agent.core import create_react_agent_with_tools
+from lib.agent.llm_config import get_model_config
+from lib.agent.metrics_callbacks import CircuitBreakerCallbackHandler
+
+
+# =============================================================================
+# Fakes
+# =============================================================================
+
+SYSTEM_PROMPTS: List[str] = []
+
+
+class RecordingChat(GenericFakeChatModel):
+    """Fake chat model that records the system prompt of each call."""
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Runnable:
+        return self
+
+    async def _agenerate(self, messages: List[BaseMessage], *args: Any, **kwargs: Any) -> Any:
+        SYSTEM_PROMPTS.append(messages[0].content)
+        return await super()._agenerate(messages, *args, **kwargs)
+
+
+class FakeProvider:
+    def __init__(self) -> None:
+        self.created = 0
+
+    def create_llm(self, **_: Any) -> RecordingChat:
+        self.created += 1
+        return RecordingChat(messages=iter([AIMessage(content="ok")] * 20))
+
+
+def _tool(name: str, description: str = "Look something up.") -> StructuredTool:
+    async def run(query: str) -> str:
+        return query
+    return StructuredTool.from_function(coroutine=run, name=name, description=description)
+
+
+@pytest.fixture
+def provider(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeProvider]:
+    fake = FakeProvider()
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setattr(providers, "get_provider", lambda _: fake)
+    monkeypatch.setattr(model_router, "_llm_pool", {})
+    monkeypatch.setattr(agent_cache, "_cache", CompiledAgentCache())
+    monkeypatch.setattr(circuit_breaker, "_registry", circuit_breaker.CircuitBreakerRegistry())
+    model_router.reset_model_router()
+    yield fake
+    model_router.reset_model_router()
+
+
+async def _create(tools: List[StructuredTool], static: str = "STATIC", dynamic: str = "", user: str = "u1") -> Any:
+    return await create_react_agent_with_tools(
+        tools=tools,
+        system_prompt=static,
+        user_id=user,
+        session_id="s1",
+        dynamic_prompt=dynamic,
+    )
+
+
+# =============================================================================
+# Keys
+# =============================================================================
+
+class TestKeys:
+
+    def test_fingerprint_ignores_order_and_identity(self) -> None:
+        a, b = _tool("a"), _tool("b")
+        assert tool_fingerprint([a, b], "u") == tool_fingerprint([_tool("b"), _tool("a")], "u")
+
+    def test_fingerprint_changes_with_tools_and_user(self) -> None:
+        base = tool_fingerprint([_tool("a")], "u")
+        assert base != tool_fingerprint([_tool("a", "Other description.")], "u")
+        assert base != tool_fingerprint([_tool("a")], "other-user")
+
+    def test_key_covers_models_role_and_prompt(self) -> None:
+        tools = [_tool("a")]
+        key = agent_cache_key(["m1"], None, tools, "prompt")
+        assert key == agent_cache_key(["m1"], None, tools, "prompt")
+        assert key != agent_cache_key(["m1", "m2"], None, tools, "prompt")
+        assert key != agent_cache_key(["m1"], "role", tools, "prompt")
+        assert key != agent_cache_key(["m1"], None, tools, "prompt 2")
+
+
+class TestCompiledAgentCache:
+
+    def test_ttl_and_lru(self) -> None:
+        now = [0.0]
+        cache = CompiledAgentCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+        cache.put(("a",), "A")
+        cache.put(("b",), "B")
+        assert cache.get(("a",)) == "A"
+        cache.put(("c",), "C")             # evicts ("b",)
+        assert cache.get(("b",)) is None
+        now[0] = 11
+        assert cache.get(("a",)) is None
+        assert cache.stats()["evictions"] == 1
+
+
+# =============================================================================
+# Agent creation
+# =============================================================================
+
+class TestCreateReactAgentCaching:
+
+    @pytest.mark.asyncio
+    async def test_second_turn_reuses_agent_and_client(self, provider: FakeProvider) -> None:
+        tools = [_tool("lookup")]
+        _, first = await _create(tools)
+        _, second = await _create([_tool("lookup")])
+        assert first["_agent_cache"]["hit"] is False
+        assert second["_agent_cache"]["hit"] is True
+        assert provider.created == 1
+        assert agent_cache.get_agent_cache().stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_dynamic_context_injected_per_turn(self, provider: FakeProvider) -> None:
+        tools = [_tool("lookup")]
+        monday, _ = await _create(tools, dynamic="\nToday is Monday")
+        tuesday, meta = await _create(tools, dynamic="\nToday is Tuesday")
+        assert meta["_agent_cache"]["hit"] is True
+
+        await monday.ainvoke({"messages": [HumanMessage(content="hi")]})
+        await tuesday.ainvoke({"messages": [HumanMessage(content="hi")]})
+        prompts = SYSTEM_PROMPTS[-2:]
+        assert prompts == ["STATIC\nToday is Monday", "STATIC\nToday is Tuesday"]
+
+    @pytest.mark.asyncio
+    async def test_changes_that_need_a_new_agent(self, provider: FakeProvider) -> None:
+        await _create([_tool("lookup")])
+        for kwargs in ({"static": "OTHER"}, {"user": "u2"}):
+            _, meta = await _create([_tool("lookup")], **kwargs)
+            assert meta["_agent_cache"]["hit"] is False
+        _, meta = await _create([_tool("lookup"), _tool("write")])
+        assert meta["_agent_cache"]["hit"] is False
+        assert provider.created == 1   # still one pooled client
+
+    @pytest.mark.asyncio
+    async def test_cache_can_be_disabled(self, provider: FakeProvider, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(agent_cache, "AGENT_CACHE_ENABLED", False)
+        await _create([_tool("lookup")])
+        _, meta = await _create([_tool("lookup")])
+        assert meta["_agent_cache"]["hit"] is False
+
+
+def test_pooled_llm_attaches_breaker_once(provider: FakeProvider) -> None:
+    config = get_model_config("claude-sonnet")
+    first = model_router.get_pooled_llm(config)
+    assert model_router.get_pooled_llm(config) is first
+    assert sum(isinstance(cb, CircuitBreakerCallbackHandler) for cb in first.callbacks) == 1
+    assert model_router.get_pooled_llm(config, temperature=0.0) is not first
@@ -0,0 +1,299 @@
+"""
+Tests for the Buffered Audit Log Writer
+=======================================
+
+Run with: pytest tests/test_audit_writer.py -v
+
+Tests cover:
+1. Multi-row inserts in batch_size chunks
+2. Size-threshold flush from the background thread
+3. Spill file on DB failure, replayed after recovery
+4. Backpressure: overflow beyond the queue capacity is spilled
+5. close() drains the queue (flush-on-shutdown)
+6. log_tool_executions_batch queues one row per result
+7. Duplicate ids are ignored; rejected rows are bisected out and
+   dead-lettered instead of re-spilled
+"""
+
+import os
+import sys
+import time
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from postgrest.exceptions import APIError
+
+from backend.services import audit_logging
+from backend.services.audit_logging import AuditLogSink
+
+
+# =============================================================================
+# Fakes
+# =============================================================================
+
+class FakeSupabase:
+    """
+    Records each INSERT / upsert; ``fail`` makes execute() raise a
+    connection error, and rows whose id is in ``reject`` fail their whole
+    statement with a check violation.
+    """
+
+    def __init__(self) -> None:
+        self.inserts: List[List[Dict[str, Any]]] = []
+        self.fail = False
+        self.reject: set = set()
+        self.calls = 0
+
+    def table(self, name: str) -> "FakeSupabase":
+        assert name == "tool_audit_log"
+        return self
+
+    def insert(self, rows: Any) -> MagicMock:
+        query = MagicMock()
+
+        def _execute() -> MagicMock:
+            if self.fail:
+                raise ConnectionError("database unavailable")
+            batch = rows if isinstance(rows, list) else [rows]
+            self.inserts.append(batch)
+            return MagicMock(data=batch)
+
+        query.execute.side_effect = _execute
+        return query
+
+    def upsert(self, rows: List[Dict[str, Any]], on_conflict: str = "", ignore_duplicates: bool = False) -> MagicMock:
+        assert on_conflict == "id" and ignore_duplicates
+        query = MagicMock()
+
+        def _execute() -> MagicMock:
+            self.calls += 1
+            if self.fail:
+                raise ConnectionError("database unavailable")
+            if any(row["id"] in self.reject for row in rows):
+                raise APIError({"code": "23514", "message": "check violation", "details": None, "hint": None})
+            seen = {row["id"] for row in self.rows}
+            batch = [row for row in rows if row["id"] not in seen]
+            self.inserts.append(batch)
+            return MagicMock(data=batch)
+
+        query.execute.side_effect = _execute
+        return query
+
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        return [row for batch in self.inserts for row in batch]
+
+
+def _rows(n: int, start: int = 0) -> List[Dict[str, Any]]:
+    return [{"id": f"row-{i}", "tool_name": "t", "status": "success"} for i in range(start, start + n)]
+
+
+@pytest.fixture
+def db() -> FakeSupabase:
+    return FakeSupabase()
+
+
+@pytest.fixture
+def make_sink(db, tmp_path):
+    sinks: List[AuditLogSink] = []
+
+    def _make(**kwargs: Any) -> AuditLogSink:
+        params = dict(
+            client_factory=lambda: db,
+            max_queue=100,
+            batch_size=10,
+            flush_interval=60.0,
+            spill_path=str(tmp_path / "spill.jsonl"),
+        )
+        params.update(kwargs)
+        sink = AuditLogSink(**params)
+        sinks.append(sink)
+        return sink
+
+    yield _make
+    db.fail = False
+    for sink in sinks:
+        sink.close(timeout=1)
+
+
+# =============================================================================
+# AuditLogSink
+# =============================================================================
+
+class TestAuditLogSink:
+    def test_flush_writes_multi_row_batches(self, db, make_sink):
+        sink = make_sink(batch_size=10)
+        sink.enqueue(_rows(25))
+        sink.flush()
+
+        assert [len(b) for b in db.inserts] == [10, 10, 5]
+        assert sink.stats()["flushed"] == 25
+        assert sink.stats()["queue_depth"] == 0
+
+    def test_background_thread_flushes_at_batch_size(self, db, make_sink):
+        sink = make_sink(batch_size=5)
+        sink.enqueue(_rows(5))
+
+        deadline = time.time() + 2
+        while len(db.rows) < 5 and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert len(db.rows) == 5
+        assert sink.stats()["running"] is True
+
+    def test_failed_flush_spills_and_replays_on_recovery(self, db, make_sink):
+        sink = make_sink()
+        db.fail = True
+        sink.enqueue(_rows(3))
+        sink.flush()
+
+        assert db.rows == []
+        assert os.path.exists(sink.spill_path)
+        assert sink.stats()["flush_failures"] == 1
+        assert sink.stats()["spilled"] == 3
+
+        db.fail = False
+        sink.enqueue(_rows(2, start=3))
+        sink.flush()
+
+        assert sorted(r["id"] for r in db.rows) == [f"row-{i}" for i in range(5)]
+        assert not os.path.exists(sink.spill_path)
+        assert sink.stats()["replayed"] == 3
+
+    def test_replay_keeps_rows_while_db_is_down(self, db, make_sink):
+        sink = make_sink()
+        sink._spill(_rows(4))
+        db.fail = True
+
+        assert sink.replay_spill() == 0
+        assert os.path.exists(sink.spill_path)
+
+        db.fail = False
+        assert sink.replay_spill() == 4
+        assert len(db.rows) == 4
+
+    def test_overflow_is_spilled_not_dropped(self, db, make_sink):
+        sink = make_sink(max_queue=5, batch_size=100)
+        accepted = sink.enqueue(_rows(8))
+
+        stats = sink.stats()
+        assert accepted == 8
+        assert stats["queue_depth"] == 5
+        assert stats["overflowed"] == 3
+        assert stats["high_watermark"] == 5
+
+        sink.flush()
+        assert len(db.rows) == 8
+
+    def test_close_drains_queue(self, db, make_sink):
+        sink = make_sink(batch_size=50, flush_interval=60.0)
+        sink.enqueue(_rows(7))
+        sink.close(timeout=2)
+
+        assert len(db.rows) == 7
+        assert sink.stats()["running"] is False
+
+    def test_duplicate_ids_are_ignored(self, db, make_sink):
+        sink = make_sink()
+        sink.enqueue(_rows(3))
+        sink.flush()
+        sink.enqueue(_rows(4))  # re-sent after an ambiguous timeout
+        sink.flush()
+
+        assert sorted(r["id"] for r in db.rows) == [f"row-{i}" for i in range(4)]
+        assert not os.path.exists(sink.spill_path)
+
+    def test_rejected_row_is_dead_lettered(self, db, make_sink):
+        sink = make_sink(batch_size=8)
+        db.reject = {"row-5"}
+        sink.enqueue(_rows(8))
+
+        assert sink.flush() == 7
+
+        assert sorted(r["id"] for r in db.rows) == [f"row-{i}" for i in range(8) if i != 5]
+        assert not os.path.exists(sink.spill_path)
+        assert sink.stats()["dead_lettered"] == 1
+        with open(sink.dead_letter_path, encoding="utf-8") as f:
+            assert '"row-5"' in f.read()
+        # log2(8) bisection levels, not one insert per row
+        assert db.calls <= 7
+
+    def test_rejected_row_in_spill_is_not_replayed_forever(self, db, make_sink):
+        sink = make_sink()
+        sink._spill(_rows(3))
+        db.reject = {"row-1"}
+
+        assert sink.replay_spill() == 2
+        assert not os.path.exists(sink.spill_path)
+        assert sink.replay_spill() == 0
+
+    def test_no_client_spills(self, tmp_path):
+        sink = AuditLogSink(
+            client_factory=lambda: None,
+            spill_path=str(tmp_path / "spill.jsonl"),
+        )
+        sink.enqueue(_rows(2))
+        sink.close(timeout=1)
+
+        assert sink.stats()["spilled"] == 2
+
+
+# =============================================================================
+# Module entry points
+# =============================================================================
+
+class TestBatchLogging:
+    @pytest.mark.asyncio
+    async def test_batch_queues_results_only(self, db, make_sink):
+        sink = make_sink()
+        executions = [
+            {"type": "tool_call", "tool_name": "github_issues"},
+            {"type": "tool_result", "tool_name": "github_issues", "status": "success"},
+            {"type": "tool_result", "tool_name": "run_python_sandbox", "status": "error", "error": "timeout"},
+        ]
+
+        with patch.object(audit_logging, "get_supabase_client", return_value=db), \
+             patch.object(audit_logging, "get_audit_sink", return_value=sink), \
+             patch.object(audit_logging, "AUDIT_LOG_BUFFERED", True):
+            count = await audit_logging.log_tool_executions_batch(executions, user_id="u1")
+
+        assert count == 2
+        assert db.rows == []  # nothing written on the caller's path
+        sink.flush()
+        assert len(db.inserts) == 1
+        assert [r["tool_name"] for r in db.rows] == ["github_issues", "run_python_sandbox"]
+        assert db.rows[1]["error_type"] == "timeout"
+
+    @pytest.mark.asyncio
+    async def test_unbuffered_batch_is_one_insert(self, db):
+        executions = [
+            {"tool_name": "a", "status": "success"},
+            {"tool_name": "b", "status": "success"},
+        ]
+        with patch.object(audit_logging, "get_supabase_client", return_value=db), \
+             patch.object(audit_logging, "AUDIT_LOG_BUFFERED", False):
+            count = await audit_logging.log_tool_executions_batch(executions)
+
+        assert count == 2
+        assert len(db.inserts) == 1
+
+    @pytest.mark.asyncio
+    async def test_single_execution_returns_id_immediately(self, db, make_sink):
+        sink = make_sink()
+        with patch.object(audit_logging, "get_supabase_client", return_value=db), \
+             patch.object(audit_logging, "get_audit_sink", return_value=sink), \
+             patch.object(audit_logging, "AUDIT_LOG_BUFFERED", True):
+            audit_id = await audit_logging.log_tool_execution(
+                tool_name="github_issues",
+                input_params={"token": "token=abc123"},
+            )
+
+        assert audit_id is not None
+        assert sink.stats()["queue_depth"] == 1
+        sink.flush()
+        assert db.rows[0]["id"] == str(audit_id)
+        assert "abc123" not in str(db.rows[0]["input_params"])
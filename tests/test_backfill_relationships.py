@@ -0,0 +1,253 @@
+"""
+Tests for backend.worker.backfill_relationships
+================================================
+
+Covers the keyset-paginated relationship backfill:
+- Shard id ranges cover the UUID space without overlap
+- The whole table is walked across multiple pages
+- The high-water mark is persisted and honoured on the next run
+- Only new or re-linked memories are re-extracted (not plain updates)
+- Dry runs never advance the high-water mark
+- Progress / cost fields in the result
+
+Supabase and Redis are replaced by in-memory fakes.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID
+
+import pytest
+
+from backend.worker import backfill_relationships as backfill
+from backend.worker.backfill_relationships import (
+    load_high_water_mark,
+    shard_id_range,
+)
+
+
+# =========================================================================
+# Fakes
+# =========================================================================
+
+class FakeRedis:
+    """Minimal in-memory Redis stub."""
+
+    def __init__(self) -> None:
+        self._store: Dict[str, str] = {}
+
+    def set(self, key: str, value: str) -> None:
+        self._store[key] = value
+
+    def get(self, key: str) -> Optional[str]:
+        return self._store.get(key)
+
+
+def _memory(n: int, links: int = 2) -> Dict[str, Any]:
+    return {
+        # Spread ids over the UUID space so id-range shards split them
+        "id": str(UUID(int=n * (1 << 125))),
+        "content": f"memory {n}",
+        "entity_links": [str(UUID(int=(n << 8) + k + 1)) for k in range(links)],
+        "metadata": {},
+        "created_at": f"2026-02-{n + 1:02d}T00:00:00+00:00",
+        "updated_at": f"2026-02-{n + 1:02d}T00:00:00+00:00",
+        "entity_links_updated_at": None,
+    }
+
+
+class FakeTable:
+    """Evaluates the backfill's keyset queries over a Python list."""
+
+    def __init__(self, memories: List[Dict[str, Any]]) -> None:
+        self.memories = memories
+        self.page_calls = 0
+
+    def _visible(
+        self,
+        id_range: Tuple[Optional[str], Optional[str]],
+        cursor: Optional[Dict[str, Any]],
+        column: str,
+    ) -> List[Dict[str, Any]]:
+        lower, upper = id_range
+        rows = sorted(
+            (m for m in self.memories if m[column] is not None),
+            key=lambda m: (m[column], m["id"]),
+        )
+        return [
+            m for m in rows
+            if (lower is None or m["id"] >= lower)
+            and (upper is None or m["id"] < upper)
+            and (cursor is None or (m[column], m["id"]) > (cursor[column], cursor["id"]))
+        ]
+
+    def fetch_page(self, client, id_range, cursor, page_size, column="created_at"):
+        self.page_calls += 1
+        return self._visible(id_range, cursor, column)[:page_size]
+
+    def count_remaining(self, client, id_range, cursor, column="created_at"):
+        return len(self._visible(id_range, cursor, column))
+
+
+async def _fake_lookup(client: Any, entity_ids: List[str]) -> List[Dict[str, Any]]:
+    return [{"id": eid, "name": f"Entity {eid[-4:]}", "type": "person"} for eid in entity_ids]
+
+
+def _run(table: FakeTable, redis: FakeRedis, **kwargs: Any) -> Tuple[Dict[str, Any], MagicMock]:
+    extract = MagicMock(return_value=[{"subject": "a", "predicate": "knows", "object": "b"}])
+    store = AsyncMock(return_value={"stored": 1, "skipped": 0, "errors": []})
+    with patch.object(backfill, "_fetch_page", table.fetch_page), \
+         patch.object(backfill, "_count_remaining", table.count_remaining), \
+         patch.object(backfill, "_lookup_entities", _fake_lookup), \
+         patch("backend.services.wal.get_supabase_client", return_value=MagicMock()), \
+         patch("backend.services.redis_client.get_redis_client", return_value=redis), \
+         patch("backend.worker.slow_path.extract_relationships", extract), \
+         patch("backend.magma.store.store_relationships", store):
+        result = backfill.backfill_entity_relationships(**kwargs)
+    return result, extract
+
+
+# =========================================================================
+# Tests
+# =========================================================================
+
+class TestShardIdRange:
+
+    def test_single_shard_is_unbounded(self) -> None:
+        assert shard_id_range(0, 1) == (None, None)
+
+    def test_shards_are_contiguous(self) -> None:
+        ranges = [shard_id_range(i, 4) for i in range(4)]
+        assert ranges[0][0] is None
+        assert ranges[-1][1] is None
+        for (_, upper), (lower, _) in zip(ranges, ranges[1:]):
+            assert upper == lower
+
+    def test_invalid_shard_raises(self) -> None:
+        with pytest.raises(ValueError):
+            shard_id_range(4, 4)
+
+
+class TestKeysetBackfill:
+
+    def test_walks_whole_table_across_pages(self) -> None:
+        table = FakeTable([_memory(n) for n in range(7)])
+        result, extract = _run(table, FakeRedis(), batch_size=3)
+
+        assert result["total_memories"] == 7
+        assert extract.call_count == 7
+        assert result["relationships_stored"] == 7
+        # 3 created_at pages + 1 empty re-link page
+        assert table.page_calls == 4
+        assert result["remaining_memories"] == 0
+
+    def test_second_run_only_sees_new_memories(self) -> None:
+        redis = FakeRedis()
+        table = FakeTable([_memory(n) for n in range(5)])
+        _run(table, redis, batch_size=2)
+
+        table.memories.append(_memory(7))
+        result, extract = _run(table, redis, batch_size=2)
+
+        assert result["total_memories"] == 1
+        assert extract.call_count == 1
+        assert result["high_water_mark"]["created_at"]["id"] == _memory(7)["id"]
+
+    def test_plain_updates_are_not_re_extracted(self) -> None:
+        redis = FakeRedis()
+        table = FakeTable([_memory(n) for n in range(4)])
+        _run(table, redis)
+
+        # Nightly salience rewrite bumps updated_at only
+        for memory in table.memories:
+            memory["updated_at"] = "2026-03-01T00:00:00+00:00"
+        result, extract = _run(table, redis)
+
+        assert result["total_memories"] == 0
+        assert extract.call_count == 0
+
+    def test_relinked_memories_are_re_extracted_once(self) -> None:
+        redis = FakeRedis()
+        table = FakeTable([_memory(n) for n in range(4)])
+        _run(table, redis)
+
+        table.memories[1]["entity_links_updated_at"] = "2026-03-01T00:00:00+00:00"
+        first, extract = _run(table, redis)
+        second, _ = _run(table, redis)
+
+        assert first["processed"] == 1
+        assert extract.call_args.kwargs["source_wal_id"] == table.memories[1]["id"]
+        assert second["processed"] == 0
+
+    def test_new_relinked_memory_is_extracted_by_created_pass_only(self) -> None:
+        redis = FakeRedis()
+        table = FakeTable([_memory(n) for n in range(2)])
+        _run(table, redis)
+
+        fresh = _memory(5)
+        fresh["entity_links_updated_at"] = "2026-03-01T00:00:00+00:00"
+        table.memories.append(fresh)
+        result, extract = _run(table, redis)
+
+        assert extract.call_count == 1
+        assert result["high_water_mark"]["entity_links_updated_at"]["id"] == fresh["id"]
+    def test_full_rescan_ignores_high_water_mark(self) -> None:
+        redis = FakeRedis()
+        table = FakeTable([_memory(n) for n in range(4)])
+        _run(table, redis)
+
+        result, _ = _run(table, redis, full_rescan=True)
+        assert result["total_memories"] == 4
+
+    def test_dry_run_does_not_advance_mark(self) -> None:
+        redis = FakeRedis()
+        table = FakeTable([_memory(n) for n in range(3)])
+        _run(table, redis, dry_run=True)
+
+        assert load_high_water_mark(redis_client=redis) is None
+
+    def test_max_memories_caps_run_and_resumes(self) -> None:
+        redis = FakeRedis()
+        table = FakeTable([_memory(n) for n in range(6)])
+
+        first, _ = _run(table, redis, batch_size=10, max_memories=4)
+        second, _ = _run(table, redis, batch_size=10)
+
+        assert first["total_memories"] == 4
+        assert first["remaining_memories"] == 2
+        assert first["estimated_remaining_cost"] > 0
+        assert second["total_memories"] == 2
+
+    def test_shards_partition_memories(self) -> None:
+        redis = FakeRedis()
+        table = FakeTable([_memory(n) for n in range(8)])
+
+        totals = [
+            _run(table, redis, shard_index=i, shard_count=2)[0]["total_memories"]
+            for i in range(2)
+        ]
+
+        assert totals == [4, 4]
+
+    def test_memories_with_one_entity_skip_haiku(self) -> None:
+        table = FakeTable([_memory(0, links=1), _memory(1, links=3)])
+        result, extract = _run(table, FakeRedis())
+
+        assert result["processed"] == 2
+        assert result["haiku_calls"] == 1
+        assert extract.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_entity_lookup_is_chunked(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(backfill, "_ENTITY_LOOKUP_CHUNK", 2)
+    client = MagicMock()
+    query = client.table.return_value.select.return_value.in_
+    query.return_value.execute.side_effect = lambda: MagicMock(
+        data=[{"id": eid} for eid in query.call_args.args[1]]
+    )
+
+    entities = await backfill._lookup_entities(client, ["a", "b", "c"])
+
+    assert [c.args[1] for c in query.call_args_list] == [["a", "b"], ["c"]]
+    assert [e["id"] for e in entities] == ["a", "b", "c"]
@@ -0,0 +1,288 @@
+"""
+Tests for provider circuit breakers (lib/agent/circuit_breaker.py) and
+runtime model failover (lib/agent/model_router.py).
+"""
+
+from typing import Any, Iterator, List
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import Runnable
+
+from lib.agent import circuit_breaker
+from lib.agent.circuit_breaker import (
+    BreakerConfig,
+    BreakerState,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    is_provider_failure,
+)
+from lib.agent.llm_config import ModelProvider, ModelTier
+from lib.agent.metrics_callbacks import CircuitBreakerCallbackHandler
+from lib.agent.model_router import (
+    FailoverChatModel,
+    ModelRouter,
+    execute_with_fallback,
+    reset_model_router,
+)
+
+
+# =============================================================================
+# Fakes
+# =============================================================================
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Overloaded(Exception):
+    status_code = 529
+
+
+class FakeChat(GenericFakeChatModel):
+    """Fake chat model that can bind tools and counts its calls."""
+
+    calls: int = 0
+    fail_with: Any = None
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Runnable:
+        return self
+
+    async def _agenerate(self, *args: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        if self.fail_with is not None:
+            raise self.fail_with
+        return await super()._agenerate(*args, **kwargs)
+
+
+def _chat(provider: str, reply: str = "ok", fail_with: Any = None) -> FakeChat:
+    return FakeChat(
+        messages=iter([AIMessage(content=reply)] * 10),
+        fail_with=fail_with,
+        callbacks=[CircuitBreakerCallbackHandler(provider)],
+    )
+
+
+CONFIG = BreakerConfig(
+    window_seconds=60,
+    min_calls=4,
+    error_rate_threshold=0.5,
+    slow_call_seconds=10,
+    slow_call_rate_threshold=0.75,
+    open_seconds=30,
+    half_open_probes=1,
+)
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> CircuitBreakerRegistry:
+    fresh = CircuitBreakerRegistry(config=CONFIG)
+    monkeypatch.setattr(circuit_breaker, "_registry", fresh)
+    return fresh
+
+
+def _trip(registry: CircuitBreakerRegistry, provider: str) -> None:
+    for _ in range(CONFIG.min_calls):
+        registry.record(provider, 0.1, error=Overloaded("overloaded"))
+
+
+# =============================================================================
+# Breaker state machine
+# =============================================================================
+
+class TestCircuitBreaker:
+
+    def test_opens_on_error_rate(self) -> None:
+        breaker = CircuitBreaker("anthropic", CONFIG, clock=FakeClock())
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_success()
+        assert breaker.state == BreakerState.CLOSED
+        breaker.record_failure()          # 2/4 failed
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow_request()
+
+    def test_opens_on_slow_calls(self) -> None:
+        breaker = CircuitBreaker("groq", CONFIG, clock=FakeClock())
+        for _ in range(4):
+            breaker.record_success(latency_seconds=12)
+        assert breaker.state == BreakerState.OPEN
+
+    def test_old_calls_leave_the_window(self) -> None:
+        clock = FakeClock()
+        breaker = CircuitBreaker("anthropic", CONFIG, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 61
+        breaker.record_failure()
+        assert breaker.state == BreakerState.CLOSED
+
+    def test_half_open_probe_closes(self) -> None:
+        clock = FakeClock()
+        breaker = CircuitBreaker("anthropic", CONFIG, clock=clock)
+        for _ in range(4):
+            breaker.record_failure()
+        clock.now += 31
+        assert breaker.state == BreakerState.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()   # only one probe in flight
+        breaker.record_success()
+        assert breaker.state == BreakerState.CLOSED
+
+    def test_failed_probe_reopens(self) -> None:
+        clock = FakeClock()
+        breaker = CircuitBreaker("anthropic", CONFIG, clock=clock)
+        for _ in range(4):
+            breaker.record_failure()
+        clock.now += 31
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == BreakerState.OPEN
+        assert breaker.times_opened == 2
+
+    def test_state_changes_publish_gauge(self) -> None:
+        from backend.services.metrics import LLM_CIRCUIT_STATE
+
+        def published() -> List[str]:
+            return [s.value for s in BreakerState if LLM_CIRCUIT_STATE.value(provider="gauge-test", state=s.value)]
+
+        clock = FakeClock()
+        breaker = CircuitBreaker("gauge-test", CONFIG, clock=clock)
+        assert published() == ["closed"]
+        for _ in range(4):
+            breaker.record_failure()
+        assert published() == ["open"]
+        clock.now += 31
+        assert breaker.allow_request()
+        assert published() == ["half_open"]
+        breaker.record_success()
+        assert published() == ["closed"]
+
+    def test_error_classification(self) -> None:
+        assert is_provider_failure(Overloaded("x"))
+        assert is_provider_failure(TimeoutError())
+        assert is_provider_failure(RuntimeError("Error code: 529 - overloaded_error"))
+        assert not is_provider_failure(ValueError("invalid tool schema"))
+
+    def test_client_errors_do_not_trip(self, registry: CircuitBreakerRegistry) -> None:
+        for _ in range(10):
+            registry.record("anthropic", 0.1, error=ValueError("invalid request"))
+        assert registry.is_available("anthropic")
+
+
+# =============================================================================
+# Routing
+# =============================================================================
+
+class TestRouterHealth:
+
+    @pytest.fixture(autouse=True)
+    def keys(self, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("GROQ_API_KEY", "test")
+        reset_model_router()   # drop provider availability cached without keys
+        yield
+        reset_model_router()
+
+    def test_open_provider_routed_around(self, registry: CircuitBreakerRegistry) -> None:
+        router = ModelRouter()
+        assert router.route().model_config.provider == ModelProvider.ANTHROPIC
+
+        _trip(registry, "anthropic")
+        decision = router.route()
+        assert decision.model_config.provider == ModelProvider.GROQ
+        assert "failover" in decision.reason
+        # Unhealthy provider sorted to the end of the chain
+        assert decision.fallback_chain[-1] == "claude-sonnet"
+
+    def test_premium_chain_degrades_to_api_tier(self, registry: CircuitBreakerRegistry) -> None:
+        decision = ModelRouter().route()
+        assert decision.tier == ModelTier.PREMIUM
+        assert decision.fallback_chain == ["claude-sonnet", "groq-llama-70b"]
+
+    def test_build_failover_llm_chains_providers(self, registry: CircuitBreakerRegistry) -> None:
+        from lib.agent.model_router import build_failover_llm
+
+        llm = build_failover_llm(ModelRouter().route())
+        assert llm.providers == ["anthropic", "groq"]
+        assert all(
+            any(isinstance(cb, CircuitBreakerCallbackHandler) for cb in model.callbacks)
+            for model in [llm.runnable, *llm.fallbacks]
+        )
+
+
+# =============================================================================
+# Failover model
+# =============================================================================
+
+class TestFailoverChatModel:
+
+    @pytest.mark.asyncio
+    async def test_fails_over_and_records_outcomes(self, registry: CircuitBreakerRegistry) -> None:
+        primary = _chat("anthropic", fail_with=Overloaded("overloaded"))
+        backup = _chat("groq", reply="from groq")
+        model = FailoverChatModel(runnable=primary, fallbacks=[backup], providers=["anthropic", "groq"])
+
+        for _ in range(CONFIG.min_calls):
+            result = await model.ainvoke([HumanMessage(content="hi")])
+            assert result.content == "from groq"
+        assert registry.get("anthropic").state == BreakerState.OPEN
+
+        # Open breaker: the primary is no longer tried at all
+        await model.ainvoke([HumanMessage(content="hi")])
+        assert primary.calls == CONFIG.min_calls
+        assert backup.calls == CONFIG.min_calls + 1
+
+    @pytest.mark.asyncio
+    async def test_all_open_fails_fast(self, registry: CircuitBreakerRegistry) -> None:
+        _trip(registry, "anthropic")
+        primary = _chat("anthropic")
+        model = FailoverChatModel(runnable=primary, fallbacks=[], providers=["anthropic"])
+        with pytest.raises(CircuitOpenError):
+            await model.ainvoke([HumanMessage(content="hi")])
+        assert primary.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_works_inside_react_agent(self, registry: CircuitBreakerRegistry) -> None:
+        from langchain_core.tools import tool
+        from langgraph.prebuilt import create_react_agent
+
+        @tool
+        def echo(text: str) -> str:
+            """Echo text."""
+            return text
+
+        primary = _chat("anthropic", fail_with=TimeoutError("read timed out"))
+        backup = _chat("groq", reply="answer")
+        model = FailoverChatModel(runnable=primary, fallbacks=[backup], providers=["anthropic", "groq"])
+        agent = create_react_agent(model, [echo])
+        result = await agent.ainvoke({"messages": [HumanMessage(content="hi")]})
+        assert result["messages"][-1].content == "answer"
+
+
+@pytest.mark.asyncio
+async def test_execute_with_fallback_skips_open_provider(registry: CircuitBreakerRegistry) -> None:
+    from lib.agent.model_router import RoutingDecision
+    from lib.agent.llm_config import get_model_config
+
+    _trip(registry, "anthropic")
+    tried: List[str] = []
+
+    async def execute(config: Any) -> str:
+        tried.append(config.model_id)
+        return config.model_id
+
+    decision = RoutingDecision(
+        model_config=get_model_config("claude-sonnet"),
+        tier=ModelTier.PREMIUM,
+        reason="test",
+        fallback_chain=["claude-sonnet", "groq-llama-70b"],
+    )
+    result = await execute_with_fallback(execute, decision)
+    assert tried == [result] == ["llama-3.3-70b-versatile"]
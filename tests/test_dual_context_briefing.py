@@ -339,7 +339,7 @@ class TestEdgeCases:
         mock_llm = AsyncMock()
         mock_llm.ainvoke.side_effect = Exception("API Error")
         
-        with patch("lib.agent.scheduler.ChatAnthropic", return_value=mock_llm):
+        with patch("langchain_anthropic.ChatAnthropic", return_value=mock_llm):
             with patch("lib.agent.scheduler.ANTHROPIC_API_KEY", "fake-key"):
                 result = await synthesize_briefing(long_context, "Ryan")
         
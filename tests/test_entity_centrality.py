@@ -0,0 +1,165 @@
+"""
+Tests for Entity Centrality
+============================
+
+Unit tests for the materialized entity degree table readers
+(``backend/services/entity_centrality.py``), the degree-based causal
+centrality in ``backend/services/salience.py`` and its use by the nightly
+salience job.  Supabase is mocked.
+
+Run with: pytest tests/test_entity_centrality.py -v
+"""
+
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from backend.services import entity_centrality
+from backend.services.entity_centrality import (
+    check_consistency,
+    load_memory_degrees,
+    main,
+)
+from backend.services.salience import centrality_from_degree, compute_causal_centrality
+
+
+def _degree_rpc(client: MagicMock, degrees: Dict[str, int], drift: List[Dict[str, Any]] = ()) -> List[Dict[str, Any]]:
+    """Answer memory_entity_degrees / entity_centrality_drift; record the calls."""
+    calls: List[Dict[str, Any]] = []
+
+    def _rpc(name, params):
+        calls.append({"name": name, **params})
+        query = MagicMock()
+        if name == "memory_entity_degrees":
+            data = [{"memory_id": m, "degree": degrees[m]} for m in params["p_memory_ids"] if m in degrees]
+        elif name == "entity_centrality_drift":
+            data = list(drift)
+        else:
+            data = [{"entities": 3, "removed": 1}]
+        query.execute.return_value = MagicMock(data=data)
+        return query
+
+    client.rpc.side_effect = _rpc
+    return calls
+
+
+@pytest.fixture
+def counting_client():
+    """Client behind compute_causal_centrality's on-the-fly COUNT path."""
+    with patch("backend.services.wal.get_supabase_client") as mock:
+        client = MagicMock()
+        mock.return_value = client
+        yield client
+
+
+# =============================================================================
+# Test: degree -> centrality
+# =============================================================================
+
+class TestCentralityFromDegree:
+
+    @pytest.mark.parametrize("degree, expected", [(0, 0.1), (1, 0.1), (5, 0.5), (10, 1.0), (25, 1.0)])
+    def test_normalisation(self, degree: int, expected: float) -> None:
+        assert centrality_from_degree(degree) == expected
+
+    def test_precomputed_degree_skips_queries(self, counting_client) -> None:
+        assert compute_causal_centrality(entity_links=["e1", "e2"], degree=4) == 0.4
+        counting_client.table.assert_not_called()
+
+    def test_on_the_fly_counts_match_degree(self, counting_client) -> None:
+        counting_client.table.return_value.select.return_value.in_.return_value.execute.return_value = MagicMock(count=3)
+        assert compute_causal_centrality(entity_links=["e1"]) == centrality_from_degree(6)
+
+
+# =============================================================================
+# Test: load_memory_degrees()
+# =============================================================================
+
+def test_load_memory_degrees_batches(monkeypatch) -> None:
+    monkeypatch.setattr(entity_centrality, "DEGREE_BATCH_SIZE", 2)
+    client = MagicMock()
+    calls = _degree_rpc(client, {"m1": 4, "m3": 0})
+
+    degrees = load_memory_degrees(client, ["m1", "m2", "m3"])
+
+    assert degrees == {"m1": 4, "m3": 0}
+    assert [c["p_memory_ids"] for c in calls] == [["m1", "m2"], ["m3"]]
+
+
+# =============================================================================
+# Test: check_consistency()
+# =============================================================================
+
+class TestCheckConsistency:
+
+    @staticmethod
+    def _client(degrees: Dict[str, int], drift: List[Dict[str, Any]] = ()) -> MagicMock:
+        client = MagicMock()
+        memories = [{"id": m, "entity_links": ["e1"]} for m in degrees] + [{"id": "bare", "entity_links": []}]
+        (client.table.return_value.select.return_value.neq.return_value
+         .order.return_value.limit.return_value.execute.return_value) = MagicMock(data=memories)
+        _degree_rpc(client, degrees, drift)
+        return client
+
+    def test_consistent(self, counting_client) -> None:
+        counting_client.table.return_value.select.return_value.in_.return_value.execute.return_value = MagicMock(count=2)
+
+        report = check_consistency(self._client({"m1": 4, "m2": 4}))
+
+        assert report["consistent"] is True
+        assert report["memories_checked"] == 2
+
+    def test_reports_entity_and_memory_drift(self, counting_client) -> None:
+        counting_client.table.return_value.select.return_value.in_.return_value.execute.return_value = MagicMock(count=2)
+        drift = [{"entity_id": "e1", "stored_out": 1, "stored_in": 1, "actual_out": 2, "actual_in": 2}]
+
+        report = check_consistency(self._client({"m1": 2}, drift))
+
+        assert report["consistent"] is False
+        assert report["drifted_entities"] == drift
+        assert report["memory_mismatches"] == [{"memory_id": "m1", "stored": 0.2, "actual": 0.4}]
+
+    def test_cli_exit_status_and_repair(self, counting_client, capsys) -> None:
+        counting_client.table.return_value.select.return_value.in_.return_value.execute.return_value = MagicMock(count=0)
+        client = self._client({}, [{"entity_id": "e1", "stored_out": 1, "stored_in": 0, "actual_out": 0, "actual_in": 0}])
+
+        with patch("backend.services.wal.get_supabase_client", return_value=client):
+            assert main(["check", "--repair"]) == 1
+
+        assert "refresh_entity_centrality" in [c.args[0] for c in client.rpc.call_args_list]
+        assert '"refreshed"' in capsys.readouterr().out
+
+
+# =============================================================================
+# Test: salience job reads degrees from the table
+# =============================================================================
+
+def test_recalculation_uses_entity_centrality(counting_client) -> None:
+    from backend.worker.salience_job import recalculate_all_salience_scores
+
+    linked, bare = str(uuid4()), str(uuid4())
+    memories = [
+        {"id": linked, "content": "a", "entity_links": [str(uuid4())], "access_count": 1, "metadata": {}},
+        {"id": bare, "content": "b", "entity_links": [], "access_count": 1, "metadata": {}},
+    ]
+    client = MagicMock()
+    client.table.return_value.select.return_value.eq.return_value.execute.return_value = MagicMock(data=memories)
+    calls = _degree_rpc(client, {linked: 10})
+    checkpoint = MagicMock()
+    checkpoint.load.return_value = None
+
+    with patch("backend.worker.salience_job._get_supabase_client", return_value=client), \
+         patch("backend.worker.checkpoint.CheckpointManager", return_value=checkpoint), \
+         patch("backend.worker.salience_job._load_weights_for_user") as weights, \
+         patch("backend.services.salience.calculate_salience") as calculate:
+        from backend.services.salience import SalienceWeights
+        weights.return_value = SalienceWeights()
+        calculate.return_value = MagicMock(score=0.5)
+        result = recalculate_all_salience_scores()
+
+    assert result["status"] == "completed"
+    assert calls == [{"name": "memory_entity_degrees", "p_memory_ids": [linked]}]
+    assert [c.kwargs["causal_degree"] for c in calculate.call_args_list] == [10, 0]
+    counting_client.table.assert_not_called()
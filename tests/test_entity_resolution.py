@@ -0,0 +1,231 @@
+"""
+Batched Entity Resolution Tests
+================================
+
+Tests for ``backend/magma/resolution.py``:
+- Name normalization and trigram similarity
+- Best-match selection (exact, fuzzy, strict type/domain)
+- One lookup + one bulk write per batch
+- In-batch deduplication
+- Slow Path fallback to per-entity resolution
+
+All Supabase access is mocked.
+
+Run with::
+
+    python -m pytest tests/test_entity_resolution.py -v
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.magma.resolution import (
+    find_best_match,
+    normalize_entity_name,
+    resolve_entities_batch,
+    trigram_similarity,
+)
+from backend.magma.store import build_entity_name_to_id
+
+TEST_USER_ID: str = "00000000-0000-0000-0000-000000000001"
+
+
+def _make_client(candidates: Optional[List[Dict[str, Any]]] = None) -> MagicMock:
+    """Mock Supabase client whose candidate RPC returns ``candidates``."""
+    client = MagicMock()
+    rpc_response = MagicMock()
+    rpc_response.data = candidates or []
+    client.rpc.return_value.execute.return_value = rpc_response
+    client.table.return_value.upsert.return_value.execute.return_value = MagicMock(data=[])
+    return client
+
+
+def _upserted_rows(client: MagicMock) -> List[Dict[str, Any]]:
+    return client.table.return_value.upsert.call_args[0][0]
+
+
+# =============================================================================
+# Normalization and similarity
+# =============================================================================
+
+class TestNormalization:
+
+    def test_case_punctuation_and_accents(self) -> None:
+        assert normalize_entity_name("Dr. José  Álvarez") == "dr jose alvarez"
+
+    def test_underscores_become_spaces(self) -> None:
+        assert normalize_entity_name("project_alpha") == "project alpha"
+
+    def test_empty(self) -> None:
+        assert normalize_entity_name("  ") == ""
+
+    def test_identical_names_similarity_one(self) -> None:
+        assert trigram_similarity("John Smith", "john smith") == 1.0
+
+    def test_near_miss_scores_high(self) -> None:
+        assert trigram_similarity("Jon Smith", "John Smith") >= 0.6
+
+    def test_unrelated_scores_low(self) -> None:
+        assert trigram_similarity("Alice", "Quarterly Budget") < 0.2
+
+
+class TestFindBestMatch:
+
+    def test_exact_beats_fuzzy(self) -> None:
+        candidates = [
+            {"id": "1", "name": "Jon Smith", "type": "person"},
+            {"id": "2", "name": "John Smith", "type": "person"},
+        ]
+        match, score = find_best_match("john smith", candidates, entity_type="person")
+        assert match["id"] == "2"
+        assert score == 1.0
+
+    def test_below_threshold_returns_none(self) -> None:
+        match, score = find_best_match("Alice", [{"id": "1", "name": "Bob"}])
+        assert match is None
+        assert score == 0.0
+
+    def test_numbers_must_agree_for_fuzzy_match(self) -> None:
+        match, _ = find_best_match("Q2 Launch", [{"id": "1", "name": "Q1 Launch"}])
+        assert match is None
+
+    def test_strict_requires_type_and_domain(self) -> None:
+        candidates = [{"id": "1", "name": "Alice", "type": "project", "domain": "work"}]
+        match, _ = find_best_match(
+            "Alice", candidates, entity_type="person", domain="work", strict=True,
+        )
+        assert match is None
+
+    def test_type_agreement_breaks_ties(self) -> None:
+        candidates = [
+            {"id": "1", "name": "Alice", "type": "project", "domain": "work"},
+            {"id": "2", "name": "Alice", "type": "person", "domain": "work"},
+        ]
+        match, _ = find_best_match("Alice", candidates, entity_type="person", domain="work")
+        assert match["id"] == "2"
+
+
+# =============================================================================
+# Batch resolution
+# =============================================================================
+
+class TestResolveEntitiesBatch:
+
+    @pytest.mark.asyncio
+    async def test_single_lookup_and_single_write(self) -> None:
+        """Eight entities cost one RPC and one upsert."""
+        client = _make_client()
+        entities = [{"name": f"Person {i}", "type": "person"} for i in range(8)]
+
+        results = await resolve_entities_batch(entities, TEST_USER_ID, client=client)
+
+        assert client.rpc.call_count == 1
+        assert client.table.return_value.upsert.call_count == 1
+        assert len(results) == 8
+        assert all(r["action"] == "created" for r in results)
+        assert len({r["entity_id"] for r in results}) == 8
+
+    @pytest.mark.asyncio
+    async def test_existing_entity_updated_with_mention_count(self) -> None:
+        existing_id = str(uuid4())
+        client = _make_client([{
+            "id": existing_id,
+            "name": "Alice",
+            "type": "person",
+            "domain": "work",
+            "status": "active",
+            "attributes": {"mention_count": 5, "role": "pm"},
+        }])
+
+        results = await resolve_entities_batch(
+            [{"name": "alice", "type": "person", "attributes": {"team": "infra"}}],
+            TEST_USER_ID,
+            client=client,
+        )
+
+        assert results == [{"action": "updated", "entity_id": existing_id}]
+        row = _upserted_rows(client)[0]
+        assert row["id"] == existing_id
+        assert row["name"] == "Alice"
+        assert row["attributes"]["mention_count"] == 6
+        assert row["attributes"]["role"] == "pm"
+        assert row["attributes"]["team"] == "infra"
+        assert row["attributes"]["last_mentioned_by"] == TEST_USER_ID
+
+    @pytest.mark.asyncio
+    async def test_duplicate_mentions_in_batch_collapse(self) -> None:
+        client = _make_client()
+
+        results = await resolve_entities_batch(
+            [{"name": "Q1 Launch"}, {"name": "q1 launch"}],
+            TEST_USER_ID,
+            client=client,
+        )
+
+        assert results[0]["entity_id"] == results[1]["entity_id"]
+        assert all(r["action"] == "created" for r in results)
+        rows = _upserted_rows(client)
+        assert len(rows) == 1
+        assert rows[0]["attributes"]["mention_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_empty_names_skipped_without_db(self) -> None:
+        client = _make_client()
+
+        results = await resolve_entities_batch([{"name": " "}], TEST_USER_ID, client=client)
+
+        assert results == [{"action": "skipped", "entity_id": None}]
+        client.rpc.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_upsert_rows_share_keys(self) -> None:
+        """PostgREST bulk upsert requires a uniform column set."""
+        client = _make_client([{"id": str(uuid4()), "name": "Alice", "attributes": {}}])
+
+        await resolve_entities_batch(
+            [{"name": "Alice"}, {"name": "Bob"}], TEST_USER_ID, client=client,
+        )
+
+        rows = _upserted_rows(client)
+        assert len({frozenset(r.keys()) for r in rows}) == 1
+
+    @pytest.mark.asyncio
+    async def test_results_feed_build_entity_name_to_id(self) -> None:
+        client = _make_client()
+        entities = [{"name": "Alice"}, {"name": ""}, {"name": "Acme"}]
+
+        results = await resolve_entities_batch(entities, TEST_USER_ID, client=client)
+        mapping = build_entity_name_to_id(entities, results)
+
+        assert set(mapping) == {"Alice", "Acme"}
+
+
+class TestSlowPathFallback:
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_per_entity_on_batch_error(self) -> None:
+        from backend.worker import slow_path
+
+        per_entity = MagicMock(side_effect=lambda **kw: {"action": "created", "entity_id": "x"})
+
+        async def _fake_resolve(entity_data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+            return per_entity(entity_data=entity_data, user_id=user_id)
+
+        with patch(
+            "backend.magma.resolution.resolve_entities_batch",
+            side_effect=RuntimeError("rpc missing"),
+        ), patch.object(slow_path, "_async_resolve_entity", _fake_resolve):
+            results = await slow_path.resolve_entities(
+                [{"name": "Alice"}, {"name": "Bob"}], TEST_USER_ID,
+            )
+
+        assert per_entity.call_count == 2
+        assert [r["action"] for r in results] == ["created", "created"]
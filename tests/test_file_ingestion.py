@@ -229,6 +229,90 @@ class TestCSVParsing:
         assert "Column1" in metadata["columns"]
 
 
+class TestTableProfiler:
+    """Tests for block-wise spreadsheet profiling."""
+
+    def _profile(self, csv_text: str):
+        from lib.agent.parsing import TableProfiler, _iter_csv_frames
+
+        profiler = TableProfiler()
+        for frame in _iter_csv_frames(io.BytesIO(csv_text.encode("utf-8"))):
+            profiler.add(frame)
+        return profiler, "\n".join(profiler.summary_lines())
+
+    def test_column_profiles(self):
+        """Verify dtypes, null rates, top values, quantiles and date ranges."""
+        rows = ["Date,Category,Amount"]
+        for i in range(1, 101):
+            amount = "" if i % 10 == 0 else str(i)
+            rows.append(f"2024-01-{(i % 28) + 1:02d},{'rent' if i % 4 == 0 else 'food'},{amount}")
+        profiler, summary = self._profile("\n".join(rows))
+
+        assert profiler.rows == 100
+        assert "Amount: float64, 90 non-null (10.0% null), min 1, max 99, mean 50" in summary
+        assert "median 50" in summary
+        assert "Category: " in summary and "2 distinct, top: food (75), rent (25)" in summary
+        assert "Date: datetime64" in summary and "range 2024-01-01 to 2024-01-28" in summary
+        assert "(sampled)" not in summary
+
+    def test_blocks_match_whole_file(self, monkeypatch):
+        """Verify exact statistics do not depend on the block size."""
+        from lib.agent import parsing
+
+        csv_text = "\n".join(["n,label"] + [f"{i},{'odd' if i % 2 else 'even'}" for i in range(1000)])
+        _, whole = self._profile(csv_text)
+        monkeypatch.setattr(parsing, "PROFILE_BLOCK_ROWS", 37)
+        profiler, blocked = self._profile(csv_text)
+
+        assert profiler.rows == 1000
+        assert blocked.split("Sample Data")[0] == whole.split("Sample Data")[0]
+
+    def test_sample_is_bounded(self, monkeypatch):
+        """Verify the sample and the row reservoir stay bounded on large tables."""
+        from lib.agent import parsing
+
+        monkeypatch.setattr(parsing, "PROFILE_BLOCK_ROWS", 500)
+        monkeypatch.setattr(parsing, "PROFILE_RESERVOIR_ROWS", 200)
+        monkeypatch.setattr(parsing, "PROFILE_SAMPLE_CHARS", 300)
+        csv_text = "\n".join(["id,text"] + [f"{i},{'x' * 40}" for i in range(5000)])
+        profiler, summary = self._profile(csv_text)
+
+        assert len(profiler._reservoir) == 200
+        assert "(sampled)" in summary
+        sample = summary.split("Sample Data")[1].splitlines()
+        assert sample[0].startswith(" (") and "random rows of 5000" in sample[0]
+        assert sum(len(line) for line in sample[1:-1]) <= 300
+        assert sample[-1].startswith("  ... and ")
+        # Sample rows come from across the file, in file order
+        numbers = [int(line.split()[1].rstrip(":")) for line in sample[1:-1]]
+        assert numbers == sorted(numbers)
+
+    @pytest.mark.asyncio
+    async def test_parse_excel_streams_sheets(self):
+        """Verify Excel sheets are profiled from the read-only reader."""
+        import datetime
+        from openpyxl import Workbook
+        from lib.agent.parsing import parse_excel
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Budget"
+        sheet.append(["Item", "Cost", "Bought"])
+        sheet.append(["Laptop", 1200, datetime.datetime(2024, 3, 1)])
+        sheet.append([None, None, None])
+        sheet.append(["Desk", 300, datetime.datetime(2024, 5, 9)])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+
+        extracted_text, metadata = await parse_excel(buffer.getvalue(), "budget.xlsx")
+
+        assert metadata["total_rows"] == 2
+        assert metadata["sheet_names"] == ["Budget"]
+        assert "=== Sheet: Budget ===" in extracted_text
+        assert "range 2024-03-01 to 2024-05-09" in extracted_text
+        assert "Row 2: Item: Desk | Cost: 300 | Bought: 2024-05-09" in extracted_text
+
+
 class TestImageParsing:
     """Tests for image parsing with mocked Claude Vision."""
 
@@ -245,7 +329,7 @@ class TestImageParsing:
         mock_llm.ainvoke = AsyncMock(return_value=mock_response)
 
         with patch.object(parsing, 'ANTHROPIC_API_KEY', 'test-key'):
-            with patch('lib.agent.parsing.ChatAnthropic', return_value=mock_llm):
+            with patch('langchain_anthropic.ChatAnthropic', return_value=mock_llm):
                 extracted_text, metadata = await parsing.parse_image(
                     png_content,
                     "screenshot.png",
@@ -434,7 +518,7 @@ class TestUploadEndpoint:
         })
 
         with patch.object(parsing, 'ANTHROPIC_API_KEY', 'test-key'):
-            with patch('lib.agent.parsing.ChatAnthropic', return_value=mock_llm):
+            with patch('langchain_anthropic.ChatAnthropic', return_value=mock_llm):
                 with patch.object(memory, 'ingest_user_message', mock_ingest):
                     extracted_text, metadata = await parsing.parse_file(
                         png_content,
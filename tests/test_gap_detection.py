@@ -36,13 +36,6 @@ def mock_supabase():
         yield client
 
 
-@pytest.fixture
-def mock_audit_failures():
-    """Mock audit logging get_recent_failures."""
-    with patch("backend.services.gap_detection.get_failure_summary", new_callable=AsyncMock) as mock:
-        yield mock
-
-
 @pytest.fixture
 def sample_failures() -> List[Dict[str, Any]]:
     """Sample failure records for testing."""
@@ -161,116 +154,110 @@ class TestGroupFailuresByTool:
 class TestDetectGaps:
     """Test the detect_gaps async function."""
 
+    @staticmethod
+    def _rpc_results(mock_supabase, aggregate_rows, upserted=None):
+        """Route client.rpc(name, params) to canned results per function."""
+        calls: Dict[str, Any] = {}
+
+        def _rpc(name, params):
+            calls[name] = params
+            query = MagicMock()
+            data = aggregate_rows if name == "aggregate_tool_failures" else upserted
+            query.execute.return_value = MagicMock(data=data)
+            return query
+
+        mock_supabase.rpc.side_effect = _rpc
+        return calls
+
     @pytest.mark.asyncio
-    async def test_no_failures_returns_empty_list(self, mock_supabase, mock_audit_failures):
-        """No failures found returns empty list."""
-        mock_audit_failures.return_value = []
+    async def test_no_failures_returns_empty_list(self, mock_supabase):
+        """No aggregated failures returns empty list without writing."""
+        calls = self._rpc_results(mock_supabase, [])
 
         result = await detect_gaps()
 
         assert result == []
-        mock_audit_failures.assert_called_once()
+        assert list(calls) == ["aggregate_tool_failures"]
 
     @pytest.mark.asyncio
-    async def test_failures_below_threshold_returns_empty(self, mock_supabase, mock_audit_failures):
-        """Failures below min_failures threshold returns empty list."""
-        mock_audit_failures.return_value = [
-            {"tool_name": "test_tool", "user_id": "user-123", "created_at": "2026-02-10T10:00:00Z"},
-            {"tool_name": "test_tool", "user_id": "user-123", "created_at": "2026-02-11T10:00:00Z"},
-        ]
+    async def test_threshold_and_window_pushed_to_sql(self, mock_supabase):
+        """min_failures, hours and user_id are applied by the SQL aggregate."""
+        calls = self._rpc_results(mock_supabase, [])
 
-        result = await detect_gaps(min_failures=3)
+        await detect_gaps(user_id="user-123", min_failures=4, hours=24)
 
-        assert result == []
+        params = calls["aggregate_tool_failures"]
+        assert params["p_user_id"] == "user-123"
+        assert params["p_min_failures"] == 4
+        assert params["p_hours"] == 24
 
     @pytest.mark.asyncio
-    async def test_failures_at_threshold_creates_gap(self, mock_supabase, mock_audit_failures):
-        """Failures at threshold creates gap records via _upsert_gap."""
-        mock_audit_failures.return_value = [
+    async def test_aggregates_upserted_in_one_call(self, mock_supabase):
+        """Each (user, tool) row becomes one gap in a single upsert call."""
+        rows = [
             {
-                "tool_name": "test_tool",
-                "error_type": "timeout",
-                "error_message": "Error 1",
                 "user_id": "user-123",
-                "created_at": "2026-02-10T10:00:00Z",
+                "tool_name": "search_emails",
+                "failure_count": 3,
+                "error_types": {"timeout": 2, "api_error": 1},
+                "first_seen": "2026-02-10T10:00:00Z",
+                "last_seen": "2026-02-12T10:00:00Z",
+                "sample_messages": ["Request timed out after 30s"],
             },
             {
-                "tool_name": "test_tool",
-                "error_type": "timeout",
-                "error_message": "Error 2",
-                "user_id": "user-123",
-                "created_at": "2026-02-11T10:00:00Z",
-            },
-            {
-                "tool_name": "test_tool",
-                "error_type": "timeout",
-                "error_message": "Error 3",
-                "user_id": "user-123",
-                "created_at": "2026-02-12T10:00:00Z",
+                "user_id": "user-456",
+                "tool_name": "search_emails",
+                "failure_count": 5,
+                "error_types": {"auth_error": 5},
+                "first_seen": "2026-02-11T10:00:00Z",
+                "last_seen": "2026-02-13T10:00:00Z",
+                "sample_messages": [],
             },
         ]
-
-        # Mock _upsert_gap to return a gap (no existing gap case)
-        mock_existing = MagicMock()
-        mock_existing.data = []
-        mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value.in_.return_value.limit.return_value.execute.return_value = mock_existing
-
-        mock_insert = MagicMock()
-        mock_insert.data = [{"id": "gap-123", "tool_name": "test_tool"}]
-        mock_supabase.table.return_value.insert.return_value.execute.return_value = mock_insert
+        upserted = [{"id": "gap-1"}, {"id": "gap-2"}]
+        calls = self._rpc_results(mock_supabase, rows, upserted)
 
         result = await detect_gaps(min_failures=3)
 
-        assert len(result) == 1
-        assert result[0]["id"] == "gap-123"
-
-    @pytest.mark.asyncio
-    async def test_user_id_filter_works(self, mock_supabase, mock_audit_failures):
-        """user_id filter correctly filters results."""
-        mock_audit_failures.return_value = [
-            {"tool_name": "tool1", "user_id": "user-123", "error_type": "error1", "created_at": "2026-02-10T10:00:00Z"},
-            {"tool_name": "tool1", "user_id": "user-123", "error_type": "error1", "created_at": "2026-02-11T10:00:00Z"},
-            {"tool_name": "tool1", "user_id": "user-123", "error_type": "error1", "created_at": "2026-02-12T10:00:00Z"},
-            {"tool_name": "tool1", "user_id": "user-456", "error_type": "error1", "created_at": "2026-02-13T10:00:00Z"},
+        assert result == upserted
+        gaps = calls["upsert_skill_gaps"]["p_gaps"]
+        assert [(g["user_id"], g["occurrence_count"]) for g in gaps] == [
+            ("user-123", 3),
+            ("user-456", 5),
         ]
+        assert gaps[0]["gap_type"] == "repeated_failure"
+        assert gaps[0]["first_seen_at"] == "2026-02-10T10:00:00Z"
+        assert gaps[0]["last_seen_at"] == "2026-02-12T10:00:00Z"
+        assert "Error types: timeout(2), api_error(1)" in gaps[0]["pattern_description"]
+        assert "Sample: Request timed out" in gaps[0]["pattern_description"]
+        assert "Sample: N/A" in gaps[1]["pattern_description"]
 
-        # Mock no existing gap
-        mock_existing = MagicMock()
-        mock_existing.data = []
-        mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value.in_.return_value.limit.return_value.execute.return_value = mock_existing
-
-        mock_insert = MagicMock()
-        mock_insert.data = [{"id": "gap-123", "tool_name": "tool1", "user_id": "user-123"}]
-        mock_supabase.table.return_value.insert.return_value.execute.return_value = mock_insert
+    @pytest.mark.asyncio
+    async def test_aggregate_error_returns_empty(self, mock_supabase):
+        """An RPC error is logged and no gaps are written."""
+        mock_supabase.rpc.return_value.execute.side_effect = Exception("function does not exist")
 
-        result = await detect_gaps(user_id="user-123", min_failures=3)
+        result = await detect_gaps()
 
-        assert len(result) == 1
-        assert result[0]["user_id"] == "user-123"
+        assert result == []
+        assert mock_supabase.rpc.call_count == 1
 
     @pytest.mark.asyncio
-    async def test_existing_gap_updates_not_duplicates(self, mock_supabase, mock_audit_failures):
-        """Existing open gap for same tool+user updates (not duplicates)."""
-        mock_audit_failures.return_value = [
-            {"tool_name": "tool1", "user_id": "user-123", "error_type": "error1", "created_at": "2026-02-10T10:00:00Z"},
-            {"tool_name": "tool1", "user_id": "user-123", "error_type": "error1", "created_at": "2026-02-11T10:00:00Z"},
-            {"tool_name": "tool1", "user_id": "user-123", "error_type": "error1", "created_at": "2026-02-12T10:00:00Z"},
-        ]
+    async def test_upsert_error_returns_empty(self, mock_supabase):
+        """A failed upsert returns no gaps."""
+        rows = [{"user_id": "u", "tool_name": "t", "failure_count": 3, "error_types": {}}]
 
-        # Mock existing gap found
-        mock_existing = MagicMock()
-        mock_existing.data = [{"id": "gap-existing", "tool_name": "tool1", "user_id": "user-123"}]
-        mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value.in_.return_value.limit.return_value.execute.return_value = mock_existing
+        def _rpc(name, params):
+            query = MagicMock()
+            if name == "upsert_skill_gaps":
+                query.execute.side_effect = Exception("conflict")
+            else:
+                query.execute.return_value = MagicMock(data=rows)
+            return query
 
-        # Mock update
-        mock_update = MagicMock()
-        mock_update.data = [{"id": "gap-existing", "tool_name": "tool1", "occurrence_count": 3}]
-        mock_supabase.table.return_value.update.return_value.eq.return_value.execute.return_value = mock_update
-
-        result = await detect_gaps(min_failures=3)
+        mock_supabase.rpc.side_effect = _rpc
 
-        assert len(result) == 1
-        assert result[0]["id"] == "gap-existing"
+        assert await detect_gaps() == []
 
     @pytest.mark.asyncio
     async def test_no_supabase_returns_empty(self):
@@ -0,0 +1,363 @@
+"""
+Tests for Gmail Incremental Sync - History API and Redis Dedup
+==============================================================
+
+Run with: pytest tests/test_gmail_sync.py -v
+
+Tests cover:
+1. Atomic message claims and per-member TTL pruning
+2. Batch membership checks for processed IDs and replied threads
+3. History cursor only moves forward
+4. History delta listing, pagination and expired-cursor fallback
+5. Message summaries keep unread INBOX messages, newest first
+6. Eligible-email selection (one reply per thread)
+7. Aggregating results from a multi-email batch
+
+Redis and httpx are replaced by in-memory fakes.
+"""
+
+import os
+import sys
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.agent.gmail_sync import (
+    HISTORY_KEY_PREFIX,
+    PROCESSED_KEY,
+    EmailDedupStore,
+    HistoryExpiredError,
+    fetch_message_summaries,
+    list_history_message_ids,
+    sync_new_emails,
+)
+
+
+# =============================================================================
+# Fakes
+# =============================================================================
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self._redis = redis
+        self._calls: List[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        def _queue(*args: Any, **kwargs: Any) -> "FakePipeline":
+            self._calls.append((name, args, kwargs))
+            return self
+        return _queue
+
+    def execute(self) -> List[Any]:
+        return [getattr(self._redis, n)(*a, **k) for n, a, k in self._calls]
+
+
+class FakeRedis:
+    """Just enough Redis for EmailDedupStore (ZSET, strings, cursor script)."""
+
+    def __init__(self) -> None:
+        self.zsets: Dict[str, Dict[str, float]] = {}
+        self.strings: Dict[str, str] = {}
+
+    def ping(self) -> bool:
+        return True
+
+    def pipeline(self) -> FakePipeline:
+        return FakePipeline(self)
+
+    def zadd(self, key: str, mapping: Dict[str, float], nx: bool = False) -> int:
+        zset = self.zsets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if member in zset:
+                if not nx:
+                    zset[member] = score
+                continue
+            zset[member] = score
+            added += 1
+        return added
+
+    def zremrangebyscore(self, key: str, low: Any, high: float) -> int:
+        zset = self.zsets.get(key, {})
+        stale = [m for m, s in zset.items() if s <= high]
+        for member in stale:
+            del zset[member]
+        return len(stale)
+
+    def expire(self, key: str, seconds: int) -> bool:
+        return True
+
+    def zmscore(self, key: str, members: List[str]) -> List[Optional[float]]:
+        zset = self.zsets.get(key, {})
+        return [zset.get(m) for m in members]
+
+    def get(self, key: str) -> Optional[str]:
+        return self.strings.get(key)
+
+    def set(self, key: str, value: str) -> bool:
+        self.strings[key] = value
+        return True
+
+    def eval(self, script: str, numkeys: int, key: str, value: str) -> int:
+        current = self.strings.get(key)
+        if current is None or int(value) > int(current):
+            self.strings[key] = value
+            return 1
+        return 0
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, payload: Optional[Dict[str, Any]] = None):
+        self.status_code = status_code
+        self._payload = payload or {}
+
+    def json(self) -> Dict[str, Any]:
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeGmailClient:
+    """Serves history pages, message metadata and the profile."""
+
+    def __init__(
+        self,
+        history_pages: Optional[List[Dict[str, Any]]] = None,
+        messages: Optional[Dict[str, Dict[str, Any]]] = None,
+        profile_history_id: str = "900",
+        history_status: int = 200,
+    ):
+        self.history_pages = history_pages or []
+        self.messages = messages or {}
+        self.profile_history_id = profile_history_id
+        self.history_status = history_status
+        self.calls: List[str] = []
+
+    async def get(self, url: str, headers: Dict[str, str], params: Any = None, timeout: float = 0) -> FakeResponse:
+        self.calls.append(url)
+        if url.endswith("/profile"):
+            return FakeResponse(200, {"historyId": self.profile_history_id})
+        if url.endswith("/history"):
+            if self.history_status != 200:
+                return FakeResponse(self.history_status)
+            index = int(params.get("pageToken") or 0)
+            return FakeResponse(200, self.history_pages[index])
+        message_id = url.rsplit("/", 1)[-1]
+        if message_id not in self.messages:
+            return FakeResponse(404)
+        return FakeResponse(200, self.messages[message_id])
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _message(message_id: str, thread_id: str, internal_date: int, labels=("INBOX", "UNREAD")) -> Dict[str, Any]:
+    return {
+        "id": message_id,
+        "threadId": thread_id,
+        "labelIds": list(labels),
+        "snippet": f"snippet {message_id}",
+        "internalDate": str(internal_date),
+        "payload": {"headers": [
+            {"name": "From", "value": "Ryan <ryan@example.com>"},
+            {"name": "Subject", "value": f"Subject {message_id}"},
+        ]},
+    }
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# =============================================================================
+# Dedup Store
+# =============================================================================
+
+class TestEmailDedupStore:
+    def test_claim_is_exclusive(self):
+        store = EmailDedupStore(redis_client=FakeRedis(), ttl_days=7, clock=Clock())
+
+        assert store.claim_message("m1") is True
+        assert store.claim_message("m1") is False
+        assert store.claim_message("m2") is True
+
+    def test_entries_expire_after_ttl(self):
+        clock = Clock()
+        redis = FakeRedis()
+        store = EmailDedupStore(redis_client=redis, ttl_days=1, clock=clock)
+
+        store.claim_message("old")
+        clock.now += 86400 + 1
+        assert store.processed(["old"]) == set()
+
+        # The next write prunes the stale member from the sorted set
+        store.claim_message("new")
+        assert "old" not in redis.zsets[PROCESSED_KEY]
+        assert store.claim_message("old") is True
+
+    def test_batch_membership(self):
+        store = EmailDedupStore(redis_client=FakeRedis(), clock=Clock())
+        store.mark_processed("m1")
+        store.mark_thread_replied("t1")
+
+        assert store.processed(["m1", "m2", ""]) == {"m1"}
+        assert store.replied_threads(["t1", "t2"]) == {"t1"}
+        assert store.processed([]) == set()
+
+    def test_history_cursor_only_moves_forward(self):
+        redis = FakeRedis()
+        store = EmailDedupStore(redis_client=redis, clock=Clock())
+
+        assert store.advance_history_id("a@x.com", "100") is True
+        assert store.advance_history_id("a@x.com", "90") is False
+        assert store.advance_history_id("a@x.com", "not-a-number") is False
+        assert store.get_history_id("a@x.com") == "100"
+
+        store.reset_history_id("a@x.com", "50")
+        assert redis.strings[f"{HISTORY_KEY_PREFIX}:a@x.com"] == "50"
+
+
+# =============================================================================
+# History API
+# =============================================================================
+
+class TestHistoryListing:
+    @pytest.mark.asyncio
+    async def test_follows_pages_and_dedupes(self):
+        client = FakeGmailClient(history_pages=[
+            {"historyId": "120", "nextPageToken": "1", "history": [
+                {"messagesAdded": [{"message": {"id": "m1"}}, {"message": {"id": "m2"}}]},
+            ]},
+            {"historyId": "130", "history": [
+                {"messagesAdded": [{"message": {"id": "m2"}}, {"message": {"id": "m3"}}]},
+            ]},
+        ])
+
+        ids, latest = await list_history_message_ids(client, "tok", "100")
+
+        assert ids == ["m1", "m2", "m3"]
+        assert latest == "130"
+
+    @pytest.mark.asyncio
+    async def test_expired_cursor_raises(self):
+        client = FakeGmailClient(history_status=404)
+
+        with pytest.raises(HistoryExpiredError):
+            await list_history_message_ids(client, "tok", "1")
+
+    @pytest.mark.asyncio
+    async def test_summaries_keep_unread_inbox_newest_first(self):
+        client = FakeGmailClient(messages={
+            "m1": _message("m1", "t1", 1000),
+            "m2": _message("m2", "t2", 3000),
+            "m3": _message("m3", "t3", 2000, labels=("INBOX",)),
+        })
+
+        emails = await fetch_message_summaries(client, "tok", ["m1", "m2", "m3", "gone"])
+
+        assert [e["id"] for e in emails] == ["m2", "m1"]
+        assert emails[0]["from"] == "Ryan <ryan@example.com>"
+        assert emails[0]["subject"] == "Subject m2"
+        assert emails[0]["threadId"] == "t2"
+
+
+class TestSyncNewEmails:
+    @pytest.mark.asyncio
+    async def test_no_cursor_resets_and_falls_back(self):
+        store = EmailDedupStore(redis_client=FakeRedis(), clock=Clock())
+        client = FakeGmailClient(profile_history_id="900")
+
+        emails, next_id = await sync_new_emails("tok", "a@x.com", store, client=client)
+
+        assert emails is None and next_id is None
+        assert store.get_history_id("a@x.com") == "900"
+
+    @pytest.mark.asyncio
+    async def test_incremental_delta(self):
+        store = EmailDedupStore(redis_client=FakeRedis(), clock=Clock())
+        store.advance_history_id("a@x.com", "100")
+        client = FakeGmailClient(
+            history_pages=[{"historyId": "150", "history": [
+                {"messagesAdded": [{"message": {"id": "m1"}}]},
+            ]}],
+            messages={"m1": _message("m1", "t1", 1000)},
+        )
+
+        emails, next_id = await sync_new_emails("tok", "a@x.com", store, client=client)
+
+        assert [e["id"] for e in emails] == ["m1"]
+        assert next_id == "150"
+        # Cursor moves only once the caller has handled the batch
+        assert store.get_history_id("a@x.com") == "100"
+
+    @pytest.mark.asyncio
+    async def test_expired_cursor_resets(self):
+        store = EmailDedupStore(redis_client=FakeRedis(), clock=Clock())
+        store.advance_history_id("a@x.com", "5")
+        client = FakeGmailClient(history_status=404, profile_history_id="700")
+
+        emails, next_id = await sync_new_emails("tok", "a@x.com", store, client=client)
+
+        assert emails is None and next_id is None
+        assert store.get_history_id("a@x.com") == "700"
+
+
+# =============================================================================
+# Handler integration
+# =============================================================================
+
+class TestHandlerSelection:
+    def _config(self) -> Dict[str, Any]:
+        return {
+            "assistant_email": "sabine@strugcity.com",
+            "agent_email": "sabine@strugcity.com",
+            "authorized_emails": ["ryan@example.com"],
+        }
+
+    def test_selects_one_email_per_thread_and_skips_processed(self):
+        from lib.agent import gmail_handler
+
+        store = EmailDedupStore(redis_client=FakeRedis(), clock=Clock())
+        store.mark_processed("done")
+        emails = [
+            {"id": "m3", "threadId": "t1", "from": "Ryan <ryan@example.com>", "subject": "Again", "snippet": "b"},
+            {"id": "m2", "threadId": "t1", "from": "Ryan <ryan@example.com>", "subject": "Hi", "snippet": "a"},
+            {"id": "m4", "threadId": "t2", "from": "ryan@example.com", "subject": "Other", "snippet": "c"},
+            {"id": "done", "threadId": "t3", "from": "ryan@example.com", "subject": "Old", "snippet": "d"},
+            {"id": "m5", "threadId": "t4", "from": "stranger@example.com", "subject": "Hey", "snippet": "e"},
+        ]
+
+        with patch.object(gmail_handler, "get_dedup_store", return_value=store):
+            selected = gmail_handler._select_eligible_emails(emails, self._config())
+
+        assert [e["message_id"] for e in selected] == ["m3", "m4"]
+        assert selected[0]["sender"] == "ryan@example.com"
+        assert selected[0]["sender_name"] == "Ryan"
+        # The older duplicate in the same thread is marked so it is not re-examined
+        assert store.processed(["m2"]) == {"m2"}
+
+    def test_summarize_results(self):
+        from lib.agent.gmail_handler import _summarize_results
+
+        single = {"success": True, "action": "replied", "recipient": "a@x.com"}
+        assert _summarize_results([single]) is single
+
+        summary = _summarize_results([
+            {"success": True, "action": "skipped_concurrent", "message_id": "m1"},
+            {"success": True, "action": "replied", "recipient": "a@x.com",
+             "message_id": "m2", "thread_id": "t2", "subject": "Re: Hi"},
+        ])
+        assert summary["action"] == "replied"
+        assert summary["replied_count"] == 1
+        assert summary["recipient"] == "a@x.com"
+        assert summary["message_id"] == "m2"
+        assert len(summary["results"]) == 2
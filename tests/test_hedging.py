@@ -0,0 +1,166 @@
+"""
+Tests for hedged LLM requests (backend/services/hedging.py).
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List
+
+import pytest
+
+from backend.services import hedging
+from backend.services.hedging import Hedger
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+class FakeCalls:
+    """Calls answering after scripted delays; records starts and cancellations."""
+
+    def __init__(self) -> None:
+        self.started: List[str] = []
+        self.cancelled: List[str] = []
+
+    def make(self, name: str, delay: float, error: Exception = None) -> Callable[[], Awaitable[str]]:
+        async def call() -> str:
+            self.started.append(name)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.cancelled.append(name)
+                raise
+            if error is not None:
+                raise error
+            return name
+        return call
+
+
+@pytest.fixture
+def calls() -> FakeCalls:
+    return FakeCalls()
+
+
+def _warm(hedger: Hedger, latency: float = 0.01, count: int = 20) -> None:
+    for _ in range(count):
+        hedger.record(latency)
+    hedger._credit = 1.0
+
+
+def _counts(hedger: Hedger) -> Dict[str, Any]:
+    return {k: v for k, v in hedger.snapshot().items() if k in ("call", "hedge", "hedge_won", "budget_exhausted")}
+
+
+# =============================================================================
+# Hedging
+# =============================================================================
+
+class TestHedger:
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_until_warm(self, calls: FakeCalls) -> None:
+        hedger = Hedger("site", min_samples=5)
+        assert hedger.hedge_delay() is None
+        assert await hedger.run(calls.make("primary", 0.05)) == "primary"
+        assert calls.started == ["primary"]
+
+    def test_delay_is_observed_quantile(self) -> None:
+        hedger = Hedger("site", quantile=0.9, min_samples=10)
+        for latency in range(1, 11):
+            hedger.record(latency / 10)
+        assert hedger.hedge_delay() == pytest.approx(0.9)
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_loses_to_hedge_and_is_cancelled(self, calls: FakeCalls) -> None:
+        hedger = Hedger("site")
+        _warm(hedger)
+        result = await hedger.run(calls.make("primary", 5.0), calls.make("fallback", 0.01))
+        assert result == "fallback"
+        await asyncio.sleep(0)
+        assert calls.cancelled == ["primary"]
+        assert _counts(hedger) == {"call": 1, "hedge": 1, "hedge_won": 1, "budget_exhausted": 0}
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_sends_no_hedge(self, calls: FakeCalls) -> None:
+        hedger = Hedger("site")
+        _warm(hedger, latency=0.5)
+        assert await hedger.run(calls.make("primary", 0.01), calls.make("fallback", 0.01)) == "primary"
+        assert calls.started == ["primary"]
+
+    @pytest.mark.asyncio
+    async def test_primary_can_still_win_after_hedging(self, calls: FakeCalls) -> None:
+        hedger = Hedger("site")
+        _warm(hedger)
+        assert await hedger.run(calls.make("primary", 0.05), calls.make("fallback", 5.0)) == "primary"
+        await asyncio.sleep(0)
+        assert calls.cancelled == ["fallback"]
+        assert hedger.snapshot()["hedge_won"] == 0
+
+    @pytest.mark.asyncio
+    async def test_budget_limits_extra_calls(self, calls: FakeCalls) -> None:
+        hedger = Hedger("site", budget_ratio=0.05, budget_burst=1.0, window=1000)
+        _warm(hedger, count=500)   # the slower calls below stay outside the p90
+        hedger._credit = 0.0
+        for _ in range(40):
+            await hedger.run(calls.make("primary", 0.03), calls.make("fallback", 0.0))
+        snapshot = hedger.snapshot()
+        # 40 calls earn two hedges; everything else waits for the primary
+        assert snapshot["hedge"] == 2
+        assert snapshot["budget_exhausted"] == 38
+        assert calls.started.count("fallback") == 2
+
+
+# =============================================================================
+# Failures
+# =============================================================================
+
+class TestFailures:
+
+    @pytest.mark.asyncio
+    async def test_hedge_failure_waits_for_primary(self, calls: FakeCalls) -> None:
+        hedger = Hedger("site")
+        _warm(hedger)
+        result = await hedger.run(calls.make("primary", 0.05), calls.make("fallback", 0.0, ValueError("no budget")))
+        assert result == "primary"
+
+    @pytest.mark.asyncio
+    async def test_both_fail_raises_primary_error(self, calls: FakeCalls) -> None:
+        hedger = Hedger("site")
+        _warm(hedger)
+        with pytest.raises(KeyError):
+            await hedger.run(calls.make("primary", 0.05, KeyError("p")), calls.make("fallback", 0.0, ValueError("h")))
+
+    @pytest.mark.asyncio
+    async def test_early_failure_is_not_retried(self, calls: FakeCalls) -> None:
+        hedger = Hedger("site")
+        _warm(hedger, latency=0.5)
+        with pytest.raises(ValueError):
+            await hedger.run(calls.make("primary", 0.0, ValueError("bad request")))
+        assert calls.started == ["primary"]
+
+    @pytest.mark.asyncio
+    async def test_outer_timeout_cancels_both(self, calls: FakeCalls) -> None:
+        hedger = Hedger("site")
+        _warm(hedger)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(hedger.run(calls.make("primary", 5.0), calls.make("fallback", 5.0)), 0.1)
+        await asyncio.sleep(0)
+        assert sorted(calls.cancelled) == ["fallback", "primary"]
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, calls: FakeCalls, monkeypatch) -> None:
+        monkeypatch.setattr(hedging, "HEDGE_ENABLED", False)
+        hedger = Hedger("site")
+        _warm(hedger)
+        assert await hedger.run(calls.make("primary", 0.05), calls.make("fallback", 0.0)) == "primary"
+        assert calls.started == ["primary"]
+
+
+def test_registry_snapshot() -> None:
+    hedging.reset_hedgers()
+    hedger = hedging.get_hedger("fast_path.extract_entities")
+    assert hedging.get_hedger("fast_path.extract_entities") is hedger
+    snapshot = hedging.hedge_snapshot()["fast_path.extract_entities"]
+    assert snapshot["hedge_delay_seconds"] is None
+    assert snapshot["samples"] == 0
+    hedging.reset_hedgers()
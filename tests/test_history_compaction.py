@@ -0,0 +1,195 @@
+"""
+Tests for conversation history compaction (lib/agent/history_compaction.py).
+"""
+
+from typing import List, Optional, Sequence
+
+import pytest
+
+from lib.agent import history_compaction
+from lib.agent.history_compaction import (
+    HistoryCompactor,
+    SessionSummaryCache,
+    Turn,
+    estimate_tokens,
+    extractive_summary,
+    split_turns,
+    truncate_to_tokens,
+)
+
+
+# =============================================================================
+# Fakes
+# =============================================================================
+
+class FakeSummarizer:
+    """Records what it was asked to fold; returns a short deterministic summary."""
+
+    def __init__(self) -> None:
+        self.calls: List[tuple] = []
+
+    async def __call__(self, previous: Optional[str], turns: Sequence[Turn], max_tokens: int) -> str:
+        self.calls.append((previous, [t[0]["content"] for t in turns]))
+        return (previous or "") + "".join(f"[{t[0]['content']}]" for t in turns)
+
+
+def _conversation(turns: int, words: int = 20) -> List[dict]:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"q{i} " + "word " * words})
+        history.append({"role": "assistant", "content": f"a{i} " + "reply " * words})
+    return history
+
+
+def _compactor(**kwargs) -> HistoryCompactor:
+    kwargs.setdefault("summarizer", FakeSummarizer())
+    kwargs.setdefault("token_budget", 100_000)
+    return HistoryCompactor(**kwargs)
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+class TestTurns:
+
+    def test_tool_results_stay_with_their_call(self) -> None:
+        history = [
+            {"role": "user", "content": "what's on today?"},
+            {"role": "assistant", "content": "", "tool_calls": [{"name": "get_calendar_events"}]},
+            {"role": "tool", "name": "get_calendar_events", "content": "dentist 3pm"},
+            {"role": "assistant", "content": "A dentist appointment at 3pm."},
+            {"role": "user", "content": "thanks"},
+        ]
+        turns = split_turns(history)
+        assert [len(t) for t in turns] == [4, 1]
+        assert turns[0][2]["role"] == "tool"
+
+    def test_leading_non_user_messages_form_a_turn(self) -> None:
+        turns = split_turns([{"role": "assistant", "content": "hi"}, {"role": "user", "content": "hey"}])
+        assert len(turns) == 2
+
+    def test_truncate_respects_budget(self) -> None:
+        text = "word " * 500
+        assert estimate_tokens(truncate_to_tokens(text, 50)) <= 50
+
+    def test_extractive_summary_drops_oldest_first(self) -> None:
+        turns = split_turns(_conversation(30))
+        summary = extractive_summary(None, turns, 120)
+        assert estimate_tokens(summary) <= 120
+        assert "q29" in summary and "q0 " not in summary
+
+
+# =============================================================================
+# Compactor
+# =============================================================================
+
+class TestHistoryCompactor:
+
+    @pytest.mark.asyncio
+    async def test_short_history_passes_through(self) -> None:
+        compactor = _compactor(keep_turns=6)
+        result = await compactor.compact("s", _conversation(3))
+        assert result.summary is None
+        assert len(result.messages) == 6
+        assert compactor.summary_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_old_turns_folded_recent_kept(self) -> None:
+        compactor = _compactor(keep_turns=4, fold_batch=1)
+        result = await compactor.compact("s", _conversation(10))
+        assert result.folded_turns == 6
+        assert result.messages[0]["content"].startswith("q6 ")
+        assert "[q0 " in result.summary and "[q5 " in result.summary
+
+    @pytest.mark.asyncio
+    async def test_summary_updated_incrementally(self) -> None:
+        summarizer = FakeSummarizer()
+        compactor = _compactor(keep_turns=4, fold_batch=2, summarizer=summarizer)
+        history = _conversation(20)
+
+        for n in range(5, 21):
+            await compactor.compact("s", history[: 2 * n])
+
+        # Each call only sees turns that aged out since the previous fold
+        folded = [c for _, contents in summarizer.calls for c in contents]
+        assert len(folded) == len(set(folded))
+        assert len(summarizer.calls) < 16
+        assert all(len(contents) >= 2 for _, contents in summarizer.calls)
+
+    @pytest.mark.asyncio
+    async def test_batching_keeps_extra_turns_verbatim(self) -> None:
+        compactor = _compactor(keep_turns=4, fold_batch=4)
+        history = _conversation(12)
+        await compactor.compact("s", history[:16])        # 8 turns: folds 4
+        result = await compactor.compact("s", history[:20])  # 10 turns: 2 new, below batch
+        assert compactor.summary_calls == 1
+        assert result.folded_turns == 4
+        assert len(result.messages) == 12
+
+    @pytest.mark.asyncio
+    async def test_edited_history_rebuilds_summary(self) -> None:
+        summarizer = FakeSummarizer()
+        compactor = _compactor(keep_turns=2, fold_batch=1, summarizer=summarizer)
+        history = _conversation(6)
+        await compactor.compact("s", history)
+
+        edited = [dict(m) for m in history]
+        edited[0]["content"] = "q0 edited"
+        await compactor.compact("s", edited)
+        assert summarizer.calls[-1][0] is None
+        assert summarizer.calls[-1][1][0] == "q0 edited"
+
+    @pytest.mark.asyncio
+    async def test_token_budget_enforced(self) -> None:
+        compactor = _compactor(keep_turns=20, token_budget=400, summary_max_tokens=100)
+        result = await compactor.compact("s", _conversation(20))
+        assert result.estimated_tokens <= 400
+        assert result.original_tokens > 400
+        assert result.folded_turns > 0
+
+    @pytest.mark.asyncio
+    async def test_current_turn_never_folded(self) -> None:
+        compactor = _compactor(keep_turns=2, token_budget=10, summary_max_tokens=5)
+        result = await compactor.compact("s", _conversation(4, words=50))
+        assert result.folded_turns == 3
+        assert len(result.messages) == 2
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_isolated(self) -> None:
+        compactor = _compactor(keep_turns=2, fold_batch=1)
+        await compactor.compact("a", _conversation(6))
+        other = [{"role": m["role"], "content": "b-" + m["content"]} for m in _conversation(6)]
+        result = await compactor.compact("b", other)
+        assert "[b-q0 " in result.summary
+
+
+class TestSessionSummaryCache:
+
+    def test_ttl_and_lru(self) -> None:
+        now = [0.0]
+        cache = SessionSummaryCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+        entry = history_compaction.SessionSummary(summary="x", folded_turns=1, digest="d")
+        cache.put("a", entry)
+        cache.put("b", history_compaction.SessionSummary(summary="y", folded_turns=1, digest="d"))
+        cache.put("c", history_compaction.SessionSummary(summary="z", folded_turns=1, digest="d"))
+        assert cache.get("a") is None
+        now[0] = 11
+        assert cache.get("b") is None
+
+
+@pytest.mark.asyncio
+async def test_model_summarizer_falls_back_without_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    turns = split_turns(_conversation(3))
+    summary = await history_compaction.summarize_with_model(None, turns, 200)
+    assert "q0" in summary
+
+
+@pytest.mark.asyncio
+async def test_compaction_can_be_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(history_compaction, "HISTORY_COMPACTION_ENABLED", False)
+    history = _conversation(50)
+    result = await history_compaction.compact_history("s", history)
+    assert result.messages == history
+    assert result.summary is None
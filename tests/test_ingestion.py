@@ -0,0 +1,411 @@
+"""
+Tests for chunked file ingestion (lib/agent/ingestion.py) and incremental
+parsing (lib/agent/parsing.iter_file_sections).
+"""
+
+import io
+import json
+import os
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from lib.agent import ingestion, memory, parsing
+from lib.agent.ingestion import (
+    Chunker,
+    UploadTooLargeError,
+    chunk_sections,
+    create_ingestion_job,
+    get_ingestion_job,
+    run_ingestion_job,
+    spool_upload,
+)
+from lib.agent.memory import ExtractedContext, ExtractedEntity
+from lib.agent.parsing import ParsedSection, iter_file_sections
+
+
+# =============================================================================
+# Fakes
+# =============================================================================
+
+class FakeQuery:
+    def __init__(self, db: "FakeSupabase", table: str) -> None:
+        self.db = db
+        self.table = table
+        self.op: Optional[str] = None
+        self.payload: Any = None
+        self.filters: List[Any] = []
+
+    def insert(self, payload: Any) -> "FakeQuery":
+        self.op, self.payload = "insert", payload
+        return self
+
+    def update(self, payload: Any) -> "FakeQuery":
+        self.op, self.payload = "update", payload
+        return self
+
+    def delete(self) -> "FakeQuery":
+        self.op = "delete"
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append((column, value))
+        return self
+
+    def execute(self) -> Any:
+        self.db.calls.append((self.table, self.op, self.payload, self.filters))
+        if self.op == "insert" and self.table == "knowledge_files":
+            return SimpleNamespace(data=[{"id": self.db.document_id, **self.payload}])
+        return SimpleNamespace(data=[])
+
+
+class FakeSupabase:
+    def __init__(self) -> None:
+        self.document_id = str(uuid4())
+        self.calls: List[Any] = []
+        self.uploads: List[bytes] = []
+        self.storage = SimpleNamespace(from_=lambda bucket: SimpleNamespace(upload=self._upload))
+
+    def _upload(self, path: str, file: Any, file_options: Dict[str, str]) -> None:
+        self.uploads.append(file.read())
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def ops(self, table: str, op: str) -> List[Any]:
+        return [call for call in self.calls if call[0] == table and call[1] == op]
+
+
+class FakeEmbeddings:
+    def __init__(self, fail_after: Optional[int] = None) -> None:
+        self.batches: List[int] = []
+        self.fail_after = fail_after
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.fail_after is not None and len(self.batches) >= self.fail_after:
+            raise RuntimeError("embeddings down")
+        self.batches.append(len(texts))
+        return [[0.1] * 4 for _ in texts]
+
+
+class FakeUpload:
+    def __init__(self, content: bytes) -> None:
+        self._stream = io.BytesIO(content)
+        self.reads: List[int] = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return self._stream.read(size)
+
+
+@pytest.fixture
+def db(monkeypatch: pytest.MonkeyPatch) -> FakeSupabase:
+    fake = FakeSupabase()
+    monkeypatch.setattr(ingestion, "_supabase", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def embeddings(monkeypatch: pytest.MonkeyPatch) -> FakeEmbeddings:
+    fake = FakeEmbeddings()
+    monkeypatch.setattr(memory, "get_embeddings", lambda: fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def no_llm(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def extract_context(text: str) -> ExtractedContext:
+        return ExtractedContext(
+            extracted_entities=[ExtractedEntity(name="Project Alpha", type="project", domain="work")],
+            core_memory=text[:50],
+            domain="work",
+        )
+
+    async def resolve(entities: Any, user_id: str, supabase: Any) -> Any:
+        return ["11111111-1111-1111-1111-111111111111"], 1, 0
+
+    monkeypatch.setattr(memory, "extract_context", extract_context)
+    monkeypatch.setattr(memory, "resolve_extracted_entities", resolve)
+
+
+def _write(tmp_path: Any, name: str, content: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+# =============================================================================
+# Incremental parsing
+# =============================================================================
+
+class TestIterFileSections:
+
+    def test_csv_row_blocks(self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(parsing, "ROWS_PER_SECTION", 2)
+        path = _write(tmp_path, "e.csv", b"Expense,Amount\nServer,50\nDomain,12\nHosting,25\n")
+        sections = list(iter_file_sections(path, "text/csv"))
+        assert [s.label for s in sections] == ["Rows 1-2", "Rows 3-3", "Summary"]
+        assert sections[0].text == "Row 1: Expense: Server | Amount: 50\nRow 2: Expense: Domain | Amount: 12"
+        assert "Total Rows: 3" in sections[-1].text
+        assert sections[-1].progress == 1.0
+
+    def test_excel_sheet_by_sheet(self, tmp_path: Any) -> None:
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.title = "Budget"
+        workbook.active.append(["Item", "Cost"])
+        workbook.active.append(["Laptop", 1200])
+        people = workbook.create_sheet("People")
+        people.append(["Name"])
+        people.append(["Alice"])
+        path = str(tmp_path / "w.xlsx")
+        workbook.save(path)
+
+        sections = list(iter_file_sections(path, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"))
+        assert [s.label for s in sections] == [
+            "Sheet Budget, rows 1-1", "Sheet Budget, summary", "Sheet People, rows 1-1", "Sheet People, summary",
+        ]
+        assert sections[0].text == "Row 1: Item: Laptop | Cost: 1200"
+        assert [s.progress for s in sections] == [0.5, 0.5, 1.0, 1.0]
+
+    def test_pdf_page_by_page(self, tmp_path: Any) -> None:
+        from pypdf import PdfWriter
+
+        writer = PdfWriter()
+        for _ in range(3):
+            writer.add_blank_page(width=612, height=792)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        path = _write(tmp_path, "d.pdf", buffer.getvalue())
+
+        sections = list(iter_file_sections(path, "application/pdf"))
+        assert [s.label for s in sections] == ["Page 1", "Page 2", "Page 3"]
+        assert sections[1].progress == pytest.approx(2 / 3)
+
+    def test_text_is_not_truncated(self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(parsing, "TEXT_BYTES_PER_SECTION", 1000)
+        text = "é" * (parsing.MAX_EXTRACTED_TEXT_LENGTH + 10)
+        path = _write(tmp_path, "t.txt", text.encode("utf-8"))
+        assert "".join(s.text for s in iter_file_sections(path, "text/plain")) == text
+
+    def test_json_items(self, tmp_path: Any) -> None:
+        path = _write(tmp_path, "d.json", json.dumps([{"a": 1}, {"b": 2}]).encode())
+        sections = list(iter_file_sections(path, "application/json"))
+        assert [s.label for s in sections] == ["Item 1", "Item 2"]
+
+    def test_images_and_unknown_types_rejected(self, tmp_path: Any) -> None:
+        path = _write(tmp_path, "x.png", b"\x89PNG")
+        with pytest.raises(ValueError):
+            list(iter_file_sections(path, "image/png"))
+        with pytest.raises(ValueError):
+            list(iter_file_sections(path, "application/x-msdownload"))
+
+
+# =============================================================================
+# Chunking
+# =============================================================================
+
+def _sentences(start: int, count: int) -> str:
+    return " ".join(f"Sentence {i} is about budget item {i}." for i in range(start, start + count))
+
+
+class TestChunking:
+
+    def test_chunks_respect_size_and_overlap(self) -> None:
+        sections = [
+            ParsedSection(f"Page {page}", f"{_sentences(page * 100, 30)}\n\nShort note {page}.", page / 3)
+            for page in range(1, 4)
+        ]
+        chunks = list(chunk_sections(sections, max_chars=500, overlap_chars=120))
+
+        assert [c.index for c in chunks] == list(range(len(chunks)))
+        assert all(len(c.text) <= 500 for c in chunks)
+        # Every sentence survives, and consecutive chunks share a tail
+        joined = " ".join(c.text for c in chunks)
+        for page in range(1, 4):
+            assert f"Sentence {page * 100 + 29} " in joined + " "
+            assert f"Short note {page}." in joined
+        overlaps = sum(c.text.split(". ")[-1] in n.text for c, n in zip(chunks, chunks[1:]))
+        assert overlaps >= len(chunks) // 2
+
+    def test_paragraphs_kept_whole_and_sections_tracked(self) -> None:
+        chunker = Chunker(max_chars=60, overlap_chars=0)
+        assert chunker.feed("Page 1", "First paragraph here.\n\nSecond one.") == []
+        chunks = chunker.feed("Page 2", "A paragraph on the next page.")
+        chunks += chunker.flush()
+        assert [c.text for c in chunks] == [
+            "First paragraph here.\n\nSecond one.",
+            "A paragraph on the next page.",
+        ]
+        assert [c.sections for c in chunks] == [["Page 1"], ["Page 2"]]
+        assert chunker.flush() == []
+
+    def test_oversized_word_is_split(self) -> None:
+        chunks = list(chunk_sections([ParsedSection("Part 1", "x" * 250, 1.0)], max_chars=100, overlap_chars=0))
+        assert [len(c.text) for c in chunks] == [100, 100, 50]
+
+
+# =============================================================================
+# Spooling
+# =============================================================================
+
+class TestSpool:
+
+    @pytest.mark.asyncio
+    async def test_streams_in_blocks(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(ingestion, "UPLOAD_READ_BLOCK_BYTES", 4)
+        upload = FakeUpload(b"0123456789")
+        path, size = await spool_upload(upload, "notes.txt")
+        try:
+            assert size == 10
+            assert path.endswith(".txt")
+            assert open(path, "rb").read() == b"0123456789"
+            assert set(upload.reads) == {4}
+        finally:
+            os.unlink(path)
+
+    @pytest.mark.asyncio
+    async def test_size_limit_enforced_while_streaming(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+        monkeypatch.setattr(ingestion.tempfile, "tempdir", str(tmp_path))
+        monkeypatch.setattr(ingestion, "UPLOAD_READ_BLOCK_BYTES", 4)
+        with pytest.raises(UploadTooLargeError):
+            await spool_upload(FakeUpload(b"x" * 20), "big.bin", max_bytes=10)
+        assert list(tmp_path.iterdir()) == []
+
+
+# =============================================================================
+# Jobs
+# =============================================================================
+
+def _csv(rows: int) -> bytes:
+    lines = ["Item,Note"] + [f"Item {i},Project Alpha line {i} with some extra words" for i in range(rows)]
+    return "\n".join(lines).encode()
+
+
+class TestIngestionJob:
+
+    @pytest.mark.asyncio
+    async def test_batched_embeddings_and_bulk_insert(
+        self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch, db: FakeSupabase, embeddings: FakeEmbeddings,
+    ) -> None:
+        monkeypatch.setattr(ingestion, "INGEST_EMBED_BATCH_SIZE", 4)
+        monkeypatch.setattr(ingestion, "INGEST_CHUNK_CHARS", 300)
+        monkeypatch.setattr(parsing, "ROWS_PER_SECTION", 10)
+        path = _write(tmp_path, "items.csv", _csv(100))
+
+        job = create_ingestion_job(path, os.path.getsize(path), "user-1", "items.csv", "text/csv")
+        assert job.job_id == db.document_id
+        assert get_ingestion_job(job.job_id) is job
+
+        await run_ingestion_job(job)
+
+        assert job.status == "completed", job.error
+        assert not os.path.exists(path)
+        assert db.uploads and db.uploads[0].startswith(b"Item,Note")
+
+        inserts = db.ops("memories", "insert")
+        rows = [row for _, _, payload, _ in inserts for row in payload]
+        # One embeddings call and one insert per batch of up to 4 chunks
+        assert embeddings.batches == [len(payload) for _, _, payload, _ in inserts]
+        assert max(embeddings.batches) == 4
+        assert len(rows) == job.chunks_stored > 4
+        assert [row["metadata"]["chunk_index"] for row in rows] == list(range(len(rows)))
+        assert all(row["document_id"] == db.document_id for row in rows)
+        assert rows[0]["content"].startswith("[File: items.csv | Rows 1-10")
+        assert rows[0]["metadata"]["domain"] == "work"
+        assert rows[0]["entity_links"] == ["11111111-1111-1111-1111-111111111111"]
+
+        final = db.ops("knowledge_files", "update")[-1][2]
+        assert final["status"] == "completed"
+        assert final["chunks_ingested"] == len(rows)
+        assert job.to_dict()["percent"] == 100
+
+    @pytest.mark.asyncio
+    async def test_failure_removes_partial_chunks(
+        self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch, db: FakeSupabase,
+    ) -> None:
+        failing = FakeEmbeddings(fail_after=1)
+        monkeypatch.setattr(memory, "get_embeddings", lambda: failing)
+        monkeypatch.setattr(ingestion, "INGEST_EMBED_BATCH_SIZE", 2)
+        monkeypatch.setattr(ingestion, "INGEST_CHUNK_CHARS", 200)
+        path = _write(tmp_path, "items.csv", _csv(50))
+
+        job = await run_ingestion_job(create_ingestion_job(path, 1, "user-1", "items.csv", "text/csv"))
+
+        assert job.status == "failed"
+        assert "embeddings down" in job.error
+        assert db.ops("memories", "delete")[0][3] == [("document_id", db.document_id)]
+        assert db.ops("knowledge_files", "update")[-1][2]["status"] == "failed"
+        assert not os.path.exists(path)
+
+    @pytest.mark.asyncio
+    async def test_progress_writes_run_off_the_event_loop(
+        self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch, db: FakeSupabase, embeddings: FakeEmbeddings,
+    ) -> None:
+        threads: List[str] = []
+        update = ingestion._update_document
+
+        def recording_update(job: Any, **fields: Any) -> None:
+            threads.append(threading.current_thread().name)
+            update(job, **fields)
+
+        monkeypatch.setattr(ingestion, "_update_document", recording_update)
+        path = _write(tmp_path, "items.csv", _csv(20))
+
+        job = await run_ingestion_job(create_ingestion_job(path, 1, "user-1", "items.csv", "text/csv"))
+
+        assert job.status == "completed", job.error
+        assert threads and threading.main_thread().name not in threads
+
+    @pytest.mark.asyncio
+    async def test_empty_file_fails(self, tmp_path: Any, db: FakeSupabase, embeddings: FakeEmbeddings) -> None:
+        path = _write(tmp_path, "empty.txt", b"   \n\n  ")
+        job = await run_ingestion_job(create_ingestion_job(path, 7, "user-1", "empty.txt", "text/plain"))
+        assert job.status == "failed"
+        assert embeddings.batches == []
+
+
+# =============================================================================
+# Endpoints
+# =============================================================================
+
+def test_upload_returns_job_and_progress(
+    monkeypatch: pytest.MonkeyPatch, db: FakeSupabase, embeddings: FakeEmbeddings,
+) -> None:
+    from lib.agent.routers.memory import router
+    from lib.agent.shared import verify_api_key
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[verify_api_key] = lambda: True
+    client = TestClient(app)
+
+    response = client.post(
+        "/memory/upload",
+        files={"file": ("items.csv", _csv(30), "text/csv")},
+        data={"user_id": "user-1"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ingestion_status"] == "queued"
+    assert body["job_id"] == db.document_id
+
+    # TestClient runs background tasks before returning
+    progress = client.get(body["progress_url"]).json()
+    assert progress["status"] == "completed"
+    assert progress["chunks_stored"] >= 1
+
+    monkeypatch.setattr(ingestion, "MAX_UPLOAD_BYTES", 10)
+    too_big = client.post(
+        "/memory/upload",
+        files={"file": ("items.csv", _csv(30), "text/csv")},
+        data={"user_id": "user-1"},
+    )
+    assert too_big.status_code == 413
+    assert client.get("/memory/upload/not-a-job/progress").status_code == 404
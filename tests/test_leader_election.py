@@ -0,0 +1,198 @@
+"""
+Tests for backend.services.leader_election
+===========================================
+
+Covers the Redis lease elector that gates the API's singleton services:
+- Only one of several electors becomes leader
+- Followers take over once the leader's lease lapses
+- A leader that loses its lease (or Redis) demotes itself
+- stop() releases the lease and runs on_demoted
+- status() serves the cached leader id without a Redis call
+- Disabled election is always leader
+
+Redis is replaced by an in-memory fake that implements the SET NX PX and
+Lua compare-and-* calls the elector uses.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from backend.services.leader_election import (
+    LeaderElector,
+    _RELEASE_SCRIPT,
+    _RENEW_SCRIPT,
+)
+
+
+# =========================================================================
+# Fakes
+# =========================================================================
+
+class FakeRedis:
+    """In-memory Redis with expiring keys and the elector's two scripts."""
+
+    def __init__(self) -> None:
+        self._store: Dict[str, Tuple[str, float]] = {}
+        self.fail: bool = False
+
+    def _check(self) -> None:
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._store.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            self._store.pop(key, None)
+            return None
+        return entry[0]
+
+    def expire_now(self, key: str) -> None:
+        self._store.pop(key, None)
+
+    def set(self, key: str, value: str, nx: bool = False, px: Optional[int] = None) -> bool:
+        self._check()
+        if nx and self._live(key) is not None:
+            return False
+        self._store[key] = (value, time.monotonic() + (px or 0) / 1000.0)
+        return True
+
+    def get(self, key: str) -> Optional[str]:
+        self._check()
+        return self._live(key)
+
+    def eval(self, script: str, numkeys: int, key: str, owner: str, *args: Any) -> int:
+        self._check()
+        if self._live(key) != owner:
+            return 0
+        if script == _RENEW_SCRIPT:
+            self._store[key] = (owner, time.monotonic() + int(args[0]) / 1000.0)
+            return 1
+        if script == _RELEASE_SCRIPT:
+            del self._store[key]
+            return 1
+        raise AssertionError("unexpected script")
+
+
+def _elector(redis: FakeRedis, name: str, events: List[str], **kwargs: Any) -> LeaderElector:
+    async def elected() -> None:
+        events.append(f"{name}:elected")
+
+    async def demoted() -> None:
+        events.append(f"{name}:demoted")
+
+    return LeaderElector(
+        name="test",
+        on_elected=elected,
+        on_demoted=demoted,
+        redis_client=redis,
+        instance_id=name,
+        enabled=True,
+        **kwargs,
+    )
+
+
+# =========================================================================
+# Tests
+# =========================================================================
+
+class TestLeaderElector:
+
+    @pytest.mark.asyncio
+    async def test_only_one_leader(self) -> None:
+        redis, events = FakeRedis(), []
+        a, b = _elector(redis, "a", events), _elector(redis, "b", events)
+
+        await a.tick()
+        await b.tick()
+
+        assert a.is_leader and not b.is_leader
+        assert events == ["a:elected"]
+        assert b.current_leader() == "a"
+
+    @pytest.mark.asyncio
+    async def test_follower_takes_over_after_lease_lapses(self) -> None:
+        redis, events = FakeRedis(), []
+        a, b = _elector(redis, "a", events), _elector(redis, "b", events)
+        await a.tick()
+
+        redis.expire_now(a.key)  # leader crashed, lease expired
+        await b.tick()
+
+        assert b.is_leader
+        assert events == ["a:elected", "b:elected"]
+
+    @pytest.mark.asyncio
+    async def test_leader_demoted_when_lease_stolen(self) -> None:
+        redis, events = FakeRedis(), []
+        a, b = _elector(redis, "a", events), _elector(redis, "b", events)
+        await a.tick()
+        redis.expire_now(a.key)
+        await b.tick()
+
+        await a.tick()  # renewal fails: b owns the key now
+
+        assert not a.is_leader and b.is_leader
+        assert events[-1] == "a:demoted"
+
+    @pytest.mark.asyncio
+    async def test_redis_outage_demotes_before_lease_expiry(self) -> None:
+        redis, events = FakeRedis(), []
+        a = _elector(redis, "a", events, ttl_seconds=0.3)
+        await a.tick()
+
+        redis.fail = True
+        await a.tick()
+        assert a.is_leader  # a single blip does not demote
+
+        a._last_renewed -= 0.3
+        await a.tick()
+        assert not a.is_leader
+        assert a.status().last_error == "redis down"
+
+    @pytest.mark.asyncio
+    async def test_follower_status_is_served_from_cache(self) -> None:
+        redis, events = FakeRedis(), []
+        a, b = _elector(redis, "a", events), _elector(redis, "b", events)
+        await a.tick()
+        await b.tick()
+
+        redis.fail = True  # status() must not touch Redis
+        status = b.status()
+
+        assert not status.is_leader
+        assert status.leader_id == a.instance_id
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_lease(self) -> None:
+        redis, events = FakeRedis(), []
+        a, b = _elector(redis, "a", events), _elector(redis, "b", events)
+        await a.start()
+
+        await a.stop()
+        await b.tick()
+
+        assert events == ["a:elected", "a:demoted", "b:elected"]
+        assert b.is_leader
+        await b.stop()
+
+    @pytest.mark.asyncio
+    async def test_disabled_is_always_leader(self) -> None:
+        events: List[str] = []
+        elector = LeaderElector(
+            name="test",
+            on_elected=lambda: _append(events, "elected"),
+            enabled=False,
+            redis_client=object(),  # never touched
+        )
+
+        await elector.start()
+
+        assert elector.is_leader
+        assert events == ["elected"]
+        assert elector.status().leader_id == elector.instance_id
+
+
+async def _append(events: List[str], item: str) -> None:
+    events.append(item)
@@ -0,0 +1,262 @@
+"""
+Tests for Set-Based Memory Archival
+====================================
+
+Unit tests for the chunked archive / restore jobs in
+``backend/worker/salience_job.py`` and the archive router endpoints that
+call them.  The Supabase RPCs are mocked.
+
+Run with: pytest tests/test_memory_archival.py -v
+"""
+
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.worker import salience_job
+from backend.worker.salience_job import (
+    archive_low_salience_memories,
+    build_retention_policies,
+    restore_archived_memories,
+)
+
+# Unpatched loader (the autouse fixture below replaces the module attribute)
+_load_archive_config_from_redis = salience_job._load_archive_config_from_redis
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def mock_supabase():
+    """Mock Supabase client for the archive jobs."""
+    with patch("backend.worker.salience_job._get_supabase_client") as mock:
+        client = MagicMock()
+        mock.return_value = client
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def archive_config():
+    """Default archive config (no Redis)."""
+    config: Dict[str, Any] = {
+        "threshold": 0.2,
+        "min_age_days": 90,
+        "max_access_count": 2,
+        "by_type": {},
+    }
+    with patch("backend.worker.salience_job._load_archive_config_from_redis", return_value=config):
+        yield config
+
+
+def _rpc_pages(mock_supabase, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return one canned row per rpc() call; record the params of each call."""
+    calls: List[Dict[str, Any]] = []
+    remaining = list(pages)
+
+    def _rpc(name, params):
+        calls.append({"name": name, **params})
+        query = MagicMock()
+        query.execute.return_value = MagicMock(data=[remaining.pop(0)])
+        return query
+
+    mock_supabase.rpc.side_effect = _rpc
+    return calls
+
+
+# =============================================================================
+# Test: retention policies
+# =============================================================================
+
+class TestRetentionPolicies:
+
+    def test_overrides_fill_from_default(self) -> None:
+        policies = build_retention_policies(
+            threshold=0.3,
+            min_age_days=60,
+            max_access_count=1,
+            by_type={"sms": {"min_age_days": 30}, "file": {"threshold": 0.0, "max_access_count": None}},
+        )
+        assert policies["default"] == {"threshold": 0.3, "min_age_days": 60, "max_access_count": 1}
+        assert policies["sms"] == {"threshold": 0.3, "min_age_days": 30, "max_access_count": 1}
+        assert policies["file"] == {"threshold": 0.0, "min_age_days": 60, "max_access_count": 1}
+
+
+# =============================================================================
+# Test: archive_low_salience_memories()
+# =============================================================================
+
+class TestArchive:
+
+    def test_walks_keyset_chunks(self, mock_supabase, archive_config) -> None:
+        archive_config["by_type"] = {"sms": {"min_age_days": 30}}
+        calls = _rpc_pages(mock_supabase, [
+            {"scanned": 500, "archived": 3, "next_after_salience": 0.15, "next_after": "id-500",
+             "by_type": {"sms": {"count": 3, "avg_salience": 0.1}}},
+            {"scanned": 120, "archived": 1, "next_after_salience": None, "next_after": None,
+             "by_type": {"sms": {"count": 1, "avg_salience": 0.02}}},
+        ])
+
+        result = archive_low_salience_memories()
+
+        assert [(c["p_after_salience"], c["p_after"]) for c in calls] == [(None, None), (0.15, "id-500")]
+        assert {c["name"] for c in calls} == {"archive_memory_chunk"}
+        assert calls[0]["p_policies"]["sms"]["min_age_days"] == 30
+        assert calls[0]["p_dry_run"] is False
+        assert result["status"] == "completed"
+        assert result["archived_count"] == 4
+        assert result["scanned"] == 620
+        assert result["chunks"] == 2
+        assert result["by_type"] == {"sms": {"count": 4, "avg_salience": 0.08}}
+
+    def test_dry_run_moves_nothing(self, mock_supabase) -> None:
+        calls = _rpc_pages(mock_supabase, [
+            {"scanned": 10, "archived": 2, "next_after": None, "by_type": {"default": {"count": 2, "avg_salience": 0.1}}},
+        ])
+
+        result = archive_low_salience_memories(threshold=0.5, dry_run=True, user_id="user-1")
+
+        assert calls[0]["p_dry_run"] is True
+        assert calls[0]["p_user_id"] == "user-1"
+        assert calls[0]["p_policies"]["default"]["threshold"] == 0.5
+        assert result["status"] == "dry_run"
+        assert result["candidate_count"] == 2
+        assert result["archived_count"] == 0
+
+    def test_user_config_preferred_over_global(self) -> None:
+        stored = {
+            "sabine:archive_config:user-1": '{"threshold": 0.4, "min_age_days": 7, "max_access_count": 0}',
+            "sabine:archive_config:global": '{"threshold": 0.1}',
+        }
+        redis_client = MagicMock()
+        redis_client.get.side_effect = stored.get
+
+        with patch("backend.services.redis_client.get_redis_client", return_value=redis_client):
+            user_config = _load_archive_config_from_redis("user-1")
+            other_config = _load_archive_config_from_redis("user-2")
+
+        assert user_config["threshold"] == 0.4
+        assert user_config["min_age_days"] == 7
+        assert other_config["threshold"] == 0.1
+
+    def test_chunk_error_reports_progress(self, mock_supabase) -> None:
+        query = MagicMock()
+        query.execute.side_effect = [
+            MagicMock(data=[{"scanned": 500, "archived": 7, "next_after": "id-500", "by_type": {}}]),
+            Exception("statement timeout"),
+        ]
+        mock_supabase.rpc.return_value = query
+
+        result = archive_low_salience_memories()
+
+        assert result["status"] == "failed"
+        assert result["archived_count"] == 7
+
+
+# =============================================================================
+# Test: restore_archived_memories()
+# =============================================================================
+
+class TestRestore:
+
+    def test_requires_predicate(self, mock_supabase) -> None:
+        with pytest.raises(ValueError):
+            restore_archived_memories()
+        mock_supabase.rpc.assert_not_called()
+
+    def test_restores_until_short_chunk(self, mock_supabase, monkeypatch) -> None:
+        monkeypatch.setattr(salience_job, "ARCHIVE_CHUNK_SIZE", 2)
+        calls = _rpc_pages(mock_supabase, [
+            {"restored": 2, "by_type": {"sms": 2}},
+            {"restored": 1, "by_type": {"sms": 1}},
+        ])
+
+        result = restore_archived_memories(user_id="user-1", memory_type="sms")
+
+        assert len(calls) == 2
+        assert calls[0]["name"] == "restore_archived_memories"
+        assert calls[0]["p_user_id"] == "user-1"
+        assert calls[0]["p_memory_type"] == "sms"
+        assert calls[0]["p_salience"] == salience_job.RESTORE_SALIENCE
+        assert result == {"status": "completed", "restored_count": 3, "by_type": {"sms": 3},
+                          "duration_ms": result["duration_ms"]}
+
+    def test_dry_run_is_one_call(self, mock_supabase, monkeypatch) -> None:
+        monkeypatch.setattr(salience_job, "ARCHIVE_CHUNK_SIZE", 2)
+        calls = _rpc_pages(mock_supabase, [{"restored": 40, "by_type": {"file": 40}}])
+
+        result = restore_archived_memories(archived_after="2026-02-01T00:00:00+00:00", dry_run=True)
+
+        assert len(calls) == 1
+        assert result["status"] == "dry_run"
+        assert result["restored_count"] == 40
+
+
+# =============================================================================
+# Test: archive router
+# =============================================================================
+
+@pytest.fixture
+def client() -> TestClient:
+    from lib.agent.routers.archive import router
+    from lib.agent.shared import verify_api_key
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[verify_api_key] = lambda: True
+    return TestClient(app)
+
+
+class TestArchiveRouter:
+
+    def test_trigger_dry_run_reports_by_type(self, client: TestClient) -> None:
+        report = {"status": "dry_run", "candidate_count": 5, "by_type": {"sms": {"count": 5, "avg_salience": 0.1}}}
+        with patch("backend.worker.salience_job.archive_low_salience_memories", return_value=report) as job:
+            response = client.post("/api/archive/trigger?user_id=u1", json={"threshold": 0.3, "dry_run": True})
+
+        assert response.status_code == 200
+        assert response.json()["estimated_count"] == 5
+        assert response.json()["by_type"]["sms"]["count"] == 5
+        job.assert_called_once_with(threshold=0.3, dry_run=True, user_id="u1")
+
+    def test_restore_scopes_to_user(self, client: TestClient) -> None:
+        result = {"status": "completed", "restored_count": 2, "by_type": {"sms": 2}}
+        with patch("backend.worker.salience_job.restore_archived_memories", return_value=result) as job:
+            response = client.post(
+                "/api/archive/restore?user_id=u1",
+                json={"memory_type": "sms", "archived_after": "2026-02-01T00:00:00Z"},
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "completed", "restored_count": 2, "by_type": {"sms": 2}}
+        kwargs = job.call_args.kwargs
+        assert kwargs["user_id"] == "u1"
+        assert kwargs["memory_type"] == "sms"
+        assert kwargs["archived_after"].startswith("2026-02-01T00:00:00")
+
+    def test_restore_failure_is_500(self, client: TestClient) -> None:
+        with patch("backend.worker.salience_job.restore_archived_memories",
+                   return_value={"status": "failed", "error": "boom"}):
+            response = client.post("/api/archive/restore?user_id=u1", json={})
+
+        assert response.status_code == 500
+
+    def test_stats_from_rpc(self, client: TestClient) -> None:
+        supabase = MagicMock()
+        supabase.rpc.return_value.execute.return_value = MagicMock(data=[
+            {"total_archived": 12, "last_archived_at": "2026-02-20T03:00:00+00:00", "avg_salience": 0.123456},
+        ])
+        with patch("lib.agent.routers.archive._get_supabase", return_value=supabase):
+            response = client.get("/api/archive/stats?user_id=u1")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "total_archived": 12,
+            "last_archive_run": "2026-02-20T03:00:00+00:00",
+            "avg_salience_of_archived": 0.1235,
+        }
+        supabase.rpc.assert_called_once_with("archived_memory_stats", {"p_user_id": "u1"})
@@ -0,0 +1,383 @@
+"""
+Tests for the In-Process Metrics Registry
+=========================================
+
+Run with: pytest tests/test_metrics.py -v
+
+Tests cover:
+1. Counter / gauge / histogram semantics and label validation
+2. Prometheus text rendering (HELP/TYPE, cumulative buckets, escaping)
+3. Redis aggregation: delta flushes, cross-process sums, fork safety
+4. Background gauge refresh (no DB queries at scrape time)
+5. Instrumentation hooks: LLM calls, agent callbacks, rq jobs, Fast Path
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services import metrics
+from backend.services.metrics import (
+    MetricsRefresher,
+    MetricsRegistry,
+    track_llm_call,
+)
+
+
+class FakeRedis:
+    """Hash commands and pipelines over a dict (shared like a real server)."""
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else {}
+        self.fail = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hgetall(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return {k: str(v) for k, v in self.store.get(key, {}).items()}
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def hincrbyfloat(self, key, field, amount):
+        self.ops.append(("incr", key, field, amount))
+
+    def hset(self, key, field, value):
+        self.ops.append(("set", key, field, value))
+
+    def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("redis down")
+        for op, key, field, value in self.ops:
+            table = self.redis.store.setdefault(key, {})
+            if op == "incr":
+                table[field] = table.get(field, 0.0) + float(value)
+            else:
+                table[field] = float(value)
+
+
+def _registry(redis=None):
+    registry = MetricsRegistry(redis_key="test:metrics")
+    if redis is not None:
+        registry.enable_redis(lambda: redis)
+    return registry
+
+
+# =============================================================================
+# Metric types
+# =============================================================================
+
+class TestMetricTypes:
+    def test_counter(self):
+        counter = _registry().counter("jobs_total", "Jobs", ["kind"])
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        assert counter.value(kind="a") == 3
+        with pytest.raises(ValueError):
+            counter.inc(-1, kind="a")
+
+    def test_labels_must_match(self):
+        counter = _registry().counter("jobs_total", "Jobs", ["kind"])
+        with pytest.raises(ValueError):
+            counter.inc()
+        with pytest.raises(ValueError):
+            counter.inc(kind="a", extra="b")
+
+    def test_gauge(self):
+        gauge = _registry().gauge("depth", "Depth")
+        gauge.set(5)
+        gauge.dec(2)
+        assert gauge.value() == 3
+
+    def test_histogram_buckets_are_cumulative(self):
+        hist = _registry().histogram("lat_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            hist.observe(value)
+
+        samples = hist.collect()
+        assert samples[("_bucket", (), "0.1")] == 2  # le is inclusive
+        assert samples[("_bucket", (), "1")] == 3
+        assert samples[("_bucket", (), "+Inf")] == 4
+        assert samples[("_count", (), None)] == 4
+        assert samples[("_sum", (), None)] == pytest.approx(3.65)
+
+    def test_histogram_time(self):
+        hist = _registry().histogram("lat_seconds", "Latency", ["stage"])
+        with hist.time(stage="x"):
+            pass
+        with pytest.raises(RuntimeError):
+            with hist.time(stage="x"):
+                raise RuntimeError
+        assert hist.count(stage="x") == 2
+
+    def test_reregistering_returns_same_metric(self):
+        registry = _registry()
+        assert registry.counter("a_total", "A", ["x"]) is registry.counter("a_total", "A", ["x"])
+        with pytest.raises(ValueError):
+            registry.gauge("a_total", "A", ["x"])
+
+
+# =============================================================================
+# Rendering
+# =============================================================================
+
+class TestRender:
+    def test_prometheus_text(self):
+        registry = _registry()
+        registry.counter("req_total", "Requests", ["path"]).inc(path='/a"b')
+        hist = registry.histogram("lat_seconds", "Latency", ["stage"], buckets=(0.5, 10))
+        hist.observe(0.2, stage="wal")
+        hist.observe(20, stage="wal")
+        registry.gauge("idle", "Idle gauge")
+
+        text = registry.render()
+
+        assert "# TYPE req_total counter" in text
+        assert 'req_total{path="/a\\"b"} 1' in text
+        assert "# TYPE lat_seconds histogram" in text
+        lines = [l for l in text.splitlines() if l.startswith("lat_seconds")]
+        assert lines == [
+            'lat_seconds_bucket{stage="wal",le="0.5"} 1',
+            'lat_seconds_bucket{stage="wal",le="10"} 1',
+            'lat_seconds_bucket{stage="wal",le="+Inf"} 2',
+            'lat_seconds_sum{stage="wal"} 20.2',
+            'lat_seconds_count{stage="wal"} 2',
+        ]
+        assert "idle 0" in text  # unlabelled metrics always have a sample
+
+    def test_default_instruments_render(self):
+        text = metrics.REGISTRY.render()
+        for name in ("sabine_fast_path_stage_seconds", "sabine_llm_request_seconds",
+                     "sabine_tool_executions_total", "sabine_rq_job_seconds",
+                     "sabine_wal_entries", "dream_team_queue_depth"):
+            assert f"# TYPE {name} " in text
+
+
+# =============================================================================
+# Redis aggregation
+# =============================================================================
+
+class TestRedisAggregation:
+    def test_flush_sends_only_deltas(self):
+        redis = FakeRedis()
+        registry = _registry(redis)
+        counter = registry.counter("c_total", "C")
+        counter.inc(3)
+        assert registry.flush()
+        counter.inc(2)
+        assert registry.flush()
+
+        field = metrics._field("c_total", ("", (), None))
+        assert redis.store["test:metrics"][field] == 5
+
+    def test_processes_sum_counters_and_histograms(self):
+        redis = FakeRedis()
+        api, worker = _registry(redis), _registry(redis)
+        for registry, duration in ((api, 0.2), (worker, 2.0)):
+            registry.counter("c_total", "C").inc()
+            registry.histogram("d_seconds", "D", buckets=(1.0,)).observe(duration)
+            registry.flush()
+
+        aggregate = api.read_aggregate()
+        assert aggregate["c_total"][("", (), None)] == 2
+        assert aggregate["d_seconds"][("_bucket", (), "1")] == 1
+        assert aggregate["d_seconds"][("_bucket", (), "+Inf")] == 2
+        assert "c_total 2" in api.render_aggregate()
+
+    def test_gauges_last_write_wins(self):
+        redis = FakeRedis()
+        a, b = _registry(redis), _registry(redis)
+        a.gauge("g", "G").set(4)
+        a.flush()
+        b.gauge("g", "G").set(7)
+        b.flush()
+        assert a.read_aggregate()["g"][("", (), None)] == 7
+
+    def test_failed_flush_is_retried(self):
+        redis = FakeRedis()
+        registry = _registry(redis)
+        registry.counter("c_total", "C").inc()
+        redis.fail = True
+        assert not registry.flush()
+        redis.fail = False
+        assert registry.flush()
+        assert registry.read_aggregate()["c_total"][("", (), None)] == 1
+
+    def test_forked_child_does_not_reflush_inherited_values(self):
+        redis = FakeRedis()
+        registry = _registry(redis)
+        counter = registry.counter("c_total", "C")
+        counter.inc(10)  # recorded by the parent, not yet flushed
+
+        registry._after_fork_in_child()
+        counter.inc()
+        registry.flush()
+
+        assert registry.read_aggregate()["c_total"][("", (), None)] == 1
+
+    def test_render_falls_back_to_local_when_redis_down(self):
+        redis = FakeRedis()
+        registry = _registry(redis)
+        registry.counter("c_total", "C").inc(4)
+        redis.fail = True
+        assert "c_total 4" in registry.render_aggregate()
+
+    def test_unknown_fields_are_ignored(self):
+        redis = FakeRedis({"test:metrics": {"garbage": 1.0, metrics._field("other", ("", (), None)): 2.0}})
+        assert _registry(redis).read_aggregate() == {}
+
+    def test_flush_without_redis_is_noop(self):
+        assert _registry().flush() is False
+
+
+# =============================================================================
+# Background refresh
+# =============================================================================
+
+class TestRefresher:
+    def test_runs_sync_and_async_collectors(self):
+        registry = _registry(FakeRedis())
+        gauge = registry.gauge("depth", "Depth")
+        calls = []
+
+        def sync_collector():
+            calls.append("sync")
+
+        async def async_collector():
+            await asyncio.sleep(0)
+            gauge.set(9)
+
+        def broken():
+            raise RuntimeError("db down")
+
+        refresher = MetricsRefresher([sync_collector, async_collector, broken], registry=registry)
+        assert refresher.refresh_once() == 2
+        assert calls == ["sync"]
+        assert registry.read_aggregate()["depth"][("", (), None)] == 9
+
+    def test_start_and_stop(self):
+        ticks = []
+        refresher = MetricsRefresher([lambda: ticks.append(1)], interval_seconds=60, registry=_registry())
+        refresher.start()
+        try:
+            assert refresher.running
+        finally:
+            refresher.stop()
+        assert not refresher.running
+        assert ticks
+
+    @pytest.mark.asyncio
+    async def test_task_queue_collector_sets_gauges(self):
+        service = MagicMock()
+        service.get_task_queue_health = AsyncMock(return_value={
+            "total_queued": 4, "total_in_progress": 1, "stale_queued_24h": 2,
+        })
+        service.get_latest_metrics = AsyncMock(return_value={"p95_duration_ms": 1200})
+
+        with patch("backend.services.task_queue.get_task_queue_service", return_value=service):
+            await metrics._collect_task_queue()
+
+        assert metrics.DREAM_TEAM_QUEUE_DEPTH.value(status="queued") == 4
+        assert metrics.DREAM_TEAM_STALE.value(threshold="24h") == 2
+        assert metrics.DREAM_TEAM_DURATION.value(quantile="p95") == 1200
+
+    def test_rq_collector_skips_errors(self):
+        metrics.RQ_WORKERS.set(3)
+        with patch("backend.services.queue.get_queue_stats", return_value={"error": "down"}):
+            metrics._collect_rq_queue()
+        assert metrics.RQ_WORKERS.value() == 3
+
+    @pytest.mark.asyncio
+    async def test_scrape_does_not_query_database(self):
+        from lib.agent.routers.observability import get_prometheus_metrics
+
+        with patch("backend.services.task_queue.get_task_queue_service") as service, \
+                patch("backend.services.metrics.start_metrics_refresher") as start:
+            response = await get_prometheus_metrics()
+
+        service.assert_not_called()
+        start.assert_called_once()
+        body = response.body.decode()
+        assert "# TYPE sabine_fast_path_stage_seconds histogram" in body
+        assert "sabine_user_config_cache_entries" in body
+
+
+# =============================================================================
+# Instrumentation
+# =============================================================================
+
+class TestInstrumentation:
+    def test_track_llm_call(self):
+        model = f"m-{uuid4().hex[:6]}"
+        with track_llm_call("openai", model):
+            pass
+        with pytest.raises(TimeoutError):
+            with track_llm_call("openai", model):
+                raise TimeoutError
+
+        assert metrics.LLM_REQUESTS_TOTAL.value(provider="openai", model=model, status="success") == 1
+        assert metrics.LLM_REQUESTS_TOTAL.value(provider="openai", model=model, status="error") == 1
+        assert metrics.LLM_REQUEST_SECONDS.count(provider="openai", model=model) == 2
+
+    def test_fast_path_timings(self):
+        from backend.services.fast_path_timing import FastPathTimings
+
+        before = metrics.FAST_PATH_STAGE_SECONDS.count(stage="wal_write")
+        FastPathTimings(wal_write_ms=12.0, total_ms=80.0).record_metrics()
+        assert metrics.FAST_PATH_STAGE_SECONDS.count(stage="wal_write") == before + 1
+        assert metrics.FAST_PATH_STAGE_SECONDS.count(stage="total") >= 1
+
+    def test_agent_callback_handler(self):
+        from lib.agent.metrics_callbacks import MetricsCallbackHandler
+
+        model = f"m-{uuid4().hex[:6]}"
+        tool = f"tool_{uuid4().hex[:6]}"
+        handler = MetricsCallbackHandler(provider="anthropic", model=model)
+
+        llm_run, tool_ok, tool_bad = uuid4(), uuid4(), uuid4()
+        handler.on_chat_model_start({}, [], run_id=llm_run)
+        handler.on_llm_end(MagicMock(), run_id=llm_run)
+        handler.on_tool_start({"name": tool}, "{}", run_id=tool_ok)
+        handler.on_tool_start({"name": tool}, "{}", run_id=tool_bad)
+        handler.on_tool_end("ok", run_id=tool_ok)
+        handler.on_tool_error(RuntimeError("x"), run_id=tool_bad)
+        handler.on_llm_end(MagicMock(), run_id=uuid4())  # unknown run: ignored
+
+        assert metrics.LLM_REQUESTS_TOTAL.value(provider="anthropic", model=model, status="success") == 1
+        assert metrics.TOOL_EXECUTIONS_TOTAL.value(tool=tool, status="success") == 1
+        assert metrics.TOOL_EXECUTIONS_TOTAL.value(tool=tool, status="error") == 1
+        assert metrics.TOOL_EXECUTION_SECONDS.count(tool=tool) == 2
+
+    def test_rq_job_duration_and_flush(self):
+        from backend.worker.memory_guard import memory_profiled_job
+
+        job = f"job_{uuid4().hex[:6]}"
+
+        def ok():
+            return {"status": "processed"}
+
+        def failed():
+            return {"status": "failed"}
+
+        ok.__name__ = failed.__name__ = job
+
+        with patch("backend.worker.memory_guard._record_peak_memory"), \
+                patch("backend.services.metrics.flush_metrics") as flush:
+            memory_profiled_job()(ok)()
+            memory_profiled_job()(failed)()
+
+        assert metrics.RQ_JOB_SECONDS.count(job=job, status="success") == 1
+        assert metrics.RQ_JOB_SECONDS.count(job=job, status="failed") == 1
+        assert flush.call_count == 2
@@ -0,0 +1,312 @@
+"""
+Tests for the provider rate limiter (backend/services/rate_limiter.py).
+"""
+
+import threading
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+
+from backend.services import rate_limiter
+from backend.services.rate_limiter import (
+    LLMRateLimiter,
+    LocalBucketBackend,
+    Priority,
+    RateLimit,
+    RedisBucketBackend,
+    ThrottleWaitExceeded,
+    current_priority,
+    llm_priority,
+    retry_after_seconds,
+    run_with_priority,
+)
+from lib.agent.circuit_breaker import is_provider_failure
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+class FakeTime:
+    """Clock whose sleeps advance it instantly."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float) -> None:
+        self.sleep(seconds)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, headers: Any = None) -> None:
+        super().__init__("rate limited")
+        self.response = SimpleNamespace(status_code=429, headers=headers or {})
+
+
+@pytest.fixture
+def clock() -> FakeTime:
+    return FakeTime()
+
+
+def _limiter(clock: FakeTime, **limits: RateLimit) -> LLMRateLimiter:
+    return LLMRateLimiter(
+        limits={"anthropic": RateLimit(rpm=60, tpm=6000), **limits},
+        backend=LocalBucketBackend(clock=clock),
+        clock=clock,
+        sleep=clock.sleep,
+        async_sleep=clock.async_sleep,
+    )
+
+
+# =============================================================================
+# Budgets
+# =============================================================================
+
+class TestBudgets:
+
+    @pytest.mark.asyncio
+    async def test_requests_per_minute(self, clock: FakeTime) -> None:
+        limiter = _limiter(clock, anthropic=RateLimit(rpm=2))
+        assert await limiter.acquire("anthropic", "haiku") == 0
+        assert await limiter.acquire("anthropic", "haiku") == 0
+        waited = await limiter.acquire("anthropic", "haiku", max_wait=120)
+        assert waited == pytest.approx(30, abs=1.5)   # one request refills every 30s
+
+    def test_keys_are_per_model(self, clock: FakeTime) -> None:
+        limiter = _limiter(clock, anthropic=RateLimit(rpm=1))
+        assert limiter.acquire_sync("anthropic", "haiku") == 0
+        assert limiter.acquire_sync("anthropic", "sonnet") == 0
+
+    def test_model_override(self, clock: FakeTime) -> None:
+        limiter = _limiter(clock, **{"anthropic:haiku": RateLimit(rpm=5, tpm=0)})
+        assert limiter.limit_for("anthropic", "haiku") == RateLimit(rpm=5, tpm=0)
+        assert limiter.limit_for("anthropic", "sonnet") == RateLimit(rpm=60, tpm=6000)
+        assert limiter.limit_for("unknown", "m") == RateLimit()
+
+    def test_token_debt_delays_next_call(self, clock: FakeTime) -> None:
+        limiter = _limiter(clock)
+        assert limiter.acquire_sync("anthropic", "haiku", tokens=1000) == 0
+        limiter.record_usage("anthropic", "haiku", 6000)   # actual usage far above the estimate
+        waited = limiter.acquire_sync("anthropic", "haiku", tokens=100)
+        # 7000 used of a 6000/min bucket: 1100 short at 100 tokens/s
+        assert waited == pytest.approx(11, abs=1.5)
+
+    def test_unlimited_provider_never_waits(self, clock: FakeTime) -> None:
+        limiter = _limiter(clock, ollama=RateLimit())
+        for _ in range(100):
+            assert limiter.acquire_sync("ollama", "phi4") == 0
+
+    def test_wait_exceeded(self, clock: FakeTime) -> None:
+        limiter = _limiter(clock, anthropic=RateLimit(rpm=1))
+        limiter.acquire_sync("anthropic", "haiku")
+        with pytest.raises(ThrottleWaitExceeded) as info:
+            limiter.acquire_sync("anthropic", "haiku", max_wait=5)
+        # Our own budget being spent must not trip the provider's breaker
+        assert not is_provider_failure(info.value)
+
+
+# =============================================================================
+# Priorities
+# =============================================================================
+
+class TestPriorities:
+
+    def test_background_leaves_interactive_reserve(self, clock: FakeTime) -> None:
+        limiter = _limiter(clock, anthropic=RateLimit(rpm=10))
+        for _ in range(8):
+            assert limiter.acquire_sync("anthropic", "haiku", priority=Priority.BACKGROUND) == 0
+        with pytest.raises(ThrottleWaitExceeded):
+            limiter.acquire_sync("anthropic", "haiku", priority=Priority.BACKGROUND, max_wait=1)
+        assert limiter.acquire_sync("anthropic", "haiku", priority=Priority.INTERACTIVE) == 0
+
+    def test_background_yields_to_waiting_interactive(self, clock: FakeTime) -> None:
+        backend = LocalBucketBackend(clock=clock)
+        limit = RateLimit(rpm=100, tpm=1000)
+        assert backend.try_acquire("k", limit, 1, 900, True, 0.2, "a") == 0
+        # Interactive call needs more tokens than are left: it queues...
+        assert backend.try_acquire("k", limit, 1, 500, True, 0.2, "b") > 0
+        # ...and background calls stand aside even though they would fit
+        assert backend.try_acquire("k", limit, 1, 0, False, 0.0, "c") == -1
+        clock.now += 30
+        assert backend.try_acquire("k", limit, 1, 500, True, 0.2, "b") == 0
+        assert backend.try_acquire("k", limit, 1, 0, False, 0.0, "c") == 0
+
+    @pytest.mark.asyncio
+    async def test_priority_context(self) -> None:
+        assert current_priority() == Priority.INTERACTIVE
+        with llm_priority(Priority.BACKGROUND):
+            assert current_priority() == Priority.BACKGROUND
+        assert current_priority() == Priority.INTERACTIVE
+
+        async def job() -> Priority:
+            return current_priority()
+
+        assert await run_with_priority(Priority.BACKGROUND, job) == Priority.BACKGROUND
+        assert await run_with_priority(Priority.BACKGROUND, current_priority) == Priority.BACKGROUND
+
+
+# =============================================================================
+# Provider 429s
+# =============================================================================
+
+class TestRetryAfter:
+
+    def test_parse_headers(self) -> None:
+        assert retry_after_seconds(RateLimited({"retry-after": "7"})) == 7
+        assert retry_after_seconds(RateLimited({"retry-after-ms": "1500"})) == 1.5
+        assert retry_after_seconds(RateLimited({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+        assert retry_after_seconds(RateLimited()) is None
+
+    def test_429_blocks_every_priority(self, clock: FakeTime) -> None:
+        limiter = _limiter(clock)
+        assert limiter.handle_error("anthropic", "haiku", RateLimited({"retry-after": "7"})) == 7
+        assert limiter.handle_error("anthropic", "haiku", ValueError("bad request")) is None
+        waited = limiter.acquire_sync("anthropic", "haiku", priority=Priority.INTERACTIVE)
+        assert waited == pytest.approx(7, abs=0.5)
+
+    @pytest.mark.asyncio
+    async def test_slot_settles_usage_and_honours_429(self, clock: FakeTime, monkeypatch) -> None:
+        limiter = _limiter(clock)
+        monkeypatch.setattr(rate_limiter, "_limiter", limiter)
+
+        async with rate_limiter.llm_rate_limit("anthropic", "haiku", estimated_tokens=100) as slot:
+            slot.record(SimpleNamespace(usage=SimpleNamespace(input_tokens=5900, output_tokens=100)))
+        assert limiter.acquire_sync("anthropic", "haiku", tokens=100) > 0
+
+        with pytest.raises(RateLimited):
+            with rate_limiter.llm_rate_limit("anthropic", "sonnet"):
+                raise RateLimited({"retry-after": "3"})
+        assert limiter.acquire_sync("anthropic", "sonnet") == pytest.approx(3, abs=0.5)
+
+
+# =============================================================================
+# Backends and integration
+# =============================================================================
+
+class FakeRedis:
+    """Records script calls; fails when told to."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.calls: List[Any] = []
+
+    def register_script(self, source: str) -> Any:
+        def run(keys: List[str], args: List[Any]) -> bytes:
+            if self.fail:
+                raise ConnectionError("redis down")
+            self.calls.append((keys, args))
+            return b"0"
+        return run
+
+
+def test_redis_backend_keys_and_fallback(clock: FakeTime) -> None:
+    redis = FakeRedis()
+    limiter = LLMRateLimiter(
+        limits={"groq": RateLimit(rpm=1)}, backend=RedisBucketBackend(redis),
+        clock=clock, sleep=clock.sleep,
+    )
+    assert limiter.acquire_sync("groq", "llama") == 0
+    keys, args = redis.calls[0]
+    assert keys == [f"sabine:ratelimit:groq:llama:{suffix}" for suffix in ("req", "tok", "blocked", "waiters")]
+    assert args[:5] == [1, 0, 1, 0, 1]
+
+    # Redis errors fall back to in-process buckets, which still enforce the limit
+    redis.fail = True
+    assert limiter.acquire_sync("groq", "llama") == 0
+    assert limiter.acquire_sync("groq", "llama", max_wait=120) > 0
+
+
+@pytest.mark.asyncio
+async def test_async_acquire_runs_redis_script_off_the_loop(clock: FakeTime) -> None:
+    threads: List[str] = []
+
+    class RecordingRedis(FakeRedis):
+        def register_script(self, source: str) -> Any:
+            run = super().register_script(source)
+
+            def recorded(keys: List[str], args: List[Any]) -> bytes:
+                threads.append(threading.current_thread().name)
+                return run(keys, args)
+            return recorded
+
+    limiter = LLMRateLimiter(
+        limits={"groq": RateLimit(rpm=1)}, backend=RedisBucketBackend(RecordingRedis()),
+        clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep,
+    )
+    assert await limiter.acquire("groq", "llama") == 0
+    assert threads and threading.main_thread().name not in threads
+
+
+@pytest.mark.asyncio
+async def test_settlement_runs_redis_script_off_the_loop(clock: FakeTime, monkeypatch) -> None:
+    threads: List[str] = []
+
+    class RecordingRedis(FakeRedis):
+        def register_script(self, source: str) -> Any:
+            run = super().register_script(source)
+
+            def recorded(keys: List[str], args: List[Any]) -> bytes:
+                threads.append(threading.current_thread().name)
+                return run(keys, args)
+            return recorded
+
+    limiter = LLMRateLimiter(
+        limits={"anthropic": RateLimit(tpm=6000)}, backend=RedisBucketBackend(RecordingRedis()),
+        clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep,
+    )
+    monkeypatch.setattr(rate_limiter, "_limiter", limiter)
+
+    with pytest.raises(RateLimited):
+        async with rate_limiter.llm_rate_limit("anthropic", "haiku", estimated_tokens=100) as slot:
+            await slot.record_async(SimpleNamespace(usage=SimpleNamespace(input_tokens=500, output_tokens=100)))
+            raise RateLimited({"retry-after": "3"})
+    limiter.record_usage_nowait("anthropic", "haiku", 50)
+    assert limiter.handle_error_nowait("anthropic", "haiku", RateLimited({"retry-after": "2"})) == 2
+    limiter._settler.shutdown(wait=True)
+
+    # acquire, charge, block (async); charge, block (settlement thread)
+    assert len(threads) == 5
+    assert threading.main_thread().name not in threads
+
+
+@pytest.mark.asyncio
+async def test_chat_model_queues_and_breaker_sees_provider_latency(monkeypatch) -> None:
+    import time
+
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    from lib.agent import circuit_breaker
+    from lib.agent.metrics_callbacks import CircuitBreakerCallbackHandler
+
+    # Real clock: 600 tokens/min, one token in debt -> ~0.1s queue
+    limiter = LLMRateLimiter(limits={"anthropic": RateLimit(tpm=600)}, backend=LocalBucketBackend())
+    limiter.record_usage("anthropic", "sonnet", 601)
+    monkeypatch.setattr(rate_limiter, "_limiter", limiter)
+    registry = circuit_breaker.CircuitBreakerRegistry(
+        config=circuit_breaker.BreakerConfig(min_calls=1, slow_call_seconds=0.05, slow_call_rate_threshold=0.5),
+    )
+    monkeypatch.setattr(circuit_breaker, "_registry", registry)
+
+    model = GenericFakeChatModel(
+        messages=iter([AIMessage(content="ok")]),
+        rate_limiter=rate_limiter.ProviderRateLimiter("anthropic", "sonnet"),
+        callbacks=[CircuitBreakerCallbackHandler("anthropic")],
+    )
+    start = time.perf_counter()
+    await model.ainvoke([HumanMessage(content="hi")])
+    assert time.perf_counter() - start >= 0.05
+
+    # The queueing was excluded, so the breaker did not see a slow call
+    assert registry.get("anthropic").state == circuit_breaker.BreakerState.CLOSED
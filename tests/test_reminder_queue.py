@@ -0,0 +1,432 @@
+"""
+Tests for Reminder Queue - Redis Sorted-Set Index
+=================================================
+
+Run with: pytest tests/test_reminder_queue.py -v
+
+Tests cover:
+1. Next-occurrence computation
+2. Atomic claim: a due reminder is delivered once across dispatchers
+3. Finalize: recurring reminders move forward, one-time reminders leave
+4. Retry and give-up on failed deliveries (persisted before removal)
+5. One-time bootstrap from the reminders table
+6. ReminderScheduler routing to the queue
+7. Concurrent delivery and channel rate limiting
+
+Redis is replaced by an in-memory fake that emulates the queue's two Lua
+scripts.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import UUID, uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.agent.reminder_queue import (
+    INDEXED_KEY,
+    SCHEDULE_KEY,
+    SPEC_KEY,
+    ReminderQueue,
+    _CLAIM_SCRIPT,
+    _FINALIZE_SCRIPT,
+    next_fire_time,
+)
+from lib.agent.reminder_scheduler import ReminderScheduler
+
+
+# =============================================================================
+# Fakes
+# =============================================================================
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis"):
+        self._redis = redis
+        self._calls: List[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        def _queue(*args: Any, **kwargs: Any) -> "FakePipeline":
+            self._calls.append((name, args, kwargs))
+            return self
+        return _queue
+
+    def execute(self) -> List[Any]:
+        return [getattr(self._redis, n)(*a, **k) for n, a, k in self._calls]
+
+
+class FakeRedis:
+    """Just enough Redis for ReminderQueue (ZSET, HASH, SET NX, scripts)."""
+
+    def __init__(self) -> None:
+        self.zsets: Dict[str, Dict[str, float]] = {}
+        self.hashes: Dict[str, Dict[str, str]] = {}
+        self.strings: Dict[str, str] = {}
+
+    def ping(self) -> bool:
+        return True
+
+    def pipeline(self) -> FakePipeline:
+        return FakePipeline(self)
+
+    def zadd(self, key: str, mapping: Dict[str, float], nx: bool = False) -> int:
+        zset = self.zsets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if nx and member in zset:
+                continue
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    def zrem(self, key: str, member: str) -> int:
+        return int(self.zsets.get(key, {}).pop(member, None) is not None)
+
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        return self.zsets.get(key, {}).get(member)
+
+    def zrange(self, key: str, start: int, end: int, withscores: bool = False) -> List[Any]:
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda kv: (kv[1], kv[0]))
+        items = items[start:] if end == -1 else items[start:end + 1]
+        return items if withscores else [m for m, _ in items]
+
+    def hset(self, key: str, field: str, value: str) -> int:
+        self.hashes.setdefault(key, {})[field] = value
+        return 1
+
+    def hsetnx(self, key: str, field: str, value: str) -> int:
+        h = self.hashes.setdefault(key, {})
+        if field in h:
+            return 0
+        h[field] = value
+        return 1
+
+    def hdel(self, key: str, field: str) -> int:
+        return int(self.hashes.get(key, {}).pop(field, None) is not None)
+
+    def hmget(self, key: str, fields: List[str]) -> List[Optional[str]]:
+        return [self.hashes.get(key, {}).get(f) for f in fields]
+
+    def set(self, key: str, value: str, nx: bool = False) -> bool:
+        if nx and key in self.strings:
+            return False
+        self.strings[key] = value
+        return True
+
+    def delete(self, key: str) -> int:
+        return int(self.strings.pop(key, None) is not None)
+
+    def eval(self, script: str, numkeys: int, *args: Any) -> Any:
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == _CLAIM_SCRIPT:
+            now_ms, limit, lease = float(argv[0]), int(argv[1]), float(argv[2])
+            due = [m for m, s in self.zrange(keys[0], 0, -1, withscores=True) if s <= now_ms]
+            due = due[:limit]
+            for member in due:
+                self.zsets[keys[0]][member] = lease
+            return due
+        if script == _FINALIZE_SCRIPT:
+            member, claimed, next_score, spec = argv
+            if self.zscore(keys[0], member) != float(claimed):
+                return 0
+            if next_score == "":
+                self.zrem(keys[0], member)
+                self.hdel(keys[1], member)
+            else:
+                self.zsets[keys[0]][member] = float(next_score)
+                if spec != "":
+                    self.hset(keys[1], member, spec)
+            return 1
+        raise AssertionError("unexpected script")
+
+
+class Clock:
+    def __init__(self, start: datetime):
+        self.now = start.timestamp()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+START = datetime(2026, 3, 2, 15, 0, tzinfo=timezone.utc)
+
+
+def _fire_with(status: str, action: Optional[str] = None) -> AsyncMock:
+    async def _fire(ids: List[UUID]) -> List[Dict[str, Any]]:
+        return [{"reminder_id": str(i), "status": status, "action": action} for i in ids]
+    return AsyncMock(side_effect=_fire)
+
+
+# =============================================================================
+# Unit Tests: Next Fire Time
+# =============================================================================
+
+class TestNextFireTime:
+
+    def test_one_time_future(self):
+        at = START + timedelta(hours=1)
+        assert next_fire_time(at, None, START) == at
+
+    def test_one_time_past_is_none(self):
+        assert next_fire_time(START - timedelta(hours=1), None, START) is None
+
+    def test_daily_moves_one_day(self):
+        nxt = next_fire_time(START, "daily", START)
+        assert nxt - START == timedelta(days=1)
+
+
+# =============================================================================
+# Unit Tests: Claim / Finalize
+# =============================================================================
+
+class TestDispatch:
+
+    @pytest.mark.asyncio
+    async def test_due_reminder_claimed_once_across_dispatchers(self):
+        redis, clock = FakeRedis(), Clock(START)
+        a = ReminderQueue(redis_client=redis, clock=clock)
+        b = ReminderQueue(redis_client=redis, clock=clock)
+        rid = uuid4()
+        await a.schedule(rid, START - timedelta(minutes=1))
+
+        ids_a, _ = await a.claim_due()
+        ids_b, _ = await b.claim_due()
+
+        assert ids_a == [str(rid)]
+        assert ids_b == []
+
+    @pytest.mark.asyncio
+    async def test_future_reminders_not_claimed(self):
+        redis, clock = FakeRedis(), Clock(START)
+        queue = ReminderQueue(redis_client=redis, clock=clock)
+        await queue.schedule(uuid4(), START + timedelta(hours=1))
+
+        fire = _fire_with("success", "completed")
+        assert await queue.dispatch_due(fire) == []
+        fire.assert_not_called()
+        assert await queue.seconds_until_next() == pytest.approx(3600)
+
+    @pytest.mark.asyncio
+    async def test_one_time_removed_after_delivery(self):
+        redis, clock = FakeRedis(), Clock(START)
+        queue = ReminderQueue(redis_client=redis, clock=clock)
+        rid = uuid4()
+        await queue.schedule(rid, START)
+
+        await queue.dispatch_due(_fire_with("success", "completed"))
+
+        assert redis.zsets[SCHEDULE_KEY] == {}
+        assert redis.hashes[SPEC_KEY] == {}
+
+    @pytest.mark.asyncio
+    async def test_recurring_rescheduled_to_next_occurrence(self):
+        redis, clock = FakeRedis(), Clock(START)
+        queue = ReminderQueue(redis_client=redis, clock=clock)
+        rid = uuid4()
+        await queue.schedule(rid, START, "daily")
+        clock.advance(60)
+
+        await queue.dispatch_due(_fire_with("success", "triggered_recurring"))
+
+        score = redis.zsets[SCHEDULE_KEY][str(rid)]
+        assert score == (START + timedelta(days=1)).timestamp() * 1000
+
+    @pytest.mark.asyncio
+    async def test_reschedule_during_delivery_wins(self):
+        redis, clock = FakeRedis(), Clock(START)
+        queue = ReminderQueue(redis_client=redis, clock=clock)
+        rid = uuid4()
+        moved_to = START + timedelta(days=3)
+        await queue.schedule(rid, START)
+
+        async def _fire(ids: List[UUID]) -> List[Dict[str, Any]]:
+            await queue.schedule(rid, moved_to)  # user edits the reminder
+            return [{"status": "success", "action": "completed"}]
+
+        await queue.dispatch_due(_fire)
+
+        assert redis.zsets[SCHEDULE_KEY][str(rid)] == moved_to.timestamp() * 1000
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_retries_then_gives_up(self):
+        redis, clock = FakeRedis(), Clock(START)
+        queue = ReminderQueue(redis_client=redis, clock=clock, lease_seconds=60, max_attempts=2)
+        rid = uuid4()
+        await queue.schedule(rid, START)
+        fire = _fire_with("failed")
+
+        await queue.dispatch_due(fire)
+        assert json.loads(redis.hashes[SPEC_KEY][str(rid)])["attempts"] == 1
+        assert await queue.dispatch_due(fire) == []  # still leased
+
+        clock.advance(60)
+        await queue.dispatch_due(fire)
+        assert str(rid) not in redis.zsets[SCHEDULE_KEY]
+        assert fire.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_give_up_must_persist_before_removal(self):
+        redis, clock = FakeRedis(), Clock(START)
+        queue = ReminderQueue(redis_client=redis, clock=clock, lease_seconds=60, max_attempts=1)
+        rid = uuid4()
+        await queue.schedule(rid, START)
+        give_up = AsyncMock(side_effect=[False, True])
+
+        await queue.dispatch_due(_fire_with("failed"), give_up)
+        assert str(rid) in redis.zsets[SCHEDULE_KEY]
+
+        # Re-indexing by the poller leaves the attempt count alone
+        assert await queue.schedule(rid, START, only_if_absent=True) is None
+
+        clock.advance(60)
+        await queue.dispatch_due(_fire_with("failed"), give_up)
+        assert str(rid) not in redis.zsets[SCHEDULE_KEY]
+        assert give_up.await_args_list[-1].args[0] == rid
+
+    @pytest.mark.asyncio
+    async def test_recurring_gives_up_occurrence_only(self):
+        redis, clock = FakeRedis(), Clock(START)
+        queue = ReminderQueue(redis_client=redis, clock=clock, max_attempts=1)
+        rid = uuid4()
+        await queue.schedule(rid, START, "daily")
+        give_up = AsyncMock(return_value=True)
+
+        await queue.dispatch_due(_fire_with("failed"), give_up)
+
+        give_up.assert_not_awaited()
+        assert redis.zsets[SCHEDULE_KEY][str(rid)] == (START + timedelta(days=1)).timestamp() * 1000
+        assert json.loads(redis.hashes[SPEC_KEY][str(rid)])["attempts"] == 0
+
+
+# =============================================================================
+# Unit Tests: Bootstrap
+# =============================================================================
+
+class TestBootstrap:
+
+    def _client(self, rows: List[Dict[str, Any]]) -> MagicMock:
+        client = MagicMock()
+        query = client.table.return_value.select.return_value.eq.return_value.eq.return_value
+        query.order.return_value.limit.return_value.execute.return_value = MagicMock(data=rows)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_bootstrap_runs_once(self):
+        redis, clock = FakeRedis(), Clock(START)
+        queue = ReminderQueue(redis_client=redis, clock=clock)
+        rows = [
+            {"id": str(uuid4()), "title": "A", "scheduled_time": (START + timedelta(hours=1)).isoformat(), "repeat_pattern": None},
+            {"id": str(uuid4()), "title": "B", "scheduled_time": "2026-01-01T09:00:00Z", "repeat_pattern": "weekly"},
+        ]
+        client = self._client(rows)
+
+        first = await queue.bootstrap(client)
+        second = await queue.bootstrap(client)
+
+        assert first["bootstrapped"] and first["indexed"] == 2
+        assert not second["bootstrapped"]
+        assert client.table.call_count == 1
+        assert INDEXED_KEY in redis.strings
+
+    @pytest.mark.asyncio
+    async def test_bootstrap_failure_allows_retry(self):
+        redis = FakeRedis()
+        queue = ReminderQueue(redis_client=redis, clock=Clock(START))
+        client = MagicMock()
+        client.table.side_effect = RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await queue.bootstrap(client)
+
+        assert INDEXED_KEY not in redis.strings
+
+
+# =============================================================================
+# Unit Tests: Scheduler Integration
+# =============================================================================
+
+class TestSchedulerWithQueue:
+
+    @pytest.mark.asyncio
+    async def test_add_and_remove_use_index(self):
+        redis = FakeRedis()
+        queue = ReminderQueue(redis_client=redis, clock=Clock(START))
+        apscheduler = MagicMock()
+        scheduler = ReminderScheduler(scheduler=apscheduler, queue=queue)
+        rid = uuid4()
+
+        assert await scheduler.add_reminder_job(rid, START + timedelta(hours=1), title="Dentist")
+        apscheduler.add_job.assert_not_called()
+        assert scheduler.get_reminder_jobs()[0]["name"] == "Reminder: Dentist"
+
+        assert await scheduler.remove_reminder_job(rid)
+        assert redis.zsets[SCHEDULE_KEY] == {}
+
+    @pytest.mark.asyncio
+    async def test_start_falls_back_when_redis_unreachable(self):
+        queue = MagicMock()
+        queue.is_available = AsyncMock(return_value=False)
+        scheduler = ReminderScheduler(scheduler=MagicMock(), queue=queue)
+
+        with patch.object(scheduler, "restore_reminder_jobs", new_callable=AsyncMock) as restore:
+            await scheduler.start()
+
+        restore.assert_awaited_once()
+        assert scheduler._queue is None
+
+    @pytest.mark.asyncio
+    async def test_give_up_deactivates_reminder(self):
+        scheduler = ReminderScheduler(scheduler=MagicMock(), queue=MagicMock())
+        service = MagicMock()
+        service.mark_reminder_failed = AsyncMock(return_value=MagicMock(success=True))
+        rid = uuid4()
+
+        with patch("backend.services.reminder_service.get_reminder_service", return_value=service):
+            assert await scheduler._record_give_up(rid, "twilio down")
+
+        service.mark_reminder_failed.assert_awaited_once_with(rid, "twilio down")
+
+
+# =============================================================================
+# Unit Tests: Concurrent Delivery
+# =============================================================================
+
+class TestDelivery:
+
+    @pytest.mark.asyncio
+    async def test_fire_reminders_runs_concurrently_in_order(self):
+        from lib.agent import reminder_notifications
+
+        async def _slow_fire(reminder_id: UUID) -> Dict[str, Any]:
+            await asyncio.sleep(0.05)
+            return {"reminder_id": str(reminder_id), "status": "success"}
+
+        ids = [uuid4() for _ in range(5)]
+        with patch.object(reminder_notifications, "fire_reminder", _slow_fire):
+            started = time.monotonic()
+            results = await reminder_notifications.fire_reminders(ids)
+            elapsed = time.monotonic() - started
+
+        assert [r["reminder_id"] for r in results] == [str(i) for i in ids]
+        assert elapsed < 0.2
+
+    @pytest.mark.asyncio
+    async def test_channel_limiter_spaces_sends(self):
+        from lib.agent.reminder_notifications import ChannelRateLimiter
+
+        limiter = ChannelRateLimiter(rate_per_sec=20, burst=1)
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+
+        assert time.monotonic() - started >= 0.09
@@ -11,10 +11,12 @@ Run with: pytest tests/test_signal_classifier.py -v
 import pytest
 
 from backend.services.signal_classifier import (
+    _content_tokens,
     classify_frustration,
     classify_gratitude,
     classify_repetition,
     classify_signals,
+    get_signal_matcher,
 )
 
 
@@ -229,3 +231,49 @@ class TestClassifySignals:
         assert result["gratitude"] is False
         assert result["frustration"] is False
         assert result["repetition"] is False
+
+
+# =============================================================================
+# Compiled Matcher
+# =============================================================================
+
+class TestSignalMatcher:
+    """Tests for the single-pass phrase matcher behind the classifiers."""
+
+    def test_hits_report_positions(self):
+        """Each hit carries its kind, phrase and span in the lowercased text."""
+        hits = get_signal_matcher().hits("Great job, but that's wrong")
+        spans = {(h.kind, h.phrase, h.start, h.end) for h in hits}
+        assert ("gratitude", "great job", 0, 9) in spans
+        assert ("frustration", "that's wrong", 15, 27) in spans
+
+    def test_overlapping_prefix_hits(self):
+        """Shorter phrases starting at the same position are reported too."""
+        phrases = {h.phrase for h in get_signal_matcher().hits("thanks but no")}
+        assert {"thanks but", "thanks", "thank"} <= phrases
+
+    def test_negation_only_cancels_what_it_covers(self):
+        """A negation mid-message cancels its own 'thanks', not other gratitude."""
+        assert classify_gratitude("Sorry, no thanks") is False
+        assert classify_gratitude("Perfect! Thanks but one more thing") is True
+
+    def test_short_phrases_match_whole_words_only(self):
+        """'ty', 'ugh' and 'come on' don't fire inside other words."""
+        assert classify_gratitude("pretty city") is False
+        assert classify_frustration("I laughed, though") is False
+        assert classify_frustration("income only") is False
+        assert classify_gratitude("thankful for this") is True
+
+    def test_curly_apostrophe(self):
+        """Typographic apostrophes match like ASCII ones."""
+        assert classify_frustration("That’s wrong") is True
+
+    def test_repetition_tokens_cached(self):
+        """Each message is tokenized once across consecutive turns."""
+        _content_tokens.cache_clear()
+        classify_repetition("check my calendar today", "check my calendar")
+        classify_repetition("what about tomorrow", "check my calendar today")
+
+        info = _content_tokens.cache_info()
+        assert info.misses == 3
+        assert info.hits == 1
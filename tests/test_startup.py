@@ -0,0 +1,198 @@
+"""
+Tests for startup readiness gates, the import timer and lazy subsystem
+initialization (backend/services/startup.py, lib/agent/registry.py).
+"""
+
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.services import startup
+from backend.services.startup import ImportTimer, is_ready, readiness, start_gate
+from lib.agent import registry
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    startup.reset_startup_state()
+    registry.reset_base_tools()
+    yield
+    startup.reset_startup_state()
+    registry.reset_base_tools()
+
+
+# =============================================================================
+# Gates
+# =============================================================================
+
+class TestGates:
+
+    @pytest.mark.asyncio
+    async def test_required_gate_holds_readiness(self) -> None:
+        release = asyncio.Event()
+
+        async def slow_init() -> None:
+            await release.wait()
+
+        async def broken_init() -> None:
+            raise RuntimeError("redis down")
+
+        tools = start_gate("tools", slow_init)
+        optional = start_gate("redis", broken_init, required=False)
+        await optional
+        assert not is_ready()
+        assert readiness()["gates"]["redis"]["status"] == "failed"
+        assert readiness()["gates"]["tools"]["status"] == "running"
+
+        release.set()
+        await tools
+        state = readiness()
+        assert state["ready"] is True
+        assert state["ready_after_seconds"] is not None
+        assert state["gates"]["tools"]["seconds"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_failed_required_gate_is_not_ready(self) -> None:
+        async def broken_init() -> None:
+            raise ValueError("no tools")
+
+        await start_gate("tools", broken_init)
+        assert not is_ready()
+        assert readiness()["gates"]["tools"]["error"] == "no tools"
+
+    @pytest.mark.asyncio
+    async def test_stop_gates_cancels_pending(self) -> None:
+        task = start_gate("tools", lambda: asyncio.sleep(10))
+        await asyncio.sleep(0)
+        await startup.stop_gates()
+        assert task.cancelled() or task.done()
+
+    def test_phases_are_recorded(self) -> None:
+        with startup.startup_phase("preflight"):
+            pass
+        assert [p["name"] for p in startup.startup_profile()["phases"]] == ["preflight"]
+
+
+# =============================================================================
+# Import timing
+# =============================================================================
+
+def test_import_timer_reports_self_time(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    package = tmp_path / "slowpkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("import time\ntime.sleep(0.05)\nfrom . import child\n")
+    (package / "child.py").write_text("import time\ntime.sleep(0.1)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    timer = ImportTimer()
+    sys.meta_path.insert(0, timer)
+    try:
+        import slowpkg  # noqa: F401
+    finally:
+        sys.meta_path.remove(timer)
+        for name in ("slowpkg", "slowpkg.child"):
+            sys.modules.pop(name, None)
+
+    # The package's own time excludes its child's
+    assert 0.04 < timer.self_seconds["slowpkg"] < 0.1
+    assert timer.self_seconds["slowpkg.child"] >= 0.09
+    assert timer.by_package()[0] == {"package": "slowpkg", "seconds": pytest.approx(0.15, abs=0.05), "modules": 2}
+
+
+def test_server_import_defers_heavy_sdks() -> None:
+    """Importing the API must not pull in the LLM, MCP or LangGraph SDKs."""
+    code = (
+        "import sys, lib.agent.server\n"
+        "heavy = ('anthropic', 'langchain_anthropic', 'openai', 'langchain_openai', 'mcp', 'langgraph.prebuilt')\n"
+        "print('loaded:' + ','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.strip().splitlines()[-1] == "loaded:"
+
+
+# =============================================================================
+# Tool registry cache
+# =============================================================================
+
+class TestBaseToolCache:
+
+    @pytest.fixture
+    def loads(self, monkeypatch: pytest.MonkeyPatch) -> List[int]:
+        calls: List[int] = []
+
+        def load_local_skills() -> List[Any]:
+            calls.append(1)
+            return []
+
+        monkeypatch.setattr(registry, "load_local_skills", load_local_skills)
+        monkeypatch.setattr(registry, "MCP_SERVERS", [])
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_loaded_once_and_shared(self, loads: List[int]) -> None:
+        await asyncio.gather(registry.get_all_tools(), registry.get_all_tools())
+        await registry.get_all_tools()
+        assert len(loads) == 1
+        registry.reset_base_tools()
+        await registry.get_all_tools()
+        assert len(loads) == 2
+
+    @pytest.mark.asyncio
+    async def test_empty_mcp_server_is_retried(self, loads: List[int], monkeypatch: pytest.MonkeyPatch) -> None:
+        async def by_server() -> List[Any]:
+            return [("workspace-mcp", [])]
+
+        monkeypatch.setattr(registry, "MCP_SERVERS", [{"command": "workspace-mcp"}])
+        monkeypatch.setattr(registry, "_load_mcp_tools_by_server", by_server)
+        monkeypatch.setattr(registry, "TOOL_REGISTRY_RETRY_SECONDS", 0.0)
+        await registry.get_all_tools()
+        await registry.get_all_tools()
+        assert len(loads) == 2
+
+
+# =============================================================================
+# Endpoints
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_health_is_liveness_and_ready_follows_gates(monkeypatch: pytest.MonkeyPatch) -> None:
+    from lib.agent.routers import observability
+
+    async def must_not_load(*args: Any, **kwargs: Any) -> List[Any]:
+        raise AssertionError("/health must not load tools")
+
+    monkeypatch.setattr(observability, "get_all_tools", must_not_load)
+    monkeypatch.setattr(registry, "get_all_tools", must_not_load)
+
+    app = FastAPI()
+    app.include_router(observability.router)
+    client = TestClient(app)
+
+    release = asyncio.Event()
+    gate = start_gate("tools", release.wait)
+    await asyncio.sleep(0)
+
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert health.json()["ready"] is False
+    not_ready = client.get("/ready")
+    assert not_ready.status_code == 503
+    assert not_ready.json()["gates"]["tools"]["status"] == "running"
+
+    release.set()
+    await gate
+    assert client.get("/ready").status_code == 200
+    profile = client.get("/startup/profile").json()
+    assert profile["gates"]["tools"]["status"] == "ready"
@@ -0,0 +1,328 @@
+"""
+Tests for the tool result cache (lib/agent/tool_cache.py) and its wiring
+into local skill tools (lib/agent/registry.py).
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from lib.agent import tool_cache
+from lib.agent.registry import (
+    SKILLS_DIR,
+    LoadedSkill,
+    SkillManifest,
+    convert_local_skill_to_tool,
+    load_local_skills,
+)
+from lib.agent.tool_cache import (
+    ToolCacheSpec,
+    ToolResultCache,
+    derive_key_args,
+    make_cache_key,
+    track_cache_hits,
+)
+
+
+# =============================================================================
+# Fakes
+# =============================================================================
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.ops: List[Any] = []
+
+    def get(self, key: str) -> None:
+        self.ops.append(lambda: self.redis.store.get(key))
+
+    def ttl(self, key: str) -> None:
+        self.ops.append(lambda: self.redis.ttls.get(key, -2))
+
+    def incr(self, key: str) -> None:
+        self.ops.append(lambda: self.redis.incr(key))
+
+    def execute(self) -> List[Any]:
+        return [op() for op in self.ops]
+
+
+class FakeRedis:
+    """Just the Redis commands the tool cache uses; shared between caches."""
+
+    def __init__(self) -> None:
+        self.store: Dict[str, Any] = {}
+        self.ttls: Dict[str, int] = {}
+
+    def pipeline(self) -> FakePipeline:
+        return FakePipeline(self)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.store.get(k) for k in keys]
+
+    def set(self, key: str, value: str, ex: int) -> None:
+        self.store[key] = value.encode()
+        self.ttls[key] = ex
+
+    def incr(self, key: str) -> int:
+        value = int(self.store.get(key, b"0")) + 1
+        self.store[key] = str(value).encode()
+        return value
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> ToolResultCache:
+    """A fresh local-only cache installed as the process-wide one."""
+    fresh = ToolResultCache(redis_enabled=False)
+    monkeypatch.setattr(tool_cache, "_cache", fresh)
+    return fresh
+
+
+def _skill(
+    name: str,
+    handler: Any,
+    cache: Optional[Dict[str, Any]] = None,
+    invalidates: Optional[List[str]] = None,
+) -> LoadedSkill:
+    manifest = SkillManifest(
+        name=name,
+        description=f"{name} skill",
+        parameters={
+            "type": "object",
+            "properties": {
+                "action": {"type": "string"},
+                "query": {"type": "string"},
+                "limit": {"type": "integer", "default": 10},
+            },
+        },
+        cache=cache,
+        invalidates=invalidates or [],
+    )
+    return LoadedSkill(name=name, description=manifest.description, handler=handler, manifest=manifest)
+
+
+class CountingHandler:
+    def __init__(self, result: Any = None) -> None:
+        self.calls: List[Dict[str, Any]] = []
+        self.result = result
+
+    async def __call__(self, params: Dict[str, Any]) -> Any:
+        self.calls.append(params)
+        if self.result is not None:
+            return self.result
+        return {"status": "success", "call": len(self.calls)}
+
+
+# =============================================================================
+# Keys and spec
+# =============================================================================
+
+class TestKeys:
+
+    def test_defaults_fill_omitted_args(self) -> None:
+        spec = ToolCacheSpec(ttl_seconds=60)
+        defaults = {"limit": 10}
+        assert derive_key_args(spec, {"query": "x"}, defaults) == \
+            derive_key_args(spec, {"query": "x", "limit": 10}, defaults)
+
+    def test_key_args_select_identity(self) -> None:
+        spec = ToolCacheSpec(ttl_seconds=60, key_args=["query"])
+        assert derive_key_args(spec, {"query": "x", "trace": "abc"}, {}) == {"query": "x"}
+
+    def test_key_changes_with_generation_and_args(self) -> None:
+        base = make_cache_key("t", "1.0.0", {"q": "x"}, [0])
+        assert base == make_cache_key("t", "1.0.0", {"q": "x"}, [0])
+        assert base != make_cache_key("t", "1.0.0", {"q": "x"}, [1])
+        assert base != make_cache_key("t", "1.0.0", {"q": "y"}, [0])
+        assert base != make_cache_key("t", "2.0.0", {"q": "x"}, [0])
+
+    def test_only_when(self) -> None:
+        spec = ToolCacheSpec(ttl_seconds=60, only_when={"action": ["list", "get"]})
+        assert spec.applies_to({"action": "list"})
+        assert not spec.applies_to({"action": "create"})
+        assert not spec.applies_to({})
+
+
+# =============================================================================
+# Cache storage
+# =============================================================================
+
+class TestToolResultCache:
+
+    def test_expiry_and_lru(self) -> None:
+        clock = FakeClock()
+        cache = ToolResultCache(max_entries=2, redis_enabled=False, clock=clock)
+        cache.put("a", "A", 10)
+        cache.put("b", "B", 10)
+        assert cache.get("a") == "A"
+        cache.put("c", "C", 10)          # evicts "b" (least recently used)
+        assert cache.get("b") is None
+        clock.now += 11
+        assert cache.get("a") is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate_bumps_generation(self) -> None:
+        cache = ToolResultCache(redis_enabled=False)
+        assert cache.generations(["calendar", "gmail"]) == [0, 0]
+        cache.invalidate(["calendar"])
+        assert cache.generations(["calendar", "gmail"]) == [1, 0]
+
+    def test_redis_shares_results_and_invalidations(self) -> None:
+        redis = FakeRedis()
+        worker_a = ToolResultCache(redis_factory=lambda: redis, redis_enabled=True)
+        worker_b = ToolResultCache(redis_factory=lambda: redis, redis_enabled=True)
+
+        worker_a.put("k", "value", 30)
+        assert worker_b.get("k") == "value"
+        assert worker_b.stats()["redis_hits"] == 1
+
+        worker_a.invalidate(["calendar"])
+        assert worker_b.generations(["calendar"]) == [1]
+
+    def test_lookups_feed_metrics_registry(self) -> None:
+        from backend.services.metrics import TOOL_CACHE_ENTRIES, TOOL_CACHE_LOOKUPS_TOTAL
+
+        before = {r: TOOL_CACHE_LOOKUPS_TOTAL.value(result=r) for r in ("hit", "redis_hit", "miss")}
+        redis = FakeRedis()
+        worker_a = ToolResultCache(redis_factory=lambda: redis, redis_enabled=True)
+        worker_b = ToolResultCache(redis_factory=lambda: redis, redis_enabled=True)
+        assert worker_a.get("k") is None
+        worker_a.put("k", "value", 30)
+        assert worker_a.get("k") == "value"
+        assert worker_b.get("k") == "value"
+
+        after = {r: TOOL_CACHE_LOOKUPS_TOTAL.value(result=r) - before[r] for r in before}
+        assert after == {"hit": 1, "redis_hit": 1, "miss": 1}
+        assert TOOL_CACHE_ENTRIES.value() == 1
+
+    def test_redis_failure_degrades_to_local(self) -> None:
+        def broken() -> Any:
+            raise ConnectionError("redis down")
+
+        cache = ToolResultCache(redis_factory=broken, redis_enabled=True)
+        cache.put("k", "v", 30)
+        assert cache.get("k") == "v"
+        cache.invalidate(["t"])
+        assert cache.generations(["t"]) == [1]
+
+
+# =============================================================================
+# Registry wiring
+# =============================================================================
+
+class TestSkillToolCaching:
+
+    @pytest.mark.asyncio
+    async def test_repeated_read_hits_cache(self, cache: ToolResultCache) -> None:
+        handler = CountingHandler()
+        tool = convert_local_skill_to_tool(_skill("read", handler, cache={"ttl_seconds": 60}))
+
+        first = await tool.ainvoke({"query": "x"})
+        second = await tool.ainvoke({"query": "x", "limit": 10})
+        third = await tool.ainvoke({"query": "other"})
+
+        assert first == second
+        assert third != first
+        assert len(handler.calls) == 2
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached(self, cache: ToolResultCache) -> None:
+        handler = CountingHandler(result={"status": "error", "error": "quota"})
+        tool = convert_local_skill_to_tool(_skill("read", handler, cache={"ttl_seconds": 60}))
+
+        await tool.ainvoke({"query": "x"})
+        await tool.ainvoke({"query": "x"})
+        assert len(handler.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_related_reads(self, cache: ToolResultCache) -> None:
+        reads = CountingHandler()
+        read_tool = convert_local_skill_to_tool(
+            _skill("get_events", reads, cache={"ttl_seconds": 60, "tags": ["calendar"]}))
+        write_tool = convert_local_skill_to_tool(
+            _skill("create_event", CountingHandler(), invalidates=["calendar"]))
+
+        await read_tool.ainvoke({"query": "today"})
+        await read_tool.ainvoke({"query": "today"})
+        await write_tool.ainvoke({"query": "lunch"})
+        await read_tool.ainvoke({"query": "today"})
+        assert len(reads.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_mixed_skill_caches_reads_and_invalidates_on_writes(self, cache: ToolResultCache) -> None:
+        handler = CountingHandler()
+        tool = convert_local_skill_to_tool(_skill(
+            "github_issues",
+            handler,
+            cache={"ttl_seconds": 60, "tags": ["github"], "only_when": {"action": ["list"]}},
+            invalidates=["github"],
+        ))
+
+        await tool.ainvoke({"action": "list"})
+        await tool.ainvoke({"action": "list"})
+        assert len(handler.calls) == 1
+        await tool.ainvoke({"action": "create"})
+        await tool.ainvoke({"action": "list"})
+        assert len(handler.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_hits_are_tracked_for_audit(self, cache: ToolResultCache) -> None:
+        tool = convert_local_skill_to_tool(
+            _skill("read", CountingHandler(), cache={"ttl_seconds": 60}))
+
+        with track_cache_hits() as hits:
+            miss = await tool.ainvoke({"query": "x"})
+            hit = await tool.ainvoke({"query": "x"})
+            other = await tool.ainvoke({"query": "y"})
+        assert hits == Counter({("read", hit): 1})
+
+        from lib.agent.core import extract_tool_execution_details
+        messages = [
+            AIMessage(content=""),
+            ToolMessage(content=miss, name="read", tool_call_id="1"),
+            ToolMessage(content=hit, name="read", tool_call_id="2"),
+            ToolMessage(content=other, name="read", tool_call_id="3"),
+        ]
+        results = [
+            e for e in extract_tool_execution_details(messages, cache_hits=hits)["tool_executions"]
+            if e["type"] == "tool_result"
+        ]
+        # The hit is indistinguishable from the identical miss; exactly one
+        # of the pair is flagged, and the unrelated result is not.
+        assert sum(e["cache_hit"] for e in results[:2]) == 1
+        assert results[2]["cache_hit"] is False
+
+    def test_audit_entry_records_cache_hit(self) -> None:
+        from backend.services.audit_logging import _build_audit_entry
+
+        assert _build_audit_entry("get_weather", cache_hit=True)["cache_hit"] is True
+        assert _build_audit_entry("get_weather")["cache_hit"] is False
+
+
+class TestManifests:
+
+    def test_read_skills_opt_in_and_writes_invalidate(self) -> None:
+        skills = {s.name: s.manifest for s in load_local_skills()}
+        for name in ("get_calendar_events", "get_weather", "search_gmail_messages", "github_issues"):
+            if name in skills:
+                assert skills[name].cache is not None, name
+        if "create_calendar_event" in skills and "get_calendar_events" in skills:
+            calendar_tags = skills["get_calendar_events"].cache.tags
+            assert set(calendar_tags) <= set(skills["create_calendar_event"].invalidates)
+
+    def test_manifest_cache_blocks_parse(self) -> None:
+        import json
+        for manifest_path in SKILLS_DIR.glob("*/manifest.json"):
+            data = json.loads(manifest_path.read_text())
+            if "cache" in data:
+                ToolCacheSpec(**data["cache"])
@@ -0,0 +1,375 @@
+"""
+Tests for request tracing (backend/services/tracing.py).
+
+Covers span context encoding, parent/child wiring across awaits, tasks and
+threads, OTLP/JSON export, the ASGI middleware, the rq producer/consumer
+hand-off through job meta, and the Slow Path link back to the request
+that wrote a WAL entry.
+"""
+
+import asyncio
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Generator
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.services import tracing
+from backend.services.tracing import (
+    INVALID_SPAN,
+    ConsoleSpanExporter,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    SpanContext,
+    TraceMiddleware,
+    configure_tracing,
+    current_span,
+    extract,
+    inject,
+    start_span,
+    traced,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SPAN_ID = "00f067aa0ba902b7"
+TRACEPARENT = f"00-{TRACE_ID}-{SPAN_ID}-01"
+
+
+@pytest.fixture
+def exporter() -> Generator[InMemorySpanExporter, None, None]:
+    """Route spans to memory for the test, then restore the env tracer."""
+    memory = InMemorySpanExporter()
+    configure_tracing(memory)
+    yield memory
+    tracing._tracer = None
+
+
+# =============================================================================
+# Span context
+# =============================================================================
+
+class TestSpanContext:
+
+    def test_traceparent_round_trip(self) -> None:
+        ctx = SpanContext.from_traceparent(TRACEPARENT)
+        assert ctx == SpanContext(TRACE_ID, SPAN_ID, sampled=True)
+        assert ctx.to_traceparent() == TRACEPARENT
+
+    def test_unsampled_flag(self) -> None:
+        ctx = SpanContext.from_traceparent(f"00-{TRACE_ID}-{SPAN_ID}-00")
+        assert ctx is not None and ctx.sampled is False
+
+    @pytest.mark.parametrize("value", [
+        None,
+        "",
+        "garbage",
+        f"00-{'0' * 32}-{SPAN_ID}-01",
+        f"00-{TRACE_ID}-{'0' * 16}-01",
+        f"ff-{TRACE_ID}-{SPAN_ID}-01",
+        f"00-{TRACE_ID[:-1]}-{SPAN_ID}-01",
+    ])
+    def test_invalid_values_rejected(self, value: Any) -> None:
+        assert SpanContext.from_traceparent(value) is None
+
+    def test_inject_extract(self, exporter: InMemorySpanExporter) -> None:
+        assert inject() == {}
+        with start_span("outer") as span:
+            carrier = inject({"other": "x"})
+            assert carrier["other"] == "x"
+            assert extract(carrier) == span.context
+        assert extract({}) is None
+        assert extract(None) is None
+
+
+# =============================================================================
+# Spans
+# =============================================================================
+
+class TestSpans:
+
+    def test_nested_spans_share_trace(self, exporter: InMemorySpanExporter) -> None:
+        with start_span("parent") as parent:
+            with start_span("child") as child:
+                assert current_span() is child
+            assert current_span() is parent
+        assert current_span() is INVALID_SPAN
+
+        assert [s.name for s in exporter.spans] == ["child", "parent"]
+        assert child.context.trace_id == parent.context.trace_id
+        assert child.parent_span_id == parent.context.span_id
+        assert parent.parent_span_id is None
+
+    def test_remote_parent(self, exporter: InMemorySpanExporter) -> None:
+        with start_span("server", parent=SpanContext(TRACE_ID, SPAN_ID)) as span:
+            pass
+        assert span.context.trace_id == TRACE_ID
+        assert span.parent_span_id == SPAN_ID
+
+    def test_exception_recorded_and_reraised(self, exporter: InMemorySpanExporter) -> None:
+        with pytest.raises(ValueError):
+            with start_span("boom"):
+                raise ValueError("bad input")
+        span = exporter.spans[0]
+        assert span.status_code == tracing.STATUS_ERROR
+        assert span.attributes["exception.type"] == "ValueError"
+        assert span.end_ns is not None
+
+    def test_unsampled_spans_not_exported(self, exporter: InMemorySpanExporter) -> None:
+        with start_span("dropped", parent=SpanContext(TRACE_ID, SPAN_ID, sampled=False)):
+            pass
+        assert exporter.spans == []
+
+    def test_invalid_span_ignores_writes(self) -> None:
+        INVALID_SPAN.set_attribute("k", "v")
+        INVALID_SPAN.add_link(SpanContext(TRACE_ID, SPAN_ID))
+        assert INVALID_SPAN.attributes == {}
+        assert INVALID_SPAN.links == []
+
+    @pytest.mark.asyncio
+    async def test_context_follows_tasks_and_threads(self, exporter: InMemorySpanExporter) -> None:
+        def in_thread() -> str:
+            with start_span("thread.work"):
+                return current_span().parent_span_id or ""
+
+        async def in_task() -> str:
+            with start_span("task.work"):
+                return current_span().parent_span_id or ""
+
+        with start_span("request") as root:
+            thread_parent = await asyncio.to_thread(in_thread)
+            task_parents = await asyncio.gather(in_task(), in_task())
+
+        assert thread_parent == root.context.span_id
+        assert task_parents == [root.context.span_id] * 2
+        assert {s.context.trace_id for s in exporter.spans} == {root.context.trace_id}
+
+    @pytest.mark.asyncio
+    async def test_traced_decorator(self, exporter: InMemorySpanExporter) -> None:
+        @traced("sync.op")
+        def sync_op() -> int:
+            return 1
+
+        @traced()
+        async def async_op() -> int:
+            return sync_op() + 1
+
+        assert await async_op() == 2
+        names = [s.name for s in exporter.spans]
+        assert names[0] == "sync.op"
+        assert names[1].endswith("async_op")
+        assert exporter.spans[0].parent_span_id == exporter.spans[1].context.span_id
+
+
+# =============================================================================
+# Exporters
+# =============================================================================
+
+class TestExporters:
+
+    def test_file_exporter_writes_otlp_json_lines(self, tmp_path: Any) -> None:
+        path = tmp_path / "traces.jsonl"
+        file_exporter = FileSpanExporter(str(path), service_name="sabine-test")
+        configure_tracing(file_exporter)
+        try:
+            with start_span("root", attributes={"count": 3, "ok": True, "ratio": 0.5}) as root:
+                root.add_link(SpanContext(TRACE_ID, SPAN_ID), {"why": "origin"})
+                with start_span("leaf"):
+                    pass
+        finally:
+            tracing.shutdown_tracing()
+            tracing._tracer = None
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        leaf, root_doc = (json.loads(line) for line in lines)
+        resource = root_doc["resourceSpans"][0]
+        assert {"key": "service.name", "value": {"stringValue": "sabine-test"}} in (
+            resource["resource"]["attributes"]
+        )
+        span = resource["scopeSpans"][0]["spans"][0]
+        assert span["name"] == "root"
+        assert span["kind"] == 1
+        assert {"key": "count", "value": {"intValue": "3"}} in span["attributes"]
+        assert {"key": "ok", "value": {"boolValue": True}} in span["attributes"]
+        assert span["links"][0]["traceId"] == TRACE_ID
+        leaf_span = leaf["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        assert leaf_span["parentSpanId"] == span["spanId"]
+
+    def test_console_exporter(self) -> None:
+        stream = io.StringIO()
+        configure_tracing(ConsoleSpanExporter(stream=stream))
+        try:
+            with start_span("printed"):
+                pass
+        finally:
+            tracing._tracer = None
+        assert '"name":"printed"' in stream.getvalue()
+
+    def test_env_selects_exporter(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+        monkeypatch.setenv("TRACING_EXPORTER", "file")
+        monkeypatch.setenv("TRACING_FILE_PATH", str(tmp_path / "t.jsonl"))
+        assert isinstance(tracing._exporter_from_env(), FileSpanExporter)
+        monkeypatch.setenv("TRACING_EXPORTER", "stdout")
+        assert isinstance(tracing._exporter_from_env(), ConsoleSpanExporter)
+        monkeypatch.setenv("TRACING_EXPORTER", "none")
+        assert tracing._exporter_from_env() is None
+
+
+# =============================================================================
+# Middleware
+# =============================================================================
+
+class TestTraceMiddleware:
+
+    @pytest.fixture
+    def client(self) -> TestClient:
+        app = FastAPI()
+        app.add_middleware(TraceMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: str) -> Dict[str, Any]:
+            with start_span("handler"):
+                return {"trace": current_span().context.trace_id}
+
+        @app.get("/fail")
+        async def fail() -> None:
+            raise RuntimeError("nope")
+
+        return TestClient(app, raise_server_exceptions=False)
+
+    def test_continues_incoming_trace(self, client: TestClient, exporter: InMemorySpanExporter) -> None:
+        resp = client.get("/items/42", headers={"traceparent": TRACEPARENT})
+        assert resp.json() == {"trace": TRACE_ID}
+        assert resp.headers["x-trace-id"] == TRACE_ID
+
+        server = exporter.by_name("GET /items/{item_id}")[0]
+        assert server.kind == tracing.SPAN_KIND_SERVER
+        assert server.parent_span_id == SPAN_ID
+        assert server.attributes["http.response.status_code"] == 200
+        assert resp.headers["traceparent"] == server.context.to_traceparent()
+        assert exporter.by_name("handler")[0].parent_span_id == server.context.span_id
+
+    def test_new_trace_without_header(self, client: TestClient, exporter: InMemorySpanExporter) -> None:
+        resp = client.get("/items/1")
+        assert SpanContext.from_traceparent(resp.headers["traceparent"]) is not None
+        assert exporter.spans[-1].parent_span_id is None
+
+    def test_server_error_marks_span(self, client: TestClient, exporter: InMemorySpanExporter) -> None:
+        resp = client.get("/fail")
+        assert resp.status_code == 500
+        assert exporter.by_name("GET /fail")[0].status_code == tracing.STATUS_ERROR
+
+
+# =============================================================================
+# rq hand-off and Slow Path link
+# =============================================================================
+
+class TestQueuePropagation:
+
+    def test_enqueue_stores_traceparent_in_meta(self, exporter: InMemorySpanExporter) -> None:
+        from backend.services.queue import _enqueue_job
+
+        mock_queue = MagicMock()
+        mock_queue.enqueue.return_value = MagicMock(id="job-1")
+        with (
+            patch("rq.Queue", return_value=mock_queue),
+            patch("backend.services.redis_client.get_redis_client", return_value=MagicMock()),
+            start_span("request") as request,
+        ):
+            result = _enqueue_job("backend.worker.jobs.process_wal_entry", {"wal_entry_id": "w1"})
+
+        assert result.success
+        producer = exporter.by_name("rq.enqueue process_wal_entry")[0]
+        assert producer.parent_span_id == request.context.span_id
+        assert producer.attributes["messaging.message.id"] == "job-1"
+        meta = mock_queue.enqueue.call_args.kwargs["meta"]
+        assert extract(meta) == producer.context
+
+    def test_job_resumes_trace_from_meta(self, exporter: InMemorySpanExporter) -> None:
+        from backend.worker.memory_guard import memory_profiled_job
+
+        job = MagicMock(id="job-7", meta={"traceparent": TRACEPARENT})
+
+        @memory_profiled_job()
+        def sample_job() -> str:
+            with start_span("inside"):
+                return current_span().context.trace_id
+
+        with (
+            patch("rq.get_current_job", return_value=job),
+            patch("backend.worker.memory_guard._record_peak_memory"),
+            patch("backend.worker.memory_guard._record_job_metrics"),
+        ):
+            assert sample_job() == TRACE_ID
+
+        consumer = exporter.by_name("rq.job sample_job")[0]
+        assert consumer.kind == tracing.SPAN_KIND_CONSUMER
+        assert consumer.parent_span_id == SPAN_ID
+        assert consumer.attributes["messaging.message.id"] == "job-7"
+
+    @patch("backend.services.wal.get_supabase_client")
+    def test_consolidation_links_to_originating_request(
+        self, mock_supabase: MagicMock, exporter: InMemorySpanExporter,
+    ) -> None:
+        from backend.worker.slow_path import consolidate_wal_entry
+
+        wal_id = str(uuid4())
+        entry_data = {
+            "id": wal_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "raw_payload": {"message": "", "user_id": "u1", "traceparent": TRACEPARENT},
+            "status": "pending",
+            "retry_count": 0,
+            "metadata": {},
+        }
+        mock_client = MagicMock()
+        mock_client.table.return_value.select.return_value.eq.return_value.execute.return_value = (
+            MagicMock(data=[entry_data])
+        )
+        mock_client.table.return_value.update.return_value.eq.return_value.execute.return_value = (
+            MagicMock(data=[{"id": wal_id}])
+        )
+        mock_supabase.return_value = mock_client
+
+        with start_span("rq.job process_wal_entry") as job_span:
+            consolidate_wal_entry(wal_id)
+
+        span = exporter.by_name("slow_path.consolidate_entry")[0]
+        assert span.parent_span_id == job_span.context.span_id
+        assert span.attributes["wal.entry_id"] == wal_id
+        assert [ctx for ctx, _ in span.links] == [SpanContext(TRACE_ID, SPAN_ID)]
+
+
+# =============================================================================
+# Agent callbacks
+# =============================================================================
+
+class TestTracingCallbackHandler:
+
+    def test_llm_and_tool_spans(self, exporter: InMemorySpanExporter) -> None:
+        from lib.agent.metrics_callbacks import TracingCallbackHandler
+
+        handler = TracingCallbackHandler(provider="anthropic", model="claude-test")
+        llm_run, tool_run, failed_run = uuid4(), uuid4(), uuid4()
+        message = MagicMock(usage_metadata={"input_tokens": 120, "output_tokens": 8})
+        response = MagicMock(generations=[[MagicMock(message=message)]])
+
+        with start_span("agent.invoke") as agent_span:
+            handler.on_chat_model_start({}, [], run_id=llm_run)
+            handler.on_tool_start({"name": "get_weather"}, "{}", run_id=tool_run, parent_run_id=llm_run)
+            handler.on_tool_end("sunny", run_id=tool_run)
+            handler.on_llm_end(response, run_id=llm_run)
+            handler.on_tool_start({"name": "broken"}, "{}", run_id=failed_run)
+            handler.on_tool_error(RuntimeError("down"), run_id=failed_run)
+
+        llm = exporter.by_name("llm claude-test")[0]
+        assert llm.kind == tracing.SPAN_KIND_CLIENT
+        assert llm.parent_span_id == agent_span.context.span_id
+        assert llm.attributes["gen_ai.usage.input_tokens"] == 120
+        assert exporter.by_name("tool get_weather")[0].parent_span_id == llm.context.span_id
+        assert exporter.by_name("tool broken")[0].status_code == tracing.STATUS_ERROR
@@ -0,0 +1,220 @@
+"""
+Tests for the user_config Read Cache
+====================================
+
+Run with: pytest tests/test_user_config_cache.py -v
+
+Tests cover:
+1. TTL expiry and the negative cache for missing keys
+2. get_user_config serves repeated reads from the cache
+3. set/delete write through the cache and publish an invalidation
+4. Invalidation messages from other processes (own messages ignored)
+5. LRU bound and hit/miss counters (also in the metrics registry)
+"""
+
+import json
+import os
+import sys
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.db import user_config
+from lib.db.user_config import UserConfigCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _supabase(rows: List[Dict[str, Any]]) -> MagicMock:
+    """Supabase mock whose select chain returns ``rows``."""
+    client = MagicMock()
+    chain = client.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value
+    chain.execute.return_value = MagicMock(data=rows)
+    upsert = client.table.return_value.upsert.return_value
+    upsert.execute.return_value = MagicMock(data=[{"config_value": "x"}])
+    return client
+
+
+@pytest.fixture
+def cache():
+    """Fresh module cache with the pub/sub listener disabled."""
+    fresh = UserConfigCache(clock=Clock())
+    with patch.object(user_config, "_cache", fresh), \
+         patch.object(user_config, "_ensure_invalidation_listener"), \
+         patch.object(user_config, "_publish_invalidation") as publish:
+        fresh.publish = publish
+        yield fresh
+
+
+# =============================================================================
+# UserConfigCache
+# =============================================================================
+
+class TestUserConfigCache:
+    def test_hit_until_ttl_expires(self):
+        clock = Clock()
+        c = UserConfigCache(ttl_seconds=10, clock=clock)
+        c.put("u1", "c_int", "0.5")
+
+        assert c.get("u1", "c_int") == (True, "0.5")
+        clock.now += 11
+        assert c.get("u1", "c_int") == (False, None)
+
+    def test_negative_entries_use_shorter_ttl(self):
+        clock = Clock()
+        c = UserConfigCache(ttl_seconds=100, negative_ttl_seconds=5, clock=clock)
+        c.put("u1", "lambda_alpha", None)
+
+        assert c.get("u1", "lambda_alpha") == (True, None)
+        assert c.stats()["negative_hits"] == 1
+        clock.now += 6
+        assert c.get("u1", "lambda_alpha") == (False, None)
+
+    def test_invalidate_scopes(self):
+        c = UserConfigCache(clock=Clock())
+        c.put("u1", "a", "1")
+        c.put("u1", "b", "2")
+        c.put("u2", "a", "3")
+
+        c.invalidate("u1", "a")
+        assert c.get("u1", "a")[0] is False
+        assert c.get("u1", "b")[0] is True
+
+        c.invalidate("u1")
+        assert c.get("u1", "b")[0] is False
+        assert c.get("u2", "a")[0] is True
+
+        c.invalidate()
+        assert c.stats()["size"] == 0
+
+    def test_lru_bound(self):
+        c = UserConfigCache(max_entries=2, clock=Clock())
+        c.put("u", "a", "1")
+        c.put("u", "b", "2")
+        c.get("u", "a")  # a is now most recently used
+        c.put("u", "c", "3")
+
+        assert c.get("u", "b")[0] is False
+        assert c.get("u", "a")[0] is True
+        assert c.stats()["evictions"] == 1
+
+    def test_lookups_feed_metrics_registry(self):
+        from backend.services.metrics import USER_CONFIG_CACHE_ENTRIES, USER_CONFIG_CACHE_LOOKUPS_TOTAL
+
+        before = {r: USER_CONFIG_CACHE_LOOKUPS_TOTAL.value(result=r) for r in ("hit", "negative_hit", "miss")}
+        c = UserConfigCache(clock=Clock())
+        c.get("u", "a")
+        c.put("u", "a", "1")
+        c.put("u", "b", None)
+        c.get("u", "a")
+        c.get("u", "b")
+
+        after = {r: USER_CONFIG_CACHE_LOOKUPS_TOTAL.value(result=r) - before[r] for r in before}
+        assert after == {"hit": 1, "negative_hit": 1, "miss": 1}
+        assert USER_CONFIG_CACHE_ENTRIES.value() == 2
+
+
+# =============================================================================
+# get / set / delete
+# =============================================================================
+
+class TestCachedAccess:
+    @pytest.mark.asyncio
+    async def test_repeated_reads_hit_database_once(self, cache):
+        client = _supabase([{"config_value": "0.7"}])
+        with patch.object(user_config, "_get_supabase", return_value=client):
+            values = [await user_config.get_user_config("u1", "c_int") for _ in range(5)]
+
+        assert values == ["0.7"] * 5
+        assert client.table.call_count == 1
+        assert cache.stats()["hits"] == 4
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_key_is_negatively_cached(self, cache):
+        client = _supabase([])
+        with patch.object(user_config, "_get_supabase", return_value=client):
+            first = await user_config.get_user_config("u1", "lambda_alpha_work", default="d")
+            second = await user_config.get_user_config("u1", "lambda_alpha_work", default="other")
+
+        assert first == "d"
+        assert second == "other"  # caller's default, not the cached one
+        assert client.table.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_read_errors_are_not_cached(self, cache):
+        client = MagicMock()
+        client.table.side_effect = ConnectionError("down")
+        with patch.object(user_config, "_get_supabase", return_value=client):
+            await user_config.get_user_config("u1", "c_int", default="d")
+            await user_config.get_user_config("u1", "c_int", default="d")
+
+        assert client.table.call_count == 2
+        assert cache.stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_set_writes_through_and_publishes(self, cache):
+        client = _supabase([{"config_value": "old"}])
+        with patch.object(user_config, "_get_supabase", return_value=client):
+            await user_config.get_user_config("u1", "c_int")
+            assert await user_config.set_user_config("u1", "c_int", "0.9") is True
+            value = await user_config.get_user_config("u1", "c_int")
+
+        assert value == "0.9"
+        cache.publish.assert_called_once_with("u1", "c_int")
+
+    @pytest.mark.asyncio
+    async def test_delete_caches_missing(self, cache):
+        client = _supabase([{"config_value": "old"}])
+        with patch.object(user_config, "_get_supabase", return_value=client):
+            await user_config.get_user_config("u1", "c_int")
+            assert await user_config.delete_user_config("u1", "c_int") is True
+            value = await user_config.get_user_config("u1", "c_int", default="d")
+
+        assert value == "d"
+        cache.publish.assert_called_once_with("u1", "c_int")
+
+
+# =============================================================================
+# Pub/sub invalidation
+# =============================================================================
+
+class TestInvalidationMessages:
+    def test_peer_message_invalidates(self, cache):
+        cache.put("u1", "c_int", "0.5")
+        user_config._handle_invalidation({
+            "type": "message",
+            "data": json.dumps({"user_id": "u1", "key": "c_int", "origin": "other"}),
+        })
+        assert cache.get("u1", "c_int")[0] is False
+
+    def test_own_message_is_ignored(self, cache):
+        cache.put("u1", "c_int", "0.5")
+        user_config._handle_invalidation({
+            "type": "message",
+            "data": json.dumps({"user_id": "u1", "key": "c_int", "origin": user_config._INSTANCE_ID}),
+        })
+        assert cache.get("u1", "c_int") == (True, "0.5")
+
+    def test_malformed_message_is_ignored(self, cache):
+        cache.put("u1", "c_int", "0.5")
+        user_config._handle_invalidation({"type": "message", "data": "not json"})
+        assert cache.get("u1", "c_int")[0] is True
+
+    def test_publish_payload(self):
+        redis = MagicMock()
+        with patch("backend.services.redis_client.get_redis_client", return_value=redis):
+            user_config._publish_invalidation("u1", "c_int")
+
+        channel, payload = redis.publish.call_args[0]
+        assert channel == user_config.USER_CONFIG_INVALIDATION_CHANNEL
+        assert json.loads(payload) == {"user_id": "u1", "key": "c_int", "origin": user_config._INSTANCE_ID}